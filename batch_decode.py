@@ -7,6 +7,7 @@ Usage:
     python batch_decode.py --limit 50         # Limit to 50 transactions
     python batch_decode.py --verbose          # Enable debug logging
     python batch_decode.py --output results.csv  # Export results to CSV
+    python batch_decode.py --no-chain-cache   # Bypass the on-disk tx/receipt/block cache
 """
 
 import os
@@ -171,6 +172,8 @@ def main():
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable debug logging')
     parser.add_argument('--output', '-o', type=str, help='Output CSV file path')
     parser.add_argument('--wallet', type=str, help='Specific wallet to check (overrides loading all)')
+    parser.add_argument('--no-chain-cache', action='store_true',
+                        help='Fetch tx/receipt/block data from RPC instead of the on-disk chain cache')
     args = parser.parse_args()
 
     # Enable debug logging if requested
@@ -206,8 +209,14 @@ def main():
 
     # Initialize decoder registry
     from main_app.services.decoders import DecoderRegistry
-    registry = DecoderRegistry(w3, fund_wallets, fund_id="drip_capital")
+    from main_app.services.chain_cache import ChainDataCache, get_chain_cache, set_chain_cache
+    if args.no_chain_cache:
+        set_chain_cache(ChainDataCache(None, enabled=False))
+    chain_cache = get_chain_cache()
+    registry = DecoderRegistry(w3, fund_wallets, fund_id="drip_capital", chain_cache=chain_cache)
     print(f"[+] Initialized DecoderRegistry with {len(registry._decoder_classes)} decoders")
+    if chain_cache.enabled:
+        print(f"[+] Chain cache: {chain_cache.path} ({len(chain_cache)} entries)")
 
     # Fetch transactions for all wallets
     print_section("FETCHING TRANSACTIONS")
@@ -239,6 +248,12 @@ def main():
     # Decode all transactions
     print_section("DECODING TRANSACTIONS")
 
+    # Fetch tx/receipt/block/price data for every hash in JSON-RPC batches;
+    # the per-transaction loop below then reads from the decoded cache
+    start = time.time()
+    registry.decode_many([tx['hash'] for tx in all_transactions])
+    print(f"[+] Decoded {len(all_transactions)} transactions in {time.time() - start:.1f}s")
+
     results = []
     platform_counts = {}
     category_counts = {}
@@ -328,6 +343,11 @@ def main():
     total_jes = sum(r['journal_entries'] for r in results)
     print(f"\nTotal Journal Entries Generated: {total_jes}")
 
+    if chain_cache.enabled:
+        stats = chain_cache.stats
+        print(f"\nChain Cache: {stats['hits']} hits, {stats['misses']} misses (RPC fetches), "
+              f"{stats['writes']} writes")
+
     # Export to CSV if requested
     if args.output:
         df = pd.DataFrame(results)
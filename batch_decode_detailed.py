@@ -249,6 +249,9 @@ def main():
     # Decode and write to log file
     print(f"[+] Decoding and writing to {args.output}...")
 
+    # Bulk-fetch chain data in JSON-RPC batches; the loop below hits the decoded cache
+    registry.decode_many([tx['hash'] for tx in all_transactions])
+
     stats = {
         'total': 0, 'success': 0, 'error': 0, 'spam': 0,
         'platforms': {}, 'categories': {}, 'total_jes': 0
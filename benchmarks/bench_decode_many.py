@@ -0,0 +1,94 @@
+"""
+Decode Pipeline Benchmark - sequential decode_transaction vs batched decode_many
+
+Starts the stub JSON-RPC server with a fixed per-request latency and decodes
+the same synthetic transactions twice, with the on-disk chain cache disabled
+so every run pays full RPC cost:
+  - old: DecoderRegistry.decode_transaction() per hash (3+ round trips each)
+  - new: DecoderRegistry.decode_many() (JSON-RPC batches, shared blocks deduped)
+
+Usage:
+    python benchmarks/bench_decode_many.py
+    python benchmarks/bench_decode_many.py --txs 5000 --latency 0.05 --skip-sequential
+    python benchmarks/bench_decode_many.py --rps 20      # exercise 429 backoff
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3 import Web3
+
+from tests.stub_rpc_server import StubRpcServer, FUND_WALLET
+from main_app.services.chain_cache import ChainDataCache
+from main_app.services.decoders import DecoderRegistry, Platform
+from main_app.services.price_oracle import EthUsdPriceOracle
+
+
+def make_registry(w3: Web3) -> DecoderRegistry:
+    """Registry with decoders initialized and no persistent cache or price history"""
+    cache = ChainDataCache(None, enabled=False)
+    registry = DecoderRegistry(w3, [FUND_WALLET], chain_cache=cache,
+                               price_oracle=EthUsdPriceOracle(None, chain_cache=cache))
+    # Warm up one-off imports/initialization outside the timed section
+    registry._get_decoder(Platform.GENERIC)
+    return registry
+
+
+def summarize(results) -> tuple:
+    return tuple((r.tx_hash, r.status, r.category.value, str(r.eth_price), len(r.journal_entries))
+                 for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched transaction decoding")
+    parser.add_argument('--txs', type=int, default=500, help='Transactions to decode')
+    parser.add_argument('--txs-per-block', type=int, default=4, help='Transactions sharing a block')
+    parser.add_argument('--latency', type=float, default=0.03, help='Stub RPC seconds per HTTP request')
+    parser.add_argument('--rps', type=float, default=None, help='Stub requests/second before 429s')
+    parser.add_argument('--batch-size', type=int, default=100, help='Calls per JSON-RPC batch')
+    parser.add_argument('--concurrency', type=int, default=4, help='Batches in flight')
+    parser.add_argument('--skip-sequential', action='store_true', help='Only time decode_many')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    logging.disable(logging.WARNING)
+
+    with StubRpcServer(args.txs, args.txs_per_block, args.latency, args.rps) as server:
+        w3 = Web3(Web3.HTTPProvider(server.url))
+        hashes = server.tx_hashes
+        print(f"Transactions: {args.txs}  blocks: {len(server.chain.blocks)}  "
+              f"latency: {args.latency * 1000:.0f}ms/request")
+
+        batched_registry = make_registry(w3)
+        server.reset_counters()
+        start = time.perf_counter()
+        batched = batched_registry.decode_many(hashes, batch_size=args.batch_size,
+                                               max_concurrency=args.concurrency)
+        new = time.perf_counter() - start
+        new_requests, new_429 = server.http_requests, server.rate_limited
+
+        if not args.skip_sequential:
+            sequential_registry = make_registry(w3)
+            server.reset_counters()
+            start = time.perf_counter()
+            sequential = [sequential_registry.decode_transaction(h) for h in hashes]
+            old = time.perf_counter() - start
+            old_requests = server.http_requests
+
+            assert summarize(sequential) == summarize(batched), "decode results differ"
+            print(f"  decode_transaction loop: {old:8.2f}s  {old_requests:6d} HTTP requests")
+
+        print(f"  decode_many            : {new:8.2f}s  {new_requests:6d} HTTP requests"
+              f"  ({new_429} answered 429)")
+        if not args.skip_sequential:
+            print(f"  speedup                : {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
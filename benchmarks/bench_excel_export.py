@@ -0,0 +1,143 @@
+"""
+Excel Export Benchmark - pd.ExcelWriter vs streaming write-only workbook
+
+Exports a GL-shaped journal entries frame the way the GL2 download does:
+  - old: dates formatted to strings, pd.ExcelWriter(engine='openpyxl') with
+    to_excel (every cell held in memory until save), then column widths from
+    astype(str) over every cell
+  - new: export_frames_to_excel() (widths estimated from the frame, shared
+    named styles, rows converted in chunks and streamed to the sheet file)
+
+Each variant runs in its own process so its peak RSS can be reported. The
+row count and the first --check-rows rows of both workbooks are compared.
+
+Usage:
+    python benchmarks/bench_excel_export.py
+    python benchmarks/bench_excel_export.py --rows 500000 --check-rows 1000
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from main_app.modules.financial_reporting.excel_export import export_frames_to_excel
+
+SHEET = 'Journal Entries'
+
+
+def make_gl(n: int, seed: int = 7) -> pd.DataFrame:
+    """n GL-shaped lines over two funds and three years"""
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 10**9, n) / 10**6
+    debit = rng.random(n) < 0.5
+    return pd.DataFrame({
+        'date': pd.Timestamp('2022-01-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, n), unit='s'),
+        'fund_id': rng.choice(['fund_i_class_B_ETH', 'fund_ii_class_B_ETH'], n),
+        'GL_Acct_Number': rng.choice([10030, 13010, 40010, 60010], n),
+        'account_name': rng.choice(['100.30 - ETH Wallet', '130.10 - Loans Receivable',
+                                    '400.10 - Interest Income', '600.10 - Gas Expense'], n),
+        'transaction_type': rng.choice(['loan_origination', 'interest_accrual', 'gas_fee'], n),
+        'cryptocurrency': 'ETH',
+        'debit_crypto': np.where(debit, amounts, 0.0),
+        'credit_crypto': np.where(debit, 0.0, amounts),
+        'eth_usd_price': rng.uniform(1500, 4000, n),
+        'hash': [f'0x{i:064x}' for i in range(n)],
+    })
+
+
+def old_export(df: pd.DataFrame) -> BytesIO:
+    """The GL2 journal entries download before the streaming export"""
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        export_df = df.copy()
+        export_df['date'] = pd.to_datetime(export_df['date']).dt.strftime('%Y-%m-%d %H:%M:%S')
+        export_df.to_excel(writer, sheet_name=SHEET, index=False)
+
+        worksheet = writer.sheets[SHEET]
+        for idx, col in enumerate(export_df.columns):
+            max_length = max(export_df[col].astype(str).map(len).max(), len(str(col))) + 2
+            worksheet.column_dimensions[chr(65 + idx) if idx < 26 else f'A{chr(65 + idx - 26)}'].width = min(max_length, 50)
+    buffer.seek(0)
+    return buffer
+
+
+def new_export(df: pd.DataFrame) -> BytesIO:
+    export_df = df.copy()
+    export_df['date'] = pd.to_datetime(export_df['date'])
+    return export_frames_to_excel({SHEET: export_df})
+
+
+def run_variant(variant: str, rows: int, path: str):
+    """Child process: export, save to path, print seconds and peak RSS as JSON"""
+    df = make_gl(rows)
+    start = time.perf_counter()
+    output = (old_export if variant == 'old' else new_export)(df)
+    seconds = time.perf_counter() - start
+    with open(path, 'wb') as f:
+        f.write(output.getbuffer())
+    # ru_maxrss is in KiB on Linux
+    print(json.dumps({'seconds': seconds, 'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                      'size_mb': os.path.getsize(path) / 1e6}))
+
+
+def read_head(path: str, check_rows: int):
+    """Row count and the first check_rows rows (dates as text) of a workbook"""
+    ws = load_workbook(path, read_only=True)[SHEET]
+    # Write-only sheets carry no dimension record, so rows are counted
+    count, head = 0, []
+    for row in ws.iter_rows(values_only=True):
+        if count <= check_rows:
+            head.append([v.strftime('%Y-%m-%d %H:%M:%S') if hasattr(v, 'strftime') else v for v in row])
+        count += 1
+    return count, head
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Excel export: pd.ExcelWriter vs streaming workbook")
+    parser.add_argument('--rows', type=int, default=500_000, help='GL lines to export')
+    parser.add_argument('--check-rows', type=int, default=1000, help='Leading rows compared between the workbooks')
+    parser.add_argument('--variant', choices=['old', 'new'], help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.variant:
+        run_variant(args.variant, args.rows, args.output)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant in ['old', 'new']:
+            path = os.path.join(tmp, f'{variant}.xlsx')
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--variant', variant,
+                                   '--rows', str(args.rows), '--output', path],
+                                  capture_output=True, text=True, check=True)
+            results[variant] = json.loads(proc.stdout.strip().splitlines()[-1])
+            results[variant]['head'] = read_head(path, args.check_rows)
+
+    assert results['old']['head'] == results['new']['head'], "exported rows differ"
+
+    old, new = results['old'], results['new']
+    print(f"GL: {args.rows:,} lines x {len(make_gl(1).columns)} columns")
+    print(f"  old (pd.ExcelWriter)    : {old['seconds']:7.1f}s  peak RSS {old['peak_mb']:7.0f} MB  "
+          f"({old['size_mb']:.1f} MB file)")
+    print(f"  new (streaming workbook): {new['seconds']:7.1f}s  peak RSS {new['peak_mb']:7.0f} MB  "
+          f"({new['size_mb']:.1f} MB file)")
+    print(f"  speedup: {old['seconds'] / new['seconds']:.2f}x; peak memory: {new['peak_mb'] / old['peak_mb']:.0%} of old")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+FIFO Ledger Benchmark - row-by-row FIFOTracker vs columnar FIFOLotEngine
+
+Generates a wallet history shaped like Blur Pool / WETH activity (many
+small deposits, occasional larger withdrawals, so open lots pile up) and
+times build_fifo_ledger at each size:
+  - old: build_fifo_ledger_reference (iterrows + FIFOTracker, re-sums lots per trade)
+  - new: build_fifo_ledger (FIFOLotEngine, running totals, wei-scaled ints)
+
+The old path is quadratic and is only run up to --reference-max rows; where
+both run the outputs are checked for exact equality.
+
+Usage:
+    python benchmarks/bench_fifo_ledger.py
+    python benchmarks/bench_fifo_ledger.py --sizes 10000 100000 1000000 --reference-max 100000
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from main_app.services.fifo_tracker import build_fifo_ledger, build_fifo_ledger_reference
+
+
+def make_transactions(n: int, seed: int = 42) -> pd.DataFrame:
+    """n movements across 2 wallets x 2 assets; ~85% small buys"""
+    rng = np.random.default_rng(seed)
+    is_buy = rng.random(n) < 0.85
+    # Withdrawals are ~3x a deposit: about half of what comes in stays as open lots
+    wei = np.where(is_buy, rng.integers(10**15, 10**17, n), rng.integers(10**16, 3 * 10**17, n))
+    return pd.DataFrame({
+        'fund_id': 'fund_i_class_B_ETH',
+        'wallet_address': rng.choice(['0x' + 'a1' * 20, '0x' + 'b2' * 20], n),
+        'asset': rng.choice(['WETH', 'BLUR POOL'], n),
+        'date': pd.Timestamp('2023-01-01', tz='UTC') + pd.to_timedelta(np.arange(n) * 30, unit='s'),
+        'hash': [f'0x{i:064x}' for i in range(n)],
+        'side': np.where(is_buy, 'buy', 'sell'),
+        'token_amount': wei / 1e18,
+        'token_value_eth': wei / 1e18 * rng.uniform(0.98, 1.02, n),
+        'eth_usd_price': rng.uniform(1500, 4000, n),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FIFO ledger construction")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Transaction counts to time')
+    parser.add_argument('--reference-max', type=int, default=10_000,
+                        help='Largest size to also run the row-by-row reference on')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    for n in args.sizes:
+        df = make_transactions(n)
+
+        start = time.perf_counter()
+        new = build_fifo_ledger(df.copy())
+        new_seconds = time.perf_counter() - start
+        line = f"{n:>9,} txs  engine: {new_seconds:8.2f}s"
+
+        if n <= args.reference_max:
+            start = time.perf_counter()
+            old = build_fifo_ledger_reference(df.copy())
+            old_seconds = time.perf_counter() - start
+            pd.testing.assert_frame_equal(new, old, check_exact=True)
+            line += f"  reference: {old_seconds:8.2f}s  speedup: {old_seconds / new_seconds:6.1f}x  (identical)"
+        else:
+            line += "  reference: skipped"
+
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
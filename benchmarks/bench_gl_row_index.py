@@ -0,0 +1,126 @@
+"""
+GL Row-Key Index Benchmark - ledger scan vs persistent key index
+
+Simulates "Post all auto-ready" posting a batch of decoded journal lines,
+half of which are already in the ledger, against an in-memory S3 with a
+per-call latency and per-MB transfer time:
+  - old: load the whole GL, build every line's row key row by row, drop the
+    batch lines whose key is in that set, append the rest
+  - new: GLRowKeyIndex.post() (manifest check, O(batch) probe of the sorted
+    per-partition keys, append)
+
+The first post of a session builds the index from the ledger; that one-off
+cost is reported separately. The lines posted by both paths are compared.
+
+Usage:
+    python benchmarks/bench_gl_row_index.py
+    python benchmarks/bench_gl_row_index.py --rows 1000000 --batch 1000 --posts 5 --latency 0.03
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services.gl_store import GLStore
+from main_app.services.gl_row_index import GLRowKeyIndex
+
+KEY = "drip_capital/general_ledger.parquet"
+BUCKET = "bench-bucket"
+
+
+def make_ledger(n: int, seed: int = 7, prefix: str = '0x') -> pd.DataFrame:
+    """n GL-shaped lines over two funds and three years"""
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 10**9, n) / 10**6
+    debit = rng.random(n) < 0.5
+    return pd.DataFrame({
+        'date': pd.Timestamp('2022-01-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, n), unit='s'),
+        'fund_id': rng.choice(['fund_i_class_B_ETH', 'fund_ii_class_B_ETH'], n),
+        'account_name': rng.choice(['100.30 - ETH Wallet', '130.10 - Loans Receivable',
+                                    '400.10 - Interest Income', '600.10 - Gas Expense'], n),
+        'transaction_type': rng.choice(['loan_origination', 'interest_accrual', 'gas_fee'], n),
+        'cryptocurrency': 'ETH',
+        'debit_crypto': np.where(debit, amounts, 0.0),
+        'credit_crypto': np.where(debit, 0.0, amounts),
+        'eth_usd_price': rng.uniform(1500, 4000, n),
+        'hash': [f'{prefix}{i:064x}' for i in range(n)],
+    })
+
+
+def row_key(row) -> str:
+    """The per-row key post_all_auto_ready built before the index"""
+    return (f"{row.get('hash', '')}:{row.get('account_name', '')}:{row.get('transaction_type', '')}:"
+            f"{row.get('debit_crypto', 0)}:{row.get('credit_crypto', 0)}")
+
+
+def old_post(store: GLStore, batch: pd.DataFrame) -> pd.DataFrame:
+    existing = store.read()
+    existing_keys = set(existing.apply(row_key, axis=1))
+    new = batch[~batch.apply(row_key, axis=1).isin(existing_keys)]
+    store.append(new)
+    return new
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GL dedup: ledger scan vs row-key index")
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Existing ledger lines')
+    parser.add_argument('--batch', type=int, default=1000, help='Lines per post (half already posted)')
+    parser.add_argument('--posts', type=int, default=3, help='Posts to time')
+    parser.add_argument('--latency', type=float, default=0.03, help='Seconds per S3 call')
+    parser.add_argument('--mb-per-second', type=float, default=50.0, help='S3 transfer rate')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    seconds_per_mb = 1 / args.mb_per_second
+
+    ledger = make_ledger(args.rows)
+    rng = np.random.default_rng(1)
+    # New lines are recent, as in a freshly decoded batch
+    batches = [pd.concat([ledger.iloc[rng.integers(0, args.rows, args.batch // 2)],
+                          make_ledger(args.batch - args.batch // 2, seed=100 + i, prefix=f'0x{i:02x}').assign(
+                              date=lambda d: pd.Timestamp('2024-12-01', tz='UTC') + (d['date'] - d['date'].min()) / 36)],
+                         ignore_index=True)
+               for i in range(args.posts + 1)]
+
+    def setup() -> InMemoryS3:
+        s3 = InMemoryS3()
+        GLStore(KEY, s3, BUCKET).replace(ledger)
+        s3.latency, s3.seconds_per_mb = args.latency, seconds_per_mb
+        return s3
+
+    old_store = GLStore(KEY, setup(), BUCKET)
+    old_store.read()  # session start: the ledger view is loaded once
+    start = time.perf_counter()
+    old_posted = [old_post(old_store, batch) for batch in batches[1:]]
+    old_seconds = (time.perf_counter() - start) / args.posts
+
+    index = GLRowKeyIndex(GLStore(KEY, setup(), BUCKET))
+    start = time.perf_counter()
+    index.post(batches[0])
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_posted = [index.post(batch)[0] for batch in batches[1:]]
+    new_seconds = (time.perf_counter() - start) / args.posts
+
+    for old, new in zip(old_posted, new_posted):
+        pd.testing.assert_frame_equal(old, new)
+
+    print(f"ledger: {args.rows:,} lines; batch: {args.batch:,} lines ({args.batch // 2:,} already posted); "
+          f"S3 latency {args.latency * 1000:.0f} ms, {args.mb_per_second:.0f} MB/s")
+    print(f"  old (scan ledger keys) : {old_seconds:7.2f}s per post")
+    print(f"  new (row-key index)    : {new_seconds:7.2f}s per post  "
+          f"(first post of a session builds the index: {build_seconds:.2f}s)")
+    print(f"  speedup: {old_seconds / new_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
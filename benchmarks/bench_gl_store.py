@@ -0,0 +1,114 @@
+"""
+GL Store Benchmark - whole-object rewrite vs partitioned append
+
+Simulates posting a manual journal entry (two lines) and refreshing the
+ledger view, against an in-memory S3 with a per-call latency and per-MB
+transfer time:
+  - old: download the single GL parquet, concat, re-upload it, re-download it
+  - new: GLStore.append() one segment, then read() (only the manifest and the
+    new segment are fetched; other files come from the in-process cache)
+
+Usage:
+    python benchmarks/bench_gl_store.py
+    python benchmarks/bench_gl_store.py --rows 1000000 --posts 5 --latency 0.03 --mb-per-second 50
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services.gl_store import GLStore
+
+KEY = "drip_capital/general_ledger.parquet"
+BUCKET = "bench-bucket"
+
+
+def make_ledger(n: int, seed: int = 7) -> pd.DataFrame:
+    """n GL2-shaped lines over two funds and three years"""
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 10**9, n) / 10**6
+    debit = rng.random(n) < 0.5
+    return pd.DataFrame({
+        'date': pd.Timestamp('2022-01-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, n), unit='s'),
+        'fund_id': rng.choice(['fund_i_class_B_ETH', 'fund_ii_class_B_ETH'], n),
+        'transaction_type': rng.choice(['loan_origination', 'interest_accrual', 'gas_fee'], n),
+        'cryptocurrency': 'ETH',
+        'GL_Acct_Number': rng.choice(['100.30', '130.10', '400.10', '600.10'], n),
+        'debit_crypto': np.where(debit, amounts, 0.0),
+        'credit_crypto': np.where(debit, 0.0, amounts),
+        'eth_usd_price': rng.uniform(1500, 4000, n),
+        'hash': [f'0x{i:064x}' for i in range(n)],
+        'row_key': [f'0x{i:064x}:{i % 4}' for i in range(n)],
+    })
+
+
+def old_post(s3: InMemoryS3, entry: pd.DataFrame) -> None:
+    existing = pq.read_table(BytesIO(s3.get_object(Bucket=BUCKET, Key=KEY)['Body'].read())).to_pandas()
+    combined = pd.concat([existing, entry], ignore_index=True)
+    s3.put_object(Bucket=BUCKET, Key=KEY, Body=combined.to_parquet(index=False))
+    # The UI reloads the ledger after the click
+    pq.read_table(BytesIO(s3.get_object(Bucket=BUCKET, Key=KEY)['Body'].read())).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GL posting: rewrite vs append")
+    parser.add_argument('--rows', type=int, default=500_000, help='Existing ledger lines')
+    parser.add_argument('--posts', type=int, default=5, help='Manual entries to post')
+    parser.add_argument('--latency', type=float, default=0.03, help='Seconds per S3 call')
+    parser.add_argument('--mb-per-second', type=float, default=50.0, help='S3 transfer rate')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    seconds_per_mb = 1 / args.mb_per_second
+
+    ledger = make_ledger(args.rows)
+    entries = [make_ledger(2, seed=100 + i).assign(date=pd.Timestamp('2024-12-31', tz='UTC'),
+                                                   row_key=[f'manual:{i}:0', f'manual:{i}:1'])
+               for i in range(args.posts)]
+
+    old_s3 = InMemoryS3()
+    old_s3.put_object(Bucket=BUCKET, Key=KEY, Body=ledger.to_parquet(index=False))
+    size_mb = len(old_s3.objects[KEY][0]) / 1e6
+    old_s3.latency, old_s3.seconds_per_mb = args.latency, seconds_per_mb
+    old_s3.reset_counters()
+
+    start = time.perf_counter()
+    for entry in entries:
+        old_post(old_s3, entry)
+    old_seconds = (time.perf_counter() - start) / args.posts
+    old_mb = (old_s3.bytes_uploaded + old_s3.bytes_downloaded) / 1e6 / args.posts
+
+    new_s3 = InMemoryS3()
+    GLStore(KEY, new_s3, BUCKET).replace(ledger)
+    store = GLStore(KEY, new_s3, BUCKET)
+    store.read()  # session start: the first load fetches everything once
+    new_s3.latency, new_s3.seconds_per_mb = args.latency, seconds_per_mb
+    new_s3.reset_counters()
+
+    start = time.perf_counter()
+    for entry in entries:
+        store.append(entry)
+        refreshed = store.read()
+    new_seconds = (time.perf_counter() - start) / args.posts
+    new_mb = (new_s3.bytes_uploaded + new_s3.bytes_downloaded) / 1e6 / args.posts
+
+    assert len(refreshed) == args.rows + 2 * args.posts
+    print(f"ledger: {args.rows:,} lines, {size_mb:.1f} MB parquet; "
+          f"S3 latency {args.latency * 1000:.0f} ms, {args.mb_per_second:.0f} MB/s")
+    print(f"  old (rewrite object): {old_seconds:7.2f}s per post  {old_mb:8.2f} MB transferred")
+    print(f"  new (append segment): {new_seconds:7.2f}s per post  {new_mb:8.2f} MB transferred")
+    print(f"  speedup: {old_seconds / new_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Log Dispatcher Benchmark - trial decoding vs topic0 lookup
+
+Builds synthetic Gondi receipts offline from the embedded V2 MultiSourceLoan
+ABI and compares per-receipt decode time of:
+  - old: loop every GondiEventType and call process_log() until one succeeds
+  - new: LogDispatcher topic0 lookup, one get_event_data() per log
+
+Usage:
+    python benchmarks/bench_log_dispatcher.py
+    python benchmarks/bench_log_dispatcher.py --receipts 500 --logs 12
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import warnings
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
+from web3 import Web3
+
+from main_app.services.decoders.gondi_decoder import (
+    GondiEventType,
+    GONDI_MULTI_SOURCE_LOAN_ADDRESS,
+    V2_MULTISOURCE_LOAN_ABI,
+)
+from main_app.services.decoders.abis.common import ERC20_ABI
+from main_app.services.decoders.log_dispatcher import LogDispatcher
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+
+def dummy_value(abi_input: Dict[str, Any], rng: random.Random) -> Any:
+    """Random value of the right shape for an ABI input"""
+    typ = abi_input['type']
+    if typ.endswith('[]'):
+        inner = dict(abi_input, type=typ[:-2])
+        return [dummy_value(inner, rng) for _ in range(rng.randint(1, 3))]
+    if typ == 'tuple':
+        return tuple(dummy_value(c, rng) for c in abi_input['components'])
+    if typ.startswith('uint'):
+        return rng.randint(0, 10**20)
+    if typ.startswith('int'):
+        return rng.randint(-10**9, 10**9)
+    if typ == 'address':
+        return Web3.to_checksum_address('0x' + '%040x' % rng.getrandbits(160))
+    if typ == 'bool':
+        return rng.random() < 0.5
+    if typ == 'bytes':
+        return bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 40)))
+    if typ.startswith('bytes'):
+        return bytes(rng.getrandbits(8) for _ in range(int(typ[5:])))
+    if typ == 'string':
+        return 'x' * rng.randint(0, 10)
+    raise ValueError(f"Unsupported ABI type {typ}")
+
+
+def build_log(event_abi: Dict, address: str, log_index: int, rng: random.Random) -> Dict:
+    """Encode a receipt log for event_abi with random arguments"""
+    topics = [HexBytes(event_abi_to_log_topic(event_abi))]
+    data_types, data_values = [], []
+    for arg in event_abi['inputs']:
+        value = dummy_value(arg, rng)
+        if arg.get('indexed'):
+            topics.append(HexBytes(encode([collapse_if_tuple(arg)], [value])))
+        else:
+            data_types.append(collapse_if_tuple(arg))
+            data_values.append(value)
+
+    return {
+        'address': Web3.to_checksum_address(address),
+        'topics': topics,
+        'data': HexBytes(encode(data_types, data_values)),
+        'logIndex': log_index,
+        'transactionIndex': 0,
+        'transactionHash': HexBytes(b'\x01' * 32),
+        'blockHash': HexBytes(b'\x02' * 32),
+        'blockNumber': 18_000_000,
+    }
+
+
+def build_receipts(n_receipts: int, logs_per_receipt: int, seed: int = 42) -> List[Dict]:
+    """Receipts mixing Gondi loan events, Gondi admin events and WETH transfers"""
+    rng = random.Random(seed)
+    gondi_names = {e.value for e in GondiEventType}
+    events = [e for e in V2_MULTISOURCE_LOAN_ABI if e['type'] == 'event']
+    gondi_events = [e for e in events if e['name'] in gondi_names]
+    other_events = [e for e in events if e['name'] not in gondi_names]
+    transfer = next(e for e in ERC20_ABI if e['type'] == 'event' and e['name'] == 'Transfer')
+
+    receipts = []
+    for _ in range(n_receipts):
+        logs = []
+        for i in range(logs_per_receipt):
+            roll = rng.random()
+            if roll < 0.4:
+                logs.append(build_log(rng.choice(gondi_events), GONDI_MULTI_SOURCE_LOAN_ADDRESS, i, rng))
+            elif roll < 0.6:
+                # Admin/config events from the loan contract match no GondiEventType
+                logs.append(build_log(rng.choice(other_events), GONDI_MULTI_SOURCE_LOAN_ADDRESS, i, rng))
+            else:
+                logs.append(build_log(transfer, WETH, i, rng))
+        receipts.append({'logs': logs})
+    return receipts
+
+
+def _try_all_event_types(contract, log) -> Any:
+    for event_type in GondiEventType:
+        event_obj = getattr(contract.events, event_type.value, None)
+        if event_obj is None:
+            continue
+        try:
+            return event_obj.process_log(log)
+        except Exception:
+            continue
+    return None
+
+
+def decode_trial(contract, receipt: Dict) -> List[tuple]:
+    """Old path: try every GondiEventType on every Gondi log, then retry misses"""
+    gondi_address = contract.address.lower()
+    out = {}
+    for _ in range(2):  # first pass + "try all contracts" second pass
+        for log in receipt['logs']:
+            if log['address'].lower() != gondi_address or log['logIndex'] in out:
+                continue
+            decoded = _try_all_event_types(contract, log)
+            if decoded is not None:
+                out[log['logIndex']] = (log['logIndex'], decoded['event'], dict(decoded['args']))
+    return [out[i] for i in sorted(out)]
+
+
+def decode_dispatch(dispatcher: LogDispatcher, receipt: Dict) -> List[tuple]:
+    """New path: one topic0 lookup and one decode per log"""
+    out = []
+    for log in receipt['logs']:
+        decoded = dispatcher.decode_log(log)
+        if decoded is not None:
+            out.append((log['logIndex'], decoded['event'], dict(decoded['args'])))
+    return out
+
+
+def time_per_receipt(fn, receipts: List[Dict], repeat: int) -> float:
+    """Best-of-repeat mean seconds per receipt"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for receipt in receipts:
+            fn(receipt)
+        best = min(best, (time.perf_counter() - start) / len(receipts))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark receipt log decoding")
+    parser.add_argument('--receipts', type=int, default=200, help='Number of synthetic receipts')
+    parser.add_argument('--logs', type=int, default=10, help='Logs per receipt')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    w3 = Web3()
+    contract = w3.eth.contract(
+        address=Web3.to_checksum_address(GONDI_MULTI_SOURCE_LOAN_ADDRESS),
+        abi=V2_MULTISOURCE_LOAN_ABI,
+    )
+    dispatcher = LogDispatcher.for_contracts(w3, [contract], [e.value for e in GondiEventType])
+
+    receipts = build_receipts(args.receipts, args.logs)
+
+    # Both paths must decode exactly the same events
+    for receipt in receipts:
+        assert decode_trial(contract, receipt) == decode_dispatch(dispatcher, receipt)
+
+    old = time_per_receipt(lambda r: decode_trial(contract, r), receipts, args.repeat)
+    new = time_per_receipt(lambda r: decode_dispatch(dispatcher, r), receipts, args.repeat)
+
+    print(f"Receipts: {args.receipts}  logs/receipt: {args.logs}")
+    print(f"  trial decoding : {old * 1e6:10.1f} us/receipt")
+    print(f"  topic0 dispatch: {new * 1e6:10.1f} us/receipt")
+    print(f"  speedup        : {old / new:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
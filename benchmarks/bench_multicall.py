@@ -0,0 +1,139 @@
+"""
+Multicall Benchmark - per-call state reads vs Multicall3 aggregate3 batches
+
+Starts the stub JSON-RPC server with a fixed per-request latency, registers
+NFTfi v3 / v2.3 loan contracts and an ERC-20 on it, and reads the same state
+twice:
+  - loans, old: NFTfiOnChainQuery.get_loan_terms() per loan (one eth_call per
+    loan for v3, two for v2.3)
+  - loans, new: NFTfiOnChainQuery.get_loan_terms_many() (aggregate3 batches)
+  - balances, old: one read per (wallet, asset) position followed by the
+    balance checker's rate-limit sleep, as verify_wallet_balances() paces
+    its Etherscan requests
+  - balances, new: EtherscanBalanceChecker.get_balances_batched()
+
+Both paths read the same block and their results are compared exactly.
+
+Usage:
+    python benchmarks/bench_multicall.py
+    python benchmarks/bench_multicall.py --loans 2000 --wallets 50 --latency 0.05 --batch-size 300
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import warnings
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3 import Web3
+
+from tests.stub_rpc_server import StubRpcServer, abi_contract
+from main_app.services.decoders.nftfi_decoder import NFTfiOnChainQuery, LOAN_TERMS_V3_ABI, LOAN_TERMS_V23_ABI
+from main_app.services.etherscan_balance_checker import EtherscanBalanceChecker
+from main_app.services.multicall import ERC20_BALANCE_OF_ABI
+
+V3_CONTRACT = "0x9f10d706d789e4c76a1a6434cd1a9841c875c0a6"
+V23_CONTRACT = "0xd0a40eb7fd94ee97102ba8e9342243a2b2e22207"
+USDC = "0xA0b86a33E6441644663FB5CDDFEF68e36E6c6C46"
+BORROWER = "0x" + "bb" * 20
+LENDER = "0x" + "aa" * 20
+TOKENS = {'USDC': {'address': USDC, 'decimals': 6}}
+
+
+def register_contracts(server: StubRpcServer) -> None:
+    """NFTfi v3 / v2.3 loans and a USDC balanceOf on the stub node"""
+    def v3_terms(block, loan_id):
+        return (10**18 + loan_id, 10**18 + 10**16, loan_id, USDC, 30 * 86400, 1200, 500, 0, BORROWER,
+                block, BORROWER, BORROWER, LENDER, LENDER, True)
+
+    def v23_terms(block, loan_id):
+        return 10**18 + loan_id, 10**18 + 10**16, loan_id, USDC, 30 * 86400, 1200, 500, BORROWER, block, \
+            BORROWER, BORROWER
+
+    server.register_contract(V3_CONTRACT, abi_contract(LOAN_TERMS_V3_ABI, {'getLoanTerms': v3_terms}))
+    server.register_contract(V23_CONTRACT, abi_contract(LOAN_TERMS_V23_ABI, {
+        'loanIdToLoan': v23_terms, 'loanIdToLoanExtras': lambda block, loan_id: (LENDER, 25, 10)}))
+    server.register_contract(USDC, abi_contract([ERC20_BALANCE_OF_ABI], {
+        'balanceOf': lambda block, account: int(account[-4:], 16) * 10**6}))
+
+
+def per_position_balances(w3: Web3, checker: EtherscanBalanceChecker, positions, block: int):
+    """One read per position, paced like the Etherscan loop"""
+    usdc = w3.eth.contract(address=Web3.to_checksum_address(USDC), abi=[ERC20_BALANCE_OF_ABI])
+    balances = {}
+    for wallet, asset in positions:
+        if asset == 'ETH':
+            raw, decimals = w3.eth.get_balance(Web3.to_checksum_address(wallet), block_identifier=block), 18
+        else:
+            raw = usdc.functions.balanceOf(Web3.to_checksum_address(wallet)).call(block_identifier=block)
+            decimals = TOKENS[asset]['decimals']
+        balances[(wallet, asset)] = Decimal(raw) / Decimal(10 ** decimals)
+        time.sleep(checker.rate_limit_delay)
+    return balances
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Multicall3 batched state reads")
+    parser.add_argument('--loans', type=int, default=200, help='Loans to read (half v3, half v2.3)')
+    parser.add_argument('--wallets', type=int, default=20, help='Wallets holding ETH and USDC')
+    parser.add_argument('--latency', type=float, default=0.03, help='Stub RPC seconds per HTTP request')
+    parser.add_argument('--batch-size', type=int, default=200, help='Calls per aggregate3 call')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    logging.disable(logging.WARNING)
+
+    with StubRpcServer(n_txs=0, latency=args.latency) as server:
+        register_contracts(server)
+        w3 = Web3(Web3.HTTPProvider(server.url))
+        block = server.chain.head
+        print(f"Loans: {args.loans}  positions: {2 * args.wallets}  "
+              f"latency: {args.latency * 1000:.0f}ms/request  batch size: {args.batch_size}")
+
+        query = NFTfiOnChainQuery(w3)
+        loans = [(i, V3_CONTRACT if i % 2 else V23_CONTRACT) for i in range(args.loans)]
+
+        server.reset_counters()
+        start = time.perf_counter()
+        sequential = {loan: query.get_loan_terms(*loan, block_identifier=block) for loan in loans}
+        old = time.perf_counter() - start
+        old_calls = server.calls_by_method['eth_call']
+
+        server.reset_counters()
+        start = time.perf_counter()
+        batched = query.get_loan_terms_many(loans, block_identifier=block, batch_size=args.batch_size)
+        new = time.perf_counter() - start
+        new_calls = server.calls_by_method['eth_call']
+
+        assert batched == sequential, "loan terms differ"
+        print(f"  get_loan_terms loop     : {old:8.2f}s  {old_calls:6d} eth_calls")
+        print(f"  get_loan_terms_many     : {new:8.2f}s  {new_calls:6d} eth_calls  speedup: {old / new:6.1f}x")
+
+        for i in range(args.wallets):
+            server.eth_balances["0x" + f"{i + 1:040x}"] = (i + 1) * 10**17
+        positions = [("0x" + f"{i + 1:040x}", asset) for i in range(args.wallets) for asset in ('ETH', 'USDC')]
+        checker = EtherscanBalanceChecker(api_key="benchmark", w3=w3)
+
+        start = time.perf_counter()
+        sequential_balances = per_position_balances(w3, checker, positions, block)
+        old = time.perf_counter() - start
+
+        server.reset_counters()
+        start = time.perf_counter()
+        batched_balances = checker.get_balances_batched(positions, TOKENS, block_identifier=block,
+                                                        batch_size=args.batch_size)
+        new = time.perf_counter() - start
+
+        assert batched_balances == sequential_balances, "balances differ"
+        print(f"  per-position balances   : {old:8.2f}s  (incl. {checker.rate_limit_delay:.1f}s "
+              f"rate-limit sleep each)")
+        print(f"  get_balances_batched    : {new:8.2f}s  {server.calls_by_method['eth_call']:6d} eth_calls"
+              f"  speedup: {old / new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
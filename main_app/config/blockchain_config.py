@@ -129,7 +129,25 @@ CHAINLINK_AGGREGATOR_V3_ABI = [{
     ],
     "stateMutability": "view",
     "type": "function",
+}, {
+    "inputs": [{"internalType": "uint80", "name": "_roundId", "type": "uint80"}],
+    "name": "getRoundData",
+    "outputs": [
+        {"internalType": "uint80", "name": "roundId", "type": "uint80"},
+        {"internalType": "int256", "name": "answer", "type": "int256"},
+        {"internalType": "uint256", "name": "startedAt", "type": "uint256"},
+        {"internalType": "uint256", "name": "updatedAt", "type": "uint256"},
+        {"internalType": "uint80", "name": "answeredInRound", "type": "uint80"},
+    ],
+    "stateMutability": "view",
+    "type": "function",
 }]
+CHAINLINK_ETH_USD_DECIMALS = 8
+
+# Multicall3 (same address on mainnet and most EVM chains). Batched state
+# reads aggregate this many calls into one aggregate3 eth_call.
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL_BATCH_SIZE = int(os.environ.get("MULTICALL_BATCH_SIZE", "200"))
 
 # Query Configuration
 BLOCK_CHUNK_SIZE = 10000  # Number of blocks to query at once
@@ -140,12 +158,36 @@ REQUEST_TIMEOUT = 30  # seconds
 # Cache Configuration
 CACHE_SIZES = {
     "block_by_timestamp": 1024,
-    "eth_price_at_block": 512,
+    "eth_price_at_block": 8192,
     "decoded_logs": 2048,
     "wallet_fund_mapping": 256,
     "token_info": 128,
 }
 
+# Persistent raw chain data cache (tx, receipt, block, price) shared by all
+# decoders and processes. Set CHAIN_CACHE_DISABLED=1 to always hit the RPC.
+CHAIN_CACHE_PATH = os.environ.get(
+    "CHAIN_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "realworldnav", "chain_cache.sqlite3"),
+)
+CHAIN_CACHE_MAX_MB = int(os.environ.get("CHAIN_CACHE_MAX_MB", "1024"))
+CHAIN_CACHE_DISABLED = os.environ.get("CHAIN_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+# Chainlink ETH/USD round history used by the price oracle (parquet)
+PRICE_ORACLE_PATH = os.environ.get(
+    "PRICE_ORACLE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "realworldnav", "chainlink_eth_usd_rounds.parquet"),
+)
+
+# Shared new-block listener: per-wallet high-water blocks and recent block
+# hashes (JSON), reorg detection depth and poll interval in seconds
+HEAD_TRACKER_STATE_PATH = os.environ.get(
+    "HEAD_TRACKER_STATE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "realworldnav", "head_tracker.json"),
+)
+HEAD_TRACKER_REORG_DEPTH = int(os.environ.get("HEAD_TRACKER_REORG_DEPTH", "12"))
+HEAD_TRACKER_POLL_SECONDS = float(os.environ.get("HEAD_TRACKER_POLL_SECONDS", "6"))
+
 # Known Blacklisted Tokens (Scams/Phishing)
 BLACKLISTED_TOKENS = {
     # Common phishing attempts - add addresses as discovered
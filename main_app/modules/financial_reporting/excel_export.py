@@ -4,12 +4,16 @@ Creates formatted Excel workbook with all financial reporting sections
 """
 
 from io import BytesIO
+from decimal import Decimal
+from typing import Dict, List
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 import numpy as np
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
+from ...services.gl_amounts import is_amount_column, to_decimals
 from .tb_generator import get_income_expense_changes, calculate_nav_changes, generate_trial_balance_from_gl, categorize_account
 from .data_processor import get_previous_period_date, format_currency
 from ...s3_utils import load_COA_file, load_LP_commitments_file
@@ -58,6 +62,198 @@ def get_display_round(currency: str = "ETH"):
         return 4
 
 
+# =========================================================================
+# STREAMING EXPORT (large data sheets)
+# =========================================================================
+#
+# The statement sheets below are small, fixed layouts built cell by cell.
+# Data sheets (GL detail, journal entries, account ledgers) can run to
+# hundreds of thousands of rows, so they are written to a write-only
+# workbook instead: rows are streamed to the sheet file as they are
+# appended, amount and date columns share one named style per column (text
+# and integers keep the default style, which is cheaper to write), column
+# widths are estimated from the frame before any row is written, and the
+# frame is converted to Python values one chunk of rows at a time.
+
+EXPORT_CHUNK_ROWS = 10_000
+EXPORT_MAX_COLUMN_WIDTH = 50
+EXPORT_WIDTH_SAMPLE_ROWS = 10_000
+EXPORT_DATE_FORMAT = "yyyy-mm-dd hh:mm:ss"
+
+_EXCEL_TYPES = (str, int, float, Decimal, bool, datetime, date)
+
+
+def register_export_styles(wb, currency: str = "ETH") -> Dict[str, str]:
+    """
+    Add the shared named styles of the streaming export to a workbook.
+
+    Returns:
+        Dict of 'header', 'amount' and 'date' -> style name
+    """
+    amount_style = f"export_amount_{currency.upper()}"
+    styles = {
+        "header": NamedStyle(name="export_header", font=font_black_bold, fill=light_color_fill,
+                             border=thin_border, alignment=center),
+        "amount": NamedStyle(name=amount_style, font=font_black, alignment=right,
+                             number_format=get_number_format(currency)),
+        "date": NamedStyle(name="export_date", font=font_black, alignment=left,
+                           number_format=EXPORT_DATE_FORMAT),
+    }
+    for style in styles.values():
+        if style.name not in wb.named_styles:
+            wb.add_named_style(style)
+    return {kind: style.name for kind, style in styles.items()}
+
+
+def _column_kind(values: pd.Series) -> str:
+    """Style kind of a column, from its dtype"""
+    if is_amount_column(values) or pd.api.types.is_float_dtype(values.dtype):
+        return "amount"
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return "text"
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return "integer"
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return "date"
+    # Decimal objects from the Decimal GL loaders
+    sample = values.iloc[::max(1, len(values) // 100)]
+    if values.dtype == object and pd.api.types.infer_dtype(sample, skipna=True) == "decimal":
+        return "amount"
+    return "text"
+
+
+def _number_width(max_abs: float, number_format: str) -> int:
+    """Characters a number up to max_abs takes in number_format (or General)"""
+    digits = len(f"{int(max_abs):d}") if np.isfinite(max_abs) else 1
+    first_section = number_format.split(";")[0]
+    if "0." not in first_section:
+        return digits + 1
+    decimals = len(first_section.split(".")[1].split("_")[0])
+    separators = (digits - 1) // 3 if "," in first_section else 0
+    # Sign or parentheses, integer part, separators, point, decimals
+    return 2 + digits + separators + 1 + decimals
+
+
+def estimate_column_widths(df: pd.DataFrame, kinds: List[str], currency: str = "ETH",
+                           sample_rows: int = EXPORT_WIDTH_SAMPLE_ROWS) -> List[float]:
+    """
+    Column widths for a data sheet, without reading cells back.
+
+    Numbers and dates are sized from their dtype, format and largest magnitude;
+    text from the longest value in an evenly spaced sample of rows.
+    """
+    step = max(1, -(-len(df) // sample_rows))
+    widths = []
+    for (name, values), kind in zip(df.items(), kinds):
+        if kind == "date":
+            content = len("yyyy-mm-dd hh:mm:ss")
+        elif kind in ("amount", "integer") and len(values):
+            magnitudes = np.abs(values.astype("float64").to_numpy(dtype="float64", na_value=np.nan))
+            max_abs = np.nanmax(magnitudes) if (~np.isnan(magnitudes)).any() else 0.0
+            content = _number_width(max_abs, get_number_format(currency) if kind == "amount" else "General")
+        else:
+            sample = values.iloc[::step].dropna()
+            content = int(sample.astype(str).str.len().max()) if len(sample) else 0
+        widths.append(min(max(content, len(str(name))) + 2, EXPORT_MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _excel_values(values: pd.Series, kind: str) -> List:
+    """One chunk of a column as Python values openpyxl can write (missing -> None)"""
+    if kind == "date":
+        if values.dt.tz is not None:
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        return [None if pd.isna(v) else v.to_pydatetime() for v in values]
+    if is_amount_column(values):
+        values = to_decimals(values)
+    values = values.astype(object)
+    values = values.where(values.notna(), None).tolist()
+    if kind == "text":
+        values = [v if v is None or isinstance(v, _EXCEL_TYPES) else str(v) for v in values]
+    return values
+
+
+def write_frame_sheet(wb, df: pd.DataFrame, title: str, currency: str = "ETH",
+                      chunk_size: int = EXPORT_CHUNK_ROWS):
+    """
+    Stream a DataFrame into a new sheet of a write-only workbook.
+
+    Args:
+        wb: Workbook(write_only=True)
+        df: Data to export (header row from its columns)
+        title: Sheet title
+        currency: Reporting currency, sets the amount number format
+        chunk_size: Rows converted to Python values at a time
+
+    Returns:
+        The worksheet
+    """
+    styles = register_export_styles(wb, currency)
+    ws = wb.create_sheet(title=title)
+    kinds = [_column_kind(values) for _, values in df.items()]
+
+    # Layout must be set before the first row is written
+    for idx, width in enumerate(estimate_column_widths(df, kinds, currency), 1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+    ws.freeze_panes = "A2"
+
+    header = []
+    for name in df.columns:
+        cell = WriteOnlyCell(ws, value=str(name))
+        cell.style = styles["header"]
+        header.append(cell)
+    ws.append(header)
+
+    # One styled cell per amount/date column, re-used for every row: append()
+    # writes the row to the sheet stream before returning
+    cells = []
+    for kind in kinds:
+        cell = None
+        if kind in styles:
+            cell = WriteOnlyCell(ws)
+            cell.style = styles[kind]
+        cells.append(cell)
+
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        columns = [_excel_values(values, kind) for (_, values), kind in zip(chunk.items(), kinds)]
+        for values in zip(*columns):
+            row = []
+            for value, cell in zip(values, cells):
+                if value is None or cell is None:
+                    row.append(value)
+                else:
+                    cell.value = value
+                    row.append(cell)
+            ws.append(row)
+    return ws
+
+
+def export_frames_to_excel(frames: Dict[str, pd.DataFrame], currency: str = "ETH",
+                           chunk_size: int = EXPORT_CHUNK_ROWS) -> BytesIO:
+    """
+    Export DataFrames as sheets of one workbook, streaming the rows.
+
+    Args:
+        frames: Sheet title -> DataFrame, in sheet order
+        currency: Reporting currency, sets the amount number format
+        chunk_size: Rows converted to Python values at a time
+
+    Returns:
+        BytesIO containing the .xlsx file, positioned at the start
+    """
+    wb = Workbook(write_only=True)
+    for title, df in frames.items():
+        write_frame_sheet(wb, df, title, currency, chunk_size)
+    if not frames:
+        wb.create_sheet(title="Sheet1")
+
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
 def create_account_statement_sheet(wb, gl_df: pd.DataFrame, fund_name: str, 
                                  report_date: datetime, currency: str = "ETH"):
     """Create Account Statement sheet exactly like reference implementation"""
@@ -1,7 +1,8 @@
 from shiny import ui as shiny_ui, render, reactive
 from datetime import datetime
 import pandas as pd
-from ...s3_utils import load_GL_file
+from ...s3_utils import read_gl, TYPED_GL_AMOUNTS
+from ...services.gl_amounts import is_amount_column
 from ..fund_accounting.helpers import gl_data_for_fund
 from .account_statement import account_statement_ui, register_outputs as as_register_outputs
 from .nav_changes import nav_changes_ui, register_outputs as nc_register_outputs
@@ -20,8 +21,8 @@ def register_outputs(output, input, selected_fund, selected_report_date):
         fund_id = selected_fund() if selected_fund and hasattr(selected_fund, '__call__') else None
         print(f"DEBUG - Financial Reporting loading GL data for fund: {fund_id}")
         
-        # Load GL data directly from S3
-        gl_df = load_GL_file()
+        # Load GL data directly from S3 (only the selected fund's partitions)
+        gl_df = read_gl(fund_id=fund_id or None, typed=TYPED_GL_AMOUNTS)
         
         if gl_df.empty:
             print("DEBUG - No GL data loaded from S3")
@@ -30,22 +31,15 @@ def register_outputs(output, input, selected_fund, selected_report_date):
         print(f"DEBUG - Loaded GL data with shape: {gl_df.shape}")
         print(f"DEBUG - GL columns: {gl_df.columns.tolist()}")
         
-        # Filter by fund if specified
-        if fund_id:
-            original_shape = gl_df.shape[0]
-            if 'fund_id' in gl_df.columns:
-                gl_df = gl_df[gl_df['fund_id'] == fund_id]
-                print(f"DEBUG - Filtered by fund_id {fund_id}: {gl_df.shape[0]} rows (was {original_shape})")
-        
         # Ensure date column is properly formatted
         if 'date' in gl_df.columns:
             gl_df['date'] = pd.to_datetime(gl_df['date'], utc=True, errors='coerce')
         elif 'operating_date' in gl_df.columns:
             gl_df['date'] = pd.to_datetime(gl_df['operating_date'], utc=True, errors='coerce')
         
-        # Ensure numeric columns are properly formatted
+        # Ensure numeric columns are properly formatted (typed amounts already are)
         for col in ['debit_crypto', 'credit_crypto', 'debit_USD', 'credit_USD']:
-            if col in gl_df.columns:
+            if col in gl_df.columns and not is_amount_column(gl_df[col]):
                 gl_df[col] = pd.to_numeric(gl_df[col], errors='coerce').fillna(0)
         
         # CRITICAL: Use account mapper to connect GL account names to COA
@@ -8,6 +8,7 @@ import numpy as np
 from datetime import datetime, timedelta, date
 from typing import Dict, Tuple, Optional
 from ...s3_utils import load_GL_file, load_COA_file
+from ...services.gl_amounts import is_amount_column, to_floats
 from .data_processor import safe_date_compare
 
 
@@ -56,9 +57,9 @@ def generate_trial_balance_from_gl(gl_df: pd.DataFrame, as_of_date: datetime) ->
     # Remove rows with invalid account numbers
     filtered_gl = filtered_gl[pd.notna(filtered_gl['GL_Acct_Number'])]
     
-    # Ensure debit/credit columns are numeric
+    # Ensure debit/credit columns are numeric (typed amounts already are)
     for col in ['debit_crypto', 'credit_crypto', 'debit_USD', 'credit_USD']:
-        if col in filtered_gl.columns:
+        if col in filtered_gl.columns and not is_amount_column(filtered_gl[col]):
             filtered_gl[col] = pd.to_numeric(filtered_gl[col], errors='coerce').fillna(0)
     
     # Group by account number ONLY to avoid duplicate rows (like Fund Accounting does)
@@ -77,9 +78,28 @@ def generate_trial_balance_from_gl(gl_df: pd.DataFrame, as_of_date: datetime) ->
             lambda x: coa_dict.get(int(x), f"Account {int(x)}")
         )
     
+    return _finish_trial_balance(account_totals, coa_dict)
+
+
+def _finish_trial_balance(account_totals: pd.DataFrame, coa_dict: Dict) -> pd.DataFrame:
+    """
+    Balances, names and categories for per-account debit/credit totals.
+    
+    Args:
+        account_totals: One row per account with GL_Acct_Number, debit_crypto,
+            credit_crypto and original_account_name
+        coa_dict: GL_Acct_Number -> GL_Acct_Name from the COA
+        
+    Returns:
+        Trial balance rows with a non-zero balance, in statement order
+    """
     # Calculate net balance as debit - credit (NO SIGN FLIPPING)
     account_totals['Balance'] = account_totals['debit_crypto'] - account_totals['credit_crypto']
     
+    # Typed amounts were summed exactly; hand the reports floats like the untyped path
+    for col in ['debit_crypto', 'credit_crypto', 'Balance']:
+        account_totals[col] = to_floats(account_totals[col])
+    
     # Add formal account names from COA and categories
     account_totals['GL_Acct_Name'] = account_totals['GL_Acct_Number'].apply(
         lambda x: coa_dict.get(int(x), f"Account {int(x)}")
@@ -97,6 +117,157 @@ def generate_trial_balance_from_gl(gl_df: pd.DataFrame, as_of_date: datetime) ->
     return account_totals
 
 
+class PeriodEngine:
+    """
+    Trial balances at many cut-off dates from one pass over the GL.
+
+    generate_trial_balance_from_gl() re-filters and re-groups the whole GL for
+    every date, and a period report needs a beginning and ending balance for
+    each of MTD/QTD/YTD/ITD. The engine sorts the requested cut-offs instead,
+    places every GL line in the interval between two cut-offs with one
+    searchsorted, and sums debits and credits per (account, interval) in a
+    single groupby. The balance at a cut-off is then the sum of that small
+    table over the intervals up to it, so typed amounts stay exact.
+
+    trial_balance(d) returns the same frame as generate_trial_balance_from_gl(gl_df, d).
+    """
+
+    def __init__(self, gl_df: pd.DataFrame):
+        """
+        Prepare the GL columns the trial balance needs (dates, account
+        numbers, amounts, display names), once for all cut-offs.
+
+        Args:
+            gl_df: General ledger DataFrame
+        """
+        self.gl_df = gl_df
+        self._lines: Optional[pd.DataFrame] = None
+        # Account number dtype while no unmapped line is in range (to_numeric gives int64 then)
+        self._mapped_dtype = None
+        self._coa_dict: Optional[Dict] = None
+        self._cache: Dict[pd.Timestamp, pd.DataFrame] = {}
+
+    def _prepare(self) -> pd.DataFrame:
+        if self._lines is not None:
+            return self._lines
+
+        gl_df = self.gl_df
+        dates = gl_df['date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates)
+
+        lines = pd.DataFrame({'date': dates.dt.as_unit('ns')}, index=gl_df.index)
+        if 'GL_Acct_Number' in gl_df.columns:
+            numbers = pd.to_numeric(gl_df['GL_Acct_Number'], errors='coerce')
+            lines['GL_Acct_Number'] = numbers
+            if numbers.isna().any():
+                self._mapped_dtype = pd.to_numeric(gl_df['GL_Acct_Number'][numbers.notna()], errors='coerce').dtype
+            for col in ['debit_crypto', 'credit_crypto']:
+                values = gl_df[col]
+                lines[col] = values if is_amount_column(values) else pd.to_numeric(values, errors='coerce').fillna(0)
+            if 'account_name' in gl_df.columns:
+                lines['original_account_name'] = gl_df['account_name']
+        self._lines = lines.reset_index(drop=True)
+        return self._lines
+
+    def _coa(self) -> Dict:
+        if self._coa_dict is None:
+            coa_df = load_COA_file()
+            self._coa_dict = dict(zip(coa_df['GL_Acct_Number'], coa_df['GL_Acct_Name']))
+        return self._coa_dict
+
+    def _align(self, as_of_date) -> pd.Timestamp:
+        """Cut-off as a Timestamp comparable with the GL dates (see safe_date_compare)"""
+        cutoff = pd.Timestamp(as_of_date)
+        tz = self._prepare()['date'].dt.tz
+        if tz is not None:
+            cutoff = cutoff.tz_localize('UTC') if cutoff.tz is None else cutoff.tz_convert(tz)
+        elif cutoff.tz is not None:
+            cutoff = cutoff.tz_localize(None)
+        return cutoff.as_unit('ns')
+
+    def trial_balance(self, as_of_date) -> pd.DataFrame:
+        """Trial balance up to as_of_date (inclusive)"""
+        return self.trial_balances([as_of_date])[as_of_date]
+
+    def trial_balances(self, dates) -> Dict:
+        """
+        Trial balances at several cut-off dates.
+
+        Args:
+            dates: Cut-off dates (datetime, date, Timestamp or string)
+
+        Returns:
+            Dict of each given date -> trial balance, as generate_trial_balance_from_gl
+        """
+        if self.gl_df.empty:
+            return {d: pd.DataFrame() for d in dates}
+
+        aligned = {d: self._align(d) for d in dates}
+        missing = sorted(set(aligned.values()) - set(self._cache))
+        if missing:
+            self._cache.update(self._compute(pd.DatetimeIndex(missing)))
+        return {d: self._cache[cutoff] for d, cutoff in aligned.items()}
+
+    def _compute(self, cutoffs: pd.DatetimeIndex) -> Dict[pd.Timestamp, pd.DataFrame]:
+        lines = self._prepare()
+
+        # Interval of each line: line i is on or before cut-off j iff interval[i] <= j
+        # (undated lines sort after every cut-off)
+        interval = cutoffs.searchsorted(lines['date'], side='left')
+        first_interval = interval.min()
+
+        if 'GL_Acct_Number' not in lines.columns:
+            if first_interval < len(cutoffs):
+                print("ERROR - No GL_Acct_Number column found in GL data - account mapping may have failed")
+            return {cutoff: pd.DataFrame() for cutoff in cutoffs}
+
+        dated = lines[interval < len(cutoffs)].assign(interval=interval[interval < len(cutoffs)])
+        mapped = dated[dated['GL_Acct_Number'].notna()]
+        first_unmapped = dated.loc[dated['GL_Acct_Number'].isna(), 'interval'].min()
+        print(f"DEBUG - TB_GENERATOR: GL records with account numbers: {len(mapped)}, "
+              f"without: {len(dated) - len(mapped)} (up to {cutoffs[-1]})")
+
+        # Debit/credit per (account, interval): the only pass over the GL lines
+        sums = mapped.groupby(['GL_Acct_Number', 'interval'])[['debit_crypto', 'credit_crypto']].sum().reset_index()
+        if 'original_account_name' in mapped.columns:
+            # First non-empty name per (account, interval), with its line position
+            named = mapped.loc[mapped['original_account_name'].notna(), ['GL_Acct_Number', 'interval', 'original_account_name']]
+            names = named.assign(position=named.index).groupby(['GL_Acct_Number', 'interval']).first().reset_index()
+            names = names.sort_values('position', kind='stable')
+
+        coa_dict = self._coa()
+        results = {}
+        for j, cutoff in enumerate(cutoffs):
+            if first_interval > j:
+                results[cutoff] = pd.DataFrame()
+                continue
+
+            account_totals = sums[sums['interval'] <= j].groupby('GL_Acct_Number').agg({
+                'debit_crypto': 'sum',
+                'credit_crypto': 'sum'
+            }).reset_index()
+            if self._mapped_dtype is not None and not first_unmapped <= j:
+                account_totals['GL_Acct_Number'] = account_totals['GL_Acct_Number'].astype(self._mapped_dtype)
+
+            if 'original_account_name' in mapped.columns:
+                first_names = names[names['interval'] <= j].groupby('GL_Acct_Number')['original_account_name'].first()
+                account_totals['original_account_name'] = account_totals['GL_Acct_Number'].map(first_names).astype(
+                    mapped['original_account_name'].dtype)
+            else:
+                account_totals['original_account_name'] = account_totals['GL_Acct_Number'].apply(
+                    lambda x: coa_dict.get(int(x), f"Account {int(x)}")
+                )
+
+            results[cutoff] = _finish_trial_balance(account_totals, coa_dict)
+        return results
+
+
+def _period_cutoff(value):
+    """Cut-off for a period boundary: dates (and datetimes) become midnight"""
+    return datetime.combine(value, datetime.min.time()) if isinstance(value, date) else value
+
+
 def categorize_account(acct_num) -> str:
     """Categorize account based on account number (1=Assets, 2=Liabilities, 3=Capital, 4=Income, 8=Expenses, 9=Income)."""
     acct_str = str(int(acct_num))
@@ -120,11 +291,15 @@ def categorize_account(acct_num) -> str:
 def calculate_period_changes(
     gl_df: pd.DataFrame,
     current_date: datetime,
-    selected_fund: Optional[str] = None
+    selected_fund: Optional[str] = None,
+    engine: Optional[PeriodEngine] = None
 ) -> Dict[str, pd.DataFrame]:
     """
     Calculate trial balance changes for different periods (MTD, QTD, YTD, ITD).
     
+    All beginning and ending balances come from one PeriodEngine pass over
+    the GL; pass an engine to share it with other reports on the same GL.
+    
     Returns dict with keys: 'mtd', 'qtd', 'ytd', 'itd'
     Each value is a DataFrame with beginning balance, ending balance, and change.
     """
@@ -162,12 +337,15 @@ def calculate_period_changes(
         'itd': (itd_start, current_date)
     }
     
+    engine = engine or PeriodEngine(gl_df)
+    trial_balances = engine.trial_balances([d for span in periods.values() for d in span])
+    
     results = {}
     
     for period_name, (start_date, end_date) in periods.items():
         # Get beginning and ending balances
-        begin_tb = generate_trial_balance_from_gl(gl_df, start_date)
-        end_tb = generate_trial_balance_from_gl(gl_df, end_date)
+        begin_tb = trial_balances[start_date]
+        end_tb = trial_balances[end_date]
         
         # Merge to calculate changes
         if not begin_tb.empty and not end_tb.empty:
@@ -213,11 +391,13 @@ def calculate_period_changes(
 
 def get_income_expense_changes(
     gl_df: pd.DataFrame,
-    current_date: datetime
+    current_date: datetime,
+    engine: Optional[PeriodEngine] = None
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Get income and expense account changes using ORIGINAL EXCEL GENERATOR LOGIC.
     This creates a master trial balance approach and calculates period changes.
+    Trial balances at all period boundaries come from one PeriodEngine pass.
     
     For DISPLAY purposes:
     - Income accounts (4xxx, 9xxx): Show as POSITIVE values in statement
@@ -238,7 +418,8 @@ def get_income_expense_changes(
     print("DEBUG - TB_GENERATOR: Building master TB structure from GL...")
     
     # First, create trial balance for the current date to get all accounts
-    current_tb = generate_trial_balance_from_gl(gl_df, current_date)
+    engine = engine or PeriodEngine(gl_df)
+    current_tb = engine.trial_balance(current_date)
     if current_tb.empty:
         print("DEBUG - TB_GENERATOR: No trial balance data for current date")
         return pd.DataFrame(), pd.DataFrame()
@@ -284,6 +465,8 @@ def get_income_expense_changes(
     
     print(f"DEBUG - TB_GENERATOR: Period dates: {periods}")
     
+    trial_balances = engine.trial_balances([_period_cutoff(d) for span in periods.values() for d in span])
+    
     # Build change data for each account
     change_data = []
     for _, account_row in income_expense_accounts.iterrows():
@@ -302,8 +485,8 @@ def get_income_expense_changes(
         # Calculate change for each period
         for period_name, (start_date, end_date) in periods.items():
             # Get trial balance at start and end of period
-            start_tb = generate_trial_balance_from_gl(gl_df, datetime.combine(start_date, datetime.min.time()) if isinstance(start_date, date) else start_date)
-            end_tb = generate_trial_balance_from_gl(gl_df, datetime.combine(end_date, datetime.min.time()) if isinstance(end_date, date) else end_date)
+            start_tb = trial_balances[_period_cutoff(start_date)]
+            end_tb = trial_balances[_period_cutoff(end_date)]
             
             # Get balances for this account
             start_val = 0.0
@@ -365,7 +548,8 @@ def get_income_expense_changes(
 
 def calculate_nav_changes(
     gl_df: pd.DataFrame,
-    current_date: datetime
+    current_date: datetime,
+    engine: Optional[PeriodEngine] = None
 ) -> pd.DataFrame:
     """
     Calculate NAV changes using ORIGINAL EXCEL GENERATOR LOGIC.
@@ -377,6 +561,8 @@ def calculate_nav_changes(
     - Distributions (30210): Use NEGATIVE value (distributions reduce NAV)
     - Net income: Income accounts (4xxx, 9xxx) POSITIVE, minus expenses (8xxx)
     
+    Trial balances at all period boundaries come from one PeriodEngine pass.
+    
     Returns DataFrame with NAV waterfall: Beginning, Contributions, Distributions, Net Income, Ending
     """
     print("DEBUG - TB_GENERATOR: Starting NAV calculation (ORIGINAL LOGIC)")
@@ -415,12 +601,15 @@ def calculate_nav_changes(
         "Ending balance": [],
     }
     
+    engine = engine or PeriodEngine(gl_df)
+    trial_balances = engine.trial_balances([_period_cutoff(d) for _, start, end in periods for d in (start, end)])
+    
     for label, start_date, end_date in periods:
         print(f"DEBUG - TB_GENERATOR: Calculating NAV for {label}: {start_date} to {end_date}")
         
         # Get trial balances for start and end periods
-        start_tb = generate_trial_balance_from_gl(gl_df, datetime.combine(start_date, datetime.min.time()) if isinstance(start_date, date) else start_date)
-        end_tb = generate_trial_balance_from_gl(gl_df, datetime.combine(end_date, datetime.min.time()) if isinstance(end_date, date) else end_date)
+        start_tb = trial_balances[_period_cutoff(start_date)]
+        end_tb = trial_balances[_period_cutoff(end_date)]
         
         if end_tb.empty:
             # Fill with zeros if no end data
@@ -12,6 +12,7 @@ from pandas.tseries.offsets import MonthEnd
 import re
 from .tb_generator import generate_trial_balance_from_gl
 from .data_processor import format_currency, get_previous_period_date
+from ...services.gl_amounts import is_amount_column, sum_pivot
 
 
 def clean_date_utc(date_val):
@@ -115,18 +116,22 @@ def register_outputs(output, input, gl_data, selected_date):
                     print(f"DEBUG - Financial Reporting TB: COA merge failed: {e}")
                     return pd.DataFrame()
             
-            # Convert debit/credit to Decimal for precision
-            print(f"DEBUG - Financial Reporting TB: Converting amounts to Decimal...")
-            for col in ['debit_crypto', 'credit_crypto']:
-                if col in gl_df.columns:
-                    gl_df[col] = (
-                        gl_df[col]
-                        .astype(str)
-                        .apply(lambda x: Decimal(x) if (x.replace('.', '', 1).replace('-', '', 1).replace('e', '', 1).replace('+', '', 1).isdigit()) else Decimal(0))
-                    )
-            
-            # Compute net_debit_credit at 18-decimal precision
-            gl_df['net_debit_credit_crypto'] = (gl_df['debit_crypto'] - gl_df['credit_crypto']).round(18)
+            if is_amount_column(gl_df['debit_crypto']):
+                # Typed amounts are exact at 18 decimals already; no per-cell Decimal work
+                gl_df['net_debit_credit_crypto'] = gl_df['debit_crypto'] - gl_df['credit_crypto']
+            else:
+                # Convert debit/credit to Decimal for precision
+                print(f"DEBUG - Financial Reporting TB: Converting amounts to Decimal...")
+                for col in ['debit_crypto', 'credit_crypto']:
+                    if col in gl_df.columns:
+                        gl_df[col] = (
+                            gl_df[col]
+                            .astype(str)
+                            .apply(lambda x: Decimal(x) if (x.replace('.', '', 1).replace('-', '', 1).replace('e', '', 1).replace('+', '', 1).isdigit()) else Decimal(0))
+                        )
+                
+                # Compute net_debit_credit at 18-decimal precision
+                gl_df['net_debit_credit_crypto'] = (gl_df['debit_crypto'] - gl_df['credit_crypto']).round(18)
             
             # Extract "day" (midnight UTC) for grouping
             gl_df['day'] = gl_df['date'].dt.normalize()
@@ -159,16 +164,7 @@ def register_outputs(output, input, gl_data, selected_date):
                     pivot_index = ['account_name']
                 
                 # Create pivot table with cumulative balances
-                acct_by_day = (
-                    period_df
-                    .pivot_table(
-                        index=pivot_index,
-                        columns='day',
-                        values='net_debit_credit_crypto',
-                        aggfunc='sum',
-                        fill_value=Decimal(0),
-                    )
-                )
+                acct_by_day = sum_pivot(period_df, pivot_index, 'day', 'net_debit_credit_crypto')
                 
                 if acct_by_day.empty:
                     return pd.DataFrame()
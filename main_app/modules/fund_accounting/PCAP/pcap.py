@@ -10,6 +10,7 @@ All utility functions have been moved to excess.py to maintain clean separation
 import pandas as pd
 import numpy as np
 import math
+import os
 from decimal import Decimal, InvalidOperation, getcontext
 from datetime import datetime, timedelta, time
 from collections import defaultdict
@@ -44,10 +45,15 @@ from .excess import (
     save_cash_flow_waterfall_image_from_row,
     build_lp_pdf_report_clean
 )
+from ....services.gl_amounts import is_amount_column, to_decimals
+from ....services.pdf_renderer import PDFJob, get_template, render_pdfs
 
 # Set high precision for financial calculations
 getcontext().prec = 28
 
+# Investor statement template, stylesheet and fonts
+STATEMENT_ASSETS_DIR = os.path.join(os.path.dirname(__file__), "PDF Creator")
+
 # Backward compatibility aliases
 to_dec = safe_decimal
 to_decimal = safe_decimal
@@ -132,6 +138,10 @@ def process_capital_with_partner_accounting(gl, grid, timing_classifier):
     # Track statistics
     timing_stats = {'BOD': 0, 'EOD': 0}
 
+    if 'net_debit_credit_crypto' in capital_gl.columns and is_amount_column(capital_gl['net_debit_credit_crypto']):
+        _add_typed_capital_flows(capital_gl, grid, timing_classifier, timing_stats)
+        capital_gl = capital_gl.iloc[:0]
+
     print(f"\nProcessing transactions...")
 
     # Process each capital transaction
@@ -206,9 +216,238 @@ def process_capital_with_partner_accounting(gl, grid, timing_classifier):
     return grid
 
 
-def run_partner_capital_pcap_allocation(grid, fund_pnl_by_group):
+def _add_typed_capital_flows(capital_gl, grid, timing_classifier, timing_stats):
+    """
+    Typed-amount version of the per-transaction loop in
+    process_capital_with_partner_accounting: classify timing for all rows at
+    once, sum each (LP, date, bucket) natively and add the sums to the grid
+    as Decimals. Rows without exactly one matching grid row are skipped, as
+    in the loop.
+    """
+    tx_datetime = pd.to_datetime(capital_gl['transaction_datetime'])
+    if tx_datetime.dt.tz is None:
+        tx_datetime = tx_datetime.dt.tz_localize('UTC')
+    else:
+        tx_datetime = tx_datetime.dt.tz_convert('UTC')
+
+    cutoff = timing_classifier.bod_cutoff
+    cutoff_delta = timedelta(hours=cutoff.hour, minutes=cutoff.minute,
+                             seconds=cutoff.second, microseconds=cutoff.microsecond)
+    is_bod = (tx_datetime - tx_datetime.dt.normalize()) <= cutoff_delta
+    timing_stats['BOD'] += int(is_bod.sum())
+    timing_stats['EOD'] += int((~is_bod).sum())
+
+    is_contribution = capital_gl['account_name'].str.lower().str.contains('contribution', regex=False)
+    flows = pd.DataFrame({
+        'limited_partner_ID': capital_gl['limited_partner_ID'],
+        'date': capital_gl['date'],
+        'target_col': np.where(is_contribution, 'cap_contrib', 'cap_dist') + np.where(is_bod, '_bod', '_eod'),
+        'amount': capital_gl['net_debit_credit_crypto'],
+    })
+    sums = to_decimals(flows.groupby(['limited_partner_ID', 'date', 'target_col'])['amount'].sum())
+
+    grid_rows = grid.groupby(['limited_partner_ID', 'date']).groups
+    for (lp_id, normalized_date, target_col), amount in sums.items():
+        grid_idx = grid_rows.get((lp_id, normalized_date), [])
+        if len(grid_idx) == 1:
+            grid.at[grid_idx[0], target_col] += amount
+        else:
+            print(f"  ⚠ Warning: No grid match for {lp_id} on {normalized_date}")
+
+    print(f"Added {len(sums)} summed capital flows from {len(capital_gl)} transactions")
+
+
+def run_partner_capital_pcap_allocation(grid, fund_pnl_by_group, deferred=None):
     """
     PCAP allocation respecting partner capital accounting conventions
+
+    Each day, the fund P&L deferred so far is allocated across the LPs on
+    that day in proportion to |beg_bal + BOD contributions + BOD
+    distributions|, and each LP's ending balance rolls forward as its next
+    beginning balance. On days without partner capital the P&L stays
+    deferred.
+
+    The grid is pivoted into dense (days x LPs) Decimal arrays and each day
+    is one array step over its LPs instead of masks over the whole grid;
+    results are written back to the grid in one assignment per column. The
+    arithmetic is the same Decimal arithmetic, in the same order, as the
+    day-by-day reference _run_partner_capital_pcap_allocation_by_day, which
+    still handles grids with duplicate or missing (LP, date) keys.
+
+    Args:
+        grid: One row per (limited_partner_ID, date) with beg_bal and the
+            cap_contrib/cap_dist BOD/EOD, mgmt_fee_amt and gp_incentive_amt columns
+        fund_pnl_by_group: date, SCPC, schedule_ranking and fund_pnl_amt
+            (or amount) rows
+        deferred: Optional {(SCPC, schedule_ranking): amount} P&L still
+            deferred from an earlier run over the preceding days; updated in
+            place with the buckets left deferred at the end of this run
+
+    Returns:
+        (grid, alloc_rows, allocation_summary_df)
+    """
+    keys = ['limited_partner_ID', 'date']
+    if grid.duplicated(keys).any() or grid[keys].isna().any().any():
+        print(" Duplicate or missing (LP, date) keys in PCAP grid - allocating day by day")
+        return _run_partner_capital_pcap_allocation_by_day(grid, fund_pnl_by_group, deferred)
+
+    print(" STARTING PARTNER CAPITAL PCAP ALLOCATION")
+    print(" PARTNER CAPITAL ACCOUNT CONVENTIONS:")
+    print("• Normal Balance: CREDIT (negative values)")
+    print("• Contributions: Credits (-) increase capital")
+    print("• Distributions: Debits (+) decrease capital")
+    print("• Management Fees: Debits (+) decrease capital")
+    print("=" * 60)
+
+    # PREP
+    grid = grid.sort_values(keys).reset_index(drop=True)
+    for col in ['beg_bal', 'allocated_pnl', 'end_bal', 'pnl_allocation_pct', 'allocation_base',
+                'cap_contrib_bod', 'cap_contrib_eod', 'cap_dist_bod', 'cap_dist_eod']:
+        if col not in grid.columns:
+            grid[col] = Decimal('0')
+
+    # Pivot: every grid row is one (day, LP) cell
+    day_pos, days = pd.factorize(grid['date'], sort=True)
+    lp_pos, lps = pd.factorize(grid['limited_partner_ID'], sort=True)
+    shape = (len(days), len(lps))
+    present = np.zeros(shape, dtype=bool)
+    present[day_pos, lp_pos] = True
+
+    def cells(col=None):
+        dense = np.full(shape, Decimal('0'), dtype=object)
+        if col is not None and col in grid.columns:
+            dense[day_pos, lp_pos] = grid[col].to_numpy(dtype=object)
+        return dense
+
+    beg = cells('beg_bal')
+    contrib_bod, contrib_eod = cells('cap_contrib_bod'), cells('cap_contrib_eod')
+    dist_bod, dist_eod = cells('cap_dist_bod'), cells('cap_dist_eod')
+    fees, incentive = cells('mgmt_fee_amt'), cells('gp_incentive_amt')
+    base, pct, allocated, end = cells(), cells(), cells(), cells()
+
+    pnl_by_day = _fund_pnl_by_day(fund_pnl_by_group, days)
+    daily_fund_pnl = {}
+    allocated_days = np.zeros(len(days), dtype=bool)
+    carried_deferred = deferred
+    deferred = defaultdict(Decimal, carried_deferred or {})
+    alloc_rows = []
+
+    print(f" Processing {len(days)} days x {len(lps)} partners with partner capital conventions")
+
+    for t in range(len(days)):
+        d = days[t]
+        on_day = np.flatnonzero(present[t])
+
+        # 1) Add today's fund P&L to deferred bucket
+        day_pnl = Decimal('0')
+        for key, amount in pnl_by_day.get(t, ()):
+            deferred[key] += amount
+            day_pnl += amount
+        daily_fund_pnl[t] = day_pnl
+
+        # 2) Roll forward yesterday's ending balances, then the allocation base
+        if t > 0:
+            carried = present[t - 1] & present[t]
+            beg[t, carried] = end[t - 1, carried]
+        day_base = beg[t, on_day] + contrib_bod[t, on_day] + dist_bod[t, on_day]
+        base[t, on_day] = day_base
+
+        # 3) Allocate deferred P&L by share of absolute partner capital
+        absolute_capital = np.abs(day_base)
+        total_absolute_capital = sum(absolute_capital)
+        day_allocated = np.full(len(on_day), Decimal('0'), dtype=object)
+        if total_absolute_capital > 0:
+            allocated_days[t] = True
+            weights = absolute_capital / total_absolute_capital
+            pct[t, on_day] = weights
+            for (scpc, rank), amt in list(deferred.items()):
+                if amt == 0:
+                    continue
+                shares = amt * weights
+                day_allocated = day_allocated + shares
+                alloc_rows.extend(
+                    {
+                        'date': d,
+                        'limited_partner_ID': lps[k],
+                        'SCPC': scpc,
+                        'schedule_ranking': rank,
+                        'allocated_amt': share,
+                        'allocation_weight': weight,
+                        'allocation_base': lp_base,
+                        'capital_balance': lp_base
+                    }
+                    for k, share, weight, lp_base in zip(on_day, shares, weights, day_base)
+                )
+                deferred[(scpc, rank)] = Decimal('0')
+        allocated[t, on_day] = day_allocated
+
+        # 4) ENDING BALANCE: Partner capital equation
+        end[t, on_day] = (
+            beg[t, on_day] + contrib_bod[t, on_day] + contrib_eod[t, on_day]
+            + dist_bod[t, on_day] + dist_eod[t, on_day]
+            + fees[t, on_day] + incentive[t, on_day] + allocated[t, on_day]
+        )
+
+    # Write back in one step
+    for col, dense in [('beg_bal', beg), ('allocation_base', base), ('pnl_allocation_pct', pct),
+                       ('allocated_pnl', allocated), ('end_bal', end)]:
+        grid[col] = dense[day_pos, lp_pos]
+
+    # Daily allocation percentages for the days that had partner capital
+    day_idx, lp_idx = np.nonzero(present & allocated_days[:, None])
+    allocation_summary_df = pd.DataFrame({
+        'date': days[day_idx],
+        'limited_partner_ID': lps[lp_idx],
+        'capital_balance': base[day_idx, lp_idx],
+        'allocation_percentage': pct[day_idx, lp_idx],
+        'has_pnl_to_allocate': [daily_fund_pnl[t] != 0 for t in day_idx],
+    }) if len(day_idx) else pd.DataFrame()
+
+    print(f"\n PARTNER CAPITAL PCAP ALLOCATION COMPLETE")
+    print(f" Final Summary:")
+    print(f"  • Days allocated: {int(allocated_days.sum())} of {len(days)}")
+    print(f"  • Deferred P&L: {sum(deferred.values()):,.8f}")
+    print(f"  • Allocation records: {len(alloc_rows):,}")
+    print(f"   All partner capital accounting conventions maintained")
+
+    if carried_deferred is not None:
+        carried_deferred.clear()
+        carried_deferred.update(deferred)
+
+    return grid, alloc_rows, allocation_summary_df
+
+
+def _fund_pnl_by_day(fund_pnl_by_group, days):
+    """
+    [(key, Decimal amount), ...] per grid day position, in row order.
+    Rows dated on no grid day are never allocated, as in the day loop.
+    """
+    if fund_pnl_by_group is None or fund_pnl_by_group.empty:
+        return {}
+
+    amount_col = 'fund_pnl_amt' if 'fund_pnl_amt' in fund_pnl_by_group.columns else 'amount'
+    days = pd.DatetimeIndex(days)
+    pnl_dates = pd.DatetimeIndex(pd.to_datetime(fund_pnl_by_group['date']))
+    if days.tz is not None and pnl_dates.tz is None:
+        pnl_dates = pnl_dates.tz_localize(days.tz)
+    elif days.tz is None and pnl_dates.tz is not None:
+        pnl_dates = pnl_dates.tz_convert(None)
+    positions = days.get_indexer(pnl_dates)
+
+    pnl_by_day = defaultdict(list)
+    rows = zip(positions, fund_pnl_by_group['SCPC'], fund_pnl_by_group['schedule_ranking'],
+               fund_pnl_by_group[amount_col].tolist())
+    for t, scpc, rank, amount in rows:
+        if t >= 0:
+            pnl_by_day[t].append(((scpc, rank), Decimal(str(amount))))
+    return pnl_by_day
+
+
+def _run_partner_capital_pcap_allocation_by_day(grid, fund_pnl_by_group, deferred=None):
+    """
+    PCAP allocation respecting partner capital accounting conventions, one
+    day at a time over the whole grid (reference for the dense engine in
+    run_partner_capital_pcap_allocation)
     """
 
     print(" STARTING PARTNER CAPITAL PCAP ALLOCATION")
@@ -235,7 +474,8 @@ def run_partner_capital_pcap_allocation(grid, fund_pnl_by_group):
 
     alloc_rows = []
     all_days = sorted(grid['date'].unique())
-    deferred = defaultdict(Decimal)
+    carried_deferred = deferred
+    deferred = defaultdict(Decimal, carried_deferred or {})
 
     print(f" Processing {len(all_days)} days with partner capital conventions")
 
@@ -416,6 +656,10 @@ def run_partner_capital_pcap_allocation(grid, fund_pnl_by_group):
     # Create daily allocation percentage summary
     allocation_summary_df = pd.DataFrame(daily_allocation_summary)
 
+    if carried_deferred is not None:
+        carried_deferred.clear()
+        carried_deferred.update(deferred)
+
     return grid, alloc_rows, allocation_summary_df
 
 
@@ -428,10 +672,12 @@ def validate_fund_allocation_timing_only(final_grid, alloc_rows, fund_pnl_by_gro
     # Check that allocations match fund P&L by date
     validation_errors = []
     
+    # Allocated P&L per date, summed once for the whole grid
+    allocated_by_date = final_grid.groupby(final_grid['date'].dt.strftime('%Y-%m-%d'))['allocated_pnl'].sum()
+    
     for date_str, expected_pnl in fund_pnl_by_group.items():
         # Sum allocated P&L for this date
-        date_mask = final_grid['date'].dt.strftime('%Y-%m-%d') == date_str
-        actual_allocated = final_grid[date_mask]['allocated_pnl'].sum()
+        actual_allocated = allocated_by_date.get(date_str, 0)
         
         # Check variance
         variance = abs(expected_pnl - actual_allocated)
@@ -564,45 +810,50 @@ def allocate_daily_pl_to_partners_USD_with_prior_nav(
     if as_of_date is None:
         as_of_date = datetime.now()
     
+    nav_df = _allocate_pl_by_prior_nav(
+        nav_df, gl_data, 'nav', 'prior_nav', 'allocation_pct', 'allocated_pnl_new'
+    )
+    
+    print("Daily P&L allocation completed")
+    return nav_df
+
+
+def _allocate_pl_by_prior_nav(nav_df, gl_data, nav_col, prior_col, pct_col, allocated_col):
+    """
+    Allocate each day's GL P&L by the LPs' NAV on the previous calendar day.
+
+    Daily P&L is summed once per date and prior NAVs are joined on
+    (date - 1 day, LP) instead of filtering gl_data and nav_df per date and
+    per LP. Rows without a prior-day NAV, or whose prior day's total NAV is
+    not positive, keep Decimal('0') in the three output columns.
+    """
     # Sort by date for proper allocation sequence
     nav_df = nav_df.sort_values(['date', 'limited_partner_ID']).copy()
     
-    # Calculate daily fund P&L from GL
-    daily_pnl = {}
-    for date in nav_df['date'].unique():
-        date_gl = gl_data[gl_data['date'].dt.date == date.date()]
-        daily_fund_pnl = date_gl['amount'].sum() if not date_gl.empty else Decimal('0')
-        daily_pnl[date] = safe_decimal(daily_fund_pnl)
-    
-    # Allocate based on prior day NAV
-    nav_df['prior_nav'] = Decimal('0')
-    nav_df['allocation_pct'] = Decimal('0')
-    nav_df['allocated_pnl_new'] = Decimal('0')
-    
-    for current_date in sorted(nav_df['date'].unique()):
-        current_data = nav_df[nav_df['date'] == current_date].copy()
-        
-        # Get prior day NAV for allocation base
-        prior_date = current_date - pd.Timedelta(days=1)
-        prior_data = nav_df[nav_df['date'] == prior_date]
-        
-        if not prior_data.empty:
-            total_prior_nav = prior_data['nav'].sum()
-            
-            for idx, row in current_data.iterrows():
-                lp_id = row['limited_partner_ID']
-                lp_prior = prior_data[prior_data['limited_partner_ID'] == lp_id]
-                
-                if not lp_prior.empty and total_prior_nav > 0:
-                    prior_nav = lp_prior['nav'].iloc[0]
-                    allocation_pct = prior_nav / total_prior_nav
-                    allocated_pnl = daily_pnl.get(current_date, Decimal('0')) * allocation_pct
-                    
-                    nav_df.loc[idx, 'prior_nav'] = prior_nav
-                    nav_df.loc[idx, 'allocation_pct'] = allocation_pct
-                    nav_df.loc[idx, 'allocated_pnl_new'] = allocated_pnl
-    
-    print("Daily P&L allocation completed")
+    # Daily fund P&L from GL, per calendar date
+    pnl_by_date = gl_data.groupby(gl_data['date'].dt.date)['amount'].sum()
+    daily_pnl = pd.Series([safe_decimal(pnl_by_date.get(d.date(), Decimal('0'))) for d in nav_df['date']],
+                          index=nav_df.index, dtype=object)
+    
+    # Prior day NAV per LP (first row if an LP has several) and in total
+    prior = nav_df.drop_duplicates(['date', 'limited_partner_ID'])[['date', 'limited_partner_ID', nav_col]]
+    total_prior = nav_df.groupby('date')[nav_col].sum()
+    lookup = pd.MultiIndex.from_arrays([nav_df['date'] - pd.Timedelta(days=1), nav_df['limited_partner_ID']])
+    prior_nav = prior.set_index(['date', 'limited_partner_ID'])[nav_col].reindex(lookup).to_numpy(dtype=object)
+    total_prior_nav = total_prior.reindex(nav_df['date'] - pd.Timedelta(days=1)).to_numpy(dtype=object)
+    
+    has_prior = pd.notna(prior_nav) & pd.notna(total_prior_nav)
+    has_prior[has_prior] = total_prior_nav[has_prior] > 0
+    
+    nav_df[prior_col] = Decimal('0')
+    nav_df[pct_col] = Decimal('0')
+    nav_df[allocated_col] = Decimal('0')
+    
+    allocation_pct = prior_nav[has_prior] / total_prior_nav[has_prior]
+    rows = nav_df.index[has_prior]
+    nav_df.loc[rows, prior_col] = prior_nav[has_prior]
+    nav_df.loc[rows, pct_col] = allocation_pct
+    nav_df.loc[rows, allocated_col] = daily_pnl[rows].to_numpy(dtype=object) * allocation_pct
     return nav_df
 
 
@@ -729,43 +980,10 @@ def allocate_daily_pl_to_partners_crypto_with_prior_nav(
     if as_of_date is None:
         as_of_date = datetime.now()
     
-    # Similar to USD allocation but with crypto-specific considerations
-    nav_df = nav_df.sort_values(['date', 'limited_partner_ID']).copy()
-    
-    # Calculate daily fund P&L in crypto terms
-    daily_pnl_crypto = {}
-    for date in nav_df['date'].unique():
-        date_gl = gl_data[gl_data['date'].dt.date == date.date()]
-        daily_fund_pnl = date_gl['amount'].sum() if not date_gl.empty else Decimal('0')
-        daily_pnl_crypto[date] = safe_decimal(daily_fund_pnl)
-    
-    # Allocate based on prior day NAV in crypto
-    nav_df['prior_nav_crypto'] = Decimal('0')
-    nav_df['allocation_pct_crypto'] = Decimal('0')
-    nav_df['allocated_pnl_crypto'] = Decimal('0')
-    
-    for current_date in sorted(nav_df['date'].unique()):
-        current_data = nav_df[nav_df['date'] == current_date].copy()
-        
-        # Get prior day NAV for allocation base
-        prior_date = current_date - pd.Timedelta(days=1)
-        prior_data = nav_df[nav_df['date'] == prior_date]
-        
-        if not prior_data.empty:
-            total_prior_nav = prior_data['nav_crypto'].sum()
-            
-            for idx, row in current_data.iterrows():
-                lp_id = row['limited_partner_ID']
-                lp_prior = prior_data[prior_data['limited_partner_ID'] == lp_id]
-                
-                if not lp_prior.empty and total_prior_nav > 0:
-                    prior_nav = lp_prior['nav_crypto'].iloc[0]
-                    allocation_pct = prior_nav / total_prior_nav
-                    allocated_pnl = daily_pnl_crypto.get(current_date, Decimal('0')) * allocation_pct
-                    
-                    nav_df.loc[idx, 'prior_nav_crypto'] = prior_nav
-                    nav_df.loc[idx, 'allocation_pct_crypto'] = allocation_pct
-                    nav_df.loc[idx, 'allocated_pnl_crypto'] = allocated_pnl
+    # Same allocation as the USD version, on the crypto NAV
+    nav_df = _allocate_pl_by_prior_nav(
+        nav_df, gl_data, 'nav_crypto', 'prior_nav_crypto', 'allocation_pct_crypto', 'allocated_pnl_crypto'
+    )
     
     print(f"Daily P&L allocation completed ({crypto_currency})")
     return nav_df
@@ -1687,7 +1905,6 @@ def generate_investor_statement_pdf(final_grid_enhanced, lp_id, fund_name,
         import json
         import os
         import tempfile
-        from jinja2 import Environment, FileSystemLoader
         try:
             from weasyprint import HTML
             HAS_WEASYPRINT = True
@@ -1722,44 +1939,26 @@ def generate_investor_statement_pdf(final_grid_enhanced, lp_id, fund_name,
         
         # Set up template directory
         if template_dir is None:
-            template_dir = os.path.join(os.path.dirname(__file__), "PDF Creator", "templates")
+            template_dir = os.path.join(STATEMENT_ASSETS_DIR, "templates")
         
         if not os.path.exists(template_dir):
             print(f"Template directory not found: {template_dir}")
             return None
         
-        # Set up Jinja2 environment
+        # Compiled template, shared with every other statement in this process
         print(f"  - Template directory: {template_dir}")
         try:
-            env = Environment(loader=FileSystemLoader(template_dir))
-            template = env.get_template("report.html")
+            template = get_template(template_dir)
             print(f"  - Template loaded successfully")
         except Exception as template_error:
             print(f"   Template loading failed: {template_error}")
             print(f"  - Error type: {type(template_error).__name__}")
             return None
         
-        # Replace zeros with dashes for cleaner presentation
-        def replace_zeros(obj):
-            if isinstance(obj, dict):
-                return {k: replace_zeros(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [replace_zeros(i) for i in obj]
-            elif isinstance(obj, (int, float)) and obj == 0:
-                return "-"
-            return obj
-        
-        json_data = replace_zeros(json_data)
-        
         # Render HTML
         print(f"  - Rendering HTML template...")
         try:
-            html_content = template.render(
-                **json_data,
-                lp_name="",  # Could be enhanced with LP name lookup
-                css_path=os.path.join(os.path.dirname(__file__), "PDF Creator"),
-                generated_on=datetime.now().strftime("%B %d, %Y")
-            )
+            html_content = _render_statement_html(template, json_data)
             print(f"  - HTML rendered successfully ({len(html_content)} characters)")
         except Exception as render_error:
             print(f"   HTML rendering failed: {render_error}")
@@ -1775,26 +1974,7 @@ def generate_investor_statement_pdf(final_grid_enhanced, lp_id, fund_name,
         os.makedirs(output_dir, exist_ok=True)
         
         # Create filename
-        if to_date is None:
-            # For PCAP report format, use period end or current date
-            if 'Period_End' in final_grid_enhanced.columns:
-                to_date = final_grid_enhanced['Period_End'].iloc[0] if not final_grid_enhanced.empty else datetime.now()
-            elif 'date' in final_grid_enhanced.columns:
-                to_date = final_grid_enhanced['date'].max()
-            else:
-                to_date = datetime.now()
-        
-        # Handle both datetime and string dates
-        if hasattr(to_date, 'strftime'):
-            date_str = to_date.strftime('%Y%m%d')
-        else:
-            # If it's already a string, try to parse and reformat, or use as-is
-            try:
-                date_str = pd.to_datetime(str(to_date)).strftime('%Y%m%d')
-            except:
-                date_str = datetime.now().strftime('%Y%m%d')
-        
-        filename = f"{date_str}_Investor_Capital_Statement_for_{lp_id}_with_{fund_name.replace(' ', '_')}.pdf"
+        filename = _statement_filename(final_grid_enhanced, lp_id, fund_name, to_date)
         output_path = os.path.join(output_dir, filename)
         
         # Generate PDF with detailed debugging
@@ -1802,7 +1982,7 @@ def generate_investor_statement_pdf(final_grid_enhanced, lp_id, fund_name,
         print(f"  - Output path: {output_path}")
         print(f"  - HTML content length: {len(html_content)} characters")
         
-        base_url = os.path.join(os.path.dirname(__file__), "PDF Creator")
+        base_url = STATEMENT_ASSETS_DIR
         print(f"  - Base URL: {base_url}")
         
         # Check if base directory exists
@@ -1842,10 +2022,120 @@ def generate_investor_statement_pdf(final_grid_enhanced, lp_id, fund_name,
         return None
 
 
+def _replace_zeros(obj):
+    """Replace zeros with dashes for cleaner presentation"""
+    if isinstance(obj, dict):
+        return {k: _replace_zeros(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_replace_zeros(i) for i in obj]
+    elif isinstance(obj, (int, float)) and obj == 0:
+        return "-"
+    return obj
+
+
+def _render_statement_html(template, json_data):
+    """Investor statement HTML from its JSON data"""
+    return template.render(
+        **_replace_zeros(json_data),
+        lp_name="",  # Could be enhanced with LP name lookup
+        css_path=STATEMENT_ASSETS_DIR,
+        generated_on=datetime.now().strftime("%B %d, %Y")
+    )
+
+
+def _statement_filename(final_grid_enhanced, lp_id, fund_name, to_date=None):
+    """PDF file name of an LP's statement, dated to_date or the data's period end"""
+    if to_date is None:
+        # For PCAP report format, use period end or current date
+        if 'Period_End' in final_grid_enhanced.columns:
+            to_date = final_grid_enhanced['Period_End'].iloc[0] if not final_grid_enhanced.empty else datetime.now()
+        elif 'date' in final_grid_enhanced.columns:
+            to_date = final_grid_enhanced['date'].max()
+        else:
+            to_date = datetime.now()
+
+    # Handle both datetime and string dates
+    if hasattr(to_date, 'strftime'):
+        date_str = to_date.strftime('%Y%m%d')
+    else:
+        # If it's already a string, try to parse and reformat, or use as-is
+        try:
+            date_str = pd.to_datetime(str(to_date)).strftime('%Y%m%d')
+        except:
+            date_str = datetime.now().strftime('%Y%m%d')
+
+    return f"{date_str}_Investor_Capital_Statement_for_{lp_id}_with_{fund_name.replace(' ', '_')}.pdf"
+
+
+def investor_statement_jobs(final_grid_enhanced, fund_name, from_date=None, to_date=None,
+                            output_dir=None, template_dir=None, currency='ETH'):
+    """
+    PDFJobs for the statements of all LPs, built lazily one LP at a time
+
+    The data is split by LP in one groupby and every statement is rendered
+    from the same compiled template. LPs without data are skipped.
+    """
+    if template_dir is None:
+        template_dir = os.path.join(STATEMENT_ASSETS_DIR, "templates")
+    if output_dir is None:
+        output_dir = os.path.join(os.path.dirname(__file__), "PCAP", "generated_reports")
+    os.makedirs(output_dir, exist_ok=True)
+    template = get_template(template_dir)
+
+    # Raw grid data: the statement period is the whole grid's, not each LP's
+    if 'Line_Item' not in final_grid_enhanced.columns and 'date' in final_grid_enhanced.columns:
+        if from_date is None:
+            from_date = final_grid_enhanced['date'].min()
+        if to_date is None:
+            to_date = final_grid_enhanced['date'].max()
+    file_date = to_date
+    if file_date is None and 'Period_End' in final_grid_enhanced.columns and not final_grid_enhanced.empty:
+        file_date = final_grid_enhanced['Period_End'].iloc[0]
+
+    for lp_id, lp_data in final_grid_enhanced.groupby('limited_partner_ID', sort=False):
+        try:
+            json_data = create_investor_statement_json(
+                lp_data, lp_id, fund_name, from_date, to_date, currency=currency
+            )
+            if json_data is None:
+                print(f" No data available for LP {lp_id}")
+                continue
+            filename = _statement_filename(lp_data, lp_id, fund_name, file_date)
+            yield PDFJob(
+                name=lp_id,
+                html=_render_statement_html(template, json_data),
+                output_path=os.path.join(output_dir, filename),
+                base_url=STATEMENT_ASSETS_DIR,
+            )
+        except Exception as e:
+            print(f" Error preparing statement for LP {lp_id}: {e}")
+            import traceback
+            traceback.print_exc()
+
+
 def generate_all_lp_statements_pdf(final_grid_enhanced, fund_name, 
-                                 from_date=None, to_date=None, output_dir=None, currency='ETH'):
+                                 from_date=None, to_date=None, output_dir=None, currency='ETH',
+                                 template_dir=None, max_workers=None, progress=None, zip_path=None):
     """
     Generate investor statement PDFs for all LPs in the dataset
+
+    Statements are prepared one LP at a time (see investor_statement_jobs)
+    and laid out on a process pool by services.pdf_renderer.render_pdfs, so
+    only a bounded number of statements is in memory at once.
+
+    Args:
+        final_grid_enhanced: PCAP grid or PCAP report rows for all LPs
+        fund_name: Fund name printed on the statements
+        from_date, to_date: Statement period (default: the data's range)
+        output_dir: Directory for the PDFs
+        currency: Statement currency
+        template_dir: Directory holding report.html
+        max_workers: Worker processes (default PDF_RENDER_WORKERS; 0 renders here)
+        progress: progress(done, total, lp_id, path or None) after each PDF
+        zip_path: If given, also bundle the PDFs into this zip
+
+    Returns:
+        Paths of the generated PDFs
     """
     print(" PDF Generation: Starting...")
     print(f"  - Input data shape: {final_grid_enhanced.shape}")
@@ -1859,52 +2149,18 @@ def generate_all_lp_statements_pdf(final_grid_enhanced, fund_name,
     if len(lp_ids) == 0:
         print(" No LP IDs found in the data")
         return []
-    
-    generated_files = []
-    
-    for i, lp_id in enumerate(lp_ids):
-        print(f" Processing LP {i+1}/{len(lp_ids)}: {lp_id}")
-        try:
-            # Filter data for this LP to see what we're working with
-            lp_data = final_grid_enhanced[final_grid_enhanced['limited_partner_ID'] == lp_id]
-            print(f"  - LP data shape: {lp_data.shape}")
-            
-            # Handle different data formats - PCAP report vs raw grid data
-            if 'Period_End' in lp_data.columns:
-                # PCAP report format
-                if not lp_data.empty:
-                    period_end = lp_data['Period_End'].iloc[0]
-                    print(f"  - Period end: {period_end}")
-                    # Show sample line items and amounts
-                    contrib_rows = lp_data[lp_data['Line_Item'] == 'Capital Contributions']
-                    dist_rows = lp_data[lp_data['Line_Item'] == 'Capital Distributions']
-                    if not contrib_rows.empty and not dist_rows.empty:
-                        contrib = contrib_rows['Current_Month'].iloc[0]
-                        dist = dist_rows['Current_Month'].iloc[0]
-                        print(f"  - Sample values: contrib={contrib}, dist={dist}")
-            elif 'date' in lp_data.columns:
-                # Raw grid data format
-                print(f"  - Date range: {lp_data['date'].min()} to {lp_data['date'].max()}")
-                print(f"  - Sample values: contrib={lp_data['cap_contrib'].sum()}, dist={lp_data['cap_dist'].sum()}, pnl={lp_data['allocated_pnl'].sum()}")
-            else:
-                print(f"  - Available columns: {lp_data.columns.tolist()}")
-            
-            pdf_path = generate_investor_statement_pdf(
-                final_grid_enhanced, lp_id, fund_name, 
-                from_date, to_date, output_dir, currency=currency
-            )
-            
-            if pdf_path:
-                print(f"   Generated: {pdf_path}")
-                generated_files.append(pdf_path)
-            else:
-                print(f"   Failed to generate PDF for {lp_id}")
-                
-        except Exception as e:
-            print(f" Error generating PDF for LP {lp_id}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
+
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError) as e:
+        print(f"Missing required dependencies for PDF generation: {e}")
+        print("Please install: pip install jinja2 weasyprint")
+        return []
+
+    jobs = investor_statement_jobs(final_grid_enhanced, fund_name, from_date, to_date,
+                                   output_dir, template_dir, currency)
+    generated_files = render_pdfs(jobs, total=len(lp_ids), max_workers=max_workers,
+                                  progress=progress, zip_path=zip_path)
     
     print(f"Generated {len(generated_files)} PDF statements")
     return generated_files
@@ -9,8 +9,7 @@ from datetime import datetime
 import json
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from jinja2 import Environment, FileSystemLoader
+from typing import Callable, Dict, List, Optional, Tuple
 try:
     from weasyprint import HTML
     HAS_WEASYPRINT = True
@@ -21,6 +20,8 @@ except (ImportError, OSError):
 import tempfile
 import shutil
 
+from ....services.pdf_renderer import PDFJob, get_template, render_pdfs, write_pdf
+
 # Import S3 utilities
 from ....s3_utils import (
     list_pcap_excel_files,
@@ -647,54 +648,15 @@ class PCAPExcelProcessor:
             Path to generated PDF file
         """
         try:
-            # Get JSON data for the LP
-            json_data = self.parse_excel_to_json(lp_id)
-            
-            if not json_data:
-                print(f"No data available for LP: {lp_id}")
+            job = self._statement_job(lp_id, fund_name, output_dir)
+            if job is None:
                 return None
             
-            # Auto-detect fund name if not provided
-            if not fund_name:
-                fund_name = self.get_fund_name_from_lp(lp_id)
-                print(f"Auto-detected fund name: {fund_name}")
-            
-            # Set up paths
-            base_path = Path(__file__).parent.parent / "PDF Creator"
-            template_dir = base_path / "templates"
-            
-            # Set up Jinja2 environment
-            env = Environment(loader=FileSystemLoader(str(template_dir)))
-            template = env.get_template("report.html")
-            
-            # Format numbers to 6 decimal places
-            json_data = self._format_numbers(json_data)
-            
-            # Render HTML
-            # Note: lp_name is already in json_data, don't pass it again
-            html_output = template.render(
-                **json_data,
-                fund_name=fund_name,
-                css_path=str(base_path),
-                generated_on=datetime.now().strftime("%B %d, %Y")
-            )
-            
-            # Generate PDF filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            fund_id = self.current_file['fund_id'] if self.current_file else 'unknown'
-            pdf_filename = f"PCAP_Statement_{fund_id}_{lp_id}_{timestamp}.pdf"
-            
-            # Determine output directory
-            if output_dir:
-                output_path = Path(output_dir) / pdf_filename
-            else:
-                output_path = Path(tempfile.gettempdir()) / pdf_filename
-            
             # Generate PDF
-            HTML(string=html_output, base_url=str(base_path)).write_pdf(str(output_path))
+            write_pdf(job.html, job.base_url, job.output_path)
             
-            print(f"PDF generated: {output_path}")
-            return str(output_path)
+            print(f"PDF generated: {job.output_path}")
+            return job.output_path
             
         except Exception as e:
             print(f"Error generating PDF: {e}")
@@ -702,6 +664,49 @@ class PCAPExcelProcessor:
             traceback.print_exc()
             return None
     
+    def _statement_job(self, lp_id: str, fund_name: str = None, output_dir: str = None) -> Optional[PDFJob]:
+        """Rendered statement HTML of an LP and the path its PDF goes to"""
+        # Get JSON data for the LP
+        json_data = self.parse_excel_to_json(lp_id)
+        
+        if not json_data:
+            print(f"No data available for LP: {lp_id}")
+            return None
+        
+        # Auto-detect fund name if not provided
+        if not fund_name:
+            fund_name = self.get_fund_name_from_lp(lp_id)
+            print(f"Auto-detected fund name: {fund_name}")
+        
+        # Set up paths; the template is compiled once per process
+        base_path = Path(__file__).parent.parent / "PDF Creator"
+        template = get_template(str(base_path / "templates"))
+        
+        # Format numbers to 6 decimal places
+        json_data = self._format_numbers(json_data)
+        
+        # Render HTML
+        # Note: lp_name is already in json_data, don't pass it again
+        html_output = template.render(
+            **json_data,
+            fund_name=fund_name,
+            css_path=str(base_path),
+            generated_on=datetime.now().strftime("%B %d, %Y")
+        )
+        
+        # Generate PDF filename
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        fund_id = self.current_file['fund_id'] if self.current_file else 'unknown'
+        pdf_filename = f"PCAP_Statement_{fund_id}_{lp_id}_{timestamp}.pdf"
+        
+        # Determine output directory
+        if output_dir:
+            output_path = Path(output_dir) / pdf_filename
+        else:
+            output_path = Path(tempfile.gettempdir()) / pdf_filename
+        
+        return PDFJob(name=lp_id, html=html_output, output_path=str(output_path), base_url=str(base_path))
+    
     def _format_numbers(self, data: Dict) -> Dict:
         """Format numbers in JSON data to 6 decimal places"""
         def format_value(val):
@@ -721,25 +726,45 @@ class PCAPExcelProcessor:
         
         return format_value(data)
     
-    def generate_all_lp_pdfs(self, fund_name: str = None, output_dir: str = None) -> List[str]:
+    def generate_all_lp_pdfs(self, fund_name: str = None, output_dir: str = None,
+                             progress: Optional[Callable] = None, zip_path: str = None,
+                             max_workers: int = None) -> List[str]:
         """
         Generate PDF statements for all LPs
         
+        Statement HTML is rendered here one LP at a time as PDF workers free
+        up; the PDF layout runs on a process pool (services.pdf_renderer).
+        
         Args:
             fund_name: Name of the fund (optional, will auto-detect from LP IDs)
             output_dir: Directory to save PDFs
+            progress: progress(done, total, lp_id, path or None) after each PDF
+            zip_path: If given, also bundle the PDFs into this zip
+            max_workers: Worker processes (default PDF_RENDER_WORKERS)
             
         Returns:
             List of generated PDF file paths
         """
-        pdf_files = []
-        
-        for lp_id in self.available_lps:
-            # Auto-detect fund name for each LP if not provided
-            lp_fund_name = fund_name if fund_name else self.get_fund_name_from_lp(lp_id)
-            pdf_path = self.generate_pdf(lp_id, lp_fund_name, output_dir)
-            if pdf_path:
-                pdf_files.append(pdf_path)
+        if not HAS_WEASYPRINT:
+            print("WeasyPrint not available - PDF generation disabled")
+            return []
+        
+        lp_ids = list(self.available_lps)
+        
+        def jobs():
+            for lp_id in lp_ids:
+                try:
+                    # Auto-detect fund name for each LP if not provided
+                    lp_fund_name = fund_name if fund_name else self.get_fund_name_from_lp(lp_id)
+                    job = self._statement_job(lp_id, lp_fund_name, output_dir)
+                except Exception as e:
+                    print(f"Error preparing statement for {lp_id}: {e}")
+                    job = None
+                if job is not None:
+                    yield job
+        
+        pdf_files = render_pdfs(jobs(), total=len(lp_ids), max_workers=max_workers,
+                                progress=progress, zip_path=zip_path)
         
         print(f"Generated {len(pdf_files)} PDF statements")
         return pdf_files
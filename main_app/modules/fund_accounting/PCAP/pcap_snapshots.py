@@ -0,0 +1,366 @@
+"""
+PCAP Snapshots - month-over-month roll-forward of the PCAP allocation
+
+Running the allocation from fund inception on every PCAP generation redoes
+every closed month although only the newest one changes after a close.
+PCAPSnapshotStore keeps, per fund and closed month, a versioned snapshot of
+what that month left behind and what it produced:
+
+- state: each LP's ending balance on the month's last grid day, the P&L
+  still deferred (the allocation's deferred buckets, in order) and each
+  LP's inception-to-date GP incentive
+- output: the month's grid rows, allocation rows and allocation summary,
+  so reports still see the full history
+- gl_fingerprint: an order-insensitive content hash of the month's GL lines
+- input_fingerprint: the same over the month's grid rows and fund P&L rows,
+  so a grid for another set of LPs never reuses the month
+
+run_incremental_pcap_allocation() reuses the longest run of leading closed
+months whose fingerprints are unchanged, restores the state of the last
+one and allocates only the days after it. A back-dated GL change therefore
+shows up as a fingerprint mismatch and forces recomputation from the month
+it touched onward. Results are identical to a full
+run_partner_capital_pcap_allocation() over the whole grid.
+
+S3 layout (under s3_utils.PCAP_SNAPSHOT_PREFIX):
+
+    <fund_id>/_manifest.json
+    <fund_id>/<YYYY-MM>/v<version>-{grid,alloc,summary}.parquet
+
+Snapshot objects are immutable (a recomputed month gets a new version), so
+they are cached in memory once read; the manifest is the only object
+overwritten.
+snapshot_store() keeps one store per fund for the session; the app's PCAP
+generation (fund_accounting.simple_pcap_function) allocates through it.
+"""
+
+import json
+import logging
+import threading
+from decimal import Decimal
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from ....s3_utils import BUCKET_NAME, PCAP_SNAPSHOT_PREFIX, get_s3_client
+from ....services.gl_store import fingerprint, row_hashes, to_utc
+from .pcap import run_partner_capital_pcap_allocation
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.json"
+# 2: entries carry input_fingerprint
+MANIFEST_FORMAT = 2
+
+SNAPSHOT_TABLES = ("grid", "alloc", "summary")
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def period_labels(dates: pd.Series) -> pd.Series:
+    """Month label ("YYYY-MM") of every date; naive dates are taken as UTC."""
+    return to_utc(dates).dt.strftime("%Y-%m")
+
+
+def gl_period_fingerprints(gl: pd.DataFrame, date_column: str = "date") -> Dict[str, int]:
+    """
+    Content fingerprint of the GL lines of every month.
+
+    Uses the GL store's row hashes, so the fingerprint does not depend on row
+    or column order or on whether amounts were loaded as Decimal or float.
+    """
+    if gl is None or gl.empty or date_column not in gl.columns:
+        return {}
+    hashes = pd.Series(row_hashes(gl, date_columns=(date_column,)), index=gl.index)
+    return {label: fingerprint(part.to_numpy(dtype="uint64"))
+            for label, part in hashes.groupby(period_labels(gl[date_column]).to_numpy())}
+
+
+def input_period_fingerprints(grid: pd.DataFrame, fund_pnl_by_group: pd.DataFrame) -> Dict[str, int]:
+    """
+    Content fingerprint of the allocation inputs of every month: the grid
+    rows (which LPs, their flows and balances) and the fund P&L rows.
+    """
+    fingerprints: Dict[str, int] = {}
+    for frame in (grid, fund_pnl_by_group):
+        for label, value in gl_period_fingerprints(frame).items():
+            fingerprints[label] = (fingerprints.get(label, 0) + value) % (1 << 64)
+    return fingerprints
+
+
+def _decimal_columns(df: pd.DataFrame) -> List[str]:
+    """Object columns holding only Decimals (and nulls)."""
+    columns = []
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        present = df[col].dropna()
+        if len(present) and all(isinstance(v, Decimal) for v in present):
+            columns.append(col)
+    return columns
+
+
+def _to_parquet(df: pd.DataFrame) -> Tuple[bytes, List[str]]:
+    """Parquet bytes with Decimal columns stored as exact strings."""
+    decimals = _decimal_columns(df)
+    stored = df.copy()
+    for col in decimals:
+        stored[col] = [None if v is None else str(v) for v in stored[col]]
+    buffer = BytesIO()
+    stored.to_parquet(buffer, index=False)
+    return buffer.getvalue(), decimals
+
+
+def _from_parquet(data: bytes, decimals: List[str]) -> pd.DataFrame:
+    df = pq.read_table(BytesIO(data)).to_pandas()
+    for col in decimals:
+        df[col] = pd.Series([None if v is None else Decimal(v) for v in df[col]], index=df.index, dtype=object)
+    return df
+
+
+def _native(value):
+    """JSON-safe form of a numpy scalar."""
+    return value.item() if hasattr(value, "item") else value
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class PCAPSnapshotStore:
+    """
+    Closed-month PCAP snapshots of one fund on S3.
+
+    Args:
+        fund_id: Fund the snapshots belong to
+        s3_client: boto3 S3 client (default: s3_utils.get_s3_client())
+        bucket: S3 bucket
+        prefix: Key prefix all funds' snapshots live under
+    """
+
+    def __init__(self, fund_id: str, s3_client=None, bucket: str = BUCKET_NAME,
+                 prefix: str = PCAP_SNAPSHOT_PREFIX):
+        self.fund_id = fund_id
+        self.s3 = s3_client or get_s3_client()
+        self.bucket = bucket
+        self.prefix = f"{prefix.rstrip('/')}/{fund_id}/"
+        self.manifest_key = self.prefix + MANIFEST_NAME
+        self._cache: Dict[str, pd.DataFrame] = {}
+        self.stats = {
+            "periods_restored": 0,
+            "periods_allocated": 0,
+            "snapshots_saved": 0,
+            "days_allocated": 0,
+        }
+
+    def manifest(self) -> Dict[str, Any]:
+        """Current manifest ({"format", "periods": [...]}, oldest period first)."""
+        try:
+            obj = self.s3.get_object(Bucket=self.bucket, Key=self.manifest_key)
+            return json.loads(obj["Body"].read())
+        except self.s3.exceptions.NoSuchKey:
+            return {"format": MANIFEST_FORMAT, "periods": []}
+        except Exception as e:
+            logger.error(f"Failed to read PCAP snapshot manifest for {self.fund_id}: {e}")
+            return {"format": MANIFEST_FORMAT, "periods": []}
+
+    def _table_key(self, period: str, version: int, table: str) -> str:
+        return f"{self.prefix}{period}/v{version}-{table}.parquet"
+
+    def save_period(self, entry: Dict[str, Any], tables: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Write a period's output tables under the entry's version.
+
+        Args:
+            entry: Manifest entry (period, version, state, gl_fingerprint)
+            tables: DataFrame per name in SNAPSHOT_TABLES
+
+        Returns:
+            The entry with the Decimal columns of each table recorded
+        """
+        entry = dict(entry, decimal_columns={})
+        for table in SNAPSHOT_TABLES:
+            key = self._table_key(entry["period"], entry["version"], table)
+            body, decimals = _to_parquet(tables[table])
+            self.s3.put_object(Bucket=self.bucket, Key=key, Body=body)
+            entry["decimal_columns"][table] = decimals
+            self._cache[key] = tables[table]
+        self.stats["snapshots_saved"] += 1
+        return entry
+
+    def load_period(self, entry: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+        """Output tables of a manifest entry."""
+        tables = {}
+        for table in SNAPSHOT_TABLES:
+            key = self._table_key(entry["period"], entry["version"], table)
+            if key not in self._cache:
+                obj = self.s3.get_object(Bucket=self.bucket, Key=key)
+                self._cache[key] = _from_parquet(obj["Body"].read(), entry["decimal_columns"][table])
+            tables[table] = self._cache[key].copy()
+        return tables
+
+    def commit(self, periods: List[Dict[str, Any]], previous: List[Dict[str, Any]]) -> None:
+        """Write the manifest, then delete snapshot objects it no longer lists."""
+        body = json.dumps({"format": MANIFEST_FORMAT, "periods": periods}, separators=(",", ":"))
+        self.s3.put_object(Bucket=self.bucket, Key=self.manifest_key, Body=body.encode())
+
+        live = {(p["period"], p["version"]) for p in periods}
+        for entry in previous:
+            if (entry["period"], entry["version"]) in live:
+                continue
+            for table in SNAPSHOT_TABLES:
+                key = self._table_key(entry["period"], entry["version"], table)
+                self._cache.pop(key, None)
+                try:
+                    self.s3.delete_object(Bucket=self.bucket, Key=key)
+                except Exception as e:
+                    logger.warning(f"Failed to delete stale PCAP snapshot {key}: {e}")
+
+
+# Stores are kept per fund for the session so snapshot tables read once stay cached
+_stores: Dict[str, PCAPSnapshotStore] = {}
+_stores_lock = threading.Lock()
+
+
+def snapshot_store(fund_id: str) -> PCAPSnapshotStore:
+    """The session's snapshot store of a fund (created on first use)."""
+    with _stores_lock:
+        if fund_id not in _stores:
+            _stores[fund_id] = PCAPSnapshotStore(fund_id)
+        return _stores[fund_id]
+
+
+# ============================================================================
+# INCREMENTAL ALLOCATION
+# ============================================================================
+
+def _encode_state(balances, deferred, gp_incentive_itd) -> Dict[str, Any]:
+    return {
+        "balances": {lp: str(v) for lp, v in balances.items()},
+        "deferred": [[scpc, _native(rank), str(amount)] for (scpc, rank), amount in deferred.items()],
+        "gp_incentive_itd": {lp: str(v) for lp, v in gp_incentive_itd.items()},
+    }
+
+
+def _decode_state(state: Dict[str, Any]):
+    balances = {lp: Decimal(v) for lp, v in state["balances"].items()}
+    deferred = {(scpc, rank): Decimal(amount) for scpc, rank, amount in state["deferred"]}
+    gp_incentive_itd = {lp: Decimal(v) for lp, v in state["gp_incentive_itd"].items()}
+    return balances, deferred, gp_incentive_itd
+
+
+def _reusable_periods(manifest_periods, periods, closed, fingerprints, input_fingerprints):
+    """Leading manifest entries that still match the grid, the fund P&L and the GL."""
+    reusable = []
+    for entry, period in zip(manifest_periods, periods):
+        if (entry.get("period") != period or period not in closed
+                or entry.get("gl_fingerprint") != fingerprints.get(period, 0)
+                or entry.get("input_fingerprint") != input_fingerprints.get(period, 0)):
+            break
+        reusable.append(entry)
+    return reusable
+
+
+def run_incremental_pcap_allocation(grid, fund_pnl_by_group, gl, store: PCAPSnapshotStore,
+                                    closed_through: Optional[str] = None):
+    """
+    run_partner_capital_pcap_allocation, restarted from the last closed month.
+
+    Months before the grid's latest month are closed (or, with
+    closed_through, every month up to and including that "YYYY-MM" label).
+    Closed months already snapshotted from the same grid rows, fund P&L
+    and GL lines are restored; the remaining months are allocated one after the other,
+    carrying ending balances and deferred P&L across, and each closed one is
+    snapshotted. Grids with duplicate or missing (LP, date) keys are
+    allocated in full without snapshots.
+
+    Args:
+        grid: PCAP grid from inception, as for run_partner_capital_pcap_allocation
+        fund_pnl_by_group: Fund P&L rows, as for run_partner_capital_pcap_allocation
+        gl: GL lines the grid and P&L were built from (date column required)
+        store: Snapshot store of the fund
+        closed_through: Last closed month
+
+    Returns:
+        (grid, alloc_rows, allocation_summary_df), identical to a full run
+    """
+    keys = ['limited_partner_ID', 'date']
+    if grid.empty or grid.duplicated(keys).any() or grid[keys].isna().any().any():
+        logger.info("PCAP grid cannot be split by month - running full allocation")
+        return run_partner_capital_pcap_allocation(grid, fund_pnl_by_group)
+
+    labels = period_labels(grid['date'])
+    periods = sorted(labels.unique())
+    if closed_through is None:
+        closed = set(periods[:-1])
+    else:
+        closed = {p for p in periods if p <= closed_through}
+
+    fingerprints = gl_period_fingerprints(gl)
+    input_fingerprints = input_period_fingerprints(grid, fund_pnl_by_group)
+    manifest_periods = store.manifest().get("periods", [])
+    reusable = _reusable_periods(manifest_periods, periods, closed, fingerprints, input_fingerprints)
+    logger.info(f"PCAP snapshots: reusing {len(reusable)} of {len(periods)} months for {store.fund_id}")
+
+    grids, alloc_rows, summaries = [], [], []
+    balances, deferred, gp_incentive_itd = {}, {}, {}
+    for entry in reusable:
+        tables = store.load_period(entry)
+        grids.append(tables["grid"])
+        alloc_rows.extend(tables["alloc"].to_dict("records"))
+        summaries.append(tables["summary"])
+        store.stats["periods_restored"] += 1
+    if reusable:
+        balances, deferred, gp_incentive_itd = _decode_state(reusable[-1]["state"])
+
+    versions = {entry["period"]: entry["version"] for entry in manifest_periods}
+    saved = list(reusable)
+    for period in periods[len(reusable):]:
+        chunk = grid[(labels == period).to_numpy()].copy()
+        if 'beg_bal' not in chunk.columns:
+            chunk['beg_bal'] = Decimal('0')
+
+        # LPs on the previous grid day carry their ending balance into the first day
+        first_day = chunk['date'] == chunk['date'].min()
+        carried = first_day & chunk['limited_partner_ID'].isin(list(balances))
+        chunk.loc[carried, 'beg_bal'] = chunk.loc[carried, 'limited_partner_ID'].map(balances)
+
+        period_grid, period_rows, period_summary = run_partner_capital_pcap_allocation(
+            chunk, fund_pnl_by_group, deferred)
+        grids.append(period_grid)
+        alloc_rows.extend(period_rows)
+        summaries.append(period_summary)
+        store.stats["periods_allocated"] += 1
+        store.stats["days_allocated"] += period_grid['date'].nunique()
+
+        last_day = period_grid[period_grid['date'] == period_grid['date'].max()]
+        balances = dict(zip(last_day['limited_partner_ID'], last_day['end_bal']))
+        if 'gp_incentive_amt' in period_grid.columns:
+            for lp, amount in period_grid.groupby('limited_partner_ID')['gp_incentive_amt'].sum().items():
+                gp_incentive_itd[lp] = gp_incentive_itd.get(lp, Decimal('0')) + amount
+
+        if period in closed:
+            entry = {
+                "period": period,
+                "version": versions.get(period, 0) + 1,
+                "gl_fingerprint": fingerprints.get(period, 0),
+                "input_fingerprint": input_fingerprints.get(period, 0),
+                "state": _encode_state(balances, deferred, gp_incentive_itd),
+            }
+            saved.append(store.save_period(entry, {
+                "grid": period_grid,
+                "alloc": pd.DataFrame(period_rows),
+                "summary": period_summary,
+            }))
+
+    if saved != manifest_periods:
+        store.commit(saved, manifest_periods)
+
+    full_grid = pd.concat(grids, ignore_index=True).sort_values(keys).reset_index(drop=True)
+    summaries = [s for s in summaries if not s.empty]
+    allocation_summary_df = pd.concat(summaries, ignore_index=True) if summaries else pd.DataFrame()
+    return full_grid, alloc_rows, allocation_summary_df
@@ -0,0 +1,326 @@
+"""
+Balance Engine for Fund Accounting
+
+Builds the full (date x account) cumulative balance matrix from the general
+ledger in one vectorized pass, so NAV series, daily trial balances and KPI
+boxes can be read as slices instead of re-filtering the GL for every date.
+
+The GL is grouped once into per-date, per-account net movements
+(debit - credit), and a cumulative sum over the date axis gives the running
+debit-normal balance of every account at every posting date. New GL rows can
+be appended later; only the part of the matrix on or after the earliest new
+date is recomputed.
+"""
+
+from typing import Dict, Optional, Tuple
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Account number prefixes with a normal credit balance:
+# 2xxx Liabilities, 3xxx Equity, 4xxx Income/Revenue, 9xxx Other Income.
+# Everything else (1xxx Assets, 8xxx Expenses, unknown) is debit normal.
+CREDIT_NORMAL_PREFIXES = ('2', '3', '4', '9')
+
+
+class BalanceEngine:
+    """Cumulative per-account balance matrix over GL posting dates"""
+
+    def __init__(self, gl_df: Optional[pd.DataFrame] = None,
+                 date_col: str = 'date',
+                 account_col: str = 'GL_Acct_Number',
+                 debit_col: str = 'debit_crypto',
+                 credit_col: str = 'credit_crypto'):
+        """
+        Initialize the engine, optionally seeding it with GL rows
+
+        Args:
+            gl_df: GL frame with date, account number, debit and credit columns
+            date_col: Name of the posting date column
+            account_col: Name of the GL account number column
+            debit_col: Name of the debit amount column
+            credit_col: Name of the credit amount column
+        """
+        self.date_col = date_col
+        self.account_col = account_col
+        self.debit_col = debit_col
+        self.credit_col = credit_col
+
+        # Net debit movement per posting date (rows) and account (columns)
+        self._movements = pd.DataFrame(dtype=float)
+        # Running debit-normal balance per posting date and account
+        self._balances = pd.DataFrame(dtype=float)
+        # First posting date per account, used to hide not-yet-active accounts
+        self._first_seen = pd.Series(dtype='datetime64[ns]')
+
+        # Per-row content hashes of ingested rows so callers can detect a pure append
+        self.rows_ingested = 0
+        self._row_hashes = np.empty(0, dtype='uint64')
+
+        if gl_df is not None:
+            self.append(gl_df)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _prepare(self, gl_df: pd.DataFrame) -> pd.DataFrame:
+        """Reduce GL rows to (date, account, net debit movement)"""
+        dates = gl_df[self.date_col]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+
+        debit = pd.to_numeric(gl_df[self.debit_col], errors='coerce').fillna(0).astype(float)
+        credit = pd.to_numeric(gl_df[self.credit_col], errors='coerce').fillna(0).astype(float)
+
+        frame = pd.DataFrame({
+            'date': dates.reset_index(drop=True),
+            'account': gl_df[self.account_col].astype(str).reset_index(drop=True),
+            'net': (debit - credit).reset_index(drop=True),
+        })
+        return frame[frame['date'].notna()]
+
+    def _fingerprint(self, gl_df: pd.DataFrame) -> np.ndarray:
+        """Exact content hash of every GL row over date, account, debit and credit"""
+        dates = gl_df[self.date_col]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+        if getattr(dates.dt, 'tz', None) is not None:
+            dates = dates.dt.tz_convert('UTC')
+        content = pd.DataFrame({
+            'date': dates.reset_index(drop=True),
+            'account': gl_df[self.account_col].astype(str).reset_index(drop=True),
+            'debit': pd.to_numeric(gl_df[self.debit_col], errors='coerce').fillna(0).astype(float).reset_index(drop=True),
+            'credit': pd.to_numeric(gl_df[self.credit_col], errors='coerce').fillna(0).astype(float).reset_index(drop=True),
+        })
+        return pd.util.hash_pandas_object(content, index=False).to_numpy(dtype='uint64')
+
+    def append(self, new_rows: pd.DataFrame) -> None:
+        """
+        Add GL rows to the engine
+
+        Rows dated after the current last date only extend the matrix. Rows
+        that are back-dated or share an existing date cause the cumulative
+        balances to be recomputed from that date onward, never from inception.
+
+        Args:
+            new_rows: GL rows with the engine's date/account/debit/credit columns
+        """
+        if new_rows is None or new_rows.empty:
+            return
+
+        self._row_hashes = np.concatenate([self._row_hashes, self._fingerprint(new_rows)])
+        self.rows_ingested = len(self._row_hashes)
+
+        frame = self._prepare(new_rows)
+        if frame.empty:
+            return
+
+        moves = frame.groupby(['date', 'account'], sort=True)['net'].sum().unstack(fill_value=0.0)
+        first_seen = frame.groupby('account')['date'].min()
+
+        if self._movements.empty:
+            self._movements = moves
+            self._balances = moves.cumsum()
+            self._first_seen = first_seen
+            return
+
+        start = moves.index.min()
+        movements = self._movements.add(moves, fill_value=0.0).fillna(0.0)
+        columns = movements.columns
+
+        pos = int(movements.index.searchsorted(start, side='left'))
+        if pos > 0:
+            carried = self._balances.iloc[pos - 1].reindex(columns, fill_value=0.0).values
+        else:
+            carried = np.zeros(len(columns))
+
+        head = self._balances.iloc[:pos].reindex(columns=columns, fill_value=0.0)
+        tail = movements.iloc[pos:].cumsum() + carried
+
+        self._movements = movements
+        self._balances = pd.concat([head, tail])
+        self._first_seen = pd.concat([self._first_seen, first_seen]).groupby(level=0).min()
+
+    def matches_prefix(self, gl_df: pd.DataFrame) -> bool:
+        """Check whether the first rows of gl_df are exactly the rows already ingested"""
+        if len(gl_df) < self.rows_ingested:
+            return False
+        return np.array_equal(self._fingerprint(gl_df.iloc[:self.rows_ingested]), self._row_hashes)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def empty(self) -> bool:
+        return self._balances.empty
+
+    @property
+    def dates(self) -> pd.Index:
+        """Sorted unique GL posting dates"""
+        return self._balances.index
+
+    @property
+    def accounts(self) -> pd.Index:
+        """GL account numbers (as strings) seen so far"""
+        return self._balances.columns
+
+    def _coerce_date(self, target_date) -> pd.Timestamp:
+        """Align a comparison date with the timezone of the date index"""
+        target = pd.Timestamp(target_date)
+        index_tz = getattr(self.dates, 'tz', None)
+        if index_tz is not None:
+            if target.tz is None:
+                target = target.tz_localize('UTC')
+            target = target.tz_convert(index_tz)
+        elif target.tz is not None:
+            target = target.tz_localize(None)
+        return target
+
+    def _position(self, target_date) -> int:
+        """Row of the last posting date on or before target_date (-1 if none)"""
+        if self.empty:
+            return -1
+        target = self._coerce_date(target_date)
+        return int(self.dates.searchsorted(target, side='right')) - 1
+
+    def _sign_vector(self, accounts: pd.Index) -> np.ndarray:
+        """+1 for debit-normal accounts, -1 for credit-normal accounts"""
+        credit_normal = accounts.str.startswith(CREDIT_NORMAL_PREFIXES)
+        return np.where(credit_normal, -1.0, 1.0)
+
+    def balances_at(self, target_date, signed: bool = True) -> pd.Series:
+        """
+        Account balances as of target_date (inclusive)
+
+        Args:
+            target_date: Cut-off date
+            signed: Apply normal-balance sign (credit-normal accounts positive)
+
+        Returns:
+            Series indexed by account number, only accounts active by that date
+        """
+        pos = self._position(target_date)
+        if pos < 0:
+            return pd.Series(dtype=float)
+
+        row = self._balances.iloc[pos]
+        active = self._first_seen.reindex(row.index) <= self.dates[pos]
+        row = row[active.values]
+        if signed:
+            row = row * self._sign_vector(row.index)
+        return row
+
+    def nav_at(self, target_date) -> Tuple[float, float, float]:
+        """
+        Assets, liabilities and NAV as of target_date
+
+        Assets (1xxx) are debit normal, liabilities (2xxx) credit normal,
+        and NAV = assets - liabilities.
+        """
+        pos = self._position(target_date)
+        if pos < 0:
+            return 0, 0, 0
+
+        row = self._balances.iloc[pos]
+        accounts = row.index
+        total_assets = row[accounts.str.startswith('1')].sum()
+        total_liabilities = -row[accounts.str.startswith('2')].sum()
+        return total_assets, total_liabilities, total_assets - total_liabilities
+
+    def prefix_totals(self, prefixes) -> pd.Series:
+        """
+        Debit-normal balance summed over accounts starting with any prefix
+
+        Args:
+            prefixes: Account number prefix or tuple of prefixes, e.g. ('4', '9')
+
+        Returns:
+            Series indexed by GL posting date
+        """
+        if self.empty:
+            return pd.Series(dtype=float)
+        mask = self.accounts.str.startswith(prefixes)
+        return self._balances.loc[:, mask].sum(axis=1)
+
+    def nav_frame(self) -> pd.DataFrame:
+        """Assets, liabilities and NAV for every GL posting date"""
+        if self.empty:
+            return pd.DataFrame(columns=['date', 'assets', 'liabilities', 'nav'])
+
+        assets = self.prefix_totals('1')
+        liabilities = -self.prefix_totals('2')
+
+        return pd.DataFrame({
+            'date': self.dates,
+            'assets': assets.values,
+            'liabilities': liabilities.values,
+            'nav': (assets - liabilities).values,
+        })
+
+    def daily_balances(self) -> pd.DataFrame:
+        """
+        Melted trial balance: one row per (posting date, active account)
+
+        Returns:
+            DataFrame with 'Report Date', 'GL_Acct_Number' and signed 'Balance'
+        """
+        if self.empty:
+            return pd.DataFrame(columns=['Report Date', 'GL_Acct_Number', 'Balance'])
+
+        accounts = self.accounts
+        dates = self.dates
+        values = self._balances.values * self._sign_vector(accounts)
+        first_seen = self._first_seen.reindex(accounts).values
+
+        date_idx, acct_idx = np.nonzero(first_seen[None, :] <= dates.values[:, None])
+
+        return pd.DataFrame({
+            'Report Date': dates[date_idx],
+            'GL_Acct_Number': accounts.values[acct_idx],
+            'Balance': values[date_idx, acct_idx],
+        })
+
+
+# Engines are kept per scope (e.g. 'all' or a fund id) so switching between a
+# fund-filtered and an unfiltered GL does not throw away the other's matrix.
+_engines: Dict[str, BalanceEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_balance_engine(gl_df: pd.DataFrame, scope: str = 'all') -> BalanceEngine:
+    """
+    Return a balance engine for gl_df, reusing the cached one when possible
+
+    If gl_df starts with exactly the rows the cached engine already holds,
+    only the new trailing rows are appended; otherwise the engine is rebuilt.
+
+    Args:
+        gl_df: Prepared GL frame (see helpers.gl_data_for_fund)
+        scope: Cache slot, typically the fund id or 'all'
+
+    Returns:
+        BalanceEngine covering every row of gl_df
+    """
+    with _engines_lock:
+        engine = _engines.get(scope)
+
+        if engine is not None and engine.matches_prefix(gl_df):
+            if len(gl_df) > engine.rows_ingested:
+                engine.append(gl_df.iloc[engine.rows_ingested:])
+            return engine
+
+        engine = BalanceEngine(gl_df)
+        _engines[scope] = engine
+        return engine
+
+
+def clear_balance_engines() -> None:
+    """Drop all cached balance engines"""
+    with _engines_lock:
+        _engines.clear()
@@ -372,29 +372,22 @@ def register_outputs(output, input, selected_fund=None, selected_report_date=Non
             end = data_end
         return start, end
 
+    @reactive.calc
+    def balance_engine():
+        """Cumulative balance matrix for the selected fund's GL"""
+        from .balance_engine import get_balance_engine
+        fund_id = selected_fund() if selected_fund and hasattr(selected_fund, '__call__') else None
+        return get_balance_engine(gl_data(), scope=f"fund:{fund_id or 'all'}")
+
     @reactive.calc
     def contributed_capital():
         """Calculate contributed capital (equity accounts 3xxx)"""
-        df = gl_data()
-        if df.empty:
-            return 0
-            
-        latest_date = df['date'].max()
-        from ..financial_reporting.data_processor import safe_date_compare
-        historical_df = df[safe_date_compare(df['date'], latest_date)].copy()
-        historical_df['GL_Acct_Number'] = historical_df['GL_Acct_Number'].astype(str)
-        
-        # Filter for equity accounts (3xxx)
-        equity_df = historical_df[historical_df['GL_Acct_Number'].str.startswith('3')]
-        
-        if equity_df.empty:
+        engine = balance_engine()
+        if engine.empty:
             return 0
         
         # Equity accounts have normal credit balance
-        total_credits = equity_df['credit_crypto'].sum()
-        total_debits = equity_df['debit_crypto'].sum()
-        
-        return total_credits - total_debits
+        return -engine.prefix_totals('3').iloc[-1]
 
     @output
     @render.data_frame
@@ -429,33 +422,18 @@ def register_outputs(output, input, selected_fund=None, selected_report_date=Non
     @reactive.calc
     def net_income_series():
         """Calculate net income over time (income - expenses)"""
-        df = gl_data()
-        if df.empty:
+        engine = balance_engine()
+        if engine.empty:
             return pd.Series(dtype=float)
-            
-        df['GL_Acct_Number'] = df['GL_Acct_Number'].astype(str)
         
-        # Get unique dates
-        unique_dates = sorted(df['date'].dropna().unique())
+        # Income accounts (4xxx and 9xxx) - normal credit balance, flip sign for positive display
+        total_income = -engine.prefix_totals(('4', '9'))
         
-        income_data = []
-        for date in unique_dates:
-            from ..financial_reporting.data_processor import safe_date_compare
-            historical_df = df[safe_date_compare(df['date'], date)].copy()
-            
-            # Income accounts (4xxx and 9xxx) - normal credit balance, flip sign for positive display
-            income_df = historical_df[historical_df['GL_Acct_Number'].str.match(r'^[49]')]
-            total_income = income_df['credit_crypto'].sum() - income_df['debit_crypto'].sum()
-            
-            # Expense accounts (8xxx) - normal debit balance, flip sign for positive display  
-            expense_df = historical_df[historical_df['GL_Acct_Number'].str.startswith('8')]
-            total_expenses = -(expense_df['debit_crypto'].sum() - expense_df['credit_crypto'].sum())
-            
-            net_income = total_income - total_expenses
-            income_data.append({'date': date, 'net_income': net_income})
+        # Expense accounts (8xxx) - normal debit balance, flip sign for positive display
+        total_expenses = -engine.prefix_totals('8')
         
-        income_df = pd.DataFrame(income_data)
-        income_series = pd.Series(income_df['net_income'].values, index=pd.DatetimeIndex(income_df['date']))
+        net_income = total_income - total_expenses
+        income_series = pd.Series(net_income.values, index=pd.DatetimeIndex(engine.dates))
         
         return income_series.sort_index()
     
@@ -696,318 +674,6 @@ def register_outputs(output, input, selected_fund=None, selected_report_date=Non
             return f"${amount:,.2f}"
     @output
     @render.ui
-    def pcap_status():
-        """Display PCAP generation status"""
-        return ui.p("Ready to generate PCAP", class_="text-muted")
-    
-    def format_currency_amount(amount, currency):
-        """Format amount based on currency type"""
-        if currency == 'ETH':
-            return f"{amount:,.6f} ETH"
-            print("\n=== Data Source Check ===")
-            print(f"GL Data: {len(gl_df)} records")
-            
-            # TODO: Add these data sources when available
-            print("WARN:LP Commitments: Not loaded (would contain commitment amounts, terms)")
-            print("WARN:COA Data: Not loaded (would help classify accounts)")
-            print("WARN:Master TB: Not loaded (would provide additional balances)")
-            print("WARN:Wallet Mappings: Not loaded (would map crypto addresses)")
-            
-            # Create date range with proper timezone handling
-            from .PCAP.excess import ensure_timezone_aware
-            
-            try:
-                min_date = gl_df['date'].min()
-                max_date = gl_df['date'].max()
-                
-                print(f"Date range extraction: min={min_date}, max={max_date}")
-                
-                # Ensure as_of_date is timezone-aware to match GL data
-                as_of_date_tz = ensure_timezone_aware(as_of_date)
-                
-                # Compare timezone-aware timestamps
-                max_date = min(max_date, as_of_date_tz)
-                
-                print(f"Final date range: {min_date} to {max_date}")
-                
-                # Create date range (timezone will be inherited from min_date/max_date)
-                date_range = pd.date_range(min_date, max_date, freq='D')
-                print(f"Created date range with {len(date_range)} days")
-                
-            except Exception as date_error:
-                error_msg = f"Error creating date range: {str(date_error)}"
-                print(f"Date error details: {error_msg}")
-                print(f"GL date column type: {gl_df['date'].dtype}")
-                print(f"GL date sample: {gl_df['date'].head()}")
-                pcap_data.set(pd.DataFrame())
-                pcap_summary.set({'error': error_msg})
-                return
-            
-            # Create grid and populate with actual GL transactions
-            grid_data = []
-            for lp_id in lp_ids:
-                for date in date_range:
-                    # Initialize with zeros - use column names expected by PCAP function
-                    row_data = {
-                        'limited_partner_ID': lp_id,
-                        'date': date,
-                        'cap_contrib_bod': Decimal('0'),  # Beginning of day contributions
-                        'cap_contrib_eod': Decimal('0'),  # End of day contributions
-                        'cap_dist_bod': Decimal('0'),     # Beginning of day distributions
-                        'cap_dist_eod': Decimal('0'),     # End of day distributions
-                        'mgmt_fee_amt': Decimal('0'),
-                        'gp_incentive_amt': Decimal('0'), # GP incentive fees
-                        'fund_pnl_amt': Decimal('0'),
-                        'beg_bal': Decimal('0'),          # Beginning balance
-                        'allocated_pnl': Decimal('0'),
-                        'end_bal': Decimal('0')           # Ending balance
-                    }
-                    
-                    # Get actual GL entries for this LP and date
-                    if 'limited_partner_ID' in gl_df.columns:
-                        lp_entries = gl_df[
-                            (gl_df['limited_partner_ID'] == lp_id) & 
-                            (gl_df['date'].dt.date == date.date())
-                        ]
-                        
-                        if not lp_entries.empty:
-                            # Look for capital contribution accounts (typically 3xxx accounts)
-                            contrib_entries = lp_entries[
-                                lp_entries['account_name'].str.contains('capital_contributions', case=False, na=False) |
-                                lp_entries['GL_Acct_Number'].astype(str).str.startswith('3', na=False)
-                            ]
-                            if not contrib_entries.empty:
-                                # Capital contributions: credits increase capital
-                                # For simplicity, put all contributions in End of Day
-                                row_data['cap_contrib_eod'] = Decimal(str(contrib_entries['credit_crypto'].sum()))
-                            
-                            # Look for distribution accounts
-                            dist_entries = lp_entries[
-                                lp_entries['account_name'].str.contains('distribution', case=False, na=False)
-                            ]
-                            if not dist_entries.empty:
-                                # Distributions: debits reduce capital
-                                # For simplicity, put all distributions in End of Day
-                                row_data['cap_dist_eod'] = Decimal(str(dist_entries['debit_crypto'].sum()))
-                            
-                            # Look for management fee accounts
-                            mgmt_entries = lp_entries[
-                                lp_entries['account_name'].str.contains('management|fee', case=False, na=False)
-                            ]
-                            if not mgmt_entries.empty:
-                                row_data['mgmt_fee_amt'] = Decimal(str(mgmt_entries['debit_crypto'].sum()))
-                    
-                    grid_data.append(row_data)
-            
-            grid_df = pd.DataFrame(grid_data)
-            print(f"Created PCAP grid: {len(grid_df)} rows for {len(lp_ids)} LPs over {len(date_range)} days")
-            
-            # Calculate running balances for each LP
-            print("Calculating running balances...")
-            for lp_id in lp_ids:
-                lp_mask = grid_df['limited_partner_ID'] == lp_id
-                lp_data = grid_df[lp_mask].copy().sort_values('date')
-                
-                running_balance = Decimal('0')
-                for idx, row in lp_data.iterrows():
-                    # Set beginning balance
-                    grid_df.at[idx, 'beg_bal'] = running_balance
-                    
-                    # Calculate daily change
-                    daily_contrib = (row['cap_contrib_bod'] + row['cap_contrib_eod'])
-                    daily_dist = (row['cap_dist_bod'] + row['cap_dist_eod'])
-                    daily_fees = row['mgmt_fee_amt'] + row['gp_incentive_amt']
-                    daily_pnl = row['allocated_pnl']  # Will be calculated from fund P&L later
-                    
-                    # Update running balance
-                    running_balance += daily_contrib - daily_dist - daily_fees + daily_pnl
-                    
-                    # Set ending balance
-                    grid_df.at[idx, 'end_bal'] = running_balance
-                    
-            print("Running balances calculated")
-            
-            # Calculate actual fund P&L from GL data
-            fund_pnl_by_group = {}
-            
-            # Identify P&L accounts (revenue/income and expense accounts)
-            revenue_accounts = []
-            expense_accounts = []
-            
-            if 'GL_Acct_Number' in gl_df.columns:
-                # Revenue accounts typically start with 4
-                revenue_accounts = gl_df[gl_df['GL_Acct_Number'].astype(str).str.startswith('4', na=False)]['GL_Acct_Number'].unique()
-                # Expense accounts typically start with 5, 6, 7, 8, 9
-                expense_accounts = gl_df[gl_df['GL_Acct_Number'].astype(str).str.match(r'^[56789]', na=False)]['GL_Acct_Number'].unique()
-                
-                print(f"Found {len(revenue_accounts)} revenue accounts and {len(expense_accounts)} expense accounts")
-            
-            for date in date_range:
-                # Ensure consistent timezone handling for date comparison
-                if hasattr(date, 'tz_localize') and date.tz is None:
-                    date_normalized = date.tz_localize('UTC')
-                else:
-                    date_normalized = date
-                
-                daily_gl = gl_df[gl_df['date'].dt.date == date_normalized.date()]
-                
-                if not daily_gl.empty:
-                    # Calculate P&L from revenue and expense accounts
-                    daily_revenue = Decimal('0')
-                    daily_expenses = Decimal('0')
-                    
-                    if len(revenue_accounts) > 0:
-                        revenue_entries = daily_gl[daily_gl['GL_Acct_Number'].isin(revenue_accounts)]
-                        if not revenue_entries.empty:
-                            # Revenue accounts: credits increase, debits decrease
-                            daily_revenue = Decimal(str(revenue_entries['credit_crypto'].sum() - revenue_entries['debit_crypto'].sum()))
-                    
-                    if len(expense_accounts) > 0:
-                        expense_entries = daily_gl[daily_gl['GL_Acct_Number'].isin(expense_accounts)]
-                        if not expense_entries.empty:
-                            # Expense accounts: debits increase, credits decrease
-                            daily_expenses = Decimal(str(expense_entries['debit_crypto'].sum() - expense_entries['credit_crypto'].sum()))
-                    
-                    # Net income = Revenue - Expenses
-                    daily_pnl = daily_revenue - daily_expenses
-                    fund_pnl_by_group[date_normalized.strftime('%Y-%m-%d')] = daily_pnl
-                    
-                    if daily_pnl != 0:
-                        print(f"Date {date_normalized.date()}: Revenue {daily_revenue}, Expenses {daily_expenses}, Net P&L {daily_pnl}")
-                else:
-                    fund_pnl_by_group[date_normalized.strftime('%Y-%m-%d')] = Decimal('0')
-            
-            # Convert fund_pnl_by_group dict to DataFrame format expected by PCAP function
-            fund_pnl_df_list = []
-            for date_str, pnl_amount in fund_pnl_by_group.items():
-                fund_pnl_df_list.append({
-                    'date': pd.to_datetime(date_str),
-                    'SCPC': 'Net Income',  # Default SCPC category
-                    'schedule_ranking': 1,  # Default ranking
-                    'amount': float(pnl_amount)
-                })
-            
-            fund_pnl_df = pd.DataFrame(fund_pnl_df_list)
-            print(f"Created fund P&L DataFrame: {len(fund_pnl_df)} rows")
-            
-            # Run PCAP allocation
-            grid_with_allocation, alloc_rows, allocation_summary_df = run_partner_capital_pcap_allocation(grid_df, fund_pnl_df)
-            
-            # Add required columns for PCAP processing
-            if 'running_nav' not in grid_with_allocation.columns:
-                grid_with_allocation['running_nav'] = grid_with_allocation['end_bal']
-            
-            if 'gp_management_fee' not in grid_with_allocation.columns:
-                grid_with_allocation['gp_management_fee'] = Decimal('0')
-            
-            if 'gp_carried_interest' not in grid_with_allocation.columns:
-                grid_with_allocation['gp_carried_interest'] = Decimal('0')
-            
-            if 'gp_total_incentive' not in grid_with_allocation.columns:
-                grid_with_allocation['gp_total_incentive'] = Decimal('0')
-            
-            # Load COA data for PCAP generation
-            from ...s3_utils import load_COA_file
-            try:
-                df_coa = load_COA_file()
-                print(f"Loaded COA data: {len(df_coa)} records")
-                if not df_coa.empty and 'SCPC' in df_coa.columns:
-                    print(f"COA SCPCs available: {df_coa['SCPC'].nunique()}")
-                    print(f"COA columns: {list(df_coa.columns)}")
-            except Exception as coa_error:
-                print(f"Warning: Could not load COA data: {coa_error}")
-                df_coa = pd.DataFrame()
-            
-            # Create complete PCAP report with COA data
-            pcap_report = create_complete_fund_pcap_with_gp(
-                grid_with_allocation, 
-                pd.DataFrame(),  # Empty allocations_df for now
-                df_coa=df_coa
-            )
-            
-            # Calculate summary with safe column access
-            # Extract data from the new PCAP summary report structure
-            # The new format has Line_Item and ITD columns instead of daily columns
-            total_contributions = 0
-            total_distributions = 0
-            total_pnl = 0
-            fund_nav = 0
-            
-            if not pcap_report.empty and 'ITD' in pcap_report.columns and 'Line_Item' in pcap_report.columns:
-                # Extract contributions
-                contrib_rows = pcap_report[pcap_report['Line_Item'].str.contains('Capital contributions', case=False, na=False)]
-                if not contrib_rows.empty:
-                    total_contributions = float(contrib_rows['ITD'].sum())
-                
-                # Extract distributions  
-                dist_rows = pcap_report[pcap_report['Line_Item'].str.contains('Capital distributions', case=False, na=False)]
-                if not dist_rows.empty:
-                    total_distributions = float(abs(dist_rows['ITD'].sum()))  # Make positive for display
-                
-                # Extract P&L
-                pnl_rows = pcap_report[pcap_report['Line_Item'].str.contains('Allocated profit', case=False, na=False)]
-                if not pnl_rows.empty:
-                    total_pnl = float(pnl_rows['ITD'].sum())
-                
-                # Extract ending balance (NAV)
-                nav_rows = pcap_report[pcap_report['Line_Item'].str.contains('Ending capital balance', case=False, na=False)]
-                if not nav_rows.empty:
-                    fund_nav = float(nav_rows['ITD'].sum())
-            
-            print(f"[DEBUG] Fund NAV Calculation Debug ({currency}):")
-            print(f"  - PCAP Report Shape: {pcap_report.shape}")
-            print(f"  - PCAP Report Columns: {list(pcap_report.columns)}")
-            
-            # Check if date column exists for date range
-            if 'date' in pcap_report.columns and not pcap_report['date'].isna().all():
-                print(f"  - Date Range: {pcap_report['date'].min()} to {pcap_report['date'].max()}")
-            else:
-                print(f"  - Date Range: No date column in PCAP report")
-                
-            print(f"  - Total Contributions: {total_contributions:,.6f}")
-            print(f"  - Total Distributions: {total_distributions:,.6f}")
-            print(f"  - Total P&L: {total_pnl:,.6f}")
-            print(f"  - Manual NAV Calc: {total_contributions - total_distributions + total_pnl:,.6f}")
-            # The new PCAP report structure doesn't have running_nav, it's a summary report
-            print(f"  - PCAP Report Summary (ITD values from report):")
-            
-            # Try to extract NAV from the summary data
-            if not pcap_report.empty and 'ITD' in pcap_report.columns:
-                # Look for ending balance line items
-                ending_balance_rows = pcap_report[
-                    pcap_report['Line_Item'].str.contains('Ending capital balance', case=False, na=False)
-                ]
-                if not ending_balance_rows.empty:
-                    fund_nav_from_report = float(ending_balance_rows['ITD'].sum())
-                    print(f"  - Fund NAV from PCAP Report: {fund_nav_from_report:,.6f}")
-                    fund_nav = fund_nav_from_report  # Use the report value
-                else:
-                    print(f"  - No ending balance found in PCAP report")
-                    
-                # Show a sample of the report data
-                print(f"  - Sample PCAP line items:")
-                for _, row in pcap_report.head(3).iterrows():
-                    print(f"    {row['Line_Item']}: ITD = {row['ITD']:,.6f}")
-            else:
-                print(f"  - No ITD column found in PCAP report")
-            
-            print(f"  - Final Fund NAV: {fund_nav:,.6f}")
-            
-            summary = {
-                'as_of_date': as_of_date,
-                'currency': currency,
-                'total_contributions': total_contributions,
-                'total_distributions': total_distributions,
-                'fund_nav': fund_nav,
-                'gp_incentives': 0,  # Will need to extract from report if available
-                'num_lps': len(pcap_report['limited_partner_ID'].unique()) if not pcap_report.empty and 'limited_partner_ID' in pcap_report.columns else 0
-            }
-            
-            # Store results
-            pcap_data.set(pcap_report)
-            pcap_summary.set(summary)
-    @output
-    @render.ui
     def pcap_status():
         """Display PCAP generation status"""
         summary = pcap_summary.get()
@@ -1,30 +1,28 @@
 from shiny import reactive
 import pandas as pd
-from ...s3_utils import load_GL_file, load_COA_file
+from ...s3_utils import load_GL_file, load_COA_file, read_gl, TYPED_GL_AMOUNTS
+from ...services.gl_amounts import is_amount_column
+from .balance_engine import get_balance_engine
 
 def gl_data_for_fund(selected_fund=None):
-    """Load GL data with proper columns, optionally filtered by fund"""
-    gl_df = load_GL_file()
+    """
+    Load GL data with proper columns, optionally filtered by fund.
+
+    With GL_TYPED_AMOUNTS on, debit/credit and the other financial columns
+    are typed decimal amounts (see services.gl_amounts), otherwise floats.
+    """
     coa_df = load_COA_file()
+    fund_id = selected_fund() if selected_fund and hasattr(selected_fund, '__call__') else None
     
+    # A fund posting under fund_id only needs its own partitions of the GL
+    gl_df = read_gl(fund_id=fund_id, typed=TYPED_GL_AMOUNTS) if fund_id else pd.DataFrame()
     
-    # Fund fields are available for filtering
-    
-    # Filter by fund if available and fund selection exists
-    if selected_fund and hasattr(selected_fund, '__call__'):
-        fund_id = selected_fund()
-        if fund_id:
-            # Try different fund fields
-            original_shape = gl_df.shape[0]
-            
-            if 'fund_id' in gl_df.columns and fund_id in gl_df['fund_id'].values:
-                gl_df = gl_df[gl_df['fund_id'] == fund_id].copy()  # Make explicit copy
-            elif 'counterparty_fund_id' in gl_df.columns and fund_id in gl_df['counterparty_fund_id'].values:
-                gl_df = gl_df[gl_df['counterparty_fund_id'] == fund_id].copy()  # Make explicit copy
-            # Fund not found in available columns, use all data
-    else:
-        # Make a copy to avoid modifying the cached DataFrame
-        gl_df = gl_df.copy()
+    if gl_df.empty:
+        gl_df = load_GL_file(typed=TYPED_GL_AMOUNTS)
+        if fund_id and 'counterparty_fund_id' in gl_df.columns and fund_id in gl_df['counterparty_fund_id'].values:
+            gl_df = gl_df[gl_df['counterparty_fund_id'] == fund_id].copy()  # Make explicit copy
+        # Otherwise the fund is not in the available columns: use all data
+        # (load_GL_file returns a copy, so the cached DataFrame is not modified)
     
     # Create a mapping function to normalize account names
     def normalize_account_name(name):
@@ -82,9 +80,10 @@ def gl_data_for_fund(selected_fund=None):
     elif 'operating_date' in merged_df.columns:
         merged_df['date'] = pd.to_datetime(merged_df['operating_date'], errors='coerce')
     
-    # Ensure debit/credit columns are numeric
-    merged_df['debit_crypto'] = pd.to_numeric(merged_df['debit_crypto'], errors='coerce').fillna(0)
-    merged_df['credit_crypto'] = pd.to_numeric(merged_df['credit_crypto'], errors='coerce').fillna(0)
+    # Ensure debit/credit columns are numeric (typed amounts are already clean)
+    for col in ['debit_crypto', 'credit_crypto']:
+        if not is_amount_column(merged_df[col]):
+            merged_df[col] = pd.to_numeric(merged_df[col], errors='coerce').fillna(0)
     
     # If most accounts don't match COA, create fallback account numbers based on account name patterns
     if matched_accounts == 0 or matched_accounts < len(merged_df) * 0.5:
@@ -160,85 +159,38 @@ def gl_data():
     """Legacy wrapper for gl_data_for_fund"""
     return gl_data_for_fund()
 
+@reactive.calc
+def balance_engine():
+    """Cumulative (date x account) balance matrix for the GL"""
+    return get_balance_engine(gl_data())
+
 def calculate_nav_for_date(target_date=None):
-    """Calculate NAV for a specific date by summing all GL entries up to that date"""
-    df = gl_data()
+    """Calculate NAV for a specific date from the cumulative balance matrix"""
+    engine = balance_engine()
     
-    if df.empty:
+    if engine.empty:
         return 0, 0, 0  # assets, liabilities, nav
     
     # Use latest date if not specified
     if target_date is None:
-        target_date = df['date'].max()
+        target_date = engine.dates.max()
     else:
         target_date = pd.to_datetime(target_date, utc=True)
     
-    # Filter to all transactions up to and including target date
-    from ..financial_reporting.data_processor import safe_date_compare
-    historical_df = df[safe_date_compare(df['date'], target_date)].copy()
-    
-    if historical_df.empty:
-        return 0, 0, 0
-    
-    # Convert GL_Acct_Number to string for comparison
-    historical_df['GL_Acct_Number'] = historical_df['GL_Acct_Number'].astype(str)
-    
-    # Group by account and calculate net balance for each account
-    account_balances = historical_df.groupby('GL_Acct_Number').agg({
-        'debit_crypto': 'sum',
-        'credit_crypto': 'sum'
-    }).reset_index()
-    
-    # Calculate net balance based on account type - use float64 to avoid dtype warnings
-    account_balances['net_balance'] = 0.0
-    
-    # Assets (1xxx): Normal debit balance (debit - credit)
-    asset_mask = account_balances['GL_Acct_Number'].str.startswith('1')
-    account_balances.loc[asset_mask, 'net_balance'] = (
-        account_balances.loc[asset_mask, 'debit_crypto'] - 
-        account_balances.loc[asset_mask, 'credit_crypto']
-    )
-    
-    # Liabilities (2xxx): Normal credit balance (credit - debit) 
-    liability_mask = account_balances['GL_Acct_Number'].str.startswith('2')
-    account_balances.loc[liability_mask, 'net_balance'] = (
-        account_balances.loc[liability_mask, 'credit_crypto'] - 
-        account_balances.loc[liability_mask, 'debit_crypto']
-    )
-    
-    # Sum up assets and liabilities
-    total_assets = account_balances[asset_mask]['net_balance'].sum()
-    total_liabilities = account_balances[liability_mask]['net_balance'].sum()
-    
+    # Assets (1xxx) are debit normal, liabilities (2xxx) credit normal;
     # NAV = Assets - Liabilities
-    nav = total_assets - total_liabilities
-    
-    
-    return total_assets, total_liabilities, nav
+    return engine.nav_at(target_date)
 
 @reactive.calc
 def daily_nav_series():
     """Calculate NAV for each unique date in the GL"""
-    df = gl_data()
+    engine = balance_engine()
 
-    if df.empty:
+    if engine.empty:
         return pd.Series(dtype=float)
 
-    # Get unique dates
-    unique_dates = sorted(df['date'].dropna().unique())
-
-    nav_data = []
-    for i, date in enumerate(unique_dates):
-        assets, liabilities, nav = calculate_nav_for_date(date)
-        nav_data.append({
-            'date': date,
-            'assets': assets,
-            'liabilities': liabilities,
-            'nav': nav
-        })
-        if i < 3:  # Show first few calculations
-            # Debug calculations available if needed
-            pass
+    # One row per GL posting date, read straight from the balance matrix
+    nav_data = engine.nav_frame().to_dict('records')
 
     # If we only have one data point, generate synthetic historical data for demo purposes
     if len(nav_data) == 1:
@@ -280,60 +232,19 @@ def daily_nav_series():
 @reactive.calc
 def daily_balances():
     """Legacy function - now returns NAV data in expected format"""
-    df = gl_data()
-    
-    if df.empty:
+    # Chart of Accounts Structure:
+    # 1xxx - Assets (debit normal balance)
+    # 2xxx - Liabilities (credit normal balance)
+    # 3xxx - Equity (credit normal balance)
+    # 4xxx - Income/Revenue (credit normal balance)
+    # 8xxx - Expenses (debit normal balance)
+    # 9xxx - Other Income (credit normal balance)
+    engine = balance_engine()
+    
+    if engine.empty:
         return pd.DataFrame()
     
-    # Get unique dates
-    unique_dates = sorted(df['date'].dropna().unique())
-    
-    daily_data = []
-    for date in unique_dates:
-        # Get all accounts with activity up to this date
-        historical_df = df[safe_date_compare(df['date'], date)].copy()
-        historical_df['GL_Acct_Number'] = historical_df['GL_Acct_Number'].astype(str)
-        
-        # Group by account
-        account_balances = historical_df.groupby('GL_Acct_Number').agg({
-            'debit_crypto': 'sum',
-            'credit_crypto': 'sum'
-        }).reset_index()
-        
-        for _, row in account_balances.iterrows():
-            account = row['GL_Acct_Number']
-            
-            # Calculate balance based on account type
-            # Chart of Accounts Structure:
-            # 1xxx - Assets (debit normal balance)
-            # 2xxx - Liabilities (credit normal balance)
-            # 3xxx - Equity (credit normal balance)
-            # 4xxx - Income/Revenue (credit normal balance)
-            # 8xxx - Expenses (debit normal balance)
-            # 9xxx - Other Income (credit normal balance)
-            
-            if str(account).startswith('1'):  # Assets
-                balance = row['debit_crypto'] - row['credit_crypto']
-            elif str(account).startswith('2'):  # Liabilities
-                balance = row['credit_crypto'] - row['debit_crypto']
-            elif str(account).startswith('3'):  # Equity
-                balance = row['credit_crypto'] - row['debit_crypto']
-            elif str(account).startswith('4'):  # Income/Revenue
-                balance = row['credit_crypto'] - row['debit_crypto']
-            elif str(account).startswith('8'):  # Expenses
-                balance = row['debit_crypto'] - row['credit_crypto']
-            elif str(account).startswith('9'):  # Other Income
-                balance = row['credit_crypto'] - row['debit_crypto']
-            else:  # Any other accounts
-                balance = row['debit_crypto'] - row['credit_crypto']
-            
-            daily_data.append({
-                'Report Date': pd.Timestamp(date),
-                'GL_Acct_Number': account,
-                'Balance': balance
-            })
-    
-    return pd.DataFrame(daily_data)
+    return engine.daily_balances()
 
 # Backward compatibility aliases
 @reactive.calc  
@@ -1,31 +1,19 @@
 from shiny import reactive, render
 import pandas as pd
 from faicons import icon_svg
-from .helpers import daily_balances
+from .helpers import balance_engine
 
 # === Shared reactive calculations ===
 def init_nav_reactives(input):
     @reactive.calc
     def nav_data():
-        df = daily_balances()
-        if df.empty:
+        engine = balance_engine()
+        if engine.empty:
             return pd.Series(dtype=float)
-            
-        df["GL_Acct_Number"] = df["GL_Acct_Number"].astype(str).str.strip()
-        df = df[df["GL_Acct_Number"].str.match(r"^\d")].copy()
-        df["Type"] = df["GL_Acct_Number"].str[0].map({"1": "Asset", "2": "Liability"})
-
-        # Group by date and sum balances
-        assets_by_date = df[df["Type"] == "Asset"].groupby("Report Date")["Balance"].sum()
-        liabs_by_date = df[df["Type"] == "Liability"].groupby("Report Date")["Balance"].sum()
-
-        # Get all unique dates and reindex
-        all_dates = pd.to_datetime(sorted(df["Report Date"].unique()))
-        assets_by_date = assets_by_date.reindex(all_dates, fill_value=0)
-        liabs_by_date = liabs_by_date.reindex(all_dates, fill_value=0)
 
-        # NAV = Assets + Liabilities
-        nav_series = assets_by_date + liabs_by_date
+        # NAV = Assets - Liabilities, one point per GL posting date
+        nav_df = engine.nav_frame()
+        nav_series = pd.Series(nav_df["nav"].values, index=pd.DatetimeIndex(nav_df["date"]))
         return nav_series.sort_index()
 
     @reactive.calc
@@ -98,16 +86,11 @@ def register_kpi_outputs(output, input):
 
     @reactive.calc
     def contributed_capital():
-        df = daily_balances()
-        if df.empty:
+        engine = balance_engine()
+        if engine.empty:
             return 0
-        df["GL_Acct_Number"] = df["GL_Acct_Number"].astype(str)
-        latest_date = df["Report Date"].max()
-        cap_rows = df[
-            (df["GL_Acct_Number"].str.startswith("3")) &
-            (df["Report Date"] == latest_date)
-        ]
-        return cap_rows["Balance"].sum()
+        latest = engine.balances_at(engine.dates.max())
+        return latest[latest.index.str.startswith("3")].sum()
 
     @output
     @render.ui
@@ -118,17 +101,12 @@ def register_kpi_outputs(output, input):
     @output
     @render.data_frame
     def latest_summary():
-        df = daily_balances()
-        if df.empty:
+        engine = balance_engine()
+        if engine.empty:
             return pd.DataFrame({"Metric": ["No Data"], "Value": ["No GL data available"]})
             
-        latest_date = df["Report Date"].max()
-        df["GL_Acct_Number"] = df["GL_Acct_Number"].astype(str)
-        df["Type"] = df["GL_Acct_Number"].str[0].map({"1": "Asset", "2": "Liability"})
-        latest = df[df["Report Date"] == latest_date]
-        total_assets = latest[latest["Type"] == "Asset"]["Balance"].sum()
-        total_liabs = latest[latest["Type"] == "Liability"]["Balance"].sum()
-        nav = total_assets + total_liabs
+        latest_date = engine.dates.max()
+        total_assets, total_liabs, nav = engine.nav_at(latest_date)
         summary = pd.DataFrame({
             "Metric": ["Latest Date", "Total Assets", "Total Liabilities", "NAV"],
             "Value": [latest_date.strftime("%Y-%m-%d"), total_assets, total_liabs, nav]
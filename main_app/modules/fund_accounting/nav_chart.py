@@ -2,31 +2,19 @@ from shiny import reactive, render
 from shinywidgets import render_plotly
 import pandas as pd
 import plotly.graph_objects as go
-from .helpers import daily_balances, apply_plotly_theme
+from .helpers import balance_engine, apply_plotly_theme
 
 # === Shared reactive calculations ===
 def init_nav_reactives(input):
     @reactive.calc
     def nav_data():
-        df = daily_balances()
-        if df.empty:
+        engine = balance_engine()
+        if engine.empty:
             return pd.Series(dtype=float)
-            
-        df["GL_Acct_Number"] = df["GL_Acct_Number"].astype(str).str.strip()
-        df = df[df["GL_Acct_Number"].str.match(r"^\d")].copy()
-        df["Type"] = df["GL_Acct_Number"].str[0].map({"1": "Asset", "2": "Liability"})
-
-        # Group by date and sum balances
-        assets_by_date = df[df["Type"] == "Asset"].groupby("Report Date")["Balance"].sum()
-        liabs_by_date = df[df["Type"] == "Liability"].groupby("Report Date")["Balance"].sum()
-
-        # Get all unique dates and reindex
-        all_dates = pd.to_datetime(sorted(df["Report Date"].unique()))
-        assets_by_date = assets_by_date.reindex(all_dates, fill_value=0)
-        liabs_by_date = liabs_by_date.reindex(all_dates, fill_value=0)
-
-        # NAV = Assets + Liabilities 
-        nav_series = assets_by_date + liabs_by_date
+
+        # NAV = Assets - Liabilities, one point per GL posting date
+        nav_df = engine.nav_frame()
+        nav_series = pd.Series(nav_df["nav"].values, index=pd.DatetimeIndex(nav_df["date"]))
         return nav_series.sort_index()
 
     @reactive.calc
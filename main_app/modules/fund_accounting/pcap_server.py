@@ -5,6 +5,8 @@ Handles loading PCAP Excel files from S3 and generating PDF statements
 
 from shiny import ui, render, reactive, module
 from datetime import datetime
+import asyncio
+import concurrent.futures
 import tempfile
 import os
 import io
@@ -12,10 +14,14 @@ from pathlib import Path
 
 # Import PCAP processor
 from .PCAP import PCAPExcelProcessor
+from ...services.pdf_renderer import RenderProgress
 
 # Import S3 utilities
 from ...s3_utils import list_pcap_excel_files
 
+# One background PDF batch at a time; the batch itself fans out to worker processes
+_pdf_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
 def register_pcap_outputs(output, input, session=None):
     """Register all PCAP-related outputs"""
     
@@ -26,6 +32,9 @@ def register_pcap_outputs(output, input, session=None):
     selected_file = reactive.value(None)
     pdf_generation_status = reactive.value("")
     last_generated_pdf_path = reactive.value(None)
+    requested_zip_path = reactive.value(None)
+    last_generated_zip_path = reactive.value(None)
+    pdf_progress = RenderProgress()
     
     @reactive.calc
     def load_available_files():
@@ -296,6 +305,19 @@ def register_pcap_outputs(output, input, session=None):
             print(f"Error in download handler: {e}")
             yield io.BytesIO(f"Error: {str(e)}".encode()).getvalue()
     
+    # Background PDF generation: runs off the session so the UI stays responsive
+    @reactive.extended_task
+    async def generate_all_pdfs_task(processor, fund_name, output_dir, zip_path):
+        """Render every LP statement on the PDF worker pool in a background thread"""
+        loop = asyncio.get_event_loop()
+        def _generate():
+            try:
+                return processor.generate_all_lp_pdfs(fund_name, output_dir, progress=pdf_progress,
+                                                      zip_path=zip_path)
+            finally:
+                pdf_progress.finish()
+        return await loop.run_in_executor(_pdf_executor, _generate)
+    
     @reactive.effect
     @reactive.event(input.generate_all_pdfs)
     def generate_all_pdfs():
@@ -306,6 +328,10 @@ def register_pcap_outputs(output, input, session=None):
             ui.notification_show("Please load a PCAP file first", type="warning")
             return
         
+        if generate_all_pdfs_task.status() == "running":
+            ui.notification_show("PDF generation is already running", type="warning")
+            return
+        
         # Get fund name from input or let it auto-detect for each LP
         fund_name = input.fund_name_input() if hasattr(input, 'fund_name_input') else None
         
@@ -315,30 +341,73 @@ def register_pcap_outputs(output, input, session=None):
             duration=3
         )
         
-        try:
-            # Generate PDFs (fund_name will be auto-detected for each LP if None)
-            output_dir = Path("main_app/modules/fund_accounting/PCAP/PCAP/generated_reports")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            pdf_files = processor.generate_all_lp_pdfs(fund_name, str(output_dir))
-            
+        # Generate PDFs (fund_name will be auto-detected for each LP if None)
+        output_dir = Path("main_app/modules/fund_accounting/PCAP/PCAP/generated_reports")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        zip_path = output_dir / f"PCAP_Statements_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        
+        pdf_progress.start(len(processor.available_lps))
+        requested_zip_path.set(str(zip_path))
+        last_generated_zip_path.set(None)
+        generate_all_pdfs_task(processor, fund_name, str(output_dir), str(zip_path))
+    
+    @reactive.effect
+    def handle_all_pdfs_completion():
+        """Report the outcome of the background PDF generation"""
+        status = generate_all_pdfs_task.status()
+        
+        if status == "error":
+            ui.notification_show(
+                f"Error generating PDFs: {generate_all_pdfs_task.error()}",
+                type="error"
+            )
+        elif status == "success":
+            pdf_files = generate_all_pdfs_task.result()
             if pdf_files:
                 ui.notification_show(
                     f"Successfully generated {len(pdf_files)} PDF statements",
                     type="success",
                     duration=5
                 )
+                with reactive.isolate():
+                    zip_path = requested_zip_path.get()
+                last_generated_zip_path.set(zip_path if zip_path and os.path.exists(zip_path) else None)
                 pdf_generation_status.set(f"Generated {len(pdf_files)} PDFs at {datetime.now().strftime('%H:%M:%S')}")
             else:
                 ui.notification_show(
                     "No PDFs were generated. Check console for details.",
                     type="warning"
                 )
-        except Exception as e:
-            ui.notification_show(
-                f"Error generating PDFs: {str(e)}",
-                type="error"
+    
+    @output
+    @render.ui
+    def pdf_generation_progress():
+        """Progress of the background PDF generation, polled while it runs"""
+        if generate_all_pdfs_task.status() != "running":
+            return ui.div()
+        reactive.invalidate_later(1.0)
+        state = pdf_progress.snapshot()
+        total = max(state["total"], 1)
+        percent = int(100 * state["done"] / total)
+        return ui.div(
+            ui.p(f"Generating PDFs: {state['done']} of {state['total']}"
+                 + (f" (last: {state['current']})" if state["current"] else "")
+                 + (f", {state['failed']} failed" if state["failed"] else ""), class_="mb-1"),
+            ui.div(
+                ui.div(class_="progress-bar", style=f"width: {percent}%"),
+                class_="progress"
             )
+        )
+    
+    @render.download(filename=lambda: os.path.basename(last_generated_zip_path.get() or "PCAP_Statements.zip"))
+    def download_all_pdfs_zip():
+        """Download the zip of the last batch of generated PDFs"""
+        zip_path = last_generated_zip_path.get()
+        if not zip_path or not os.path.exists(zip_path):
+            yield io.BytesIO(b"Error: No PDF bundle available").getvalue()
+            return
+        with open(zip_path, 'rb') as f:
+            yield f.read()
     
     @output
     @render.ui
@@ -358,7 +427,13 @@ def register_pcap_outputs(output, input, session=None):
                 ui.p(f"Loaded file: {file_info}", class_="mb-2"),
                 ui.p(f"Total sheets: {len(processor.excel_data)}", class_="mb-2"),
                 ui.p(f"Available LPs: {len(processor.available_lps)}", class_="mb-2"),
-                ui.p(status, class_="text-success") if status else ui.div()
+                ui.p(status, class_="text-success") if status else ui.div(),
+                ui.output_ui("pdf_generation_progress"),
+                ui.download_button(
+                    "download_all_pdfs_zip",
+                    "Download All PDFs (zip)",
+                    class_="btn-outline-secondary mt-2"
+                ) if last_generated_zip_path.get() else ui.div()
             )
         )
     
@@ -3,7 +3,8 @@ import pandas as pd
 from datetime import datetime, timedelta
 from decimal import Decimal
 from pandas.tseries.offsets import MonthEnd
-from ...s3_utils import load_GL_file, load_COA_file
+from ...s3_utils import load_GL_file, load_COA_file, read_gl, TYPED_GL_AMOUNTS
+from ...services.gl_amounts import is_amount_column, sum_pivot
 from shiny.render import DataGrid, data_frame
 import json
 import os
@@ -18,6 +19,9 @@ except (ImportError, OSError):
     HTML = None  # Define HTML as None to avoid NameError
 import io
 
+# GL columns the trial balance reads
+TB_GL_COLUMNS = ['date', 'fund', 'fund_id', 'GL_Acct_Number', 'account_name', 'debit_crypto', 'credit_crypto']
+
 def clean_date_utc(date_val):
     """Clean and convert dates to UTC timezone"""
     if pd.isna(date_val):
@@ -332,15 +336,13 @@ def register_outputs(output, input, selected_fund):
         """Generate trial balance data from GL transactions using pivot table approach"""
         print(f"DEBUG - TRIAL BALANCE: Starting get_trial_balance_data()")
         try:
-            print(f"DEBUG - TRIAL BALANCE: Loading GL and COA data...")
+            print(f"DEBUG - TRIAL BALANCE: Loading COA data...")
             # Load data
-            gl_df = load_GL_file()
             coa_df = load_COA_file()
             
-            print(f"DEBUG - TRIAL BALANCE: GL data shape: {gl_df.shape if not gl_df.empty else 'EMPTY'}")
             print(f"DEBUG - TRIAL BALANCE: COA data shape: {coa_df.shape if not coa_df.empty else 'EMPTY'}")
             
-            if gl_df.empty or coa_df.empty:
+            if coa_df.empty:
                 print(f"DEBUG - TRIAL BALANCE: ERROR - GL or COA data is empty!")
                 return {"data": pd.DataFrame({"Error": ["No data available"]}), "unbalanced_days": []}
             
@@ -371,6 +373,21 @@ def register_outputs(output, input, selected_fund):
                 print(f"DEBUG - TRIAL BALANCE: Missing date inputs - start: {start_date}, end: {end_date}")
                 return {"data": pd.DataFrame({"Message": ["Please select date range and click Generate"]}), "unbalanced_days": []}
             
+            # Read only the selected fund, the date range and the columns the TB uses
+            print(f"DEBUG - TRIAL BALANCE: Loading GL data...")
+            gl_df = read_gl(
+                fund_id=selected_fund if selected_fund and selected_fund != "ALL" else None,
+                start=pd.Timestamp(pd.to_datetime(start_date), tz='UTC'),
+                end=pd.Timestamp(pd.to_datetime(end_date), tz='UTC'),
+                columns=TB_GL_COLUMNS,
+                typed=TYPED_GL_AMOUNTS,
+            )
+            print(f"DEBUG - TRIAL BALANCE: GL data shape: {gl_df.shape if not gl_df.empty else 'EMPTY'}")
+            
+            if gl_df.empty and pd.to_datetime(start_date) <= pd.to_datetime(end_date):
+                print(f"DEBUG - TRIAL BALANCE: ERROR - No GL transactions found after filtering!")
+                return {"data": pd.DataFrame({"Message": ["No GL transactions found in selected date range"]}), "unbalanced_days": []}
+            
             # Make a working copy
             df = gl_df.copy()
             
@@ -459,17 +476,21 @@ def register_outputs(output, input, selected_fund):
                     # Create fallback account numbers
                     df['GL_Acct_Number'] = df.index.astype(str)
             
-            # Convert debit/credit to Decimal for precision
-            print(f"DEBUG - TRIAL BALANCE: Converting amounts to Decimal...")
-            for col in ['debit_crypto', 'credit_crypto']:
-                df[col] = (
-                    df[col]
-                    .astype(str)
-                    .apply(lambda x: Decimal(x) if (x.replace('.', '', 1).replace('-', '', 1).replace('e', '', 1).replace('+', '', 1).isdigit()) else Decimal(0))
-                )
-            
-            # Compute net_debit_credit at 18-decimal precision
-            df['net_debit_credit_crypto'] = (df['debit_crypto'] - df['credit_crypto']).round(18)
+            if is_amount_column(df['debit_crypto']):
+                # Typed amounts are exact at 18 decimals already; no per-cell Decimal work
+                df['net_debit_credit_crypto'] = df['debit_crypto'] - df['credit_crypto']
+            else:
+                # Convert debit/credit to Decimal for precision
+                print(f"DEBUG - TRIAL BALANCE: Converting amounts to Decimal...")
+                for col in ['debit_crypto', 'credit_crypto']:
+                    df[col] = (
+                        df[col]
+                        .astype(str)
+                        .apply(lambda x: Decimal(x) if (x.replace('.', '', 1).replace('-', '', 1).replace('e', '', 1).replace('+', '', 1).isdigit()) else Decimal(0))
+                    )
+                
+                # Compute net_debit_credit at 18-decimal precision
+                df['net_debit_credit_crypto'] = (df['debit_crypto'] - df['credit_crypto']).round(18)
             
             # Extract "day" (midnight UTC) for grouping
             df['day'] = df['date'].dt.normalize()
@@ -498,16 +519,7 @@ def register_outputs(output, input, selected_fund):
                 pivot_index = ['account_name']
                 print(f"DEBUG - TRIAL BALANCE: Using only account_name as index (GL_Acct_Number not available)")
             
-            acct_by_day = (
-                df
-                .pivot_table(
-                    index=pivot_index,
-                    columns='day',
-                    values='net_debit_credit_crypto',
-                    aggfunc='sum',
-                    fill_value=Decimal(0),
-                )
-            )
+            acct_by_day = sum_pivot(df, pivot_index, 'day', 'net_debit_credit_crypto')
             
             print(f"DEBUG - TRIAL BALANCE: Pivot table shape: {acct_by_day.shape}")
             
@@ -16,7 +16,7 @@ import logging
 import json
 import os
 
-from ...services.fifo_tracker import FIFOTracker, build_fifo_ledger, convert_crypto_fetch_to_fifo_format
+from ...services.fifo_tracker import FIFOLotEngine, build_fifo_ledger, convert_crypto_fetch_to_fifo_format
 from ...services.gl_journal_builder import (
     build_crypto_journal_entries, 
     export_journal_entries_by_month,
@@ -1892,7 +1892,7 @@ def register_crypto_tracker_outputs(output, input, session):
                 progress.set(70, message="Comparing balances...", detail="Calculating differences and status")
                 
                 # Perform verification
-                verification_df = checker.verify_wallet_balances(positions_df, token_contracts)
+                verification_df = checker.verify_wallet_balances(positions_df, token_contracts, batched=True)
                 
                 progress.set(90, message="Processing results...", detail="Formatting verification data")
                 
@@ -2016,27 +2016,10 @@ def register_crypto_tracker_outputs(output, input, session):
             fifo_results.set(fifo_df)
             fifo_data_source.set("calculated")  # Track that data was freshly calculated
             
-            # Get current positions using the new simplified tracker
-            tracker = FIFOTracker()
-            for _, row in fifo_input_df.iterrows():
-                # Ensure proper string conversion for position calculation
-                try:
-                    tracker.process(
-                        fund_id=str(row['fund_id']),
-                        wallet=str(row['wallet_address']),
-                        asset=str(row['asset']),
-                        side=str(row['side']),
-                        qty=abs(float(row['qty'])),  # Use absolute value
-                        unit_price_eth=float(row.get('unit_price_eth', 0)),
-                        date=row['date'],
-                        tx_hash=str(row['hash']),
-                        price_eth=float(row.get('price_eth', 0)),
-                        log=False  # Don't log for position calculation
-                    )
-                except Exception as e:
-                    logger.warning(f"Error processing position for row: {e}, skipping row {row.name}")
-            
-            positions_df = tracker.get_all_positions()
+            # Get current positions from the columnar FIFO engine (rows with bad amounts are skipped)
+            engine = FIFOLotEngine()
+            engine.process_frame(fifo_input_df, log=False, skip_invalid=True)
+            positions_df = engine.get_all_positions()
             fifo_positions.set(positions_df)
             
             # Smart staging area management
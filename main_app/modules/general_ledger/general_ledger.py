@@ -849,7 +849,7 @@ def register_outputs(output, input, session, selected_fund):
                 refresh_trigger.set(current_count + 1)
                 
                 # Refresh edited_df_store with new data
-                edited_df_store.set(load_GL_file().copy().head(100))
+                edited_df_store.set(load_GL_file().head(100))
                 
                 ui.notification_show(f"New journal entry {new_transaction_id} added successfully!", duration=5000)
             except Exception as save_error:
@@ -965,7 +965,7 @@ def register_outputs(output, input, session, selected_fund):
                 refresh_trigger.set(current_count + 1)
                 
                 # Refresh edited_df_store with new data
-                edited_df_store.set(load_GL_file().copy().head(100))
+                edited_df_store.set(load_GL_file().head(100))
                 
                 ui.notification_show(f"Journal entry {transaction_id} deleted successfully!", duration=5000)
             except Exception as save_error:
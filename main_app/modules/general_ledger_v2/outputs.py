@@ -115,7 +115,7 @@ def register_gl2_outputs(input, output, session):
 
     # Import S3 utilities
     from ...s3_utils import (
-        load_GL2_file, save_GL2_file, clear_GL2_cache,
+        load_GL2_file, save_GL2_file, append_GL2_entries, clear_GL2_cache,
         load_COA_file, get_gl2_schema_columns
     )
 
@@ -923,7 +923,6 @@ def register_gl2_outputs(input, output, session):
             return
 
         df = filtered_journal_entries()
-        full_df = gl2_data()
 
         if df.empty:
             return
@@ -990,12 +989,11 @@ def register_gl2_outputs(input, output, session):
             ui.notification_show("No entries to reverse", type="warning")
             return
 
-        # Add reversals to data
+        # Append reversals to the ledger
         try:
             reversal_df = pd.DataFrame(reversal_records)
-            combined = pd.concat([full_df, reversal_df], ignore_index=True)
 
-            if save_GL2_file(combined):
+            if append_GL2_entries(reversal_df):
                 ui.notification_show(f"Created {len(reversal_records)} reversing entries", type="message")
                 clear_GL2_cache()
                 gl2_data_version.set(gl2_data_version() + 1)
@@ -1707,11 +1705,9 @@ def register_gl2_outputs(input, output, session):
 
         # Save
         try:
-            existing_df = load_GL2_file()
             new_df = pd.DataFrame(records)
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
 
-            if save_GL2_file(combined_df):
+            if append_GL2_entries(new_df):
                 ui.notification_show(f"Posted {len(records)} entries", type="message")
                 entry_lines.set([
                     {"account": "", "debit": 0.0, "credit": 0.0},
@@ -1770,123 +1766,77 @@ def register_gl2_outputs(input, output, session):
     @render.download(filename=lambda: f"gl2_journal_entries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
     async def gl2_download_je():
         """Export filtered journal entries to Excel."""
+        from ..financial_reporting.excel_export import export_frames_to_excel
+
         df = filtered_journal_entries()
         if df.empty:
             df = pd.DataFrame({"Message": ["No data to export"]})
 
-        from io import BytesIO
-        buffer = BytesIO()
-
-        # Create Excel writer with formatting
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            # Prepare data for export
-            export_df = df.copy()
-
-            # Format date column if exists
-            if 'date' in export_df.columns:
-                export_df['date'] = pd.to_datetime(export_df['date']).dt.strftime('%Y-%m-%d %H:%M:%S')
+        # Rows are streamed; dates keep a datetime type and get a date number format
+        export_df = df.copy()
+        if 'date' in export_df.columns:
+            export_df['date'] = pd.to_datetime(export_df['date'])
 
-            # Write to Excel
-            export_df.to_excel(writer, sheet_name='Journal Entries', index=False)
-
-            # Auto-adjust column widths
-            worksheet = writer.sheets['Journal Entries']
-            for idx, col in enumerate(export_df.columns):
-                max_length = max(
-                    export_df[col].astype(str).map(len).max(),
-                    len(str(col))
-                ) + 2
-                worksheet.column_dimensions[chr(65 + idx) if idx < 26 else f'A{chr(65 + idx - 26)}'].width = min(max_length, 50)
-
-        buffer.seek(0)
-        return buffer.getvalue()
+        return export_frames_to_excel({'Journal Entries': export_df}).getvalue()
 
     @render.download(filename=lambda: f"gl2_account_ledger_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
     async def gl2_download_ledger():
         """Export account ledger to Excel."""
+        from ..financial_reporting.excel_export import export_frames_to_excel
+
         df = account_ledger_data()
         if df.empty:
             df = pd.DataFrame({"Message": ["No data to export - select an account first"]})
 
-        from io import BytesIO
-        buffer = BytesIO()
-
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            export_df = df.copy()
-            if 'date' in export_df.columns:
-                export_df['date'] = pd.to_datetime(export_df['date']).dt.strftime('%Y-%m-%d %H:%M:%S')
+        export_df = df.copy()
+        if 'date' in export_df.columns:
+            export_df['date'] = pd.to_datetime(export_df['date'])
 
-            export_df.to_excel(writer, sheet_name='Account Ledger', index=False)
-
-            worksheet = writer.sheets['Account Ledger']
-            for idx, col in enumerate(export_df.columns):
-                max_length = max(
-                    export_df[col].astype(str).map(len).max(),
-                    len(str(col))
-                ) + 2
-                worksheet.column_dimensions[chr(65 + idx) if idx < 26 else f'A{chr(65 + idx - 26)}'].width = min(max_length, 50)
-
-        buffer.seek(0)
-        return buffer.getvalue()
+        return export_frames_to_excel({'Account Ledger': export_df}).getvalue()
 
     @render.download(filename=lambda: f"gl2_trial_balance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
     async def gl2_download_tb():
         """Export trial balance to Excel."""
+        from ..financial_reporting.excel_export import export_frames_to_excel
+
         df = trial_balance_data()
         if df.empty:
             df = pd.DataFrame({"Message": ["No data to export"]})
 
-        from io import BytesIO
-        buffer = BytesIO()
-
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            export_df = df.copy()
-            export_df.to_excel(writer, sheet_name='Trial Balance', index=False)
-
-            worksheet = writer.sheets['Trial Balance']
-            for idx, col in enumerate(export_df.columns):
-                max_length = max(
-                    export_df[col].astype(str).map(len).max(),
-                    len(str(col))
-                ) + 2
-                worksheet.column_dimensions[chr(65 + idx) if idx < 26 else f'A{chr(65 + idx - 26)}'].width = min(max_length, 50)
-
-        buffer.seek(0)
-        return buffer.getvalue()
+        return export_frames_to_excel({'Trial Balance': df}).getvalue()
 
     @render.download(filename=lambda: f"gl2_full_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
     async def gl2_download_full():
         """Export all GL2 data to Excel with multiple sheets."""
-        from io import BytesIO
-        buffer = BytesIO()
-
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            # Sheet 1: All Journal Entries
-            je_df = gl2_data()
-            if not je_df.empty:
-                export_je = je_df.copy()
-                if 'date' in export_je.columns:
-                    export_je['date'] = pd.to_datetime(export_je['date']).dt.strftime('%Y-%m-%d %H:%M:%S')
-                export_je.to_excel(writer, sheet_name='All Journal Entries', index=False)
-
-            # Sheet 2: Trial Balance
-            tb_df = trial_balance_data()
-            if not tb_df.empty:
-                tb_df.to_excel(writer, sheet_name='Trial Balance', index=False)
-
-            # Sheet 3: Summary
-            summary_data = {
-                'Metric': ['Total Entries', 'Unique Accounts', 'Total Debits', 'Total Credits', 'Balance Check'],
-                'Value': [
-                    len(je_df) if not je_df.empty else 0,
-                    je_df['GL_Acct_Number'].nunique() if not je_df.empty and 'GL_Acct_Number' in je_df.columns else 0,
-                    sum(float(x) if pd.notna(x) else 0 for x in je_df.get('debit_crypto', [])) if not je_df.empty else 0,
-                    sum(float(x) if pd.notna(x) else 0 for x in je_df.get('credit_crypto', [])) if not je_df.empty else 0,
-                    'Balanced' if abs(sum(float(x) if pd.notna(x) else 0 for x in je_df.get('debit_crypto', [])) -
-                                     sum(float(x) if pd.notna(x) else 0 for x in je_df.get('credit_crypto', []))) < 0.000001 else 'Not Balanced'
-                ]
-            }
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+        from ..financial_reporting.excel_export import export_frames_to_excel
+
+        frames = {}
+
+        # Sheet 1: All Journal Entries
+        je_df = gl2_data()
+        if not je_df.empty:
+            export_je = je_df.copy()
+            if 'date' in export_je.columns:
+                export_je['date'] = pd.to_datetime(export_je['date'])
+            frames['All Journal Entries'] = export_je
+
+        # Sheet 2: Trial Balance
+        tb_df = trial_balance_data()
+        if not tb_df.empty:
+            frames['Trial Balance'] = tb_df
+
+        # Sheet 3: Summary
+        summary_data = {
+            'Metric': ['Total Entries', 'Unique Accounts', 'Total Debits', 'Total Credits', 'Balance Check'],
+            'Value': [
+                len(je_df) if not je_df.empty else 0,
+                je_df['GL_Acct_Number'].nunique() if not je_df.empty and 'GL_Acct_Number' in je_df.columns else 0,
+                sum(float(x) if pd.notna(x) else 0 for x in je_df.get('debit_crypto', [])) if not je_df.empty else 0,
+                sum(float(x) if pd.notna(x) else 0 for x in je_df.get('credit_crypto', [])) if not je_df.empty else 0,
+                'Balanced' if abs(sum(float(x) if pd.notna(x) else 0 for x in je_df.get('debit_crypto', [])) -
+                                 sum(float(x) if pd.notna(x) else 0 for x in je_df.get('credit_crypto', []))) < 0.000001 else 'Not Balanced'
+            ]
+        }
+        frames['Summary'] = pd.DataFrame(summary_data)
 
-        buffer.seek(0)
-        return buffer.getvalue()
+        return export_frames_to_excel(frames).getvalue()
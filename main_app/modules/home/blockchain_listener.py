@@ -221,15 +221,25 @@ def register_blockchain_listener_outputs(input, output, session, selected_fund):
         except:
             return []
 
+    # Per (wallet, kind) last block fetched in "all fund wallets" mode, so
+    # refreshes only ask for newer transactions
+    wallet_cursors = {}
+
+    def fetch_wallets(wallets, limit, existing=None):
+        """Fetch one wallet, or all of them concurrently into one frame"""
+        get_blockchain_service().wallet_address = wallets[0]
+        if len(wallets) == 1:
+            return get_blockchain_service().fetch_historical_transactions(limit=limit)
+        return get_blockchain_service().fetch_wallets(wallets, limit=limit, cursors=wallet_cursors, existing=existing)
+
     # Background task for fetching transactions (non-blocking)
     @reactive.extended_task
-    async def fetch_transactions_task(wallet_address: str, limit: int = 100):
+    async def fetch_transactions_task(wallets: list, limit: int = 100):
         """Fetch transactions in background thread to avoid blocking UI"""
         loop = asyncio.get_event_loop()
         # Run the blocking call in a thread pool
         def _fetch():
-            get_blockchain_service().wallet_address = wallet_address
-            return get_blockchain_service().fetch_historical_transactions(limit=limit)
+            return fetch_wallets(wallets, limit)
 
         return await loop.run_in_executor(_executor, _fetch)
 
@@ -255,13 +265,11 @@ def register_blockchain_listener_outputs(input, output, session, selected_fund):
                 error_message.set("No Etherscan API key configured. Add ETHERSCAN_API_KEY to your environment.")
                 return
 
-            # For now, monitor the first wallet (TODO: support multiple)
-            primary_wallet = wallets[0] if wallets else None
-            if primary_wallet:
-                # Set status to loading and trigger background fetch
-                initialization_status.set("loading")
-                logger.info(f"Starting background fetch for wallet {primary_wallet[:10]}...")
-                fetch_transactions_task(primary_wallet, 100)
+            # Set status to loading and trigger background fetch
+            initialization_status.set("loading")
+            logger.info(f"Starting background fetch for {len(wallets)} wallet(s) from {wallets[0][:10]}...")
+            wallet_cursors.clear()
+            fetch_transactions_task(wallets, 100)
 
             last_refresh.set(datetime.now(timezone.utc))
 
@@ -550,13 +558,13 @@ def register_blockchain_listener_outputs(input, output, session, selected_fund):
             elif get_blockchain_service().is_infura_connected():
                 return ui.HTML("""
                     <span class="badge bg-success">
-                        <i class="bi bi-arrow-repeat"></i> Infura (15s)
+                        <i class="bi bi-arrow-repeat"></i> Infura (new blocks)
                     </span>
                 """)
             else:
                 return ui.HTML("""
                     <span class="badge bg-warning">
-                        <i class="bi bi-arrow-repeat"></i> Polling (30s)
+                        <i class="bi bi-arrow-repeat"></i> Manual refresh
                     </span>
                 """)
         elif status == "initializing":
@@ -891,6 +899,15 @@ def register_blockchain_listener_outputs(input, output, session, selected_fund):
         decode_count = 0
         tx_types = {}
 
+        # Fetch and decode the whole window with batched RPC calls up front
+        if registry and 'hash' in df.columns:
+            new_hashes = [h for h in df.head(50)['hash'].tolist() if h and h not in current_cache]
+            if new_hashes:
+                try:
+                    registry.decode_many(new_hashes)
+                except Exception as e:
+                    logger.warning(f"Batched decode failed, decoding one by one: {e}")
+
         # Process transactions, starting from most recent
         for _, row in df.head(50).iterrows():
             tx_hash = row.get('hash', '')
@@ -1119,6 +1136,19 @@ def register_blockchain_listener_outputs(input, output, session, selected_fund):
             wallet = input.wallet_address() if hasattr(input, 'wallet_address') else get_blockchain_service().wallet_address
             limit = int(input.transaction_limit()) if hasattr(input, 'transaction_limit') else 100
 
+            if wallet == "all_fund":
+                # Only transactions newer than each wallet's cursor; decoded results stay valid
+                wallets = get_monitored_wallets()
+                if wallets:
+                    with reactive.isolate():
+                        current = transaction_data.get()
+                    fresh_data = fetch_wallets(wallets, limit, existing=current)
+                    if not fresh_data.empty:
+                        transaction_data.set(fresh_data)
+                        last_refresh.set(datetime.now(timezone.utc))
+                        logger.info(f"Refreshed {len(wallets)} wallets: {len(fresh_data) - len(current)} new transactions")
+                return
+
             # Re-initialize if wallet changed
             if wallet != get_blockchain_service().wallet_address:
                 get_blockchain_service().wallet_address = wallet
@@ -1187,17 +1217,13 @@ def register_blockchain_listener_outputs(input, output, session, selected_fund):
             if new_selection == "all_fund":
                 # Monitor all fund wallets
                 logger.info(f"Monitoring all fund wallets: {len(wallets_to_monitor)} wallets")
-                if wallets_to_monitor:
-                    # For now, fetch data from first wallet (TODO: aggregate all)
-                    get_blockchain_service().wallet_address = wallets_to_monitor[0]
-                else:
+                if not wallets_to_monitor:
                     logger.warning("No wallets found for fund")
                     transaction_data.set(pd.DataFrame())
                     return
             else:
                 # Single wallet selected
                 if new_selection and len(new_selection) == 42 and new_selection.startswith('0x'):
-                    get_blockchain_service().wallet_address = new_selection
                     logger.info(f"Switched to wallet: {new_selection}")
                 else:
                     logger.warning(f"Invalid wallet address: {new_selection}")
@@ -1210,9 +1236,10 @@ def register_blockchain_listener_outputs(input, output, session, selected_fund):
                 registry.decoded_cache.clear()
                 logger.info("Cleared decoded transaction caches for wallet switch")
 
-            # Fetch fresh data for the new wallet
-            logger.info(f"Fetching transactions for: {get_blockchain_service().wallet_address}")
-            fresh_data = get_blockchain_service().fetch_historical_transactions(limit=int(input.transaction_limit() if hasattr(input, 'transaction_limit') else 100))
+            # Fetch fresh data for the new wallet(s)
+            logger.info(f"Fetching transactions for: {', '.join(wallets_to_monitor)}")
+            wallet_cursors.clear()
+            fresh_data = fetch_wallets(wallets_to_monitor, int(input.transaction_limit() if hasattr(input, 'transaction_limit') else 100))
 
             if not fresh_data.empty:
                 transaction_data.set(fresh_data)
@@ -1231,25 +1258,77 @@ def register_blockchain_listener_outputs(input, output, session, selected_fund):
             traceback.print_exc()
             error_message.set(f"Error loading wallet: {str(e)}")
 
-    # Periodic refresh for non-WebSocket mode
+    # New transactions from the shared head tracker (one block follower for all sessions)
+    head_cursor = reactive.value(None)
+
     @reactive.effect
     def periodic_refresh():
-        """Periodically refresh data - faster with Infura (15s) vs Etherscan (30s)"""
-        # Use faster refresh interval when Infura is connected
-        refresh_interval = 15 if get_blockchain_service().is_infura_connected() else 30
-        reactive.invalidate_later(refresh_interval)
+        """Merge transactions the head tracker found in new blocks, drop orphaned ones after a reorg"""
+        reactive.invalidate_later(2)
 
-        if initialization_status.get() == "active" and not get_blockchain_service().is_connected():
-            try:
-                # Get updated transactions using Infura primarily
-                updated_data = get_blockchain_service().get_all_transactions()
-                if not updated_data.empty:
-                    # Only update if there are changes
-                    current = transaction_data.get()
-                    if current.empty or len(updated_data) != len(current):
-                        transaction_data.set(updated_data)
-                        last_refresh.set(datetime.now(timezone.utc))
-                        source = "Infura" if get_blockchain_service().is_infura_connected() else "Etherscan"
-                        logger.info(f"Auto-refreshed via {source}: {len(updated_data)} transactions")
-            except Exception as e:
-                logger.error(f"Error in periodic refresh: {e}")
\ No newline at end of file
+        if initialization_status.get() != "active":
+            return
+
+        try:
+            wallets = get_monitored_wallets()
+            tracker = get_blockchain_service().start_head_tracker(wallets)
+            if tracker is None:
+                return
+
+            with reactive.isolate():
+                cursor = head_cursor.get()
+                data = transaction_data.get()
+                current_cache = decoded_tx_cache.get()
+
+            if cursor is None:
+                # Only what arrives after the initial fetch
+                head_cursor.set(tracker.sequence)
+                return
+
+            events, cursor, complete = tracker.events_since(cursor)
+            head_cursor.set(cursor)
+            if not complete:
+                logger.warning("Head tracker events were dropped before this session read them; use Refresh to reload")
+            if not events:
+                return
+
+            watched = {w.strip().lower() for w in wallets}
+            orphaned_hashes = set()
+            changed = False
+            for event in events:
+                if event.kind == 'rollback':
+                    if not data.empty and 'block' in data.columns:
+                        orphaned = pd.to_numeric(data['block'], errors='coerce') > event.block_number
+                        orphaned_hashes.update(data.loc[orphaned, 'hash'])
+                        data = data[~orphaned]
+                        changed = changed or bool(orphaned.any())
+                    continue
+
+                rows = [row for row in event.rows if row['wallet'] in watched]
+                if not rows:
+                    continue
+                new_txs = pd.DataFrame(rows)
+                new_txs['from_display'] = new_txs['from'].apply(get_blockchain_service().get_friendly_name)
+                new_txs['to_display'] = new_txs['to'].apply(get_blockchain_service().get_friendly_name)
+                data = pd.concat([data, new_txs], ignore_index=True) if not data.empty else new_txs
+                data = data.drop_duplicates(subset=['hash', 'token', 'type', 'amount'], keep='first')
+                changed = True
+
+            if not changed:
+                return
+
+            if orphaned_hashes:
+                # Decoded results of orphaned transactions are stale
+                registry = decoder_registry.get()
+                for tx_hash in orphaned_hashes:
+                    if registry and hasattr(registry, 'decoded_cache'):
+                        registry.decoded_cache.pop(tx_hash, None)
+                decoded_tx_cache.set({h: r for h, r in current_cache.items() if h not in orphaned_hashes})
+
+            if not data.empty:
+                data = data.sort_values('timestamp', ascending=False).reset_index(drop=True)
+            transaction_data.set(data)
+            last_refresh.set(datetime.now(timezone.utc))
+            logger.info(f"Head tracker update: {len(data)} transactions ({len(orphaned_hashes)} orphaned)")
+        except Exception as e:
+            logger.error(f"Error in periodic refresh: {e}")
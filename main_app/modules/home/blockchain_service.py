@@ -7,6 +7,7 @@ import asyncio
 import aiohttp
 import requests
 import time
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 import pandas as pd
@@ -47,6 +48,7 @@ class EtherscanClient:
         self.base_url_v1 = "https://api.etherscan.io/api"  # Fallback to v1 for some endpoints
         self.rate_limit_delay = 0.2  # 5 requests per second max
         self.last_request_time = 0
+        self._rate_lock = threading.Lock()
 
         # Log API key status (mask the actual key for security)
         if self.api_key:
@@ -61,15 +63,17 @@ class EtherscanClient:
             logger.debug(f"Related env vars: {env_keys}")
 
     def _rate_limit(self):
-        """Enforce rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
-
-    def get_transactions(self, address: str, chainid: int = 1, limit: int = 100) -> pd.DataFrame:
-        """Fetch transactions for a wallet address using V2 API"""
+        """Enforce rate limiting (thread-safe: concurrent callers get consecutive request slots)"""
+        with self._rate_lock:
+            current_time = time.time()
+            slot = max(current_time, self.last_request_time + self.rate_limit_delay)
+            self.last_request_time = slot
+        if slot > current_time:
+            time.sleep(slot - current_time)
+
+    def get_transactions(self, address: str, chainid: int = 1, limit: int = 100,
+                         start_block: int = 0, sort: str = 'desc') -> pd.DataFrame:
+        """Fetch transactions for a wallet address using V2 API (from start_block on)"""
         self._rate_limit()
 
         # Use V2 API endpoint
@@ -78,11 +82,11 @@ class EtherscanClient:
             'module': 'account',
             'action': 'txlist',
             'address': address,
-            'startblock': 0,
+            'startblock': start_block,
             'endblock': 99999999,
             'page': 1,
             'offset': limit,
-            'sort': 'desc',
+            'sort': sort,
             'apikey': self.api_key
         }
 
@@ -132,8 +136,9 @@ class EtherscanClient:
 
         return pd.DataFrame()
 
-    def get_token_transfers(self, address: str, chainid: int = 1, limit: int = 100) -> pd.DataFrame:
-        """Fetch ERC-20 token transfers for a wallet using V2 API"""
+    def get_token_transfers(self, address: str, chainid: int = 1, limit: int = 100,
+                            start_block: int = 0, sort: str = 'desc') -> pd.DataFrame:
+        """Fetch ERC-20 token transfers for a wallet using V2 API (from start_block on)"""
         self._rate_limit()
 
         params = {
@@ -141,11 +146,11 @@ class EtherscanClient:
             'module': 'account',
             'action': 'tokentx',
             'address': address,
-            'startblock': 0,
+            'startblock': start_block,
             'endblock': 99999999,
             'page': 1,
             'offset': limit,
-            'sort': 'desc',
+            'sort': sort,
             'apikey': self.api_key
         }
 
@@ -176,6 +181,47 @@ class EtherscanClient:
 
         return pd.DataFrame()
 
+    def get_internal_transactions(self, address: str, chainid: int = 1, limit: int = 100,
+                                  start_block: int = 0, sort: str = 'desc') -> pd.DataFrame:
+        """Fetch internal (contract-initiated) ETH transfers for a wallet using V2 API"""
+        self._rate_limit()
+
+        params = {
+            'chainid': chainid,
+            'module': 'account',
+            'action': 'txlistinternal',
+            'address': address,
+            'startblock': start_block,
+            'endblock': 99999999,
+            'page': 1,
+            'offset': limit,
+            'sort': sort,
+            'apikey': self.api_key
+        }
+
+        try:
+            response = requests.get(self.base_url, params=params)
+
+            if response.status_code == 200:
+                data = response.json()
+
+                if data.get('status') == '1':
+                    result = data.get('result', [])
+                    logger.info(f"Successfully fetched {len(result)} internal transactions")
+                    if result:
+                        return self._process_internal_transactions(result, address)
+                elif 'No transactions found' in str(data.get('message', '')):
+                    logger.debug(f"No internal transactions for {address}")
+                else:
+                    logger.error(f"Internal tx API error: {data.get('message', 'Unknown error')} - {data.get('result', '')}")
+            else:
+                logger.error(f"Internal tx HTTP Error: {response.status_code}")
+
+        except Exception as e:
+            logger.error(f"Failed to fetch internal transactions: {e}")
+
+        return pd.DataFrame()
+
     def _process_transactions(self, transactions: List[Dict], wallet_address: str) -> pd.DataFrame:
         """Process raw transaction data into DataFrame"""
         processed = []
@@ -217,6 +263,33 @@ class EtherscanClient:
 
         return pd.DataFrame(processed)
 
+    def _process_internal_transactions(self, transactions: List[Dict], wallet_address: str) -> pd.DataFrame:
+        """Process raw internal transaction data into DataFrame"""
+        processed = []
+        wallet_lower = wallet_address.lower()
+
+        for tx in transactions:
+            try:
+                processed.append({
+                    'hash': self._normalize_hash(tx.get('hash', '')),
+                    'block': int(tx.get('blockNumber', 0)),
+                    'from': tx.get('from', ''),
+                    'to': tx.get('to', ''),
+                    'amount': int(tx.get('value', 0)) / 10**18,
+                    'token': 'ETH',
+                    'gas_fee': 0,  # Paid by the outer transaction
+                    'timestamp': datetime.fromtimestamp(int(tx.get('timeStamp', 0)), tz=timezone.utc),
+                    'status': 'Confirmed' if tx.get('isError', '0') == '0' else 'Failed',
+                    'type': 'IN' if tx.get('to', '').lower() == wallet_lower else 'OUT',
+                    'nonce': 0,
+                    'confirmations': 0
+                })
+            except Exception as e:
+                logger.warning(f"Error processing internal transaction: {e}")
+                continue
+
+        return pd.DataFrame(processed)
+
     def _normalize_hash(self, hash_str: str) -> str:
         """Ensure hash has 0x prefix"""
         if not hash_str:
@@ -666,6 +739,7 @@ class BlockchainService:
         self.infura = InfuraClient()
         self.etherscan = EtherscanClient()  # Backup only
         self.web3_monitor = Web3Monitor()
+        self.fanout = None  # MultiWalletFetcher, created on first multi-wallet fetch
         self.transaction_cache = {}
         self.last_update = datetime.now(timezone.utc)
         self.wallet_address = None
@@ -677,12 +751,11 @@ class BlockchainService:
         """Initialize the service with a wallet address"""
         self.wallet_address = wallet_address
 
-        # Start Web3 monitoring in background
+        # Follow new blocks for the fund wallets in the background
         try:
-            asyncio.create_task(self.web3_monitor.monitor_address(wallet_address))
-            self.monitoring_active = True
+            self.monitoring_active = self.start_head_tracker([wallet_address]) is not None
         except Exception as e:
-            logger.warning(f"Could not start Web3 monitoring: {e}")
+            logger.warning(f"Could not start new-block tracking: {e}")
 
         # Fetch initial transactions from Infura
         return self.fetch_historical_transactions()
@@ -746,6 +819,38 @@ class BlockchainService:
         self.last_update = datetime.now(timezone.utc)
         return all_txs
 
+    def fetch_wallets(self, wallets: List[str], limit: int = 100,
+                      cursors: Optional[Dict] = None,
+                      existing: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Fetch normal, internal and token transactions of several wallets
+        concurrently and merge them into one frame with a wallet column,
+        see services/wallet_fanout.py
+
+        Args:
+            wallets: Wallet addresses (e.g. all fund wallets)
+            limit: Rows per wallet and transaction kind
+            cursors: Per (wallet, kind) last block read, updated in place;
+                pass the same dict again to fetch only newer transactions
+            existing: Rows of earlier fetches to merge the new rows into
+        """
+        from ...services.wallet_fanout import MultiWalletFetcher
+
+        if self.fanout is None:
+            self.fanout = MultiWalletFetcher(self.etherscan)
+
+        all_txs = self.fanout.fetch(wallets, limit=limit, cursors=cursors, existing=existing)
+
+        if not all_txs.empty:
+            all_txs['from_display'] = all_txs['from'].apply(self.get_friendly_name)
+            all_txs['to_display'] = all_txs['to'].apply(self.get_friendly_name)
+
+            for tx in all_txs.to_dict('records'):
+                self.transaction_cache.setdefault(tx['hash'], tx)
+
+        self.last_update = datetime.now(timezone.utc)
+        return all_txs
+
     def fetch_new_transactions(self, since_block: int = None) -> pd.DataFrame:
         """Fetch only new transactions since a given block - optimized for Infura real-time updates"""
         if not self.wallet_address:
@@ -824,6 +929,29 @@ class BlockchainService:
             return f"{wallet_address[:6]}...{wallet_address[-4:]}"
         return wallet_address
 
+    def start_head_tracker(self, wallets: Optional[List[str]] = None):
+        """
+        Follow new blocks for all fund wallets (plus wallets) with the
+        process-wide head tracker, see services/head_tracker.py
+
+        Returns:
+            The running BlockHeadTracker, or None without an Infura HTTP connection
+        """
+        if not self.is_infura_connected():
+            return None
+
+        from ...services.head_tracker import get_head_tracker
+        from ...config.blockchain_config import HEAD_TRACKER_POLL_SECONDS
+
+        watched = list(wallets or [])
+        if self.wallet_mapping is not None and not self.wallet_mapping.empty and 'wallet_address' in self.wallet_mapping.columns:
+            watched += self.wallet_mapping['wallet_address'].dropna().astype(str).tolist()
+
+        tracker = get_head_tracker(self.infura.w3_http)
+        tracker.watch(watched)
+        tracker.start(HEAD_TRACKER_POLL_SECONDS)
+        return tracker
+
     def get_all_transactions(self) -> pd.DataFrame:
         """Get all transactions (cached + real-time)"""
         # Get real-time transactions from Web3
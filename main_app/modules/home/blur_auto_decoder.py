@@ -11,7 +11,6 @@ from typing import Dict, List, Tuple, Optional, Any, Union
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from collections import defaultdict
-from functools import lru_cache
 from pathlib import Path
 import json
 import math
@@ -30,6 +29,16 @@ from ...config.blockchain_config import (
     CHAINLINK_ETH_USD_FEED, CHAINLINK_AGGREGATOR_V3_ABI
 )
 from ...s3_utils import load_abi_from_s3, list_available_abis
+from ...services.decoders.log_dispatcher import LogDispatcher
+from ...services.chain_cache import get_chain_cache
+from ...services.price_oracle import get_price_oracle
+
+# Blur Lending / Blur Pool events decoded from receipts (in output order)
+BLUR_LENDING_EVENTS = [
+    'LoanOfferTaken', 'Repay', 'Refinance', 'StartAuction',
+    'Seize', 'BuyLocked', 'OfferCancelled', 'NonceIncremented'
+]
+BLUR_POOL_EVENTS = ['Deposit', 'Withdraw']
 
 # ============================================================================
 # WEB3 SETUP
@@ -198,24 +207,25 @@ class JournalEntry:
 # HELPER FUNCTIONS
 # ============================================================================
 
-@lru_cache(maxsize=512)
 def get_eth_usd_at_block(block_number: int) -> Tuple[Decimal, datetime]:
-    """Get ETH/USD price at specific block"""
-    if not aggregator or not w3:
+    """Get ETH/USD price and block time at specific block"""
+    if not w3:
         return Decimal(3000), datetime.now(timezone.utc)
 
     try:
-        _, answer, *_ = aggregator.functions.latestRoundData().call(block_identifier=block_number)
-        price = Decimal(answer) / Decimal(1e8)
+        timestamp = get_chain_cache().get_block(w3, block_number).timestamp
+    except Exception:
+        timestamp = None
+
+    try:
+        price = get_price_oracle().price_at_block(w3, block_number, timestamp)
     except Exception as e:
         logger.warning(f"Failed to get ETH price: {e}")
         price = Decimal(3000)
 
-    try:
-        block = w3.eth.get_block(block_number)
-        return price, datetime.fromtimestamp(block.timestamp, tz=timezone.utc)
-    except:
+    if timestamp is None:
         return price, datetime.now(timezone.utc)
+    return price, datetime.fromtimestamp(timestamp, tz=timezone.utc)
 
 
 def get_implementation_address(proxy_address: str) -> Optional[str]:
@@ -329,6 +339,17 @@ class BlurAutoDecoder:
 
             if self.blur_pool_contract:
                 logger.info("Blur Pool contract loaded")
+
+            # topic0 -> event ABI for the Blur Lending and Blur Pool events we decode
+            self.log_dispatcher = LogDispatcher(w3)
+            if self.blur_lending_contract:
+                self.log_dispatcher.register(
+                    self.blur_lending_contract.abi, BLUR_LENDING, BLUR_LENDING_EVENTS
+                )
+            if self.blur_pool_contract:
+                self.log_dispatcher.register(
+                    self.blur_pool_contract.abi, BLUR_POOL, BLUR_POOL_EVENTS
+                )
         except Exception as e:
             logger.error(f"Failed to load Blur contracts: {e}")
 
@@ -424,9 +445,7 @@ class BlurAutoDecoder:
 
         try:
             # Get transaction and receipt
-            tx = w3.eth.get_transaction(tx_hash)
-            receipt = w3.eth.get_transaction_receipt(tx_hash)
-            block = w3.eth.get_block(tx.blockNumber)
+            tx, receipt, block = get_chain_cache().get_transaction_bundle(w3, tx_hash)
             block_time = datetime.fromtimestamp(block.timestamp, tz=timezone.utc)
             eth_price, _ = get_eth_usd_at_block(tx.blockNumber)
 
@@ -778,7 +797,7 @@ class BlurAutoDecoder:
                     self.positions[lien_id] = position
 
                     # Calculate interest as of repay block time
-                    block = w3.eth.get_block(tx.blockNumber)
+                    block = get_chain_cache().get_block(w3, tx.blockNumber)
                     repay_time = datetime.fromtimestamp(block.timestamp, tz=timezone.utc)
                     time_elapsed = (repay_time - position.start_time).total_seconds()
                     total_debt = position.total_due(repay_time)
@@ -832,7 +851,7 @@ class BlurAutoDecoder:
                         self.positions[lien_id] = old_position
 
                         # Calculate amounts for refinancing
-                        block = w3.eth.get_block(tx.blockNumber)
+                        block = get_chain_cache().get_block(w3, tx.blockNumber)
                         refinance_time = datetime.fromtimestamp(block.timestamp, tz=timezone.utc)
                         interest_accrued = old_position.calculate_interest(refinance_time)
                         full_debt = old_position.principal + interest_accrued
@@ -868,34 +887,20 @@ class BlurAutoDecoder:
         if not self.blur_lending_contract:
             return events
 
-        # List of known Blur Lending events to check
-        blur_lending_events = [
-            'LoanOfferTaken', 'Repay', 'Refinance', 'StartAuction',
-            'Seize', 'BuyLocked', 'OfferCancelled', 'NonceIncremented'
-        ]
+        # Decode every log once by topic0 (any emitting address, as
+        # process_receipt did), then group by event name in the order below.
+        # Blur Pool Transfer is handled separately in pool_transfers.
+        by_event = defaultdict(list)
+        for log in receipt.logs:
+            for entry, decoded in self.log_dispatcher.iter_decoded(log, any_address=True):
+                by_event[(entry.address, entry.event_name)].append(decoded)
 
-        # Try to decode each known event type
-        for event_name in blur_lending_events:
-            try:
-                if hasattr(self.blur_lending_contract.events, event_name):
-                    event_instance = getattr(self.blur_lending_contract.events, event_name)
-                    decoded_events = event_instance().process_receipt(receipt)
-                    events.extend(decoded_events)
-            except Exception as e:
-                # Event not found in receipt, continue
-                pass
+        for event_name in BLUR_LENDING_EVENTS:
+            events.extend(by_event.get((BLUR_LENDING.lower(), event_name), []))
 
-        # Also check Blur Pool events (but skip Transfer - handled separately in pool_transfers)
         if self.blur_pool_contract:
-            blur_pool_events = ['Deposit', 'Withdraw']
-            for event_name in blur_pool_events:
-                try:
-                    if hasattr(self.blur_pool_contract.events, event_name):
-                        event_instance = getattr(self.blur_pool_contract.events, event_name)
-                        decoded_events = event_instance().process_receipt(receipt)
-                        events.extend(decoded_events)
-                except Exception as e:
-                    pass
+            for event_name in BLUR_POOL_EVENTS:
+                events.extend(by_event.get((BLUR_POOL.lower(), event_name), []))
 
         # Decode NFT events from all logs
         for log in receipt.logs:
@@ -10,6 +10,7 @@ from typing import Dict, List, Any, Optional
 import logging
 import pandas as pd
 
+from ...services.gl_row_index import gl_row_keys
 from .decoded_transactions_ui import (
     transaction_card_ui,
     empty_state_ui,
@@ -27,16 +28,31 @@ def _generate_gl_row_key(row: Dict) -> str:
     """
     Generate deterministic unique key for GL row deduplication.
 
-    Key components: hash + account + type + debit + credit
-    This ensures the same journal entry line can't be posted twice.
+    Key components: hash + account + type + debit + credit (or the row's
+    row_key when set). Single-row form of gl_row_keys(), which the GL
+    row-key index uses for the whole batch.
     """
-    return (
-        f"{row.get('hash', '')}:"
-        f"{row.get('account_name', '')}:"
-        f"{row.get('transaction_type', '')}:"
-        f"{row.get('debit_crypto', 0)}:"
-        f"{row.get('credit_crypto', 0)}"
-    )
+    return gl_row_keys(pd.DataFrame([row]))[0]
+
+
+def _wallet_fund_map(wallet_df: Optional[pd.DataFrame]) -> Dict[str, str]:
+    """Lowercase wallet address -> fund_id from the wallet mapping file."""
+    if wallet_df is None or wallet_df.empty or 'wallet_address' not in wallet_df.columns or 'fund_id' not in wallet_df.columns:
+        return {}
+    addresses = wallet_df['wallet_address'].fillna('').astype(str).str.strip().str.lower()
+    funds = wallet_df['fund_id'].fillna('').astype(str).str.strip()
+    keep = (addresses != '') & (funds != '')
+    return dict(zip(addresses[keep], funds[keep]))
+
+
+def _coa_accounts(coa_df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """COA rows with a usable integer GL_Acct_Number and name (columns number, name)."""
+    if coa_df is None or coa_df.empty or 'GL_Acct_Number' not in coa_df.columns or 'GL_Acct_Name' not in coa_df.columns:
+        return pd.DataFrame({'number': pd.Series(dtype='int64'), 'name': pd.Series(dtype=object)})
+    numbers = pd.to_numeric(coa_df['GL_Acct_Number'], errors='coerce')
+    names = coa_df['GL_Acct_Name'].fillna('').astype(str).str.strip()
+    keep = numbers.notna() & (numbers != 0) & (names != '')
+    return pd.DataFrame({'number': numbers[keep].astype('int64'), 'name': names[keep]})
 
 
 def _get_unified_registry(decoder_registry_value, decoded_tx_cache_value):
@@ -619,15 +635,8 @@ def register_decoded_transactions_outputs(output, input, session, decoder_regist
 
         # Load wallet mapping for fund_id lookup
         try:
-            from ...s3_utils import load_WALLET_file, load_COA_file
-            wallet_df = load_WALLET_file()
-            wallet_to_fund_map = {}
-            if wallet_df is not None and not wallet_df.empty:
-                for _, row in wallet_df.iterrows():
-                    addr = str(row.get('wallet_address', '')).strip().lower()
-                    fund = str(row.get('fund_id', '')).strip()
-                    if addr and fund:
-                        wallet_to_fund_map[addr] = fund
+            from ...s3_utils import load_WALLET_file
+            wallet_to_fund_map = _wallet_fund_map(load_WALLET_file())
             logger.info(f"Loaded {len(wallet_to_fund_map)} wallet-to-fund mappings")
         except Exception as e:
             logger.warning(f"Could not load wallet mappings: {e}")
@@ -635,23 +644,16 @@ def register_decoded_transactions_outputs(output, input, session, decoder_regist
 
         # Load COA for GL account number lookup
         try:
-            coa_df = load_COA_file()
-            coa_map = {}
-            if coa_df is not None and not coa_df.empty:
-                for _, row in coa_df.iterrows():
-                    try:
-                        acct_num = int(row.get('GL_Acct_Number', 0))
-                        acct_name = str(row.get('GL_Acct_Name', '')).strip()
-                        if acct_num and acct_name:
-                            # Map by GL_Acct_Name for lookup
-                            coa_map[acct_name] = (acct_num, acct_name)
-                            # Also map by lowercase for flexible matching
-                            coa_map[acct_name.lower()] = (acct_num, acct_name)
-                    except:
-                        continue
+            from ...s3_utils import load_COA_file
+            coa_accounts = _coa_accounts(load_COA_file())
+            # Map by GL_Acct_Name, and by lowercase name for flexible matching
+            pairs = list(zip(coa_accounts['number'], coa_accounts['name']))
+            coa_map = {name: (number, name) for number, name in pairs}
+            coa_map.update({name.lower(): (number, name) for number, name in pairs})
             logger.info(f"Loaded {len(coa_map)} COA account mappings")
         except Exception as e:
             logger.warning(f"Could not load COA: {e}")
+            coa_accounts = _coa_accounts(None)
             coa_map = {}
 
         for tx in auto_ready:
@@ -751,33 +753,12 @@ def register_decoded_transactions_outputs(output, input, session, decoder_regist
         accrual_count = len(accrual_entries)
 
         try:
-            from ...s3_utils import (
-                save_GL_file, load_GL_file,
-                save_GL2_file, load_GL2_file, clear_GL2_cache
-            )
+            from ...s3_utils import post_GL_entries, post_GL2_entries, load_GL_file
 
-            # Create DataFrame with dedup keys
+            # Append only lines whose row key is not in the GL yet; the
+            # row-key index kept beside the GL answers that per line
             df_new = pd.DataFrame(combined_entries)
-            # Use existing row_key if present (from interest accruals), otherwise generate one
-            df_new['_row_key'] = df_new.apply(
-                lambda row: row.get('row_key') if pd.notna(row.get('row_key')) and row.get('row_key')
-                           else _generate_gl_row_key(row.to_dict()),
-                axis=1
-            )
-
-            # Get fresh GL data
-            load_GL_file.cache_clear()
-            existing_gl = load_GL_file()
-
-            # Add dedup keys to existing GL
-            existing_gl['_row_key'] = existing_gl.apply(
-                lambda row: _generate_gl_row_key(row.to_dict()), axis=1
-            )
-            existing_keys = set(existing_gl['_row_key'].tolist())
-
-            # Filter out duplicates
-            df_to_add = df_new[~df_new['_row_key'].isin(existing_keys)]
-            duplicates_count = len(df_new) - len(df_to_add)
+            df_to_add, duplicates_count = post_GL_entries(df_new)
 
             if df_to_add.empty:
                 ui.notification_show(
@@ -786,19 +767,10 @@ def register_decoded_transactions_outputs(output, input, session, decoder_regist
                 )
                 return
 
-            # Remove helper column before save
-            df_to_add = df_to_add.drop(columns=['_row_key'])
-            existing_gl = existing_gl.drop(columns=['_row_key'])
-
-            # Combine and save to existing GL
-            combined_gl = pd.concat([existing_gl, df_to_add], ignore_index=True)
-            save_GL_file(combined_gl)
-
             # Also save to GL2 (new General Ledger 2)
             try:
                 from datetime import datetime, timezone
                 import re
-                from ...s3_utils import load_COA_file
 
                 def extract_account_number(account_name_str):
                     """Extract account number from account name like '100.30 - ETH Wallet'"""
@@ -810,24 +782,17 @@ def register_decoded_transactions_outputs(output, input, session, decoder_regist
                         return match.group(1)
                     return ''
 
-                # Load COA for account name to number mapping
-                coa_df = load_COA_file()
+                # COA account name to number mapping
                 account_name_to_number = {}
                 account_number_to_name = {}
-                if not coa_df.empty:
-                    for _, coa_row in coa_df.iterrows():
-                        try:
-                            acct_num = str(int(coa_row['GL_Acct_Number']))
-                            acct_name = str(coa_row['GL_Acct_Name']).strip()
-                            # Map both ways
-                            account_name_to_number[acct_name.lower()] = acct_num
-                            account_number_to_name[acct_num] = acct_name
-                            # Also map partial names
-                            words = acct_name.lower().split()
-                            if len(words) >= 2:
-                                account_name_to_number[' '.join(words[:2])] = acct_num
-                        except:
-                            continue
+                for number, name in zip(coa_accounts['number'].astype(str), coa_accounts['name']):
+                    # Map both ways
+                    account_name_to_number[name.lower()] = number
+                    account_number_to_name[number] = name
+                    # Also map partial names
+                    words = name.lower().split()
+                    if len(words) >= 2:
+                        account_name_to_number[' '.join(words[:2])] = number
 
                 def lookup_account_number(account_name):
                     """Look up account number from COA by name"""
@@ -846,7 +811,8 @@ def register_decoded_transactions_outputs(output, input, session, decoder_regist
 
                 # Prepare GL2 format records
                 gl2_records = []
-                for _, row in df_to_add.iterrows():
+                row_keys = gl_row_keys(df_to_add)
+                for (_, row), row_key in zip(df_to_add.iterrows(), row_keys):
                     account_name = row.get('account_name', '')
                     # Try to extract number first, then lookup
                     account_number = extract_account_number(account_name)
@@ -881,23 +847,14 @@ def register_decoded_transactions_outputs(output, input, session, decoder_regist
                         'platform': row.get('platform', 'unknown'),
                         'timestamp': row.get('date', datetime.now(timezone.utc)),
                         'posted_date': datetime.now(timezone.utc),
-                        'row_key': _generate_gl_row_key(row.to_dict())
+                        'row_key': row_key
                     }
                     gl2_records.append(gl2_record)
 
                 if gl2_records:
-                    gl2_new_df = pd.DataFrame(gl2_records)
-                    clear_GL2_cache()
-                    existing_gl2 = load_GL2_file()
-
-                    # Deduplicate by row_key
-                    existing_gl2_keys = set(existing_gl2['row_key'].tolist()) if 'row_key' in existing_gl2.columns and not existing_gl2.empty else set()
-                    gl2_to_add = gl2_new_df[~gl2_new_df['row_key'].isin(existing_gl2_keys)]
-
-                    if not gl2_to_add.empty:
-                        combined_gl2 = pd.concat([existing_gl2, gl2_to_add], ignore_index=True)
-                        save_GL2_file(combined_gl2)
-                        logger.info(f"Also posted {len(gl2_to_add)} entries to GL2")
+                    gl2_posted, _ = post_GL2_entries(pd.DataFrame(gl2_records))
+                    if not gl2_posted.empty:
+                        logger.info(f"Also posted {len(gl2_posted)} entries to GL2")
             except Exception as gl2_err:
                 logger.warning(f"Could not post to GL2: {gl2_err}")
                 # Don't fail the whole operation if GL2 fails
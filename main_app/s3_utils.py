@@ -10,6 +10,12 @@ import re
 import json
 import logging
 
+from .services.gl_store import GLStore, MANIFEST_NAME, dataset_prefix
+from .services.dataset_cache import cached_dataset
+from .services.fund_summary import FundSummary, FundSummaryCube
+from .services.gl_row_index import GLRowKeyIndex
+from .services.gl_amounts import to_amounts
+
 logger = logging.getLogger(__name__)
 
 def safe_to_decimal(value):
@@ -54,14 +60,43 @@ GP_INCENTIVE_AUDIT_KEY = "drip_capital/20240731_fund_i_class_B_ETH_GP_incentive_
 APPROVED_TOKENS_KEY = "drip_capital/user_approved_tokens.csv"
 REJECTED_TOKENS_KEY = "drip_capital/user_rejected_tokens.csv"
 PCAP_EXCEL_PREFIX = "drip_capital/PCAP/"  # Prefix for PCAP Excel files
+PCAP_SNAPSHOT_PREFIX = "drip_capital/PCAP_snapshots/"  # Prefix for closed-period PCAP snapshots
 FIFO_LEDGER_KEY = "drip_capital/fifo_ledger_results.parquet"
 ABI_PREFIX = "drip_capital/smart_contract_ABIs/"  # Prefix for contract ABIs (note: capital ABIs)
 GL2_KEY = "drip_capital/general_ledger.parquet"  # New General Ledger 2
 
+# Financial columns stored as float64 and loaded as Decimal
+GL_NUMERIC_COLUMNS = [
+    'debit_crypto', 'credit_crypto', 'debit_USD', 'credit_USD',
+    'net_debit_credit_crypto', 'net_debit_credit_USD',
+    'eth_usd_price', 'principal_crypto', 'principal_USD',
+    'interest_rec_crypto', 'interest_rec_USD',
+    'payoff_amount_crypto', 'payoff_amount_USD',
+    'annual_interest_rate'
+]
+GL2_NUMERIC_COLUMNS = [
+    'debit_crypto', 'credit_crypto', 'debit_USD', 'credit_USD',
+    'eth_usd_price', 'principal_crypto', 'principal_USD',
+    'annual_interest_rate', 'payoff_amount_crypto', 'payoff_amount_USD',
+    'end_of_day_ETH_USD'
+]
+
+# Load GL amounts as typed fixed-point columns in the TB/NAV/PCAP paths
+TYPED_GL_AMOUNTS = os.environ.get("GL_TYPED_AMOUNTS", "").lower() in ("1", "true", "yes")
+
 # -- Create a reusable S3 client
 # Create S3 client - will be initialized when first used
 s3 = None
 
+# Partitioned GL stores by legacy key
+_gl_stores = {}
+
+# Dashboard summaries of the partitioned GLs, by legacy key
+_fund_summaries = {}
+
+# Row-key dedup indexes of the partitioned GLs, by legacy key
+_gl_row_indexes = {}
+
 def get_s3_client():
     """Get or create S3 client"""
     global s3
@@ -151,7 +186,22 @@ def list_available_abis() -> list:
         logger.error(f"Error listing ABIs: {e}")
         return []
 
-@lru_cache(maxsize=32)
+def _s3_version(key: str):
+    """Current version of an S3 object (VersionId, else ETag) from a HEAD request; None if unknown."""
+    try:
+        head = get_s3_client().head_object(Bucket=BUCKET_NAME, Key=key)
+    except Exception as e:
+        logger.debug(f"HEAD {key} failed: {e}")
+        return None
+    return head.get("VersionId") or head.get("ETag")
+
+def _dataset_version(key: str, **_):
+    """Version of the data behind a loader key: the store manifest for parquet GLs, else the object."""
+    if key.endswith(".parquet"):
+        return _s3_version(dataset_prefix(key) + MANIFEST_NAME)
+    return _s3_version(key)
+
+@cached_dataset(_dataset_version)
 def load_tb_file(key: str = TB_KEY) -> pd.DataFrame:
     """Load a TB file from S3 as a DataFrame."""
     obj = get_s3_client().get_object(Bucket=BUCKET_NAME, Key=key)
@@ -163,9 +213,8 @@ def load_tb_file(key: str = TB_KEY) -> pd.DataFrame:
     else:
         raise ValueError(f"Unsupported file type for key: {key}")
     
-@lru_cache
+@cached_dataset(_dataset_version)
 def load_COA_file(key: str = COA_KEY) -> pd.DataFrame:
-    s3 = boto3.client("s3", region_name="us-east-2")
     obj = get_s3_client().get_object(Bucket=BUCKET_NAME, Key=key)
     data = obj["Body"].read().decode("utf-8")
 
@@ -202,42 +251,108 @@ def save_COA_file(df: pd.DataFrame, key: str = COA_KEY) -> bool:
         traceback.print_exc()
         return False
     
-def save_GL_file(df: pd.DataFrame, key: str = GL_KEY):
-    # Make a copy to avoid modifying the original
+def _normalize_numeric_columns(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Copy of df with the given columns as float64 (parquet can't mix Decimal/float)."""
     df = df.copy()
+    for col in columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    return df
 
+def get_gl_store(key: str = GL_KEY) -> GLStore:
+    """Partitioned append-only store behind a GL parquet key (one per key per process)."""
+    store = _gl_stores.get(key)
+    if store is None:
+        store = _gl_stores[key] = GLStore(key, get_s3_client(), BUCKET_NAME)
+    return store
+
+def get_gl_row_index(key: str = GL_KEY) -> GLRowKeyIndex:
+    """Row-key index kept beside a GL store, for idempotent posting (one per key per process)."""
+    index = _gl_row_indexes.get(key)
+    if index is None:
+        index = _gl_row_indexes[key] = GLRowKeyIndex(get_gl_store(key))
+    return index
+
+def get_fund_summary(key: str = GL_KEY) -> FundSummaryCube:
+    """
+    Dashboard aggregates of a GL (see services.fund_summary), kept current
+    across sessions; only partitions changed since the last call are re-read.
+    """
+    if not key.endswith(".parquet"):
+        return FundSummaryCube.from_gl(load_GL_file(key))
+    summary = _fund_summaries.get(key)
+    if summary is None:
+        summary = _fund_summaries[key] = FundSummary(get_gl_store(key))
+    return summary.cube()
+
+def _posted(key: str):
+    """Drop what was cached from a GL that was just written."""
+    load_GL_file.cache_clear()
+    _read_gl.cache_clear()
+    if key in _fund_summaries:
+        _fund_summaries[key].invalidate()
+
+def save_GL_file(df: pd.DataFrame, key: str = GL_KEY):
+    """
+    Save the whole GL. Only the (fund, month) partitions whose rows changed
+    are rewritten; use append_GL_entries() to post new lines.
+    """
     # Normalize numeric columns to float64 for parquet compatibility
-    # Parquet can't handle mixed Decimal/float types
-    numeric_cols = [
-        'debit_crypto', 'credit_crypto', 'debit_USD', 'credit_USD',
-        'net_debit_credit_crypto', 'net_debit_credit_USD',
-        'eth_usd_price', 'principal_crypto', 'principal_USD',
-        'interest_rec_crypto', 'interest_rec_USD',
-        'payoff_amount_crypto', 'payoff_amount_USD',
-        'annual_interest_rate'
-    ]
+    df = _normalize_numeric_columns(df, GL_NUMERIC_COLUMNS)
 
-    for col in numeric_cols:
-        if col in df.columns:
-            # Convert Decimal/object to float64
-            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    if key.endswith(".parquet"):
+        get_gl_store(key).replace(df)
+        _posted(key)
+        return
 
-    # Save to Parquet
     buffer = BytesIO()
     df.to_parquet(buffer, index=False)
     buffer.seek(0)
     get_s3_client().put_object(Bucket=BUCKET_NAME, Key=key, Body=buffer.getvalue())
 
-@lru_cache(maxsize=32)
-def load_GL_file(key: str = GL_KEY) -> pd.DataFrame:
-    """Load a GL file from S3 as a DataFrame and assign unique transaction IDs."""
-    obj = get_s3_client().get_object(Bucket=BUCKET_NAME, Key=key)
-    content = obj["Body"].read()
+def append_GL_entries(df: pd.DataFrame, key: str = GL_KEY) -> int:
+    """
+    Post new journal lines to the GL without rewriting the existing ledger.
+
+    Returns:
+        Number of rows appended
+    """
+    appended = get_gl_store(key).append(_normalize_numeric_columns(df, GL_NUMERIC_COLUMNS))
+    _posted(key)
+    return appended
+
+def post_GL_entries(df: pd.DataFrame, key: str = GL_KEY):
+    """
+    Post journal lines to the GL, skipping lines whose row key is already in
+    it. Only the new lines' keys are probed against the row-key index, so the
+    cost does not grow with the ledger.
+
+    Returns:
+        (lines appended, number of lines skipped as already posted)
+    """
+    new, skipped = get_gl_row_index(key).post(_normalize_numeric_columns(df, GL_NUMERIC_COLUMNS))
+    if not new.empty:
+        _posted(key)
+    return new, skipped
+
+def _cast_numeric_columns(df: pd.DataFrame, columns, typed: bool) -> pd.DataFrame:
+    """Financial columns as Decimal objects, or as typed amounts (see services.gl_amounts)."""
+    for col in columns:
+        if col in df.columns:
+            df[col] = to_amounts(df[col]) if typed else df[col].apply(safe_to_decimal)
+    return df
 
+@cached_dataset(_dataset_version)
+def load_GL_file(key: str = GL_KEY, typed: bool = False) -> pd.DataFrame:
+    """
+    Load a GL file from S3 as a DataFrame and assign unique transaction IDs.
+
+    With typed=True the financial columns are decimal128 amounts that
+    aggregate natively instead of object columns of Decimal.
+    """
     if key.endswith(".parquet"):
-        # Use PyArrow for better control over data types
-        table = pq.read_table(BytesIO(content))
-        df = table.to_pandas()
+        # Only the manifest and files not already cached are downloaded
+        df = get_gl_store(key).read()
         
         # Fix datetime columns to be UTC-aware
         if "date" in df.columns:
@@ -245,23 +360,13 @@ def load_GL_file(key: str = GL_KEY) -> pd.DataFrame:
         if "operating_date" in df.columns:
             df["operating_date"] = pd.to_datetime(df["operating_date"], utc=True)
         
-        # Cast financial columns to Decimal for precision
-        decimal_cols = [
-            'debit_crypto', 'credit_crypto', 'debit_USD', 'credit_USD',
-            'net_debit_credit_crypto', 'net_debit_credit_USD',
-            'eth_usd_price', 'principal_crypto', 'principal_USD',
-            'interest_rec_crypto', 'interest_rec_USD',
-            'payoff_amount_crypto', 'payoff_amount_USD',
-            'annual_interest_rate'
-        ]
-        
-        for col in decimal_cols:
-            if col in df.columns:
-                df[col] = df[col].apply(safe_to_decimal)
+        # Cast financial columns to Decimal (or typed amounts) for precision
+        df = _cast_numeric_columns(df, GL_NUMERIC_COLUMNS, typed)
         
         df.attrs["dtypes"] = df.dtypes.to_dict()
     elif key.endswith(".xlsx"):
-        df = pd.read_excel(BytesIO(content))
+        obj = get_s3_client().get_object(Bucket=BUCKET_NAME, Key=key)
+        df = pd.read_excel(BytesIO(obj["Body"].read()))
     else:
         raise ValueError(f"Unsupported file type for key: {key}")
 
@@ -272,6 +377,49 @@ def load_GL_file(key: str = GL_KEY) -> pd.DataFrame:
 
     return df
 
+@cached_dataset(_dataset_version)
+def _read_gl(key: str, fund_id, start, end, columns, typed: bool) -> pd.DataFrame:
+    df = get_gl_store(key).read(fund_id=fund_id, start=start, end=end,
+                                columns=list(columns) if columns is not None else None)
+
+    # Fix datetime columns to be UTC-aware
+    for col in ("date", "operating_date", "loan_due_date"):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], utc=True, errors='coerce')
+
+    # Cast financial columns to Decimal (or typed amounts) for precision
+    return _cast_numeric_columns(df, dict.fromkeys(GL_NUMERIC_COLUMNS + GL2_NUMERIC_COLUMNS), typed)
+
+def read_gl(fund_id=None, start=None, end=None, columns=None, key: str = GL_KEY,
+            typed: bool = False) -> pd.DataFrame:
+    """
+    Query a GL: only the rows of the given fund(s) and date range, and only
+    the given columns.
+
+    Partitions, files and parquet row groups outside the fund / date range
+    are skipped and only the requested column chunks are fetched, so a report
+    reads a fraction of the ledger instead of all of it.
+
+    Args:
+        fund_id: Fund or list of funds (default: all)
+        start: Earliest date, inclusive
+        end: Latest date, inclusive
+        columns: Columns to return (default: all); names the ledger does not have are left out
+        key: GL key (GL_KEY or GL2_KEY)
+        typed: Financial columns as typed amounts instead of Decimal
+
+    Returns:
+        Matching rows with UTC dates; unlike load_GL_file no transaction_id is assigned
+    """
+    if fund_id is not None and not isinstance(fund_id, str):
+        fund_id = tuple(fund_id)
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    columns = tuple(columns) if columns is not None else None
+
+    # The dataset cache hands out copies: callers can modify the result freely
+    return _read_gl(key, fund_id, start, end, columns, typed)
+
 
 # ============= General Ledger 2 Functions =============
 
@@ -388,15 +536,17 @@ def create_empty_GL2(key: str = GL2_KEY) -> bool:
         logger.error(f"Error creating empty GL2: {e}")
         return False
 
-@lru_cache(maxsize=32)
-def load_GL2_file(key: str = GL2_KEY) -> pd.DataFrame:
-    """Load GL2 parquet file from S3. Creates empty file if not exists."""
-    try:
-        obj = get_s3_client().get_object(Bucket=BUCKET_NAME, Key=key)
-        content = obj["Body"].read()
+@cached_dataset(_dataset_version)
+def load_GL2_file(key: str = GL2_KEY, typed: bool = False) -> pd.DataFrame:
+    """
+    Load GL2 from its partitioned S3 store (empty ledger if none exists yet).
 
-        table = pq.read_table(BytesIO(content))
-        df = table.to_pandas()
+    With typed=True the financial columns are decimal128 amounts instead of Decimal objects.
+    """
+    try:
+        df = get_gl_store(key).read()
+        if df.empty and len(df.columns) == 0:
+            return pd.DataFrame(columns=get_gl2_schema_columns())
 
         # Fix datetime columns to be UTC-aware
         if "date" in df.columns:
@@ -404,55 +554,27 @@ def load_GL2_file(key: str = GL2_KEY) -> pd.DataFrame:
         if "loan_due_date" in df.columns:
             df["loan_due_date"] = pd.to_datetime(df["loan_due_date"], utc=True, errors='coerce')
 
-        # Cast financial columns to Decimal for precision
-        decimal_cols = ['debit_crypto', 'credit_crypto', 'debit_USD', 'credit_USD',
-                        'eth_usd_price', 'principal_crypto', 'principal_USD',
-                        'annual_interest_rate', 'payoff_amount_crypto', 'payoff_amount_USD',
-                        'end_of_day_ETH_USD']
-        for col in decimal_cols:
-            if col in df.columns:
-                df[col] = df[col].apply(safe_to_decimal)
-
-        return df
-
-    except get_s3_client().exceptions.NoSuchKey:
-        # File doesn't exist, create empty one
-        logger.info(f"GL2 file not found, creating empty file at {key}")
-        create_empty_GL2(key)
-        return pd.DataFrame(columns=get_gl2_schema_columns())
+        # Cast financial columns to Decimal (or typed amounts) for precision
+        return _cast_numeric_columns(df, GL2_NUMERIC_COLUMNS, typed)
 
     except Exception as e:
         logger.error(f"Error loading GL2 file: {e}")
         return pd.DataFrame(columns=get_gl2_schema_columns())
 
 def save_GL2_file(df: pd.DataFrame, key: str = GL2_KEY) -> bool:
-    """Save GL2 DataFrame to S3 with proper typing."""
+    """
+    Save the whole GL2 with proper typing. Only the (fund, month) partitions
+    whose rows changed are rewritten; use append_GL2_entries() to post new lines.
+    """
     try:
-        # Make a copy to avoid modifying the original
-        df = df.copy()
-
         # Normalize numeric columns to float64 for parquet compatibility
-        numeric_cols = ['debit_crypto', 'credit_crypto', 'debit_USD', 'credit_USD',
-                        'eth_usd_price', 'principal_crypto', 'principal_USD',
-                        'annual_interest_rate', 'payoff_amount_crypto', 'payoff_amount_USD',
-                        'end_of_day_ETH_USD']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        df = _normalize_numeric_columns(df, GL2_NUMERIC_COLUMNS)
 
-        # Save to Parquet
-        buffer = BytesIO()
-        df.to_parquet(buffer, index=False)
-        buffer.seek(0)
-
-        get_s3_client().put_object(
-            Bucket=BUCKET_NAME,
-            Key=key,
-            Body=buffer.getvalue()
-        )
+        get_gl_store(key).replace(df)
 
         # Clear cache since we've updated the data
         load_GL2_file.cache_clear()
+        _read_gl.cache_clear()
 
         logger.info(f"Saved GL2 file with {len(df)} entries")
         return True
@@ -463,9 +585,39 @@ def save_GL2_file(df: pd.DataFrame, key: str = GL2_KEY) -> bool:
         traceback.print_exc()
         return False
 
+def append_GL2_entries(df: pd.DataFrame, key: str = GL2_KEY) -> bool:
+    """Post new journal lines to GL2 without rewriting the existing ledger."""
+    try:
+        appended = get_gl_store(key).append(_normalize_numeric_columns(df, GL2_NUMERIC_COLUMNS))
+        load_GL2_file.cache_clear()
+        _read_gl.cache_clear()
+
+        logger.info(f"Appended {appended} GL2 entries")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error appending GL2 entries: {e}")
+        return False
+
+def post_GL2_entries(df: pd.DataFrame, key: str = GL2_KEY):
+    """
+    Post journal lines to GL2, skipping lines whose row key is already in it
+    (see post_GL_entries).
+
+    Returns:
+        (lines appended, number of lines skipped as already posted)
+    """
+    new, skipped = get_gl_row_index(key).post(_normalize_numeric_columns(df, GL2_NUMERIC_COLUMNS))
+    if not new.empty:
+        load_GL2_file.cache_clear()
+        _read_gl.cache_clear()
+        logger.info(f"Appended {len(new)} GL2 entries ({skipped} already posted)")
+    return new, skipped
+
 def clear_GL2_cache():
     """Clear the GL2 file cache."""
     load_GL2_file.cache_clear()
+    _read_gl.cache_clear()
 
 
 def append_audit_log(changes_df: pd.DataFrame, key="drip_capital/gl_edit_log.csv"):
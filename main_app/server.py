@@ -1,6 +1,7 @@
 from shiny import reactive, render, ui
 import pandas as pd
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from .modules.fund_accounting import register_outputs as register_fund_accounting_outputs
 from .modules.financial_reporting.financial_reporting import register_outputs as register_financial_reporting_outputs
@@ -29,6 +30,60 @@ from .ui import (
 from .theme_manager import theme_manager
 
 
+@lru_cache(maxsize=8)
+def _tb_date_columns(columns: tuple) -> dict:
+    """Date -> column of a trial balance's balance columns, parsed once per header."""
+    date_mapping = {}
+    for col in columns[3:]:  # Skip account info columns
+        try:
+            date_obj = pd.to_datetime(col, errors="raise").date()
+            date_mapping[date_obj] = col
+        except Exception:
+            continue
+    return date_mapping
+
+
+def _reporting_figures(fund_id, current_date):
+    """
+    MTD revenue and expenses and total assets of a fund as of current_date
+    (see fund_reporting_figures in server); None if the fund has no GL data.
+    """
+    from .modules.financial_reporting.tb_generator import get_income_expense_changes, generate_trial_balance_from_gl
+    from .s3_utils import load_GL_file
+    from .account_mapper import enrich_gl_with_coa_mapping
+    
+    # Load GL data and filter by selected fund (same as financial reporting)
+    gl_df = load_GL_file()
+    if fund_id and 'fund_id' in gl_df.columns:
+        gl_df = gl_df[gl_df['fund_id'] == fund_id]
+    
+    if gl_df.empty:
+        return None
+    
+    # Ensure date column is properly formatted
+    if 'date' in gl_df.columns:
+        gl_df['date'] = pd.to_datetime(gl_df['date'], utc=True, errors='coerce')
+    elif 'operating_date' in gl_df.columns:
+        gl_df['date'] = pd.to_datetime(gl_df['operating_date'], utc=True, errors='coerce')
+    
+    # Enrich with COA mappings
+    gl_df = enrich_gl_with_coa_mapping(gl_df)
+    
+    # Get income and expense changes using same logic as financial reporting
+    income_df, expense_df = get_income_expense_changes(gl_df, current_date)
+    revenue = income_df['MTD'].sum() if not income_df.empty and 'MTD' in income_df.columns else 0
+    expenses = expense_df['MTD'].sum() if not expense_df.empty and 'MTD' in expense_df.columns else 0
+    
+    # Get total assets (1xxxx) from the trial balance
+    tb_df = generate_trial_balance_from_gl(gl_df, current_date)
+    assets = 0
+    if not tb_df.empty:
+        asset_accounts = tb_df[tb_df['GL_Acct_Number'].astype(str).str.startswith('1')]
+        assets = asset_accounts['Balance'].sum() if not asset_accounts.empty else 0
+    
+    return {"revenue": revenue, "expenses": expenses, "assets": assets}
+
+
 def server(input, output, session):
 
     # Get default values from environment (set by launcher) or use fallbacks
@@ -56,7 +111,7 @@ def server(input, output, session):
     # Smart helper function that uses TB when available, falls back to GL
     def calculate_financial_metrics(account_number_ranges, selected_date=None):
         """Calculate financial metrics using TB data when available, GL data as fallback"""
-        from .s3_utils import load_tb_file, load_COA_file, load_GL_file
+        from .s3_utils import load_tb_file, load_COA_file, get_fund_summary
         
         df_coa = load_COA_file()
         if df_coa.empty:
@@ -74,13 +129,7 @@ def server(input, output, session):
         
         if not df_tb.empty:
             # Check if TB has data for our target date
-            date_mapping = {}
-            for col in df_tb.columns[3:]:
-                try:
-                    date_obj = pd.to_datetime(col, errors="raise").date()
-                    date_mapping[date_obj] = col
-                except Exception:
-                    continue
+            date_mapping = _tb_date_columns(tuple(df_tb.columns))
             
             parsed_dates = sorted(date_mapping.keys())
             if parsed_dates and min(parsed_dates) <= target_date <= max(parsed_dates):
@@ -96,19 +145,16 @@ def server(input, output, session):
                 eligible = [d for d in parsed_dates if d <= date_obj]
                 return eligible[-1] if eligible else min(parsed_dates)
             
-            def get_mtd_change(row):
-                start_dt = get_nearest_or_first(start_mtd)
-                end_dt = get_nearest_or_first(target_date)
-                start_val = pd.to_numeric(row.get(date_mapping[start_dt], 0.0), errors='coerce')
-                end_val = pd.to_numeric(row.get(date_mapping[end_dt], 0.0), errors='coerce')
-                change = (end_val or 0) - (start_val or 0)
-                
-                # For income accounts (9xxxx), flip the sign
-                gl_acct = str(pd.to_numeric(row["GL_Acct_Number"], errors="coerce"))
-                if gl_acct.startswith("9"):
-                    change *= -1
-                
-                return round(change, 6)
+            # MTD change of every TB row at once
+            start_col = date_mapping[get_nearest_or_first(start_mtd)]
+            end_col = date_mapping[get_nearest_or_first(target_date)]
+            start_vals = pd.to_numeric(df_tb[start_col], errors='coerce').fillna(0)
+            end_vals = pd.to_numeric(df_tb[end_col], errors='coerce').fillna(0)
+            mtd_changes = end_vals - start_vals
+            
+            # For income accounts (9xxxx), flip the sign
+            gl_acct = pd.to_numeric(df_tb["GL_Acct_Number"], errors="coerce").astype(str)
+            mtd_changes = mtd_changes.where(~gl_acct.str.startswith("9"), -mtd_changes).round(6)
             
             total_changes = {}
             for range_name, (start_range, end_range) in account_number_ranges.items():
@@ -117,33 +163,19 @@ def server(input, output, session):
                     (df_coa['GL_Acct_Number'] < end_range)
                 ]['account_name'].tolist()
                 
-                range_total = 0
-                for _, row in df_tb.iterrows():
-                    if row['account_name'] in category_accounts:
-                        change = get_mtd_change(row)
-                        range_total += change
-                
-                total_changes[range_name] = range_total
+                total_changes[range_name] = mtd_changes[df_tb['account_name'].isin(category_accounts)].sum()
             
             return total_changes
         
         else:
             # Fall back to GL-based calculation
-            df_gl = load_GL_file()
-            if df_gl.empty:
+            cube = get_fund_summary()
+            if cube.entries() == 0:
                 return {}
             
-            
-            # Convert GL dates and filter for current month
-            df_gl['date'] = pd.to_datetime(df_gl['date'], errors='coerce')
+            # Current month transactions
             start_of_month = target_date.replace(day=1)
             
-            # Filter to current month transactions
-            month_transactions = df_gl[
-                (df_gl['date'].dt.date >= start_of_month) & 
-                (df_gl['date'].dt.date <= target_date)
-            ]
-            
             total_changes = {}
             for range_name, (start_range, end_range) in account_number_ranges.items():
                 category_accounts = df_coa[
@@ -151,17 +183,8 @@ def server(input, output, session):
                     (df_coa['GL_Acct_Number'] < end_range)
                 ]['account_name'].tolist()
                 
-                category_transactions = month_transactions[
-                    month_transactions['account_name'].isin(category_accounts)
-                ]
-                
-                if category_transactions.empty:
-                    total_changes[range_name] = 0
-                    continue
-                
                 # Calculate net change based on account type using proper accounting principles
-                debits = pd.to_numeric(category_transactions['debit_crypto'], errors='coerce').fillna(0).sum()
-                credits = pd.to_numeric(category_transactions['credit_crypto'], errors='coerce').fillna(0).sum()
+                debits, credits = cube.totals(category_accounts, start=start_of_month, end=target_date)
                 
                 # Accounting principles for normal balances:
                 # Assets (1xxxx): Debit increases, Credit decreases -> Debit - Credit
@@ -190,13 +213,7 @@ def server(input, output, session):
             return {}
         
         # Build date mapping from TB columns
-        date_mapping = {}
-        for col in df_tb.columns[3:]:  # Skip account info columns
-            try:
-                date_obj = pd.to_datetime(col, errors="raise").date()
-                date_mapping[date_obj] = col
-            except Exception:
-                continue
+        date_mapping = _tb_date_columns(tuple(df_tb.columns))
         
         parsed_dates = sorted(date_mapping.keys())
         if not parsed_dates:
@@ -435,9 +452,8 @@ def server(input, output, session):
     @render.ui
     def dashboard_portfolio_value():
         try:
-            from .s3_utils import load_GL_file, load_COA_file
-            import pandas as pd
-            gl_df = load_GL_file()
+            from .s3_utils import get_fund_summary, load_COA_file
+            accounts = get_fund_summary().accounts()
             coa_df = load_COA_file()
             
             
@@ -452,19 +468,16 @@ def server(input, output, session):
             else:
                 investment_account_names = []
             
-            # Filter GL entries for investment accounts
-            investment_entries = gl_df[gl_df['account_name'].isin(investment_account_names)]
+            # Totals of the investment accounts
+            investment_totals = accounts[accounts.index.isin(investment_account_names)]
             
             
-            if investment_entries.empty:
-                # Fallback: try to find any investment-related entries
-                investment_entries = gl_df[gl_df['account_name'].str.contains('investment|loan|nft|crypto|asset', case=False, na=False)]
+            if investment_totals.empty:
+                # Fallback: try to find any investment-related accounts
+                investment_totals = accounts[accounts.index.to_series().str.contains('investment|loan|nft|crypto|asset', case=False, na=False)]
             
             # Calculate net balance (debits - credits for assets)
-            # Convert to numeric to handle string values
-            debits = pd.to_numeric(investment_entries['debit_crypto'], errors='coerce').fillna(0).sum()
-            credits = pd.to_numeric(investment_entries['credit_crypto'], errors='coerce').fillna(0).sum()
-            total_value = debits - credits
+            total_value = investment_totals['debit'].sum() - investment_totals['credit'].sum()
             
             
             return f"{total_value:,.4f} ETH"
@@ -478,25 +491,18 @@ def server(input, output, session):
     @render.ui
     def dashboard_active_loans():
         try:
-            from .s3_utils import load_GL_file, load_COA_file
-            gl_df = load_GL_file()
+            from .s3_utils import get_fund_summary, load_COA_file
+            accounts = get_fund_summary().accounts()
             coa_df = load_COA_file()
             
             # Get loan account names (1100-1199)
             loan_coa = coa_df[(coa_df['GL_Acct_Number'] >= 1100) & (coa_df['GL_Acct_Number'] < 1200)]
             loan_account_names = loan_coa['account_name'].tolist()
             
-            # Count unique loan accounts with non-zero balances
-            loan_entries = gl_df[gl_df['account_name'].isin(loan_account_names)]
-            
-            # Group by account and check if balance is non-zero
-            loan_balances = loan_entries.groupby('account_name').agg({
-                'debit_crypto': 'sum',
-                'credit_crypto': 'sum'
-            }).fillna(0)
-            
-            loan_balances['net_balance'] = loan_balances['debit_crypto'] - loan_balances['credit_crypto']
-            active_loans = len(loan_balances[loan_balances['net_balance'].abs() > 0.001])
+            # Count loan accounts with non-zero balances
+            loan_balances = accounts[accounts.index.isin(loan_account_names)]
+            net_balance = loan_balances['debit'] - loan_balances['credit']
+            active_loans = int((net_balance.abs() > 0.001).sum())
             
             return f"{active_loans:,}"
         except Exception as e:
@@ -507,17 +513,16 @@ def server(input, output, session):
     @render.ui
     def dashboard_nft_count():
         try:
-            from .s3_utils import load_GL_file, load_COA_file
-            gl_df = load_GL_file()
+            from .s3_utils import get_fund_summary, load_COA_file
+            accounts = get_fund_summary().accounts()
             coa_df = load_COA_file()
             
             # Get NFT account names (1200-1299)
             nft_coa = coa_df[(coa_df['GL_Acct_Number'] >= 1200) & (coa_df['GL_Acct_Number'] < 1300)]
             nft_account_names = nft_coa['account_name'].tolist()
             
-            # Count unique NFT accounts with activity
-            nft_entries = gl_df[gl_df['account_name'].isin(nft_account_names)]
-            nft_count = len(nft_entries['account_name'].unique()) if not nft_entries.empty else 0
+            # Count NFT accounts with activity
+            nft_count = int(accounts.index.isin(nft_account_names).sum())
             
             return f"{nft_count:,}"
         except Exception as e:
@@ -528,17 +533,16 @@ def server(input, output, session):
     @render.ui
     def dashboard_crypto_count():
         try:
-            from .s3_utils import load_GL_file, load_COA_file
-            gl_df = load_GL_file()
+            from .s3_utils import get_fund_summary, load_COA_file
+            accounts = get_fund_summary().accounts()
             coa_df = load_COA_file()
             
             # Get crypto account names (1300-1399)
             crypto_coa = coa_df[(coa_df['GL_Acct_Number'] >= 1300) & (coa_df['GL_Acct_Number'] < 1400)]
             crypto_account_names = crypto_coa['account_name'].tolist()
             
-            # Count unique crypto accounts with activity
-            crypto_entries = gl_df[gl_df['account_name'].isin(crypto_account_names)]
-            crypto_count = len(crypto_entries['account_name'].unique()) if not crypto_entries.empty else 0
+            # Count crypto accounts with activity
+            crypto_count = int(accounts.index.isin(crypto_account_names).sum())
             
             return f"{crypto_count:,}"
         except Exception as e:
@@ -644,9 +648,8 @@ def server(input, output, session):
     @render.ui
     def dashboard_total_entries():
         try:
-            from .s3_utils import load_GL_file
-            gl_df = load_GL_file()
-            total_entries = len(gl_df)
+            from .s3_utils import get_fund_summary
+            total_entries = get_fund_summary().entries()
             return f"{total_entries:,}"
         except Exception as e:
             print(f"Error in dashboard_total_entries: {e}")
@@ -656,23 +659,14 @@ def server(input, output, session):
     @render.ui
     def dashboard_month_entries():
         try:
-            from .s3_utils import load_GL_file
+            from .s3_utils import get_fund_summary
             import pandas as pd
-            from datetime import datetime
-            
-            gl_df = load_GL_file()
-            
-            if gl_df.empty or 'date' not in gl_df.columns:
-                return "0"
-            
-            # Convert date column to datetime if it's not already
-            gl_df['date'] = pd.to_datetime(gl_df['date'], errors='coerce')
             
             # Get current month entries
             current_month = pd.Timestamp.now(tz='UTC').replace(day=1)
-            month_entries = gl_df[gl_df['date'] >= current_month]
+            month_entries = get_fund_summary().entries(start=current_month)
             
-            return f"{len(month_entries):,}"
+            return f"{month_entries:,}"
         except Exception as e:
             print(f"Error in dashboard_month_entries: {e}")
             import traceback
@@ -683,24 +677,20 @@ def server(input, output, session):
     @render.ui
     def dashboard_account_balance():
         try:
-            from .s3_utils import load_GL_file
-            gl_df = load_GL_file()
+            from .s3_utils import get_fund_summary
+            cube = get_fund_summary()
             
-            if gl_df.empty:
+            if cube.entries() == 0:
                 return "No Data"
             
             # Calculate trial balance using crypto amounts (debits minus credits should equal zero)
-            if 'debit_crypto' in gl_df.columns and 'credit_crypto' in gl_df.columns:
-                total_debits = pd.to_numeric(gl_df['debit_crypto'], errors='coerce').fillna(0).sum()
-                total_credits = pd.to_numeric(gl_df['credit_crypto'], errors='coerce').fillna(0).sum()
-                balance = total_debits - total_credits
-                
-                if abs(balance) < 0.001:  # Use smaller threshold for crypto amounts
-                    return "Balanced"
-                else:
-                    return f"Imbalance: {balance:,.4f} ETH"
+            total_debits, total_credits = cube.totals()
+            balance = total_debits - total_credits
+            
+            if abs(balance) < 0.001:  # Use smaller threshold for crypto amounts
+                return "Balanced"
             else:
-                return "No Balance Data"
+                return f"Imbalance: {balance:,.4f} ETH"
                 
         except Exception as e:
             print(f"Error in dashboard_account_balance: {e}")
@@ -712,19 +702,13 @@ def server(input, output, session):
     @render.ui
     def dashboard_pending_items():
         try:
-            from .s3_utils import load_GL_file
+            from .s3_utils import get_fund_summary
             import pandas as pd
             
-            gl_df = load_GL_file()
-            
-            if gl_df.empty or 'date' not in gl_df.columns:
-                return "0"
-            
-            # Count recent entries (last 7 days) as "pending review"
-            gl_df['date'] = pd.to_datetime(gl_df['date'], errors='coerce')
-            recent_entries = gl_df[gl_df['date'] >= pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=7)]
+            # Count recent entries (last 7 days, by day) as "pending review"
+            recent_entries = get_fund_summary().entries(start=pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=7))
             
-            return f"{len(recent_entries):,}"
+            return f"{recent_entries:,}"
         except Exception as e:
             print(f"Error in dashboard_pending_items: {e}")
             import traceback
@@ -735,30 +719,24 @@ def server(input, output, session):
     @render.ui
     def dashboard_recent_transactions():
         try:
-            from .s3_utils import load_GL_file
+            from .s3_utils import get_fund_summary
             import pandas as pd
             
-            gl_df = load_GL_file()
+            # Get recent transactions (last 10)
+            recent_df = get_fund_summary().recent_transactions(10)
             
-            if gl_df.empty:
+            if recent_df.empty:
                 return ui.div(
                     ui.p("No transactions available", class_="text-muted text-center"),
                     class_="empty-state"
                 )
             
-            # Get recent transactions (last 10)
-            if 'date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['date'], errors='coerce')
-                recent_df = gl_df.sort_values('date', ascending=False).head(10)
-            else:
-                recent_df = gl_df.head(10)
-            
             transaction_items = []
             for _, row in recent_df.iterrows():
-                date_str = row.get('date', '').strftime('%m/%d/%Y') if pd.notna(row.get('date')) else 'Unknown'
-                account = str(row.get('account_name', 'Unknown'))[:30] + ('...' if len(str(row.get('account_name', ''))) > 30 else '')
-                debit = float(row.get('debit_crypto', 0)) if pd.notna(row.get('debit_crypto')) else 0
-                credit = float(row.get('credit_crypto', 0)) if pd.notna(row.get('credit_crypto')) else 0
+                date_str = row['date'].strftime('%m/%d/%Y') if pd.notna(row['date']) else 'Unknown'
+                account = str(row['account_name'])[:30] + ('...' if len(str(row['account_name'])) > 30 else '')
+                debit = row['debit']
+                credit = row['credit']
                 amount = debit if debit > 0 else -credit
                 
                 transaction_items.append(
@@ -793,18 +771,19 @@ def server(input, output, session):
     @render.ui
     def dashboard_account_summary():
         try:
-            from .s3_utils import load_GL_file, load_COA_file
-            import pandas as pd
+            from .s3_utils import get_fund_summary, load_COA_file
             
-            gl_df = load_GL_file()
+            cube = get_fund_summary()
             coa_df = load_COA_file()
             
-            if gl_df.empty or coa_df.empty:
+            if cube.entries() == 0 or coa_df.empty:
                 return ui.div(
                     ui.p("No account data available", class_="text-muted text-center"),
                     class_="empty-state"
                 )
             
+            accounts = cube.accounts()
+            
             # Calculate account category summaries
             account_summaries = []
             
@@ -827,11 +806,11 @@ def server(input, output, session):
                     continue
                 
                 account_names = category_coa['account_name'].tolist()
-                category_entries = gl_df[gl_df['account_name'].isin(account_names)]
+                category_totals = accounts[accounts.index.isin(account_names)]
                 
-                if not category_entries.empty:
-                    debits = pd.to_numeric(category_entries['debit_crypto'], errors='coerce').fillna(0).sum()
-                    credits = pd.to_numeric(category_entries['credit_crypto'], errors='coerce').fillna(0).sum()
+                if not category_totals.empty:
+                    debits = category_totals['debit'].sum()
+                    credits = category_totals['credit'].sum()
                     
                     # For assets and expenses, positive balance = debit balance
                     # For liabilities, equity, and revenue, positive balance = credit balance
@@ -871,51 +850,37 @@ def server(input, output, session):
             )
 
     # Financial Reporting dashboard with real data
+    def fund_reporting_figures():
+        """
+        MTD revenue and expenses and total assets of the selected fund, from
+        the same trial balance logic as financial reporting. Computed once per
+        GL version and fund, and shared by the widgets below and all sessions.
+
+        Returns:
+            Dict with revenue, expenses and assets, or None if the fund has no GL data
+        """
+        from .s3_utils import get_fund_summary
+        
+        # Filter by selected fund if specified
+        fund_id = selected_fund() if selected_fund and hasattr(selected_fund, '__call__') else None
+        
+        # Use end of available data
+        current_date = datetime(2024, 7, 31)
+        
+        return get_fund_summary().memo(
+            ("reporting_figures", fund_id, current_date),
+            lambda: _reporting_figures(fund_id, current_date)
+        )
+    
     @output
     @render.ui
     def dashboard_total_revenue():
         try:
-            from .modules.financial_reporting.tb_generator import get_income_expense_changes, generate_trial_balance_from_gl
-            from .s3_utils import load_GL_file
-            from datetime import datetime
-            
-            # Load GL data and filter by selected fund (same as financial reporting)
-            gl_df = load_GL_file()
-            
-            if gl_df.empty:
-                return "No Data"
-            
-            # Filter by selected fund if specified
-            fund_id = selected_fund() if selected_fund and hasattr(selected_fund, '__call__') else None
-            if fund_id and 'fund_id' in gl_df.columns:
-                gl_df = gl_df[gl_df['fund_id'] == fund_id]
-                
-            if gl_df.empty:
+            figures = fund_reporting_figures()
+            if figures is None:
                 return "No Data"
-                
-            # Ensure date column is properly formatted
-            if 'date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['date'], utc=True, errors='coerce')
-            elif 'operating_date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['operating_date'], utc=True, errors='coerce')
             
-            # Enrich with COA mappings
-            from .account_mapper import enrich_gl_with_coa_mapping
-            gl_df = enrich_gl_with_coa_mapping(gl_df)
-            
-            # Use current date for MTD calculation
-            current_date = datetime(2024, 7, 31)  # Use end of available data
-            
-            # Get income and expense changes using same logic as financial reporting
-            income_df, expense_df = get_income_expense_changes(gl_df, current_date)
-            
-            if income_df.empty:
-                return "0.0000 ETH"
-            
-            # Sum MTD values from income accounts
-            total_revenue = income_df['MTD'].sum() if 'MTD' in income_df.columns else 0
-            
-            return f"{total_revenue:,.4f} ETH"
+            return f"{figures['revenue']:,.4f} ETH"
         except Exception as e:
             print(f"Error in dashboard_total_revenue: {e}")
             import traceback
@@ -926,44 +891,12 @@ def server(input, output, session):
     @render.ui
     def dashboard_net_income():
         try:
-            from .modules.financial_reporting.tb_generator import get_income_expense_changes
-            from .s3_utils import load_GL_file
-            from datetime import datetime
-            
-            # Load GL data and filter by selected fund (same as financial reporting)
-            gl_df = load_GL_file()
-            
-            if gl_df.empty:
-                return "No Data"
-            
-            # Filter by selected fund if specified
-            fund_id = selected_fund() if selected_fund and hasattr(selected_fund, '__call__') else None
-            if fund_id and 'fund_id' in gl_df.columns:
-                gl_df = gl_df[gl_df['fund_id'] == fund_id]
-                
-            if gl_df.empty:
+            figures = fund_reporting_figures()
+            if figures is None:
                 return "No Data"
-                
-            # Ensure date column is properly formatted
-            if 'date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['date'], utc=True, errors='coerce')
-            elif 'operating_date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['operating_date'], utc=True, errors='coerce')
-            
-            # Enrich with COA mappings
-            from .account_mapper import enrich_gl_with_coa_mapping
-            gl_df = enrich_gl_with_coa_mapping(gl_df)
-            
-            # Use current date for MTD calculation
-            current_date = datetime(2024, 7, 31)  # Use end of available data
-            
-            # Get income and expense changes using same logic as financial reporting
-            income_df, expense_df = get_income_expense_changes(gl_df, current_date)
             
             # Calculate net income: revenue - expenses
-            total_revenue = income_df['MTD'].sum() if not income_df.empty and 'MTD' in income_df.columns else 0
-            total_expenses = expense_df['MTD'].sum() if not expense_df.empty and 'MTD' in expense_df.columns else 0
-            net_income = total_revenue - total_expenses
+            net_income = figures['revenue'] - figures['expenses']
             
             return f"{net_income:,.4f} ETH"
         except Exception as e:
@@ -976,53 +909,11 @@ def server(input, output, session):
     @render.ui
     def dashboard_assets():
         try:
-            from .modules.financial_reporting.tb_generator import generate_trial_balance_from_gl
-            from .s3_utils import load_GL_file
-            from datetime import datetime
-            
-            # Load GL data and filter by selected fund (same as financial reporting)
-            gl_df = load_GL_file()
-            
-            if gl_df.empty:
-                return "No Data"
-            
-            # Filter by selected fund if specified
-            fund_id = selected_fund() if selected_fund and hasattr(selected_fund, '__call__') else None
-            if fund_id and 'fund_id' in gl_df.columns:
-                gl_df = gl_df[gl_df['fund_id'] == fund_id]
-                
-            if gl_df.empty:
+            figures = fund_reporting_figures()
+            if figures is None:
                 return "No Data"
-                
-            # Ensure date column is properly formatted
-            if 'date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['date'], utc=True, errors='coerce')
-            elif 'operating_date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['operating_date'], utc=True, errors='coerce')
-            
-            # Enrich with COA mappings
-            from .account_mapper import enrich_gl_with_coa_mapping
-            gl_df = enrich_gl_with_coa_mapping(gl_df)
-            
-            # Use current date for trial balance
-            current_date = datetime(2024, 7, 31)  # Use end of available data
-            
-            # Generate trial balance using same logic as financial reporting
-            tb_df = generate_trial_balance_from_gl(gl_df, current_date)
             
-            if tb_df.empty:
-                return "0.0000 ETH"
-            
-            # Filter for asset accounts (1xxxx)
-            asset_accounts = tb_df[tb_df['GL_Acct_Number'].astype(str).str.startswith('1')]
-            
-            if asset_accounts.empty:
-                return "0.0000 ETH"
-            
-            # Sum asset balances
-            total_assets = asset_accounts['Balance'].sum()
-            
-            return f"{total_assets:,.4f} ETH"
+            return f"{figures['assets']:,.4f} ETH"
         except Exception as e:
             print(f"Error in dashboard_assets: {e}")
             import traceback
@@ -1033,55 +924,13 @@ def server(input, output, session):
     @render.ui
     def dashboard_roi():
         try:
-            from .modules.financial_reporting.tb_generator import get_income_expense_changes, generate_trial_balance_from_gl
-            from .s3_utils import load_GL_file
-            from datetime import datetime
-            
-            # Load GL data and filter by selected fund (same as financial reporting)
-            gl_df = load_GL_file()
-            
-            if gl_df.empty:
+            figures = fund_reporting_figures()
+            if figures is None:
                 return "No Data"
             
-            # Filter by selected fund if specified
-            fund_id = selected_fund() if selected_fund and hasattr(selected_fund, '__call__') else None
-            if fund_id and 'fund_id' in gl_df.columns:
-                gl_df = gl_df[gl_df['fund_id'] == fund_id]
-                
-            if gl_df.empty:
-                return "No Data"
-                
-            # Ensure date column is properly formatted
-            if 'date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['date'], utc=True, errors='coerce')
-            elif 'operating_date' in gl_df.columns:
-                gl_df['date'] = pd.to_datetime(gl_df['operating_date'], utc=True, errors='coerce')
-            
-            # Enrich with COA mappings
-            from .account_mapper import enrich_gl_with_coa_mapping
-            gl_df = enrich_gl_with_coa_mapping(gl_df)
-            
-            # Use current date
-            current_date = datetime(2024, 7, 31)  # Use end of available data
-            
-            # Get income and expense changes for MTD
-            income_df, expense_df = get_income_expense_changes(gl_df, current_date)
-            
-            # Get asset balances from trial balance
-            tb_df = generate_trial_balance_from_gl(gl_df, current_date)
-            
-            # Calculate components
-            revenue = income_df['MTD'].sum() if not income_df.empty and 'MTD' in income_df.columns else 0
-            expenses = expense_df['MTD'].sum() if not expense_df.empty and 'MTD' in expense_df.columns else 0
-            
-            # Get total assets from trial balance
-            assets = 0
-            if not tb_df.empty:
-                asset_accounts = tb_df[tb_df['GL_Acct_Number'].astype(str).str.startswith('1')]
-                assets = asset_accounts['Balance'].sum() if not asset_accounts.empty else 0
-            
             # Calculate ROI
-            net_income = revenue - expenses
+            net_income = figures['revenue'] - figures['expenses']
+            assets = figures['assets']
             roi = (net_income / assets * 100) if assets != 0 else 0
             
             return f"{roi:.2f}%"
@@ -1097,13 +946,13 @@ def server(input, output, session):
         try:
             import plotly.graph_objects as go
             from shiny import ui
-            from .s3_utils import load_GL_file, load_COA_file
+            from .s3_utils import get_fund_summary, load_COA_file
             
-            # For trend, use GL data directly to show actual activity by month
-            gl_df = load_GL_file()
+            # For trend, use GL activity by month
+            cube = get_fund_summary()
             coa_df = load_COA_file()
             
-            if gl_df.empty or coa_df.empty:
+            if cube.entries() == 0 or coa_df.empty:
                 return ui.div(
                     ui.p("No data available for income trend", class_="text-muted text-center"),
                     class_="empty-state"
@@ -1117,22 +966,21 @@ def server(input, output, session):
             # Combine all income accounts
             revenue_accounts = income_4_accounts + income_9_accounts
             
-            # Convert GL dates and group by month
-            gl_df['date'] = pd.to_datetime(gl_df['date'], errors='coerce')
-            gl_df['month'] = gl_df['date'].dt.to_period('M').astype(str)
+            revenue_by_month = cube.monthly(revenue_accounts)
+            expenses_by_month = cube.monthly(expense_accounts)
             
             # Calculate monthly totals
             monthly_data = []
-            for month in sorted(gl_df['month'].dropna().unique()):
-                month_data = gl_df[gl_df['month'] == month]
-                
+            for month in cube.months():
                 # Revenue (credit balance)
-                revenue_entries = month_data[month_data['account_name'].isin(revenue_accounts)]
-                monthly_revenue = pd.to_numeric(revenue_entries['credit_crypto'], errors='coerce').fillna(0).sum() - pd.to_numeric(revenue_entries['debit_crypto'], errors='coerce').fillna(0).sum()
+                monthly_revenue = 0.0
+                if month in revenue_by_month.index:
+                    monthly_revenue = revenue_by_month.at[month, 'credit'] - revenue_by_month.at[month, 'debit']
                 
                 # Expenses (debit balance)
-                expense_entries = month_data[month_data['account_name'].isin(expense_accounts)]
-                monthly_expenses = pd.to_numeric(expense_entries['debit_crypto'], errors='coerce').fillna(0).sum() - pd.to_numeric(expense_entries['credit_crypto'], errors='coerce').fillna(0).sum()
+                monthly_expenses = 0.0
+                if month in expenses_by_month.index:
+                    monthly_expenses = expenses_by_month.at[month, 'debit'] - expenses_by_month.at[month, 'credit']
                 
                 monthly_data.append({
                     'month': month,
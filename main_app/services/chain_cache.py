@@ -0,0 +1,414 @@
+"""
+Chain Data Cache Module
+
+Persistent, process-shared cache for raw chain data: transactions, receipts
+and blocks. Confirmed chain data never changes, so once a transaction has
+been fetched it can be re-decoded (e.g. after a decoder code change) without
+any RPC traffic.
+
+Entries live in a single SQLite file in WAL mode, keyed by (kind, key) where
+key is the tx hash or block number. Several processes (the Shiny app,
+batch_decode.py, notebooks) can read and write the same file. When the
+stored payload exceeds the size budget the least recently used entries are
+evicted.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+import logging
+from decimal import Decimal
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+logger = logging.getLogger(__name__)
+
+# Only refresh an entry's last-access time when it is older than this, so
+# read-mostly workloads do not turn every cache hit into a write
+TOUCH_INTERVAL_SECONDS = 300
+
+# Re-check the total size after this many writes per process
+SIZE_CHECK_EVERY = 256
+
+# Evict down to this fraction of the budget so eviction does not run on every write
+EVICT_TARGET_RATIO = 0.9
+
+# Keys per SELECT ... IN (...) query in get_many (below SQLite's variable limit)
+GET_MANY_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chain_data (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    block_number INTEGER,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_chain_data_accessed ON chain_data (accessed);
+CREATE INDEX IF NOT EXISTS idx_chain_data_block ON chain_data (block_number);
+"""
+
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+
+def _json_default(obj: Any) -> Any:
+    """Encode web3 types JSON cannot handle natively"""
+    if isinstance(obj, (bytes, bytearray)):
+        return {'__hex__': bytes(obj).hex()}
+    if isinstance(obj, Decimal):
+        return {'__dec__': str(obj)}
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Cannot cache value of type {type(obj).__name__}")
+
+
+def _object_hook(obj: Dict[str, Any]) -> Any:
+    """Rebuild HexBytes, Decimal and AttributeDict values"""
+    if len(obj) == 1:
+        if '__hex__' in obj:
+            return HexBytes(bytes.fromhex(obj['__hex__']))
+        if '__dec__' in obj:
+            return Decimal(obj['__dec__'])
+    return AttributeDict(obj)
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialize a web3 result (AttributeDict/HexBytes/int/...) to compressed JSON"""
+    payload = json.dumps(value, default=_json_default, separators=(',', ':'))
+    return zlib.compress(payload.encode('utf-8'))
+
+
+def decode_value(data: bytes) -> Any:
+    """Inverse of encode_value: mappings come back as AttributeDict, bytes as HexBytes"""
+    return json.loads(zlib.decompress(data).decode('utf-8'), object_hook=_object_hook)
+
+
+def tx_key(tx_hash: Any) -> str:
+    """Normalize a tx hash (str, bytes or HexBytes) to lowercase 0x-hex"""
+    if isinstance(tx_hash, (bytes, bytearray)):
+        return '0x' + bytes(tx_hash).hex()
+    text = str(tx_hash).lower()
+    return text if text.startswith('0x') else f'0x{text}'
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class ChainDataCache:
+    """Read-through SQLite cache for transactions, receipts and blocks"""
+
+    def __init__(self, path: Optional[str], max_size_mb: int = 1024, enabled: bool = True):
+        """
+        Initialize the chain data cache
+
+        Args:
+            path: SQLite file path (parent directories are created)
+            max_size_mb: Size budget for stored payloads in megabytes
+            enabled: If False every lookup goes straight to the RPC
+        """
+        self.path = path
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.enabled = bool(enabled and path)
+
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._writes_since_check = 0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'errors': 0,
+        }
+
+        if self.enabled:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._connection()
+                logger.info(f"ChainDataCache at {path} (max {max_size_mb}MB)")
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Chain data cache disabled, cannot open {path}: {e}")
+                self.enabled = False
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread (and per-process) SQLite connection"""
+        if os.getpid() != self._pid:
+            # Connections must not be shared across fork()
+            self._local = threading.local()
+            self._pid = os.getpid()
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """Return the cached value for (kind, key), or None"""
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT data, accessed FROM chain_data WHERE kind = ? AND key = ?",
+                (kind, key),
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL_SECONDS:
+                conn.execute(
+                    "UPDATE chain_data SET accessed = ? WHERE kind = ? AND key = ?",
+                    (now, kind, key),
+                )
+            self.stats['hits'] += 1
+            return decode_value(row[0])
+        except (sqlite3.Error, ValueError, zlib.error) as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Chain cache read failed for {kind}:{key}: {e}")
+            return None
+
+    def get_many(self, kind: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Bulk lookup
+
+        Args:
+            kind: Entry kind ('tx', 'receipt' or 'block')
+            keys: Keys to look up
+
+        Returns:
+            Dict of key -> value for the keys that are cached
+        """
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return {}
+
+        found = {}
+        try:
+            conn = self._connection()
+            now = time.time()
+            for i in range(0, len(keys), GET_MANY_CHUNK):
+                chunk = keys[i:i + GET_MANY_CHUNK]
+                marks = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, data FROM chain_data WHERE kind = ? AND key IN ({marks})",
+                    (kind, *chunk),
+                ).fetchall()
+                for key, data in rows:
+                    found[key] = decode_value(data)
+                conn.execute(
+                    f"UPDATE chain_data SET accessed = ? WHERE kind = ? AND key IN ({marks}) "
+                    f"AND accessed < ?",
+                    (now, kind, *chunk, now - TOUCH_INTERVAL_SECONDS),
+                )
+        except (sqlite3.Error, ValueError, zlib.error) as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Chain cache bulk read failed for {kind}: {e}")
+            return found
+
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put(self, kind: str, key: str, value: Any, block_number: Optional[int] = None) -> None:
+        """Store a value; failures are logged and otherwise ignored"""
+        if not self.enabled:
+            return
+        try:
+            data = encode_value(value)
+            self._connection().execute(
+                "INSERT OR REPLACE INTO chain_data (kind, key, block_number, data, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, block_number, data, len(data), time.time()),
+            )
+            self.stats['writes'] += 1
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Chain cache write failed for {kind}:{key}: {e}")
+            return
+
+        with self._lock:
+            self._writes_since_check += 1
+            check = self._writes_since_check >= SIZE_CHECK_EVERY
+            if check:
+                self._writes_since_check = 0
+        if check:
+            self.evict()
+
+    def size_bytes(self) -> int:
+        """Total stored payload size"""
+        if not self.enabled:
+            return 0
+        row = self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM chain_data").fetchone()
+        return int(row[0])
+
+    def evict(self, max_size_bytes: Optional[int] = None) -> int:
+        """
+        Drop least recently used entries while over the size budget
+
+        Args:
+            max_size_bytes: Budget to enforce (default: the configured budget)
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.enabled:
+            return 0
+        budget = self.max_size_bytes if max_size_bytes is None else max_size_bytes
+
+        try:
+            conn = self._connection()
+            total = self.size_bytes()
+            if total <= budget:
+                return 0
+
+            to_free = total - int(budget * EVICT_TARGET_RATIO)
+            victims = []
+            freed = 0
+            for kind, key, size in conn.execute(
+                "SELECT kind, key, size FROM chain_data ORDER BY accessed"
+            ):
+                victims.append((kind, key))
+                freed += size
+                if freed >= to_free:
+                    break
+
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM chain_data WHERE kind = ? AND key = ?", victims)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Chain cache eviction failed: {e}")
+            return 0
+
+        self.stats['evictions'] += len(victims)
+        logger.info(f"Chain cache evicted {len(victims)} entries ({freed / 1024 / 1024:.1f}MB)")
+        return len(victims)
+
+    def invalidate_from_block(self, block_number: int) -> int:
+        """
+        Remove everything recorded at or after block_number (chain reorg)
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.enabled:
+            return 0
+        cursor = self._connection().execute(
+            "DELETE FROM chain_data WHERE block_number >= ?", (int(block_number),)
+        )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        if self.enabled:
+            self._connection().execute("DELETE FROM chain_data")
+
+    def __len__(self) -> int:
+        if not self.enabled:
+            return 0
+        return int(self._connection().execute("SELECT COUNT(*) FROM chain_data").fetchone()[0])
+
+    # ------------------------------------------------------------------
+    # Read-through RPC helpers
+    # ------------------------------------------------------------------
+
+    def put_transaction(self, tx_hash: Any, tx: Any) -> None:
+        """Store a transaction if it is mined (pending ones can still change)"""
+        if tx is not None and tx.get('blockNumber') is not None:
+            self.put('tx', tx_key(tx_hash), tx, tx['blockNumber'])
+
+    def put_receipt(self, tx_hash: Any, receipt: Any) -> None:
+        """Store a transaction receipt"""
+        if receipt is not None and receipt.get('blockNumber') is not None:
+            self.put('receipt', tx_key(tx_hash), receipt, receipt['blockNumber'])
+
+    def put_block(self, block_number: int, block: Any) -> None:
+        """Store a block fetched by number"""
+        if block is not None:
+            self.put('block', str(int(block_number)), block, int(block_number))
+
+    def get_transaction(self, w3, tx_hash: Any) -> Any:
+        """w3.eth.get_transaction, cached once the tx is mined"""
+        tx = self.get('tx', tx_key(tx_hash))
+        if tx is None:
+            tx = w3.eth.get_transaction(tx_hash)
+            self.put_transaction(tx_hash, tx)
+        return tx
+
+    def get_receipt(self, w3, tx_hash: Any) -> Any:
+        """w3.eth.get_transaction_receipt, cached"""
+        receipt = self.get('receipt', tx_key(tx_hash))
+        if receipt is None:
+            receipt = w3.eth.get_transaction_receipt(tx_hash)
+            self.put_receipt(tx_hash, receipt)
+        return receipt
+
+    def get_block(self, w3, block_number: Any) -> Any:
+        """w3.eth.get_block for a block number, cached (tags like 'latest' are not)"""
+        if not isinstance(block_number, int):
+            return w3.eth.get_block(block_number)
+
+        block = self.get('block', str(block_number))
+        if block is None:
+            block = w3.eth.get_block(block_number)
+            self.put_block(block_number, block)
+        return block
+
+    def get_transaction_bundle(self, w3, tx_hash: Any) -> Tuple[Any, Any, Any]:
+        """(tx, receipt, block) for a transaction, each read through the cache"""
+        tx = self.get_transaction(w3, tx_hash)
+        receipt = self.get_receipt(w3, tx_hash)
+        block = self.get_block(w3, tx['blockNumber'])
+        return tx, receipt, block
+
+
+_default_cache: Optional[ChainDataCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_chain_cache() -> ChainDataCache:
+    """Process-wide chain data cache configured from blockchain_config"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            from ..config.blockchain_config import (
+                CHAIN_CACHE_PATH,
+                CHAIN_CACHE_MAX_MB,
+                CHAIN_CACHE_DISABLED,
+            )
+            _default_cache = ChainDataCache(
+                CHAIN_CACHE_PATH,
+                max_size_mb=CHAIN_CACHE_MAX_MB,
+                enabled=not CHAIN_CACHE_DISABLED,
+            )
+        return _default_cache
+
+
+def set_chain_cache(cache: Optional[ChainDataCache]) -> None:
+    """Replace the process-wide cache (None resets to the configured default)"""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
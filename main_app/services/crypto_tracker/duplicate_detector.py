@@ -3,14 +3,22 @@ Transaction Duplicate Detector
 
 Advanced duplicate detection system for cryptocurrency transactions using
 multiple verification methods and conflict resolution.
+
+Known transactions are held in a TransactionIndex (time-sorted per wallet
+and asset, persisted next to the duplicate hashes), so a check costs a
+bisection and a few lookups instead of a scan of the fund's history.
+Transactions added one at a time are persisted as small deltas, which are
+compacted into the stored index every DUPLICATE_INDEX_COMPACT_EVERY adds.
 """
 
 import hashlib
 import logging
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Set, Optional, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
+import numpy as np
 import pandas as pd
 
 from .persistence_manager import PersistenceManager, TransactionRecord
@@ -29,6 +37,191 @@ class DuplicateCheckResult:
     suggested_action: str = ""
 
 
+def _signature_hash(wallet_id: str, asset: str, side: str, token_amount: Decimal,
+                    eth_value: Decimal, date_iso: str) -> str:
+    """Hash of the fields that identify a transaction regardless of its tx hash."""
+    signature_data = f"{wallet_id}|{asset}|{side}|{token_amount}|{eth_value}|{date_iso}"
+    return hashlib.sha256(signature_data.encode()).hexdigest()
+
+
+def _utc_ns(dates: pd.Series) -> np.ndarray:
+    """UTC nanoseconds since the epoch of a date column (naive dates are UTC)."""
+    dates = pd.to_datetime(dates, utc=True)
+    return dates.dt.tz_convert(None).to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+# Columns of the persisted transaction index
+INDEX_COLUMNS = ['seq', 'tx_hash', 'wallet_id', 'asset', 'side', 'time', 'token_amount', 'eth_value', 'signature']
+
+# Index deltas appended before the whole index is rewritten
+DUPLICATE_INDEX_COMPACT_EVERY = 200
+
+
+@dataclass
+class _Series:
+    """Indexed transactions of one (wallet_id, asset), in time order."""
+    times: List[Tuple[int, int]] = field(default_factory=list)  # (UTC ns, seq)
+    token_floats: List[float] = field(default_factory=list)
+    eth_floats: List[float] = field(default_factory=list)
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class TransactionIndex:
+    """
+    In-memory index of known transactions for duplicate checks.
+    
+    Per (wallet_id, asset) the transactions are kept sorted by time with
+    their amounts alongside, so the transactions within a time window are
+    found by bisection. Transaction hashes and signature hashes are kept in
+    dicts for exact lookups. Every row carries a sequence number (the order
+    it was indexed in) so matches are reported in the order a scan of the
+    stored transactions would find them.
+    """
+    
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._tx_hashes: Dict[str, int] = {}
+        self._keys: Set[Tuple[str, str, str]] = set()
+        self._signatures: Dict[str, Dict[int, str]] = {}
+        self._next_seq = 0
+    
+    def __len__(self) -> int:
+        return sum(self._tx_hashes.values())
+    
+    def __contains__(self, tx_hash: str) -> bool:
+        return tx_hash in self._tx_hashes
+    
+    def holds(self, tx_hash: str, wallet_id: str, asset: str) -> bool:
+        """True if the transaction is indexed for (wallet_id, asset)."""
+        return (tx_hash, wallet_id, asset) in self._keys
+    
+    def tx_hashes(self) -> Set[str]:
+        """Hashes of all indexed transactions."""
+        return set(self._tx_hashes)
+    
+    def add(self, tx_hash: str, wallet_id: str, asset: str, side: str, time: int,
+            token_amount: Decimal, eth_value: Decimal, signature: str, seq: Optional[int] = None) -> int:
+        """Index one transaction (time in UTC nanoseconds); returns its sequence number."""
+        if seq is None:
+            seq = self._next_seq
+        self._next_seq = max(self._next_seq, seq + 1)
+        
+        series = self._series.setdefault((wallet_id, asset), _Series())
+        position = bisect_right(series.times, (time, seq))
+        series.times.insert(position, (time, seq))
+        series.token_floats.insert(position, float(token_amount))
+        series.eth_floats.insert(position, float(eth_value))
+        series.rows.insert(position, {
+            'seq': seq, 'tx_hash': tx_hash, 'side': side, 'token_amount': token_amount,
+            'eth_value': eth_value, 'signature': signature,
+        })
+        
+        self._tx_hashes[tx_hash] = self._tx_hashes.get(tx_hash, 0) + 1
+        self._keys.add((tx_hash, wallet_id, asset))
+        self._signatures.setdefault(signature, {})[seq] = tx_hash
+        return seq
+    
+    def remove(self, tx_hash: str, wallet_id: str, asset: str) -> int:
+        """Drop the transaction's rows for (wallet_id, asset); returns how many were dropped."""
+        series = self._series.get((wallet_id, asset))
+        if series is None:
+            return 0
+        
+        positions = [i for i, row in enumerate(series.rows) if row['tx_hash'] == tx_hash]
+        for i in reversed(positions):
+            row = series.rows.pop(i)
+            del series.times[i], series.token_floats[i], series.eth_floats[i]
+            
+            matches = self._signatures.get(row['signature'], {})
+            matches.pop(row['seq'], None)
+            if not matches:
+                self._signatures.pop(row['signature'], None)
+            
+            self._tx_hashes[tx_hash] -= 1
+            if not self._tx_hashes[tx_hash]:
+                del self._tx_hashes[tx_hash]
+        
+        self._keys.discard((tx_hash, wallet_id, asset))
+        if not series.rows:
+            del self._series[(wallet_id, asset)]
+        return len(positions)
+    
+    def signature_match(self, signature: str) -> Optional[str]:
+        """Hash of the earliest indexed transaction with this signature, if any."""
+        matches = self._signatures.get(signature)
+        return matches[min(matches)] if matches else None
+    
+    def window(self, wallet_id: str, asset: str, start: int, end: int) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Transactions of (wallet_id, asset) dated within [start, end] (UTC ns).
+        
+        Returns:
+            (token amounts, ETH values) as float arrays and the matching rows
+        """
+        series = self._series.get((wallet_id, asset))
+        if series is None:
+            return np.empty(0), np.empty(0), []
+        
+        lo = bisect_left(series.times, (start, -1))
+        hi = bisect_right(series.times, (end, self._next_seq))
+        return (np.asarray(series.token_floats[lo:hi], dtype='float64'),
+                np.asarray(series.eth_floats[lo:hi], dtype='float64'),
+                series.rows[lo:hi])
+    
+    def to_frame(self) -> pd.DataFrame:
+        """The index as a table (amounts as exact decimal strings), for persistence."""
+        records = []
+        for (wallet_id, asset), series in self._series.items():
+            for (time, _), row in zip(series.times, series.rows):
+                records.append({
+                    'seq': row['seq'], 'tx_hash': row['tx_hash'], 'wallet_id': wallet_id,
+                    'asset': asset, 'side': row['side'], 'time': time,
+                    'token_amount': str(row['token_amount']), 'eth_value': str(row['eth_value']),
+                    'signature': row['signature'],
+                })
+        frame = pd.DataFrame(records, columns=INDEX_COLUMNS)
+        return frame.sort_values('seq', kind='stable').reset_index(drop=True)
+    
+    def extend(self, frame: pd.DataFrame):
+        """
+        Index many transactions at once (rows with INDEX_COLUMNS; amounts
+        Decimal or decimal strings; seq optional, default: frame order).
+        """
+        if frame.empty:
+            return
+        frame = frame.reset_index(drop=True)
+        if 'seq' not in frame.columns:
+            frame = frame.assign(seq=np.arange(self._next_seq, self._next_seq + len(frame)))
+        self._next_seq = max(self._next_seq, int(frame['seq'].max()) + 1)
+        
+        for (wallet_id, asset), group in frame.groupby(['wallet_id', 'asset'], sort=False):
+            series = self._series.setdefault((wallet_id, asset), _Series())
+            entries = list(zip(series.times, series.token_floats, series.eth_floats, series.rows))
+            for row in group.itertuples(index=False):
+                token_amount, eth_value = Decimal(str(row.token_amount)), Decimal(str(row.eth_value))
+                seq = int(row.seq)
+                entries.append(((int(row.time), seq), float(token_amount), float(eth_value), {
+                    'seq': seq, 'tx_hash': row.tx_hash, 'side': row.side, 'token_amount': token_amount,
+                    'eth_value': eth_value, 'signature': row.signature,
+                }))
+                self._tx_hashes[row.tx_hash] = self._tx_hashes.get(row.tx_hash, 0) + 1
+                self._keys.add((row.tx_hash, wallet_id, asset))
+                self._signatures.setdefault(row.signature, {})[seq] = row.tx_hash
+            
+            entries.sort(key=lambda entry: entry[0])
+            series.times = [entry[0] for entry in entries]
+            series.token_floats = [entry[1] for entry in entries]
+            series.eth_floats = [entry[2] for entry in entries]
+            series.rows = [entry[3] for entry in entries]
+    
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "TransactionIndex":
+        """Index restored from to_frame() output."""
+        index = cls()
+        index.extend(frame)
+        return index
+
+
 class DuplicateDetector:
     """
     Advanced duplicate detection for cryptocurrency transactions.
@@ -48,6 +241,8 @@ class DuplicateDetector:
         # Load existing hashes and transactions
         self.known_hashes = self.persistence.load_duplicate_hashes()
         self.existing_transactions = self.persistence.load_transactions()
+        self.index = self._load_index()
+        self._deltas = 0
         
         # Detection thresholds
         self.time_proximity_threshold = timedelta(minutes=5)  # Transactions within 5 minutes
@@ -55,6 +250,63 @@ class DuplicateDetector:
         
         logger.info(f"Initialized DuplicateDetector for fund {fund_id} with {len(self.known_hashes)} known hashes")
     
+    def _index_rows(self, transactions: pd.DataFrame) -> pd.DataFrame:
+        """Index rows (see INDEX_COLUMNS, without seq) of stored transactions."""
+        if transactions.empty:
+            return pd.DataFrame(columns=INDEX_COLUMNS[1:])
+        
+        dates = pd.to_datetime(transactions['date'], utc=True)
+        tokens = [Decimal(str(value)) for value in transactions['token_amount']]
+        eths = [Decimal(str(value)) for value in transactions['eth_value']]
+        signatures = [
+            _signature_hash(wallet_id, asset, side, token, eth, date.isoformat())
+            for wallet_id, asset, side, token, eth, date in zip(
+                transactions['wallet_id'], transactions['asset'], transactions['side'], tokens, eths, dates)
+        ]
+        return pd.DataFrame({
+            'tx_hash': transactions['tx_hash'].to_numpy(),
+            'wallet_id': transactions['wallet_id'].to_numpy(),
+            'asset': transactions['asset'].to_numpy(),
+            'side': transactions['side'].to_numpy(),
+            'time': _utc_ns(dates),
+            'token_amount': tokens,
+            'eth_value': eths,
+            'signature': signatures,
+        })
+    
+    def _load_index(self) -> TransactionIndex:
+        """The persisted index, topped up with stored transactions it does not hold yet."""
+        stored = self.persistence.load_duplicate_index()
+        deltas = self.persistence.load_duplicate_index_deltas()
+        if deltas is not None:
+            # Transactions added since the last save; their hashes were not saved either
+            self.known_hashes.update(hashlib.sha256(tx_hash.encode()).hexdigest() for tx_hash in deltas['tx_hash'])
+            self.known_hashes.update(deltas['signature'])
+            # A delta left behind by an interrupted compaction is already in the index
+            stored = pd.concat([stored, deltas], ignore_index=True) if stored is not None else deltas
+            stored = stored.drop_duplicates(['seq', 'tx_hash', 'wallet_id', 'asset'], keep='first')
+        index = TransactionIndex.from_frame(stored) if stored is not None else TransactionIndex()
+        
+        if not self.existing_transactions.empty:
+            missing = self.existing_transactions[~self.existing_transactions['tx_hash'].isin(index.tx_hashes())]
+            index.extend(self._index_rows(missing))
+        return index
+    
+    def _index_transaction(self, transaction: TransactionRecord) -> pd.DataFrame:
+        """Index the transaction; returns its index row (as persisted, see to_frame)."""
+        time = PersistenceManager._utc(transaction.date).value
+        signature = self._generate_signature_hash(transaction)
+        seq = self.index.add(
+            transaction.tx_hash, transaction.wallet_id, transaction.asset, transaction.side,
+            time, transaction.token_amount, transaction.eth_value, signature
+        )
+        return pd.DataFrame([{
+            'seq': seq, 'tx_hash': transaction.tx_hash, 'wallet_id': transaction.wallet_id,
+            'asset': transaction.asset, 'side': transaction.side, 'time': time,
+            'token_amount': str(transaction.token_amount), 'eth_value': str(transaction.eth_value),
+            'signature': signature,
+        }], columns=INDEX_COLUMNS)
+    
     def _generate_primary_hash(self, transaction: TransactionRecord) -> str:
         """Generate primary hash from transaction hash."""
         return hashlib.sha256(transaction.tx_hash.encode()).hexdigest()
@@ -62,15 +314,10 @@ class DuplicateDetector:
     def _generate_signature_hash(self, transaction: TransactionRecord) -> str:
         """Generate signature hash from multiple transaction fields."""
         # Create signature from multiple fields for robustness
-        signature_data = (
-            f"{transaction.wallet_id}|"
-            f"{transaction.asset}|"
-            f"{transaction.side}|"
-            f"{transaction.token_amount}|"
-            f"{transaction.eth_value}|"
-            f"{transaction.date.isoformat()}"
+        return _signature_hash(
+            transaction.wallet_id, transaction.asset, transaction.side,
+            transaction.token_amount, transaction.eth_value, transaction.date.isoformat()
         )
-        return hashlib.sha256(signature_data.encode()).hexdigest()
     
     def _generate_fuzzy_hash(self, transaction: TransactionRecord) -> str:
         """Generate fuzzy hash for approximate matching."""
@@ -104,19 +351,15 @@ class DuplicateDetector:
             )
         
         # Check against existing transactions
-        if not self.existing_transactions.empty:
-            existing_match = self.existing_transactions[
-                self.existing_transactions['tx_hash'] == transaction.tx_hash
-            ]
-            if not existing_match.empty:
-                return DuplicateCheckResult(
-                    is_duplicate=True,
-                    confidence=1.0,
-                    duplicate_type='exact',
-                    conflicting_tx_hash=transaction.tx_hash,
-                    reason="Transaction hash exists in database",
-                    suggested_action="Skip transaction - already in database"
-                )
+        if transaction.tx_hash in self.index:
+            return DuplicateCheckResult(
+                is_duplicate=True,
+                confidence=1.0,
+                duplicate_type='exact',
+                conflicting_tx_hash=transaction.tx_hash,
+                reason="Transaction hash exists in database",
+                suggested_action="Skip transaction - already in database"
+            )
         
         return DuplicateCheckResult(
             is_duplicate=False,
@@ -128,39 +371,17 @@ class DuplicateDetector:
         """Check for duplicate using multi-field signature."""
         signature_hash = self._generate_signature_hash(transaction)
         
-        if not self.existing_transactions.empty:
-            # Check for matching signature patterns
-            potential_matches = self.existing_transactions[
-                (self.existing_transactions['wallet_id'] == transaction.wallet_id) &
-                (self.existing_transactions['asset'] == transaction.asset) &
-                (self.existing_transactions['side'] == transaction.side)
-            ]
-            
-            for _, existing_tx in potential_matches.iterrows():
-                existing_signature = self._generate_signature_hash(
-                    TransactionRecord(
-                        tx_hash=existing_tx['tx_hash'],
-                        block_number=int(existing_tx.get('block_number', 0)),
-                        date=pd.to_datetime(existing_tx['date']),
-                        fund_id=existing_tx['fund_id'],
-                        wallet_id=existing_tx['wallet_id'],
-                        asset=existing_tx['asset'],
-                        side=existing_tx['side'],
-                        token_amount=Decimal(str(existing_tx['token_amount'])),
-                        eth_value=Decimal(str(existing_tx['eth_value'])),
-                        usd_value=Decimal(str(existing_tx['usd_value']))
-                    )
-                )
-                
-                if signature_hash == existing_signature:
-                    return DuplicateCheckResult(
-                        is_duplicate=True,
-                        confidence=0.9,
-                        duplicate_type='probable',
-                        conflicting_tx_hash=existing_tx['tx_hash'],
-                        reason="Identical transaction signature (wallet, asset, side, amounts, date)",
-                        suggested_action="Review transaction - likely duplicate with different hash"
-                    )
+        # Signatures cover wallet, asset and side, so equal hashes match on those too
+        existing_tx_hash = self.index.signature_match(signature_hash)
+        if existing_tx_hash is not None:
+            return DuplicateCheckResult(
+                is_duplicate=True,
+                confidence=0.9,
+                duplicate_type='probable',
+                conflicting_tx_hash=existing_tx_hash,
+                reason="Identical transaction signature (wallet, asset, side, amounts, date)",
+                suggested_action="Review transaction - likely duplicate with different hash"
+            )
         
         return DuplicateCheckResult(
             is_duplicate=False,
@@ -170,25 +391,32 @@ class DuplicateDetector:
     
     def _check_proximity_duplicate(self, transaction: TransactionRecord) -> DuplicateCheckResult:
         """Check for duplicates based on time/amount proximity."""
-        if self.existing_transactions.empty:
+        # Define time window
+        date = PersistenceManager._utc(transaction.date).value
+        threshold = self.time_proximity_threshold // timedelta(microseconds=1) * 1000
+        
+        # Transactions in same wallet and asset within time window
+        tokens, eths, rows = self.index.window(
+            transaction.wallet_id, transaction.asset, date - threshold, date + threshold)
+        if not rows:
             return DuplicateCheckResult(is_duplicate=False, confidence=0.0, duplicate_type='none')
         
-        # Define time window
-        time_start = transaction.date - self.time_proximity_threshold
-        time_end = transaction.date + self.time_proximity_threshold
-        
-        # Find transactions in same wallet and asset within time window
-        proximity_matches = self.existing_transactions[
-            (self.existing_transactions['wallet_id'] == transaction.wallet_id) &
-            (self.existing_transactions['asset'] == transaction.asset) &
-            (pd.to_datetime(self.existing_transactions['date']) >= time_start) &
-            (pd.to_datetime(self.existing_transactions['date']) <= time_end)
-        ]
+        # Relative amount differences of the whole window at once; float
+        # rounding is allowed for here and the candidates re-checked exactly
+        with np.errstate(divide='ignore', invalid='ignore'):
+            token_new, eth_new = float(transaction.token_amount), float(transaction.eth_value)
+            token_max, eth_max = np.maximum(tokens, token_new), np.maximum(eths, eth_new)
+            token_rel = np.where(token_max > 0, np.abs(tokens - token_new) / token_max, 0.0)
+            eth_rel = np.where(eth_max > 0, np.abs(eths - eth_new) / eth_max, 0.0)
+        tolerance = float(self.amount_tolerance) * (1 + 1e-9) + 1e-12
+        candidates = np.flatnonzero((token_rel <= tolerance) & (eth_rel <= tolerance))
         
-        for _, existing_tx in proximity_matches.iterrows():
+        for i in sorted(candidates, key=lambda i: rows[i]['seq']):
+            existing_tx = rows[i]
+            
             # Check amount similarity
-            existing_token_amount = Decimal(str(existing_tx['token_amount']))
-            existing_eth_value = Decimal(str(existing_tx['eth_value']))
+            existing_token_amount = existing_tx['token_amount']
+            existing_eth_value = existing_tx['eth_value']
             
             token_diff = abs(transaction.token_amount - existing_token_amount)
             eth_diff = abs(transaction.eth_value - existing_eth_value)
@@ -268,15 +496,16 @@ class DuplicateDetector:
         
         # Sort transactions by date to process in chronological order
         sorted_transactions = sorted(transactions, key=lambda tx: tx.date)
+        new_rows = []
         
         for transaction in sorted_transactions:
             result = self.check_duplicate(transaction)
             results[transaction.tx_hash] = result
             
-            # If not a duplicate, add to known transactions for subsequent checks
+            # If not a duplicate, index it for subsequent checks
             if not result.is_duplicate:
-                # Add to temporary transaction list for batch processing
-                new_row = {
+                self._index_transaction(transaction)
+                new_rows.append({
                     'tx_hash': transaction.tx_hash,
                     'date': transaction.date,
                     'fund_id': transaction.fund_id,
@@ -286,29 +515,60 @@ class DuplicateDetector:
                     'token_amount': float(transaction.token_amount),
                     'eth_value': float(transaction.eth_value),
                     'usd_value': float(transaction.usd_value)
-                }
-                
-                self.existing_transactions = pd.concat([
-                    self.existing_transactions,
-                    pd.DataFrame([new_row])
-                ], ignore_index=True)
+                })
+        
+        # Add to known transactions in one go
+        if new_rows:
+            self.existing_transactions = pd.concat([
+                self.existing_transactions,
+                pd.DataFrame(new_rows)
+            ], ignore_index=True)
         
         duplicate_count = sum(1 for result in results.values() if result.is_duplicate)
         logger.info(f"Found {duplicate_count} duplicates in batch of {len(transactions)} transactions")
         
         return results
     
-    def add_transaction_hash(self, transaction: TransactionRecord) -> bool:
-        """Add transaction hash to known hashes set."""
+    def save(self) -> bool:
+        """Persist the known hashes and the whole transaction index (compacting its deltas)."""
+        hashes_saved = self.persistence.save_duplicate_hashes(self.known_hashes)
+        index_saved = self.persistence.save_duplicate_index(self.index.to_frame())
+        if hashes_saved and index_saved:
+            self._deltas = 0
+        return hashes_saved and index_saved
+    
+    def add_transaction_hash(self, transaction: TransactionRecord, persist: bool = True) -> bool:
+        """
+        Add transaction hash to known hashes set.
+        
+        A new transaction is persisted as an index delta (its hashes are
+        restored from the index on load); the whole index and hash set are
+        rewritten every DUPLICATE_INDEX_COMPACT_EVERY deltas.
+        
+        Args:
+            transaction: Transaction to remember
+            persist: Save to S3 now (False when the caller saves later, see save)
+        """
         try:
             primary_hash = self._generate_primary_hash(transaction)
             signature_hash = self._generate_signature_hash(transaction)
             
+            known = primary_hash in self.known_hashes and signature_hash in self.known_hashes
             self.known_hashes.add(primary_hash)
             self.known_hashes.add(signature_hash)
+            row = None
+            if not self.index.holds(transaction.tx_hash, transaction.wallet_id, transaction.asset):
+                row = self._index_transaction(transaction)
             
             # Persist to S3
-            return self.persistence.save_duplicate_hashes(self.known_hashes)
+            if not persist or (known and row is None):
+                return True
+            if row is None or self._deltas + 1 >= DUPLICATE_INDEX_COMPACT_EVERY:
+                return self.save()
+            if not self.persistence.append_duplicate_index_delta(row):
+                return self.save()
+            self._deltas += 1
+            return True
             
         except Exception as e:
             logger.error(f"Failed to add transaction hash: {e}")
@@ -322,9 +582,10 @@ class DuplicateDetector:
             
             self.known_hashes.discard(primary_hash)
             self.known_hashes.discard(signature_hash)
+            self.index.remove(transaction.tx_hash, transaction.wallet_id, transaction.asset)
             
             # Persist to S3
-            return self.persistence.save_duplicate_hashes(self.known_hashes)
+            return self.save()
             
         except Exception as e:
             logger.error(f"Failed to remove transaction hash: {e}")
@@ -366,9 +627,12 @@ class DuplicateDetector:
                     continue
             
             self.known_hashes = new_hashes
+            self.existing_transactions = transactions_df
+            self.index = TransactionIndex()
+            self.index.extend(self._index_rows(transactions_df))
             
             # Save to S3
-            success = self.persistence.save_duplicate_hashes(self.known_hashes)
+            success = self.save()
             
             if success:
                 logger.info(f"Successfully rebuilt hash database with {len(self.known_hashes)} hashes")
@@ -387,6 +651,7 @@ class DuplicateDetector:
             'fund_id': self.fund_id,
             'known_hashes_count': len(self.known_hashes),
             'existing_transactions_count': len(self.existing_transactions),
+            'indexed_transactions_count': len(self.index),
             'time_proximity_threshold_minutes': self.time_proximity_threshold.total_seconds() / 60,
             'amount_tolerance': float(self.amount_tolerance),
             'last_updated': datetime.now(timezone.utc).isoformat()
@@ -5,24 +5,43 @@ Production-ready FIFO cost basis engine with persistent state management,
 real-time updates, and duplicate prevention.
 """
 
+import atexit
 import logging
+import threading
+import weakref
 from collections import deque
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Tuple, Any, Deque
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from decimal import Decimal, getcontext
 import pandas as pd
+from pandas.tseries.frequencies import to_offset
 import uuid
 
 from .persistence_manager import PersistenceManager, TransactionRecord, FIFOLot
 from .duplicate_detector import DuplicateDetector, DuplicateCheckResult
 from .progress_tracker import ProgressTracker, ProgressContext
+from .write_behind import LotWriteBehind, FIFO_FLUSH_OPERATIONS, FIFO_FLUSH_SECONDS
 
 logger = logging.getLogger(__name__)
 
 # Set decimal precision for financial calculations
 getcontext().prec = 28
 
+# Month-start checkpoints hold the lot state at each month-end close
+DEFAULT_CHECKPOINT_FREQUENCY = 'MS'
+
+# Engines with write-behind, committed when the interpreter exits
+_open_engines: "weakref.WeakSet[FIFOEngine]" = weakref.WeakSet()
+
+
+def _close_open_engines():
+    for engine in list(_open_engines):
+        engine.close()
+
+
+atexit.register(_close_open_engines)
+
 
 @dataclass
 class FIFOResult:
@@ -67,13 +86,38 @@ class FIFOEngine:
     - Historical snapshot capabilities
     """
     
-    def __init__(self, fund_id: str, auto_persist: bool = True):
-        """Initialize FIFO engine for specific fund."""
+    def __init__(
+        self,
+        fund_id: str,
+        auto_persist: bool = True,
+        persistence: Optional[PersistenceManager] = None,
+        checkpoint_frequency: Optional[str] = DEFAULT_CHECKPOINT_FREQUENCY,
+        journal_path: Optional[str] = None,
+        flush_operations: int = FIFO_FLUSH_OPERATIONS,
+        flush_seconds: float = FIFO_FLUSH_SECONDS
+    ):
+        """
+        Initialize FIFO engine for specific fund.
+        
+        Args:
+            fund_id: Fund identifier
+            auto_persist: Persist lot state as transactions are processed
+                (write-behind: see LotWriteBehind and commit)
+            persistence: Storage backend (defaults to the fund's S3 PersistenceManager)
+            checkpoint_frequency: pandas offset alias for lot-state checkpoints
+                written while replaying history ('MS' = every month start, i.e.
+                the close of the previous month); None disables checkpoints
+            journal_path: Local journal of unflushed operations (default:
+                one per fund under FIFO_JOURNAL_DIR)
+            flush_operations: Flush once this many operations are pending
+            flush_seconds: Flush once the oldest pending operation is this old
+        """
         self.fund_id = fund_id
         self.auto_persist = auto_persist
+        self.checkpoint_offset = to_offset(checkpoint_frequency) if checkpoint_frequency else None
         
         # Initialize components
-        self.persistence = PersistenceManager(fund_id)
+        self.persistence = persistence or PersistenceManager(fund_id)
         self.duplicate_detector = DuplicateDetector(fund_id, self.persistence)
         self.progress_tracker = ProgressTracker()
         
@@ -83,9 +127,26 @@ class FIFOEngine:
         # Transaction processing log
         self.processing_log: List[Dict[str, Any]] = []
         
+        # Stored checkpoint times, listed lazily
+        self._checkpoints: Optional[List[pd.Timestamp]] = None
+        self.stats = {'checkpoints_loaded': 0, 'checkpoints_saved': 0, 'transactions_replayed': 0}
+        
+        # Dirty lot partitions and the journal of operations not yet written;
+        # the write-behind timer commits on its own thread, hence the lock
+        self._lock = threading.RLock()
+        self.write_behind = (
+            LotWriteBehind(self.persistence, journal_path, flush_operations, flush_seconds,
+                           on_due=self._commit_due)
+            if auto_persist else None
+        )
+        
         # Load existing state
         self._load_state()
+        if self.write_behind is not None:
+            self._replay_journal()
         
+        if self.write_behind is not None:
+            _open_engines.add(self)
         logger.info(f"Initialized FIFOEngine for fund {fund_id} with {len(self.lots)} asset pairs")
     
     def _load_state(self) -> bool:
@@ -139,33 +200,74 @@ class FIFOEngine:
             logger.error(f"Failed to load FIFO state: {e}")
             return False
     
-    def _save_state(self) -> bool:
-        """Save current FIFO state to S3."""
-        if not self.auto_persist:
-            return True
+    def _replay_journal(self) -> int:
+        """Re-apply journaled transactions the stored lots do not include (after a crash)."""
+        transactions = self.write_behind.unflushed()
+        for transaction in transactions:
+            self._process_fifo_transaction(transaction)
+            self.duplicate_detector.add_transaction_hash(transaction, persist=False)
+            self.write_behind.record(transaction, journal=False)
         
-        try:
-            # Convert lots to list
-            all_lots = []
-            for key, lot_deque in self.lots.items():
-                all_lots.extend(list(lot_deque))
-            
-            if not all_lots:
-                logger.info("No FIFO lots to save")
+        if transactions:
+            logger.warning(f"Replayed {len(transactions)} unflushed FIFO operations from {self.write_behind.journal.path}")
+        return len(transactions)
+    
+    def commit(self) -> bool:
+        """
+        Write pending lot changes and the duplicate detector's state now.
+        
+        Returns:
+            True if nothing was pending or everything was written
+        """
+        with self._lock:
+            if self.write_behind is None or not self.write_behind.pending:
                 return True
             
-            return self.persistence.save_fifo_lots(all_lots)
-            
-        except Exception as e:
-            logger.error(f"Failed to save FIFO state: {e}")
-            return False
+            try:
+                lots_saved = self.write_behind.flush(self.lots)
+                hashes_saved = self.duplicate_detector.save()
+                return lots_saved and hashes_saved
+                
+            except Exception as e:
+                logger.error(f"Failed to save FIFO state: {e}")
+                return False
+    
+    def _commit_due(self):
+        """Write-behind timer: the oldest pending operation reached the age limit."""
+        logger.debug(f"Flushing FIFO operations of fund {self.fund_id} on the write-behind timer")
+        self.commit()
+    
+    def close(self) -> bool:
+        """
+        Write pending changes and stop the write-behind timer (end of the
+        session; also done for open engines at interpreter exit).
+        
+        Returns:
+            True if nothing was pending or everything was written
+        """
+        with self._lock:
+            saved = self.commit()
+            if self.write_behind is not None:
+                self.write_behind.cancel()
+            _open_engines.discard(self)
+            return saved
     
     def process_transaction(self, transaction: TransactionRecord) -> FIFOResult:
         """
         Process a single transaction through FIFO methodology.
         
-        Includes duplicate checking and automatic persistence.
+        Includes duplicate checking and automatic persistence: the change is
+        journaled and written with others once a flush threshold is reached
+        (call commit() to write it now).
         """
+        with self._lock:
+            result = self._process_transaction(transaction)
+            if self.write_behind is not None and self.write_behind.due():
+                self.commit()
+            return result
+    
+    def _process_transaction(self, transaction: TransactionRecord) -> FIFOResult:
+        """Check, apply and record one transaction without flushing."""
         logger.debug(f"Processing transaction {transaction.tx_hash}")
         
         # Check for duplicates
@@ -184,17 +286,20 @@ class FIFOEngine:
             # Process the transaction
             realized_gain_eth, realized_gain_usd = self._process_fifo_transaction(transaction)
             
-            # Add to duplicate detection
-            self.duplicate_detector.add_transaction_hash(transaction)
+            # Add to duplicate detection (saved with the lots when write-behind)
+            self.duplicate_detector.add_transaction_hash(transaction, persist=self.write_behind is None)
+            
+            # Journal the operation and mark its lot partition dirty
+            if self.write_behind is not None:
+                self.write_behind.record(transaction)
+            
+            # A back-dated transaction makes later checkpoints stale
+            self.invalidate_checkpoints(transaction.date)
             
             # Get current lots for this asset
             key = (transaction.wallet_id, transaction.asset)
             remaining_lots = list(self.lots.get(key, deque()))
             
-            # Save state if auto-persist is enabled
-            if self.auto_persist:
-                self._save_state()
-            
             # Log the processing
             self.processing_log.append({
                 'timestamp': datetime.now(timezone.utc),
@@ -232,35 +337,55 @@ class FIFOEngine:
     
     def _process_fifo_transaction(self, transaction: TransactionRecord) -> Tuple[Decimal, Decimal]:
         """Process transaction through FIFO methodology."""
-        key = (transaction.wallet_id, transaction.asset)
+        return self._apply_fifo(
+            self.lots, transaction.fund_id, transaction.wallet_id, transaction.asset,
+            transaction.side, transaction.date, transaction.token_amount,
+            transaction.eth_value, transaction.usd_value, transaction.tx_hash
+        )
+    
+    def _apply_fifo(
+        self,
+        lots: Dict[Tuple[str, str], Deque[FIFOLot]],
+        fund_id: str,
+        wallet_id: str,
+        asset: str,
+        side: str,
+        date: datetime,
+        token_amount: Decimal,
+        eth_value: Decimal,
+        usd_value: Decimal,
+        tx_hash: str
+    ) -> Tuple[Decimal, Decimal]:
+        """Apply one transaction to a lot state (the engine's own or a replayed one)."""
+        key = (wallet_id, asset)
         
         # Get or create lot deque for this asset/wallet combination
-        lot_deque = self.lots.setdefault(key, deque())
+        lot_deque = lots.setdefault(key, deque())
         
         realized_gain_eth = Decimal('0')
         realized_gain_usd = Decimal('0')
         
-        if transaction.side.lower() == 'buy':
+        if side.lower() == 'buy':
             # Create new lot for buy transactions
             lot = FIFOLot(
                 lot_id=str(uuid.uuid4()),
-                fund_id=transaction.fund_id,
-                wallet_id=transaction.wallet_id,
-                asset=transaction.asset,
-                purchase_date=transaction.date,
-                original_quantity=transaction.token_amount,
-                remaining_quantity=transaction.token_amount,
-                cost_basis_eth=transaction.eth_value,
-                cost_basis_usd=transaction.usd_value,
-                source_tx_hash=transaction.tx_hash
+                fund_id=fund_id,
+                wallet_id=wallet_id,
+                asset=asset,
+                purchase_date=date,
+                original_quantity=token_amount,
+                remaining_quantity=token_amount,
+                cost_basis_eth=eth_value,
+                cost_basis_usd=usd_value,
+                source_tx_hash=tx_hash
             )
             
             lot_deque.append(lot)
-            logger.debug(f"Added new FIFO lot: {transaction.token_amount} {transaction.asset}")
+            logger.debug(f"Added new FIFO lot: {token_amount} {asset}")
             
-        elif transaction.side.lower() == 'sell':
+        elif side.lower() == 'sell':
             # Process sell using FIFO methodology
-            tokens_to_sell = transaction.token_amount
+            tokens_to_sell = token_amount
             
             while tokens_to_sell > 0 and lot_deque:
                 oldest_lot = lot_deque[0]
@@ -275,9 +400,9 @@ class FIFOEngine:
                     cost_basis_usd = oldest_lot.cost_basis_usd * proportion
                     
                     # Calculate proportion of sale proceeds
-                    sale_proportion = tokens_sold / transaction.token_amount
-                    proceeds_eth = transaction.eth_value * sale_proportion
-                    proceeds_usd = transaction.usd_value * sale_proportion
+                    sale_proportion = tokens_sold / token_amount
+                    proceeds_eth = eth_value * sale_proportion
+                    proceeds_usd = usd_value * sale_proportion
                     
                     realized_gain_eth += proceeds_eth - cost_basis_eth
                     realized_gain_usd += proceeds_usd - cost_basis_usd
@@ -287,7 +412,7 @@ class FIFOEngine:
                     # Remove exhausted lot
                     lot_deque.popleft()
                     
-                    logger.debug(f"Exhausted lot: sold {tokens_sold} {transaction.asset}")
+                    logger.debug(f"Exhausted lot: sold {tokens_sold} {asset}")
                     
                 else:
                     # Partial sale of lot
@@ -299,9 +424,9 @@ class FIFOEngine:
                     cost_basis_usd = oldest_lot.cost_basis_usd * proportion
                     
                     # Calculate proportion of sale proceeds
-                    sale_proportion = tokens_sold / transaction.token_amount
-                    proceeds_eth = transaction.eth_value * sale_proportion
-                    proceeds_usd = transaction.usd_value * sale_proportion
+                    sale_proportion = tokens_sold / token_amount
+                    proceeds_eth = eth_value * sale_proportion
+                    proceeds_usd = usd_value * sale_proportion
                     
                     realized_gain_eth += proceeds_eth - cost_basis_eth
                     realized_gain_usd += proceeds_usd - cost_basis_usd
@@ -313,10 +438,10 @@ class FIFOEngine:
                     
                     tokens_to_sell = Decimal('0')
                     
-                    logger.debug(f"Partial sale: sold {tokens_sold} {transaction.asset}, remaining {oldest_lot.remaining_quantity}")
+                    logger.debug(f"Partial sale: sold {tokens_sold} {asset}, remaining {oldest_lot.remaining_quantity}")
             
             if tokens_to_sell > 0:
-                logger.warning(f"Insufficient inventory for sale: missing {tokens_to_sell} {transaction.asset}")
+                logger.warning(f"Insufficient inventory for sale: missing {tokens_to_sell} {asset}")
         
         return realized_gain_eth, realized_gain_usd
     
@@ -348,8 +473,9 @@ class FIFOEngine:
                     current_step_number=i + 1
                 )
                 
-                # Process transaction
-                result = self.process_transaction(transaction)
+                # Process transaction (written once, below)
+                with self._lock:
+                    result = self._process_transaction(transaction)
                 results.append(result)
                 
                 # Stop processing if there's a critical error
@@ -358,142 +484,236 @@ class FIFOEngine:
                     break
             
             # Final save
-            if self.auto_persist:
-                self._save_state()
+            self.commit()
             
             successful_count = sum(1 for result in results if result.processed)
             logger.info(f"Batch processing completed: {successful_count}/{len(transactions)} transactions processed")
             
             return results
     
+    # ============================================================================
+    # CHECKPOINTED HISTORY
+    # ============================================================================
+    
+    def _normalize_date(self, value: datetime) -> pd.Timestamp:
+        """Stored transaction dates are UTC; treat naive inputs as UTC."""
+        value = pd.Timestamp(value)
+        return value.tz_localize('UTC') if value.tzinfo is None else value.tz_convert('UTC')
+    
+    def _load_history(self) -> pd.DataFrame:
+        """Load the stored transactions in processing (date) order."""
+        transactions_df = self.persistence.load_transactions()
+        if transactions_df.empty:
+            return transactions_df
+        
+        transactions_df['date'] = pd.to_datetime(transactions_df['date'], utc=True)
+        return transactions_df.sort_values('date', kind='stable').reset_index(drop=True)
+    
+    def _list_checkpoints(self) -> List[pd.Timestamp]:
+        if self._checkpoints is None:
+            self._checkpoints = self.persistence.list_fifo_checkpoints()
+        return self._checkpoints
+    
+    def invalidate_checkpoints(self, from_date: datetime) -> int:
+        """
+        Drop checkpoints made stale by a transaction added or edited at from_date.
+        
+        Checkpoints at or before from_date do not include it and stay valid.
+        
+        Returns:
+            Number of checkpoints deleted
+        """
+        from_date = self._normalize_date(from_date)
+        checkpoints = self._list_checkpoints()
+        if not checkpoints or checkpoints[-1] <= from_date:
+            return 0
+        
+        deleted = self.persistence.delete_fifo_checkpoints_after(from_date)
+        self._checkpoints = [as_of for as_of in checkpoints if as_of <= from_date]
+        logger.info(f"Invalidated {deleted} FIFO checkpoints after {from_date}")
+        return deleted
+    
+    def _restore_checkpoint(self, as_of: pd.Timestamp) -> Optional[Dict[Tuple[str, str], Deque[FIFOLot]]]:
+        """Rebuild the lot state stored at as_of (None if it cannot be read)."""
+        lots_df = self.persistence.load_fifo_checkpoint(as_of)
+        if lots_df is None:
+            return None
+        
+        lots: Dict[Tuple[str, str], Deque[FIFOLot]] = {}
+        for record in lots_df.to_dict('records'):
+            lot = FIFOLot(**record)
+            lots.setdefault((lot.wallet_id, lot.asset), deque()).append(lot)
+        
+        self.stats['checkpoints_loaded'] += 1
+        return lots
+    
+    def _nearest_state(self, target: pd.Timestamp, history: pd.DataFrame, applied: int = 0) -> Optional[Tuple[Dict[Tuple[str, str], Deque[FIFOLot]], int, pd.Timestamp]]:
+        """
+        Latest checkpoint at or before target that saves replaying history.
+        
+        Only checkpoints past the first `applied` rows are considered.
+        
+        Returns:
+            (lots, index of the first row to replay, checkpoint time), or None
+        """
+        for as_of in reversed(self._list_checkpoints()):
+            if as_of > target:
+                continue
+            start = int(history['date'].searchsorted(as_of, side='left')) if not history.empty else 0
+            if start <= applied and applied:
+                return None
+            lots = self._restore_checkpoint(as_of)
+            if lots is not None:
+                return lots, start, as_of
+        return None
+    
+    def _replay(
+        self,
+        lots: Dict[Tuple[str, str], Deque[FIFOLot]],
+        history: pd.DataFrame,
+        start: int,
+        stop: int,
+        floor: Optional[pd.Timestamp] = None
+    ) -> None:
+        """
+        Apply history rows [start, stop) to lots, in place.
+        
+        lots must hold the state after rows [0, start); floor is the time of
+        the checkpoint it was restored from, if any. Every checkpoint boundary
+        crossed on the way is persisted unless already stored, so the next
+        replay can start from there.
+        """
+        if start >= stop:
+            return
+        
+        dates = history['date']
+        boundary = None
+        if self.checkpoint_offset is not None:
+            boundary = dates.iloc[max(start - 1, 0)].normalize() + self.checkpoint_offset
+            while floor is not None and boundary < floor:
+                boundary = boundary + self.checkpoint_offset
+        stored = set(self._list_checkpoints())
+        
+        columns = ['fund_id', 'wallet_id', 'asset', 'side', 'date',
+                   'token_amount', 'eth_value', 'usd_value', 'tx_hash']
+        rows = history[columns].iloc[start:stop].itertuples(index=False, name=None)
+        
+        for offset, row in enumerate(rows):
+            while boundary is not None and boundary <= row[4]:
+                if boundary not in stored:
+                    self._write_checkpoint(lots, boundary, start + offset)
+                boundary = boundary + self.checkpoint_offset
+            
+            self._apply_fifo(lots, *row)
+        
+        self.stats['transactions_replayed'] += stop - start
+    
+    def _write_checkpoint(self, lots: Dict[Tuple[str, str], Deque[FIFOLot]], as_of: pd.Timestamp, transaction_count: int) -> None:
+        open_lots = [lot for lot_deque in lots.values() for lot in lot_deque]
+        if self.persistence.save_fifo_checkpoint(as_of, open_lots, transaction_count):
+            self._checkpoints = sorted(set(self._list_checkpoints()) | {as_of})
+            self.stats['checkpoints_saved'] += 1
+    
     def recalculate_from_date(self, from_date: datetime) -> bool:
-        """Recalculate FIFO from a specific date forward."""
+        """
+        Recalculate FIFO from a specific date forward.
+        
+        Checkpoints after from_date are dropped; the lot state is restored
+        from the nearest checkpoint at or before it and the stored
+        transactions from there on are replayed. Stored transactions were
+        duplicate-checked when they were recorded and are replayed as-is.
+        """
         try:
             logger.info(f"Recalculating FIFO from {from_date} for fund {self.fund_id}")
             
-            # Load all transactions
-            transactions_df = self.persistence.load_transactions()
+            from_date = self._normalize_date(from_date)
+            self.invalidate_checkpoints(from_date)
+            
+            history = self._load_history()
             
-            if transactions_df.empty:
+            if history.empty:
                 logger.info("No transactions to recalculate")
                 return True
             
-            # Filter transactions from the specified date
-            transactions_df['date'] = pd.to_datetime(transactions_df['date'])
-            relevant_transactions = transactions_df[transactions_df['date'] >= from_date]
+            lots, start, position = self._nearest_state(from_date, history) or ({}, 0, None)
             
-            if relevant_transactions.empty:
-                logger.info(f"No transactions found from {from_date}")
-                return True
-            
-            # Clear FIFO state for affected assets
-            affected_assets = set()
-            for _, row in relevant_transactions.iterrows():
-                key = (row['wallet_id'], row['asset'])
-                affected_assets.add(key)
-            
-            # Remove lots for affected assets that were created after from_date
-            for key in affected_assets:
-                if key in self.lots:
-                    self.lots[key] = deque([
-                        lot for lot in self.lots[key]
-                        if lot.purchase_date < from_date
-                    ])
-            
-            # Convert transactions to TransactionRecord objects
-            transaction_records = []
-            for _, row in relevant_transactions.iterrows():
-                transaction = TransactionRecord(
-                    tx_hash=row['tx_hash'],
-                    block_number=int(row.get('block_number', 0)),
-                    date=pd.to_datetime(row['date']),
-                    fund_id=row['fund_id'],
-                    wallet_id=row['wallet_id'],
-                    asset=row['asset'],
-                    side=row['side'],
-                    token_amount=Decimal(str(row['token_amount'])),
-                    eth_value=Decimal(str(row['eth_value'])),
-                    usd_value=Decimal(str(row['usd_value']))
-                )
-                transaction_records.append(transaction)
+            self._replay(lots, history, start, len(history), position)
             
-            # Temporarily disable auto-persist to avoid constant saves
-            original_auto_persist = self.auto_persist
-            self.auto_persist = False
-            
-            try:
-                # Reprocess transactions
-                results = self.process_transaction_batch(transaction_records)
-                
-                # Final save
-                self._save_state()
-                
-                successful_count = sum(1 for result in results if result.processed)
-                logger.info(f"Recalculation completed: {successful_count}/{len(transaction_records)} transactions reprocessed")
-                
-                return True
-                
-            finally:
-                self.auto_persist = original_auto_persist
+            # Final save
+            with self._lock:
+                self.lots = lots
+                if self.write_behind is not None:
+                    self.write_behind.mark_all()
+                self.commit()
             
+            logger.info(
+                f"Recalculation completed: {len(history) - start}/{len(history)} transactions replayed "
+                f"from {'checkpoint ' + str(position) if position is not None else 'inception'}"
+            )
+            return True
+        
         except Exception as e:
             logger.error(f"Error during recalculation: {e}")
             return False
     
     def get_portfolio_snapshot(self, as_of_date: Optional[datetime] = None) -> PortfolioSnapshot:
         """Get portfolio state at a specific date."""
-        if as_of_date is None:
-            as_of_date = datetime.now(timezone.utc)
+        return self.get_portfolio_snapshots([as_of_date])[0]
+    
+    def get_portfolio_snapshots(self, as_of_dates: List[Optional[datetime]]) -> List[PortfolioSnapshot]:
+        """
+        Get portfolio states at several dates with one history load.
         
-        # Load transactions up to the specified date
-        transactions_df = self.persistence.load_transactions()
+        The first (earliest) date starts from the nearest checkpoint at or
+        before it; later dates continue the same replay forward, or jump to a
+        closer checkpoint when one lies in between.
         
-        if transactions_df.empty:
-            return PortfolioSnapshot(
-                fund_id=self.fund_id,
-                as_of_date=as_of_date,
-                total_assets={},
-                total_cost_basis_eth={},
-                total_cost_basis_usd={},
-                unrealized_gains_eth={},
-                unrealized_gains_usd={},
-                active_lots=[],
-                transaction_count=0
-            )
+        Args:
+            as_of_dates: Snapshot times (None = now); transactions dated at or
+                before each time are included
         
-        # Filter transactions up to as_of_date
-        transactions_df['date'] = pd.to_datetime(transactions_df['date'])
-        historical_transactions = transactions_df[transactions_df['date'] <= as_of_date]
-        
-        # Create temporary FIFO engine for historical calculation
-        temp_engine = FIFOEngine(fund_id=f"temp_{self.fund_id}", auto_persist=False)
-        
-        # Process historical transactions
-        transaction_records = []
-        for _, row in historical_transactions.iterrows():
-            transaction = TransactionRecord(
-                tx_hash=row['tx_hash'],
-                block_number=int(row.get('block_number', 0)),
-                date=pd.to_datetime(row['date']),
-                fund_id=row['fund_id'],
-                wallet_id=row['wallet_id'],
-                asset=row['asset'],
-                side=row['side'],
-                token_amount=Decimal(str(row['token_amount'])),
-                eth_value=Decimal(str(row['eth_value'])),
-                usd_value=Decimal(str(row['usd_value']))
-            )
-            transaction_records.append(transaction)
+        Returns:
+            Snapshots in the order of as_of_dates
+        """
+        now = datetime.now(timezone.utc)
+        requested = [as_of if as_of is not None else now for as_of in as_of_dates]
+        
+        history = self._load_history()
+        snapshots: Dict[int, PortfolioSnapshot] = {}
         
-        temp_engine.process_transaction_batch(transaction_records)
+        lots: Dict[Tuple[str, str], Deque[FIFOLot]] = {}
+        applied = 0
+        floor: Optional[pd.Timestamp] = None
         
-        # Calculate portfolio aggregates
+        for i in sorted(range(len(requested)), key=lambda i: self._normalize_date(requested[i])):
+            target = self._normalize_date(requested[i])
+            stop = int(history['date'].searchsorted(target, side='right')) if not history.empty else 0
+            
+            nearest = self._nearest_state(target, history, applied) if stop else None
+            if nearest is not None:
+                lots, applied, floor = nearest
+            
+            self._replay(lots, history, applied, stop, floor)
+            applied = max(applied, stop)
+            
+            snapshots[i] = self._build_snapshot(requested[i], lots, history, stop)
+        
+        return [snapshots[i] for i in range(len(requested))]
+    
+    def _build_snapshot(
+        self,
+        as_of_date: datetime,
+        lots: Dict[Tuple[str, str], Deque[FIFOLot]],
+        history: pd.DataFrame,
+        transaction_count: int
+    ) -> PortfolioSnapshot:
+        """Aggregate a lot state; lots are copied so later replays do not alter the snapshot."""
         total_assets = {}
         total_cost_basis_eth = {}
         total_cost_basis_usd = {}
         active_lots = []
         
-        for key, lot_deque in temp_engine.lots.items():
+        for key, lot_deque in lots.items():
             wallet_id, asset = key
             
             asset_quantity = Decimal('0')
@@ -505,7 +725,7 @@ class FIFOEngine:
                     asset_quantity += lot.remaining_quantity
                     asset_cost_basis_eth += lot.cost_basis_eth
                     asset_cost_basis_usd += lot.cost_basis_usd
-                    active_lots.append(lot)
+                    active_lots.append(replace(lot))
             
             if asset_quantity > 0:
                 total_assets[asset] = total_assets.get(asset, Decimal('0')) + asset_quantity
@@ -519,9 +739,9 @@ class FIFOEngine:
         # Get transaction date range
         earliest_transaction = None
         latest_transaction = None
-        if not historical_transactions.empty:
-            earliest_transaction = historical_transactions['date'].min()
-            latest_transaction = historical_transactions['date'].max()
+        if transaction_count:
+            earliest_transaction = history['date'].iloc[0]
+            latest_transaction = history['date'].iloc[transaction_count - 1]
         
         return PortfolioSnapshot(
             fund_id=self.fund_id,
@@ -532,7 +752,7 @@ class FIFOEngine:
             unrealized_gains_eth=unrealized_gains_eth,
             unrealized_gains_usd=unrealized_gains_usd,
             active_lots=active_lots,
-            transaction_count=len(historical_transactions),
+            transaction_count=transaction_count,
             earliest_transaction=earliest_transaction,
             latest_transaction=latest_transaction
         )
@@ -597,5 +817,6 @@ class FIFOEngine:
             'active_lots': active_lots,
             'processing_log_entries': len(self.processing_log),
             'auto_persist_enabled': self.auto_persist,
+            'pending_operations': self.write_behind.pending if self.write_behind is not None else 0,
             'last_updated': datetime.now(timezone.utc).isoformat()
         }
\ No newline at end of file
@@ -16,15 +16,29 @@ import logging
 from io import BytesIO, StringIO
 import gzip
 import hashlib
+import uuid
 from pathlib import Path
 import pyarrow.parquet as pq
 
+from ..parquet_io import S3RangeFile, read_parquet, to_parquet_bytes, worth_reading_selectively
+
 logger = logging.getLogger(__name__)
 
 # S3 Configuration
 BUCKET_NAME = "realworldnav-beta"
 CRYPTO_TRACKER_PREFIX = "crypto_tracker"
 
+# FIFO lot-state checkpoints
+CHECKPOINT_KEY_FORMAT = "%Y%m%dT%H%M%SZ"
+CHECKPOINT_DECIMAL_COLUMNS = [
+    'original_quantity', 'remaining_quantity',
+    'cost_basis_eth', 'cost_basis_usd',
+    'unrealized_gain_eth', 'unrealized_gain_usd'
+]
+
+# Open lots partitioned per (wallet, asset), listed by a manifest
+LOT_MANIFEST_NAME = "manifest.json"
+
 
 @dataclass
 class TransactionRecord:
@@ -107,10 +121,10 @@ class PersistenceManager:
     versioning, and backup capabilities.
     """
     
-    def __init__(self, fund_id: str):
+    def __init__(self, fund_id: str, s3_client=None):
         """Initialize persistence manager for specific fund."""
         self.fund_id = fund_id
-        self.s3_client = boto3.client('s3')
+        self.s3_client = s3_client or boto3.client('s3')
         self.bucket = BUCKET_NAME
         
         # S3 key prefixes
@@ -119,6 +133,11 @@ class PersistenceManager:
         self.lots_key = f"{self.base_prefix}/fifo_lots.parquet"
         self.metadata_key = f"{self.base_prefix}/metadata.json"
         self.duplicate_hashes_key = f"{self.base_prefix}/duplicate_hashes.json"
+        self.duplicate_index_key = f"{self.base_prefix}/duplicate_index.parquet"
+        self.duplicate_deltas_prefix = f"{self.base_prefix}/duplicate_index_deltas"
+        self.checkpoints_prefix = f"{self.base_prefix}/checkpoints"
+        self.lot_partitions_prefix = f"{self.base_prefix}/fifo_lots"
+        self.lot_manifest_key = f"{self.lot_partitions_prefix}/{LOT_MANIFEST_NAME}"
         
         # Backup and staging
         self.backup_prefix = f"{CRYPTO_TRACKER_PREFIX}/backups/{fund_id}"
@@ -132,6 +151,22 @@ class PersistenceManager:
             return float(obj)
         raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
     
+    @staticmethod
+    def _utc(value: datetime) -> pd.Timestamp:
+        """Timestamps are stored in UTC; treat naive inputs as UTC."""
+        value = pd.Timestamp(value)
+        return value.tz_localize('UTC') if value.tzinfo is None else value.tz_convert('UTC')
+    
+    def _s3_object_size(self, key: str) -> Optional[int]:
+        """Size of an S3 object in bytes, or None if it does not exist."""
+        try:
+            return int(self.s3_client.head_object(Bucket=self.bucket, Key=key)['ContentLength'])
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            logger.error(f"Error checking S3 key {key}: {e}")
+            return None
+    
     def _s3_key_exists(self, key: str) -> bool:
         """Check if S3 key exists."""
         try:
@@ -167,6 +202,16 @@ class PersistenceManager:
                     Key=backup_lots_key
                 )
             
+            # Backup partitioned lots (the manifest and the files it lists)
+            manifest = self.load_lot_manifest()
+            if manifest:
+                for key in [entry['key'] for entry in manifest['partitions'].values()] + [self.lot_manifest_key]:
+                    self.s3_client.copy_object(
+                        Bucket=self.bucket,
+                        CopySource={'Bucket': self.bucket, 'Key': key},
+                        Key=f"{backup_key}/{key[len(self.base_prefix) + 1:]}"
+                    )
+            
             # Backup metadata
             if self._s3_key_exists(self.metadata_key):
                 backup_metadata_key = f"{backup_key}/metadata.json"
@@ -183,17 +228,43 @@ class PersistenceManager:
             logger.error(f"Failed to create backup: {e}")
             raise
     
-    def load_transactions(self) -> pd.DataFrame:
-        """Load all transactions for the fund."""
+    def load_transactions(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Load the fund's transactions, optionally only a date range and some columns.
+        
+        Transactions are stored sorted by date in row groups, so a bounded or
+        projected load fetches only the row groups that overlap [start, end]
+        and the requested column chunks with ranged GETs.
+        
+        Args:
+            start: Earliest transaction date, inclusive (naive dates are UTC)
+            end: Latest transaction date, inclusive
+            columns: Columns to load (default: all)
+        """
         try:
-            if not self._s3_key_exists(self.transactions_key):
+            size = self._s3_object_size(self.transactions_key)
+            if size is None:
                 logger.info(f"No existing transactions file for fund {self.fund_id}")
                 return pd.DataFrame()
             
-            # Load parquet from S3 using PyArrow
-            obj = self.s3_client.get_object(Bucket=self.bucket, Key=self.transactions_key)
-            table = pq.read_table(BytesIO(obj['Body'].read()))
-            df = table.to_pandas()
+            start = self._utc(start) if start is not None else None
+            end = self._utc(end) if end is not None else None
+            read_columns = columns
+            if columns is not None and (start is not None or end is not None) and 'date' not in columns:
+                read_columns = list(columns) + ['date']
+            
+            if (start is None and end is None and columns is None) or not worth_reading_selectively(size):
+                # Load parquet from S3 using PyArrow
+                obj = self.s3_client.get_object(Bucket=self.bucket, Key=self.transactions_key)
+                source = obj['Body'].read()
+            else:
+                source = S3RangeFile(self.s3_client, self.bucket, self.transactions_key, size)
+            df = read_parquet(source, read_columns, 'date', start, end).to_pandas()
             
             # Convert date columns back to datetime with UTC awareness
             date_columns = ['date', 'created_at', 'last_modified']
@@ -201,6 +272,17 @@ class PersistenceManager:
                 if col in df.columns:
                     df[col] = pd.to_datetime(df[col], utc=True)
             
+            # Row groups are pruned by statistics; drop the rows just outside the range
+            if start is not None or end is not None:
+                keep = pd.Series(True, index=df.index)
+                if start is not None:
+                    keep &= df['date'] >= start
+                if end is not None:
+                    keep &= df['date'] <= end
+                df = df[keep].reset_index(drop=True)
+                if columns is not None:
+                    df = df[[c for c in columns if c in df.columns]]
+            
             # Cast financial columns to Decimal
             decimal_columns = ['token_amount', 'eth_value', 'usd_value', 'gas_fee_eth', 'gas_fee_usd']
             for col in decimal_columns:
@@ -236,17 +318,20 @@ class PersistenceManager:
                 logger.warning("No transactions to save")
                 return True
             
+            # Date order keeps each row group's date statistics narrow for bounded loads
+            df = df.sort_values(
+                'date', kind='stable',
+                key=lambda d: pd.to_datetime(d, utc=True, errors='coerce', format='mixed')
+            ).reset_index(drop=True)
+            
             # Stage the data first
             staging_key = f"{self.staging_prefix}/transactions.parquet"
-            buffer = BytesIO()
-            df.to_parquet(buffer, index=False)
-            buffer.seek(0)
             
             # Upload to staging
             self.s3_client.put_object(
                 Bucket=self.bucket,
                 Key=staging_key,
-                Body=buffer.getvalue()
+                Body=to_parquet_bytes(df)
             )
             
             # Atomic move from staging to production
@@ -267,16 +352,25 @@ class PersistenceManager:
             return False
     
     def load_fifo_lots(self) -> pd.DataFrame:
-        """Load FIFO lots for the fund."""
+        """Load FIFO lots for the fund (the lot partitions if any were written)."""
         try:
-            if not self._s3_key_exists(self.lots_key):
+            manifest = self.load_lot_manifest()
+            if manifest:
+                frames = []
+                for entry in manifest['partitions'].values():
+                    obj = self.s3_client.get_object(Bucket=self.bucket, Key=entry['key'])
+                    frames.append(pq.read_table(BytesIO(obj['Body'].read())).to_pandas())
+                df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            
+            elif not self._s3_key_exists(self.lots_key):
                 logger.info(f"No existing FIFO lots file for fund {self.fund_id}")
                 return pd.DataFrame()
             
-            # Load parquet from S3 using PyArrow
-            obj = self.s3_client.get_object(Bucket=self.bucket, Key=self.lots_key)
-            table = pq.read_table(BytesIO(obj['Body'].read()))
-            df = table.to_pandas()
+            else:
+                # Load parquet from S3 using PyArrow
+                obj = self.s3_client.get_object(Bucket=self.bucket, Key=self.lots_key)
+                table = pq.read_table(BytesIO(obj['Body'].read()))
+                df = table.to_pandas()
             
             # Convert date columns back to datetime with UTC awareness
             date_columns = ['purchase_date', 'created_at', 'last_modified']
@@ -302,57 +396,259 @@ class PersistenceManager:
             return pd.DataFrame()
     
     def save_fifo_lots(self, lots: List[FIFOLot], create_backup: bool = True) -> bool:
-        """Save FIFO lots with atomic operation."""
+        """Save all FIFO lots, replacing the stored lot state."""
         try:
-            if create_backup and self._s3_key_exists(self.lots_key):
+            if create_backup and (self._s3_key_exists(self.lots_key) or self._s3_key_exists(self.lot_manifest_key)):
                 self._backup_current_data()
             
-            # Convert to DataFrame
-            data_dicts = []
+            partitions: Dict[Tuple[str, str], List[FIFOLot]] = {}
             for lot in lots:
-                lot_dict = asdict(lot)
-                # Convert Decimal to float for storage
-                for key, value in lot_dict.items():
-                    if isinstance(value, Decimal):
-                        lot_dict[key] = float(value)
-                data_dicts.append(lot_dict)
+                partitions.setdefault((lot.wallet_id, lot.asset), []).append(lot)
             
-            df = pd.DataFrame(data_dicts)
+            return self.save_fifo_lot_partitions(partitions, replace_all=True)
             
-            if df.empty:
-                logger.warning("No FIFO lots to save")
-                return True
+        except Exception as e:
+            logger.error(f"Failed to save FIFO lots: {e}")
+            return False
+    
+    # ============================================================================
+    # FIFO LOT PARTITIONS
+    # ============================================================================
+    
+    @staticmethod
+    def _lot_partition_name(wallet_id: str, asset: str) -> str:
+        """S3-safe file stem of the (wallet, asset) lot partition."""
+        return hashlib.sha256(f"{wallet_id}|{asset}".encode()).hexdigest()[:16]
+    
+    def load_lot_manifest(self) -> Dict[str, Any]:
+        """
+        Load the manifest of the lot partitions.
+        
+        Returns:
+            {'version', 'journal_sequence', 'partitions': {name: {'wallet_id',
+            'asset', 'key', 'lots'}}}, or {} if lots were never partitioned
+        """
+        try:
+            if not self._s3_key_exists(self.lot_manifest_key):
+                return {}
             
-            # Stage the data first
-            staging_key = f"{self.staging_prefix}/fifo_lots.parquet"
-            buffer = BytesIO()
-            df.to_parquet(buffer, index=False)
-            buffer.seek(0)
+            obj = self.s3_client.get_object(Bucket=self.bucket, Key=self.lot_manifest_key)
+            return json.loads(obj['Body'].read().decode('utf-8'))
             
-            # Upload to staging
+        except Exception as e:
+            logger.error(f"Failed to load lot manifest: {e}")
+            return {}
+    
+    def save_fifo_lot_partitions(
+        self,
+        partitions: Dict[Tuple[str, str], List[FIFOLot]],
+        replace_all: bool = False,
+        journal_sequence: Optional[int] = None
+    ) -> bool:
+        """
+        Write the lots of some (wallet, asset) partitions.
+        
+        Each partition is written to a new object and the manifest is
+        replaced last, so readers see either the old or the new state;
+        superseded objects are deleted afterwards. Amounts are stored as
+        decimal strings so a reload continues exactly.
+        
+        Args:
+            partitions: Open lots per (wallet, asset); an empty list drops the partition
+            replace_all: Drop stored partitions not in partitions
+            journal_sequence: Last journaled operation these lots include
+                (see LotWriteBehind), recorded in the manifest
+        
+        Returns:
+            True if the manifest was written
+        """
+        try:
+            manifest = self.load_lot_manifest()
+            stored = manifest.get('partitions', {})
+            version = manifest.get('version', 0) + 1
+            
+            entries = {} if replace_all else dict(stored)
+            columns = list(FIFOLot.__dataclass_fields__)
+            for (wallet_id, asset), lots in partitions.items():
+                name = self._lot_partition_name(wallet_id, asset)
+                if not lots:
+                    entries.pop(name, None)
+                    continue
+                
+                rows = []
+                for lot in lots:
+                    row = asdict(lot)
+                    for key in CHECKPOINT_DECIMAL_COLUMNS:
+                        value = row.get(key)
+                        row[key] = None if value is None else str(value)
+                    rows.append(row)
+                df = pd.DataFrame(rows, columns=columns)
+                for key in CHECKPOINT_DECIMAL_COLUMNS:
+                    df[key] = df[key].astype(object)
+                
+                buffer = BytesIO()
+                df.to_parquet(buffer, index=False)
+                key = f"{self.lot_partitions_prefix}/{name}_v{version}.parquet"
+                self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=buffer.getvalue())
+                entries[name] = {'wallet_id': wallet_id, 'asset': asset, 'key': key, 'lots': len(lots)}
+            
+            if journal_sequence is None:
+                journal_sequence = manifest.get('journal_sequence', 0)
             self.s3_client.put_object(
                 Bucket=self.bucket,
-                Key=staging_key,
-                Body=buffer.getvalue()
+                Key=self.lot_manifest_key,
+                Body=json.dumps({'fund_id': self.fund_id, 'version': version,
+                                 'journal_sequence': journal_sequence, 'partitions': entries}, indent=2),
+                ContentType='application/json'
             )
             
-            # Atomic move from staging to production
-            self.s3_client.copy_object(
+            live = {entry['key'] for entry in entries.values()}
+            for entry in stored.values():
+                if entry['key'] not in live:
+                    self.s3_client.delete_object(Bucket=self.bucket, Key=entry['key'])
+            
+            logger.info(f"Saved {len(partitions)} FIFO lot partitions for fund {self.fund_id} "
+                        f"({len(entries)} stored, manifest version {version})")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to save FIFO lot partitions: {e}")
+            return False
+    
+    # ============================================================================
+    # FIFO CHECKPOINTS
+    # ============================================================================
+    
+    def _checkpoint_key(self, as_of: datetime) -> str:
+        """S3 key of the lot-state checkpoint taken at as_of (UTC)."""
+        return f"{self.checkpoints_prefix}/fifo_lots_{as_of.strftime(CHECKPOINT_KEY_FORMAT)}.parquet"
+    
+    def list_fifo_checkpoints(self) -> List[pd.Timestamp]:
+        """List the as-of times of all stored FIFO checkpoints, oldest first."""
+        checkpoints = []
+        try:
+            request = {'Bucket': self.bucket, 'Prefix': f"{self.checkpoints_prefix}/fifo_lots_"}
+            while True:
+                response = self.s3_client.list_objects_v2(**request)
+                for obj in response.get('Contents', []):
+                    stamp = obj['Key'].rsplit('fifo_lots_', 1)[-1].replace('.parquet', '')
+                    try:
+                        as_of = datetime.strptime(stamp, CHECKPOINT_KEY_FORMAT)
+                    except ValueError:
+                        logger.warning(f"Ignoring unrecognised checkpoint key {obj['Key']}")
+                        continue
+                    checkpoints.append(pd.Timestamp(as_of, tz='UTC'))
+                if not response.get('IsTruncated'):
+                    break
+                request['ContinuationToken'] = response['NextContinuationToken']
+        
+        except Exception as e:
+            logger.error(f"Failed to list FIFO checkpoints: {e}")
+            return []
+        
+        return sorted(checkpoints)
+    
+    def save_fifo_checkpoint(self, as_of: datetime, lots: List[FIFOLot], transaction_count: int) -> bool:
+        """
+        Save the open lots as they stood at as_of.
+        
+        The checkpoint holds the state after every transaction dated strictly
+        before as_of. Amounts are stored as decimal strings so a restored
+        checkpoint continues exactly where a full replay would be.
+        
+        Args:
+            as_of: Checkpoint time (UTC)
+            lots: Open lots at as_of
+            transaction_count: Number of transactions applied to reach this state
+        
+        Returns:
+            True if the checkpoint was written
+        """
+        try:
+            rows = []
+            for lot in lots:
+                row = asdict(lot)
+                for key in CHECKPOINT_DECIMAL_COLUMNS:
+                    value = row.get(key)
+                    row[key] = None if value is None else str(value)
+                rows.append(row)
+            
+            columns = list(FIFOLot.__dataclass_fields__)
+            df = pd.DataFrame(rows, columns=columns)
+            for key in CHECKPOINT_DECIMAL_COLUMNS:
+                df[key] = df[key].astype(object)
+            
+            buffer = BytesIO()
+            df.to_parquet(buffer, index=False)
+            
+            self.s3_client.put_object(
                 Bucket=self.bucket,
-                CopySource={'Bucket': self.bucket, 'Key': staging_key},
-                Key=self.lots_key
+                Key=self._checkpoint_key(as_of),
+                Body=buffer.getvalue(),
+                Metadata={'transaction_count': str(transaction_count)}
             )
             
-            # Clean up staging
-            self.s3_client.delete_object(Bucket=self.bucket, Key=staging_key)
-            
-            logger.info(f"Saved {len(lots)} FIFO lots for fund {self.fund_id}")
+            logger.info(f"Saved FIFO checkpoint {as_of} with {len(lots)} lots for fund {self.fund_id}")
             return True
-            
+        
         except Exception as e:
-            logger.error(f"Failed to save FIFO lots: {e}")
+            logger.error(f"Failed to save FIFO checkpoint {as_of}: {e}")
             return False
     
+    def load_fifo_checkpoint(self, as_of: datetime) -> Optional[pd.DataFrame]:
+        """
+        Load the lots stored in the checkpoint taken at as_of.
+        
+        Returns:
+            DataFrame of lots with Decimal amounts, or None if the checkpoint
+            is missing or unreadable
+        """
+        try:
+            obj = self.s3_client.get_object(Bucket=self.bucket, Key=self._checkpoint_key(as_of))
+            df = pq.read_table(BytesIO(obj['Body'].read())).to_pandas()
+            
+            for col in ['purchase_date', 'created_at', 'last_modified']:
+                if col in df.columns:
+                    df[col] = pd.to_datetime(df[col], utc=True)
+            
+            for col in CHECKPOINT_DECIMAL_COLUMNS:
+                if col in df.columns:
+                    df[col] = [Decimal(x) if x is not None else None for x in df[col]]
+            
+            return df
+        
+        except Exception as e:
+            logger.error(f"Failed to load FIFO checkpoint {as_of}: {e}")
+            return None
+    
+    def delete_fifo_checkpoints_after(self, from_date: datetime) -> int:
+        """
+        Delete checkpoints a change dated from_date makes stale.
+        
+        A checkpoint at as_of covers transactions dated before as_of, so only
+        checkpoints taken after from_date are affected.
+        
+        Returns:
+            Number of checkpoints deleted
+        """
+        from_date = pd.Timestamp(from_date)
+        if from_date.tzinfo is None:
+            from_date = from_date.tz_localize('UTC')
+        
+        deleted_count = 0
+        for as_of in self.list_fifo_checkpoints():
+            if as_of <= from_date:
+                continue
+            try:
+                self.s3_client.delete_object(Bucket=self.bucket, Key=self._checkpoint_key(as_of))
+                deleted_count += 1
+            except Exception as e:
+                logger.error(f"Failed to delete FIFO checkpoint {as_of}: {e}")
+        
+        if deleted_count:
+            logger.info(f"Deleted {deleted_count} FIFO checkpoints after {from_date} for fund {self.fund_id}")
+        return deleted_count
+    
     def load_metadata(self) -> Dict[str, Any]:
         """Load metadata for the fund."""
         try:
@@ -434,12 +730,99 @@ class PersistenceManager:
             logger.error(f"Failed to save duplicate hashes: {e}")
             return False
     
+    def list_duplicate_index_deltas(self) -> List[str]:
+        """Keys of the duplicate index deltas not yet compacted, oldest first."""
+        keys = []
+        request = {'Bucket': self.bucket, 'Prefix': f"{self.duplicate_deltas_prefix}/"}
+        while True:
+            response = self.s3_client.list_objects_v2(**request)
+            keys.extend(obj['Key'] for obj in response.get('Contents', []))
+            if not response.get('IsTruncated'):
+                break
+            request['ContinuationToken'] = response['NextContinuationToken']
+        return sorted(keys)
+    
+    def load_duplicate_index(self) -> Optional[pd.DataFrame]:
+        """
+        Load the duplicate detector's transaction index (see
+        DuplicateDetector), or None if none has been saved.
+        """
+        try:
+            if not self._s3_key_exists(self.duplicate_index_key):
+                return None
+            
+            obj = self.s3_client.get_object(Bucket=self.bucket, Key=self.duplicate_index_key)
+            return pq.read_table(BytesIO(obj['Body'].read())).to_pandas()
+            
+        except Exception as e:
+            logger.error(f"Failed to load duplicate index: {e}")
+            return None
+    
+    def load_duplicate_index_deltas(self) -> Optional[pd.DataFrame]:
+        """
+        Load the index rows appended since the duplicate index was last
+        saved (see append_duplicate_index_delta), or None if there are none.
+        """
+        try:
+            frames = []
+            for key in self.list_duplicate_index_deltas():
+                obj = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+                frames.append(pq.read_table(BytesIO(obj['Body'].read())).to_pandas())
+            return pd.concat(frames, ignore_index=True) if frames else None
+            
+        except Exception as e:
+            logger.error(f"Failed to load duplicate index deltas: {e}")
+            return None
+    
+    def append_duplicate_index_delta(self, rows: pd.DataFrame) -> bool:
+        """
+        Store index rows added since the index was last saved as a small
+        delta object instead of rewriting the whole index.
+        """
+        try:
+            buffer = BytesIO()
+            rows.to_parquet(buffer, index=False)
+            
+            key = f"{self.duplicate_deltas_prefix}/{int(rows['seq'].min()):012d}_{uuid.uuid4().hex[:8]}.parquet"
+            self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=buffer.getvalue())
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to append duplicate index delta: {e}")
+            return False
+    
+    def save_duplicate_index(self, index: pd.DataFrame) -> bool:
+        """
+        Save the duplicate detector's transaction index next to the duplicate
+        hashes, compacting the deltas appended since the last save into it.
+        """
+        try:
+            deltas = self.list_duplicate_index_deltas()
+            buffer = BytesIO()
+            index.to_parquet(buffer, index=False)
+            
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self.duplicate_index_key,
+                Body=buffer.getvalue()
+            )
+            for key in deltas:
+                self.s3_client.delete_object(Bucket=self.bucket, Key=key)
+            
+            logger.info(f"Saved duplicate index of {len(index)} transactions for fund {self.fund_id}"
+                        f"{f' ({len(deltas)} deltas compacted)' if deltas else ''}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to save duplicate index: {e}")
+            return False
+    
     def get_data_summary(self) -> Dict[str, Any]:
         """Get summary of stored data."""
         summary = {
             'fund_id': self.fund_id,
             'transactions_exists': self._s3_key_exists(self.transactions_key),
-            'lots_exists': self._s3_key_exists(self.lots_key),
+            'lots_exists': self._s3_key_exists(self.lot_manifest_key) or self._s3_key_exists(self.lots_key),
             'metadata_exists': self._s3_key_exists(self.metadata_key),
             'duplicate_hashes_exists': self._s3_key_exists(self.duplicate_hashes_key),
         }
@@ -447,7 +830,7 @@ class PersistenceManager:
         # Get transaction count
         if summary['transactions_exists']:
             try:
-                df = self.load_transactions()
+                df = self.load_transactions(columns=['date'])
                 summary['transaction_count'] = len(df)
                 if not df.empty:
                     summary['earliest_transaction'] = df['date'].min().isoformat()
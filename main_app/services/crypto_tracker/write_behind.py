@@ -0,0 +1,253 @@
+"""
+Write-Behind Lot Persistence for the FIFO Engine
+
+Saving the whole lot state after every processed transaction costs a full
+serialization and upload per transaction. LotWriteBehind instead marks the
+(wallet, asset) partitions a transaction touched as dirty and writes only
+those, in one go, once enough operations are pending, the oldest pending one
+is old enough, or on an explicit flush. The age limit is enforced by a timer,
+so a quiet engine's last operations are written without waiting for the next
+transaction.
+
+Until a flush the operations are appended to a local journal (JSON lines,
+fsynced), numbered by a sequence the lot manifest records on every flush.
+After a crash the engine replays the journaled operations the stored lots do
+not include yet.
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from dataclasses import asdict, fields
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .persistence_manager import PersistenceManager, TransactionRecord, FIFOLot
+
+logger = logging.getLogger(__name__)
+
+# Flush once this many operations are pending...
+FIFO_FLUSH_OPERATIONS = int(os.environ.get("FIFO_FLUSH_OPERATIONS", "500"))
+
+# ...or the oldest pending operation is this old
+FIFO_FLUSH_SECONDS = float(os.environ.get("FIFO_FLUSH_SECONDS", "30"))
+
+# Local directory of the per-fund journals
+FIFO_JOURNAL_DIR = os.environ.get(
+    "FIFO_JOURNAL_DIR", os.path.join(tempfile.gettempdir(), "realworldnav", "fifo_journal")
+)
+
+_DECIMAL_FIELDS = {f.name for f in fields(TransactionRecord) if f.type is Decimal}
+_DATETIME_FIELDS = {'date', 'created_at', 'last_modified'}
+
+
+def transaction_to_json(transaction: TransactionRecord) -> Dict[str, Any]:
+    """JSON-safe form of a transaction that round-trips exactly."""
+    record = asdict(transaction)
+    for key, value in record.items():
+        if isinstance(value, Decimal):
+            record[key] = str(value)
+        elif isinstance(value, datetime):
+            record[key] = value.isoformat()
+    return record
+
+
+def transaction_from_json(record: Dict[str, Any]) -> TransactionRecord:
+    """Inverse of transaction_to_json."""
+    record = dict(record)
+    for key in _DECIMAL_FIELDS:
+        if record.get(key) is not None:
+            record[key] = Decimal(record[key])
+    for key in _DATETIME_FIELDS:
+        if record.get(key) is not None:
+            record[key] = datetime.fromisoformat(record[key])
+    return TransactionRecord(**record)
+
+
+class LotJournal:
+    """
+    Append-only local journal of operations not yet flushed.
+
+    Args:
+        path: Journal file (created on first append)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sequence = max((entry['seq'] for entry in self.entries()), default=0)
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Durably append an entry; returns its sequence number."""
+        self.sequence += 1
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**entry, 'seq': self.sequence}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return self.sequence
+
+    def entries(self, after: int = 0) -> List[Dict[str, Any]]:
+        """Entries with a sequence number above after, in order (a torn last line is ignored)."""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring unreadable journal line in {self.path}")
+                    continue
+                if entry['seq'] > after:
+                    entries.append(entry)
+        return entries
+
+    def truncate(self):
+        """Forget all entries (after they were flushed); numbering continues."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class LotWriteBehind:
+    """
+    Buffers lot-state changes of a FIFOEngine and writes the dirty partitions.
+
+    Args:
+        persistence: Storage backend of the fund
+        journal_path: Local journal file (default: FIFO_JOURNAL_DIR/<fund>.jsonl)
+        max_operations: Flush once this many operations are pending
+        max_seconds: Flush once the oldest pending operation is this old
+        on_due: Called on a timer thread max_seconds after an operation
+            became pending, if it is still pending (typically the owner's
+            commit); None leaves flushing to the caller
+    """
+
+    def __init__(
+        self,
+        persistence: PersistenceManager,
+        journal_path: Optional[str] = None,
+        max_operations: int = FIFO_FLUSH_OPERATIONS,
+        max_seconds: float = FIFO_FLUSH_SECONDS,
+        on_due: Optional[Callable[[], Any]] = None
+    ):
+        self.persistence = persistence
+        self.journal = LotJournal(journal_path or os.path.join(FIFO_JOURNAL_DIR, f"{persistence.fund_id}.jsonl"))
+        self.max_operations = max_operations
+        self.max_seconds = max_seconds
+        self.on_due = on_due
+        self._timer: Optional[threading.Timer] = None
+
+        manifest = persistence.load_lot_manifest()
+        self.flushed_sequence = manifest.get('journal_sequence', 0)
+        self.journal.sequence = max(self.journal.sequence, self.flushed_sequence)
+
+        # Lots stored in the legacy single file are partitioned on the first flush
+        self._replace_all = not manifest
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._pending = 0
+        self._since: Optional[float] = None
+        self.stats = {'operations_journaled': 0, 'flushes': 0, 'partitions_written': 0}
+
+    @property
+    def pending(self) -> int:
+        """Operations applied since the last flush."""
+        return self._pending
+
+    def unflushed(self) -> List[TransactionRecord]:
+        """Journaled transactions the stored lots do not include, in order."""
+        return [transaction_from_json(entry['transaction'])
+                for entry in self.journal.entries(after=self.flushed_sequence)]
+
+    def record(self, transaction: TransactionRecord, journal: bool = True):
+        """
+        Note a transaction applied to the lots of its (wallet, asset).
+
+        Args:
+            transaction: The applied transaction
+            journal: Append it to the journal (False when replaying the journal)
+        """
+        if journal:
+            self.journal.append({'transaction': transaction_to_json(transaction)})
+            self.stats['operations_journaled'] += 1
+        self.mark((transaction.wallet_id, transaction.asset))
+
+    def mark(self, key: Tuple[str, str]):
+        """Note a change of one partition that needs no journaling."""
+        self._dirty.add(key)
+        self._pending += 1
+        self._start()
+
+    def mark_all(self):
+        """The whole lot state was replaced: write every partition and drop the rest."""
+        self._replace_all = True
+        self._pending += 1
+        self._start()
+
+    def _start(self):
+        """Note when the first pending operation arrived and arm the flush timer."""
+        if self._since is None:
+            self._since = time.monotonic()
+            self._arm()
+
+    def _arm(self):
+        if self.on_due is None:
+            return
+        self.cancel()
+        self._timer = threading.Timer(self.max_seconds, self._fire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _fire(self):
+        self._timer = None
+        if self._pending:
+            self.on_due()
+
+    def cancel(self):
+        """Stop the flush timer (pending operations stay journaled)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def due(self) -> bool:
+        """True if the pending operations should be flushed now."""
+        if not self._pending:
+            return False
+        return self._pending >= self.max_operations or time.monotonic() - self._since >= self.max_seconds
+
+    def flush(self, lots: Dict[Tuple[str, str], Iterable[FIFOLot]]) -> bool:
+        """
+        Write the dirty partitions of lots and truncate the journal.
+
+        Args:
+            lots: The engine's current lot state
+
+        Returns:
+            True if nothing was pending or the write succeeded
+        """
+        if not self._pending:
+            return True
+
+        keys = set(lots) if self._replace_all else self._dirty
+        partitions = {key: [lot for lot in lots.get(key, ()) if lot.remaining_quantity > 0] for key in keys}
+        sequence = self.journal.sequence
+        if not self.persistence.save_fifo_lot_partitions(partitions, self._replace_all, sequence):
+            # Try again once the age limit has passed again
+            self._arm()
+            return False
+
+        self.flushed_sequence = sequence
+        self.journal.truncate()
+        self.stats['flushes'] += 1
+        self.stats['partitions_written'] += sum(1 for lots in partitions.values() if lots)
+        logger.info(f"Flushed {self._pending} FIFO operations: {len(partitions)} lot partitions written")
+
+        self._replace_all = False
+        self._dirty.clear()
+        self._pending = 0
+        self._since = None
+        self.cancel()
+        return True
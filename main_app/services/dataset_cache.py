@@ -0,0 +1,244 @@
+"""
+Dataset Cache - shared, version-checked cache of S3 datasets
+
+The s3_utils loaders used to sit behind functools.lru_cache, which hands the
+same mutable DataFrame to every caller (so callers deep-copied whole ledgers
+to be safe), only notices a change when someone calls cache_clear() in the
+same process, and lets every session that misses at the same moment download
+the same object.
+
+DatasetCache keeps one frame per (loader, arguments) together with the
+version of the S3 object it was built from (VersionId, else ETag):
+
+- freshness: an entry older than check_seconds is revalidated with a HEAD
+  request; the dataset is only reloaded when the version changed
+- single flight: concurrent misses (or revalidations) of one entry wait for
+  a single load and share its result
+- read-only frames: callers get a shallow copy, which pandas copy-on-write
+  turns into a private copy only when (and where) they modify it; without
+  copy-on-write the copy is deep
+- memory budget: entries are evicted least recently used first once the
+  estimated size of all cached frames exceeds max_bytes
+
+The cached_dataset decorator puts a loader behind the shared cache and
+keeps the lru_cache-style cache_clear() the save paths call.
+"""
+
+import os
+import sys
+import time
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Memory budget shared by all cached datasets
+DATASET_CACHE_MB = int(os.environ.get("DATASET_CACHE_MB", "1024"))
+
+# Entries younger than this are served without a HEAD request
+DATASET_CACHE_CHECK_SECONDS = float(os.environ.get("DATASET_CACHE_CHECK_SECONDS", "5"))
+
+# Object cells sampled per column when estimating a frame's size
+_SIZE_SAMPLE = 1000
+
+
+def copy_on_write_enabled() -> bool:
+    """True if shallow DataFrame copies are copy-on-write (always from pandas 3)."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        return bool(pd.get_option("mode.copy_on_write"))
+    except (KeyError, pd.errors.OptionError):
+        return False
+
+
+def share(value: Any) -> Any:
+    """What a caller gets for a cached value: a copy it may modify freely."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not copy_on_write_enabled())
+    return value
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Approximate memory held by a cached value (object cells sampled)."""
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+    if not isinstance(value, pd.DataFrame):
+        return sys.getsizeof(value)
+
+    total = int(value.index.memory_usage())
+    for col in range(value.shape[1]):
+        column = value.iloc[:, col]
+        total += int(column.memory_usage(index=False, deep=False))
+        if column.dtype == object and len(column):
+            sample = column.iloc[:: max(1, len(column) // _SIZE_SAMPLE)]
+            total += int(sum(sys.getsizeof(v) for v in sample) * len(column) / len(sample))
+    return total
+
+
+@dataclass
+class _Entry:
+    value: Any
+    version: Optional[str]
+    nbytes: int
+    checked: float
+
+
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+class DatasetCache:
+    """
+    Version-checked, single-flight, size-bounded cache of loaded datasets.
+
+    Args:
+        max_bytes: Memory budget for all entries
+        check_seconds: Serve entries this fresh without checking the version
+    """
+
+    def __init__(self, max_bytes: int = DATASET_CACHE_MB * 1024 * 1024,
+                 check_seconds: float = DATASET_CACHE_CHECK_SECONDS):
+        self.max_bytes = max_bytes
+        self.check_seconds = check_seconds
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.stats = {"hits": 0, "revalidated": 0, "loads": 0, "shared_loads": 0, "evictions": 0}
+
+    def get(self, name: Hashable, version: Callable[[], Optional[str]], loader: Callable[[], Any]) -> Any:
+        """
+        Cached value of name, loading it if missing or out of date.
+
+        Args:
+            name: Cache key (loader and its arguments)
+            version: Returns the current version of the source (None: unknown,
+                which never matches, so the entry is reloaded when checked)
+            loader: Builds the value
+
+        Returns:
+            A copy of the value the caller may modify (see share)
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and time.monotonic() - entry.checked < self.check_seconds:
+                self._entries.move_to_end(name)
+                self.stats["hits"] += 1
+                return share(entry.value)
+            flight = self._flights.get(name)
+            leader = flight is None
+            if leader:
+                flight = self._flights[name] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                self.stats["shared_loads"] += 1
+            return share(flight.value)
+
+        try:
+            # Version first: a change during the load is caught by the next check
+            current = version()
+            if entry is not None and current is not None and entry.version == current:
+                with self._lock:
+                    entry.checked = time.monotonic()
+                    self.stats["revalidated"] += 1
+                flight.value = entry.value
+            else:
+                flight.value = loader()
+                self._store(name, flight.value, current)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[name]
+            flight.done.set()
+        return share(flight.value)
+
+    def _store(self, name: Hashable, value: Any, version: Optional[str]):
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            self.stats["loads"] += 1
+            self._discard(name)
+            if nbytes > self.max_bytes:
+                logger.warning(f"Dataset {name} ({nbytes / 2**20:.0f} MB) exceeds the cache budget; not cached")
+                return
+            while self._entries and self.nbytes + nbytes > self.max_bytes:
+                evicted, old = self._entries.popitem(last=False)
+                self.nbytes -= old.nbytes
+                self.stats["evictions"] += 1
+                logger.info(f"Evicted dataset {evicted} from cache")
+            self._entries[name] = _Entry(value, version, nbytes, time.monotonic())
+            self.nbytes += nbytes
+
+    def _discard(self, name: Hashable):
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self.nbytes -= entry.nbytes
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] = None):
+        """Drop every entry (or those whose name matches predicate)."""
+        with self._lock:
+            for name in [n for n in self._entries if predicate is None or predicate(n)]:
+                self._discard(name)
+
+
+_dataset_cache = None
+_dataset_cache_lock = threading.Lock()
+
+
+def get_dataset_cache() -> DatasetCache:
+    """Process-wide dataset cache shared by all sessions."""
+    global _dataset_cache
+    with _dataset_cache_lock:
+        if _dataset_cache is None:
+            _dataset_cache = DatasetCache()
+        return _dataset_cache
+
+
+def cached_dataset(version: Callable[..., Optional[str]], cache: DatasetCache = None):
+    """
+    Decorator putting a loader behind the shared dataset cache.
+
+    Args:
+        version: Called with the loader's arguments (defaults applied, by
+            name); returns the current version of the data it reads
+        cache: Cache to use (default: get_dataset_cache())
+
+    The wrapped function gets cache_clear(), dropping all of its entries.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def resolve() -> DatasetCache:
+            return cache if cache is not None else get_dataset_cache()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            name = (func.__module__, func.__qualname__, tuple(bound.arguments.items()))
+            return resolve().get(name, lambda: version(**bound.arguments), lambda: func(*args, **kwargs))
+
+        def cache_clear():
+            owner = (func.__module__, func.__qualname__)
+            resolve().invalidate(lambda name: name[:2] == owner)
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
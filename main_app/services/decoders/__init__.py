@@ -44,6 +44,8 @@ from .base import (
     SECONDS_PER_YEAR,
 )
 
+from .accrual_schedule import build_accrual_schedule, simple_interest_wei
+
 from .registry import DecoderRegistry
 
 # Try to import adapter (may not exist)
@@ -198,6 +200,8 @@ __all__ = [
     # Interest accrual
     'compute_continuous_interest',
     'generate_daily_interest_accruals',
+    'build_accrual_schedule',
+    'simple_interest_wei',
     'WAD',
     'SECONDS_PER_YEAR',
 ]
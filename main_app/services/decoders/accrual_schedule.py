@@ -0,0 +1,270 @@
+"""
+Columnar daily interest accrual schedules for lending decoders.
+
+Every lending decoder splits a loan's interest into one row per UTC day:
+the first row runs from the loan start to the next midnight, full days run
+midnight to midnight and the last row ends at the loan end. Each row is
+labelled with 23:59:59 of its day (or the loan end for a final partial day)
+and gets an exact integer share of the total interest, carrying the wei
+remainder forward so the rows sum to the total without drift.
+
+build_accrual_schedule() does this for many loans at once with numpy. The
+remainder carry of the per-day loop
+
+    numer = total * slice_secs + leftover
+    slice = numer // total_secs; leftover = numer % total_secs
+
+assigns floor(total * elapsed / total_secs) wei up to the end of each row,
+so a row's share is the difference of that floor at its two boundaries.
+Writing total = q * total_secs + r keeps every product inside int64 for
+ordinary loans; schedules whose per-day interest does not fit fall back to
+Python integers (object arrays) and stay exact.
+"""
+
+import logging
+from datetime import datetime, timedelta, time as dt_time, timezone
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+# Day-count conventions: seconds in the year the annual rate refers to
+DAY_COUNT_SECONDS = {
+    'actual/365': 365 * SECONDS_PER_DAY,
+    'actual/360': 360 * SECONDS_PER_DAY,
+}
+
+BPS = 10000
+
+SCHEDULE_COLUMNS = [
+    'loan', 'accrual_start_ts', 'accrual_end_ts', 'accrual_ts', 'seconds_in_row',
+    'interest_wei', 'is_first_day', 'is_last_day', 'is_partial_day',
+]
+
+# Largest int64 value; products must stay below it on the fast path
+_INT64_MAX = np.iinfo(np.int64).max
+
+# Resolution pandas gives Python datetimes, so schedule timestamps line up
+# with frames built from datetime objects
+_DATETIME_UNIT = pd.Series([datetime(1970, 1, 1, tzinfo=timezone.utc)]).dt.unit
+
+IntArray = Union[Sequence[int], np.ndarray, pd.Series]
+
+
+def simple_interest_wei(
+    principal_wei: IntArray,
+    rate_bps: IntArray,
+    seconds: IntArray,
+    convention: str = 'actual/365',
+) -> np.ndarray:
+    """
+    Simple interest in wei, rounded down, for each loan.
+
+    Args:
+        principal_wei: Principal per loan
+        rate_bps: Annual rate per loan in basis points
+        seconds: Accrual seconds per loan
+        convention: Key of DAY_COUNT_SECONDS
+
+    Returns:
+        Object array of Python ints
+    """
+    if convention not in DAY_COUNT_SECONDS:
+        raise ValueError(f"Unknown day-count convention {convention!r}; expected one of {sorted(DAY_COUNT_SECONDS)}")
+    denominator = BPS * DAY_COUNT_SECONDS[convention]
+    return np.array(
+        [int(p) * int(r) * int(s) // denominator for p, r, s in zip(principal_wei, rate_bps, seconds)],
+        dtype=object,
+    )
+
+
+def _as_seconds(values: IntArray) -> np.ndarray:
+    """Unix seconds as int64 (datetimes and Timestamps are converted)"""
+    return np.array([int(v.timestamp()) if hasattr(v, 'timestamp') else int(v) for v in values], dtype=np.int64)
+
+
+def _to_utc(seconds: np.ndarray) -> pd.DatetimeIndex:
+    """Unix seconds as UTC timestamps"""
+    return pd.to_datetime(seconds, unit='s', utc=True).as_unit(_DATETIME_UNIT)
+
+
+def build_accrual_schedule(
+    start_ts: IntArray,
+    end_ts: IntArray,
+    interest_wei: Optional[IntArray] = None,
+    principal_wei: Optional[IntArray] = None,
+    rate_bps: Optional[IntArray] = None,
+    convention: str = 'actual/365',
+    skip_zero: bool = False,
+) -> pd.DataFrame:
+    """
+    Day-sliced accrual schedule for many loans.
+
+    Pass either the total interest per loan (interest_wei) or principal and
+    rate, from which simple interest over [start, end) is computed with the
+    given day-count convention. Loans with end <= start or no interest get
+    no rows.
+
+    Args:
+        start_ts: Accrual start per loan (Unix seconds or datetimes)
+        end_ts: Accrual end per loan
+        interest_wei: Total interest per loan, allocated exactly
+        principal_wei: Principal per loan (when interest_wei is not given)
+        rate_bps: Annual rate per loan in basis points
+        convention: Day-count convention for principal/rate
+        skip_zero: Drop rows that are allocated 0 wei
+
+    Returns:
+        One row per loan day with SCHEDULE_COLUMNS: loan is the position of
+        the loan in the inputs, the three timestamps are UTC datetimes,
+        interest_wei is int64 (object of Python ints if it does not fit)
+    """
+    starts = _as_seconds(start_ts)
+    ends = _as_seconds(end_ts)
+    if len(starts) != len(ends):
+        raise ValueError("start_ts and end_ts must have the same length")
+
+    if interest_wei is None:
+        if principal_wei is None or rate_bps is None:
+            raise ValueError("Pass interest_wei, or principal_wei and rate_bps")
+        interest_wei = simple_interest_wei(principal_wei, rate_bps, np.maximum(ends - starts, 0), convention)
+    totals = [int(t) for t in interest_wei]
+    if len(totals) != len(starts):
+        raise ValueError("interest_wei must have one value per loan")
+
+    # Loans that accrue anything
+    accrues = (ends > starts) & np.array([t > 0 for t in totals], dtype=bool)
+    loans = np.flatnonzero(accrues)
+    if not len(loans):
+        return _empty_schedule()
+
+    starts = starts[loans]
+    ends = ends[loans]
+    spans = ends - starts
+    quotients, remainders = zip(*(divmod(totals[i], int(s)) for i, s in zip(loans, spans)))
+
+    # Rows per loan: UTC days touched by [start, end)
+    first_day = starts // SECONDS_PER_DAY
+    counts = (ends - 1) // SECONDS_PER_DAY - first_day + 1
+    loan_pos = np.repeat(np.arange(len(loans)), counts)
+    day_offset = np.arange(len(loan_pos)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    day_start = (first_day[loan_pos] + day_offset) * SECONDS_PER_DAY
+    next_midnight = day_start + SECONDS_PER_DAY
+    loan_start = starts[loan_pos]
+    loan_end = ends[loan_pos]
+    row_start = np.maximum(loan_start, day_start)
+    row_end = np.minimum(loan_end, next_midnight)
+    seconds = row_end - row_start
+    label = np.where(row_end == next_midnight, next_midnight - 1, loan_end)
+
+    interest = _allocate(quotients, remainders, spans, loan_pos, seconds,
+                         row_start - loan_start, row_end - loan_start)
+
+    schedule = pd.DataFrame({
+        'loan': loans[loan_pos],
+        'accrual_start_ts': _to_utc(row_start),
+        'accrual_end_ts': _to_utc(row_end),
+        'accrual_ts': _to_utc(label),
+        'seconds_in_row': seconds,
+        'interest_wei': interest,
+        'is_first_day': day_offset == 0,
+        'is_last_day': row_end == loan_end,
+        'is_partial_day': seconds < SECONDS_PER_DAY,
+    })
+    if skip_zero:
+        schedule = schedule[schedule['interest_wei'] > 0].reset_index(drop=True)
+    return schedule
+
+
+def build_accrual_schedule_reference(
+    start_ts: IntArray,
+    end_ts: IntArray,
+    interest_wei: IntArray,
+    skip_zero: bool = False,
+) -> pd.DataFrame:
+    """
+    Per-day loop version of build_accrual_schedule.
+
+    This is the while-cursor loop each lending decoder used to run per loan,
+    kept as the reference implementation for tests and benchmarks.
+    """
+    rows = []
+    for loan, (start, end, total) in enumerate(zip(_as_seconds(start_ts), _as_seconds(end_ts), interest_wei)):
+        total_interest_wei = int(total)
+        if end <= start or total_interest_wei <= 0:
+            continue
+        start_dt = datetime.fromtimestamp(int(start), tz=timezone.utc)
+        end_dt = datetime.fromtimestamp(int(end), tz=timezone.utc)
+        total_secs = int(end - start)
+
+        leftover = 0
+        cursor = start_dt
+        while cursor < end_dt:
+            tomorrow = cursor.date() + timedelta(days=1)
+            next_midnight = datetime.combine(tomorrow, dt_time(0, 0, 0), tzinfo=timezone.utc)
+            segment_end = min(next_midnight, end_dt)
+            slice_secs = int((segment_end - cursor).total_seconds())
+
+            numer = (total_interest_wei * slice_secs) + leftover
+            slice_interest_wei = numer // total_secs
+            leftover = numer % total_secs
+
+            if slice_interest_wei > 0 or not skip_zero:
+                rows.append({
+                    'loan': loan,
+                    'accrual_start_ts': cursor,
+                    'accrual_end_ts': segment_end,
+                    'accrual_ts': next_midnight - timedelta(seconds=1) if segment_end == next_midnight else end_dt,
+                    'seconds_in_row': slice_secs,
+                    'interest_wei': slice_interest_wei,
+                    'is_first_day': cursor == start_dt,
+                    'is_last_day': segment_end == end_dt,
+                    'is_partial_day': slice_secs < SECONDS_PER_DAY,
+                })
+            cursor = segment_end
+
+    if not rows:
+        return _empty_schedule()
+    return pd.DataFrame(rows, columns=SCHEDULE_COLUMNS)
+
+
+def _allocate(quotients, remainders, spans: np.ndarray, loan_pos: np.ndarray, seconds: np.ndarray,
+              elapsed_before: np.ndarray, elapsed_after: np.ndarray) -> np.ndarray:
+    """
+    Wei per row: q * seconds + floor(r * after / span) - floor(r * before / span).
+
+    r < span, so r * elapsed < span**2 fits int64 for spans under ~68 years;
+    q * seconds fits while a day's interest is below ~9.2e18 wei.
+    """
+    max_q = max(quotients)
+    fits = int(spans.max()) < 2 ** 31 and max_q <= (_INT64_MAX - 2 ** 31) // SECONDS_PER_DAY
+    dtype = np.int64 if fits else object
+    if not fits:
+        logger.debug("Accrual schedule falls back to Python integers (max %d wei/second)", max_q)
+
+    q = np.array(quotients, dtype=dtype)[loan_pos]
+    r = np.array(remainders, dtype=dtype)[loan_pos]
+    span = spans.astype(dtype)[loan_pos]
+    carried = (r * elapsed_after.astype(dtype)) // span - (r * elapsed_before.astype(dtype)) // span
+    return q * seconds.astype(dtype) + carried
+
+
+def _empty_schedule() -> pd.DataFrame:
+    """Schedule frame with no rows"""
+    empty_ts = _to_utc(np.array([], dtype=np.int64))
+    return pd.DataFrame({
+        'loan': np.array([], dtype=np.int64),
+        'accrual_start_ts': empty_ts,
+        'accrual_end_ts': empty_ts,
+        'accrual_ts': empty_ts,
+        'seconds_in_row': np.array([], dtype=np.int64),
+        'interest_wei': np.array([], dtype=np.int64),
+        'is_first_day': np.array([], dtype=bool),
+        'is_last_day': np.array([], dtype=bool),
+        'is_partial_day': np.array([], dtype=bool),
+    })
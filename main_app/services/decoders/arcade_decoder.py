@@ -40,7 +40,7 @@ import json
 import math
 from pathlib import Path
 from decimal import Decimal, getcontext, ROUND_DOWN
-from datetime import datetime, timedelta, time as dt_time, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Tuple, Optional, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
@@ -53,6 +53,11 @@ from tqdm import tqdm
 from web3 import Web3
 from web3.exceptions import ContractLogicError
 
+from .accrual_schedule import build_accrual_schedule
+from .log_dispatcher import LogDispatcher
+from ..chain_cache import get_chain_cache
+from ..price_oracle import get_price_oracle
+
 # Set decimal precision for financial calculations
 getcontext().prec = 28
 
@@ -560,6 +565,11 @@ class ArcadeEventDecoder:
             abi=LOANCORE_ABI
         )
 
+        # topic0 -> LoanCore event ABI, so each log is decoded with one lookup
+        self.log_dispatcher = LogDispatcher.for_contracts(
+            w3, [self.loancore_contract], self.SUPPORTED_EVENTS
+        )
+
         # Get note contracts
         self.borrower_note = None
         self.lender_note = None
@@ -685,24 +695,22 @@ class ArcadeEventDecoder:
             if log['address'].lower() != self.loancore_address.lower():
                 continue
 
-            # Try to match each event type
-            for event_name in relevant_events:
-                if event_name not in self.SUPPORTED_EVENTS:
+            # Look up the event by topic0 and decode it once
+            for entry, decoded in self.log_dispatcher.iter_decoded(log):
+                event_name = entry.event_name
+                if event_name not in relevant_events:
                     continue
 
                 try:
-                    event = getattr(self.loancore_contract.events, event_name)()
-                    decoded = event.process_log(log)
-
-                    # Successfully decoded - process it
                     event_dict = self._process_decoded_event(
                         decoded, event_name, tx_hash, block_number, tx_datetime
                     )
-                    if event_dict:
-                        decoded_events.append(event_dict)
-                    break  # Found matching event, no need to try others
                 except Exception:
-                    continue  # Not this event type
+                    continue
+
+                if event_dict:
+                    decoded_events.append(event_dict)
+                break  # Found matching event, no need to try others
 
         return decoded_events
 
@@ -1482,12 +1490,11 @@ class ArcadeJournalEntryGenerator:
         if lender_loans.empty:
             return pd.DataFrame()
 
-        journal_rows = []
-        for _, loan_row in lender_loans.iterrows():
-            entries = self._generate_daily_accruals(
-                loan_row, df_closures, cutoff_date, is_lender=True
-            )
-            journal_rows.extend(entries)
+        terms = [
+            self._daily_accrual_terms(loan_row, df_closures, cutoff_date, is_lender=True)
+            for _, loan_row in lender_loans.iterrows()
+        ]
+        journal_rows = self._accrual_entries([t for t in terms if t])
 
         return pd.DataFrame(journal_rows) if journal_rows else pd.DataFrame()
 
@@ -1515,12 +1522,11 @@ class ArcadeJournalEntryGenerator:
         if borrower_loans.empty:
             return pd.DataFrame()
 
-        journal_rows = []
-        for _, loan_row in borrower_loans.iterrows():
-            entries = self._generate_daily_accruals(
-                loan_row, df_closures, cutoff_date, is_lender=False
-            )
-            journal_rows.extend(entries)
+        terms = [
+            self._daily_accrual_terms(loan_row, df_closures, cutoff_date, is_lender=False)
+            for _, loan_row in borrower_loans.iterrows()
+        ]
+        journal_rows = self._accrual_entries([t for t in terms if t])
 
         return pd.DataFrame(journal_rows) if journal_rows else pd.DataFrame()
 
@@ -1536,6 +1542,22 @@ class ArcadeJournalEntryGenerator:
 
         Uses Wei-precise leftover accumulation to match total interest exactly.
         """
+        terms = self._daily_accrual_terms(loan_row, df_closures, cutoff_date, is_lender)
+        return self._accrual_entries([terms]) if terms else []
+
+    def _daily_accrual_terms(
+        self,
+        loan_row: pd.Series,
+        df_closures: pd.DataFrame = None,
+        cutoff_date: datetime = None,
+        is_lender: bool = True,
+    ) -> Optional[Dict]:
+        """
+        Accrual window, total interest and entry metadata of one loan.
+
+        Returns:
+            Dict for _accrual_entries, or None if the loan accrues nothing
+        """
         # Get loan start date
         tx_dt = loan_row.get('transaction_datetime')
         if isinstance(tx_dt, str):
@@ -1549,7 +1571,7 @@ class ArcadeJournalEntryGenerator:
 
         duration_secs = int(loan_row.get('durationSecs', 0))
         if duration_secs <= 0:
-            return []
+            return None
 
         end_dt = start_dt + timedelta(seconds=duration_secs)
 
@@ -1574,7 +1596,7 @@ class ArcadeJournalEntryGenerator:
         total_interest_wei = int(ArcadeInterestCalculator.get_interest_amount(principal_wei, prorated_rate))
 
         if total_interest_wei <= 0:
-            return []
+            return None
 
         # Get token info
         payable_currency = str(loan_row.get('payableCurrency', WETH_ADDRESS)).lower()
@@ -1617,65 +1639,61 @@ class ArcadeJournalEntryGenerator:
             'token_id': str(loan_row.get('collateralId', '')),
         }
 
-        # Generate daily slices with Wei precision
-        entries = []
-        total_secs = int((end_dt - start_dt).total_seconds())
-        if total_secs <= 0:
-            return []
-
-        leftover = 0
-        assigned = 0
-        cursor = start_dt
+        return {
+            'start': start_dt,
+            'end': end_dt,
+            'interest_wei': total_interest_wei,
+            'decimals': decimals,
+            'debit_account': debit_account,
+            'credit_account': credit_account,
+            'common': common,
+        }
 
-        while cursor < end_dt:
-            # Calculate next midnight
-            tomorrow = cursor.date() + timedelta(days=1)
-            next_midnight = datetime.combine(tomorrow, dt_time(0, 0, 0)).replace(tzinfo=cursor.tzinfo)
+    def _accrual_entries(self, terms: List[Dict]) -> List[Dict]:
+        """
+        Dr/Cr entry pairs for every day of every loan in terms.
 
-            # Segment ends at midnight or loan end
-            segment_end = min(next_midnight, end_dt)
-            slice_secs = int((segment_end - cursor).total_seconds())
+        All loans are sliced in one build_accrual_schedule() call; each day
+        gets its Wei-exact share of the loan's interest.
+        """
+        if not terms:
+            return []
 
-            # Wei-precise allocation
-            numer = (total_interest_wei * slice_secs) + leftover
-            slice_wei = numer // total_secs
-            leftover = numer % total_secs
-            assigned += slice_wei
+        schedule = build_accrual_schedule(
+            [t['start'] for t in terms],
+            [t['end'] for t in terms],
+            [t['interest_wei'] for t in terms],
+        )
 
-            # Timestamp for this accrual entry
-            accrual_label = (next_midnight - timedelta(seconds=1)) if segment_end == next_midnight else end_dt
+        entries = []
+        for loan, accrual_label, slice_wei in zip(
+            schedule['loan'].tolist(), schedule['accrual_ts'], schedule['interest_wei'].tolist()
+        ):
+            t = terms[loan]
 
             # Convert to human-readable
-            slice_human = Decimal(slice_wei) / Decimal(10 ** decimals)
+            slice_human = Decimal(slice_wei) / Decimal(10 ** t['decimals'])
 
             # Debit entry
             entries.append({
-                **common,
+                **t['common'],
                 'date': accrual_label,
                 'event': 'InterestAccrual',
-                'account_name': debit_account,
+                'account_name': t['debit_account'],
                 'debit': slice_human,
                 'credit': Decimal(0),
             })
 
             # Credit entry
             entries.append({
-                **common,
+                **t['common'],
                 'date': accrual_label,
                 'event': 'InterestAccrual',
-                'account_name': credit_account,
+                'account_name': t['credit_account'],
                 'debit': Decimal(0),
                 'credit': slice_human,
             })
 
-            cursor = segment_end
-
-        # Final adjustment for any remaining Wei
-        if assigned < total_interest_wei and entries:
-            shortfall = Decimal(total_interest_wei - assigned) / Decimal(10 ** decimals)
-            entries[-2]['debit'] += shortfall
-            entries[-1]['credit'] += shortfall
-
         return entries
 
 
@@ -1683,17 +1701,10 @@ class ArcadeJournalEntryGenerator:
 # ETH/USD PRICING
 # ============================================================================
 
-@lru_cache(maxsize=10000)
 def get_eth_usd_price_at_block(w3: Web3, block_number: int) -> Decimal:
-    """Get ETH/USD price at a specific block using Chainlink."""
+    """Get ETH/USD price at a specific block from the shared Chainlink price oracle."""
     try:
-        aggregator = w3.eth.contract(
-            address=Web3.to_checksum_address(CHAINLINK_ETH_USD_FEED),
-            abi=CHAINLINK_AGGREGATOR_ABI
-        )
-        round_data = aggregator.functions.latestRoundData().call(block_identifier=block_number)
-        price = Decimal(round_data[1]) / Decimal(10**8)
-        return price
+        return get_price_oracle().price_at_block(w3, block_number)
     except Exception as e:
         print(f"[\!] Could not fetch ETH/USD price at block {block_number}: {e}")
         return Decimal("3000")
@@ -1711,15 +1722,25 @@ def add_eth_usd_prices(
 
     # Get unique hashes and their block numbers
     unique_hashes = df['hash'].unique()
-    hash_to_price = {}
+    chain_cache = get_chain_cache()
+    hash_to_block = {}
 
     for tx_hash in tqdm(unique_hashes, desc="Fetching ETH/USD prices", colour="yellow"):
         try:
-            receipt = w3.eth.get_transaction_receipt(tx_hash)
-            price = get_eth_usd_price_at_block(w3, receipt['blockNumber'])
-            hash_to_price[tx_hash] = price
-        except Exception as e:
-            hash_to_price[tx_hash] = Decimal("3000")
+            hash_to_block[tx_hash] = chain_cache.get_receipt(w3, tx_hash)['blockNumber']
+        except Exception:
+            pass
+
+    # One round-history sync for all blocks instead of an eth_call per block
+    try:
+        get_price_oracle().prefetch_blocks(w3, hash_to_block.values())
+    except Exception as e:
+        print(f"[!] ETH/USD price prefetch failed: {e}")
+
+    hash_to_price = {
+        tx_hash: get_eth_usd_price_at_block(w3, block_number)
+        for tx_hash, block_number in hash_to_block.items()
+    }
 
     # Add price column
     df['eth_usd_price'] = df['hash'].map(hash_to_price).apply(
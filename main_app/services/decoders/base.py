@@ -15,6 +15,8 @@ from abc import ABC, abstractmethod
 import math
 import logging
 
+from .log_dispatcher import LogDispatcher
+
 # Set decimal precision for financial calculations
 getcontext().prec = 28
 
@@ -582,11 +584,28 @@ class BaseDecoder(ABC):
         except Exception as e:
             return "unknown", {}
 
+    def _get_log_dispatcher(self, contract, event_names: List[str]) -> LogDispatcher:
+        """Topic0 dispatcher for a contract's events, built once per decoder"""
+        dispatchers = getattr(self, '_log_dispatchers', None)
+        if dispatchers is None:
+            dispatchers = self._log_dispatchers = {}
+
+        key = (id(contract), tuple(event_names))
+        dispatcher = dispatchers.get(key)
+        if dispatcher is None:
+            dispatcher = LogDispatcher(self.w3)
+            dispatcher.register(contract.abi, contract.address, event_names, contract)
+            for name in set(event_names) - {e.event_name for e in dispatcher.entries}:
+                logger.debug(f"Event {name} not found in contract ABI")
+            dispatchers[key] = dispatcher
+        return dispatcher
+
     def _decode_events_by_names(self, contract, receipt: Dict, event_names: List[str]) -> List[DecodedEvent]:
         """
         Decode specific events from receipt using contract ABI.
 
-        Uses process_receipt() which is the correct web3.py pattern.
+        Each log is matched to its event by topic0 and decoded once, from any
+        emitting address (as process_receipt() does).
         Unknown/failed events are logged at DEBUG level, not raised.
 
         Args:
@@ -598,26 +617,11 @@ class BaseDecoder(ABC):
             List of DecodedEvent objects, sorted by log_index
         """
         events = []
-        for name in event_names:
-            try:
-                # Get event class from contract
-                event_cls = getattr(contract.events, name, None)
-                if event_cls is None:
-                    logger.debug(f"Event {name} not found in contract ABI")
-                    continue
-
-                event_instance = event_cls()
-
-                # web3.py uses either process_receipt or processReceipt depending on version
-                if hasattr(event_instance, 'process_receipt'):
-                    decoded_logs = event_instance.process_receipt(receipt)
-                elif hasattr(event_instance, 'processReceipt'):
-                    decoded_logs = event_instance.processReceipt(receipt)
-                else:
-                    logger.debug(f"Event {name} has no process_receipt method")
-                    continue
+        dispatcher = self._get_log_dispatcher(contract, event_names)
 
-                for evt in decoded_logs:
+        for log in receipt.get('logs', []):
+            for entry, evt in dispatcher.iter_decoded(log, any_address=True):
+                try:
                     # Convert args to JSON-safe format
                     args = {}
                     for k, v in dict(evt.get('args', {})).items():
@@ -629,14 +633,14 @@ class BaseDecoder(ABC):
                             args[k] = v
 
                     events.append(DecodedEvent(
-                        name=evt.get('event', name),
+                        name=evt.get('event', entry.event_name),
                         args=args,
                         log_index=evt.get('logIndex', -1),
                         contract_address=evt.get('address', ''),
                         topic=evt['topics'][0].hex() if evt.get('topics') else None
                     ))
-            except Exception as e:
-                logger.debug(f"Could not decode event {name}: {e}")
+                except Exception as e:
+                    logger.debug(f"Could not decode event {entry.event_name}: {e}")
 
         # Sort by log index for consistent ordering
         events.sort(key=lambda x: x.log_index)
@@ -32,7 +32,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from decimal import Decimal, getcontext
-from datetime import datetime, timedelta, time as dt_time, timezone
+from datetime import datetime, timezone
 from typing import Dict, List, Tuple, Optional, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
@@ -41,6 +41,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from web3 import Web3
 
+from .accrual_schedule import build_accrual_schedule
+
 # Set decimal precision for financial calculations
 getcontext().prec = 28
 
@@ -2864,93 +2866,37 @@ class BlurJournalEntryGenerator:
         if total_interest_wei <= 0:
             return []
 
-        # Calculate total seconds
-        total_secs = end_timestamp - start_timestamp
-
-        # Generate daily slices with Wei precision
-        start_dt = datetime.fromtimestamp(start_timestamp, tz=timezone.utc)
-        end_dt = datetime.fromtimestamp(end_timestamp, tz=timezone.utc)
-
-        leftover = 0
-        assigned_so_far = 0
-        cursor = start_dt
-
-        while cursor < end_dt:
-            # Calculate next midnight
-            tomorrow = cursor.date() + timedelta(days=1)
-            naive_midnight = datetime.combine(tomorrow, dt_time(0, 0, 0))
-            next_midnight = naive_midnight.replace(tzinfo=timezone.utc)
+        # Daily slices with Wei precision; days allocated 0 wei get no entries
+        schedule = build_accrual_schedule([start_timestamp], [end_timestamp], [total_interest_wei], skip_zero=True)
 
-            # Slice ends at midnight or loan end
-            segment_end = min(next_midnight, end_dt)
-            slice_secs = int((segment_end - cursor).total_seconds())
-
-            # Wei-precise interest allocation
-            numer = (total_interest_wei * slice_secs) + leftover
-            slice_interest_wei = numer // total_secs
-            leftover = numer % total_secs
-            assigned_so_far += slice_interest_wei
-
-            # Label timestamp (end of day or loan end)
-            if segment_end == next_midnight:
-                accrual_label = next_midnight - timedelta(seconds=1)
-            else:
-                accrual_label = end_dt
+        if is_lender:
+            # Dr interest_receivable / Cr interest_income (cryptocurrency_blur_pool)
+            debit_account, credit_account = BlurAccounts.INTEREST_RECEIVABLE, BlurAccounts.INTEREST_INCOME
+        else:
+            # Dr interest_expense / Cr interest_payable (cryptocurrency_blur_pool)
+            debit_account, credit_account = BlurAccounts.INTEREST_EXPENSE, BlurAccounts.INTEREST_PAYABLE
 
+        for accrual_label, slice_interest_wei in zip(schedule['accrual_ts'], schedule['interest_wei'].tolist()):
             # Convert from wei to crypto
             slice_interest = Decimal(slice_interest_wei) / WAD
 
-            if slice_interest > 0:
-                if is_lender:
-                    # Dr interest_receivable_cryptocurrency_blur_pool
-                    entries.append({
-                        **common_metadata,
-                        'date': accrual_label,
-                        'event': 'InterestAccrual',
-                        'account_name': BlurAccounts.INTEREST_RECEIVABLE,
-                        'debit_crypto': slice_interest,
-                        'credit_crypto': Decimal(0),
-                    })
-
-                    # Cr interest_income_cryptocurrency_blur_pool
-                    entries.append({
-                        **common_metadata,
-                        'date': accrual_label,
-                        'event': 'InterestAccrual',
-                        'account_name': BlurAccounts.INTEREST_INCOME,
-                        'debit_crypto': Decimal(0),
-                        'credit_crypto': slice_interest,
-                    })
-                else:
-                    # Dr interest_expense_cryptocurrency_blur_pool
-                    entries.append({
-                        **common_metadata,
-                        'date': accrual_label,
-                        'event': 'InterestAccrual',
-                        'account_name': BlurAccounts.INTEREST_EXPENSE,
-                        'debit_crypto': slice_interest,
-                        'credit_crypto': Decimal(0),
-                    })
-
-                    # Cr interest_payable_cryptocurrency_blur_pool
-                    entries.append({
-                        **common_metadata,
-                        'date': accrual_label,
-                        'event': 'InterestAccrual',
-                        'account_name': BlurAccounts.INTEREST_PAYABLE,
-                        'debit_crypto': Decimal(0),
-                        'credit_crypto': slice_interest,
-                    })
-
-            cursor = segment_end
+            entries.append({
+                **common_metadata,
+                'date': accrual_label,
+                'event': 'InterestAccrual',
+                'account_name': debit_account,
+                'debit_crypto': slice_interest,
+                'credit_crypto': Decimal(0),
+            })
 
-        # Final adjustment for any remaining wei
-        if assigned_so_far < total_interest_wei and entries:
-            shortfall_wei = total_interest_wei - assigned_so_far
-            shortfall = Decimal(shortfall_wei) / WAD
-            # Add to last entries (debit and credit)
-            entries[-2]['debit_crypto'] += shortfall
-            entries[-1]['credit_crypto'] += shortfall
+            entries.append({
+                **common_metadata,
+                'date': accrual_label,
+                'event': 'InterestAccrual',
+                'account_name': credit_account,
+                'debit_crypto': Decimal(0),
+                'credit_crypto': slice_interest,
+            })
 
         return entries
 
@@ -190,7 +190,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from decimal import Decimal, getcontext, ROUND_FLOOR
-from datetime import datetime, timedelta, time as dt_time, timezone
+from datetime import datetime, timezone
 from typing import Dict, List, Tuple, Optional, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
@@ -200,6 +200,10 @@ from tqdm import tqdm
 from web3 import Web3
 import web3.logs
 
+from .accrual_schedule import build_accrual_schedule
+from .log_dispatcher import LogDispatcher
+from ..chain_cache import get_chain_cache
+
 # Set decimal precision for financial calculations
 getcontext().prec = 28
 
@@ -764,8 +768,16 @@ class GondiEventDecoder:
         # For backwards compatibility, set self.contract to first contract
         self.contract = next(iter(self.contracts.values())) if self.contracts else None
 
-        # Block timestamp cache
+        # topic0 -> (contract, event ABI) for every Gondi event of every contract,
+        # so each receipt log is decoded once instead of trial-decoding all types
+        self.log_dispatcher = LogDispatcher(self.w3)
+        gondi_event_names = [event_type.value for event_type in GondiEventType]
+        for addr, c in self.contracts.items():
+            self.log_dispatcher.register(c.abi, addr, gondi_event_names, c)
+
+        # Block timestamp cache (in memory, backed by the persistent chain cache)
         self._block_cache: Dict[int, int] = {}
+        self.chain_cache = get_chain_cache()
 
     def _is_v2_contract(self, address: str) -> bool:
         """Check if an address uses V2 ABI (Source[] without floor)"""
@@ -777,7 +789,7 @@ class GondiEventDecoder:
         if block_number in self._block_cache:
             ts = self._block_cache[block_number]
         else:
-            block = self.w3.eth.get_block(block_number)
+            block = self.chain_cache.get_block(self.w3, block_number)
             ts = block['timestamp']
             self._block_cache[block_number] = ts
 
@@ -787,7 +799,7 @@ class GondiEventDecoder:
         """Get block timestamp as integer"""
         if block_number in self._block_cache:
             return self._block_cache[block_number]
-        block = self.w3.eth.get_block(block_number)
+        block = self.chain_cache.get_block(self.w3, block_number)
         self._block_cache[block_number] = block['timestamp']
         return block['timestamp']
 
@@ -803,8 +815,8 @@ class GondiEventDecoder:
             List of DecodedGondiEvent objects
         """
         try:
-            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
-            tx = self.w3.eth.get_transaction(tx_hash)
+            receipt = self.chain_cache.get_receipt(self.w3, tx_hash)
+            tx = self.chain_cache.get_transaction(self.w3, tx_hash)
             block_ts = self._get_block_timestamp(receipt['blockNumber'])
             block_ts_int = self._get_block_timestamp_int(receipt['blockNumber'])
 
@@ -858,95 +870,37 @@ class GondiEventDecoder:
                     except Exception:
                         continue
 
-            # First pass: decode events from logs that match specific contracts
-            for log in receipt['logs']:
-                log_addr = log['address'].lower()
-
-                # Check if this log is from one of our Gondi contracts
-                if log_addr in self.contracts:
-                    contract = self.contracts[log_addr]
-                    is_v2 = self._is_v2_contract(log_addr)
-
-                    # Try to decode each event type
-                    for event_type in GondiEventType:
-                        try:
-                            event_obj = getattr(contract.events, event_type.value, None)
-                            if event_obj is None:
-                                continue
-
-                            # Use process_log for single log decoding (more reliable across web3.py versions)
-                            try:
-                                decoded_log = event_obj.process_log(log)
-                            except Exception:
-                                # Event signature doesn't match this log - this is expected, continue to next event type
-                                continue
-
-                            if decoded_log:
-                                decoded = self._decode_event(
-                                    event_type.value,
-                                    decoded_log,
-                                    tx_hash,
-                                    block_ts,
-                                    block_ts_int,
-                                    input_loan,
-                                    input_old_loan,
-                                    function_name,
-                                    is_v2
-                                )
-                                if decoded:
-                                    decoded_events.append(decoded)
-                                    decoded_log_indices.add(log['logIndex'])
-                                break  # Found the event type for this log, move to next log
-
-                        except Exception:
-                            continue
-
-            # Second pass: try all contracts for any Gondi-address logs we missed
+            # Decode each log once via its topic0. Logs from a registered contract
+            # use that contract's ABI first; logs from any Gondi address may fall
+            # back to a sibling version's ABI with the same event signature.
             for log in receipt['logs']:
                 log_addr = log['address'].lower()
-
-                # Skip if already decoded or not a Gondi contract
-                if log['logIndex'] in decoded_log_indices:
-                    continue
-                if log_addr not in GONDI_CONTRACT_ADDRESSES:
+                if log_addr not in self.contracts and log_addr not in GONDI_CONTRACT_ADDRESSES:
                     continue
 
-                # Determine is_v2 for this log address
-                log_is_v2 = self._is_v2_contract(log_addr)
-
-                # Try all contracts
-                for contract_addr, contract in self.contracts.items():
-                    if log['logIndex'] in decoded_log_indices:
-                        break
+                is_v2 = self._is_v2_contract(log_addr)
+                any_address = log_addr in GONDI_CONTRACT_ADDRESSES
 
-                    for event_type in GondiEventType:
-                        try:
-                            event_obj = getattr(contract.events, event_type.value)
-                            # Use process_log for single log decoding
-                            try:
-                                decoded_log = event_obj.process_log(log)
-                            except Exception:
-                                continue
-
-                            if decoded_log:
-                                decoded = self._decode_event(
-                                    event_type.value,
-                                    decoded_log,
-                                    tx_hash,
-                                    block_ts,
-                                    block_ts_int,
-                                    input_loan,
-                                    input_old_loan,
-                                    function_name,
-                                    log_is_v2
-                                )
-                                if decoded:
-                                    decoded_events.append(decoded)
-                                    decoded_log_indices.add(log['logIndex'])
-                                break
+                for entry, decoded_log in self.log_dispatcher.iter_decoded(log, any_address=any_address):
+                    try:
+                        decoded = self._decode_event(
+                            entry.event_name,
+                            decoded_log,
+                            tx_hash,
+                            block_ts,
+                            block_ts_int,
+                            input_loan,
+                            input_old_loan,
+                            function_name,
+                            is_v2
+                        )
+                    except Exception:
+                        continue
 
-                        except Exception:
-                            continue
+                    if decoded:
+                        decoded_events.append(decoded)
+                        decoded_log_indices.add(log['logIndex'])
+                        break
 
             # For LoanLiquidated, scan Transfer events for proceeds
             for event in decoded_events:
@@ -2799,112 +2753,13 @@ class GondiJournalEntryGenerator:
         tranche_idx = loan.tranches.index(tranche) if tranche in loan.tranches else 0
 
         # Build canonical accrual grid with Wei precision
-        leftover = 0
-        assigned_so_far = 0
-        cursor = start_dt
-
-        while cursor < end_dt:
-            # Next midnight UTC
-            tomorrow = cursor.date() + timedelta(days=1)
-            next_midnight = datetime.combine(tomorrow, dt_time(0, 0, 0), tzinfo=timezone.utc)
-
-            # Segment end is the EARLIER of next midnight or contractual end
-            segment_end = min(next_midnight, end_dt)
-
-            # Exact seconds in this row
-            slice_secs = int((segment_end - cursor).total_seconds())
-
-            # Skip zero-second slices (safety check)
-            if slice_secs <= 0:
-                cursor = segment_end
-                continue
-
-            # Wei-precise interest allocation proportional to time
-            numer = (total_net_interest_wei * slice_secs) + leftover
-            slice_interest_wei = numer // total_secs
-            leftover = numer % total_secs
-            assigned_so_far += slice_interest_wei
-
-            # Skip zero-interest slices
-            if slice_interest_wei <= 0:
-                cursor = segment_end
-                continue
-
-            # Journal entry timestamp (EOD or contractual end)
-            if segment_end == next_midnight:
-                accrual_ts = next_midnight - timedelta(seconds=1)
-            else:
-                accrual_ts = end_dt
-
-            # Partial day indicators for audit
-            is_first_day = (cursor == start_dt)
-            is_last_day = (segment_end == end_dt)
-            is_partial_day = (slice_secs < 86400)
-
-            # Deterministic accrual_id for reversal matching
-            # Format: loan_id:tranche_idx:YYYY-MM-DD
-            accrual_date_str = accrual_ts.strftime('%Y-%m-%d')
-            accrual_id = f"{event.loan_id}:{tranche_idx}:{accrual_date_str}"
-
-            # Dr interest_receivable
-            entries.append({
-                **common,
-                'date': accrual_ts,
-                'accrual_id': accrual_id,
-                'accrual_date': accrual_ts,
-                'journal_date': accrual_ts,
-                'accrual_start_ts': cursor,  # v1.6.0: Canonical grid field
-                'accrual_end_ts': segment_end,  # v1.6.0: Canonical grid field
-                'accrual_period_start': cursor,  # Legacy alias
-                'accrual_period_end': segment_end,  # Legacy alias
-                'accrual_period_seconds': slice_secs,
-                'seconds_in_row': slice_secs,  # v1.6.0: Canonical grid field
-                'is_partial_day': is_partial_day,
-                'is_first_day': is_first_day,
-                'is_last_day': is_last_day,
-                'is_reversal': False,
-                'reverses_accrual_id': None,
-                'account_name': f'interest_receivable_cryptocurrency_{currency_suffix}',
-                'debit': slice_interest_wei,
-                'credit': 0,
-                'principal': tranche.principalAmount,
-                'payoff_amount': 0,
-            })
-
-            # Cr interest_income
-            entries.append({
-                **common,
-                'date': accrual_ts,
-                'accrual_id': accrual_id,
-                'accrual_date': accrual_ts,
-                'journal_date': accrual_ts,
-                'accrual_start_ts': cursor,
-                'accrual_end_ts': segment_end,
-                'accrual_period_start': cursor,
-                'accrual_period_end': segment_end,
-                'accrual_period_seconds': slice_secs,
-                'seconds_in_row': slice_secs,
-                'is_partial_day': is_partial_day,
-                'is_first_day': is_first_day,
-                'is_last_day': is_last_day,
-                'is_reversal': False,
-                'reverses_accrual_id': None,
-                'account_name': f'interest_income_cryptocurrency_{currency_suffix}',
-                'debit': 0,
-                'credit': slice_interest_wei,
-                'principal': tranche.principalAmount,
-                'payoff_amount': 0,
-            })
-
-            cursor = segment_end
-
-        # Final adjustment for any remaining wei (ensure grid sums to contractual total)
-        if assigned_so_far < total_net_interest_wei and entries:
-            shortfall = total_net_interest_wei - assigned_so_far
-            entries[-2]['debit'] += shortfall
-            entries[-1]['credit'] += shortfall
-
-        return entries
+        return self._accrual_grid_entries(
+            start_dt, end_dt, total_net_interest_wei, common,
+            accrual_id_prefix=f"{event.loan_id}:{tranche_idx}",
+            debit_account=f'interest_receivable_cryptocurrency_{currency_suffix}',
+            credit_account=f'interest_income_cryptocurrency_{currency_suffix}',
+            principal=tranche.principalAmount,
+        )
 
     def _generate_borrower_interest_accruals(
         self,
@@ -2985,109 +2840,78 @@ class GondiJournalEntryGenerator:
         }
 
         # Build canonical accrual grid with Wei precision
-        leftover = 0
-        assigned_so_far = 0
-        cursor = start_dt
-
-        while cursor < end_dt:
-            tomorrow = cursor.date() + timedelta(days=1)
-            next_midnight = datetime.combine(tomorrow, dt_time(0, 0, 0), tzinfo=timezone.utc)
-
-            # Segment end is the EARLIER of next midnight or contractual end
-            segment_end = min(next_midnight, end_dt)
-
-            # Exact seconds in this row
-            slice_secs = int((segment_end - cursor).total_seconds())
-
-            # Skip zero-second slices
-            if slice_secs <= 0:
-                cursor = segment_end
-                continue
+        return self._accrual_grid_entries(
+            start_dt, end_dt, total_interest_wei, common,
+            accrual_id_prefix=f"{event.loan_id}:borrower",
+            debit_account=f'interest_expense_cryptocurrency_{currency_suffix}',
+            credit_account=f'interest_payable_cryptocurrency_{currency_suffix}',
+            principal=loan.principalAmount,
+        )
 
-            # Wei-precise interest allocation
-            numer = (total_interest_wei * slice_secs) + leftover
-            slice_interest_wei = numer // total_secs
-            leftover = numer % total_secs
-            assigned_so_far += slice_interest_wei
+    def _accrual_grid_entries(
+        self,
+        start_dt: datetime,
+        end_dt: datetime,
+        total_interest_wei: int,
+        common: Dict,
+        accrual_id_prefix: str,
+        debit_account: str,
+        credit_account: str,
+        principal: int,
+    ) -> List[Dict]:
+        """
+        Dr/Cr entry pairs for each row of a canonical accrual grid.
 
-            # Skip zero-interest slices
-            if slice_interest_wei <= 0:
-                cursor = segment_end
-                continue
+        Rows come from build_accrual_schedule(): one per UTC day bucket with
+        its Wei-exact share of total_interest_wei. Zero-interest rows are
+        skipped. accrual_id is "{accrual_id_prefix}:YYYY-MM-DD".
+        """
+        schedule = build_accrual_schedule([start_dt], [end_dt], [total_interest_wei], skip_zero=True)
 
+        entries = []
+        for row in schedule.itertuples(index=False):
             # Journal entry timestamp (EOD or contractual end)
-            if segment_end == next_midnight:
-                accrual_ts = next_midnight - timedelta(seconds=1)
-            else:
-                accrual_ts = end_dt
-
-            # Partial day indicators
-            is_first_day = (cursor == start_dt)
-            is_last_day = (segment_end == end_dt)
-            is_partial_day = (slice_secs < 86400)
-
-            # Deterministic accrual_id for reversal matching
-            accrual_date_str = accrual_ts.strftime('%Y-%m-%d')
-            accrual_id = f"{event.loan_id}:borrower:{accrual_date_str}"
+            accrual_ts = row.accrual_ts
+            accrual_id = f"{accrual_id_prefix}:{accrual_ts.strftime('%Y-%m-%d')}"
 
-            # Dr interest_expense
-            entries.append({
-                **common,
+            grid_fields = {
                 'date': accrual_ts,
                 'accrual_id': accrual_id,
                 'accrual_date': accrual_ts,
                 'journal_date': accrual_ts,
-                'accrual_start_ts': cursor,
-                'accrual_end_ts': segment_end,
-                'accrual_period_start': cursor,
-                'accrual_period_end': segment_end,
-                'accrual_period_seconds': slice_secs,
-                'seconds_in_row': slice_secs,
-                'is_partial_day': is_partial_day,
-                'is_first_day': is_first_day,
-                'is_last_day': is_last_day,
+                'accrual_start_ts': row.accrual_start_ts,  # v1.6.0: Canonical grid field
+                'accrual_end_ts': row.accrual_end_ts,  # v1.6.0: Canonical grid field
+                'accrual_period_start': row.accrual_start_ts,  # Legacy alias
+                'accrual_period_end': row.accrual_end_ts,  # Legacy alias
+                'accrual_period_seconds': row.seconds_in_row,
+                'seconds_in_row': row.seconds_in_row,  # v1.6.0: Canonical grid field
+                'is_partial_day': row.is_partial_day,
+                'is_first_day': row.is_first_day,
+                'is_last_day': row.is_last_day,
                 'is_reversal': False,
                 'reverses_accrual_id': None,
-                'account_name': f'interest_expense_cryptocurrency_{currency_suffix}',
-                'debit': slice_interest_wei,
+            }
+
+            entries.append({
+                **common,
+                **grid_fields,
+                'account_name': debit_account,
+                'debit': row.interest_wei,
                 'credit': 0,
-                'principal': loan.principalAmount,
+                'principal': principal,
                 'payoff_amount': 0,
             })
 
-            # Cr interest_payable
             entries.append({
                 **common,
-                'date': accrual_ts,
-                'accrual_id': accrual_id,
-                'accrual_date': accrual_ts,
-                'journal_date': accrual_ts,
-                'accrual_start_ts': cursor,
-                'accrual_end_ts': segment_end,
-                'accrual_period_start': cursor,
-                'accrual_period_end': segment_end,
-                'accrual_period_seconds': slice_secs,
-                'seconds_in_row': slice_secs,
-                'is_partial_day': is_partial_day,
-                'is_first_day': is_first_day,
-                'is_last_day': is_last_day,
-                'is_reversal': False,
-                'reverses_accrual_id': None,
-                'account_name': f'interest_payable_cryptocurrency_{currency_suffix}',
+                **grid_fields,
+                'account_name': credit_account,
                 'debit': 0,
-                'credit': slice_interest_wei,
-                'principal': loan.principalAmount,
+                'credit': row.interest_wei,
+                'principal': principal,
                 'payoff_amount': 0,
             })
 
-            cursor = segment_end
-
-        # Final adjustment for any remaining Wei
-        if assigned_so_far < total_interest_wei and entries:
-            shortfall = total_interest_wei - assigned_so_far
-            entries[-2]['debit'] += shortfall
-            entries[-1]['credit'] += shortfall
-
         return entries
 
     # =========================================================================
@@ -3255,89 +3079,84 @@ class GondiJournalEntryGenerator:
         secs_col = 'seconds_in_row' if 'seconds_in_row' in accruals_df.columns else 'accrual_period_seconds'
         ts_col = 'date'  # Journal timestamp
 
-        for loan_id, termination_ts in terminations.items():
-            # Get accruals for this loan
-            loan_mask = accruals_df['loan_id'] == loan_id
-            loan_accruals = accruals_df[loan_mask].copy()
-
-            if loan_accruals.empty:
-                continue
-
-            # Ensure datetime columns are proper datetime objects
-            for col in [start_col, end_col, ts_col]:
-                if col in loan_accruals.columns:
-                    if not pd.api.types.is_datetime64_any_dtype(loan_accruals[col]):
-                        loan_accruals[col] = pd.to_datetime(loan_accruals[col], utc=True)
-
-            # Process each accrual row
-            for _, accrual_row in loan_accruals.iterrows():
-                accrual_dict = accrual_row.to_dict()
+        if start_col not in accruals_df.columns or end_col not in accruals_df.columns:
+            return pd.DataFrame()
 
-                # Get row boundaries
-                row_start = accrual_dict.get(start_col)
-                row_end = accrual_dict.get(end_col)
+        # Termination per loan, timezone-aware; rows keep the order of terminations
+        loan_ids = list(terminations)
+        termination_times = [
+            ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+            for ts in terminations.values()
+        ]
+        loan_order = accruals_df['loan_id'].map({loan_id: n for n, loan_id in enumerate(loan_ids)})
+        loan_accruals = accruals_df[loan_order.notna()].copy()
+        if loan_accruals.empty:
+            return pd.DataFrame()
+        order = loan_order[loan_order.notna()].astype(int).to_numpy()
+
+        # Ensure datetime columns are proper datetime objects
+        for col in [start_col, end_col, ts_col]:
+            if col in loan_accruals.columns:
+                if not pd.api.types.is_datetime64_any_dtype(loan_accruals[col]):
+                    loan_accruals[col] = pd.to_datetime(loan_accruals[col], utc=True)
+
+        # Classify every row at once against its loan's termination (as UTC
+        # datetime64; naive boundaries are taken to be UTC)
+        def utc_values(values: pd.Series) -> np.ndarray:
+            if values.dt.tz is not None:
+                values = values.dt.tz_convert(timezone.utc).dt.tz_localize(None)
+            return values.to_numpy()
+
+        row_start = utc_values(loan_accruals[start_col])
+        row_end = utc_values(loan_accruals[end_col])
+        row_termination = utc_values(pd.Series([pd.Timestamp(ts) for ts in termination_times]))[order]
+
+        # FULLY UNEARNED: termination before or at row start
+        fully_unearned = row_termination <= row_start
+        # PARTIALLY EARNED: termination_ts is within (row_start, row_end)
+        partially_earned = (row_termination > row_start) & (row_termination < row_end)
+        # FULLY EARNED rows (termination at or after row end) need no reversal
+
+        reversing = np.flatnonzero(fully_unearned | partially_earned)
+        reversing = reversing[np.argsort(order[reversing], kind='stable')]
+        records = loan_accruals.iloc[reversing].to_dict('records')
+
+        for position, accrual_dict in zip(reversing, records):
+            row_ts = accrual_dict.get(ts_col)
+            if hasattr(row_ts, 'to_pydatetime'):
+                row_ts = row_ts.to_pydatetime()
+
+            if fully_unearned[position]:
+                # Reverse 100%, use SAME timestamp as original
+                reversal = self._create_full_reversal_v160(
+                    accrual_dict,
+                    reversal_timestamp=row_ts,  # SAME as original
+                    original_accrual_ts=row_ts
+                )
+            else:
+                # Calculate earned vs unearned seconds
+                termination_ts = termination_times[order[position]]
                 row_seconds = accrual_dict.get(secs_col, 86400)
-                row_ts = accrual_dict.get(ts_col)
-
-                # Convert to datetime if needed
-                if hasattr(row_start, 'to_pydatetime'):
-                    row_start = row_start.to_pydatetime()
-                if hasattr(row_end, 'to_pydatetime'):
-                    row_end = row_end.to_pydatetime()
-                if hasattr(row_ts, 'to_pydatetime'):
-                    row_ts = row_ts.to_pydatetime()
+                earned_seconds = int((row_termination[position] - row_start[position]) // np.timedelta64(1, 's'))
+                unearned_seconds = int((row_end[position] - row_termination[position]) // np.timedelta64(1, 's'))
+                total_seconds = int(row_seconds) if row_seconds else earned_seconds + unearned_seconds
 
-                # Skip rows without boundary data
-                if row_start is None or row_end is None:
+                if unearned_seconds <= 0:
+                    # Edge case: termination exactly at end
                     continue
 
-                # Ensure timezone awareness
-                if row_start.tzinfo is None:
-                    row_start = row_start.replace(tzinfo=timezone.utc)
-                if row_end.tzinfo is None:
-                    row_end = row_end.replace(tzinfo=timezone.utc)
-                if termination_ts.tzinfo is None:
-                    termination_ts = termination_ts.replace(tzinfo=timezone.utc)
-
-                # Classify this row
-                if termination_ts <= row_start:
-                    # FULLY UNEARNED: termination before or at row start
-                    # Reverse 100%, use SAME timestamp as original
-                    reversal = self._create_full_reversal_v160(
-                        accrual_dict,
-                        reversal_timestamp=row_ts,  # SAME as original
-                        original_accrual_ts=row_ts
-                    )
-                    if reversal:
-                        reversal_rows.append(reversal)
-
-                elif termination_ts >= row_end:
-                    # FULLY EARNED: termination at or after row end
-                    # No reversal needed
-                    continue
-
-                else:
-                    # PARTIALLY EARNED: termination_ts is within [row_start, row_end)
-                    # Calculate earned vs unearned seconds
-                    earned_seconds = int((termination_ts - row_start).total_seconds())
-                    unearned_seconds = int((row_end - termination_ts).total_seconds())
-                    total_seconds = int(row_seconds) if row_seconds else earned_seconds + unearned_seconds
-
-                    if unearned_seconds <= 0:
-                        # Edge case: termination exactly at end
-                        continue
+                # Partial reversal using UNEARNED fraction of ORIGINAL amount
+                # JE timestamp = termination_ts (the EXCEPTION)
+                reversal = self._create_partial_reversal_v160(
+                    accrual_dict,
+                    termination_ts=termination_ts,
+                    unearned_seconds=unearned_seconds,
+                    total_seconds=total_seconds,
+                    original_accrual_ts=row_ts
+                )
 
-                    # Partial reversal using UNEARNED fraction of ORIGINAL amount
-                    # JE timestamp = termination_ts (the EXCEPTION)
-                    reversal = self._create_partial_reversal_v160(
-                        accrual_dict,
-                        termination_ts=termination_ts,
-                        unearned_seconds=unearned_seconds,
-                        total_seconds=total_seconds,
-                        original_accrual_ts=row_ts
-                    )
-                    if reversal:
-                        reversal_rows.append(reversal)
+            if reversal:
+                reversal_rows.append(reversal)
 
         if not reversal_rows:
             return pd.DataFrame()
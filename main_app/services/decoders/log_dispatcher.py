@@ -0,0 +1,179 @@
+"""
+Topic-hash indexed log dispatcher for protocol decoders.
+
+Decoders used to find the event for a log by calling process_log() for every
+known event type and catching the exception on a mismatch. The dispatcher
+instead precomputes topic0 -> (contract, event ABI) once from the contract
+ABIs, so each log is decoded exactly once after a single dict lookup.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from eth_utils import event_abi_to_log_topic
+from web3._utils.events import get_event_data
+from web3.exceptions import MismatchedABI, LogTopicError, InvalidEventABI
+from eth_abi.exceptions import DecodingError
+
+logger = logging.getLogger(__name__)
+
+# Errors raised by get_event_data when a log does not fit an event ABI
+# (the set web3's process_receipt() swallows, widened to any ABI decoding error)
+DECODE_ERRORS = (MismatchedABI, LogTopicError, InvalidEventABI, TypeError, DecodingError)
+
+
+def topic_key(topic: Any) -> bytes:
+    """Normalize a log topic (HexBytes, bytes or 0x-hex string) to bytes"""
+    if isinstance(topic, str):
+        return bytes.fromhex(topic[2:] if topic.startswith('0x') else topic)
+    return bytes(topic)
+
+
+@dataclass(frozen=True, eq=False)
+class DispatchEntry:
+    """One decodable event: the contract it belongs to and its ABI"""
+    address: str
+    event_name: str
+    event_abi: Dict[str, Any]
+    contract: Any = None
+
+
+class LogDispatcher:
+    """
+    Maps log topic0 to the event ABI that can decode it.
+
+    Entries are indexed both by (contract address, topic0) and by topic0 alone.
+    The address-scoped lookup is tried first; the topic-only lookup is used when
+    a caller wants to decode logs emitted by contracts other than the one the
+    ABI was registered for (e.g. proxies or sibling protocol versions).
+    """
+
+    def __init__(self, w3):
+        """
+        Initialize an empty dispatcher
+
+        Args:
+            w3: Web3 instance (only its ABI codec is used)
+        """
+        self.w3 = w3
+        self._by_address: Dict[Tuple[str, bytes], List[DispatchEntry]] = {}
+        self._by_topic: Dict[bytes, List[DispatchEntry]] = {}
+
+    @classmethod
+    def for_contracts(cls, w3, contracts: Iterable[Any],
+                      event_names: Optional[Iterable[str]] = None) -> 'LogDispatcher':
+        """
+        Build a dispatcher for several web3 contract instances
+
+        Args:
+            w3: Web3 instance
+            contracts: Contract instances, registered in priority order
+            event_names: Restrict to these event names (default: all ABI events)
+        """
+        dispatcher = cls(w3)
+        names = list(event_names) if event_names is not None else None
+        for contract in contracts:
+            dispatcher.register(contract.abi, contract.address, names, contract)
+        return dispatcher
+
+    def register(self, abi: List[Dict[str, Any]], address: Optional[str] = None,
+                 event_names: Optional[Iterable[str]] = None, contract: Any = None) -> int:
+        """
+        Index the events of an ABI
+
+        Args:
+            abi: Contract ABI (list of entries)
+            address: Contract address the events are emitted from, if known
+            event_names: Restrict to these event names (default: all events)
+            contract: Optional contract instance kept on each entry
+
+        Returns:
+            Number of events registered
+        """
+        wanted = set(event_names) if event_names is not None else None
+        address = (address or '').lower()
+        count = 0
+
+        for item in abi or []:
+            if item.get('type') != 'event' or item.get('anonymous'):
+                continue
+            if wanted is not None and item.get('name') not in wanted:
+                continue
+
+            topic0 = bytes(event_abi_to_log_topic(item))
+            entry = DispatchEntry(address, item['name'], item, contract)
+            self._by_topic.setdefault(topic0, []).append(entry)
+            if address:
+                self._by_address.setdefault((address, topic0), []).append(entry)
+            count += 1
+
+        return count
+
+    @property
+    def topics(self) -> set:
+        """All registered topic0 hashes"""
+        return set(self._by_topic)
+
+    @property
+    def entries(self) -> List[DispatchEntry]:
+        """All registered events"""
+        return [e for entries in self._by_topic.values() for e in entries]
+
+    def candidates(self, log: Dict[str, Any], any_address: bool = False) -> List[DispatchEntry]:
+        """
+        Event ABIs that may decode a log, best match first
+
+        Args:
+            log: Receipt log
+            any_address: Also return entries registered for other addresses
+
+        Returns:
+            Entries for the log's own address, then (optionally) the rest
+        """
+        topics = log.get('topics') or []
+        if not topics:
+            return []
+
+        topic0 = topic_key(topics[0])
+        address = (log.get('address') or '').lower()
+        scoped = self._by_address.get((address, topic0), [])
+        if not any_address:
+            return scoped
+
+        scoped_ids = {id(e) for e in scoped}
+        others = [e for e in self._by_topic.get(topic0, []) if id(e) not in scoped_ids]
+        return scoped + others
+
+    def iter_decoded(self, log: Dict[str, Any],
+                     any_address: bool = False) -> Iterator[Tuple[DispatchEntry, Any]]:
+        """
+        Yield (entry, decoded log) for every candidate ABI that fits the log
+
+        Usually there is exactly one candidate. Several only occur when
+        events share a signature but differ in which arguments are indexed
+        (e.g. ERC20 vs ERC721 Transfer) or when the same event is registered
+        for several contracts.
+        """
+        for entry in self.candidates(log, any_address):
+            try:
+                decoded = get_event_data(self.w3.codec, entry.event_abi, log)
+            except DECODE_ERRORS as e:
+                logger.debug(f"Log {log.get('logIndex')} does not fit {entry.event_name}: {e}")
+                continue
+            yield entry, decoded
+
+    def decode_log(self, log: Dict[str, Any], any_address: bool = False) -> Optional[Any]:
+        """Decode a log with its matching event ABI, or return None"""
+        for _, decoded in self.iter_decoded(log, any_address):
+            return decoded
+        return None
+
+    def decode_receipt(self, receipt: Dict[str, Any], any_address: bool = False) -> List[Any]:
+        """Decode every recognised log of a receipt, in log order"""
+        decoded_logs = []
+        for log in receipt.get('logs', []):
+            decoded = self.decode_log(log, any_address)
+            if decoded is not None:
+                decoded_logs.append(decoded)
+        return decoded_logs
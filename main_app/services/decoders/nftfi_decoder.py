@@ -38,7 +38,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from decimal import Decimal, getcontext
-from datetime import datetime, timedelta, time as dt_time, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Tuple, Optional, Any, Union, Callable, Set
 from dataclasses import dataclass, field
 from enum import Enum
@@ -47,6 +47,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from web3 import Web3
 
+from .accrual_schedule import build_accrual_schedule
+from .log_dispatcher import topic_key
+from ..multicall import MulticallReader, StateCall
+
 # Set decimal precision for financial calculations
 getcontext().prec = 28
 
@@ -1001,6 +1005,73 @@ class NFTfiOnChainQuery:
             print(f"[\!] Error querying V2.3 loan {loan_id}: {e}")
             return None
 
+    def get_loan_terms_many(
+        self,
+        loans: List[Tuple[int, str]],
+        block_identifier: int = 'latest',
+        batch_size: Optional[int] = None
+    ) -> Dict[Tuple[int, str], Optional[UnifiedLoanTerms]]:
+        """
+        Query many loans' terms through Multicall3, all at the same block.
+
+        Same results as calling get_loan_terms() per loan, but every
+        getLoanTerms / loanIdToLoan / loanIdToLoanExtras read is aggregated
+        into a few aggregate3 calls. A loan whose read reverts maps to None
+        without affecting the others.
+
+        Args:
+            loans: (loan_id, contract_address) pairs
+            block_identifier: Block number or tag ('latest' is pinned once)
+            batch_size: Calls per aggregate3 call (default MULTICALL_BATCH_SIZE)
+
+        Returns:
+            Dict of (loan_id, contract_address) -> UnifiedLoanTerms or None
+        """
+        calls: Dict[Tuple[int, str, str], StateCall] = {}
+        versions: Dict[Tuple[int, str], NFTfiVersion] = {}
+        for loan_id, contract_address in loans:
+            key = (loan_id, contract_address)
+            version = detect_contract_version(contract_address)
+            versions[key] = version
+            if version == NFTfiVersion.V3:
+                contract = self._get_contract_v3(contract_address)
+                calls[key + ('terms',)] = StateCall.from_function(contract.functions.getLoanTerms(int(loan_id)))
+            elif version in [NFTfiVersion.V23, NFTfiVersion.V21, NFTfiVersion.V2]:
+                contract = self._get_contract_v23(contract_address)
+                calls[key + ('terms',)] = StateCall.from_function(contract.functions.loanIdToLoan(int(loan_id)))
+                calls[key + ('extras',)] = StateCall.from_function(contract.functions.loanIdToLoanExtras(int(loan_id)))
+            else:
+                print(f"[\!] Unknown contract version for {contract_address}")
+
+        reader = MulticallReader(self.w3, batch_size) if batch_size else MulticallReader(self.w3)
+        values = reader.read(calls, block_identifier)
+
+        results: Dict[Tuple[int, str], Optional[UnifiedLoanTerms]] = {}
+        for key, version in versions.items():
+            loan_id, contract_address = key
+            results[key] = None
+            if key + ('terms',) not in values:
+                if version != NFTfiVersion.UNKNOWN:
+                    print(f"[\!] Error querying loan {loan_id} on {contract_address}")
+                continue
+            try:
+                if version == NFTfiVersion.V3:
+                    terms_v3 = LoanTermsV3.from_tuple(values[key + ('terms',)])
+                    results[key] = UnifiedLoanTerms.from_v3(terms_v3, contract_address)
+                else:
+                    terms_v23 = LoanTermsV23.from_tuple(values[key + ('terms',)])
+                    extras_result = values.get(key + ('extras',))
+                    extras = LoanExtrasV23.from_tuple(extras_result) if extras_result is not None else None
+                    results[key] = UnifiedLoanTerms.from_v23(
+                        terms_v23,
+                        lender="",  # Must be set from event
+                        extras=extras,
+                        contract_address=contract_address
+                    )
+            except Exception as e:
+                print(f"[\!] Error decoding loan {loan_id} on {contract_address}: {e}")
+        return results
+
     def is_loan_resolved(
         self,
         loan_id: int,
@@ -1236,6 +1307,11 @@ class NFTfiEventDecoder:
         ),
     }
 
+    # topic0 -> event name, so each log is routed to exactly one _decode_* method
+    TOPIC_TO_EVENT = {
+        bytes(sig): key.split('_v')[0] for key, sig in EVENT_SIGNATURES.items()
+    }
+
     def __init__(
         self,
         w3: Web3,
@@ -1278,18 +1354,19 @@ class NFTfiEventDecoder:
                 continue
 
             topic0 = log['topics'][0]
+            event_name = self.TOPIC_TO_EVENT.get(topic_key(topic0))
+            if event_name is None or event_name not in relevant_events:
+                continue
+
             contract_addr = log['address'].lower()
             version = detect_contract_version(contract_addr)
 
-            # Try to match event
-            for event_name in relevant_events:
-                event = self._try_decode_log(
-                    log, topic0, event_name, contract_addr, version,
-                    tx_hash, block_number, tx_datetime
-                )
-                if event:
-                    decoded_events.append(event)
-                    break
+            event = self._try_decode_log(
+                log, topic0, event_name, contract_addr, version,
+                tx_hash, block_number, tx_datetime
+            )
+            if event:
+                decoded_events.append(event)
 
         return decoded_events
 
@@ -2497,11 +2574,8 @@ class NFTfiJournalEntryGenerator:
         if df_loans.empty:
             return pd.DataFrame()
 
-        journal_rows = []
-
-        for _, loan_row in df_loans.iterrows():
-            entries = self._generate_loan_interest_accruals(loan_row)
-            journal_rows.extend(entries)
+        terms = [self._loan_accrual_terms(loan_row, is_lender=True) for _, loan_row in df_loans.iterrows()]
+        journal_rows = self._accrual_entries([t for t in terms if t])
 
         if not journal_rows:
             return pd.DataFrame()
@@ -2510,113 +2584,8 @@ class NFTfiJournalEntryGenerator:
 
     def _generate_loan_interest_accruals(self, loan_row: pd.Series) -> List[Dict]:
         """Generate daily interest accruals for a single loan (lender) using Wei precision"""
-        tx_dt = loan_row.get('transaction_datetime')
-        if isinstance(tx_dt, str):
-            tx_dt = pd.to_datetime(tx_dt, utc=True)
-
-        loan_duration = int(loan_row.get('loanDuration', 0))
-        if loan_duration <= 0:
-            return []
-
-        end_dt = tx_dt + timedelta(seconds=loan_duration)
-
-        # CRITICAL: Detect cryptocurrency from loanERC20Denomination
-        loan_denomination = loan_row.get('loanERC20Denomination', '')
-        cryptocurrency, decimals = self._detect_currency_from_denomination(loan_denomination)
-
-        # Calculate net interest to lender
-        principal_wei = int(loan_row.get('loanPrincipalAmount', 0))
-        max_repay_wei = int(loan_row.get('maximumRepaymentAmount', 0))
-        admin_fee_bps = int(loan_row.get('loanAdminFeeInBasisPoints', 500))
-        is_pro_rata = loan_row.get('isProRata', False)
-
-        gross_interest_wei = max_repay_wei - principal_wei
-        admin_fee_wei = gross_interest_wei * admin_fee_bps // 10000
-        net_interest_wei = gross_interest_wei - admin_fee_wei
-
-        if net_interest_wei <= 0:
-            return []
-
-        lender = str(loan_row.get('lender', '')).lower()
-        borrower = str(loan_row.get('borrower', '')).lower()
-
-        common = {
-            'fund_id': self._get_fund_id(lender),
-            'counterparty_fund_id': self._get_fund_id(borrower),
-            'wallet_id': lender,
-            'cryptocurrency': cryptocurrency,
-            'transaction_type': 'income_interest_accruals',
-            'platform': PLATFORM,
-            'hash': loan_row.get('transactionHash', ''),
-            'loan_id': self._safe_id_str(loan_row.get('loan_id')),
-            'lender': lender,
-            'borrower': borrower,
-            'contract_address': loan_row.get('contract_address', ''),
-            'collateral_address': loan_row.get('nftCollateralContract', ''),
-            'token_id': self._safe_id_str(loan_row.get('nftCollateralId')),
-        }
-
-        entries = []
-        total_secs = int((end_dt - tx_dt).total_seconds())
-        total_interest_wei = int(net_interest_wei)
-
-        leftover = 0
-        assigned_so_far = 0
-        cursor = tx_dt
-
-        while cursor < end_dt:
-            # Calculate next midnight
-            tomorrow = cursor.date() + timedelta(days=1)
-            naive_midnight = datetime.combine(tomorrow, dt_time(0, 0, 0))
-            next_midnight = naive_midnight.replace(tzinfo=cursor.tzinfo)
-
-            segment_end = min(next_midnight, end_dt)
-            slice_secs = int((segment_end - cursor).total_seconds())
-
-            # Wei-precise interest allocation
-            numer = (total_interest_wei * slice_secs) + leftover
-            slice_interest_wei = numer // total_secs
-            leftover = numer % total_secs
-            assigned_so_far += slice_interest_wei
-
-            # Label timestamp
-            if segment_end == next_midnight:
-                accrual_label = next_midnight - timedelta(seconds=1)
-            else:
-                accrual_label = end_dt
-
-            # Convert using correct decimals (USDC=10^6, WETH/DAI=10^18)
-            slice_interest = Decimal(slice_interest_wei) / decimals
-
-            # Dr interest_receivable
-            entries.append({
-                **common,
-                'date': accrual_label,
-                'account_name': f'interest_receivable_cryptocurrency_{cryptocurrency.lower()}',
-                'debit': slice_interest,
-                'credit': Decimal(0),
-            })
-
-            # Cr interest_income
-            entries.append({
-                **common,
-                'date': accrual_label,
-                'account_name': f'interest_income_cryptocurrency_{cryptocurrency.lower()}',
-                'debit': Decimal(0),
-                'credit': slice_interest,
-            })
-
-            cursor = segment_end
-
-        # Final adjustment
-        if assigned_so_far < total_interest_wei:
-            shortfall_wei = total_interest_wei - assigned_so_far
-            shortfall = Decimal(shortfall_wei) / decimals  # Use correct decimals
-            if entries:
-                entries[-2]['debit'] += shortfall
-                entries[-1]['credit'] += shortfall
-
-        return entries
+        terms = self._loan_accrual_terms(loan_row, is_lender=True)
+        return self._accrual_entries([terms]) if terms else []
 
     def generate_interest_expense_accruals(self, df_loans: pd.DataFrame) -> pd.DataFrame:
         """
@@ -2635,11 +2604,8 @@ class NFTfiJournalEntryGenerator:
         if df_loans.empty:
             return pd.DataFrame()
 
-        journal_rows = []
-
-        for _, loan_row in df_loans.iterrows():
-            entries = self._generate_borrower_interest_expense_accruals(loan_row)
-            journal_rows.extend(entries)
+        terms = [self._loan_accrual_terms(loan_row, is_lender=False) for _, loan_row in df_loans.iterrows()]
+        journal_rows = self._accrual_entries([t for t in terms if t])
 
         if not journal_rows:
             return pd.DataFrame()
@@ -2652,109 +2618,119 @@ class NFTfiJournalEntryGenerator:
 
         Borrower accrues GROSS interest (before admin fee), as they pay the full amount.
         """
+        terms = self._loan_accrual_terms(loan_row, is_lender=False)
+        return self._accrual_entries([terms]) if terms else []
+
+    def _loan_accrual_terms(self, loan_row: pd.Series, is_lender: bool) -> Optional[Dict]:
+        """
+        Accrual window, total interest and entry metadata of one loan.
+
+        The lender accrues NET interest (after admin fee); the borrower accrues
+        GROSS interest, as they pay the full amount.
+
+        Returns:
+            Dict for _accrual_entries, or None if the loan accrues nothing
+        """
         tx_dt = loan_row.get('transaction_datetime')
         if isinstance(tx_dt, str):
             tx_dt = pd.to_datetime(tx_dt, utc=True)
 
         loan_duration = int(loan_row.get('loanDuration', 0))
         if loan_duration <= 0:
-            return []
-
-        end_dt = tx_dt + timedelta(seconds=loan_duration)
+            return None
 
         # CRITICAL: Detect cryptocurrency from loanERC20Denomination
         loan_denomination = loan_row.get('loanERC20Denomination', '')
         cryptocurrency, decimals = self._detect_currency_from_denomination(loan_denomination)
 
-        # Calculate GROSS interest (what borrower owes - includes admin fee)
         principal_wei = int(loan_row.get('loanPrincipalAmount', 0))
         max_repay_wei = int(loan_row.get('maximumRepaymentAmount', 0))
-
-        # Borrower pays gross interest (admin fee is part of their expense)
         gross_interest_wei = max_repay_wei - principal_wei
 
-        if gross_interest_wei <= 0:
-            return []
+        if is_lender:
+            admin_fee_bps = int(loan_row.get('loanAdminFeeInBasisPoints', 500))
+            admin_fee_wei = gross_interest_wei * admin_fee_bps // 10000
+            interest_wei = gross_interest_wei - admin_fee_wei
+        else:
+            # Borrower pays gross interest (admin fee is part of their expense)
+            interest_wei = gross_interest_wei
+
+        if interest_wei <= 0:
+            return None
 
         lender = str(loan_row.get('lender', '')).lower()
         borrower = str(loan_row.get('borrower', '')).lower()
+        fund_wallet, counterparty = (lender, borrower) if is_lender else (borrower, lender)
+        currency = cryptocurrency.lower()
 
-        common = {
-            'fund_id': self._get_fund_id(borrower),  # Fund is borrower
-            'counterparty_fund_id': self._get_fund_id(lender),
-            'wallet_id': borrower,
-            'cryptocurrency': cryptocurrency,
-            'transaction_type': 'expense_interest_accruals',
-            'platform': PLATFORM,
-            'hash': loan_row.get('transactionHash', ''),
-            'loan_id': self._safe_id_str(loan_row.get('loan_id')),
-            'lender': lender,
-            'borrower': borrower,
-            'contract_address': loan_row.get('contract_address', ''),
-            'collateral_address': loan_row.get('nftCollateralContract', ''),
-            'token_id': self._safe_id_str(loan_row.get('nftCollateralId')),
+        return {
+            'start': tx_dt,
+            'end': tx_dt + timedelta(seconds=loan_duration),
+            'interest_wei': int(interest_wei),
+            'decimals': decimals,
+            'debit_account': (f'interest_receivable_cryptocurrency_{currency}' if is_lender
+                              else f'interest_expense_cryptocurrency_{currency}'),
+            'credit_account': (f'interest_income_cryptocurrency_{currency}' if is_lender
+                               else f'interest_payable_cryptocurrency_{currency}'),
+            'common': {
+                'fund_id': self._get_fund_id(fund_wallet),
+                'counterparty_fund_id': self._get_fund_id(counterparty),
+                'wallet_id': fund_wallet,
+                'cryptocurrency': cryptocurrency,
+                'transaction_type': 'income_interest_accruals' if is_lender else 'expense_interest_accruals',
+                'platform': PLATFORM,
+                'hash': loan_row.get('transactionHash', ''),
+                'loan_id': self._safe_id_str(loan_row.get('loan_id')),
+                'lender': lender,
+                'borrower': borrower,
+                'contract_address': loan_row.get('contract_address', ''),
+                'collateral_address': loan_row.get('nftCollateralContract', ''),
+                'token_id': self._safe_id_str(loan_row.get('nftCollateralId')),
+            },
         }
 
-        entries = []
-        total_secs = int((end_dt - tx_dt).total_seconds())
-        total_interest_wei = int(gross_interest_wei)
-
-        leftover = 0
-        assigned_so_far = 0
-        cursor = tx_dt
-
-        while cursor < end_dt:
-            # Calculate next midnight
-            tomorrow = cursor.date() + timedelta(days=1)
-            naive_midnight = datetime.combine(tomorrow, dt_time(0, 0, 0))
-            next_midnight = naive_midnight.replace(tzinfo=cursor.tzinfo)
-
-            segment_end = min(next_midnight, end_dt)
-            slice_secs = int((segment_end - cursor).total_seconds())
-
-            # Wei-precise interest allocation
-            numer = (total_interest_wei * slice_secs) + leftover
-            slice_interest_wei = numer // total_secs
-            leftover = numer % total_secs
-            assigned_so_far += slice_interest_wei
-
-            # Label timestamp (end of day or loan end)
-            if segment_end == next_midnight:
-                accrual_label = next_midnight - timedelta(seconds=1)
-            else:
-                accrual_label = end_dt
+    def _accrual_entries(self, terms: List[Dict]) -> List[Dict]:
+        """
+        Dr/Cr entry pairs for every day of every loan in terms.
 
-            # Convert from wei to crypto units using correct decimals
-            slice_interest = Decimal(slice_interest_wei) / decimals
+        All loans are sliced in one build_accrual_schedule() call; each day
+        gets its Wei-exact share of the loan's interest, converted with the
+        loan's decimals (USDC=10^6, WETH/DAI=10^18).
+        """
+        if not terms:
+            return []
+
+        schedule = build_accrual_schedule(
+            [t['start'] for t in terms],
+            [t['end'] for t in terms],
+            [t['interest_wei'] for t in terms],
+        )
 
-            # Dr interest_expense (borrower incurs expense)
+        entries = []
+        for loan, accrual_label, slice_interest_wei in zip(
+            schedule['loan'].tolist(), schedule['accrual_ts'], schedule['interest_wei'].tolist()
+        ):
+            t = terms[loan]
+            slice_interest = Decimal(slice_interest_wei) / t['decimals']
+
+            # Dr interest_receivable / interest_expense
             entries.append({
-                **common,
+                **t['common'],
                 'date': accrual_label,
-                'account_name': f'interest_expense_cryptocurrency_{cryptocurrency.lower()}',
+                'account_name': t['debit_account'],
                 'debit': slice_interest,
                 'credit': Decimal(0),
             })
 
-            # Cr interest_payable (liability accrues)
+            # Cr interest_income / interest_payable
             entries.append({
-                **common,
+                **t['common'],
                 'date': accrual_label,
-                'account_name': f'interest_payable_cryptocurrency_{cryptocurrency.lower()}',
+                'account_name': t['credit_account'],
                 'debit': Decimal(0),
                 'credit': slice_interest,
             })
 
-            cursor = segment_end
-
-        # Final adjustment for any remaining wei
-        if assigned_so_far < total_interest_wei:
-            shortfall_wei = total_interest_wei - assigned_so_far
-            shortfall = Decimal(shortfall_wei) / decimals
-            if entries:
-                entries[-2]['debit'] += shortfall
-                entries[-1]['credit'] += shortfall
-
         return entries
 
     # =========================================================================
@@ -17,7 +17,7 @@ from web3 import Web3
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
-from functools import lru_cache
+from functools import lru_cache, partial
 import logging
 
 from .base import (
@@ -30,6 +30,10 @@ from .base import (
     calculate_gas_fee,
 )
 
+from ..chain_cache import ChainDataCache, get_chain_cache, tx_key
+from ..price_oracle import EthUsdPriceOracle, get_price_oracle
+from ..rpc_batch import BatchRpcFetcher, DEFAULT_BATCH_SIZE, DEFAULT_MAX_CONCURRENCY
+
 if TYPE_CHECKING:
     from ..decoder_fifo_integrator import DecoderFIFOIntegrator
 
@@ -264,7 +268,9 @@ class DecoderRegistry:
     """
 
     def __init__(self, w3: Web3, fund_wallets: List[str], fund_id: str = "",
-                 fifo_integrator: Optional["DecoderFIFOIntegrator"] = None):
+                 fifo_integrator: Optional["DecoderFIFOIntegrator"] = None,
+                 chain_cache: Optional[ChainDataCache] = None,
+                 price_oracle: Optional[EthUsdPriceOracle] = None):
         """
         Initialize decoder registry.
 
@@ -273,6 +279,8 @@ class DecoderRegistry:
             fund_wallets: List of wallet addresses to track
             fund_id: Fund identifier for GL posting
             fifo_integrator: Optional FIFO cost basis integrator for tracking acquisitions/disposals
+            chain_cache: Persistent tx/receipt/block cache (default: shared process cache)
+            price_oracle: ETH/USD price source (default: shared process oracle)
         """
         self.w3 = w3
         self.fund_wallets = [w.lower() for w in fund_wallets]
@@ -280,6 +288,10 @@ class DecoderRegistry:
         self.fifo_integrator = fifo_integrator
         self.decoders: Dict[Platform, BaseDecoder] = {}
         self.decoded_cache: Dict[str, DecodedTransaction] = {}
+        self.chain_cache = chain_cache if chain_cache is not None else get_chain_cache()
+        self.price_oracle = price_oracle if price_oracle is not None else get_price_oracle()
+        # Chain data fetched in bulk by decode_many(), consumed by decode_transaction()
+        self._prefetched: Dict[str, Tuple[Any, Any, Any]] = {}
         self._proxy_cache: Dict[str, str] = {}  # Cache for proxy -> implementation resolution
         self._initialize_decoders()
 
@@ -486,27 +498,126 @@ class DecoderRegistry:
         logger.debug(f"  [5] DEFAULT: -> GENERIC")
         return Platform.GENERIC
 
-    @lru_cache(maxsize=512)
-    def _get_eth_price_at_block(self, block_number: int) -> Decimal:
-        """Get ETH/USD price at specific block (cached)"""
+    def _get_eth_price_at_block(self, block_number: int, timestamp: Optional[int] = None) -> Decimal:
+        """Get ETH/USD price at specific block from the shared Chainlink price oracle"""
         try:
-            from ..blockchain_service import get_eth_usd_price
-            return Decimal(str(get_eth_usd_price(block_number)))
-        except ImportError:
-            pass
+            return self.price_oracle.price_at_block(self.w3, block_number, timestamp)
+        except Exception as e:
+            logger.warning(f"Failed to get ETH price at block {block_number}: {e}")
+            return Decimal("3000")  # Default fallback
+
+    def _fetch_chain_data(self, tx_hash: str) -> Tuple[Any, Any, Any]:
+        """Transaction, receipt and block, read through the persistent chain cache"""
+        prefetched = self._prefetched.pop(tx_key(tx_hash), None)
+        if prefetched is not None:
+            return prefetched
+        return self.chain_cache.get_transaction_bundle(self.w3, tx_hash)
 
-        # Fallback: try Chainlink aggregator directly
+    def _prefetch_chain_data(self, tx_hashes: List[str], fetcher: BatchRpcFetcher) -> None:
+        """
+        Bulk-load tx, receipt, block and ETH price data for tx_hashes
+
+        Whatever the chain cache does not already hold is fetched with
+        JSON-RPC batches. Blocks are fetched once per unique block even when
+        many transactions share it, and the price oracle syncs the Chainlink
+        rounds for the whole block range. Transactions that could not be
+        fetched are simply not prefetched; decode_transaction() then retries
+        them one by one and records the error as usual.
+        """
+        keys = {tx_key(h): h for h in tx_hashes}
+
+        # 1. Transactions and receipts
+        txs = self.chain_cache.get_many('tx', keys)
+        receipts = self.chain_cache.get_many('receipt', keys)
+
+        calls = {}
+        for key, tx_hash in keys.items():
+            if key not in txs:
+                calls[('tx', key)] = partial(self.w3.eth.get_transaction, tx_hash)
+            if key not in receipts:
+                calls[('receipt', key)] = partial(self.w3.eth.get_transaction_receipt, tx_hash)
+
+        for (kind, key), value in fetcher.fetch(calls).items():
+            if value is None:
+                continue
+            if kind == 'tx':
+                txs[key] = value
+                self.chain_cache.put_transaction(key, value)
+            else:
+                receipts[key] = value
+                self.chain_cache.put_receipt(key, value)
+
+        # 2. Blocks, deduplicated across transactions
+        block_numbers = sorted({
+            tx['blockNumber'] for tx in txs.values() if tx.get('blockNumber') is not None
+        })
+        blocks = {
+            int(number): block
+            for number, block in self.chain_cache.get_many('block', map(str, block_numbers)).items()
+        }
+        calls = {n: partial(self.w3.eth.get_block, n) for n in block_numbers if n not in blocks}
+        for number, block in fetcher.fetch(calls).items():
+            if block is not None:
+                blocks[number] = block
+                self.chain_cache.put_block(number, block)
+
+        # 3. ETH/USD round history covering those blocks
         try:
-            from ...config.blockchain_config import CHAINLINK_ETH_USD_FEED, CHAINLINK_AGGREGATOR_V3_ABI
-            aggregator = self.w3.eth.contract(
-                address=Web3.to_checksum_address(CHAINLINK_ETH_USD_FEED),
-                abi=CHAINLINK_AGGREGATOR_V3_ABI
+            self.price_oracle.prefetch_blocks(
+                self.w3, blocks,
+                timestamps={n: block['timestamp'] for n, block in blocks.items()},
+                fetcher=fetcher,
             )
-            _, answer, *_ = aggregator.functions.latestRoundData().call(block_identifier=block_number)
-            return Decimal(answer) / Decimal(1e8)
         except Exception as e:
-            logger.warning(f"Failed to get ETH price at block {block_number}: {e}")
-            return Decimal("3000")  # Default fallback
+            # Prices are then read per block by decode_transaction()
+            logger.warning(f"ETH/USD price prefetch failed: {e}")
+
+        for key in keys:
+            tx, receipt = txs.get(key), receipts.get(key)
+            if tx is None or receipt is None or tx.get('blockNumber') not in blocks:
+                continue
+            self._prefetched[key] = (tx, receipt, blocks[tx['blockNumber']])
+
+    def decode_many(self, tx_hashes: List[str], skip_spam_check: bool = False,
+                    batch_size: int = DEFAULT_BATCH_SIZE,
+                    max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> List[DecodedTransaction]:
+        """
+        Decode many transactions, fetching their chain data in bulk first.
+
+        All eth_getTransactionByHash / eth_getTransactionReceipt /
+        eth_getBlockByNumber / price calls the batch needs are sent as
+        JSON-RPC batches (bounded concurrency, backoff on 429), then every
+        transaction is decoded from memory. Results land in decoded_cache
+        exactly as with decode_transaction().
+
+        Args:
+            tx_hashes: Transaction hashes (duplicates are decoded once)
+            skip_spam_check: If True, skip spam detection
+            batch_size: RPC calls per JSON-RPC batch
+            max_concurrency: Batches in flight at once
+
+        Returns:
+            DecodedTransaction per input hash, in input order
+        """
+        pending = [h for h in dict.fromkeys(tx_hashes) if h not in self.decoded_cache]
+
+        if pending:
+            fetcher = BatchRpcFetcher(self.w3, batch_size=batch_size, max_concurrency=max_concurrency)
+            try:
+                self._prefetch_chain_data(pending, fetcher)
+            except Exception as e:
+                # Decoding still works, one RPC round trip at a time
+                logger.warning(f"Bulk prefetch failed, decoding sequentially: {e}")
+            logger.info(f"Prefetched {len(self._prefetched)}/{len(pending)} transactions "
+                        f"in {fetcher.stats['batches']} RPC batches")
+
+        try:
+            for tx_hash in pending:
+                self.decode_transaction(tx_hash, skip_spam_check=skip_spam_check)
+        finally:
+            self._prefetched.clear()
+
+        return [self.decoded_cache[h] for h in tx_hashes]
 
     def decode_transaction(self, tx_hash: str, skip_spam_check: bool = False) -> DecodedTransaction:
         """
@@ -531,11 +642,9 @@ class DecoderRegistry:
         logger.debug("Cache MISS - fetching from chain")
 
         try:
-            # Fetch transaction data
-            tx = self.w3.eth.get_transaction(tx_hash)
-            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
-            block = self.w3.eth.get_block(tx.blockNumber)
-            eth_price = self._get_eth_price_at_block(tx.blockNumber)
+            # Fetch transaction data (confirmed data is served from disk after the first fetch)
+            tx, receipt, block = self._fetch_chain_data(tx_hash)
+            eth_price = self._get_eth_price_at_block(tx.blockNumber, block.get('timestamp'))
 
             logger.debug(f"TX DETAILS:")
             logger.debug(f"  Block: {tx.blockNumber}")
@@ -764,9 +873,8 @@ class DecoderRegistry:
         ]
 
     def clear_cache(self):
-        """Clear the decoded transaction cache"""
+        """Clear the decoded transaction cache (raw chain data stays in chain_cache)"""
         self.decoded_cache.clear()
-        self._get_eth_price_at_block.cache_clear()
 
     def set_fifo_integrator(self, integrator: "DecoderFIFOIntegrator"):
         """Set or replace the FIFO integrator"""
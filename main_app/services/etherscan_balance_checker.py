@@ -3,6 +3,10 @@ Etherscan Balance Verification Service
 
 Fetches current token balances from Etherscan API and compares them with FIFO positions
 for balance verification and auditing purposes.
+
+With batched=True the balances are read from the node instead: all ETH and ERC-20
+balances go through Multicall3 in a few eth_calls pinned to one block, with no
+per-position rate-limit sleep.
 """
 
 import requests
@@ -12,7 +16,8 @@ from typing import Dict, List, Optional, Tuple
 from decimal import Decimal, getcontext
 import time
 
-from main_app.config.blockchain_config import ETHERSCAN_API_KEY, ETHERSCAN_BASE_URL
+from main_app.config.blockchain_config import ETHERSCAN_API_KEY, ETHERSCAN_BASE_URL, INFURA_URL
+from main_app.services.multicall import MulticallReader, eth_balance_call, erc20_balance_call
 
 logger = logging.getLogger(__name__)
 
@@ -25,11 +30,56 @@ class EtherscanBalanceChecker:
     Service for fetching and comparing token balances from Etherscan.
     """
     
-    def __init__(self, api_key: str = ETHERSCAN_API_KEY):
-        """Initialize with Etherscan API key."""
+    def __init__(self, api_key: str = ETHERSCAN_API_KEY, w3=None):
+        """Initialize with Etherscan API key (and a Web3 instance for batched reads)."""
         self.api_key = api_key
         self.session = requests.Session()
         self.rate_limit_delay = 0.2  # 200ms between requests to respect rate limits
+        self.w3 = w3
+
+    def _get_w3(self):
+        """Web3 instance for batched reads, created from INFURA_URL on first use"""
+        if self.w3 is None:
+            from web3 import Web3
+            self.w3 = Web3(Web3.HTTPProvider(INFURA_URL))
+        return self.w3
+
+    def get_balances_batched(self, positions: List[Tuple[str, str]], token_contracts: Dict[str, Dict],
+                             block_identifier='latest', batch_size: Optional[int] = None) -> Dict[Tuple[str, str], Decimal]:
+        """
+        Read ETH and ERC-20 balances for many (wallet, asset) pairs via Multicall3.
+
+        Args:
+            positions: (wallet_address, asset) pairs
+            token_contracts: Dict mapping token symbols to contract info
+            block_identifier: Block to read at ('latest' is pinned once for all reads)
+            batch_size: Calls per aggregate3 call
+
+        Returns:
+            Dict of (wallet_address, asset) -> balance; pairs whose read failed are
+            absent, assets without contract info are 0
+        """
+        calls = {}
+        balances = {}
+        decimals = {}
+        for wallet_address, asset in positions:
+            key = (wallet_address, asset)
+            if asset.upper() == 'ETH':
+                calls[key] = eth_balance_call(wallet_address)
+                decimals[key] = 18
+            elif asset.upper() in token_contracts:
+                token_info = token_contracts[asset.upper()]
+                calls[key] = erc20_balance_call(token_info['address'], wallet_address)
+                decimals[key] = token_info['decimals']
+            else:
+                logger.warning(f"No contract info for token {asset}, skipping balance check")
+                balances[key] = Decimal('0')
+
+        w3 = self._get_w3()
+        reader = MulticallReader(w3, batch_size) if batch_size else MulticallReader(w3)
+        for key, raw in reader.read(calls, block_identifier).items():
+            balances[key] = Decimal(raw) / Decimal(10 ** decimals[key])
+        return balances
         
     def get_eth_balance(self, wallet_address: str) -> Decimal:
         """
@@ -112,7 +162,8 @@ class EtherscanBalanceChecker:
         finally:
             time.sleep(self.rate_limit_delay)
     
-    def verify_wallet_balances(self, positions_df: pd.DataFrame, token_contracts: Dict[str, Dict] = None) -> pd.DataFrame:
+    def verify_wallet_balances(self, positions_df: pd.DataFrame, token_contracts: Dict[str, Dict] = None,
+                               batched: bool = False) -> pd.DataFrame:
         """
         Verify FIFO positions against Etherscan balances.
         
@@ -120,6 +171,10 @@ class EtherscanBalanceChecker:
             positions_df: DataFrame with FIFO positions
             token_contracts: Dict mapping token symbols to contract info
                            Format: {'TOKEN': {'address': '0x...', 'decimals': 18}}
+            batched: Read all balances from the node in Multicall3 batches at one
+                     block instead of one Etherscan request per position; falls
+                     back to Etherscan if the batched read cannot run, and per
+                     position for reads that failed within it
                            
         Returns:
             DataFrame with comparison results
@@ -138,6 +193,13 @@ class EtherscanBalanceChecker:
         # Group positions by wallet and asset
         grouped = positions_df.groupby(['wallet_address', 'asset']) if 'wallet_address' in positions_df.columns else positions_df.groupby(['asset'])
         
+        batched_balances = None
+        if batched:
+            try:
+                batched_balances = self.get_balances_batched(list(grouped.groups.keys()), token_contracts)
+            except Exception as e:
+                logger.warning(f"Batched balance read failed ({e}), falling back to Etherscan")
+        
         for (wallet_address, asset), group in grouped:
             try:
                 logger.info(f"Verifying balance for {asset} in wallet {wallet_address}")
@@ -148,7 +210,9 @@ class EtherscanBalanceChecker:
                 fifo_cost_basis = group['cost_basis_eth'].sum()
                 
                 # Get Etherscan balance
-                if asset.upper() == 'ETH':
+                if batched_balances is not None and (wallet_address, asset) in batched_balances:
+                    etherscan_balance = batched_balances[(wallet_address, asset)]
+                elif asset.upper() == 'ETH':
                     etherscan_balance = self.get_eth_balance(wallet_address)
                 else:
                     token_info = token_contracts.get(asset.upper())
@@ -6,6 +6,7 @@ Provides cost basis tracking for cryptocurrency transactions using FIFO methodol
 Simplified ETH-based approach without asset categorization.
 """
 
+import numpy as np
 import pandas as pd
 from collections import deque
 from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
@@ -261,26 +262,311 @@ class FIFOTracker:
         return pd.DataFrame(positions)
 
 
-def build_fifo_ledger(df_input: pd.DataFrame) -> pd.DataFrame:
+# Fixed-point scales of FIFOLotEngine: quantities in wei (1e-18), unit
+# prices in 1e-36 ETH so that qty * price is exact at QTY * PRICE scale
+QTY_DECIMALS = 18
+PRICE_DECIMALS = 36
+QTY_SCALE = 10 ** QTY_DECIMALS
+COST_SCALE = 10 ** (QTY_DECIMALS + PRICE_DECIMALS)
+
+# Drop consumed lots from the front of a queue once this many have piled up
+_LOT_COMPACT_THRESHOLD = 1024
+
+LEDGER_COLUMNS = [
+    'fund_id', 'wallet_address', 'asset', 'date', 'hash', 'side',
+    'qty', 'amount (eth)', 'price_eth', 'unit_price_eth',
+    'proceeds_eth', 'cost_basis_sold_eth', 'realized_gain_eth',
+    'remaining_qty', 'remaining_cost_basis_eth'
+]
+
+
+def _to_fixed(values: pd.Series, decimals: int,
+              absolute: bool = False) -> Tuple[List[Optional[int]], np.ndarray]:
     """
-    Build FIFO ledger from transaction data using ETH-based cost basis.
-    
-    Expected input columns:
-    - fund_id, wallet_address, asset, date, hash, side
-    - token_amount, token_value_eth (from crypto_fetch)
-    - OR qty, unit_price_eth (pre-calculated)
-    
+    Convert amounts to ints scaled by 10**decimals, via their decimal repr.
+
+    Goes through Decimal(str(x)) exactly like FIFOTracker does, but once per
+    distinct value instead of once per row.
+
     Returns:
-        DataFrame with FIFO calculations and required output columns
+        (fixed-point value per row or None if not a finite number,
+         float(Decimal(str(x))) per row as FIFOTracker logs it)
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    fixed: List[Optional[int]] = []
+    floats: List[float] = []
+    for value in uniques:
+        try:
+            dec = Decimal(str(abs(value) if absolute else value))
+            fixed.append(int(dec.scaleb(decimals).to_integral_value(ROUND_HALF_EVEN)))
+            floats.append(float(dec))
+        except (InvalidOperation, TypeError, ValueError, OverflowError):
+            fixed.append(None)
+            floats.append(float('nan'))
+    return [fixed[c] for c in codes], np.asarray(floats, dtype=float)[codes]
+
+
+class _LotQueue:
+    """
+    FIFO lots of one (fund_id, wallet, asset) as fixed-point integers.
+
+    Lots live in two parallel lists with a moving head index, and the
+    position totals are updated as lots are added or consumed, so each
+    trade costs O(lots touched) instead of a pass over every open lot.
+    """
+
+    __slots__ = ('qty', 'price', 'head', 'total_qty', 'positive_qty', 'positive_cost')
+
+    def __init__(self):
+        self.qty: List[int] = []      # wei-scaled, negative for short lots
+        self.price: List[int] = []    # unit price in ETH, PRICE_DECIMALS scaled
+        self.head = 0
+        self.total_qty = 0            # sum of all lot quantities
+        self.positive_qty = 0         # sum over long lots
+        self.positive_cost = 0        # sum of qty * price over long lots (COST_SCALE)
+
+    def __len__(self) -> int:
+        return len(self.qty) - self.head
+
+    def buy(self, qty: int, price: int) -> None:
+        self.qty.append(qty)
+        self.price.append(price)
+        self.total_qty += qty
+        if qty > 0:
+            self.positive_qty += qty
+            self.positive_cost += qty * price
+
+    def sell(self, qty: int, price: int) -> Tuple[int, int]:
+        """
+        Consume lots oldest first.
+
+        Returns:
+            (cost basis sold at COST_SCALE, quantity sold short)
+        """
+        lots_qty, lots_price = self.qty, self.price
+        head, end = self.head, len(lots_qty)
+        cost = 0
+
+        # Same consumption rules as FIFOTracker.process, including short lots
+        while qty > 0 and head < end:
+            lot_qty = lots_qty[head]
+            take = lot_qty if lot_qty < qty else qty
+            take_cost = take * lots_price[head]
+            cost += take_cost
+            self.total_qty -= take
+            if lot_qty > 0:
+                self.positive_qty -= take
+                self.positive_cost -= take_cost
+            if take < lot_qty:
+                lots_qty[head] = lot_qty - take
+            else:
+                head += 1
+            qty -= take
+        self.head = head
+
+        short_qty = max(qty, 0)
+        if short_qty:
+            # Short sale: negative lot at the front, cost basis = proceeds
+            self._push_front(-short_qty, price)
+            self.total_qty -= short_qty
+            cost += short_qty * price
+
+        if self.head > _LOT_COMPACT_THRESHOLD and self.head * 2 > len(lots_qty):
+            del lots_qty[:self.head]
+            del lots_price[:self.head]
+            self.head = 0
+        return cost, short_qty
+
+    def _push_front(self, qty: int, price: int) -> None:
+        if self.head > 0:
+            self.head -= 1
+            self.qty[self.head] = qty
+            self.price[self.head] = price
+        else:
+            self.qty.insert(0, qty)
+            self.price.insert(0, price)
+
+
+class FIFOLotEngine:
+    """
+    Columnar FIFO cost basis engine.
+
+    Produces the same ledger as FIFOTracker.to_dataframe(), but takes whole
+    columns at once, keeps lots as wei-scaled integers and maintains running
+    position totals per (fund_id, wallet, asset), so large wallets are
+    processed in linear time.
+
+    Quantities are held at wei resolution (1e-18); amounts finer than that
+    (which cannot come from on-chain values) are rounded half-even.
+    """
+
+    def __init__(self):
+        """Initialize engine with no open lots."""
+        self.lots: Dict[Tuple[str, str, str], _LotQueue] = {}
+
+    def process_frame(self, df: pd.DataFrame, log: bool = True,
+                      skip_invalid: bool = False) -> pd.DataFrame:
+        """
+        Process transactions in row order.
+
+        Args:
+            df: Columns fund_id, wallet_address, asset, date, hash, side, qty,
+                unit_price_eth and optionally price_eth (already sorted)
+            log: Build and return the ledger; False only updates positions
+            skip_invalid: Skip rows with non-numeric amounts instead of raising
+
+        Returns:
+            Ledger with FIFOTracker.to_dataframe() columns (empty if log=False)
+        """
+        n = len(df)
+        if n == 0:
+            return pd.DataFrame()
+
+        qty_fixed, qty_float = _to_fixed(df['qty'], QTY_DECIMALS, absolute=True)
+        price_fixed, price_float = _to_fixed(df['unit_price_eth'], PRICE_DECIMALS)
+        valid = np.array([q is not None and p is not None for q, p in zip(qty_fixed, price_fixed)],
+                         dtype=bool)
+        if not valid.all():
+            bad = df['hash'].astype(str).to_numpy()[~valid]
+            if not skip_invalid:
+                raise ValueError(f"Invalid qty/unit_price_eth for {len(bad)} rows, e.g. {bad[0]}")
+            logger.error(f"Skipping {len(bad)} rows with invalid amounts, e.g. {bad[0]}")
+            df = df[valid]
+            qty_fixed = [q for q, ok in zip(qty_fixed, valid) if ok]
+            price_fixed = [p for p, ok in zip(price_fixed, valid) if ok]
+            qty_float, price_float = qty_float[valid], price_float[valid]
+            n = len(df)
+            if n == 0:
+                return pd.DataFrame()
+
+        fund_ids = df['fund_id'].astype(str)
+        wallets = df['wallet_address'].astype(str)
+        assets = df['asset'].astype(str)
+        sides = df['side'].astype(str).str.lower().to_numpy()
+
+        # One lot queue per normalized key, looked up once per distinct key
+        keys = pd.MultiIndex.from_arrays([
+            fund_ids.str.lower(), wallets.str.lower(), assets.str.upper()
+        ])
+        key_codes, unique_keys = pd.factorize(keys)
+        queues = [self.lots.setdefault(tuple(k), _LotQueue()) for k in unique_keys]
+
+        amounts = [0] * n
+        proceeds = [0] * n
+        cost_sold = [0] * n
+        remaining_qty = [0] * n
+        remaining_cost = [0] * n
+
+        for i, code in enumerate(key_codes.tolist()):
+            queue = queues[code]
+            side = sides[i]
+            qty, price = qty_fixed[i], price_fixed[i]
+            amount = qty * price
+            amounts[i] = amount
+            if side == 'buy':
+                queue.buy(qty, price)
+            elif side == 'sell':
+                proceeds[i] = amount
+                cost_sold[i], short_qty = queue.sell(qty, price)
+                if short_qty:
+                    logger.warning(f"Short sale: {Decimal(short_qty).scaleb(-QTY_DECIMALS)} "
+                                   f"{unique_keys[code][2]} @ {price_float[i]} ETH per token")
+            remaining_qty[i] = queue.total_qty
+            remaining_cost[i] = queue.positive_cost
+
+        if not log:
+            return pd.DataFrame()
+
+        if 'price_eth' in df.columns:
+            price_eth = pd.to_numeric(df['price_eth'], errors='coerce').to_numpy(dtype=float)
+        else:
+            price_eth = np.zeros(n)
+
+        ledger = pd.DataFrame({
+            'fund_id': fund_ids.to_numpy(),
+            'wallet_address': wallets.to_numpy(),
+            'asset': assets.to_numpy(),
+            'date': _naive_dates(df['date']),
+            'hash': df['hash'].astype(str).to_numpy(),
+            'side': sides,
+            'qty': qty_float,
+            'amount (eth)': [a / COST_SCALE for a in amounts],
+            'price_eth': price_eth,
+            'unit_price_eth': price_float,
+            'proceeds_eth': [p / COST_SCALE for p in proceeds],
+            'cost_basis_sold_eth': [c / COST_SCALE for c in cost_sold],
+            'realized_gain_eth': [(p - c) / COST_SCALE for p, c in zip(proceeds, cost_sold)],
+            'remaining_qty': [q / QTY_SCALE for q in remaining_qty],
+            'remaining_cost_basis_eth': [c / COST_SCALE for c in remaining_cost],
+        })
+        return ledger[LEDGER_COLUMNS]
+
+    def get_current_position(self, fund_id: str, wallet: str, asset: str) -> Dict[str, float]:
+        """
+        Get current position for a specific asset/wallet/fund combination.
+
+        Same result as FIFOTracker.get_current_position.
+        """
+        queue = self.lots.get((fund_id.lower(), wallet.lower(), asset.upper()), _LotQueue())
+        avg_unit_price_eth = (
+            queue.positive_cost / (queue.positive_qty * 10 ** PRICE_DECIMALS)
+            if queue.positive_qty > 0 else 0.0
+        )
+        return {
+            "asset": asset,
+            "qty": queue.total_qty / QTY_SCALE,
+            "cost_basis_eth": queue.positive_cost / COST_SCALE,
+            "avg_unit_price_eth": avg_unit_price_eth,
+            "lot_count": len(queue),
+        }
+
+    def get_all_positions(self) -> pd.DataFrame:
+        """
+        Get all current positions as DataFrame.
+
+        Returns:
+            DataFrame with current positions for all assets
+        """
+        positions = []
+        for (fund_id, wallet, asset), queue in self.lots.items():
+            if len(queue):
+                positions.append({
+                    "fund_id": fund_id,
+                    "wallet_address": wallet,
+                    **self.get_current_position(fund_id, wallet, asset)
+                })
+        return pd.DataFrame(positions)
+
+
+def _naive_dates(dates: pd.Series) -> Any:
+    """Dates with any timezone dropped, as FIFOTracker logs them"""
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        return dates.dt.tz_localize(None).to_numpy()
+    if pd.api.types.is_datetime64_dtype(dates.dtype):
+        return dates.to_numpy()
+
+    def naive(date):
+        if hasattr(date, 'tz_localize'):
+            return date.tz_localize(None) if date.tzinfo is not None else date
+        if hasattr(date, 'replace'):
+            return date.replace(tzinfo=None) if date.tzinfo is not None else date
+        return date
+
+    return [naive(d) for d in dates]
+
+
+def _prepare_fifo_input(df_input: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validate ledger input, derive qty / unit_price_eth / price_eth and sort by date.
+
+    Adds the derived columns to df_input in place, as build_fifo_ledger always has.
     """
-    logger.info(f"Building FIFO ledger for {len(df_input)} transactions")
-    
     # Ensure we have required columns
     required_cols = ['fund_id', 'wallet_address', 'asset', 'date', 'hash', 'side']
     missing_cols = [col for col in required_cols if col not in df_input.columns]
     if missing_cols:
         raise ValueError(f"Missing required columns: {missing_cols}")
-    
+
     # Calculate unit_price_eth if not present
     if 'unit_price_eth' not in df_input.columns:
         if 'token_value_eth' in df_input.columns and 'token_amount' in df_input.columns:
@@ -288,32 +574,67 @@ def build_fifo_ledger(df_input: pd.DataFrame) -> pd.DataFrame:
             valid_amounts = df_input['token_amount'].abs() > 0
             df_input['unit_price_eth'] = 0.0
             df_input.loc[valid_amounts, 'unit_price_eth'] = (
-                df_input.loc[valid_amounts, 'token_value_eth'].abs() / 
+                df_input.loc[valid_amounts, 'token_value_eth'].abs() /
                 df_input.loc[valid_amounts, 'token_amount'].abs()
             )
         else:
             raise ValueError("Need either unit_price_eth or (token_value_eth, token_amount) columns")
-    
+
     # Calculate qty with proper sign based on side
     if 'qty' not in df_input.columns:
         if 'token_amount' in df_input.columns:
-            df_input['qty'] = df_input.apply(
-                lambda row: abs(row['token_amount']) if row['side'].lower() == 'buy' 
-                else -abs(row['token_amount']), 
-                axis=1
-            )
+            amount = df_input['token_amount'].abs()
+            is_buy = df_input['side'].astype(str).str.lower() == 'buy'
+            df_input['qty'] = amount.where(is_buy, -amount)
         else:
             raise ValueError("Need either qty or token_amount column")
-    
+
     # Get ETH/USD price if available
     price_eth_col = 'price_eth' if 'price_eth' in df_input.columns else 'eth_usd_price'
     if price_eth_col not in df_input.columns:
         df_input['price_eth'] = 0.0  # Will need to fetch from blockchain if needed
     else:
         df_input['price_eth'] = df_input[price_eth_col]
-    
+
     # Sort by date for chronological processing
-    df_input = df_input.sort_values('date').reset_index(drop=True)
+    return df_input.sort_values('date').reset_index(drop=True)
+
+
+def build_fifo_ledger(df_input: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build FIFO ledger from transaction data using ETH-based cost basis.
+    
+    Expected input columns:
+    - fund_id, wallet_address, asset, date, hash, side
+    - token_amount, token_value_eth (from crypto_fetch)
+    - OR qty, unit_price_eth (pre-calculated)
+    
+    Returns:
+        DataFrame with FIFO calculations and required output columns
+    """
+    logger.info(f"Building FIFO ledger for {len(df_input)} transactions")
+
+    df_input = _prepare_fifo_input(df_input)
+    df_result = FIFOLotEngine().process_frame(df_input)
+    if df_result.empty:
+        return df_result
+
+    # Filter out zero quantity transactions
+    df_result = df_result[df_result["qty"] != 0]
+
+    logger.info(f"FIFO ledger complete: {len(df_result)} transactions processed")
+
+    return df_result
+
+
+def build_fifo_ledger_reference(df_input: pd.DataFrame) -> pd.DataFrame:
+    """
+    Row-by-row FIFOTracker version of build_fifo_ledger.
+
+    Kept as the reference implementation for tests and benchmarks; it is
+    quadratic in the number of open lots.
+    """
+    df_input = _prepare_fifo_input(df_input)
     
     # Initialize tracker
     tracker = FIFOTracker()
@@ -353,8 +674,6 @@ def build_fifo_ledger(df_input: pd.DataFrame) -> pd.DataFrame:
     # Filter out zero quantity transactions
     df_result = df_result[df_result["qty"] != 0]
     
-    logger.info(f"FIFO ledger complete: {len(df_result)} transactions processed")
-    
     return df_result
 
 
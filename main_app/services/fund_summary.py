@@ -0,0 +1,273 @@
+"""
+Fund Summary - materialized dashboard aggregates of the general ledger
+
+The home and summary dashboards show a couple of dozen figures (portfolio
+value, loan / NFT / crypto counts, entry counts, category balances, monthly
+income trend, recent transactions). Computed from the ledger they each
+filter, merge and group every journal line on every render.
+
+FundSummaryCube holds what they are all derived from:
+
+- daily: debits, credits and line counts per (fund, account, UTC day)
+- recent: the latest journal lines
+
+and answers slices of it (balances of a set of accounts over a date range,
+counts, monthly activity) from a few thousand aggregate rows instead of the
+ledger. Slices and anything derived from a cube (see memo) are computed once
+per ledger version and shared by all sessions.
+
+FundSummary keeps the cube of a partitioned GL store current. Each (fund,
+month) partition is summarized separately and remembered with its content
+fingerprint, so after new postings only the partitions they touched are read
+and summarized again; the rest of the cube is reused.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dataset_cache import DATASET_CACHE_CHECK_SECONDS
+from .gl_store import GLStore, partition_state, to_utc
+
+logger = logging.getLogger(__name__)
+
+# Columns the cube is built from
+SUMMARY_COLUMNS = ["date", "fund_id", "account_name", "debit_crypto", "credit_crypto"]
+
+# Latest journal lines kept for the recent transactions list
+RECENT_ROWS = 10
+
+_DAILY_COLUMNS = ["fund_id", "account_name", "day", "debit", "credit", "entries"]
+
+
+def _amounts(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors="coerce").fillna(0).astype("float64").to_numpy()
+
+
+def _utc_day(value) -> pd.Timestamp:
+    """Midnight UTC of the day value falls on (naive values are taken as UTC)."""
+    stamp = pd.Timestamp(value)
+    stamp = stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp.tz_convert("UTC")
+    return stamp.floor("D")
+
+
+def _empty_daily() -> pd.DataFrame:
+    return pd.DataFrame({
+        "fund_id": pd.Series(dtype=object),
+        "account_name": pd.Series(dtype=object),
+        "day": pd.Series(dtype="datetime64[ns, UTC]"),
+        "debit": pd.Series(dtype="float64"),
+        "credit": pd.Series(dtype="float64"),
+        "entries": pd.Series(dtype="int64"),
+    })
+
+
+def summarize(gl: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Aggregate journal lines into the cube's pieces.
+
+    Args:
+        gl: Journal lines with (some of) SUMMARY_COLUMNS
+
+    Returns:
+        (daily, recent): totals per (fund, account, day) and the RECENT_ROWS
+        latest lines (undated lines last)
+    """
+    if gl.empty:
+        return _empty_daily(), pd.DataFrame(columns=["date", "fund_id", "account_name", "debit", "credit"])
+
+    n = len(gl)
+    dates = to_utc(gl["date"]) if "date" in gl.columns else pd.Series(pd.NaT, index=gl.index, dtype="datetime64[ns, UTC]")
+    frame = pd.DataFrame({
+        "fund_id": gl["fund_id"].astype(object) if "fund_id" in gl.columns else np.full(n, None, dtype=object),
+        "account_name": gl["account_name"].astype(object) if "account_name" in gl.columns else np.full(n, None, dtype=object),
+        "date": dates.to_numpy(),
+        "debit": _amounts(gl["debit_crypto"]) if "debit_crypto" in gl.columns else np.zeros(n),
+        "credit": _amounts(gl["credit_crypto"]) if "credit_crypto" in gl.columns else np.zeros(n),
+    })
+    frame["day"] = frame["date"].dt.floor("D")
+
+    daily = (frame.groupby(["fund_id", "account_name", "day"], dropna=False, sort=False)
+             .agg(debit=("debit", "sum"), credit=("credit", "sum"), entries=("debit", "size"))
+             .reset_index())
+    recent = (frame.sort_values("date", ascending=False, na_position="last", kind="stable")
+              .head(RECENT_ROWS)[["date", "fund_id", "account_name", "debit", "credit"]]
+              .reset_index(drop=True))
+    return daily[_DAILY_COLUMNS], recent
+
+
+class FundSummaryCube:
+    """
+    Immutable dashboard aggregates of one ledger version.
+
+    Args:
+        daily: Totals per (fund, account, day), see summarize
+        recent: Latest journal lines, see summarize
+        version: Ledger version the cube was built from
+    """
+
+    def __init__(self, daily: pd.DataFrame, recent: pd.DataFrame, version: Hashable = None):
+        self.daily = daily.reset_index(drop=True)
+        self.recent = recent.reset_index(drop=True)
+        self.version = version
+        self._memo: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_gl(cls, gl: pd.DataFrame, version: Hashable = None) -> "FundSummaryCube":
+        """Cube of a whole ledger frame (for ledgers not kept in a GLStore)."""
+        return cls(*summarize(gl), version=version)
+
+    @classmethod
+    def combine(cls, parts: Iterable[Tuple[pd.DataFrame, pd.DataFrame]], version: Hashable = None) -> "FundSummaryCube":
+        """Cube of several partitions' (daily, recent) summaries."""
+        parts = list(parts)
+        daily = [d for d, _ in parts if not d.empty]
+        recent = [r for _, r in parts if not r.empty]
+        daily = pd.concat(daily, ignore_index=True) if daily else _empty_daily()
+        if recent:
+            recent = (pd.concat(recent, ignore_index=True)
+                      .sort_values("date", ascending=False, na_position="last", kind="stable")
+                      .head(RECENT_ROWS))
+        else:
+            recent = pd.DataFrame(columns=["date", "fund_id", "account_name", "debit", "credit"])
+        return cls(daily, recent, version)
+
+    def memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """compute() once per cube; later calls with key return the same result."""
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = compute()
+        with self._lock:
+            return self._memo.setdefault(key, value)
+
+    # ------------------------------------------------------------------
+    # Slices
+    # ------------------------------------------------------------------
+
+    def fund(self, fund_id: Optional[str]) -> "FundSummaryCube":
+        """
+        The cube of one fund (this cube if fund_id is None). Its recent
+        lines are the fund's among this cube's, so there may be fewer.
+        """
+        if fund_id is None:
+            return self
+
+        def build():
+            return FundSummaryCube(self.daily[self.daily["fund_id"] == fund_id],
+                                   self.recent[self.recent["fund_id"] == fund_id], self.version)
+
+        return self.memo(("fund", fund_id), build)
+
+    def _window(self, start=None, end=None) -> pd.DataFrame:
+        daily = self.daily
+        if start is None and end is None:
+            return daily
+        mask = daily["day"].notna()
+        if start is not None:
+            mask &= daily["day"] >= _utc_day(start)
+        if end is not None:
+            mask &= daily["day"] <= _utc_day(end)
+        return daily[mask]
+
+    def accounts(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Debits, credits and line counts per account, over the days from
+        start to end (inclusive; default: all lines, undated ones included).
+        """
+        def build():
+            return (self._window(start, end)
+                    .groupby("account_name", sort=True)[["debit", "credit", "entries"]].sum())
+
+        return self.memo(("accounts", start, end), build)
+
+    def totals(self, account_names: Optional[Iterable[str]] = None, start=None, end=None) -> Tuple[float, float]:
+        """(debits, credits) of the given accounts (default: all) between start and end."""
+        accounts = self.accounts(start, end)
+        if account_names is not None:
+            accounts = accounts[accounts.index.isin(list(account_names))]
+        return float(accounts["debit"].sum()), float(accounts["credit"].sum())
+
+    def entries(self, start=None, end=None) -> int:
+        """Number of journal lines between start and end (default: all)."""
+        return int(self._window(start, end)["entries"].sum())
+
+    def monthly(self, account_names: Iterable[str]) -> pd.DataFrame:
+        """Debits and credits of the given accounts per month ('YYYY-MM' index), dated lines only."""
+        daily = self.daily[self.daily["account_name"].isin(list(account_names)) & self.daily["day"].notna()]
+        months = daily["day"].dt.strftime("%Y-%m")
+        return daily.groupby(months)[["debit", "credit"]].sum()
+
+    def months(self) -> list:
+        """Months ('YYYY-MM') with any dated journal line, in order."""
+        return self.memo("months", lambda: sorted(self.daily["day"].dropna().dt.strftime("%Y-%m").unique()))
+
+    def recent_transactions(self, n: int = RECENT_ROWS) -> pd.DataFrame:
+        """The n latest journal lines (date, fund_id, account_name, debit, credit)."""
+        return self.recent.head(n)
+
+
+class FundSummary:
+    """
+    Keeps the FundSummaryCube of a GLStore current.
+
+    Args:
+        store: Partitioned ledger to summarize
+        check_seconds: Serve the cube this long before looking at the
+            manifest again
+    """
+
+    def __init__(self, store: GLStore, check_seconds: float = DATASET_CACHE_CHECK_SECONDS):
+        self.store = store
+        self.check_seconds = check_seconds
+        self._parts: Dict[str, Tuple[Tuple[int, int], Tuple[pd.DataFrame, pd.DataFrame]]] = {}
+        self._cube = FundSummaryCube.combine([])
+        self._checked = None
+        self._lock = threading.Lock()
+        self.stats = {"refreshes": 0, "partitions_summarized": 0, "partitions_reused": 0}
+
+    def cube(self) -> FundSummaryCube:
+        """The current cube, refreshed from the store if it may be stale."""
+        with self._lock:
+            if self._checked is not None and time.monotonic() - self._checked < self.check_seconds:
+                return self._cube
+            self._refresh()
+            self._checked = time.monotonic()
+            return self._cube
+
+    def invalidate(self):
+        """Look at the store again on the next cube() (call after posting)."""
+        with self._lock:
+            self._checked = None
+
+    def _refresh(self):
+        manifest = self.store.manifest()
+        if self._checked is not None and manifest.get("version") == self._cube.version:
+            return
+
+        states = {label: partition_state(partition) for label, partition in manifest["partitions"].items()}
+        changed = [label for label, state in states.items()
+                   if label not in self._parts or self._parts[label][0] != state]
+        removed = [label for label in self._parts if label not in states]
+
+        for label in removed:
+            del self._parts[label]
+        for label in changed:
+            rows = self.store.read_partition(label, SUMMARY_COLUMNS, manifest)
+            self._parts[label] = (states[label], summarize(rows))
+
+        self.stats["refreshes"] += 1
+        self.stats["partitions_summarized"] += len(changed)
+        self.stats["partitions_reused"] += len(states) - len(changed)
+        if changed or removed or self._cube.version is None:
+            self._cube = FundSummaryCube.combine((self._parts[label][1] for label in sorted(self._parts)),
+                                                 version=manifest.get("version"))
+            logger.info(f"Fund summary of {self.store.prefix}: {len(changed)} partitions summarized, "
+                        f"{len(removed)} dropped, {len(states) - len(changed)} reused")
+        else:
+            self._cube.version = manifest.get("version")
@@ -0,0 +1,128 @@
+"""
+GL Amounts - typed fixed-point amount columns for the general ledger
+
+The Decimal loaders apply s3_utils.safe_to_decimal to every cell of 11-14
+financial columns, which leaves object columns that every trial balance, NAV
+and PCAP aggregation then walks at Python speed. The typed mode keeps amounts
+as Arrow decimal128 columns with 18 decimal places (wei precision for crypto,
+and more than enough for USD): cleaning is vectorized, sums and group-bys run
+natively and exactly, and values become Python Decimals only where a report
+needs them (to_decimals / sum_pivot).
+
+Cleaning matches safe_to_decimal: nulls, blanks and 'nan'/'none'/'null'/'na'
+become 0, text that is not a number keeps only its digits, '.' and '-', and
+anything still unparseable becomes 0. Floats are read through their shortest
+repr, exactly as str(value) does. Two deliberate differences: non-finite
+values become 0, and digits beyond the 18th decimal place (float noise) are
+rounded half-even.
+"""
+
+import logging
+from decimal import Decimal
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+AMOUNT_SCALE = 18
+
+# 18 integer digits; leaves headroom for debit - credit (37) and sums (38)
+AMOUNT_TYPE = pa.decimal128(36, AMOUNT_SCALE)
+AMOUNT_DTYPE = pd.ArrowDtype(AMOUNT_TYPE)
+
+# What Decimal() accepts for a finite number, once lowercased and trimmed
+_NUMBER_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?$'
+_NULL_LIKE = pa.array(['', 'nan', 'none', 'null', 'na'])
+_WIDE_TYPE = pa.decimal256(76, 38)
+
+
+def is_amount_column(values) -> bool:
+    """True if values is a Series/array already holding typed amounts."""
+    dtype = getattr(values, 'dtype', None)
+    return isinstance(dtype, pd.ArrowDtype) and pa.types.is_decimal(dtype.pyarrow_dtype)
+
+
+def _clean_text(text: pa.Array) -> pa.Array:
+    """Vectorized form of the string handling in safe_to_decimal."""
+    text = pc.utf8_lower(pc.utf8_trim_whitespace(text))
+    text = pc.if_else(pc.is_in(text, value_set=_NULL_LIKE), '0', text).fill_null('0')
+
+    # Not a number as written: keep digits, '.' and '-' and try again
+    stripped = pc.replace_substring_regex(text, pattern=r'[^0-9.\-]', replacement='')
+    stripped = pc.if_else(pc.match_substring_regex(stripped, _NUMBER_PATTERN), stripped, '0')
+    return pc.if_else(pc.match_substring_regex(text, _NUMBER_PATTERN), text, stripped)
+
+
+def _parse(text: pa.Array) -> pa.Array:
+    """Decimal strings to AMOUNT_TYPE, rounding anything past 18 places."""
+    try:
+        return text.cast(AMOUNT_TYPE)
+    except pa.ArrowInvalid:
+        # Some value carries more than 18 decimal places; parse wide and round
+        wide = text.cast(_WIDE_TYPE)
+        rounded = pc.round(wide, ndigits=AMOUNT_SCALE, round_mode='half_to_even')
+        try:
+            return rounded.cast(AMOUNT_TYPE)
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"GL amount outside the typed range (|x| < 1e18): {e}") from e
+
+
+def to_amounts(values: Union[pd.Series, list, np.ndarray]) -> pd.Series:
+    """
+    Convert a column to typed amounts without touching cells one by one.
+
+    Args:
+        values: float, int, string or Decimal-object column
+
+    Returns:
+        Series of dtype AMOUNT_DTYPE with the same index and name
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if is_amount_column(series):
+        return series
+
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        floats = series.to_numpy(dtype='float64', na_value=np.nan)
+        floats = np.where(np.isfinite(floats), floats, 0.0)
+        # Arrow formats floats with their shortest round-trip repr, like str()
+        text = pa.array(floats).cast(pa.string())
+    else:
+        strings = series.astype(str).to_numpy(dtype=object, na_value=None)
+        text = _clean_text(pa.array(strings, type=pa.string(), from_pandas=True))
+
+    amounts = pd.arrays.ArrowExtensionArray(_parse(text))
+    return pd.Series(amounts, index=series.index, name=series.name)
+
+
+def to_decimals(values: pd.Series) -> pd.Series:
+    """Object column of Decimal for presentation/export; other columns pass through."""
+    if not is_amount_column(values):
+        return values
+    return values.astype(object)
+
+
+def to_floats(values: pd.Series) -> pd.Series:
+    """float64 column, each value the correctly rounded float of the exact amount."""
+    if not is_amount_column(values):
+        return values
+    return to_decimals(values).map(float).astype('float64')
+
+
+def sum_pivot(df: pd.DataFrame, index: List[str], columns: str, values: str) -> pd.DataFrame:
+    """
+    Sum values into an index x columns grid of Decimals.
+
+    Same result as df.pivot_table(index=index, columns=columns, values=values,
+    aggfunc='sum', fill_value=Decimal(0)); typed amounts are summed natively
+    first, so only the cells of the grid are converted to Decimal.
+    """
+    if not is_amount_column(df[values]):
+        return df.pivot_table(index=index, columns=columns, values=values,
+                              aggfunc='sum', fill_value=Decimal(0))
+
+    sums = df.groupby(index + [columns], observed=True)[values].sum()
+    return to_decimals(sums).unstack(columns, fill_value=Decimal(0))
@@ -0,0 +1,371 @@
+"""
+GL Row-Key Index - persistent dedup index for idempotent GL posting
+
+Posting decoded transactions must skip journal lines that are already in the
+ledger. Checking that against the ledger itself means loading every line and
+building its row key on every click, so posting cost grows with the ledger.
+
+GLRowKeyIndex keeps the row keys of a partitioned GL store in a sidecar next
+to it, one sorted key file set per (fund, month) partition:
+
+    <gl prefix>_row_keys/_index.json
+    <gl prefix>_row_keys/fund_id=<fund>/month=<YYYY-MM>/keys-<stamp>-<id>.parquet
+
+Each partition's keys are stored as (key_hash, row_key) sorted by the uint64
+hash, and the index records the partition state (rows, content fingerprint,
+see gl_store.partition_state) its keys were taken from.
+
+- post() probes a batch's keys against the in-memory sorted arrays (binary
+  search on the hash, then an exact key comparison), O(batch) work per
+  partition independent of the ledger size, and appends only the new rows.
+- Appended rows go to the store as segments; their keys are written as one
+  small key file per partition touched.
+- Before every probe the index compares its recorded states with the store
+  manifest. Partitions that were edited, replaced, appended to by another
+  process or are new since are re-keyed from the ledger; this is also how the
+  index is built the first time. Compaction keeps the state, so it does not
+  trigger a rebuild.
+
+The sidecar is a cache of the ledger: it is written without conditions and
+any partition whose keys are missing or unreadable is rebuilt from the GL.
+"""
+
+import json
+import uuid
+import logging
+import threading
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .gl_store import GLStore, fingerprint, partition_labels, partition_state, row_hashes, _combine
+from .parquet_io import to_parquet_bytes
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = "_row_keys/"
+INDEX_NAME = "_index.json"
+# 2: stored row keys are normalised (see _canonical_keys)
+INDEX_FORMAT = 2
+
+# Key files per partition before they are merged into one
+INDEX_COMPACT_MIN_FILES = 16
+
+# Columns a row key is built from (row_key, when set, is the key itself)
+KEY_COLUMNS = ["hash", "account_name", "transaction_type", "debit_crypto", "credit_crypto", "row_key"]
+
+
+def _text(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[column].fillna("").astype(str)
+
+
+def _amount(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series("0.0", index=df.index, dtype=object)
+    return pd.to_numeric(df[column], errors="coerce").astype("float64").fillna(0.0).astype(str)
+
+
+# A key ending in :<debit>:<credit> (any number format, or a missing amount)
+_NUMBER = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|nan|NaN|None"
+_AMOUNT_FIELDS = rf"^(?P<head>.*):(?P<debit>{_NUMBER}):(?P<credit>{_NUMBER})$"
+
+
+def _canonical_keys(keys: pd.Series) -> pd.Series:
+    """
+    Stored row keys with their debit/credit fields in the float64 format.
+
+    Lines posted before the index carry keys built from the raw amounts
+    (e.g. ...:0.123456789012345678:0 from Decimals); rewritten this way they
+    equal the key generated for the same line now (...:0.12345678901234568:0.0).
+    Keys not ending in two amounts (e.g. accrual keys ending in :DR) are kept.
+    """
+    parts = keys.str.extract(_AMOUNT_FIELDS)
+    matched = parts["head"].notna()
+    if not matched.any():
+        return keys
+    parts = parts[matched]
+    # float() parses exactly; to_numeric on strings can be off by an ulp
+    amounts = [parts[field].map(lambda v: 0.0 if v in ("nan", "NaN", "None") else float(v))
+               .astype("float64").astype(str) for field in ("debit", "credit")]
+    keys = keys.copy()
+    keys[matched] = parts["head"] + ":" + amounts[0] + ":" + amounts[1]
+    return keys
+
+
+def gl_row_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    Deterministic dedup key of every GL line.
+
+    A line's row_key column is used when set (interest accruals and GL2
+    lines carry one); otherwise the key is hash:account:type:debit:credit,
+    with amounts formatted as float64 so a line hashes the same before and
+    after it was stored (Decimal on the way in, float64 in parquet). Amounts
+    in a stored row_key are brought to the same format.
+    """
+    generated = (_text(df, "hash") + ":" + _text(df, "account_name") + ":" + _text(df, "transaction_type")
+                 + ":" + _amount(df, "debit_crypto") + ":" + _amount(df, "credit_crypto"))
+    given = _text(df, "row_key")
+    given = given.mask(given != "", _canonical_keys(given))
+    return np.where(given != "", given, generated).astype(object)
+
+
+def _hash_keys(keys: np.ndarray) -> np.ndarray:
+    return pd.util.hash_array(np.asarray(keys, dtype=object)).astype("uint64")
+
+
+def _sorted_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(hashes, keys) sorted by hash"""
+    hashes = _hash_keys(keys)
+    order = np.argsort(hashes, kind="stable")
+    return hashes[order], np.asarray(keys, dtype=object)[order]
+
+
+def _contains(hashes: np.ndarray, keys: np.ndarray, probe_hashes: np.ndarray, probe_keys: np.ndarray) -> np.ndarray:
+    """Which probe keys are in one partition's sorted (hashes, keys)"""
+    found = np.zeros(len(probe_keys), dtype=bool)
+    if not len(hashes):
+        return found
+    left = np.searchsorted(hashes, probe_hashes, side="left")
+    right = np.searchsorted(hashes, probe_hashes, side="right")
+    for i in np.flatnonzero(right > left):
+        # Equal hashes: compare the keys themselves
+        found[i] = probe_keys[i] in keys[left[i]:right[i]]
+    return found
+
+
+class GLRowKeyIndex:
+    """
+    Row keys of a GLStore, kept beside it and updated with every append.
+
+    Args:
+        store: Partitioned ledger to index
+        compact_min_files: Key files per partition before they are merged
+    """
+
+    def __init__(self, store: GLStore, compact_min_files: int = INDEX_COMPACT_MIN_FILES):
+        self.store = store
+        self.prefix = store.prefix + INDEX_DIR
+        self.index_key = self.prefix + INDEX_NAME
+        self.compact_min_files = compact_min_files
+
+        # label -> (state, key file keys, sorted hashes, keys)
+        self._parts: Dict[str, Tuple[Tuple[int, int], Tuple[str, ...], np.ndarray, np.ndarray]] = {}
+        self._lock = threading.RLock()
+        self.stats = {"syncs": 0, "partitions_rebuilt": 0, "keys_probed": 0, "keys_added": 0}
+
+    # ------------------------------------------------------------------
+    # Sidecar files
+    # ------------------------------------------------------------------
+
+    def _get_index(self) -> Dict[str, Any]:
+        try:
+            obj = self.store.s3.get_object(Bucket=self.store.bucket, Key=self.index_key)
+        except self.store.s3.exceptions.NoSuchKey:
+            return {"format": INDEX_FORMAT, "partitions": {}}
+        index = json.loads(obj["Body"].read().decode("utf-8"))
+        return index if index.get("format") == INDEX_FORMAT else {"format": INDEX_FORMAT, "partitions": {}}
+
+    def _put_index(self) -> None:
+        index = {
+            "format": INDEX_FORMAT,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "partitions": {label: {"rows": state[0], "fingerprint": state[1], "files": list(files)}
+                           for label, (state, files, _, _) in self._parts.items()},
+        }
+        self.store.s3.put_object(Bucket=self.store.bucket, Key=self.index_key,
+                                 Body=json.dumps(index, separators=(",", ":")).encode("utf-8"),
+                                 ContentType="application/json")
+
+    def _write_keys(self, label: str, hashes: np.ndarray, keys: np.ndarray) -> str:
+        fund, month = label.split("/", 1)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        key = f"{self.prefix}fund_id={fund}/month={month}/keys-{stamp}-{uuid.uuid4().hex[:12]}.parquet"
+        frame = pd.DataFrame({"key_hash": hashes, "row_key": keys})
+        self.store.s3.put_object(Bucket=self.store.bucket, Key=key, Body=to_parquet_bytes(frame))
+        return key
+
+    def _read_keys(self, files: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        frames = []
+        for key in files:
+            body = self.store.s3.get_object(Bucket=self.store.bucket, Key=key)["Body"].read()
+            frames.append(pq.read_table(BytesIO(body)).to_pandas())
+        if not frames:
+            return np.zeros(0, dtype="uint64"), np.zeros(0, dtype=object)
+        frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        hashes = frame["key_hash"].to_numpy(dtype="uint64")
+        keys = frame["row_key"].to_numpy(dtype=object)
+        if len(frames) > 1:
+            order = np.argsort(hashes, kind="stable")
+            hashes, keys = hashes[order], keys[order]
+        return hashes, keys
+
+    def _delete(self, files: Iterable[str]) -> None:
+        for key in files:
+            try:
+                self.store.s3.delete_object(Bucket=self.store.bucket, Key=key)
+            except Exception as e:
+                logger.warning(f"Could not delete GL row-key file {key}: {e}")
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def _rebuild(self, label: str, state: Tuple[int, int], manifest: Dict[str, Any]) -> List[str]:
+        """Re-key one partition from the ledger; returns the key files it replaced"""
+        rows = self.store.read_partition(label, KEY_COLUMNS, manifest)
+        hashes, keys = _sorted_keys(gl_row_keys(rows))
+        replaced = list(self._parts[label][1]) if label in self._parts else []
+        self._parts[label] = (state, (self._write_keys(label, hashes, keys),), hashes, keys)
+        self.stats["partitions_rebuilt"] += 1
+        return replaced
+
+    def _sync(self) -> None:
+        """Bring the index in line with the store manifest, rebuilding partitions that drifted"""
+        manifest = self.store.manifest()
+        states = {label: partition_state(p) for label, p in manifest["partitions"].items()}
+        stored = self._get_index()["partitions"]
+        changed, replaced = False, []
+
+        for label in [label for label in self._parts if label not in states]:
+            replaced.extend(self._parts.pop(label)[1])
+            changed = True
+
+        for label, state in states.items():
+            entry = stored.get(label)
+            stored_state = (entry["rows"], entry["fingerprint"]) if entry else None
+            stored_files = tuple(entry["files"]) if entry else ()
+            current = self._parts.get(label)
+
+            if current is not None and current[0] == state:
+                # Keys in memory are current; rewrite the sidecar if it lags them
+                changed = changed or stored_state != state
+                continue
+            if stored_state == state:
+                # Another process (or an earlier run) keyed this partition
+                try:
+                    hashes, keys = self._read_keys(stored_files)
+                    self._parts[label] = (state, stored_files, hashes, keys)
+                    continue
+                except Exception as e:
+                    logger.warning(f"GL row keys of {label} unreadable ({e}), rebuilding")
+            replaced.extend(self._rebuild(label, state, manifest))
+            changed = True
+
+        # Index entries written by others for partitions we just dropped or
+        # rebuilt are not referenced anymore either
+        live = {key for _, files, _, _ in self._parts.values() for key in files}
+        replaced.extend(key for entry in stored.values() for key in entry.get("files", []) if key not in live)
+
+        self.stats["syncs"] += 1
+        if changed or set(stored) != set(self._parts):
+            self._put_index()
+            self._delete(set(replaced) - live)
+
+    # ------------------------------------------------------------------
+    # Probe / append
+    # ------------------------------------------------------------------
+
+    def contains(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Which rows of df are already in the ledger (by row key).
+
+        Returns:
+            Boolean array aligned with df
+        """
+        with self._lock:
+            self._sync()
+            return self._probe(gl_row_keys(df))
+
+    def _probe(self, keys: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(keys), dtype=bool)
+        if not len(keys):
+            return found
+        probe_hashes = _hash_keys(keys)
+        for _, _, hashes, part_keys in self._parts.values():
+            found |= _contains(hashes, part_keys, probe_hashes, keys)
+        self.stats["keys_probed"] += len(keys)
+        return found
+
+    def new_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of df whose row key is not in the ledger yet"""
+        if df is None or df.empty:
+            return df
+        return df[~self.contains(df)]
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Append rows to the store and add their keys to the index.
+
+        The rows are appended as given (no dedup; see post()).
+
+        Returns:
+            Number of rows appended
+        """
+        if df is None or df.empty:
+            return 0
+        with self._lock:
+            self._sync()
+            return self._append(df)
+
+    def post(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+        """
+        Append the rows of df that are not in the ledger yet.
+
+        Returns:
+            (rows appended, number of rows skipped as already posted)
+        """
+        if df is None or df.empty:
+            return df, 0
+        with self._lock:
+            self._sync()
+            new = df[~self._probe(gl_row_keys(df))]
+            if not new.empty:
+                self._append(new)
+            return new, len(df) - len(new)
+
+    def _append(self, df: pd.DataFrame) -> int:
+        appended = self.store.append(df)
+
+        labels = partition_labels(df, self.store.fund_column, self.store.date_column).to_numpy()
+        hashes = row_hashes(df, (self.store.date_column,))
+        keys = gl_row_keys(df)
+        replaced = []
+        for label in pd.unique(labels):
+            mask = labels == label
+            new_hashes, new_keys = _sorted_keys(keys[mask])
+            state, files, part_hashes, part_keys = self._parts.get(
+                label, ((0, 0), (), np.zeros(0, dtype="uint64"), np.zeros(0, dtype=object)))
+
+            # The state the store reaches with exactly these rows added; if
+            # another writer appended too, the next sync sees the difference
+            expected = (state[0] + int(mask.sum()), _combine([state[1], fingerprint(hashes[mask])]))
+            merged_hashes = np.concatenate([part_hashes, new_hashes])
+            merged_keys = np.concatenate([part_keys, new_keys])
+            order = np.argsort(merged_hashes, kind="stable")
+            merged_hashes, merged_keys = merged_hashes[order], merged_keys[order]
+
+            if len(files) + 1 >= self.compact_min_files:
+                replaced.extend(files)
+                files = (self._write_keys(label, merged_hashes, merged_keys),)
+            else:
+                files = files + (self._write_keys(label, new_hashes, new_keys),)
+            self._parts[label] = (expected, files, merged_hashes, merged_keys)
+
+        self._put_index()
+        self._delete(replaced)
+        self.stats["keys_added"] += len(keys)
+        return appended
+
+    def invalidate(self) -> None:
+        """Forget the in-memory keys (the sidecar is re-read on the next probe)"""
+        with self._lock:
+            self._parts.clear()
+
+    def __len__(self) -> int:
+        return sum(len(keys) for _, _, _, keys in self._parts.values())
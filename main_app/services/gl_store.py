@@ -0,0 +1,694 @@
+"""
+Partitioned General Ledger Store
+
+Append-only S3 layout for the general ledgers, replacing the single parquet
+object that used to be rewritten (and re-downloaded) on every posting.
+
+A ledger stored at ``drip_capital/general_ledger.parquet`` lives under
+``drip_capital/general_ledger/``:
+
+    _manifest.json
+    fund_id=<fund>/month=<YYYY-MM>/seg-<stamp>-<id>.parquet    (appended lines)
+    fund_id=<fund>/month=<YYYY-MM>/part-<stamp>-<id>.parquet   (compacted)
+
+The manifest lists every live file per (fund, month) partition and is the
+only object ever overwritten. It is committed with a conditional put on its
+ETag, so readers always see a complete set of files and concurrent writers
+retry instead of losing each other's lines.
+
+- append() writes one small segment per partition touched by the new rows.
+- replace() takes a whole ledger (the load / edit / save pattern) and only
+  rewrites partitions whose contents changed, detected by an
+  order-insensitive row-hash fingerprint kept in the manifest.
+- Partitions holding many segments are compacted into one file.
+- read() prunes partitions by fund and date range before downloading, and
+  files by the date bounds recorded for each one in the manifest.
+
+Files are written sorted by (fund, date) in row groups of
+parquet_io.ROW_GROUP_ROWS rows. A read that asks for a date range or a
+subset of columns fetches, with ranged GETs, only the row groups whose
+statistics overlap the range and only the requested column chunks.
+
+Data files are immutable, so fully downloaded files are cached in memory
+(selective reads are served from the cache when the file is there) and a
+re-read after a posting only fetches the manifest and the new segment.
+Files dropped by a compaction or rewrite are deleted after a grace period
+so readers holding the previous manifest can finish.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from botocore.exceptions import ClientError
+
+from .parquet_io import S3RangeFile, date_bounds, read_parquet, to_parquet_bytes, worth_reading_selectively
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_FORMAT = 1
+
+# Partition label for rows without a fund or a parseable date
+UNKNOWN_PARTITION = "unknown"
+
+# Compact a partition once it holds this many files
+COMPACT_MIN_FILES = int(os.environ.get("GL_STORE_COMPACT_MIN_FILES", "16"))
+
+# Retired files are deleted this long after the manifest stopped listing them
+RETIRE_GRACE_SECONDS = int(os.environ.get("GL_STORE_RETIRE_GRACE_SECONDS", "3600"))
+
+# Attempts at committing the manifest when another writer got there first
+COMMIT_RETRIES = 8
+
+# In-memory budget for downloaded (immutable) data files
+CACHE_MAX_MB = int(os.environ.get("GL_STORE_CACHE_MB", "512"))
+
+# S3 error codes for a failed conditional put
+_CONFLICT_CODES = {"PreconditionFailed", "ConditionalRequestConflict", "412", "409"}
+
+
+class ManifestConflictError(RuntimeError):
+    """The manifest changed under us more often than COMMIT_RETRIES allows."""
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def dataset_prefix(key: str) -> str:
+    """S3 prefix holding the partitioned form of a legacy single-object key."""
+    base = key[:-len(".parquet")] if key.endswith(".parquet") else key
+    return base.rstrip("/") + "/"
+
+
+def to_utc(values: pd.Series) -> pd.Series:
+    """Parse a date column to UTC timestamps (NaT where unparseable)."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.tz_localize("UTC") if values.dt.tz is None else values.dt.tz_convert("UTC")
+    return pd.to_datetime(values, utc=True, errors="coerce", format="mixed")
+
+
+def partition_labels(df: pd.DataFrame, fund_column: str = "fund_id", date_column: str = "date") -> pd.Series:
+    """
+    Partition label ("<fund>/<YYYY-MM>") for every row.
+
+    Funds are URL-quoted so they are safe in S3 keys; rows without a fund or
+    a parseable date go to the "unknown" fund / month.
+    """
+    n = len(df)
+    if fund_column in df.columns:
+        funds = df[fund_column]
+        valid = funds.notna().to_numpy() & (funds.astype(str).str.strip() != "").to_numpy()
+        fund_codes, fund_values = pd.factorize(funds.astype(str))
+        fund_names = [quote(value, safe="") for value in fund_values] + [UNKNOWN_PARTITION]
+        fund_codes = np.where(valid, fund_codes, len(fund_names) - 1)
+    else:
+        fund_codes, fund_names = np.zeros(n, dtype="int64"), [UNKNOWN_PARTITION]
+
+    if date_column in df.columns:
+        dates = to_utc(df[date_column])
+        months = (dates.dt.year * 100 + dates.dt.month).fillna(0).astype("int64").to_numpy()
+    else:
+        months = np.zeros(n, dtype="int64")
+
+    codes, pairs = pd.factorize(fund_codes.astype("int64") * 1_000_000 + months)
+    names = np.array([
+        f"{fund_names[pair // 1_000_000]}/"
+        + (f"{pair % 1_000_000 // 100:04d}-{pair % 100:02d}" if pair % 1_000_000 else UNKNOWN_PARTITION)
+        for pair in pairs
+    ], dtype=object)
+    return pd.Series(names[codes] if n else [], index=df.index, dtype=object)
+
+
+def row_hashes(df: pd.DataFrame, date_columns: Iterable[str] = ("date",)) -> np.ndarray:
+    """
+    uint64 hash per row, independent of column order and of how the frame
+    was typed on the way in (Decimal vs float amounts, str vs Timestamp
+    dates), so a ledger that was loaded and saved back unchanged hashes the
+    same as what was written.
+    """
+    canonical = {}
+    date_columns = set(date_columns)
+    for col in sorted(df.columns, key=str):
+        values = df[col]
+        if col in date_columns:
+            stamps = to_utc(values)
+            values = pd.Series(stamps.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]").view("int64"))
+        elif pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            values = values.astype("float64")
+        else:
+            numeric = pd.to_numeric(values, errors="coerce")
+            if values.notna().any() and numeric.notna().sum() == values.notna().sum():
+                values = numeric.astype("float64")
+            else:
+                present = values.notna().to_numpy()
+                values = pd.Series(np.where(present, values.astype(str).to_numpy(dtype=object), None), dtype=object)
+        canonical[str(col)] = values.reset_index(drop=True)
+
+    if not canonical:
+        return np.zeros(len(df), dtype="uint64")
+    return pd.util.hash_pandas_object(pd.DataFrame(canonical), index=False).to_numpy(dtype="uint64")
+
+
+def fingerprint(hashes: np.ndarray) -> int:
+    """Order-insensitive content fingerprint: the wrapping sum of row hashes."""
+    return int(hashes.sum(dtype="uint64"))
+
+
+def _combine(fingerprints: Iterable[int]) -> int:
+    return int(sum(fingerprints) % (1 << 64))
+
+
+def partition_state(partition: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    (rows, content fingerprint) of a manifest partition. Equal states mean
+    equal rows, however the partition's files were written or compacted.
+    """
+    files = partition.get("files", [])
+    return sum(f["rows"] for f in files), _combine(f["fingerprint"] for f in files)
+
+
+def _empty_manifest() -> Dict[str, Any]:
+    return {"format": MANIFEST_FORMAT, "version": 0, "partitions": {}, "retired": []}
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class GLStore:
+    """
+    Partitioned, append-only ledger dataset under one S3 prefix.
+
+    Args:
+        key: Legacy single-object key ("...general_ledger.parquet"); the
+            dataset lives next to it and the legacy object, if present, is
+            migrated on first use
+        s3_client: boto3 S3 client
+        bucket: S3 bucket
+        fund_column: Column partitioned on (besides the month)
+        date_column: Column the month is taken from
+    """
+
+    def __init__(
+        self,
+        key: str,
+        s3_client,
+        bucket: str,
+        fund_column: str = "fund_id",
+        date_column: str = "date",
+        compact_min_files: int = COMPACT_MIN_FILES,
+        cache_max_mb: int = CACHE_MAX_MB,
+    ):
+        self.legacy_key = key
+        self.prefix = dataset_prefix(key)
+        self.manifest_key = self.prefix + MANIFEST_NAME
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.fund_column = fund_column
+        self.date_column = date_column
+        self.compact_min_files = compact_min_files
+
+        self._cache: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_max_bytes = cache_max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "files_downloaded": 0,
+            "bytes_downloaded": 0,
+            "files_written": 0,
+            "bytes_written": 0,
+            "cache_hits": 0,
+            "files_read_partially": 0,
+            "commit_conflicts": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def _get_manifest(self) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(manifest, etag), or (None, None) if the dataset does not exist yet."""
+        try:
+            obj = self.s3.get_object(Bucket=self.bucket, Key=self.manifest_key)
+        except self.s3.exceptions.NoSuchKey:
+            return None, None
+        return json.loads(obj["Body"].read().decode("utf-8")), obj.get("ETag")
+
+    def _put_manifest(self, manifest: Dict[str, Any], etag: Optional[str]) -> bool:
+        """Conditionally write the manifest; False if another writer won."""
+        manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=self.manifest_key,
+                Body=json.dumps(manifest, separators=(",", ":")).encode("utf-8"),
+                ContentType="application/json",
+                **condition,
+            )
+            return True
+        except ClientError as e:
+            code = str(e.response.get("Error", {}).get("Code", ""))
+            status = str(e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", ""))
+            if code in _CONFLICT_CODES or status in _CONFLICT_CODES:
+                self.stats["commit_conflicts"] += 1
+                return False
+            raise
+
+    def manifest(self) -> Dict[str, Any]:
+        """Current manifest, migrating the legacy single object on first use."""
+        manifest, _ = self._load_or_migrate()
+        return manifest
+
+    def _load_or_migrate(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        manifest, etag = self._get_manifest()
+        if manifest is not None:
+            return manifest, etag
+
+        legacy = self._read_legacy()
+        if legacy is None or legacy.empty:
+            return _empty_manifest(), None
+
+        logger.info(f"Migrating {self.legacy_key} ({len(legacy)} rows) to partitioned store {self.prefix}")
+        self.replace(legacy)
+        manifest, etag = self._get_manifest()
+        return manifest or _empty_manifest(), etag
+
+    def _read_legacy(self) -> Optional[pd.DataFrame]:
+        if not self.legacy_key.endswith(".parquet"):
+            return None
+        try:
+            obj = self.s3.get_object(Bucket=self.bucket, Key=self.legacy_key)
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        return pq.read_table(BytesIO(obj["Body"].read())).to_pandas()
+
+    def _commit(self, mutate: Callable[[Dict[str, Any]], Optional[List[str]]]) -> Dict[str, Any]:
+        """
+        Apply mutate() to the latest manifest and commit it, retrying on
+        conflicts. mutate returns the keys of files it removed from the
+        manifest (they are retired, not deleted straight away).
+        """
+        for attempt in range(COMMIT_RETRIES):
+            manifest, etag = self._get_manifest()
+            if manifest is None:
+                manifest = _empty_manifest()
+
+            removed = mutate(manifest) or []
+            now = time.time()
+            retired = manifest.setdefault("retired", [])
+            retired.extend({"key": key, "retired_at": now} for key in removed)
+            expired = [r["key"] for r in retired if now - r["retired_at"] >= RETIRE_GRACE_SECONDS]
+            manifest["retired"] = [r for r in retired if now - r["retired_at"] < RETIRE_GRACE_SECONDS]
+            manifest["version"] = manifest.get("version", 0) + 1
+
+            if self._put_manifest(manifest, etag):
+                for key in expired:
+                    try:
+                        self.s3.delete_object(Bucket=self.bucket, Key=key)
+                    except Exception as e:
+                        logger.warning(f"Could not delete retired GL file {key}: {e}")
+                return manifest
+
+            time.sleep(min(0.05 * 2 ** attempt, 1.0))
+
+        raise ManifestConflictError(f"Could not commit {self.manifest_key} after {COMMIT_RETRIES} attempts")
+
+    # ------------------------------------------------------------------
+    # Data files
+    # ------------------------------------------------------------------
+
+    def _write_file(self, label: str, df: pd.DataFrame, kind: str, hashes: np.ndarray) -> Dict[str, Any]:
+        fund, month = label.split("/", 1)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        key = f"{self.prefix}fund_id={fund}/month={month}/{kind}-{stamp}-{uuid.uuid4().hex[:12]}.parquet"
+
+        frame = df.reset_index(drop=True)
+        dates = to_utc(frame[self.date_column]) if self.date_column in frame.columns else None
+        if dates is not None and len(frame) > 1:
+            # (fund, date) order keeps each row group's date statistics narrow
+            order = np.lexsort((
+                dates.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]"),
+                frame[self.fund_column].astype(str).to_numpy() if self.fund_column in frame.columns
+                else np.zeros(len(frame)),
+            ))
+            frame = frame.take(order).reset_index(drop=True)
+            dates = dates.take(order).reset_index(drop=True)
+        body = to_parquet_bytes(frame)
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=body)
+
+        self.stats["files_written"] += 1
+        self.stats["bytes_written"] += len(body)
+        self._cache_put(key, frame, len(body))
+
+        entry = {"key": key, "kind": kind, "rows": len(frame), "bytes": len(body),
+                 "fingerprint": fingerprint(hashes)}
+        if dates is not None:
+            entry.update(date_bounds(dates))
+        return entry
+
+    def _read_file(
+        self,
+        key: str,
+        columns: Optional[List[str]] = None,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        size: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        One data file. A full read is downloaded and cached; a projected or
+        date-bounded read of a large uncached file fetches only the row groups
+        and column chunks it needs (start/end prune row groups, rows are not
+        filtered here). Small files are always downloaded whole and cached.
+        """
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                frame = cached[0]
+                return frame if columns is None else frame[[c for c in columns if c in frame.columns]]
+
+        selective = columns is not None or start is not None or end is not None
+        if selective and worth_reading_selectively(size):
+            source = S3RangeFile(self.s3, self.bucket, key, size)
+            df = read_parquet(source, columns, self.date_column, start, end).to_pandas()
+            self.stats["files_read_partially"] += 1
+            self.stats["bytes_downloaded"] += source.bytes_read
+            return df
+
+        obj = self.s3.get_object(Bucket=self.bucket, Key=key)
+        body = obj["Body"].read()
+        df = pq.read_table(BytesIO(body)).to_pandas()
+
+        self.stats["files_downloaded"] += 1
+        self.stats["bytes_downloaded"] += len(body)
+        self._cache_put(key, df, len(body))
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+    def _cache_put(self, key: str, df: pd.DataFrame, size: int) -> None:
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = (df, size)
+            self._cache_bytes += size
+            while self._cache_bytes > self._cache_max_bytes and len(self._cache) > 1:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _split(self, df: pd.DataFrame) -> Dict[str, Tuple[pd.DataFrame, np.ndarray]]:
+        labels = partition_labels(df, self.fund_column, self.date_column).to_numpy()
+        hashes = row_hashes(df, (self.date_column,))
+        parts = {}
+        for label in pd.unique(labels):
+            mask = labels == label
+            parts[label] = (df[mask], hashes[mask])
+        return parts
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Append journal lines as new segments, one per partition touched.
+
+        Returns:
+            Number of rows appended
+        """
+        if df is None or df.empty:
+            return 0
+
+        entries = {label: self._write_file(label, part, "seg", hashes)
+                   for label, (part, hashes) in self._split(df).items()}
+
+        def add_segments(manifest):
+            partitions = manifest["partitions"]
+            for label, entry in entries.items():
+                partitions.setdefault(label, {"files": []})["files"].append(entry)
+            return []
+
+        manifest = self._commit(add_segments)
+        logger.info(f"Appended {len(df)} GL rows to {len(entries)} partitions of {self.prefix}")
+
+        crowded = [label for label in entries
+                   if len(manifest["partitions"].get(label, {}).get("files", [])) >= self.compact_min_files]
+        if crowded:
+            self.compact(crowded)
+        return len(df)
+
+    def replace(self, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Make the stored ledger equal to df.
+
+        Partitions whose row fingerprint is unchanged are left alone; changed
+        ones are rewritten as a single file and partitions no longer present
+        are dropped.
+
+        Returns:
+            Counts of rewritten, unchanged and dropped partitions
+        """
+        parts = self._split(df) if df is not None and not df.empty else {}
+        targets = {label: (len(part), fingerprint(hashes)) for label, (part, hashes) in parts.items()}
+        written: Dict[str, Dict[str, Any]] = {}
+        summary = {"rewritten": 0, "unchanged": 0, "dropped": 0}
+
+        def rewrite(manifest):
+            partitions = manifest["partitions"]
+            removed = []
+            summary.update(rewritten=0, unchanged=0, dropped=0)
+
+            for label in list(partitions):
+                if label not in targets:
+                    removed.extend(f["key"] for f in partitions.pop(label)["files"])
+                    summary["dropped"] += 1
+
+            for label, target in targets.items():
+                current = partitions.get(label)
+                if current is not None and partition_state(current) == target:
+                    summary["unchanged"] += 1
+                    continue
+                if label not in written:
+                    part, hashes = parts[label]
+                    written[label] = self._write_file(label, part, "part", hashes)
+                if current is not None:
+                    removed.extend(f["key"] for f in current["files"])
+                partitions[label] = {"files": [written[label]]}
+                summary["rewritten"] += 1
+            return removed
+
+        self._commit(rewrite)
+        logger.info(
+            f"Saved GL {self.prefix}: {summary['rewritten']} partitions rewritten, "
+            f"{summary['unchanged']} unchanged, {summary['dropped']} dropped"
+        )
+        return summary
+
+    def compact(self, labels: Optional[Iterable[str]] = None) -> int:
+        """
+        Merge each partition's files into one.
+
+        Args:
+            labels: Partitions to compact (default: every partition with at
+                least compact_min_files files)
+
+        Returns:
+            Number of partitions compacted
+        """
+        manifest = self.manifest()
+        if labels is None:
+            labels = [label for label, p in manifest["partitions"].items()
+                      if len(p.get("files", [])) >= self.compact_min_files]
+
+        merged: Dict[str, Tuple[List[str], Dict[str, Any]]] = {}
+        for label in labels:
+            files = manifest["partitions"].get(label, {}).get("files", [])
+            if len(files) < 2:
+                continue
+            frames = [self._read_file(f["key"]) for f in files]
+            combined = pd.concat(frames, ignore_index=True)
+            entry = self._write_file(label, combined, "part", np.zeros(0, dtype="uint64"))
+            # Same rows, so the combined fingerprint carries over
+            entry["fingerprint"] = _combine(f["fingerprint"] for f in files)
+            merged[label] = ([f["key"] for f in files], entry)
+
+        if not merged:
+            return 0
+
+        compacted = []
+
+        def swap(manifest):
+            removed = []
+            compacted.clear()
+            for label, (keys, entry) in merged.items():
+                partition = manifest["partitions"].get(label)
+                if partition is None:
+                    continue
+                current = [f["key"] for f in partition["files"]]
+                # Only swap the files we merged; segments appended since stay
+                if current[:len(keys)] != keys:
+                    continue
+                partition["files"] = [entry] + partition["files"][len(keys):]
+                removed.extend(keys)
+                compacted.append(label)
+            return removed
+
+        self._commit(swap)
+        orphaned = [entry["key"] for label, (_, entry) in merged.items() if label not in compacted]
+        for key in orphaned:
+            self.s3.delete_object(Bucket=self.bucket, Key=key)
+
+        logger.info(f"Compacted {len(compacted)} GL partitions in {self.prefix}")
+        return len(compacted)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def partitions(
+        self,
+        fund_id: Optional[Union[str, Iterable[str]]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        manifest: Optional[Dict[str, Any]] = None,
+    ) -> List[str]:
+        """
+        Labels of the partitions that can hold rows for the given funds and
+        date range, in (fund, month) order. Rows without a parseable date
+        can match any range, so "unknown" months are always kept.
+        """
+        manifest = manifest or self.manifest()
+        funds = None
+        if fund_id is not None:
+            funds = {fund_id} if isinstance(fund_id, str) else set(fund_id)
+
+        first = pd.Timestamp(start).strftime("%Y-%m") if start is not None else None
+        last = pd.Timestamp(end).strftime("%Y-%m") if end is not None else None
+
+        selected = []
+        for label in sorted(manifest["partitions"]):
+            fund, month = label.split("/", 1)
+            if funds is not None and unquote(fund) not in funds:
+                continue
+            if month != UNKNOWN_PARTITION:
+                if first is not None and month < first:
+                    continue
+                if last is not None and month > last:
+                    continue
+            selected.append(label)
+        return selected
+
+    def read_partition(
+        self,
+        label: str,
+        columns: Optional[Iterable[str]] = None,
+        manifest: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        All rows of one partition, as stored.
+
+        Args:
+            label: Partition label ("<fund>/<YYYY-MM>")
+            columns: Columns to return (default: all)
+            manifest: Manifest to read from (default: the current one)
+        """
+        manifest = manifest or self.manifest()
+        columns = list(columns) if columns is not None else None
+        files = manifest["partitions"].get(label, {}).get("files", [])
+        frames = [self._read_file(f["key"], columns, size=f.get("bytes")) for f in files]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=columns) if columns is not None else pd.DataFrame()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].copy()
+
+    def read(
+        self,
+        fund_id: Optional[Union[str, Iterable[str]]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Read the ledger, or only the rows of the given funds / date range.
+
+        Args:
+            fund_id: Fund or funds to keep (default: all)
+            start: Earliest date to keep, inclusive
+            end: Latest date to keep, inclusive
+            columns: Columns to return (default: all); names no file holds
+                are left out
+
+        Returns:
+            The matching rows, as stored (no type conversion)
+        """
+        manifest = self.manifest()
+        labels = self.partitions(fund_id, start, end, manifest)
+        start = _utc(start) if start is not None else None
+        end = _utc(end) if end is not None else None
+
+        wanted = None
+        if columns is not None:
+            columns = list(columns)
+            # Filter columns are read too, then dropped after filtering rows
+            wanted = columns + [c for c in (self.fund_column, self.date_column) if c not in columns]
+
+        frames = [self._read_file(f["key"], wanted, start, end, f.get("bytes"))
+                  for label in labels
+                  for f in manifest["partitions"][label]["files"]
+                  if _may_overlap(f, start, end)]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=columns) if columns is not None else pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].copy()
+
+        if fund_id is not None and self.fund_column in df.columns:
+            funds = [fund_id] if isinstance(fund_id, str) else list(fund_id)
+            df = df[df[self.fund_column].isin(funds)]
+        if (start is not None or end is not None) and self.date_column in df.columns:
+            dates = to_utc(df[self.date_column])
+            keep = pd.Series(True, index=df.index)
+            if start is not None:
+                keep &= dates >= start
+            if end is not None:
+                keep &= dates <= end
+            df = df[keep]
+
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df.reset_index(drop=True)
+
+
+def _may_overlap(entry: Dict[str, Any], start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> bool:
+    """False if the file's recorded date bounds lie outside [start, end]; files without bounds match."""
+    if "min_date" not in entry:
+        return True
+    if start is not None and _utc(entry["max_date"]) < start:
+        return False
+    if end is not None and _utc(entry["min_date"]) > end:
+        return False
+    return True
+
+
+def _utc(value) -> pd.Timestamp:
+    value = pd.Timestamp(value)
+    return value.tz_localize("UTC") if value.tzinfo is None else value.tz_convert("UTC")
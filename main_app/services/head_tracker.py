@@ -0,0 +1,495 @@
+"""
+Block Head Tracker
+
+Follows the chain head once for all watched fund wallets, instead of every
+session re-fetching a wallet's history on a timer. Each poll reads the new
+block range:
+
+- ERC-20 Transfer logs with eth_getLogs, one query with the watched wallets
+  as topic1 (sent) and one as topic2 (received)
+- the body of every new block, for native ETH transfers, matched against
+  the watched wallets with a set lookup
+
+A long gap (restart, RPC outage, slow poll) is walked in steps of
+max_block_scan blocks, and the high-water blocks only move past a step once
+both its logs and its block bodies have been read.
+
+Every wallet has a high-water block number (the last block already searched
+for it), persisted to a local JSON file so a restart resumes where it
+stopped. Hashes of the last few blocks are kept as well: when the chain no
+longer contains one of them, the tracker rolls every wallet back to the last
+common block and publishes a rollback so consumers drop what they received
+for the orphaned blocks; the next poll re-reads them from the new chain.
+
+Results are published as an ordered event log that any number of readers
+(e.g. Shiny sessions) consume with their own cursor, see events_since().
+"""
+
+import os
+import json
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ERC-20 Transfer(address,address,uint256)
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+# Blocks whose hashes are remembered; a deeper reorg is not detected
+DEFAULT_REORG_DEPTH = 12
+
+# Blocks read (with full transactions) per step of a poll
+DEFAULT_MAX_BLOCK_SCAN = 64
+
+# Events kept for readers; a reader further behind must resync
+DEFAULT_EVENT_LOG_SIZE = 1000
+
+_ERC20_METADATA_ABI = [
+    {"constant": True, "inputs": [], "name": "symbol",
+     "outputs": [{"name": "", "type": "string"}], "type": "function"},
+    {"constant": True, "inputs": [], "name": "decimals",
+     "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
+    {"constant": True, "inputs": [], "name": "name",
+     "outputs": [{"name": "", "type": "string"}], "type": "function"},
+]
+
+
+def _hex(value: Any) -> str:
+    """0x-prefixed lowercase hex string of a hash, topic or address"""
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    value = str(value).lower()
+    return value if value.startswith('0x') else f'0x{value}'
+
+
+def _address_topic(address: str) -> str:
+    """32-byte topic of an address"""
+    return '0x' + address.lower()[2:].zfill(64)
+
+
+def _topic_address(topic: Any) -> str:
+    """Address held in a 32-byte topic"""
+    return '0x' + _hex(topic)[-40:]
+
+
+@dataclass
+class HeadEvent:
+    """
+    One entry of the tracker's event log.
+
+    kind is 'transactions' (rows holds new transaction rows) or 'rollback'
+    (rows from blocks above block_number are no longer on the chain).
+    """
+    sequence: int
+    kind: str
+    block_number: int
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class BlockHeadTracker:
+    """Shared head follower for a set of wallets"""
+
+    def __init__(self, w3, state_path: Optional[str] = None,
+                 reorg_depth: int = DEFAULT_REORG_DEPTH,
+                 max_log_range: int = 10000,
+                 max_block_scan: int = DEFAULT_MAX_BLOCK_SCAN,
+                 event_log_size: int = DEFAULT_EVENT_LOG_SIZE,
+                 on_rollback: Optional[Callable[[int], None]] = None):
+        """
+        Initialize the tracker
+
+        Args:
+            w3: Web3 instance (HTTP provider)
+            state_path: JSON file of the wallets' high-water blocks (None: not persisted)
+            reorg_depth: Recent block hashes kept to detect reorgs
+            max_log_range: Blocks per eth_getLogs query
+            max_block_scan: Blocks per step when walking the new block range
+            event_log_size: Events kept for readers
+            on_rollback: Called with the last common block after a reorg
+        """
+        self.w3 = w3
+        self.state_path = state_path
+        self.reorg_depth = max(1, reorg_depth)
+        self.max_log_range = max(1, max_log_range)
+        self.max_block_scan = max(1, max_block_scan)
+        self.on_rollback = on_rollback
+
+        self._lock = threading.RLock()
+        self._high_water: Dict[str, int] = {}
+        self._recent_hashes: Dict[int, str] = {}
+        self._events: deque = deque(maxlen=event_log_size)
+        self._sequence = 0
+        self._token_info: Dict[str, Tuple[str, int, str]] = {}
+        self._block_timestamps: Dict[int, int] = {}
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {'polls': 0, 'blocks': 0, 'log_queries': 0, 'rows': 0, 'rollbacks': 0, 'errors': 0}
+
+        self._load_state()
+
+    # ------------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------------
+
+    def _load_state(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            self._high_water = {wallet.lower(): int(block) for wallet, block in state.get('wallets', {}).items()}
+            self._recent_hashes = {int(number): block_hash for number, block_hash in state.get('recent_blocks', {}).items()}
+            logger.info(f"Head tracker resumed {len(self._high_water)} wallets from {self.state_path}")
+        except Exception as e:
+            logger.warning(f"Could not read head tracker state {self.state_path}: {e}")
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'wallets': self._high_water,
+                           'recent_blocks': {str(n): h for n, h in self._recent_hashes.items()}}, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logger.warning(f"Could not write head tracker state {self.state_path}: {e}")
+
+    @property
+    def wallets(self) -> Set[str]:
+        """Watched wallets (lowercase)"""
+        with self._lock:
+            return set(self._high_water)
+
+    def high_water(self, wallet: str) -> Optional[int]:
+        """Last block searched for wallet, None if it is not watched"""
+        with self._lock:
+            return self._high_water.get(wallet.lower())
+
+    def watch(self, wallets: Iterable[str], start_block: Optional[int] = None) -> None:
+        """
+        Add wallets; known wallets keep their high-water block.
+
+        Args:
+            wallets: Wallet addresses
+            start_block: Last block considered already seen for new wallets
+                (default: the current head, i.e. only blocks from now on)
+        """
+        new_wallets = {w.strip().lower() for w in wallets if w and w.strip()} - self.wallets
+        if not new_wallets:
+            return
+        if start_block is None:
+            start_block = self.w3.eth.block_number
+        with self._lock:
+            for wallet in new_wallets:
+                self._high_water[wallet] = start_block
+            self._save_state()
+        logger.info(f"Head tracker watching {len(new_wallets)} more wallets from block {start_block}")
+
+    # ------------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------------
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the latest event (a reader's initial cursor)"""
+        with self._lock:
+            return self._sequence
+
+    def _publish(self, kind: str, block_number: int, rows: Optional[List[Dict[str, Any]]] = None) -> None:
+        self._sequence += 1
+        self._events.append(HeadEvent(self._sequence, kind, block_number, rows or []))
+
+    def events_since(self, cursor: int) -> Tuple[List[HeadEvent], int, bool]:
+        """
+        Events after cursor.
+
+        Returns:
+            (events, new cursor, complete); complete is False if events after
+            cursor were already dropped from the log and the reader should
+            reload instead
+        """
+        with self._lock:
+            events = [event for event in self._events if event.sequence > cursor]
+            oldest = self._events[0].sequence if self._events else self._sequence + 1
+            complete = cursor >= oldest - 1
+            return events, self._sequence, complete
+
+    # ------------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------------
+
+    def poll(self) -> List[HeadEvent]:
+        """
+        Read everything after the wallets' high-water blocks up to the head.
+
+        Returns:
+            Events published by this poll
+        """
+        with self._lock:
+            if not self._high_water:
+                return []
+            first_sequence = self._sequence + 1
+            self.stats['polls'] += 1
+
+            head = self.w3.eth.block_number
+            self._check_reorg(head)
+
+            start = min(self._high_water.values()) + 1
+            for step_start in range(start, head + 1, self.max_block_scan):
+                self._read_step(step_start, min(head, step_start + self.max_block_scan - 1), head)
+
+            return [event for event in self._events if event.sequence >= first_sequence]
+
+    def _read_step(self, start: int, end: int, head: int) -> None:
+        """
+        Read blocks start..end (native transfers and token logs), publish the
+        new rows and only then move every wallet's high-water block to end
+        """
+        blocks = self._get_blocks(range(start, end + 1))
+        rows = self._native_rows(blocks) + self._token_rows(start, end)
+        rows = [row for row in rows if row['block'] > self._high_water[row['wallet']]]
+        for row in rows:
+            row['confirmations'] = head - row['block']
+        rows.sort(key=lambda row: (row['block'], row.get('log_index', -1), row['wallet']))
+
+        for number in range(max(start, head - self.reorg_depth + 1), end + 1):
+            self._recent_hashes[number] = _hex(blocks[number]['hash'])
+        for number in [n for n in self._recent_hashes if n <= head - self.reorg_depth]:
+            del self._recent_hashes[number]
+        for number in [n for n in self._block_timestamps if n < start]:
+            del self._block_timestamps[number]
+
+        for wallet in self._high_water:
+            self._high_water[wallet] = max(self._high_water[wallet], end)
+        self.stats['blocks'] += end - start + 1
+        self.stats['rows'] += len(rows)
+        if rows:
+            self._publish('transactions', end, rows)
+            logger.info(f"Head tracker: {len(rows)} new transactions up to block {end}")
+        self._save_state()
+
+    def _check_reorg(self, head: int) -> None:
+        """Roll back to the last remembered block still on the chain"""
+        if not self._recent_hashes:
+            return
+        common = min(self._recent_hashes) - 1
+        for number in sorted((n for n in self._recent_hashes if n <= head), reverse=True):
+            if _hex(self.w3.eth.get_block(number)['hash']) == self._recent_hashes[number]:
+                common = number
+                break
+        if common == max(self._recent_hashes):
+            return
+
+        for number in [n for n in self._recent_hashes if n > common]:
+            del self._recent_hashes[number]
+        for wallet, block in self._high_water.items():
+            self._high_water[wallet] = min(block, common)
+        for number in [n for n in self._block_timestamps if n > common]:
+            del self._block_timestamps[number]
+
+        self.stats['rollbacks'] += 1
+        self._publish('rollback', common)
+        logger.warning(f"Head tracker: chain reorganized, rolled back to block {common}")
+        if self.on_rollback is not None:
+            try:
+                self.on_rollback(common)
+            except Exception as e:
+                logger.warning(f"Head tracker rollback callback failed: {e}")
+
+    def _get_blocks(self, numbers: Iterable[int]) -> Dict[int, Any]:
+        """Blocks with full transactions"""
+        blocks = {}
+        for number in numbers:
+            block = self.w3.eth.get_block(number, full_transactions=True)
+            blocks[number] = block
+            self._block_timestamps[number] = block['timestamp']
+        return blocks
+
+    def _timestamp(self, number: int) -> datetime:
+        if number not in self._block_timestamps:
+            self._block_timestamps[number] = self.w3.eth.get_block(number)['timestamp']
+        return datetime.fromtimestamp(self._block_timestamps[number], tz=timezone.utc)
+
+    def _native_rows(self, blocks: Dict[int, Any]) -> List[Dict[str, Any]]:
+        """Rows for native ETH transactions sent or received by a watched wallet"""
+        wallets = self._high_water
+        rows = []
+        for number, block in blocks.items():
+            for tx in block['transactions']:
+                sender = (tx.get('from') or '').lower()
+                recipient = (tx.get('to') or '').lower()
+                if sender not in wallets and recipient not in wallets:
+                    continue
+
+                tx_hash = _hex(tx['hash'])
+                status, gas_fee = 'Confirmed', 0.0
+                try:
+                    receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+                    status = 'Confirmed' if receipt.get('status') == 1 else 'Failed'
+                    gas_price = receipt.get('effectiveGasPrice') or tx.get('gasPrice', 0)
+                    gas_fee = receipt['gasUsed'] * gas_price / 10**18
+                except Exception as e:
+                    logger.debug(f"No receipt for {tx_hash}: {e}")
+
+                for wallet in {sender, recipient} & wallets.keys():
+                    rows.append({
+                        'hash': tx_hash,
+                        'block': number,
+                        'from': tx.get('from', ''),
+                        'to': tx.get('to') or '',
+                        'amount': tx.get('value', 0) / 10**18,
+                        'token': 'ETH',
+                        'gas_fee': gas_fee if wallet == sender else 0,
+                        'timestamp': datetime.fromtimestamp(block['timestamp'], tz=timezone.utc),
+                        'status': status,
+                        'type': 'OUT' if wallet == sender else 'IN',
+                        'nonce': tx.get('nonce', 0),
+                        'confirmations': 0,
+                        'wallet': wallet,
+                    })
+        return rows
+
+    def _get_logs(self, start: int, end: int) -> List[Any]:
+        """Transfer logs from or to any watched wallet, once each"""
+        wallet_topics = [_address_topic(wallet) for wallet in sorted(self._high_water)]
+        logs = {}
+        for chunk_start in range(start, end + 1, self.max_log_range):
+            chunk_end = min(end, chunk_start + self.max_log_range - 1)
+            for topics in ([TRANSFER_TOPIC, wallet_topics], [TRANSFER_TOPIC, None, wallet_topics]):
+                self.stats['log_queries'] += 1
+                for log in self.w3.eth.get_logs({'fromBlock': chunk_start, 'toBlock': chunk_end, 'topics': topics}):
+                    logs[(_hex(log['transactionHash']), log['logIndex'])] = log
+        return list(logs.values())
+
+    def _token_rows(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """Rows for ERC-20 transfers sent or received by a watched wallet"""
+        wallets = self._high_water
+        rows = []
+        for log in self._get_logs(start, end):
+            topics = log['topics']
+            if len(topics) < 3:
+                continue  # ERC-721 style or malformed
+            sender = _topic_address(topics[1])
+            recipient = _topic_address(topics[2])
+            data = _hex(log['data'])
+            value = int(data, 16) if data != '0x' else 0
+            if value == 0:
+                continue  # dust attacks / scam airdrops
+
+            contract = _hex(log['address'])
+            symbol, decimals, name = self._token(contract)
+            for wallet in {sender, recipient} & wallets.keys():
+                rows.append({
+                    'hash': _hex(log['transactionHash']),
+                    'block': log['blockNumber'],
+                    'from': sender,
+                    'to': recipient,
+                    'amount': value / 10**decimals,
+                    'token': symbol,
+                    'gas_fee': 0,
+                    'timestamp': self._timestamp(log['blockNumber']),
+                    'status': 'Confirmed',
+                    'type': 'OUT' if wallet == sender else 'IN',
+                    'nonce': 0,
+                    'confirmations': 0,
+                    'token_name': name,
+                    'contract_address': contract,
+                    'log_index': log['logIndex'],
+                    'wallet': wallet,
+                })
+        return rows
+
+    def _token(self, contract: str) -> Tuple[str, int, str]:
+        """(symbol, decimals, name) of a token contract, read once per contract"""
+        if contract not in self._token_info:
+            info = ('UNKNOWN', 18, '')
+            try:
+                from web3 import Web3
+                token = self.w3.eth.contract(address=Web3.to_checksum_address(contract), abi=_ERC20_METADATA_ABI)
+                info = (token.functions.symbol().call(), token.functions.decimals().call(),
+                        token.functions.name().call())
+            except Exception as e:
+                logger.debug(f"Could not fetch token info for {contract}: {e}")
+            self._token_info[contract] = info
+        return self._token_info[contract]
+
+    # ------------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------------
+
+    def start(self, interval: float) -> None:
+        """Poll every interval seconds in a daemon thread (no-op if running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Head tracker poll failed: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name='block-head-tracker', daemon=True)
+        self._thread.start()
+        logger.info(f"Head tracker started (every {interval}s)")
+
+    def stop(self) -> None:
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+_default_tracker: Optional[BlockHeadTracker] = None
+_default_tracker_lock = threading.Lock()
+
+
+def get_head_tracker(w3=None) -> Optional[BlockHeadTracker]:
+    """
+    Process-wide head tracker configured from blockchain_config.
+
+    Created on the first call that passes a Web3 instance; None before that.
+    A reorg also drops the orphaned blocks from the chain data cache.
+    """
+    global _default_tracker
+    with _default_tracker_lock:
+        if _default_tracker is None and w3 is not None:
+            from ..config.blockchain_config import (
+                HEAD_TRACKER_STATE_PATH,
+                HEAD_TRACKER_REORG_DEPTH,
+                BLOCK_CHUNK_SIZE,
+            )
+            from .chain_cache import get_chain_cache
+
+            _default_tracker = BlockHeadTracker(
+                w3,
+                state_path=HEAD_TRACKER_STATE_PATH,
+                reorg_depth=HEAD_TRACKER_REORG_DEPTH,
+                max_log_range=BLOCK_CHUNK_SIZE,
+                on_rollback=lambda block: get_chain_cache().invalidate_from_block(block + 1),
+            )
+        return _default_tracker
+
+
+def set_head_tracker(tracker: Optional[BlockHeadTracker]) -> None:
+    """Replace the process-wide tracker (None: create again on next use)"""
+    global _default_tracker
+    with _default_tracker_lock:
+        if _default_tracker is not None and _default_tracker is not tracker:
+            _default_tracker.stop()
+        _default_tracker = tracker
@@ -0,0 +1,262 @@
+"""
+Multicall3 State Reader
+
+Aggregates many read-only contract calls (loan terms, ETH and ERC-20
+balances) into Multicall3 aggregate3 calls, so hundreds of reads cost one
+eth_call each instead of one HTTP round trip per field.
+
+Every read of a batch set is pinned to one block: 'latest' is resolved to a
+block number once, before the first batch, so all values come from the same
+chain state even if new blocks arrive while the batches are in flight.
+
+Calls are sent with allowFailure=True, so a reverting call (an unknown loan
+id, a token that rejects the query) only loses its own result. If a whole
+aggregate3 call fails (gas limit, response size) the batch is split in
+half and retried, down to single calls. Failed keys are left out of the
+result, like BatchRpcFetcher.
+"""
+
+import time
+import random
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Tuple, Union
+
+from eth_abi import decode, encode
+from eth_utils import function_abi_to_4byte_selector, to_checksum_address
+from eth_utils.abi import get_abi_input_types, get_abi_output_types
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+from main_app.config.blockchain_config import MULTICALL3_ADDRESS, MULTICALL_BATCH_SIZE
+from main_app.services.rpc_batch import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES, is_rate_limited, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+MULTICALL3_ABI = [{
+    "inputs": [{
+        "components": [
+            {"internalType": "address", "name": "target", "type": "address"},
+            {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+            {"internalType": "bytes", "name": "callData", "type": "bytes"},
+        ],
+        "internalType": "struct Multicall3.Call3[]",
+        "name": "calls",
+        "type": "tuple[]",
+    }],
+    "name": "aggregate3",
+    "outputs": [{
+        "components": [
+            {"internalType": "bool", "name": "success", "type": "bool"},
+            {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+        ],
+        "internalType": "struct Multicall3.Result[]",
+        "name": "returnData",
+        "type": "tuple[]",
+    }],
+    "stateMutability": "payable",
+    "type": "function",
+}, {
+    "inputs": [{"internalType": "address", "name": "addr", "type": "address"}],
+    "name": "getEthBalance",
+    "outputs": [{"internalType": "uint256", "name": "balance", "type": "uint256"}],
+    "stateMutability": "view",
+    "type": "function",
+}]
+
+ERC20_BALANCE_OF_ABI = {
+    "inputs": [{"internalType": "address", "name": "account", "type": "address"}],
+    "name": "balanceOf",
+    "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+    "stateMutability": "view",
+    "type": "function",
+}
+
+_GET_ETH_BALANCE_ABI = MULTICALL3_ABI[1]
+
+BlockIdentifier = Union[int, str]
+
+
+@dataclass(frozen=True)
+class StateCall:
+    """One encoded contract read and how to decode its return data"""
+    target: str
+    data: bytes
+    output_types: Tuple[str, ...]
+
+    @classmethod
+    def from_abi(cls, target: str, fn_abi: Dict[str, Any], *args: Any) -> 'StateCall':
+        """Encode a call of fn_abi with args on target"""
+        data = function_abi_to_4byte_selector(fn_abi) + encode(get_abi_input_types(fn_abi), list(args))
+        return cls(to_checksum_address(target), data, tuple(get_abi_output_types(fn_abi)))
+
+    @classmethod
+    def from_function(cls, fn: Any) -> 'StateCall':
+        """Encode a bound web3 ContractFunction, e.g. contract.functions.getLoanTerms(5)"""
+        return cls.from_abi(fn.address, fn.abi, *fn.args)
+
+    def decode(self, return_data: bytes) -> Any:
+        """
+        Decode return data the way ContractFunction.call() does: addresses
+        checksummed, a single output unwrapped, several outputs as a list
+        """
+        if not return_data and self.output_types:
+            raise ValueError("Empty return data (no contract at target?)")
+        values = map_abi_data(BASE_RETURN_NORMALIZERS, self.output_types,
+                              decode(self.output_types, bytes(return_data)))
+        return values[0] if len(values) == 1 else list(values)
+
+
+def eth_balance_call(wallet: str, multicall_address: str = MULTICALL3_ADDRESS) -> StateCall:
+    """ETH balance of wallet in wei, read through Multicall3.getEthBalance"""
+    return StateCall.from_abi(multicall_address, _GET_ETH_BALANCE_ABI, to_checksum_address(wallet))
+
+
+def erc20_balance_call(token: str, wallet: str) -> StateCall:
+    """ERC-20 balanceOf(wallet) in the token's smallest unit"""
+    return StateCall.from_abi(token, ERC20_BALANCE_OF_ABI, to_checksum_address(wallet))
+
+
+class MulticallReader:
+    """Executes keyed contract reads as Multicall3 aggregate3 batches"""
+
+    def __init__(self, w3, batch_size: int = MULTICALL_BATCH_SIZE,
+                 address: str = MULTICALL3_ADDRESS,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = 0.5, max_backoff: float = 30.0):
+        """
+        Initialize the reader
+
+        Args:
+            w3: Web3 instance
+            batch_size: Calls per aggregate3 call
+            address: Multicall3 contract address
+            max_concurrency: aggregate3 calls in flight at once
+            max_retries: Retries per batch on 429 responses
+            backoff_base: First backoff delay in seconds (doubles per retry)
+            max_backoff: Upper bound on a single backoff delay
+        """
+        self.w3 = w3
+        self.batch_size = max(1, batch_size)
+        self.address = to_checksum_address(address)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self._contract = w3.eth.contract(address=self.address, abi=MULTICALL3_ABI)
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'multicalls': 0,
+            'calls': 0,
+            'rate_limited': 0,
+            'split_batches': 0,
+            'failed_calls': 0,
+        }
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[stat] += n
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before retry number attempt (Retry-After wins if present)"""
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = self.backoff_base * (2 ** attempt) * (1 + random.random() * 0.25)
+        return min(delay, self.max_backoff)
+
+    def pin_block(self, block_identifier: BlockIdentifier = 'latest') -> int:
+        """Block number the reads run at ('latest' and other tags resolved once)"""
+        if isinstance(block_identifier, int):
+            return block_identifier
+        if block_identifier == 'latest':
+            return self.w3.eth.block_number
+        return self.w3.eth.get_block(block_identifier)['number']
+
+    def read(self, calls: Dict[Hashable, StateCall],
+             block_identifier: BlockIdentifier = 'latest') -> Dict[Hashable, Any]:
+        """
+        Run keyed calls through aggregate3, all at the same block
+
+        Args:
+            calls: Dict of key -> StateCall
+            block_identifier: Block number or tag to read at
+
+        Returns:
+            Dict of key -> decoded value for every call that succeeded
+        """
+        items = list(calls.items())
+        if not items:
+            return {}
+
+        block = self.pin_block(block_identifier)
+        chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        results: Dict[Hashable, Any] = {}
+
+        if self.max_concurrency == 1 or len(chunks) == 1:
+            for chunk in chunks:
+                results.update(self._read_chunk(chunk, block))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as pool:
+                for chunk_result in pool.map(lambda chunk: self._read_chunk(chunk, block), chunks):
+                    results.update(chunk_result)
+
+        logger.debug(f"Multicall read {len(results)}/{len(items)} values at block {block} "
+                     f"in {len(chunks)} batches")
+        return results
+
+    def _read_chunk(self, chunk: List[Tuple[Hashable, StateCall]], block: int) -> Dict[Hashable, Any]:
+        """One aggregate3 call, with 429 backoff and bisection on failure"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._execute(chunk, block)
+            except Exception as e:
+                if is_rate_limited(e):
+                    self._count('rate_limited')
+                    if attempt < self.max_retries:
+                        delay = self._backoff(attempt, e)
+                        logger.debug(f"Multicall rate limited, retrying in {delay:.2f}s")
+                        time.sleep(delay)
+                        continue
+                    logger.warning(f"Multicall of {len(chunk)} still rate limited after "
+                                   f"{self.max_retries} retries")
+                    self._count('failed_calls', len(chunk))
+                    return {}
+
+                if len(chunk) == 1:
+                    logger.debug(f"Multicall read {chunk[0][0]} failed: {e}")
+                    self._count('failed_calls')
+                    return {}
+
+                logger.debug(f"Multicall of {len(chunk)} failed ({e}), splitting the batch")
+                self._count('split_batches')
+                middle = len(chunk) // 2
+                results = self._read_chunk(chunk[:middle], block)
+                results.update(self._read_chunk(chunk[middle:], block))
+                return results
+        return {}
+
+    def _execute(self, chunk: List[Tuple[Hashable, StateCall]], block: int) -> Dict[Hashable, Any]:
+        """Send one aggregate3 call and decode the successful results"""
+        outcomes = self._contract.functions.aggregate3(
+            [(call.target, True, call.data) for _, call in chunk]
+        ).call(block_identifier=block)
+
+        self._count('multicalls')
+        self._count('calls', len(chunk))
+
+        results = {}
+        for (key, call), (success, return_data) in zip(chunk, outcomes):
+            if not success:
+                logger.debug(f"Multicall read {key} reverted")
+                self._count('failed_calls')
+                continue
+            try:
+                results[key] = call.decode(return_data)
+            except Exception as e:
+                logger.debug(f"Multicall read {key} returned undecodable data: {e}")
+                self._count('failed_calls')
+        return results
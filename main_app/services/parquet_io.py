@@ -0,0 +1,201 @@
+"""
+Parquet IO - selective reads of parquet objects on S3
+
+Reading a parquet object with get_object() downloads every column of every
+row group. The readers here fetch the footer with one ranged GET, use the
+row-group statistics to skip groups that cannot match a date range, and
+fetch only the projected column chunks of the groups that are left (Arrow
+coalesces the chunks of one group into a single ranged GET).
+
+Writers sort rows by their filter columns and cut row groups of
+ROW_GROUP_ROWS rows so the statistics of each group cover a narrow range.
+"""
+
+import os
+import io
+import logging
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Rows per row group: small enough for date pruning inside a month, large
+# enough that per-group overhead (one GET per group) stays negligible
+ROW_GROUP_ROWS = int(os.environ.get("PARQUET_ROW_GROUP_ROWS", "16384"))
+
+# Below this size one plain GET beats a footer read (Arrow probes the last
+# 64 KB) plus a ranged GET per row group
+SELECTIVE_READ_MIN_BYTES = int(os.environ.get("PARQUET_SELECTIVE_READ_MIN_KB", "256")) * 1024
+
+
+class S3RangeFile(io.RawIOBase):
+    """
+    Read-only, seekable file over one S3 object; every read is a ranged GET.
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: S3 bucket
+        key: Object key
+        size: Object size in bytes (looked up with head_object if omitted)
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str, size: Optional[int] = None):
+        super().__init__()
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.size = size if size is not None else int(
+            s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"])
+        self.position = 0
+        self.requests = 0
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.size if size is None or size < 0 else min(self.size, self.position + size)
+        if end <= self.position:
+            return b""
+        obj = self.s3.get_object(Bucket=self.bucket, Key=self.key,
+                                 Range=f"bytes={self.position}-{end - 1}")
+        data = obj["Body"].read()
+        self.requests += 1
+        self.bytes_read += len(data)
+        self.position += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def worth_reading_selectively(size: Optional[int]) -> bool:
+    """True if an object of size bytes (None: unknown) is worth ranged reads."""
+    return size is None or size >= SELECTIVE_READ_MIN_BYTES
+
+
+def to_parquet_bytes(df: pd.DataFrame, row_group_size: Optional[int] = None) -> bytes:
+    """Serialize df with statistics and row groups of row_group_size (default ROW_GROUP_ROWS) rows."""
+    buffer = BytesIO()
+    df.to_parquet(buffer, index=False, row_group_size=max(1, row_group_size or ROW_GROUP_ROWS))
+    return buffer.getvalue()
+
+
+def _overlaps(statistics, start: Optional[datetime], end: Optional[datetime]) -> bool:
+    """False only when the group's min/max prove it holds no date in [start, end]."""
+    if statistics is None or not statistics.has_min_max:
+        return True
+    low, high = statistics.min, statistics.max
+    if not isinstance(low, datetime) or not isinstance(high, datetime):
+        return True
+    try:
+        low, high = pd.Timestamp(low), pd.Timestamp(high)
+        if low.tzinfo is None:
+            low, high = low.tz_localize("UTC"), high.tz_localize("UTC")
+        if start is not None and high < start:
+            return False
+        if end is not None and low > end:
+            return False
+    except TypeError:
+        return True
+    return True
+
+
+def select_row_groups(
+    metadata: pq.FileMetaData,
+    date_column: str,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+) -> List[int]:
+    """
+    Row groups whose statistics for date_column can overlap [start, end].
+
+    start/end must be UTC timestamps. Groups without usable statistics (no
+    such column, string dates, statistics not written) are always kept.
+    """
+    groups = list(range(metadata.num_row_groups))
+    if start is None and end is None:
+        return groups
+
+    names = metadata.schema.to_arrow_schema().names
+    if date_column not in names:
+        return groups
+    index = names.index(date_column)
+    return [i for i in groups
+            if _overlaps(metadata.row_group(i).column(index).statistics, start, end)]
+
+
+def read_parquet(
+    source,
+    columns: Optional[Sequence[str]] = None,
+    date_column: Optional[str] = None,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+) -> pa.Table:
+    """
+    Read the projected columns of the row groups that can match a date range.
+
+    Rows are not filtered here: a surviving group can still hold dates just
+    outside the range, so callers filter rows after conversion.
+
+    Args:
+        source: Parquet bytes, a file object or an S3RangeFile
+        columns: Columns to read; names missing from the file are skipped
+        date_column: Column whose statistics prune row groups
+        start: Earliest date wanted (UTC), inclusive
+        end: Latest date wanted (UTC), inclusive
+
+    Returns:
+        Arrow table (keeps the pandas metadata, so to_pandas() restores dtypes)
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+    parquet = pq.ParquetFile(source, pre_buffer=True)
+
+    names = parquet.schema_arrow.names
+    if columns is not None:
+        columns = [c for c in columns if c in names]
+
+    groups = (select_row_groups(parquet.metadata, date_column, start, end)
+              if date_column else list(range(parquet.metadata.num_row_groups)))
+    if len(groups) == parquet.metadata.num_row_groups:
+        return parquet.read(columns=columns)
+    if not groups:
+        schema = parquet.schema_arrow
+        if columns is not None:
+            schema = pa.schema([schema.field(c) for c in columns], metadata=schema.metadata)
+        return schema.empty_table()
+    return parquet.read_row_groups(groups, columns=columns)
+
+
+def date_bounds(dates: pd.Series) -> Dict[str, str]:
+    """
+    min_date / max_date of a parsed UTC date column for manifest entries, as
+    naive UTC ISO strings widened to whole seconds.
+    """
+    present = dates.dropna()
+    if present.empty:
+        return {}
+    low, high = present.min().floor("s"), present.max().ceil("s")
+    return {"min_date": low.strftime("%Y-%m-%dT%H:%M:%S"), "max_date": high.strftime("%Y-%m-%dT%H:%M:%S")}
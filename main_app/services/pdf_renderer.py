@@ -0,0 +1,281 @@
+"""
+PDF Renderer - batch HTML to PDF rendering on a process pool
+
+Investor statements are rendered from one Jinja template with WeasyPrint,
+which spends most of its time in layout and holds the GIL while doing it.
+Rendering one statement after another on the server thread blocks the Shiny
+session for minutes on a 60+ LP fund.
+
+render_pdfs() takes a lazy stream of PDFJobs (HTML already rendered by the
+caller from a template compiled once, see get_template) and lays them out
+on a process pool:
+
+- at most max_in_flight jobs exist at a time, so HTML is only produced as
+  workers free up and memory stays bounded however many LPs there are
+- workers are recycled after PDF_TASKS_PER_WORKER jobs, which caps the
+  memory WeasyPrint accumulates per process
+- each worker keeps one FontConfiguration and caches the stylesheets, fonts
+  and images it fetches, so they are loaded once per worker, not per PDF
+- if a worker dies (e.g. killed for memory) the pool is replaced and the
+  jobs it was running are retried one at a time; a job that kills its
+  worker again is reported as failed
+- progress is reported as each PDF finishes, and the results can be
+  bundled into one zip
+
+This module imports nothing heavy so spawned workers start quickly.
+"""
+
+import os
+import logging
+import threading
+import zipfile
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for PDF layout (0 renders in the calling process)
+PDF_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Jobs a worker renders before it is replaced by a fresh process
+PDF_TASKS_PER_WORKER = int(os.environ.get("PDF_RENDER_TASKS_PER_WORKER", "16"))
+
+# Per-worker state, set up by _init_worker
+_worker_state: Dict[str, object] = {}
+
+
+@dataclass
+class PDFJob:
+    """One document: name (for progress), rendered HTML and where to write it."""
+    name: str
+    html: str
+    output_path: str
+    base_url: Optional[str] = None
+
+
+class RenderProgress:
+    """
+    Thread-safe progress of a render_pdfs run, for polling from the UI
+    while the run happens on another thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.current = ""
+        self.finished = False
+
+    def start(self, total: int):
+        with self._lock:
+            self.total, self.done, self.failed, self.current, self.finished = total, 0, 0, "", False
+
+    def __call__(self, done: int, total: int, name: str, path: Optional[str]):
+        with self._lock:
+            self.done, self.total, self.current = done, total, name
+            if path is None:
+                self.failed += 1
+
+    def finish(self):
+        with self._lock:
+            self.finished = True
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {"total": self.total, "done": self.done, "failed": self.failed,
+                    "current": self.current, "finished": self.finished}
+
+
+@lru_cache(maxsize=8)
+def get_template(template_dir: str, name: str = "report.html"):
+    """Compiled Jinja template, loaded and compiled once per process."""
+    from jinja2 import Environment, FileSystemLoader
+    env = Environment(loader=FileSystemLoader(str(template_dir)))
+    return env.get_template(name)
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+def _init_worker():
+    """Start the worker with empty font and resource caches."""
+    _worker_state.clear()
+
+
+def _font_config():
+    """The process's WeasyPrint FontConfiguration, created on first use."""
+    if "font_config" not in _worker_state:
+        from weasyprint.text.fonts import FontConfiguration
+        _worker_state["font_config"] = FontConfiguration()
+    return _worker_state["font_config"]
+
+
+def _cached_url_fetcher(url: str, *args, **kwargs):
+    """weasyprint.default_url_fetcher, remembering every resource it loads."""
+    from weasyprint import default_url_fetcher
+
+    resources = _worker_state.setdefault("resources", {})
+    if url not in resources:
+        fetched = dict(default_url_fetcher(url, *args, **kwargs))
+        file_obj = fetched.pop("file_obj", None)
+        if file_obj is not None:
+            fetched["string"] = file_obj.read()
+            file_obj.close()
+        resources[url] = fetched
+    return dict(resources[url])
+
+
+def write_pdf(html: str, base_url: Optional[str], output_path: str) -> str:
+    """Lay out html with WeasyPrint and write it to output_path."""
+    from weasyprint import HTML
+
+    HTML(string=html, base_url=base_url, url_fetcher=_cached_url_fetcher).write_pdf(
+        output_path, font_config=_font_config())
+    return output_path
+
+
+def _run_job(writer: Callable, job: PDFJob) -> Optional[str]:
+    try:
+        path = writer(job.html, job.base_url, job.output_path)
+        if not path or not os.path.exists(path) or os.path.getsize(path) == 0:
+            logger.error(f"PDF for {job.name} was not written")
+            return None
+        return path
+    except Exception as e:
+        logger.error(f"PDF rendering failed for {job.name}: {e}")
+        return None
+
+
+# ============================================================================
+# BATCH RENDERING
+# ============================================================================
+
+def render_pdfs(
+    jobs: Iterable[PDFJob],
+    total: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str, Optional[str]], None]] = None,
+    writer: Callable[[str, Optional[str], str], str] = write_pdf,
+    zip_path: Optional[str] = None,
+) -> List[str]:
+    """
+    Render PDFJobs, in parallel unless max_workers is 0.
+
+    Args:
+        jobs: PDFJobs; consumed lazily, only as many ahead as max_in_flight
+        total: Number of jobs, for progress (len(jobs) if it has one)
+        max_workers: Worker processes (default PDF_WORKERS)
+        max_in_flight: Jobs submitted but not finished (default 2 x workers)
+        progress: Called as progress(done, total, name, path or None) after
+            each job, on the calling thread
+        writer: writer(html, base_url, output_path) -> path; must be a
+            module-level function when rendering on workers
+        zip_path: If given, also bundle the PDFs into this zip
+
+    Returns:
+        Paths of the PDFs written, in job order (failed jobs are left out)
+    """
+    workers = PDF_WORKERS if max_workers is None else max_workers
+    if total is None and hasattr(jobs, "__len__"):
+        total = len(jobs)
+    total = total or 0
+    results: Dict[int, Optional[str]] = {}
+    done = 0
+
+    def finished(index: int, job: PDFJob, path: Optional[str]):
+        nonlocal done
+        results[index] = path
+        done += 1
+        if progress:
+            progress(done, max(total, done), job.name, path)
+
+    if workers <= 0:
+        for index, job in enumerate(jobs):
+            finished(index, job, _run_job(writer, job))
+    else:
+        limit = max_in_flight or 2 * workers
+        context = multiprocessing.get_context("spawn")
+
+        def new_pool(size: int = workers):
+            return ProcessPoolExecutor(max_workers=size, mp_context=context, initializer=_init_worker,
+                                       max_tasks_per_child=PDF_TASKS_PER_WORKER)
+
+        executor = new_pool()
+        pending = {}
+        lost: List[tuple] = []
+
+        def restart(broken: ProcessPoolExecutor):
+            """Replace the pool if it is still the one that broke."""
+            nonlocal executor
+            if broken is executor:
+                logger.warning("PDF worker process died; restarting the pool")
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = new_pool()
+
+        def submit(index: int, job: PDFJob):
+            try:
+                future = executor.submit(_run_job, writer, job)
+            except BrokenProcessPool:
+                restart(executor)
+                future = executor.submit(_run_job, writer, job)
+            pending[future] = (index, job, executor)
+
+        def collect():
+            """Wait for the next jobs to finish; keep those lost with a broken pool for a retry."""
+            completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                index, job, pool = pending.pop(future)
+                try:
+                    finished(index, job, future.result())
+                except BrokenProcessPool:
+                    restart(pool)
+                    lost.append((index, job))
+
+        try:
+            for index, job in enumerate(jobs):
+                while len(pending) >= limit:
+                    collect()
+                submit(index, job)
+            while pending:
+                collect()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        # A dead worker takes every job in flight with it; retry them one at a
+        # time so only the job that kills its worker again is failed
+        if lost:
+            executor = new_pool(1)
+            try:
+                for index, job in sorted(lost, key=lambda item: item[0]):
+                    try:
+                        path = executor.submit(_run_job, writer, job).result()
+                    except BrokenProcessPool:
+                        logger.error(f"PDF rendering failed for {job.name}: worker process died")
+                        path = None
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = new_pool(1)
+                    finished(index, job, path)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    paths = [results[i] for i in sorted(results) if results[i]]
+    logger.info(f"Rendered {len(paths)} of {done} PDFs")
+    if zip_path and paths:
+        bundle_zip(paths, zip_path)
+    return paths
+
+
+def bundle_zip(paths: Iterable[str], zip_path: str) -> str:
+    """Write the files into one zip (flat, by file name)."""
+    os.makedirs(os.path.dirname(os.path.abspath(zip_path)), exist_ok=True)
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path in paths:
+            archive.write(path, arcname=os.path.basename(path))
+    return zip_path
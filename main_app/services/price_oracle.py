@@ -0,0 +1,564 @@
+"""
+ETH/USD Price Oracle Module
+
+Single source of ETH/USD prices for every decoder. Instead of one Chainlink
+latestRoundData eth_call per block, the oracle keeps the aggregator's round
+history (roundId, answer, updatedAt) in a local parquet file and answers
+"price at block/timestamp" with a binary search over updatedAt.
+
+The price at time t is the answer of the last round with updatedAt <= t,
+which is exactly what latestRoundData returns at a block with timestamp t.
+That only holds where the stored history is complete, so the oracle also
+records the timestamp ranges it has fully synced ("coverage"); lookups
+outside coverage fall back to a live latestRoundData read, whose round is
+stored as well.
+
+Round ids are (phaseId << 64) | aggregatorRoundId. A range sync reads the
+rounds current at both ends of the range and then every round id between
+them with batched getRoundData calls, walking across aggregator phase
+changes when the proxy was upgraded in between.
+"""
+
+import os
+import json
+import atexit
+import bisect
+import threading
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from web3 import Web3
+
+from .chain_cache import ChainDataCache, get_chain_cache
+from .rpc_batch import BatchRpcFetcher
+from ..config.blockchain_config import (
+    CACHE_SIZES,
+    CHAINLINK_ETH_USD_FEED,
+    CHAINLINK_AGGREGATOR_V3_ABI,
+    CHAINLINK_ETH_USD_DECIMALS,
+)
+
+logger = logging.getLogger(__name__)
+
+PHASE_OFFSET = 64
+AGGREGATOR_ROUND_MASK = (1 << PHASE_OFFSET) - 1
+
+# Rough spacing of ETH/USD rounds (1h heartbeat, 0.5% deviation). Used only
+# to choose between a range sync and per-block reads when prefetching.
+ESTIMATED_ROUND_INTERVAL_SECONDS = 1800
+
+# Write the file after this many rounds were learned from live reads
+FLUSH_EVERY_ROUNDS = 64
+
+_SCHEMA = pa.schema([
+    ('phase_id', pa.uint16()),
+    ('aggregator_round_id', pa.uint64()),
+    ('answer', pa.int64()),
+    ('updated_at', pa.int64()),
+])
+
+
+class PriceUnavailableError(LookupError):
+    """Raised when no price can be determined for a block or timestamp"""
+
+
+def split_round_id(round_id: int) -> Tuple[int, int]:
+    """(phaseId, aggregatorRoundId) of a proxy round id"""
+    return round_id >> PHASE_OFFSET, round_id & AGGREGATOR_ROUND_MASK
+
+
+def make_round_id(phase_id: int, aggregator_round_id: int) -> int:
+    """Proxy round id from its phase and aggregator round"""
+    return (phase_id << PHASE_OFFSET) | aggregator_round_id
+
+
+def _merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort and merge overlapping or touching [start, end] intervals"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class EthUsdPriceOracle:
+    """Chainlink ETH/USD round history with block and timestamp lookups"""
+
+    def __init__(self, path: Optional[str] = None, feed: str = CHAINLINK_ETH_USD_FEED,
+                 decimals: int = CHAINLINK_ETH_USD_DECIMALS,
+                 lru_size: int = CACHE_SIZES["eth_price_at_block"],
+                 chain_cache: Optional[ChainDataCache] = None):
+        """
+        Initialize the oracle
+
+        Args:
+            path: Parquet file for the round history (None keeps it in memory)
+            feed: Chainlink aggregator proxy address
+            decimals: Decimals of the feed answer
+            lru_size: Block prices kept in the shared in-memory LRU
+            chain_cache: Cache used to look up block timestamps (default: shared cache)
+        """
+        self.path = path
+        self.feed = Web3.to_checksum_address(feed)
+        self.scale = Decimal(10 ** decimals)
+        self.lru_size = lru_size
+        self._chain_cache = chain_cache
+
+        self._lock = threading.RLock()
+        self._rounds: Dict[int, Tuple[int, int]] = {}  # round id -> (answer, updatedAt)
+        self._coverage: List[Tuple[int, int]] = []
+        self._updated_at = np.empty(0, dtype=np.int64)
+        self._answers = np.empty(0, dtype=np.int64)
+        self._lru: "OrderedDict[int, Decimal]" = OrderedDict()
+        self._unsaved = 0
+        self._dirty = False
+
+        self.stats = {
+            'lru_hits': 0,
+            'history_hits': 0,
+            'live_reads': 0,
+            'rounds_synced': 0,
+            'stale_answers': 0,
+        }
+
+        if path and os.path.exists(path):
+            try:
+                self._load()
+            except Exception as e:
+                logger.warning(f"Could not read price history {path}: {e}")
+
+    @property
+    def chain_cache(self) -> ChainDataCache:
+        return self._chain_cache if self._chain_cache is not None else get_chain_cache()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _read_file(self) -> Tuple[Dict[int, Tuple[int, int]], List[Tuple[int, int]]]:
+        """Rounds and coverage stored in the parquet file"""
+        table = pq.read_table(self.path)
+        columns = table.to_pydict()
+        rounds = {
+            make_round_id(phase, agg): (answer, updated)
+            for phase, agg, answer, updated in zip(
+                columns['phase_id'], columns['aggregator_round_id'],
+                columns['answer'], columns['updated_at'],
+            )
+        }
+        metadata = table.schema.metadata or {}
+        coverage = [tuple(c) for c in json.loads(metadata.get(b'coverage', b'[]'))]
+        return rounds, coverage
+
+    def _load(self) -> None:
+        rounds, coverage = self._read_file()
+        with self._lock:
+            self._rounds.update(rounds)
+            self._coverage = _merge_intervals(self._coverage + coverage)
+            self._rebuild_index()
+        logger.info(f"Loaded {len(rounds)} ETH/USD rounds from {self.path}")
+
+    def save(self) -> None:
+        """Write the round history, merged with whatever another process saved meanwhile"""
+        if not self.path:
+            self._unsaved, self._dirty = 0, False
+            return
+
+        with self._lock:
+            if os.path.exists(self.path):
+                try:
+                    rounds, coverage = self._read_file()
+                    for round_id, value in rounds.items():
+                        self._rounds.setdefault(round_id, value)
+                    self._coverage = _merge_intervals(self._coverage + coverage)
+                    self._rebuild_index()
+                except Exception as e:
+                    logger.warning(f"Overwriting unreadable price history {self.path}: {e}")
+
+            ids = sorted(self._rounds, key=lambda r: (self._rounds[r][1], r))
+            table = pa.table({
+                'phase_id': [split_round_id(r)[0] for r in ids],
+                'aggregator_round_id': [split_round_id(r)[1] for r in ids],
+                'answer': [self._rounds[r][0] for r in ids],
+                'updated_at': [self._rounds[r][1] for r in ids],
+            }, schema=_SCHEMA.with_metadata({
+                'feed': self.feed,
+                'coverage': json.dumps(self._coverage),
+            }))
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, self.path)
+            self._unsaved, self._dirty = 0, False
+
+    def flush(self) -> None:
+        """Save if anything changed since the last save; errors are logged, not raised"""
+        if not self._dirty:
+            return
+        try:
+            self.save()
+        except Exception as e:
+            logger.warning(f"Could not save price history {self.path}: {e}")
+
+    def _rebuild_index(self) -> None:
+        """Sorted updatedAt/answer arrays used by the binary search"""
+        values = sorted(self._rounds.values(), key=lambda v: v[1])
+        self._updated_at = np.fromiter((v[1] for v in values), dtype=np.int64, count=len(values))
+        self._answers = np.fromiter((v[0] for v in values), dtype=np.int64, count=len(values))
+
+    def add_rounds(self, rounds: Dict[int, Tuple[int, int]],
+                   covered: Optional[Tuple[int, int]] = None) -> int:
+        """
+        Store rounds and optionally mark a timestamp range as complete
+
+        Args:
+            rounds: round id -> (answer, updatedAt); rounds with updatedAt 0 are ignored
+            covered: (start, end) timestamps for which every round is now known
+
+        Returns:
+            Number of rounds that were not known before
+        """
+        with self._lock:
+            added = 0
+            for round_id, (answer, updated_at) in rounds.items():
+                if updated_at and round_id not in self._rounds:
+                    self._rounds[round_id] = (int(answer), int(updated_at))
+                    added += 1
+            if covered is not None and covered[0] <= covered[1]:
+                coverage = _merge_intervals(self._coverage + [tuple(covered)])
+                if coverage != self._coverage:
+                    self._coverage = coverage
+                    self._dirty = True
+            if added:
+                self._rebuild_index()
+                self._unsaved += added
+                self._dirty = True
+            return added
+
+    def __len__(self) -> int:
+        return len(self._rounds)
+
+    @property
+    def coverage(self) -> List[Tuple[int, int]]:
+        """Merged [start, end] timestamp ranges with complete round history"""
+        return list(self._coverage)
+
+    def is_covered(self, timestamp: int) -> bool:
+        coverage = self._coverage
+        i = bisect.bisect_right(coverage, (timestamp, float('inf'))) - 1
+        return i >= 0 and coverage[i][0] <= timestamp <= coverage[i][1]
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def price_at_timestamp(self, timestamp: int, interpolate: bool = False,
+                           allow_stale: bool = False) -> Optional[Decimal]:
+        """
+        ETH/USD price from the stored history
+
+        Args:
+            timestamp: Unix timestamp
+            interpolate: Interpolate linearly between the surrounding rounds
+                instead of returning the answer in force at timestamp
+            allow_stale: Answer from the nearest earlier round even if the
+                history around timestamp may be incomplete
+
+        Returns:
+            Price, or None if the history cannot answer for this timestamp
+        """
+        if not allow_stale and not self.is_covered(timestamp):
+            return None
+
+        updated_at, answers = self._updated_at, self._answers
+        i = int(np.searchsorted(updated_at, timestamp, side='right')) - 1
+        if i < 0:
+            return None
+
+        price = Decimal(int(answers[i])) / self.scale
+        if interpolate and i + 1 < len(updated_at) and updated_at[i] < timestamp:
+            t0, t1 = int(updated_at[i]), int(updated_at[i + 1])
+            next_price = Decimal(int(answers[i + 1])) / self.scale
+            price += (next_price - price) * (timestamp - t0) / (t1 - t0)
+        return price
+
+    def price_at_block(self, w3, block_number: int, timestamp: Optional[int] = None,
+                       interpolate: bool = False) -> Decimal:
+        """
+        ETH/USD price at a block
+
+        Answers from the shared LRU, then the stored history, then a live
+        latestRoundData read at the block (whose round is kept for later).
+
+        Args:
+            w3: Web3 instance
+            block_number: Block number
+            timestamp: Block timestamp if the caller already has the block
+            interpolate: See price_at_timestamp
+
+        Returns:
+            Price in USD per ETH
+
+        Raises:
+            PriceUnavailableError: if neither the history nor the node can answer
+        """
+        block_number = int(block_number)
+        if not interpolate:
+            with self._lock:
+                price = self._lru.get(block_number)
+                if price is not None:
+                    self._lru.move_to_end(block_number)
+                    self.stats['lru_hits'] += 1
+                    return price
+
+        if timestamp is None:
+            try:
+                timestamp = int(self.chain_cache.get_block(w3, block_number)['timestamp'])
+            except Exception as e:
+                logger.debug(f"No timestamp for block {block_number}: {e}")
+
+        price = None
+        if timestamp is not None:
+            price = self.price_at_timestamp(timestamp, interpolate=interpolate)
+            if price is not None:
+                self.stats['history_hits'] += 1
+
+        if price is None:
+            price = self._read_live(w3, block_number, timestamp)
+
+        if not interpolate:
+            self._remember(block_number, price)
+        return price
+
+    def _remember(self, block_number: int, price: Decimal) -> None:
+        with self._lock:
+            self._lru[block_number] = price
+            self._lru.move_to_end(block_number)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _aggregator(self, w3):
+        return w3.eth.contract(address=self.feed, abi=CHAINLINK_AGGREGATOR_V3_ABI)
+
+    def _read_live(self, w3, block_number: int, timestamp: Optional[int]) -> Decimal:
+        """latestRoundData at the block; stale history if the node cannot answer"""
+        try:
+            round_id, answer, _, updated_at, _ = (
+                self._aggregator(w3).functions.latestRoundData().call(block_identifier=block_number)
+            )
+        except Exception as e:
+            stale = (self.price_at_timestamp(timestamp, allow_stale=True)
+                     if timestamp is not None else None)
+            if stale is None:
+                raise PriceUnavailableError(
+                    f"No ETH/USD price at block {block_number}: {e}"
+                ) from e
+            self.stats['stale_answers'] += 1
+            logger.warning(f"Using last known ETH/USD round for block {block_number}: {e}")
+            return stale
+
+        self.stats['live_reads'] += 1
+        covered = (updated_at, timestamp) if timestamp is not None else None
+        self.add_rounds({round_id: (answer, updated_at)}, covered)
+        if self._unsaved >= FLUSH_EVERY_ROUNDS:
+            self.flush()
+        return Decimal(answer) / self.scale
+
+    # ------------------------------------------------------------------
+    # Bulk loading
+    # ------------------------------------------------------------------
+
+    def block_timestamps(self, w3, block_numbers: Iterable[int],
+                         fetcher: Optional[BatchRpcFetcher] = None) -> Dict[int, int]:
+        """Timestamps for blocks, from the chain cache or one batched fetch"""
+        numbers = sorted({int(n) for n in block_numbers})
+        cache = self.chain_cache
+        blocks = {int(k): v for k, v in cache.get_many('block', map(str, numbers)).items()}
+
+        missing = [n for n in numbers if n not in blocks]
+        if missing:
+            fetcher = fetcher or BatchRpcFetcher(w3)
+            for number, block in fetcher.fetch({n: partial(w3.eth.get_block, n) for n in missing}).items():
+                if block is not None:
+                    blocks[number] = block
+                    cache.put_block(number, block)
+        return {n: int(block['timestamp']) for n, block in blocks.items()}
+
+    def sync_range(self, w3, start_block: int, end_block: int,
+                   end_timestamp: Optional[int] = None,
+                   fetcher: Optional[BatchRpcFetcher] = None) -> int:
+        """
+        Download every round between two blocks
+
+        Args:
+            w3: Web3 instance
+            start_block: First block of the range
+            end_block: Last block of the range
+            end_timestamp: Timestamp of end_block if already known
+            fetcher: Batch fetcher (default: a new one with default settings)
+
+        Returns:
+            Number of new rounds stored
+        """
+        fetcher = fetcher or BatchRpcFetcher(w3)
+        aggregator = self._aggregator(w3)
+
+        if end_timestamp is None:
+            end_timestamp = self.block_timestamps(w3, [end_block], fetcher).get(end_block)
+
+        ends = fetcher.fetch({
+            block: partial(aggregator.functions.latestRoundData().call, block_identifier=block)
+            for block in {start_block, end_block}
+        })
+        if start_block not in ends or end_block not in ends:
+            raise PriceUnavailableError(f"latestRoundData failed for blocks {start_block}-{end_block}")
+
+        first_round, _, _, first_updated, _ = ends[start_block]
+        last_round = ends[end_block][0]
+        rounds = {r[0]: (r[1], r[3]) for r in ends.values()}
+
+        complete = True
+        first_phase, first_agg = split_round_id(first_round)
+        last_phase, last_agg = split_round_id(last_round)
+        for phase in range(first_phase, last_phase + 1):
+            start = first_agg if phase == first_phase else 1
+            end = last_agg if phase == last_phase else None
+            phase_rounds, phase_complete = self._fetch_phase_rounds(aggregator, phase, start, end, fetcher)
+            rounds.update(phase_rounds)
+            complete = complete and phase_complete
+
+        covered = (first_updated, end_timestamp) if complete and end_timestamp is not None else None
+        if not complete:
+            logger.warning(f"Incomplete ETH/USD round history for blocks {start_block}-{end_block}")
+
+        added = self.add_rounds(rounds, covered)
+        self.stats['rounds_synced'] += added
+        self.flush()
+        logger.info(f"Synced {added} ETH/USD rounds for blocks {start_block}-{end_block}")
+        return added
+
+    def _fetch_phase_rounds(self, aggregator, phase: int, start: int, end: Optional[int],
+                            fetcher: BatchRpcFetcher) -> Tuple[Dict[int, Tuple[int, int]], bool]:
+        """
+        getRoundData for aggregator rounds start..end of one phase
+
+        When end is None (a phase that ended inside the range) its last round
+        is located first, so the batches never contain reverting calls.
+
+        Returns:
+            (round id -> (answer, updatedAt), True if no round in between is missing)
+        """
+        if end is None:
+            end = self._last_round_of_phase(aggregator, phase, start)
+
+        calls = {}
+        for agg in range(start, end + 1):
+            round_id = make_round_id(phase, agg)
+            if round_id not in self._rounds:
+                calls[round_id] = partial(aggregator.functions.getRoundData(round_id).call)
+        found = {rid: (data[1], data[3]) for rid, data in fetcher.fetch(calls).items() if data[3]}
+        return found, len(found) == len(calls)
+
+    def _last_round_of_phase(self, aggregator, phase: int, start: int) -> int:
+        """Highest aggregator round of a finished phase (exponential then binary search)"""
+        def has_round(agg: int) -> bool:
+            round_id = make_round_id(phase, agg)
+            if round_id in self._rounds:
+                return True
+            try:
+                return aggregator.functions.getRoundData(round_id).call()[3] > 0
+            except Exception:
+                return False
+
+        low, step = start, 1
+        while has_round(low + step):
+            low += step
+            step *= 2
+        high = low + step  # has_round(low) and not has_round(high)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if has_round(middle):
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def prefetch_blocks(self, w3, block_numbers: Iterable[int],
+                        timestamps: Optional[Dict[int, int]] = None,
+                        fetcher: Optional[BatchRpcFetcher] = None) -> None:
+        """
+        Make every block in block_numbers answerable from the local history
+
+        Uses one range sync when the blocks span fewer rounds than there are
+        blocks to price, otherwise one batched latestRoundData per block.
+
+        Args:
+            w3: Web3 instance
+            block_numbers: Blocks that will be priced
+            timestamps: Known block timestamps (the rest are looked up)
+            fetcher: Batch fetcher (default: a new one with default settings)
+        """
+        numbers = sorted({int(n) for n in block_numbers})
+        if not numbers:
+            return
+        fetcher = fetcher or BatchRpcFetcher(w3)
+
+        timestamps = dict(timestamps or {})
+        missing = [n for n in numbers if n not in timestamps]
+        if missing:
+            timestamps.update(self.block_timestamps(w3, missing, fetcher))
+
+        uncovered = [n for n in numbers if n not in timestamps or not self.is_covered(timestamps[n])]
+        if not uncovered:
+            return
+
+        first, last = uncovered[0], uncovered[-1]
+        span = timestamps.get(last, 0) - timestamps.get(first, 0)
+        if span // ESTIMATED_ROUND_INTERVAL_SECONDS < len(uncovered):
+            try:
+                self.sync_range(w3, first, last, timestamps.get(last), fetcher)
+                return
+            except PriceUnavailableError as e:
+                logger.warning(f"Range sync failed, reading rounds per block: {e}")
+
+        aggregator = self._aggregator(w3)
+        results = fetcher.fetch({
+            n: partial(aggregator.functions.latestRoundData().call, block_identifier=n)
+            for n in uncovered
+        })
+        for number, (round_id, answer, _, updated_at, _) in results.items():
+            covered = (updated_at, timestamps[number]) if number in timestamps else None
+            self.add_rounds({round_id: (answer, updated_at)}, covered)
+        self.flush()
+
+
+_default_oracle: Optional[EthUsdPriceOracle] = None
+_default_oracle_lock = threading.Lock()
+
+
+def get_price_oracle() -> EthUsdPriceOracle:
+    """Process-wide ETH/USD oracle shared by all decoders"""
+    global _default_oracle
+    with _default_oracle_lock:
+        if _default_oracle is None:
+            from ..config.blockchain_config import PRICE_ORACLE_PATH, CHAIN_CACHE_DISABLED
+            _default_oracle = EthUsdPriceOracle(None if CHAIN_CACHE_DISABLED else PRICE_ORACLE_PATH)
+            atexit.register(_default_oracle.flush)
+        return _default_oracle
+
+
+def set_price_oracle(oracle: Optional[EthUsdPriceOracle]) -> None:
+    """Replace the process-wide oracle (None resets to the configured default)"""
+    global _default_oracle
+    with _default_oracle_lock:
+        _default_oracle = oracle
@@ -0,0 +1,174 @@
+"""
+Batched JSON-RPC Fetcher
+
+Sends many independent read calls (eth_getTransactionByHash,
+eth_getTransactionReceipt, eth_getBlockByNumber, eth_call) as JSON-RPC batch
+requests instead of one HTTP round trip each. Batches are sent with bounded
+concurrency and retried with exponential backoff when the node answers
+429 Too Many Requests.
+
+If a batch fails for another reason (e.g. one transaction is unknown, or the
+provider does not support batching) its calls are retried one by one so a
+single bad item does not sink the rest.
+"""
+
+import time
+import random
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True if an RPC error means the node is throttling us (HTTP 429)"""
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    text = str(error).lower()
+    return '429' in text or 'too many requests' in text or 'rate limit' in text
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After header of a 429 response, if the node sent one"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class BatchRpcFetcher:
+    """Executes keyed web3 calls as concurrent JSON-RPC batches"""
+
+    def __init__(self, w3, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = 0.5, max_backoff: float = 30.0):
+        """
+        Initialize the fetcher
+
+        Args:
+            w3: Web3 instance (HTTP provider for real batching)
+            batch_size: Calls per JSON-RPC batch
+            max_concurrency: Batches in flight at once
+            max_retries: Retries per batch on 429 responses
+            backoff_base: First backoff delay in seconds (doubles per retry)
+            max_backoff: Upper bound on a single backoff delay
+        """
+        self.w3 = w3
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'batches': 0,
+            'calls': 0,
+            'rate_limited': 0,
+            'single_calls': 0,
+            'failed_calls': 0,
+        }
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[stat] += n
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before retry number attempt (Retry-After wins if present)"""
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = self.backoff_base * (2 ** attempt) * (1 + random.random() * 0.25)
+        return min(delay, self.max_backoff)
+
+    def fetch(self, calls: Dict[Hashable, Callable[[], Any]]) -> Dict[Hashable, Any]:
+        """
+        Run keyed calls in batches
+
+        Each call must be a zero-argument callable that issues exactly one
+        web3 request, e.g. functools.partial(w3.eth.get_block, 123). Inside a
+        batch the callable only records the request; outside it runs normally.
+
+        Args:
+            calls: Dict of key -> request callable
+
+        Returns:
+            Dict of key -> result for every call that succeeded
+        """
+        items = list(calls.items())
+        if not items:
+            return {}
+
+        chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        results: Dict[Hashable, Any] = {}
+
+        if self.max_concurrency == 1 or len(chunks) == 1:
+            for chunk in chunks:
+                results.update(self._fetch_chunk(chunk))
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as pool:
+            for chunk_result in pool.map(self._fetch_chunk, chunks):
+                results.update(chunk_result)
+        return results
+
+    def _fetch_chunk(self, chunk: List[Tuple[Hashable, Callable[[], Any]]]) -> Dict[Hashable, Any]:
+        """One batch, with 429 backoff and per-call fallback"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._execute_batch(chunk)
+            except Exception as e:
+                if is_rate_limited(e):
+                    self._count('rate_limited')
+                    if attempt < self.max_retries:
+                        delay = self._backoff(attempt, e)
+                        logger.debug(f"RPC batch rate limited, retrying in {delay:.2f}s")
+                        time.sleep(delay)
+                        continue
+                    logger.warning(f"RPC batch of {len(chunk)} still rate limited after "
+                                   f"{self.max_retries} retries")
+                    self._count('failed_calls', len(chunk))
+                    return {}
+
+                logger.debug(f"RPC batch failed ({e}), falling back to single calls")
+                return self._fetch_individually(chunk)
+        return {}
+
+    def _execute_batch(self, chunk: List[Tuple[Hashable, Callable[[], Any]]]) -> Dict[Hashable, Any]:
+        """Send one JSON-RPC batch request"""
+        with self.w3.batch_requests() as batch:
+            for _, build_request in chunk:
+                batch.add(build_request())
+            responses = batch.execute()
+
+        self._count('batches')
+        self._count('calls', len(chunk))
+        return {key: response for (key, _), response in zip(chunk, responses)}
+
+    def _fetch_individually(self, chunk: List[Tuple[Hashable, Callable[[], Any]]]) -> Dict[Hashable, Any]:
+        """Run each call on its own; failed calls are left out of the result"""
+        results = {}
+        for key, call in chunk:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    results[key] = call()
+                    self._count('single_calls')
+                    break
+                except Exception as e:
+                    if is_rate_limited(e) and attempt < self.max_retries:
+                        self._count('rate_limited')
+                        time.sleep(self._backoff(attempt, e))
+                        continue
+                    logger.debug(f"RPC call {key} failed: {e}")
+                    self._count('failed_calls')
+                    break
+        return results
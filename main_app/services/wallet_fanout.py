@@ -0,0 +1,194 @@
+"""
+Multi-Wallet Fetcher
+
+Fetches normal transactions, internal transactions and ERC-20 transfers for
+several wallets at once ("all fund wallets" mode). The (wallet, kind) calls
+run on a small thread pool; the Etherscan client's rate limiter hands out
+request slots to the threads, so together they stay within the provider's
+request budget instead of waiting for each other's HTTP round trips.
+
+The per-wallet frames are merged into one frame with a wallet column. A
+transfer between two fund wallets is returned for both of them and is kept
+once, attributed to the sending wallet and flagged intercompany.
+
+Cursors remember the last block fully read per (wallet, kind), so a refresh
+asks Etherscan only for newer blocks.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# (kind, EtherscanClient method)
+FETCH_KINDS = (
+    ('normal', 'get_transactions'),
+    ('internal', 'get_internal_transactions'),
+    ('token', 'get_token_transfers'),
+)
+
+DEFAULT_MAX_WORKERS = 4
+
+# Columns that identify the same transfer seen from two wallets
+_IDENTITY_COLUMNS = ['hash', 'tx_kind', '_from', '_to', 'token', 'amount']
+
+
+def _with_identity(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of df with the lowercase '_from'/'_to' identity columns"""
+    df = df.copy()
+    df['_from'] = df['from'].fillna('').astype(str).str.lower()
+    df['_to'] = df['to'].fillna('').astype(str).str.lower()
+    return df
+
+
+def merge_wallet_rows(df: pd.DataFrame, wallets: Iterable[str],
+                      existing: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Collapse rows fetched for several wallets into one row per transfer.
+
+    Args:
+        df: Rows with 'wallet' (lowercase) and 'tx_kind' columns
+        wallets: The fund wallets the rows were fetched for
+        existing: Already merged rows of earlier fetches; new rows for a
+            transfer they hold (e.g. fetched before from the other wallet)
+            are dropped
+
+    Returns:
+        Deduplicated rows, newest first, with wallet attributed to the
+        sending fund wallet (else the receiving one), type from that
+        wallet's view and an intercompany flag
+    """
+    if existing is not None and not existing.empty:
+        new = merge_wallet_rows(df, wallets) if not df.empty else df
+        if new.empty:
+            return existing
+        # Existing rows were re-attributed, so match them by identity only;
+        # the n-th copy of a transfer is a duplicate of the n-th known copy
+        new, known = _with_identity(new), _with_identity(existing)
+        for frame in (new, known):
+            frame['_occurrence'] = frame.groupby(_IDENTITY_COLUMNS, sort=False, dropna=False).cumcount()
+        keys = _IDENTITY_COLUMNS + ['_occurrence']
+        seen = pd.MultiIndex.from_frame(known[keys])
+        new = new[~pd.MultiIndex.from_frame(new[keys]).isin(seen)]
+        new = new.drop(columns=['_from', '_to', '_occurrence'])
+        df = pd.concat([new, existing], ignore_index=True)
+        return df.sort_values('timestamp', ascending=False).reset_index(drop=True)
+
+    if df.empty:
+        return df
+
+    wallets = {w.strip().lower() for w in wallets if w}
+    df = _with_identity(df)
+
+    # Identical transfers inside one wallet's results are distinct; only the
+    # same occurrence seen from another wallet is a duplicate
+    df['_occurrence'] = df.groupby(['wallet'] + _IDENTITY_COLUMNS, sort=False, dropna=False).cumcount()
+    df = df.drop_duplicates(subset=_IDENTITY_COLUMNS + ['_occurrence'], keep='first')
+
+    from_fund = df['_from'].isin(wallets)
+    to_fund = df['_to'].isin(wallets)
+    df['wallet'] = df['_from'].where(from_fund, df['_to'].where(to_fund, df['wallet']))
+    df['type'] = (df['wallet'] == df['_from']).map({True: 'OUT', False: 'IN'})
+    df['intercompany'] = from_fund & to_fund
+
+    df = df.drop(columns=['_from', '_to', '_occurrence'])
+    return df.sort_values('timestamp', ascending=False).reset_index(drop=True)
+
+
+class MultiWalletFetcher:
+    """Concurrent Etherscan fetches for a set of wallets"""
+
+    def __init__(self, client, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialize the fetcher
+
+        Args:
+            client: EtherscanClient (its rate limiter is shared by all threads)
+            max_workers: Requests in flight at once
+        """
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.stats = {'requests': 0, 'rows': 0, 'duplicates': 0}
+
+    def _fetch_one(self, wallet: str, kind: str, method: str, limit: int,
+                   cursor: Optional[int]) -> Tuple[pd.DataFrame, Optional[int]]:
+        """
+        One (wallet, kind) call.
+
+        Returns:
+            (rows, new cursor); the cursor is None if nothing was read
+        """
+        fetch = getattr(self.client, method)
+        if cursor is None:
+            # First load: the newest rows
+            df = fetch(wallet, limit=limit, sort='desc')
+            new_cursor = int(df['block'].max()) if not df.empty else None
+        else:
+            # Delta: oldest first after the cursor; when the page is full the
+            # last block may be cut off, so leave it for the next refresh
+            df = fetch(wallet, limit=limit, start_block=cursor + 1, sort='asc')
+            if df.empty:
+                return df, cursor
+            new_cursor = int(df['block'].max())
+            if len(df) >= limit and new_cursor > cursor + 1:
+                df = df[df['block'] < new_cursor]
+                new_cursor -= 1
+
+        if not df.empty:
+            df = df.assign(wallet=wallet, tx_kind=kind)
+        return df, new_cursor
+
+    def fetch(self, wallets: List[str], limit: int = 100,
+              cursors: Optional[Dict[Tuple[str, str], int]] = None,
+              existing: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Fetch and merge the transactions of all wallets.
+
+        Args:
+            wallets: Wallet addresses
+            limit: Rows per (wallet, kind) call
+            cursors: Last block read per (wallet, kind), updated in place;
+                known cursors make this a delta fetch
+            existing: Rows of earlier fetches to merge the new rows into
+
+        Returns:
+            One frame for all wallets (see merge_wallet_rows)
+        """
+        wallets = list(dict.fromkeys(w.strip().lower() for w in wallets if w and w.strip()))
+        cursors = cursors if cursors is not None else {}
+        tasks = [(wallet, kind, method) for wallet in wallets for kind, method in FETCH_KINDS]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks) or 1)) as pool:
+            futures = {
+                (wallet, kind): pool.submit(self._fetch_one, wallet, kind, method, limit, cursors.get((wallet, kind)))
+                for wallet, kind, method in tasks
+            }
+
+        frames = []
+        for key, future in futures.items():
+            try:
+                df, cursor = future.result()
+            except Exception as e:
+                logger.error(f"Fetch of {key[1]} transactions for {key[0]} failed: {e}")
+                continue
+            if cursor is not None:
+                cursors[key] = cursor
+            if not df.empty:
+                frames.append(df)
+
+        self.stats['requests'] += len(tasks)
+        fetched = sum(len(df) for df in frames)
+        self.stats['rows'] += fetched
+
+        if not frames:
+            return existing if existing is not None else pd.DataFrame()
+
+        combined = pd.concat(frames, ignore_index=True)
+        merged = merge_wallet_rows(combined, wallets, existing)
+        known = len(existing) if existing is not None else 0
+        self.stats['duplicates'] += len(combined) + known - len(merged)
+        logger.info(f"Fetched {fetched} rows for {len(wallets)} wallets ({len(merged)} after merging)")
+        return merged
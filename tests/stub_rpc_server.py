@@ -0,0 +1,467 @@
+"""
+Stub Ethereum JSON-RPC Server - deterministic local node for tests and benchmarks
+
+Serves a synthetic chain of WETH transfers from a fund wallet over HTTP,
+answering single and batched JSON-RPC requests. Every HTTP request sleeps for
+a fixed latency to model the network round trip to a hosted node, and an
+optional requests-per-second cap answers 429 Too Many Requests like Infura or
+Alchemy do when throttling.
+
+Supported methods: eth_chainId, net_version, eth_blockNumber,
+eth_getTransactionByHash, eth_getTransactionReceipt, eth_getBlockByNumber,
+eth_call (Chainlink latestRoundData / getRoundData, registered contracts and
+a built-in Multicall3 aggregate3 / getEthBalance), eth_getBalance, eth_getCode,
+eth_getStorageAt. Blocks without transactions are synthesized on demand up to
+the chain head.
+
+Contracts are registered with register_contract(address, handler), where the
+handler maps (calldata, block number) to return data or raises StubRevert;
+abi_contract() builds a handler from an ABI and Python implementations.
+
+Usage:
+    python tests/stub_rpc_server.py --port 8545 --txs 5000 --latency 0.05
+
+    with StubRpcServer(n_txs=100) as server:
+        w3 = Web3(Web3.HTTPProvider(server.url))
+"""
+
+import json
+import time
+import threading
+import argparse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from eth_abi import decode, encode
+from eth_utils import function_abi_to_4byte_selector, keccak
+from eth_utils.abi import get_abi_input_types, get_abi_output_types
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+FUND_WALLET = "0x" + "f0" * 20
+COUNTERPARTY = "0x" + "c0" * 20
+TRANSFER_TOPIC = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+LATEST_ROUND_DATA_SELECTOR = "0xfeaf968c"
+GET_ROUND_DATA_SELECTOR = "0x" + keccak(text="getRoundData(uint80)")[:4].hex()
+FIRST_BLOCK = 19_000_000
+FIRST_TIMESTAMP = 1_704_067_200  # 2024-01-01T00:00:00Z
+ROUNDS_ORIGIN_BLOCK = FIRST_BLOCK - 10_000  # block of the first Chainlink round
+MULTICALL3 = "0xca11bde05977b3631167028862be2a173976ca11"
+AGGREGATE3_SELECTOR = keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+GET_ETH_BALANCE_SELECTOR = keccak(text="getEthBalance(address)")[:4]
+
+ContractHandler = Callable[[bytes, int], bytes]
+
+
+class StubRevert(Exception):
+    """Raised by a contract handler to make the call revert"""
+
+
+def _hex(value: int) -> str:
+    return hex(value)
+
+
+def _pad_address(address: str) -> str:
+    return "0x" + "0" * 24 + address[2:]
+
+
+def abi_contract(abi: List[Dict[str, Any]], implementations: Dict[str, Callable[..., Any]]) -> ContractHandler:
+    """
+    Contract handler that decodes calldata with abi and encodes the result
+
+    Args:
+        abi: Contract ABI
+        implementations: Function name -> fn(block, *args) returning the
+            output value (or a tuple of values for several outputs)
+    """
+    functions = {}
+    for fn_abi in abi:
+        if fn_abi.get("type") == "function" and fn_abi["name"] in implementations:
+            functions[function_abi_to_4byte_selector(fn_abi)] = (
+                implementations[fn_abi["name"]], get_abi_input_types(fn_abi), get_abi_output_types(fn_abi))
+
+    def handler(data: bytes, block: int) -> bytes:
+        if data[:4] not in functions:
+            raise StubRevert("unknown selector")
+        implementation, input_types, output_types = functions[data[:4]]
+        value = implementation(block, *decode(input_types, data[4:]))
+        return encode(output_types, [value] if len(output_types) == 1 else list(value))
+
+    return handler
+
+
+class SyntheticChain:
+    """Deterministic transactions, receipts and blocks"""
+
+    def __init__(self, n_txs: int, txs_per_block: int = 4, blocks_per_round: int = 1,
+                 rounds_per_phase: Optional[int] = None):
+        """
+        Args:
+            n_txs: Number of synthetic transactions
+            txs_per_block: Transactions sharing each block
+            blocks_per_round: Blocks between Chainlink ETH/USD rounds
+            rounds_per_phase: Rounds per aggregator phase (None: a single phase)
+        """
+        self.blocks_per_round = blocks_per_round
+        self.rounds_per_phase = rounds_per_phase
+        self.txs: Dict[str, Dict[str, Any]] = {}
+        self.receipts: Dict[str, Dict[str, Any]] = {}
+        self.blocks: Dict[int, Dict[str, Any]] = {}
+        self.tx_hashes: List[str] = []
+
+        for i in range(n_txs):
+            number = FIRST_BLOCK + i // txs_per_block
+            index = i % txs_per_block
+            tx_hash = "0x" + keccak(text=f"stub-tx-{i}").hex()
+            block_hash = "0x" + keccak(text=f"stub-block-{number}").hex()
+            amount = (i + 1) * 10**16
+            data = "0xa9059cbb" + encode(["address", "uint256"], [COUNTERPARTY, amount]).hex()
+
+            self.tx_hashes.append(tx_hash)
+            self.txs[tx_hash] = {
+                "hash": tx_hash,
+                "blockHash": block_hash,
+                "blockNumber": _hex(number),
+                "transactionIndex": _hex(index),
+                "from": FUND_WALLET,
+                "to": WETH,
+                "value": "0x0",
+                "input": data,
+                "nonce": _hex(i),
+                "gas": _hex(60_000),
+                "gasPrice": _hex(20 * 10**9),
+                "type": "0x0",
+                "chainId": "0x1",
+                "v": "0x25",
+                "r": "0x" + "11" * 32,
+                "s": "0x" + "22" * 32,
+            }
+            self.receipts[tx_hash] = {
+                "transactionHash": tx_hash,
+                "blockHash": block_hash,
+                "blockNumber": _hex(number),
+                "transactionIndex": _hex(index),
+                "from": FUND_WALLET,
+                "to": WETH,
+                "contractAddress": None,
+                "cumulativeGasUsed": _hex(51_000 * (index + 1)),
+                "gasUsed": _hex(51_000),
+                "effectiveGasPrice": _hex(20 * 10**9),
+                "status": "0x1",
+                "type": "0x0",
+                "logsBloom": "0x" + "00" * 256,
+                "logs": [{
+                    "address": WETH,
+                    "topics": [TRANSFER_TOPIC, _pad_address(FUND_WALLET), _pad_address(COUNTERPARTY)],
+                    "data": "0x" + encode(["uint256"], [amount]).hex(),
+                    "blockNumber": _hex(number),
+                    "blockHash": block_hash,
+                    "transactionHash": tx_hash,
+                    "transactionIndex": _hex(index),
+                    "logIndex": _hex(index),
+                    "removed": False,
+                }],
+            }
+            block = self.blocks.setdefault(number, self._make_block(number))
+            block["transactions"].append(tx_hash)
+
+        self.head = max(self.blocks) if self.blocks else FIRST_BLOCK
+
+    @staticmethod
+    def timestamp(number: int) -> int:
+        return FIRST_TIMESTAMP + 12 * (number - FIRST_BLOCK)
+
+    @classmethod
+    def _make_block(cls, number: int) -> Dict[str, Any]:
+        return {
+            "number": _hex(number),
+            "hash": "0x" + keccak(text=f"stub-block-{number}").hex(),
+            "parentHash": "0x" + keccak(text=f"stub-block-{number - 1}").hex(),
+            "timestamp": _hex(cls.timestamp(number)),
+            "miner": "0x" + "00" * 20,
+            "gasLimit": _hex(30_000_000),
+            "gasUsed": "0x0",
+            "baseFeePerGas": _hex(10 * 10**9),
+            "difficulty": "0x0",
+            "totalDifficulty": "0x0",
+            "extraData": "0x",
+            "size": _hex(1000),
+            "nonce": "0x0000000000000000",
+            "mixHash": "0x" + "00" * 32,
+            "sha3Uncles": "0x" + "00" * 32,
+            "logsBloom": "0x" + "00" * 256,
+            "transactionsRoot": "0x" + "00" * 32,
+            "stateRoot": "0x" + "00" * 32,
+            "receiptsRoot": "0x" + "00" * 32,
+            "uncles": [],
+            "transactions": [],
+        }
+
+    def block(self, number: int) -> Optional[Dict[str, Any]]:
+        """Block with its transactions, or an empty one up to the head"""
+        if number in self.blocks:
+            return self.blocks[number]
+        return self._make_block(number) if number <= self.head else None
+
+    # Chainlink ETH/USD rounds: round k (1-based) starts at
+    # ROUNDS_ORIGIN_BLOCK + (k - 1) * blocks_per_round; price drifts $1 per round
+
+    def round_index_at(self, block_number: int) -> int:
+        return (block_number - ROUNDS_ORIGIN_BLOCK) // self.blocks_per_round + 1
+
+    def round_id(self, k: int) -> int:
+        if not self.rounds_per_phase:
+            return (1 << 64) | k
+        phase, agg = divmod(k - 1, self.rounds_per_phase)
+        return ((phase + 1) << 64) | (agg + 1)
+
+    def round_index(self, round_id: int) -> Optional[int]:
+        phase, agg = round_id >> 64, round_id & ((1 << 64) - 1)
+        if phase < 1 or agg < 1:
+            return None
+        if not self.rounds_per_phase:
+            return agg if phase == 1 else None
+        if agg > self.rounds_per_phase:
+            return None
+        return (phase - 1) * self.rounds_per_phase + agg
+
+    def round_data(self, k: int) -> str:
+        """getRoundData/latestRoundData return data for round k"""
+        answer = (2500 + k % 500) * 10**8
+        ts = self.timestamp(ROUNDS_ORIGIN_BLOCK + (k - 1) * self.blocks_per_round)
+        round_id = self.round_id(k)
+        return "0x" + encode(
+            ["uint80", "int256", "uint256", "uint256", "uint80"],
+            [round_id, answer, ts, ts, round_id],
+        ).hex()
+
+    def eth_usd_round(self, block_number: int) -> str:
+        """latestRoundData() return data at a block"""
+        return self.round_data(self.round_index_at(block_number))
+
+
+class StubRpcServer:
+    """Threaded HTTP JSON-RPC server over a SyntheticChain"""
+
+    def __init__(self, n_txs: int = 1000, txs_per_block: int = 4, latency: float = 0.05,
+                 max_requests_per_second: Optional[float] = None,
+                 host: str = "127.0.0.1", port: int = 0,
+                 blocks_per_round: int = 1, rounds_per_phase: Optional[int] = None):
+        """
+        Args:
+            n_txs: Number of synthetic transactions
+            txs_per_block: Transactions sharing each block
+            latency: Seconds added to every HTTP request (single or batch)
+            max_requests_per_second: Answer 429 above this HTTP request rate
+            host: Bind address
+            port: Bind port (0 picks a free port)
+            blocks_per_round: Blocks between Chainlink ETH/USD rounds
+            rounds_per_phase: Rounds per aggregator phase (None: a single phase)
+        """
+        self.chain = SyntheticChain(n_txs, txs_per_block, blocks_per_round, rounds_per_phase)
+        self.latency = latency
+        self.max_requests_per_second = max_requests_per_second
+
+        self.http_requests = 0
+        self.rpc_calls = 0
+        self.rate_limited = 0
+        self.calls_by_method: Counter = Counter()
+        self.contracts: Dict[str, ContractHandler] = {}
+        self.eth_balances: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def tx_hashes(self) -> List[str]:
+        return self.chain.tx_hashes
+
+    def register_contract(self, address: str, handler: ContractHandler) -> None:
+        """Answer eth_call to address (directly or through Multicall3) with handler"""
+        self.contracts[address.lower()] = handler
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.http_requests = 0
+            self.rpc_calls = 0
+            self.rate_limited = 0
+            self.calls_by_method.clear()
+
+    def start(self) -> "StubRpcServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubRpcServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+
+    def _throttled(self) -> bool:
+        """Count the request; True if it exceeds the per-second cap"""
+        with self._lock:
+            self.http_requests += 1
+            if not self.max_requests_per_second:
+                return False
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count > self.max_requests_per_second:
+                self.rate_limited += 1
+                return True
+            return False
+
+    def _call_contract(self, to: str, data: bytes, block: int) -> bytes:
+        """Return data of a call to a registered contract or Multicall3"""
+        to = to.lower()
+        if to == MULTICALL3 and data[:4] == AGGREGATE3_SELECTOR:
+            (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+            results = []
+            for target, allow_failure, call_data in calls:
+                try:
+                    results.append((True, self._call_contract(target, call_data, block)))
+                except StubRevert:
+                    if not allow_failure:
+                        raise StubRevert("Multicall3: call failed")
+                    results.append((False, b""))
+            return encode(["(bool,bytes)[]"], [results])
+        if to == MULTICALL3 and data[:4] == GET_ETH_BALANCE_SELECTOR:
+            (address,) = decode(["address"], data[4:])
+            return encode(["uint256"], [self.eth_balances.get(address.lower(), 0)])
+        if to in self.contracts:
+            return self.contracts[to](data, block)
+        # A call to an account without code succeeds with no return data
+        return b""
+
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method = request.get("method")
+        params = request.get("params") or []
+        chain = self.chain
+        result: Any = None
+
+        if method == "eth_chainId":
+            result = "0x1"
+        elif method == "net_version":
+            result = "1"
+        elif method == "eth_blockNumber":
+            result = _hex(chain.head)
+        elif method == "eth_getTransactionByHash":
+            result = chain.txs.get(params[0].lower())
+        elif method == "eth_getTransactionReceipt":
+            result = chain.receipts.get(params[0].lower())
+        elif method == "eth_getBlockByNumber":
+            tag = params[0]
+            number = chain.head if tag in ("latest", "finalized", "safe") else int(tag, 16)
+            result = chain.block(number)
+        elif method == "eth_call":
+            call, tag = params[0], params[1] if len(params) > 1 else "latest"
+            number = chain.head if not str(tag).startswith("0x") else int(tag, 16)
+            data = call.get("data") or call.get("input") or "0x"
+            to = (call.get("to") or "").lower()
+            if to == MULTICALL3 or to in self.contracts:
+                try:
+                    result = "0x" + self._call_contract(to, bytes.fromhex(data[2:]), number).hex()
+                except StubRevert as e:
+                    return {"jsonrpc": "2.0", "id": request.get("id"),
+                            "error": {"code": 3, "message": f"execution reverted: {e}", "data": "0x"}}
+                except Exception as e:
+                    return {"jsonrpc": "2.0", "id": request.get("id"),
+                            "error": {"code": -32000, "message": str(e)}}
+            elif data.startswith(LATEST_ROUND_DATA_SELECTOR):
+                result = chain.eth_usd_round(number)
+            elif data.startswith(GET_ROUND_DATA_SELECTOR):
+                k = chain.round_index(int(data[10:], 16))
+                if k is None or k > chain.round_index_at(number):
+                    return {"jsonrpc": "2.0", "id": request.get("id"),
+                            "error": {"code": 3, "message": "execution reverted: No data present",
+                                      "data": "0x"}}
+                result = chain.round_data(k)
+            else:
+                result = "0x"
+        elif method == "eth_getBalance":
+            result = _hex(self.eth_balances.get(params[0].lower(), 0))
+        elif method == "eth_getCode":
+            result = "0x"
+        elif method == "eth_getStorageAt":
+            result = "0x" + "00" * 32
+        else:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": f"Method {method} not found"}}
+
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                time.sleep(server.latency)
+
+                if server._throttled():
+                    payload = b'{"jsonrpc":"2.0","error":{"code":-32005,"message":"Too Many Requests"}}'
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0.2")
+                else:
+                    request = json.loads(body)
+                    if isinstance(request, list):
+                        response = [server._dispatch(r) for r in request]
+                        calls = len(request)
+                    else:
+                        response = server._dispatch(request)
+                        calls = 1
+                    with server._lock:
+                        server.rpc_calls += calls
+                        server.calls_by_method.update(
+                            r.get("method") for r in (request if isinstance(request, list) else [request]))
+                    payload = json.dumps(response).encode()
+                    self.send_response(200)
+
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub Ethereum JSON-RPC server")
+    parser.add_argument('--port', type=int, default=8545, help='Port to listen on')
+    parser.add_argument('--txs', type=int, default=5000, help='Synthetic transactions')
+    parser.add_argument('--txs-per-block', type=int, default=4, help='Transactions per block')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per HTTP request')
+    parser.add_argument('--rps', type=float, default=None, help='Requests/second before 429s')
+    args = parser.parse_args()
+
+    server = StubRpcServer(args.txs, args.txs_per_block, args.latency, args.rps, port=args.port)
+    print(f"[+] Stub RPC at {server.url} with {args.txs} transactions")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
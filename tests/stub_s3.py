@@ -0,0 +1,136 @@
+"""
+Stub S3 Client - in-memory bucket for tests and benchmarks
+
+Implements the S3 client calls the app makes (get/put/head/copy/delete
+object, list_objects_v2, ranged gets) against a dict, including ETags and conditional
+puts (IfMatch / IfNoneMatch), which fail with the same ClientError codes as
+S3. Every call can sleep for a fixed latency plus a per-megabyte transfer
+time to model the round trip to a real bucket; byte counters record how much
+was uploaded and downloaded.
+
+Usage:
+    s3 = InMemoryS3(latency=0.03, seconds_per_mb=0.02)
+    persistence = PersistenceManager(fund_id, s3_client=s3)
+"""
+
+import time
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Tuple
+
+from botocore.exceptions import ClientError
+
+
+class _Body:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def read(self) -> bytes:
+        return self.data
+
+
+class InMemoryS3:
+    """Dict-backed stand-in for a boto3 S3 client"""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, latency: float = 0.0, seconds_per_mb: float = 0.0):
+        """
+        Args:
+            latency: Seconds slept per call
+            seconds_per_mb: Extra seconds per MB transferred
+        """
+        self.latency = latency
+        self.seconds_per_mb = seconds_per_mb
+        self.objects: Dict[str, Tuple[bytes, str, datetime]] = {}
+        self.puts = []
+        self.calls = 0
+        self.bytes_uploaded = 0
+        self.bytes_downloaded = 0
+        self._lock = threading.Lock()
+
+    def _wait(self, size: int = 0):
+        self.calls += 1
+        delay = self.latency + self.seconds_per_mb * size / 1_000_000
+        if delay:
+            time.sleep(delay)
+
+    def reset_counters(self):
+        self.puts = []
+        self.calls = 0
+        self.bytes_uploaded = 0
+        self.bytes_downloaded = 0
+
+    @staticmethod
+    def _error(code: str, status: int, operation: str) -> ClientError:
+        return ClientError(
+            {"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+            operation,
+        )
+
+    def head_object(self, Bucket, Key):
+        self._wait()
+        if Key not in self.objects:
+            raise self._error("404", 404, "HeadObject")
+        data, etag, modified = self.objects[Key]
+        return {"ETag": etag, "ContentLength": len(data), "LastModified": modified}
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        if Key not in self.objects:
+            self._wait()
+            raise self.exceptions.NoSuchKey(Key)
+        data, etag, modified = self.objects[Key]
+        size = len(data)
+        response = {"ETag": etag, "LastModified": modified}
+        if Range:
+            # "bytes=a-b", "bytes=a-" or the suffix form "bytes=-n"
+            first, _, last = Range[len("bytes="):].partition("-")
+            if first:
+                first, last = int(first), min(int(last) if last else size - 1, size - 1)
+            else:
+                first, last = max(0, size - int(last)), size - 1
+            data = data[first:last + 1]
+            response["ContentRange"] = f"bytes {first}-{last}/{size}"
+        self._wait(len(data))
+        self.bytes_downloaded += len(data)
+        response.update(Body=_Body(data), ContentLength=len(data))
+        return response
+
+    def put_object(self, Bucket, Key, Body, IfMatch=None, IfNoneMatch=None, **kwargs):
+        data = Body.encode() if isinstance(Body, str) else bytes(Body)
+        self._wait(len(data))
+        with self._lock:
+            current = self.objects.get(Key)
+            if IfNoneMatch == "*" and current is not None:
+                raise self._error("PreconditionFailed", 412, "PutObject")
+            if IfMatch is not None and (current is None or current[1] != IfMatch):
+                raise self._error("PreconditionFailed", 412, "PutObject")
+            etag = '"' + hashlib.md5(data).hexdigest() + '"'
+            self.objects[Key] = (data, etag, datetime.now(timezone.utc))
+        self.puts.append(Key)
+        self.bytes_uploaded += len(data)
+        return {"ETag": etag}
+
+    def copy_object(self, Bucket, CopySource, Key, **kwargs):
+        self._wait()
+        data, etag, _ = self.objects[CopySource["Key"]]
+        self.objects[Key] = (data, etag, datetime.now(timezone.utc))
+        return {}
+
+    def delete_object(self, Bucket, Key):
+        self._wait()
+        self.objects.pop(Key, None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix="", **kwargs):
+        self._wait()
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        return {
+            "Contents": [{"Key": key, "Size": len(self.objects[key][0]), "LastModified": self.objects[key][2]}
+                         for key in keys],
+            "KeyCount": len(keys),
+            "IsTruncated": False,
+        }
@@ -0,0 +1,194 @@
+"""
+Unit tests for the columnar daily accrual schedule.
+
+Tests:
+- The schedule matches the per-day decoder loop on random loans, including totals beyond int64
+- Each loan's rows sum to its interest to the wei
+- Row boundaries, 23:59:59 labels and first/last/partial flags
+- skip_zero drops days allocated 0 wei
+- Interest from principal and rate under each day-count convention
+- NFTfi accruals for a book of loans sum to each loan's net interest
+"""
+import pytest
+import logging
+import random
+import sys
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from main_app.services.decoders.accrual_schedule import (
+    build_accrual_schedule,
+    build_accrual_schedule_reference,
+    simple_interest_wei,
+    SCHEDULE_COLUMNS,
+)
+
+# 2024-01-01 00:00:00 UTC
+MIDNIGHT = 1_704_067_200
+LENDER = '0x' + 'aa' * 20
+BORROWER = '0x' + 'bb' * 20
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def utc(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def make_loans(n=400, seed=0, max_interest=10**13):
+    rng = random.Random(seed)
+    starts, ends, totals = [], [], []
+    for _ in range(n):
+        start = MIDNIGHT + rng.randint(-10**7, 10**7)
+        starts.append(start)
+        ends.append(start + rng.choice([0, 1, 59, 86400, rng.randint(1, 200 * 86400)]))
+        totals.append(rng.choice([0, 1, 7, rng.randint(1, max_interest)]))
+    return starts, ends, totals
+
+
+def assert_same_schedule(actual, expected):
+    pd.testing.assert_frame_equal(actual.drop(columns='interest_wei'), expected.drop(columns='interest_wei'),
+                                  check_dtype=False)
+    assert actual['interest_wei'].tolist() == expected['interest_wei'].tolist()
+
+
+class TestParity:
+    """Test the columnar schedule against the per-day loop."""
+
+    @pytest.mark.parametrize('skip_zero', [False, True])
+    def test_matches_reference(self, skip_zero):
+        starts, ends, totals = make_loans()
+
+        actual = build_accrual_schedule(starts, ends, totals, skip_zero=skip_zero)
+
+        assert str(actual['interest_wei'].dtype) == 'int64'
+        assert_same_schedule(actual, build_accrual_schedule_reference(starts, ends, totals, skip_zero=skip_zero))
+
+    def test_large_totals_stay_exact(self):
+        starts, ends, totals = make_loans(seed=1, max_interest=10**30)
+
+        actual = build_accrual_schedule(starts, ends, totals)
+
+        assert actual['interest_wei'].dtype == object
+        assert all(type(v) is int for v in actual['interest_wei'])
+        assert_same_schedule(actual, build_accrual_schedule_reference(starts, ends, totals))
+
+    def test_rows_sum_to_interest(self):
+        starts, ends, totals = make_loans(seed=2)
+
+        schedule = build_accrual_schedule(starts, ends, totals)
+
+        sums = schedule['interest_wei'].astype(object).groupby(schedule['loan']).sum()
+        for loan, (start, end, total) in enumerate(zip(starts, ends, totals)):
+            assert sums.get(loan, 0) == (total if end > start else 0)
+
+
+class TestRows:
+    """Test the rows of a single loan."""
+
+    def test_boundaries_and_flags(self):
+        # 06:00 on day 1 to 12:00 on day 3
+        start, end = MIDNIGHT + 6 * 3600, MIDNIGHT + 2 * 86400 + 12 * 3600
+
+        schedule = build_accrual_schedule([start], [end], [1000])
+
+        assert list(schedule.columns) == SCHEDULE_COLUMNS
+        assert list(schedule['accrual_start_ts']) == [utc(start), utc(MIDNIGHT + 86400), utc(MIDNIGHT + 2 * 86400)]
+        assert list(schedule['accrual_end_ts']) == [utc(MIDNIGHT + 86400), utc(MIDNIGHT + 2 * 86400), utc(end)]
+        assert list(schedule['accrual_ts']) == [utc(MIDNIGHT + 86399), utc(MIDNIGHT + 2 * 86400 - 1), utc(end)]
+        assert list(schedule['seconds_in_row']) == [18 * 3600, 86400, 12 * 3600]
+        assert list(schedule['interest_wei']) == [333, 444, 223]
+        assert list(schedule['is_first_day']) == [True, False, False]
+        assert list(schedule['is_last_day']) == [False, False, True]
+        assert list(schedule['is_partial_day']) == [True, False, True]
+
+    def test_end_at_midnight_labelled_end_of_day(self):
+        schedule = build_accrual_schedule([MIDNIGHT], [MIDNIGHT + 86400], [5])
+
+        assert list(schedule['accrual_ts']) == [utc(MIDNIGHT + 86399)]
+        assert bool(schedule['is_last_day'].iloc[0]) and not bool(schedule['is_partial_day'].iloc[0])
+
+    def test_skip_zero(self):
+        # 2 wei over 4 days: days 2 and 4 get one each
+        schedule = build_accrual_schedule([MIDNIGHT], [MIDNIGHT + 4 * 86400], [2], skip_zero=True)
+
+        assert list(schedule['interest_wei']) == [1, 1]
+        assert list(schedule['accrual_ts']) == [utc(MIDNIGHT + 2 * 86400 - 1), utc(MIDNIGHT + 4 * 86400 - 1)]
+
+    def test_no_rows(self):
+        schedule = build_accrual_schedule([MIDNIGHT, MIDNIGHT], [MIDNIGHT, MIDNIGHT + 10], [100, 0])
+
+        assert schedule.empty
+        assert list(schedule.columns) == SCHEDULE_COLUMNS
+
+    def test_datetime_inputs_and_loan_positions(self):
+        schedule = build_accrual_schedule(
+            [utc(MIDNIGHT), pd.Timestamp(MIDNIGHT, unit='s', tz='UTC')],
+            [utc(MIDNIGHT), utc(MIDNIGHT + 3600)],
+            [10, 10],
+        )
+
+        assert list(schedule['loan']) == [1]
+
+
+class TestConventions:
+    """Test interest computed from principal and rate."""
+
+    def test_actual_365_and_360(self):
+        principal, seconds = 10**18, 30 * 86400
+
+        schedule = build_accrual_schedule([MIDNIGHT], [MIDNIGHT + seconds], principal_wei=[principal], rate_bps=[1500])
+        act_360 = build_accrual_schedule([MIDNIGHT], [MIDNIGHT + seconds], principal_wei=[principal], rate_bps=[1500],
+                                         convention='actual/360')
+
+        expected = principal * 1500 * seconds // (10000 * 365 * 86400)
+        assert int(schedule['interest_wei'].sum()) == expected
+        assert int(act_360['interest_wei'].sum()) == principal * 1500 * seconds // (10000 * 360 * 86400)
+        assert list(simple_interest_wei([principal], [1500], [seconds])) == [expected]
+
+    def test_unknown_convention(self):
+        with pytest.raises(ValueError):
+            simple_interest_wei([1], [1], [1], convention='30/360')
+        with pytest.raises(ValueError):
+            build_accrual_schedule([MIDNIGHT], [MIDNIGHT + 1])
+
+
+class TestDecoder:
+    """Test a lending decoder built on the schedule."""
+
+    def test_nftfi_accruals(self):
+        from main_app.services.decoders.nftfi_decoder import NFTfiJournalEntryGenerator, USDC_ADDRESS
+
+        generator = NFTfiJournalEntryGenerator(None, {LENDER: {'fund_id': 'fund_i', 'category': 'fund'}})
+        loans = pd.DataFrame([{
+            'transaction_datetime': pd.Timestamp(MIDNIGHT + 3600 * (i + 1), unit='s', tz='UTC'),
+            'loanDuration': 10 * 86400 + i,
+            'loanERC20Denomination': USDC_ADDRESS if i % 2 else '',
+            'loanPrincipalAmount': 10**18,
+            'maximumRepaymentAmount': 10**18 + 10**16 + i,
+            'loanAdminFeeInBasisPoints': 500,
+            'lender': LENDER,
+            'borrower': BORROWER,
+            'transactionHash': f'0x{i:02x}',
+            'loan_id': i,
+        } for i in range(6)])
+
+        entries = generator.generate_interest_accruals(loans)
+
+        for i, loan_entries in entries.groupby('loan_id'):
+            gross = 10**16 + int(i)
+            decimals = Decimal(10**6) if int(i) % 2 else Decimal(10**18)
+            net = Decimal(gross - gross * 500 // 10000) / decimals
+            assert sum(loan_entries['debit']) == net == sum(loan_entries['credit'])
+            assert len(loan_entries) == 2 * 11
@@ -0,0 +1,173 @@
+"""
+Unit tests for the fund accounting balance engine.
+
+Tests:
+- Cumulative balances match a per-date GL re-filter/groupby
+- NAV per date matches the assets - liabilities calculation
+- Incremental appends (forward and back-dated) match a full rebuild
+- Cached engine reuse when the GL only grows, rebuild on any row edit
+"""
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_app.modules.fund_accounting.balance_engine import (
+    BalanceEngine,
+    get_balance_engine,
+    clear_balance_engines,
+)
+
+
+ACCOUNTS = ['1101', '1103', '2101', '3001', '4001', '8001', '9001']
+CREDIT_NORMAL = ('2', '3', '4', '9')
+
+
+def make_gl(n_rows=400, n_days=60, seed=7, tz='UTC'):
+    """Synthetic GL with a handful of accounts spread over n_days"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01', tz=tz)
+    dates = start + pd.to_timedelta(rng.integers(0, n_days, n_rows), unit='D')
+    accounts = rng.choice(ACCOUNTS, n_rows)
+    amounts = rng.random(n_rows).round(6) * 10
+    is_debit = rng.random(n_rows) < 0.5
+    return pd.DataFrame({
+        'date': dates,
+        'GL_Acct_Number': accounts,
+        'debit_crypto': np.where(is_debit, amounts, 0.0),
+        'credit_crypto': np.where(is_debit, 0.0, amounts),
+    })
+
+
+def reference_balances(df, date):
+    """Per-date re-filter and groupby, as the GL loops used to do it"""
+    hist = df[df['date'] <= date].copy()
+    hist['GL_Acct_Number'] = hist['GL_Acct_Number'].astype(str)
+    grouped = hist.groupby('GL_Acct_Number')[['debit_crypto', 'credit_crypto']].sum()
+    net = grouped['debit_crypto'] - grouped['credit_crypto']
+    sign = np.where(net.index.str.startswith(CREDIT_NORMAL), -1.0, 1.0)
+    return net * sign
+
+
+class TestBalanceEngine:
+    """Test BalanceEngine against the per-date reference loop."""
+
+    def test_balances_match_reference(self):
+        df = make_gl()
+        engine = BalanceEngine(df)
+
+        for date in sorted(df['date'].unique()):
+            expected = reference_balances(df, date).sort_index()
+            actual = engine.balances_at(date).sort_index()
+            assert list(actual.index) == list(expected.index)
+            np.testing.assert_allclose(actual.values, expected.values, atol=1e-9)
+
+    def test_nav_matches_reference(self):
+        df = make_gl()
+        engine = BalanceEngine(df)
+        nav = engine.nav_frame()
+
+        assert len(nav) == df['date'].nunique()
+        for _, row in nav.iterrows():
+            balances = reference_balances(df, row['date'])
+            assets = balances[balances.index.str.startswith('1')].sum()
+            liabilities = balances[balances.index.str.startswith('2')].sum()
+            assert row['assets'] == pytest.approx(assets)
+            assert row['liabilities'] == pytest.approx(liabilities)
+            assert row['nav'] == pytest.approx(assets - liabilities)
+            assert engine.nav_at(row['date']) == pytest.approx((assets, liabilities, assets - liabilities))
+
+    def test_daily_balances_only_active_accounts(self):
+        df = make_gl(n_rows=50, n_days=30)
+        melted = BalanceEngine(df).daily_balances()
+
+        for date, group in melted.groupby('Report Date'):
+            expected = reference_balances(df, date)
+            assert set(group['GL_Acct_Number']) == set(expected.index)
+            np.testing.assert_allclose(
+                group.set_index('GL_Acct_Number')['Balance'].sort_index().values,
+                expected.sort_index().values,
+                atol=1e-9,
+            )
+
+    def test_nav_before_first_date_is_zero(self):
+        engine = BalanceEngine(make_gl())
+        assert engine.nav_at('2023-06-30') == (0, 0, 0)
+        assert engine.balances_at('2023-06-30').empty
+
+    def test_naive_dates_and_aware_lookup(self):
+        df = make_gl(tz=None)
+        engine = BalanceEngine(df)
+        last = df['date'].max()
+        expected = reference_balances(df, last).sort_index()
+        actual = engine.balances_at(last.tz_localize('UTC')).sort_index()
+        np.testing.assert_allclose(actual.values, expected.values, atol=1e-9)
+
+    def test_forward_append_matches_rebuild(self):
+        df = make_gl().sort_values('date').reset_index(drop=True)
+        cut = len(df) // 2
+        engine = BalanceEngine(df.iloc[:cut])
+        engine.append(df.iloc[cut:])
+
+        full = BalanceEngine(df)
+        pd.testing.assert_frame_equal(engine.nav_frame(), full.nav_frame(), atol=1e-9)
+        pd.testing.assert_frame_equal(engine.daily_balances(), full.daily_balances(), atol=1e-9)
+
+    def test_backdated_append_matches_rebuild(self):
+        df = make_gl()
+        extra = make_gl(n_rows=40, n_days=90, seed=11)
+        extra.loc[0, 'GL_Acct_Number'] = '1999'  # new account mid-history
+
+        engine = BalanceEngine(df)
+        engine.append(extra)
+
+        full = BalanceEngine(pd.concat([df, extra], ignore_index=True))
+        pd.testing.assert_frame_equal(engine.nav_frame(), full.nav_frame(), atol=1e-9)
+        pd.testing.assert_frame_equal(engine.daily_balances(), full.daily_balances(), atol=1e-9)
+
+    def test_get_balance_engine_extends_cached_engine(self):
+        clear_balance_engines()
+        df = make_gl()
+        first = get_balance_engine(df.iloc[:300], scope='test')
+        assert first.rows_ingested == 300
+
+        second = get_balance_engine(df, scope='test')
+        assert second is first
+        assert second.rows_ingested == len(df)
+
+        # A frame whose leading rows changed forces a rebuild
+        edited = df.copy()
+        edited.loc[0, 'debit_crypto'] += 1.0
+        third = get_balance_engine(edited, scope='test')
+        assert third is not first
+        clear_balance_engines()
+
+    @pytest.mark.parametrize('edit', ['account', 'date', 'small_amount', 'moved_line'])
+    def test_get_balance_engine_rebuilds_on_any_edit(self, edit):
+        """Edits that keep the row count and debit/credit totals must not reuse the cache"""
+        clear_balance_engines()
+        df = make_gl()
+        cached = get_balance_engine(df, scope='test')
+
+        edited = df.copy()
+        debit_rows = edited.index[edited['debit_crypto'] > 0]
+        if edit == 'account':
+            edited.loc[0, 'GL_Acct_Number'] = '2101' if edited.loc[0, 'GL_Acct_Number'] != '2101' else '1101'
+        elif edit == 'date':
+            edited.loc[0, 'date'] += pd.Timedelta(days=1)
+        elif edit == 'small_amount':
+            edited.loc[debit_rows[0], 'debit_crypto'] += 1e-9
+        else:
+            # Same totals, amount moved between two lines and account changed
+            edited.loc[debit_rows[0], 'debit_crypto'] += 5.0
+            edited.loc[debit_rows[1], 'debit_crypto'] -= 5.0
+            edited.loc[debit_rows[0], 'GL_Acct_Number'] = '2101'
+
+        engine = get_balance_engine(edited, scope='test')
+        assert engine is not cached
+        pd.testing.assert_frame_equal(engine.nav_frame(), BalanceEngine(edited).nav_frame())
+        clear_balance_engines()
@@ -0,0 +1,183 @@
+"""
+Unit tests for the persistent chain data cache.
+
+Tests:
+- web3 results round-trip with AttributeDict/HexBytes intact
+- Read-through helpers only hit the RPC on a miss
+- A second cache instance on the same file (another process) sees the data
+- Pending transactions and block tags are not cached
+- LRU size eviction and reorg invalidation
+"""
+import pytest
+from decimal import Decimal
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from main_app.services.chain_cache import (
+    ChainDataCache,
+    encode_value,
+    decode_value,
+    tx_key,
+)
+
+TX_HASH = '0x' + 'ab' * 32
+
+
+def make_tx(block_number=100, tx_hash=TX_HASH):
+    return AttributeDict({
+        'hash': HexBytes(tx_hash),
+        'blockNumber': block_number,
+        'from': '0x' + '11' * 20,
+        'to': '0x' + '22' * 20,
+        'value': 10**18,
+        'input': HexBytes('0x65e03b9c' + '00' * 32),
+    })
+
+
+def make_receipt(block_number=100, tx_hash=TX_HASH):
+    return AttributeDict({
+        'transactionHash': HexBytes(tx_hash),
+        'blockNumber': block_number,
+        'gasUsed': 21000,
+        'effectiveGasPrice': 30 * 10**9,
+        'status': 1,
+        'logs': [AttributeDict({
+            'address': '0x' + '33' * 20,
+            'topics': [HexBytes(b'\x01' * 32), HexBytes(b'\x02' * 32)],
+            'data': HexBytes(b'\x00' * 32),
+            'logIndex': 0,
+            'removed': False,
+        })],
+    })
+
+
+class FakeEth:
+    """Counts RPC calls; returns canned web3-shaped results"""
+
+    def __init__(self, pending=False):
+        self.calls = []
+        self.pending = pending
+
+    def get_transaction(self, tx_hash):
+        self.calls.append(('tx', tx_hash))
+        return make_tx(block_number=None if self.pending else 100, tx_hash=tx_hash)
+
+    def get_transaction_receipt(self, tx_hash):
+        self.calls.append(('receipt', tx_hash))
+        return make_receipt(tx_hash=tx_hash)
+
+    def get_block(self, block_identifier):
+        self.calls.append(('block', block_identifier))
+        number = 999 if block_identifier == 'latest' else block_identifier
+        return AttributeDict({'number': number, 'timestamp': 1_700_000_000 + number})
+
+
+class FakeW3:
+    def __init__(self, pending=False):
+        self.eth = FakeEth(pending)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'chain_cache.sqlite3')
+
+
+class TestSerialization:
+    """Test the JSON encoding of web3 results."""
+
+    def test_receipt_round_trip(self):
+        receipt = make_receipt()
+        restored = decode_value(encode_value(receipt))
+
+        assert restored == receipt
+        assert restored.blockNumber == 100
+        assert isinstance(restored.logs[0], AttributeDict)
+        assert isinstance(restored.logs[0].topics[0], HexBytes)
+        assert restored.logs[0].removed is False
+
+    def test_decimal_round_trip(self):
+        assert decode_value(encode_value(Decimal('3456.12345678'))) == Decimal('3456.12345678')
+
+    def test_tx_key_normalization(self):
+        assert tx_key(HexBytes(TX_HASH)) == TX_HASH
+        assert tx_key(TX_HASH.upper().replace('0X', '0x')) == TX_HASH
+        assert tx_key(TX_HASH[2:]) == TX_HASH
+
+
+class TestChainDataCache:
+    """Test read-through caching, sharing and eviction."""
+
+    def test_bundle_fetched_once(self, cache_path):
+        cache = ChainDataCache(cache_path)
+        w3 = FakeW3()
+
+        first = cache.get_transaction_bundle(w3, TX_HASH)
+        assert [c[0] for c in w3.eth.calls] == ['tx', 'receipt', 'block']
+
+        second = cache.get_transaction_bundle(w3, TX_HASH)
+        assert len(w3.eth.calls) == 3
+        assert second == first
+        assert second[0].blockNumber == 100
+        assert cache.stats['hits'] == 3
+
+    def test_shared_across_instances(self, cache_path):
+        ChainDataCache(cache_path).get_transaction_bundle(FakeW3(), TX_HASH)
+
+        other_process = ChainDataCache(cache_path)
+        w3 = FakeW3()
+        tx, receipt, block = other_process.get_transaction_bundle(w3, TX_HASH)
+        assert w3.eth.calls == []
+        assert receipt.logs[0].topics[1] == HexBytes(b'\x02' * 32)
+        assert block.timestamp == 1_700_000_100
+
+    def test_pending_tx_and_block_tags_not_cached(self, cache_path):
+        cache = ChainDataCache(cache_path)
+        w3 = FakeW3(pending=True)
+
+        cache.get_transaction(w3, TX_HASH)
+        cache.get_transaction(w3, TX_HASH)
+        cache.get_block(w3, 'latest')
+        cache.get_block(w3, 'latest')
+        assert len(w3.eth.calls) == 4
+        assert len(cache) == 0
+
+    def test_disabled_cache_passes_through(self, cache_path):
+        cache = ChainDataCache(cache_path, enabled=False)
+        w3 = FakeW3()
+        cache.get_transaction_bundle(w3, TX_HASH)
+        cache.get_transaction_bundle(w3, TX_HASH)
+        assert len(w3.eth.calls) == 6
+        assert not os.path.exists(cache_path)
+
+    def test_evicts_least_recently_used(self, cache_path):
+        cache = ChainDataCache(cache_path)
+        w3 = FakeW3()
+        hashes = ['0x%064x' % i for i in range(20)]
+        for h in hashes:
+            cache.get_receipt(w3, h)
+
+        per_entry = cache.size_bytes() // 20
+        removed = cache.evict(max_size_bytes=per_entry * 10)
+
+        assert removed >= 10
+        assert cache.size_bytes() <= per_entry * 10
+        # Oldest entries go first, newest survive
+        assert cache.get('receipt', hashes[0]) is None
+        assert cache.get('receipt', hashes[-1]) is not None
+
+    def test_invalidate_from_block(self, cache_path):
+        cache = ChainDataCache(cache_path)
+        w3 = FakeW3()
+        cache.get_block(w3, 90)
+        cache.get_block(w3, 100)
+        cache.get_block(w3, 110)
+
+        assert cache.invalidate_from_block(100) == 2
+        assert cache.get('block', '90') is not None
+        assert cache.get('block', '110') is None
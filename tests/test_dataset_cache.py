@@ -0,0 +1,216 @@
+"""
+Unit tests for the shared dataset cache.
+
+Tests:
+- Concurrent misses of one dataset share a single load
+- A fresh entry is served without a version check; a stale one is revalidated with one HEAD
+- A changed version reloads the dataset
+- Callers can modify what they get without affecting the cache or each other
+- Entries are evicted least recently used first under the memory budget
+- cached_dataset keys entries by arguments and keeps cache_clear()
+- s3_utils.load_COA_file reloads only when the object's ETag changes
+"""
+import pytest
+import logging
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services.dataset_cache import DatasetCache, cached_dataset, estimate_nbytes
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_frame(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'amount': rng.random(n), 'account': rng.choice(['100.30', '400.10'], n).astype(object)})
+
+
+class CountingLoader:
+    """Loader returning make_frame(), counting calls (optionally slow)."""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return make_frame()
+
+
+class TestSingleFlight:
+    """Test sharing of concurrent loads."""
+
+    def test_concurrent_misses_load_once(self):
+        cache = DatasetCache(check_seconds=60)
+        loader = CountingLoader(delay=0.2)
+        results = []
+
+        def worker():
+            results.append(cache.get('gl', lambda: 'v1', loader))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loader.calls == 1
+        assert len(results) == 8
+        assert cache.stats['shared_loads'] == 7
+
+    def test_failed_load_is_raised_and_not_cached(self):
+        cache = DatasetCache()
+
+        def failing():
+            raise IOError('S3 unavailable')
+
+        with pytest.raises(IOError):
+            cache.get('gl', lambda: 'v1', failing)
+        assert cache.get('gl', lambda: 'v1', CountingLoader()).shape == (1000, 2)
+
+
+class TestVersioning:
+    """Test freshness checks and reloads."""
+
+    def test_fresh_entry_skips_version_check(self):
+        cache = DatasetCache(check_seconds=60)
+        versions = []
+        loader = CountingLoader()
+
+        def version():
+            versions.append(1)
+            return 'v1'
+
+        cache.get('gl', version, loader)
+        cache.get('gl', version, loader)
+        assert len(versions) == 1
+        assert cache.stats['hits'] == 1
+
+    def test_stale_entry_revalidated_or_reloaded(self):
+        cache = DatasetCache(check_seconds=0)
+        loader = CountingLoader()
+        current = {'version': 'v1'}
+
+        cache.get('gl', lambda: current['version'], loader)
+        cache.get('gl', lambda: current['version'], loader)
+        assert loader.calls == 1
+        assert cache.stats['revalidated'] == 1
+
+        current['version'] = 'v2'
+        cache.get('gl', lambda: current['version'], loader)
+        assert loader.calls == 2
+
+    def test_unknown_version_reloads(self):
+        cache = DatasetCache(check_seconds=0)
+        loader = CountingLoader()
+        cache.get('gl', lambda: None, loader)
+        cache.get('gl', lambda: None, loader)
+        assert loader.calls == 2
+
+
+class TestSharing:
+    """Test that handed-out frames are private to the caller."""
+
+    def test_mutation_does_not_reach_cache(self):
+        cache = DatasetCache(check_seconds=60)
+        first = cache.get('gl', lambda: 'v1', CountingLoader())
+        expected = first.copy(deep=True)
+
+        first.loc[0, 'amount'] = -1.0
+        first['extra'] = 1
+        second = cache.get('gl', lambda: 'v1', CountingLoader())
+
+        pd.testing.assert_frame_equal(second, expected)
+
+
+class TestEviction:
+    """Test the memory budget."""
+
+    def test_least_recently_used_evicted(self):
+        size = estimate_nbytes(make_frame())
+        cache = DatasetCache(max_bytes=int(size * 2.5), check_seconds=60)
+        loader = CountingLoader()
+
+        cache.get('a', lambda: 'v1', loader)
+        cache.get('b', lambda: 'v1', loader)
+        cache.get('a', lambda: 'v1', loader)
+        cache.get('c', lambda: 'v1', loader)
+        assert cache.stats['evictions'] == 1
+        assert cache.nbytes <= cache.max_bytes
+
+        # 'b' was least recently used
+        cache.get('a', lambda: 'v1', loader)
+        assert loader.calls == 3
+        cache.get('b', lambda: 'v1', loader)
+        assert loader.calls == 4
+
+    def test_oversized_entry_not_cached(self):
+        cache = DatasetCache(max_bytes=100, check_seconds=60)
+        loader = CountingLoader()
+        cache.get('a', lambda: 'v1', loader)
+        cache.get('a', lambda: 'v1', loader)
+        assert loader.calls == 2
+        assert cache.nbytes == 0
+
+
+class TestDecorator:
+    """Test cached_dataset."""
+
+    def test_keyed_by_arguments_and_cleared(self):
+        cache = DatasetCache(check_seconds=60)
+        calls = []
+
+        @cached_dataset(lambda key, typed: f'{key}-v1', cache=cache)
+        def load(key='gl', typed=False):
+            calls.append((key, typed))
+            return make_frame()
+
+        load()
+        load('gl')
+        load(key='gl', typed=False)
+        load('gl', typed=True)
+        assert calls == [('gl', False), ('gl', True)]
+
+        load.cache_clear()
+        load()
+        assert len(calls) == 3
+
+
+class TestS3Utils:
+    """Test the s3_utils loaders on top of the cache."""
+
+    def test_coa_reloads_on_etag_change(self, monkeypatch):
+        from main_app import s3_utils
+        from main_app.services import dataset_cache
+
+        s3 = InMemoryS3()
+        monkeypatch.setattr(s3_utils, 's3', s3)
+        monkeypatch.setattr(dataset_cache, '_dataset_cache', DatasetCache(check_seconds=0))
+
+        coa = pd.DataFrame({'GL_Acct_Number': [100, 200], 'GL_Acct_Name': ['Cash', 'Loans']})
+        s3.put_object(Bucket=s3_utils.BUCKET_NAME, Key=s3_utils.COA_KEY, Body=coa.to_csv(index=False).encode())
+
+        first = s3_utils.load_COA_file()
+        first['GL_Acct_Name'] = 'changed'
+        pd.testing.assert_frame_equal(s3_utils.load_COA_file(), coa)
+        assert dataset_cache.get_dataset_cache().stats['loads'] == 1
+
+        updated = pd.concat([coa, pd.DataFrame({'GL_Acct_Number': [300], 'GL_Acct_Name': ['Fees']})],
+                            ignore_index=True)
+        s3.put_object(Bucket=s3_utils.BUCKET_NAME, Key=s3_utils.COA_KEY, Body=updated.to_csv(index=False).encode())
+        assert len(s3_utils.load_COA_file()) == 3
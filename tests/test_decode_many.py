@@ -0,0 +1,133 @@
+"""
+Unit tests for batched transaction decoding.
+
+Tests:
+- decode_many() matches decode_transaction() with far fewer HTTP requests
+- Shared blocks and prices are fetched once
+- 429 responses are retried with backoff
+- An unknown hash in a batch becomes an error result without failing the rest
+- A second registry on the same chain cache needs no RPC at all
+"""
+import pytest
+import logging
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3 import Web3
+
+from tests.stub_rpc_server import StubRpcServer, FUND_WALLET
+from main_app.services.chain_cache import ChainDataCache
+from main_app.services.decoders import DecoderRegistry, Platform
+from main_app.services.price_oracle import EthUsdPriceOracle
+from main_app.services.rpc_batch import BatchRpcFetcher, is_rate_limited
+
+
+@pytest.fixture
+def server():
+    with StubRpcServer(n_txs=24, txs_per_block=4, latency=0) as s:
+        yield s
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_registry(server, cache=None, oracle=None):
+    w3 = Web3(Web3.HTTPProvider(server.url))
+    cache = cache if cache is not None else ChainDataCache(None, enabled=False)
+    registry = DecoderRegistry(
+        w3, [FUND_WALLET],
+        chain_cache=cache,
+        price_oracle=oracle if oracle is not None else EthUsdPriceOracle(None, chain_cache=cache),
+    )
+    registry._get_decoder(Platform.GENERIC)
+    return registry
+
+
+def summarize(results):
+    return [(r.tx_hash, r.status, r.platform, r.category, r.eth_price,
+             r.timestamp, len(r.journal_entries)) for r in results]
+
+
+class TestDecodeMany:
+    """Test DecoderRegistry.decode_many against the stub RPC node."""
+
+    def test_matches_sequential_decode(self, server):
+        registry = make_registry(server)
+        sequential = [registry.decode_transaction(h) for h in server.tx_hashes]
+
+        server.reset_counters()
+        batched = make_registry(server).decode_many(server.tx_hashes, batch_size=10)
+
+        assert summarize(batched) == summarize(sequential)
+        assert all(r.status == "success" for r in batched)
+        # 24 tx + 24 receipts + 6 blocks + 2 latestRoundData + 4 getRoundData in batches of 10
+        assert server.http_requests <= 8
+
+    def test_shared_blocks_fetched_once(self, server):
+        make_registry(server).decode_many(server.tx_hashes, batch_size=500)
+        # tx + receipt per hash, one block per block, one round sync for the range
+        assert server.rpc_calls <= 2 * 24 + 6 + 6 + 6  # + proxy probes for WETH
+
+    def test_duplicates_and_order(self, server):
+        hashes = [server.tx_hashes[3], server.tx_hashes[0], server.tx_hashes[3]]
+        results = make_registry(server).decode_many(hashes)
+        assert [r.tx_hash for r in results] == [hashes[0], hashes[1], hashes[0]]
+        assert results[0] is results[2]
+
+    def test_unknown_hash_does_not_sink_batch(self, server):
+        unknown = '0x' + 'de' * 32
+        results = make_registry(server).decode_many(server.tx_hashes[:4] + [unknown])
+        assert [r.status for r in results[:4]] == ["success"] * 4
+        assert results[4].status == "error"
+
+    def test_rate_limited_batches_are_retried(self):
+        with StubRpcServer(n_txs=8, latency=0, max_requests_per_second=1) as server:
+            w3 = Web3(Web3.HTTPProvider(server.url))
+            fetcher = BatchRpcFetcher(w3, batch_size=4, max_concurrency=1, backoff_base=0.05)
+            calls = {h: (lambda h=h: w3.eth.get_transaction(h)) for h in server.tx_hashes}
+
+            results = fetcher.fetch(calls)
+
+            assert len(results) == 8
+            assert server.rate_limited >= 1
+            assert fetcher.stats['rate_limited'] >= 1
+
+    def test_persistent_cache_avoids_rpc(self, server, tmp_path):
+        cache = ChainDataCache(str(tmp_path / 'chain.sqlite3'))
+        rounds_path = str(tmp_path / 'rounds.parquet')
+        first = make_registry(server, cache, EthUsdPriceOracle(rounds_path, chain_cache=cache)) \
+            .decode_many(server.tx_hashes)
+
+        server.reset_counters()
+        second_cache = ChainDataCache(cache.path)
+        second = make_registry(server, second_cache, EthUsdPriceOracle(rounds_path, chain_cache=second_cache)) \
+            .decode_many(server.tx_hashes)
+
+        assert summarize(second) == summarize(first)
+        # Only the proxy probes for the WETH contract remain
+        rpc_methods_left = server.rpc_calls
+        assert rpc_methods_left <= 6
+
+
+class TestRateLimitDetection:
+    """Test 429 detection helpers."""
+
+    def test_http_status(self):
+        class Response:
+            status_code = 429
+            headers = {}
+
+        error = Exception("boom")
+        error.response = Response()
+        assert is_rate_limited(error)
+
+    def test_message(self):
+        assert is_rate_limited(Exception("429 Client Error: Too Many Requests"))
+        assert not is_rate_limited(Exception("execution reverted"))
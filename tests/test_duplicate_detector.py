@@ -0,0 +1,191 @@
+"""
+Unit tests for indexed duplicate detection in the crypto tracker.
+
+Tests:
+- Exact, signature and proximity checks match a scan of the stored transactions
+- A batch catches duplicates within itself and records the new transactions
+- add_transaction_hash/remove_transaction_hash update and persist the index
+- Single adds upload small deltas, compacted into the index every so often
+- A persisted index is topped up with stored transactions it does not hold
+"""
+import pytest
+import logging
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services.crypto_tracker import DuplicateDetector, PersistenceManager
+from main_app.services.crypto_tracker import duplicate_detector
+from main_app.services.crypto_tracker.persistence_manager import TransactionRecord
+
+FUND_ID = 'fund_i_class_B_ETH'
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_record(i, minutes, tokens, eth, wallet='0xabc', asset='WETH', side='buy'):
+    return TransactionRecord(
+        tx_hash=f'0x{i:064x}', block_number=19_000_000 + i, date=START + timedelta(minutes=minutes),
+        fund_id=FUND_ID, wallet_id=wallet, asset=asset, side=side,
+        token_amount=Decimal(tokens), eth_value=Decimal(eth), usd_value=Decimal(eth) * 3000,
+    )
+
+
+def make_history(n=300, seed=0):
+    """Transactions a few minutes apart on two wallets, amounts in quarters (exact as floats)"""
+    rng = np.random.default_rng(seed)
+    minutes = np.cumsum(rng.integers(0, 4, n))
+    return [make_record(i, int(minutes[i]), str(rng.integers(1, 40) / 4), str(rng.integers(1, 40) / 4),
+                        wallet=['0xabc', '0xdef'][i % 2], side=['buy', 'sell'][i % 3 == 0])
+            for i in range(n)]
+
+
+def make_detector(history=(), s3=None):
+    persistence = PersistenceManager(FUND_ID, s3_client=s3 or InMemoryS3())
+    if history:
+        persistence.save_transactions(list(history), create_backup=False)
+    return DuplicateDetector(FUND_ID, persistence)
+
+
+def scan_proximity(detector, transaction):
+    """The frame scan the index replaces: first stored match in storage order"""
+    existing = detector.existing_transactions
+    dates = pd.to_datetime(existing['date'])
+    matches = existing[(existing['wallet_id'] == transaction.wallet_id) & (existing['asset'] == transaction.asset)
+                       & (dates >= transaction.date - detector.time_proximity_threshold)
+                       & (dates <= transaction.date + detector.time_proximity_threshold)]
+    for _, row in matches.iterrows():
+        token, eth = Decimal(str(row['token_amount'])), Decimal(str(row['eth_value']))
+        token_rel = abs(transaction.token_amount - token) / max(transaction.token_amount, token)
+        eth_rel = abs(transaction.eth_value - eth) / max(transaction.eth_value, eth)
+        if token_rel <= detector.amount_tolerance and eth_rel <= detector.amount_tolerance:
+            return row['tx_hash']
+    return None
+
+
+class TestChecks:
+    """Test the indexed checks against a scan."""
+
+    def test_proximity_matches_scan(self):
+        history = make_history()
+        detector = make_detector(history)
+        assert len(detector.index) == len(history)
+
+        rng = np.random.default_rng(1)
+        flagged = 0
+        for j in range(200):
+            base = history[rng.integers(len(history))]
+            probe = make_record(10_000 + j, (base.date - START).total_seconds() / 60 + int(rng.integers(-6, 7)),
+                                str(base.token_amount * Decimal('1.0005') if j % 2 else base.token_amount + 1),
+                                str(base.eth_value), wallet=base.wallet_id)
+            result = detector._check_proximity_duplicate(probe)
+            expected = scan_proximity(detector, probe)
+            assert result.conflicting_tx_hash == expected
+            flagged += result.is_duplicate
+        assert flagged > 20
+
+    def test_exact_and_signature(self):
+        history = make_history(50)
+        detector = make_detector(history)
+
+        assert detector.check_duplicate(history[7]).duplicate_type == 'exact'
+
+        original = history[9]
+        relabelled = make_record(999, (original.date - START).total_seconds() / 60, str(original.token_amount),
+                                 str(original.eth_value), wallet=original.wallet_id, side=original.side)
+        result = detector.check_duplicate(relabelled)
+        assert result.duplicate_type == 'probable'
+        assert result.conflicting_tx_hash == original.tx_hash
+
+        other_side = make_record(998, (original.date - START).total_seconds() / 60, str(original.token_amount),
+                                 str(original.eth_value), wallet=original.wallet_id,
+                                 side='buy' if original.side == 'sell' else 'sell')
+        assert detector._check_signature_duplicate(other_side).is_duplicate is False
+
+
+class TestBatch:
+    """Test batch checks."""
+
+    def test_duplicates_within_batch(self):
+        detector = make_detector(make_history(20))
+        batch = [make_record(500, 5000, '2', '1'), make_record(501, 5002, '2.001', '1'),
+                 make_record(502, 6000, '3', '1')]
+
+        results = detector.check_batch_duplicates(batch)
+        assert not results[batch[0].tx_hash].is_duplicate
+        assert results[batch[1].tx_hash].duplicate_type == 'possible'
+        assert results[batch[1].tx_hash].conflicting_tx_hash == batch[0].tx_hash
+        assert not results[batch[2].tx_hash].is_duplicate
+        assert len(detector.existing_transactions) == 22
+
+
+class TestPersistence:
+    """Test incremental updates and persistence of the index."""
+
+    def test_add_remove_persisted(self):
+        s3 = InMemoryS3()
+        detector = make_detector(s3=s3)
+        record = make_record(1, 100, '5', '2')
+        assert detector.add_transaction_hash(record)
+
+        near = make_record(2, 102, '5', '2')
+        reloaded = make_detector(s3=s3)
+        assert reloaded._check_proximity_duplicate(near).conflicting_tx_hash == record.tx_hash
+        assert reloaded.check_duplicate(record).duplicate_type == 'exact'
+
+        assert reloaded.remove_transaction_hash(record)
+        assert not make_detector(s3=s3)._check_proximity_duplicate(near).is_duplicate
+
+    def test_persisted_index_topped_up(self):
+        s3 = InMemoryS3()
+        history = make_history(30)
+        detector = make_detector(history[:20], s3=s3)
+        detector.add_transaction_hash(history[0])
+
+        # Transactions stored after the index was saved are indexed on load
+        make_detector(history, s3=s3)
+        reloaded = DuplicateDetector(FUND_ID, PersistenceManager(FUND_ID, s3_client=s3))
+        assert len(reloaded.index) == 30
+        assert reloaded.check_duplicate(history[25]).duplicate_type == 'exact'
+
+    def test_adds_appended_as_deltas(self, monkeypatch):
+        monkeypatch.setattr(duplicate_detector, 'DUPLICATE_INDEX_COMPACT_EVERY', 4)
+        s3 = InMemoryS3()
+        history = make_history(40)
+        detector = make_detector(history[:30], s3=s3)
+        detector.save()
+        persistence = detector.persistence
+
+        s3.reset_counters()
+        for record in history[30:33]:
+            assert detector.add_transaction_hash(record)
+        assert all(key.startswith(persistence.duplicate_deltas_prefix) for key in s3.puts)
+        assert len(s3.puts) == 3
+        # Re-adding a known transaction uploads nothing
+        assert detector.add_transaction_hash(history[30])
+        assert len(s3.puts) == 3
+
+        reloaded = make_detector(s3=s3)
+        assert reloaded.index.to_frame().equals(detector.index.to_frame())
+        assert reloaded.known_hashes == detector.known_hashes
+        assert reloaded.check_duplicate(history[32]).duplicate_type == 'exact'
+
+        # The fourth add rewrites the index and drops the deltas
+        assert detector.add_transaction_hash(history[33])
+        assert persistence.duplicate_index_key in s3.puts
+        assert persistence.list_duplicate_index_deltas() == []
+        assert make_detector(s3=s3).index.to_frame().equals(detector.index.to_frame())
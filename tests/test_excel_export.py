@@ -0,0 +1,169 @@
+"""
+Unit tests for the streaming Excel export of data sheets.
+
+The reference is the previous implementation: pd.ExcelWriter (openpyxl) with
+to_excel and a width rescan over every cell.
+
+Tests:
+- Cell values read back the same as from pd.ExcelWriter
+- Missing values are empty cells; tz-aware dates are written as naive UTC
+- Typed (Arrow decimal) and Decimal object amounts are written as numbers
+- Header, amount and date cells carry the shared named styles
+- Column widths are estimated from the frame and capped
+- Chunk boundaries do not drop or repeat rows
+- Several frames are written as sheets in order
+"""
+import pytest
+import logging
+import sys
+import os
+from decimal import Decimal
+from io import BytesIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from main_app.services.gl_amounts import to_amounts
+from main_app.modules.financial_reporting.excel_export import (
+    EXPORT_DATE_FORMAT,
+    EXPORT_MAX_COLUMN_WIDTH,
+    estimate_column_widths,
+    export_frames_to_excel,
+    get_number_format,
+)
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_gl(n=250, seed=0):
+    """GL-shaped frame with every column kind and some missing values"""
+    rng = np.random.default_rng(seed)
+    amounts = np.round(rng.uniform(0, 5000, n), 6)
+    debit = rng.random(n) < 0.5
+    gl = pd.DataFrame({
+        'date': pd.Timestamp('2023-03-01 12:00', tz='UTC') + pd.to_timedelta(rng.integers(0, 86400 * 400, n), unit='s'),
+        'GL_Acct_Number': rng.choice([10110, 13010, 40100], n),
+        'account_name': rng.choice(['100.30 - ETH Wallet', '130.10 - Loans Receivable', None], n),
+        'debit_crypto': np.where(debit, amounts, 0.0),
+        'credit_crypto': np.where(debit, 0.0, amounts),
+        'hash': [f'0x{i:064x}' for i in range(n)],
+    })
+    gl.loc[3, 'debit_crypto'] = np.nan
+    return gl
+
+
+def read_sheet(output, title):
+    """Header and rows of a sheet, as openpyxl loads them"""
+    ws = load_workbook(output)[title]
+    rows = [list(row) for row in ws.iter_rows(values_only=True)]
+    return rows[0], rows[1:]
+
+
+def reference_rows(df):
+    """Rows written by pd.ExcelWriter, as openpyxl loads them"""
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Sheet', index=False)
+    buffer.seek(0)
+    return read_sheet(buffer, 'Sheet')
+
+
+class TestValues:
+    """Test the written values against pd.ExcelWriter."""
+
+    def test_matches_excel_writer(self):
+        gl = make_gl()
+        naive = gl.assign(date=gl['date'].dt.tz_localize(None))
+
+        assert read_sheet(export_frames_to_excel({'GL': gl}), 'GL') == reference_rows(naive)
+
+    def test_missing_values_and_tz_dates(self):
+        df = pd.DataFrame({
+            'date': [pd.Timestamp('2024-01-01 05:00', tz='America/New_York'), pd.NaT],
+            'debit_crypto': [np.nan, 1.5],
+            'account_name': [None, 'wallet'],
+        })
+        header, rows = read_sheet(export_frames_to_excel({'GL': df}), 'GL')
+
+        assert header == ['date', 'debit_crypto', 'account_name']
+        assert rows[0] == [pd.Timestamp('2024-01-01 10:00').to_pydatetime(), None, None]
+        assert rows[1] == [None, 1.5, 'wallet']
+
+    def test_typed_and_decimal_amounts(self):
+        df = pd.DataFrame({
+            'typed': to_amounts(['1.25', '123456.000001', '0']),
+            'decimals': [Decimal('2.5'), None, Decimal('-7.125')],
+        })
+        ws = load_workbook(export_frames_to_excel({'GL': df}))['GL']
+
+        assert [[c.value for c in row] for row in ws.iter_rows(min_row=2)] == \
+            [[1.25, 2.5], [123456.000001, None], [0, -7.125]]
+        assert ws['A2'].number_format == ws['B2'].number_format == get_number_format('ETH')
+
+    def test_unsupported_objects_written_as_text(self):
+        df = pd.DataFrame({'tags': [['a', 'b'], {'k': 1}, 'plain']})
+        _, rows = read_sheet(export_frames_to_excel({'GL': df}), 'GL')
+
+        assert rows == [["['a', 'b']"], ["{'k': 1}"], ['plain']]
+
+    @pytest.mark.parametrize('chunk_size', [1, 7, 250, 10_000])
+    def test_chunk_boundaries(self, chunk_size):
+        gl = make_gl()
+        expected = read_sheet(export_frames_to_excel({'GL': gl}), 'GL')
+
+        assert read_sheet(export_frames_to_excel({'GL': gl}, chunk_size=chunk_size), 'GL') == expected
+
+
+class TestLayout:
+    """Test styles, widths and sheets of the streamed workbook."""
+
+    def test_named_styles(self):
+        ws = load_workbook(export_frames_to_excel({'GL': make_gl()}, currency='USD'))['GL']
+
+        assert all(cell.style == 'export_header' for cell in ws[1])
+        assert ws['A2'].style == 'export_date'
+        assert ws['A2'].number_format == EXPORT_DATE_FORMAT
+        assert ws['D2'].style == 'export_amount_USD'
+        assert ws['D2'].number_format == get_number_format('USD')
+        assert ws.freeze_panes == 'A2'
+
+    def test_column_widths(self):
+        gl = make_gl()
+        gl['memo'] = 'x' * 30
+        ws = load_workbook(export_frames_to_excel({'GL': gl}))['GL']
+        widths = [ws.column_dimensions[letter].width for letter in 'ABCDEFG']
+
+        assert widths[0] == len('yyyy-mm-dd hh:mm:ss') + 2
+        assert widths[2] == len('130.10 - Loans Receivable') + 2
+        assert widths[5] == EXPORT_MAX_COLUMN_WIDTH
+        assert widths[6] == 30 + 2
+        # Wide enough for the largest formatted amount
+        assert widths[3] >= len(f"{gl['debit_crypto'].max():,.2f}") + 2
+
+    def test_widths_sample_long_frames(self):
+        df = pd.DataFrame({'name': ['a'] * 100_000})
+        df.loc[50_001, 'name'] = 'b' * 30
+
+        assert estimate_column_widths(df, ['text'], sample_rows=100_000) == [32]
+        assert estimate_column_widths(df, ['text'], sample_rows=1_000) == [6]
+
+    def test_sheets_in_order(self):
+        frames = {'All Journal Entries': make_gl(), 'Trial Balance': make_gl(10, seed=1),
+                  'Summary': pd.DataFrame({'Metric': ['Total Entries'], 'Value': [250]})}
+        wb = load_workbook(export_frames_to_excel(frames))
+
+        assert wb.sheetnames == list(frames)
+        assert wb['Summary']['B2'].value == 250
+        assert wb['Trial Balance'].max_row == 11
+
+    def test_no_frames(self):
+        assert load_workbook(export_frames_to_excel({})).sheetnames == ['Sheet1']
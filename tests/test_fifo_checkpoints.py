@@ -0,0 +1,203 @@
+"""
+Unit tests for checkpointed FIFO state in the crypto tracker engine.
+
+Tests:
+- Snapshots built from checkpoints match a full replay of the history
+- A later snapshot restores the nearest checkpoint and replays only the tail
+- A back-dated edit drops only later checkpoints and recalculation rebuilds them
+- A back-dated processed transaction invalidates later checkpoints
+- Checkpoints round-trip Decimal amounts exactly
+"""
+import pytest
+import logging
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services.crypto_tracker import FIFOEngine, PersistenceManager
+from main_app.services.crypto_tracker.persistence_manager import FIFOLot, TransactionRecord
+
+FUND_ID = 'fund_i_class_B_ETH'
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_transactions(n=240):
+    """Buys and sells across Jan-Jun 2024; amounts in quarters survive the float storage"""
+    start = datetime(2024, 1, 1, 6, tzinfo=timezone.utc)
+    transactions = []
+    for i in range(n):
+        side = 'sell' if i % 4 == 3 else 'buy'
+        tokens = Decimal((i * 7) % 13 + 1) / 4
+        transactions.append(TransactionRecord(
+            tx_hash=f'0x{i:064x}',
+            block_number=19_000_000 + i,
+            date=start + timedelta(hours=18 * i),
+            fund_id=FUND_ID,
+            wallet_id='0xabc' if i % 3 else '0xdef',
+            asset='WETH' if i % 2 else 'BLUR POOL',
+            side=side,
+            token_amount=tokens,
+            eth_value=tokens * Decimal((i % 5) + 3) / 4,
+            usd_value=tokens * Decimal(3000 + 25 * (i % 9)),
+        ))
+    return transactions
+
+
+def make_engine(transactions=None, checkpoint_frequency='MS'):
+    s3 = InMemoryS3()
+    persistence = PersistenceManager(FUND_ID, s3_client=s3)
+    if transactions:
+        persistence.save_transactions(transactions, create_backup=False)
+    engine = FIFOEngine(FUND_ID, auto_persist=False, persistence=persistence,
+                        checkpoint_frequency=checkpoint_frequency)
+    return engine, s3
+
+
+def reference_lots(transactions, as_of=None):
+    """Lot state from processing the transactions one by one on an empty store"""
+    engine, _ = make_engine(checkpoint_frequency=None)
+    selected = [tx for tx in transactions if as_of is None or tx.date <= as_of]
+    results = engine.process_transaction_batch(selected)
+    assert all(result.processed for result in results)
+    return lot_values(lot for lot_deque in engine.lots.values() for lot in lot_deque)
+
+
+def lot_values(lots):
+    return sorted(
+        (lot.wallet_id, lot.asset, lot.purchase_date, lot.original_quantity, lot.remaining_quantity,
+         lot.cost_basis_eth, lot.cost_basis_usd, lot.source_tx_hash)
+        for lot in lots
+        if lot.remaining_quantity > 0
+    )
+
+
+def month_ends():
+    return [datetime(2024, month, 1, tzinfo=timezone.utc) - timedelta(microseconds=1) for month in range(2, 8)]
+
+
+class TestSnapshots:
+    """Test snapshots served from checkpoints."""
+
+    def test_snapshots_match_full_replay(self):
+        transactions = make_transactions()
+        engine, _ = make_engine(transactions)
+
+        snapshots = engine.get_portfolio_snapshots(list(reversed(month_ends())))
+
+        for snapshot, as_of in zip(snapshots, reversed(month_ends())):
+            assert snapshot.as_of_date == as_of
+            assert lot_values(snapshot.active_lots) == reference_lots(transactions, as_of)
+            assert snapshot.transaction_count == sum(tx.date <= as_of for tx in transactions)
+        # One pass over the history, checkpointing each month start it crosses (Feb..Jun)
+        assert engine.stats['transactions_replayed'] == len(transactions)
+        assert len(engine.persistence.list_fifo_checkpoints()) == 5
+
+    def test_snapshot_replays_only_after_nearest_checkpoint(self):
+        transactions = make_transactions()
+        engine, s3 = make_engine(transactions)
+        engine.get_portfolio_snapshot(month_ends()[-1])
+
+        fresh = FIFOEngine(FUND_ID, auto_persist=False, persistence=PersistenceManager(FUND_ID, s3_client=s3))
+        as_of = datetime(2024, 5, 17, tzinfo=timezone.utc)
+        snapshot = fresh.get_portfolio_snapshot(as_of)
+
+        tail = [tx for tx in transactions if datetime(2024, 5, 1, tzinfo=timezone.utc) <= tx.date <= as_of]
+        assert fresh.stats['checkpoints_loaded'] == 1
+        assert fresh.stats['transactions_replayed'] == len(tail)
+        assert lot_values(snapshot.active_lots) == reference_lots(transactions, as_of)
+        assert sum(snapshot.total_assets.values()) == sum(lot[4] for lot in reference_lots(transactions, as_of))
+
+    def test_snapshots_without_checkpoints(self):
+        transactions = make_transactions(60)
+        engine, s3 = make_engine(transactions, checkpoint_frequency=None)
+
+        snapshot = engine.get_portfolio_snapshot()
+
+        assert lot_values(snapshot.active_lots) == reference_lots(transactions)
+        assert not engine.persistence.list_fifo_checkpoints()
+
+
+class TestInvalidation:
+    """Test that back-dated changes only drop later checkpoints."""
+
+    def test_back_dated_edit_recalculates_from_checkpoint(self):
+        transactions = make_transactions()
+        engine, s3 = make_engine(transactions)
+        engine.get_portfolio_snapshot(month_ends()[-1])
+        checkpoints = engine.persistence.list_fifo_checkpoints()
+
+        # Edit a mid-March buy
+        edited = next(tx for tx in transactions if tx.date.month == 3 and tx.date.day > 10 and tx.side == 'buy')
+        edited.token_amount += Decimal('2.5')
+        engine.persistence.save_transactions(transactions, create_backup=False)
+
+        s3.puts.clear()
+        engine.stats['transactions_replayed'] = 0
+        assert engine.recalculate_from_date(edited.date)
+
+        # Feb 1 and Mar 1 were kept, Apr 1 onwards rebuilt
+        rewritten = {key for key in s3.puts if '/checkpoints/' in key}
+        assert len(rewritten) == 3
+        assert not any('20240201' in key or '20240301' in key for key in rewritten)
+        assert engine.persistence.list_fifo_checkpoints() == checkpoints
+        assert engine.stats['transactions_replayed'] == \
+            sum(tx.date >= datetime(2024, 3, 1, tzinfo=timezone.utc) for tx in transactions)
+
+        current = lot_values(lot for lot_deque in engine.lots.values() for lot in lot_deque)
+        assert current == reference_lots(transactions)
+        snapshot = engine.get_portfolio_snapshot(datetime(2024, 4, 30, tzinfo=timezone.utc))
+        assert lot_values(snapshot.active_lots) == \
+            reference_lots(transactions, datetime(2024, 4, 30, tzinfo=timezone.utc))
+
+    def test_back_dated_transaction_invalidates_later_checkpoints(self):
+        engine, _ = make_engine(make_transactions())
+        engine.get_portfolio_snapshot(month_ends()[-1])
+
+        late_entry = TransactionRecord(
+            tx_hash='0x' + 'f' * 64, block_number=19_500_000,
+            date=datetime(2024, 4, 10, tzinfo=timezone.utc), fund_id=FUND_ID,
+            wallet_id='0xabc', asset='WETH', side='buy',
+            token_amount=Decimal('1'), eth_value=Decimal('1'), usd_value=Decimal('3000'),
+        )
+        assert engine.process_transaction(late_entry).processed
+
+        assert [as_of.month for as_of in engine.persistence.list_fifo_checkpoints()] == [2, 3, 4]
+
+
+class TestCheckpointStorage:
+    """Test the checkpoint files themselves."""
+
+    def test_decimal_round_trip(self):
+        persistence = PersistenceManager(FUND_ID, s3_client=InMemoryS3())
+        as_of = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        lot = FIFOLot(
+            lot_id='lot-1', fund_id=FUND_ID, wallet_id='0xabc', asset='WETH',
+            purchase_date=datetime(2024, 1, 5, 12, tzinfo=timezone.utc),
+            original_quantity=Decimal('3'), remaining_quantity=Decimal('1.123456789012345678'),
+            cost_basis_eth=Decimal('0.3333333333333333333333333333'),
+            cost_basis_usd=Decimal('1000.000000000000000000000001'),
+            source_tx_hash='0x01',
+        )
+
+        assert persistence.save_fifo_checkpoint(as_of, [lot], transaction_count=7)
+        assert persistence.list_fifo_checkpoints() == [as_of]
+
+        restored = FIFOLot(**persistence.load_fifo_checkpoint(as_of).to_dict('records')[0])
+        assert lot_values([restored]) == lot_values([lot])
+        assert restored.unrealized_gain_eth is None
+
+    def test_missing_checkpoint(self):
+        persistence = PersistenceManager(FUND_ID, s3_client=InMemoryS3())
+        assert persistence.load_fifo_checkpoint(datetime(2024, 2, 1, tzinfo=timezone.utc)) is None
+        assert persistence.delete_fifo_checkpoints_after(datetime(2024, 1, 1)) == 0
@@ -0,0 +1,178 @@
+"""
+Unit tests for the FIFO ledger engine.
+
+Tests:
+- build_fifo_ledger output matches a golden file produced by FIFOTracker.to_dataframe()
+- FIFOLotEngine matches the row-by-row FIFOTracker exactly (shorts, mixed keys, tz/naive dates)
+- Positions match FIFOTracker.get_all_positions
+- Long lot queues are compacted without changing results
+- Invalid amounts raise, or are skipped on request
+"""
+import pytest
+import logging
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_app.services.fifo_tracker import (
+    FIFOTracker,
+    FIFOLotEngine,
+    build_fifo_ledger,
+    build_fifo_ledger_reference,
+)
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'golden', 'fifo_ledger.csv')
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_golden_input():
+    """Small fixed input built with integer arithmetic only (stable across library versions)"""
+    rows = []
+    for i in range(60):
+        wei = (i * 7_919 + 13) % 997 * 10**15 + i * 10**9 + 1
+        side = 'sell' if i % 3 == 2 or i in (5, 6) else ('BUY' if i % 11 == 0 else 'buy')
+        rows.append({
+            'fund_id': 'fund_i_class_B_ETH' if i % 4 else 'FUND_II',
+            'wallet_address': '0xAbC' if i % 5 else '0xdef',
+            'asset': 'WETH' if i % 2 else 'Blur Pool',
+            'date': pd.Timestamp('2024-03-01', tz='UTC') + pd.Timedelta(hours=(i * 37) % 200, minutes=i),
+            'hash': f'0x{i:064x}',
+            'side': side,
+            'token_amount': wei / 1e18,
+            'token_value_eth': wei / 1e18 * (1 + (i % 9) / 17),
+            'eth_usd_price': 3000 + i * 1.25,
+        })
+    return pd.DataFrame(rows)
+
+
+def make_random_input(n, seed, dates='utc'):
+    rng = np.random.default_rng(seed)
+    wei = rng.integers(1, 5 * 10**18, n)
+    stamps = pd.Timestamp('2024-01-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 10**7, n), unit='s')
+    if dates == 'naive':
+        stamps = stamps.tz_localize(None)
+    elif dates == 'object':
+        stamps = pd.Series(list(stamps.to_pydatetime()), dtype=object)
+    return pd.DataFrame({
+        'fund_id': rng.choice(['fund_i_class_B_ETH', 'Fund_II'], n),
+        'wallet_address': rng.choice(['0xAbC', '0xdef', '0xABC'], n),
+        'asset': rng.choice(['WETH', 'blur pool', 'USDC'], n),
+        'date': stamps,
+        'hash': [f'0x{i:064x}' for i in range(n)],
+        'side': rng.choice(['buy', 'sell', 'BUY', 'transfer'], n, p=[.5, .4, .05, .05]),
+        'token_amount': wei / 1e18,
+        'token_value_eth': wei / 1e18 * rng.uniform(0.5, 1.5, n),
+        'eth_usd_price': rng.uniform(2000, 4000, n),
+    })
+
+
+def tracker_ledger(df):
+    """FIFOTracker.to_dataframe() for rows already in processing order"""
+    tracker = FIFOTracker()
+    for _, row in df.iterrows():
+        tracker.process(row['fund_id'], row['wallet_address'], row['asset'], row['side'],
+                        abs(row['qty']), row['unit_price_eth'], row['date'], row['hash'],
+                        row.get('price_eth', 0))
+    return tracker.to_dataframe()
+
+
+def read_golden():
+    golden = pd.read_csv(GOLDEN_PATH, index_col=0, float_precision='round_trip')
+    golden.index.name = None
+    golden['date'] = pd.to_datetime(golden['date']).astype('datetime64[us]')
+    return golden
+
+
+class TestLedgerParity:
+    """Test FIFOLotEngine against the FIFOTracker reference."""
+
+    def test_golden_file(self):
+        ledger = build_fifo_ledger(make_golden_input())
+        ledger['date'] = ledger['date'].astype('datetime64[us]')
+        pd.testing.assert_frame_equal(ledger, read_golden(), check_exact=True)
+
+    def test_golden_file_is_reference_output(self):
+        reference = build_fifo_ledger_reference(make_golden_input())
+        reference['date'] = reference['date'].astype('datetime64[us]')
+        pd.testing.assert_frame_equal(reference, read_golden(), check_exact=True)
+
+    @pytest.mark.parametrize('seed,dates', [(0, 'utc'), (1, 'naive'), (2, 'object')])
+    def test_matches_reference(self, seed, dates):
+        df = make_random_input(2000, seed, dates)
+        expected = build_fifo_ledger_reference(df.copy())
+        result = build_fifo_ledger(df.copy())
+
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        assert (result['remaining_qty'] < 0).any()  # shorts were exercised
+
+    def test_lot_compaction(self):
+        # Thousands of small buys drained by a few large sells
+        n_buys = 5000
+        df = pd.DataFrame({
+            'fund_id': 'f', 'wallet_address': 'w', 'asset': 'WETH',
+            'date': pd.date_range('2024-01-01', periods=n_buys + 4, freq='min'),
+            'hash': [f'0x{i:x}' for i in range(n_buys + 4)],
+            'side': ['buy'] * n_buys + ['sell'] * 4,
+            'qty': [round(0.001 + i * 1e-9, 12) for i in range(n_buys)] + [1.5, 1.5, 1.5, 1.0],
+            'unit_price_eth': [1 + (i % 7) * 0.01 for i in range(n_buys)] + [1.2] * 4,
+        })
+        engine = FIFOLotEngine()
+        result = engine.process_frame(df)
+
+        pd.testing.assert_frame_equal(result, tracker_ledger(df), check_exact=True)
+        assert engine.lots[('f', 'w', 'WETH')].head < n_buys
+
+
+class TestPositions:
+    """Test position summaries."""
+
+    def test_positions_match_tracker(self):
+        df = make_random_input(1500, 5)
+        build_fifo_ledger(df)  # adds qty / unit_price_eth / price_eth columns
+
+        tracker = FIFOTracker()
+        for _, row in df.iterrows():
+            tracker.process(str(row['fund_id']), str(row['wallet_address']), str(row['asset']),
+                            str(row['side']), abs(float(row['qty'])), float(row['unit_price_eth']),
+                            row['date'], str(row['hash']), float(row['price_eth']), log=False)
+
+        engine = FIFOLotEngine()
+        engine.process_frame(df, log=False)
+
+        pd.testing.assert_frame_equal(engine.get_all_positions(), tracker.get_all_positions(),
+                                      check_exact=True)
+        assert engine.get_current_position('FUND_II', '0xabc', 'weth') == \
+            tracker.get_current_position('FUND_II', '0xabc', 'weth')
+
+
+class TestInvalidRows:
+    """Test handling of non-numeric amounts."""
+
+    def make_frame(self):
+        return pd.DataFrame({
+            'fund_id': 'f', 'wallet_address': 'w', 'asset': 'WETH',
+            'date': pd.date_range('2024-01-01', periods=3, freq='D'),
+            'hash': ['0x1', '0x2', '0x3'],
+            'side': ['buy', 'buy', 'sell'],
+            'qty': [1.0, np.nan, 0.5],
+            'unit_price_eth': [1.0, 1.0, 1.1],
+        })
+
+    def test_invalid_amount_raises(self):
+        with pytest.raises(ValueError, match='0x2'):
+            FIFOLotEngine().process_frame(self.make_frame())
+
+    def test_invalid_amount_skipped(self):
+        result = FIFOLotEngine().process_frame(self.make_frame(), skip_invalid=True)
+        assert list(result['hash']) == ['0x1', '0x3']
+        assert result['remaining_qty'].iloc[-1] == 0.5
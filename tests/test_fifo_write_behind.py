@@ -0,0 +1,237 @@
+"""
+Unit tests for write-behind persistence of the FIFO engine's lot state.
+
+Tests:
+- A batch import writes the lot state once, and a reload sees the same lots
+- Single transactions are flushed on the operation threshold, writing only dirty partitions
+- Pending operations are flushed by the age timer and on close, without further transactions
+- Unflushed operations are replayed from the journal after a crash
+- Journal entries a flush already covered are not replayed again
+- Lots stored in the legacy single file are partitioned on the first flush
+- A sold-out partition is dropped
+"""
+import pytest
+import logging
+import sys
+import os
+import time
+from dataclasses import asdict, replace
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services.crypto_tracker import FIFOEngine, PersistenceManager
+from main_app.services.crypto_tracker.persistence_manager import TransactionRecord
+from main_app.services.crypto_tracker.write_behind import LotJournal
+
+FUND_ID = 'fund_i_class_B_ETH'
+START = datetime(2024, 1, 1, 6, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_transactions(n=120, offset=0):
+    """Buys and sells on four (wallet, asset) partitions; amounts with many decimals"""
+    transactions = []
+    for i in range(offset, offset + n):
+        tokens = Decimal((i * 7) % 13 + 1) / 3
+        transactions.append(TransactionRecord(
+            tx_hash=f'0x{i:064x}',
+            block_number=19_000_000 + i,
+            date=START + timedelta(hours=6 * i),
+            fund_id=FUND_ID,
+            wallet_id='0xabc' if i % 3 else '0xdef',
+            asset='WETH' if i % 2 else 'BLUR POOL',
+            side='sell' if i % 4 == 3 else 'buy',
+            token_amount=tokens,
+            eth_value=tokens * Decimal((i % 5) + 3) / 7,
+            usd_value=tokens * Decimal(3000 + 25 * (i % 9)),
+        ))
+    return transactions
+
+
+def make_engine(s3, journal, **kwargs):
+    kwargs.setdefault('flush_operations', 10_000)
+    kwargs.setdefault('flush_seconds', 3600)
+    return FIFOEngine(FUND_ID, persistence=PersistenceManager(FUND_ID, s3_client=s3),
+                      checkpoint_frequency=None, journal_path=str(journal), **kwargs)
+
+
+def lot_values(engine):
+    return sorted(
+        (lot.wallet_id, lot.asset, lot.purchase_date, lot.original_quantity, lot.remaining_quantity,
+         lot.cost_basis_eth, lot.cost_basis_usd, lot.source_tx_hash)
+        for lot_deque in engine.lots.values() for lot in lot_deque if lot.remaining_quantity > 0
+    )
+
+
+class TestFlushing:
+    """Test when and what the write-behind layer writes."""
+
+    def test_batch_written_once(self, tmp_path):
+        s3 = InMemoryS3()
+        engine = make_engine(s3, tmp_path / 'journal.jsonl')
+        results = engine.process_transaction_batch(make_transactions())
+        assert all(result.processed for result in results)
+
+        persistence = engine.persistence
+        assert s3.puts.count(persistence.lot_manifest_key) == 1
+        assert s3.puts.count(persistence.duplicate_hashes_key) == 1
+        assert engine.write_behind.pending == 0
+        assert not os.path.exists(tmp_path / 'journal.jsonl')
+
+        reloaded = make_engine(s3, tmp_path / 'journal.jsonl')
+        assert lot_values(reloaded) == lot_values(engine)
+        assert reloaded.duplicate_detector.check_duplicate(make_transactions()[5]).duplicate_type == 'exact'
+
+    def test_threshold_writes_dirty_partitions(self, tmp_path):
+        s3 = InMemoryS3()
+        engine = make_engine(s3, tmp_path / 'journal.jsonl', flush_operations=10)
+        transactions = make_transactions(40)
+        for transaction in transactions[:30]:
+            engine.process_transaction(transaction)
+        assert engine.write_behind.stats['flushes'] == 3
+        assert engine.write_behind.pending == 0
+
+        # Ten transactions of one partition rewrite only that partition
+        s3.reset_counters()
+        single = [tx for tx in make_transactions(200, offset=40) if (tx.wallet_id, tx.asset) == ('0xabc', 'WETH')]
+        for transaction in single[:10]:
+            engine.process_transaction(transaction)
+        partition_puts = [key for key in s3.puts if key.startswith(engine.persistence.lot_partitions_prefix)
+                          and key.endswith('.parquet')]
+        assert len(partition_puts) == 1
+
+        assert lot_values(make_engine(s3, tmp_path / 'journal.jsonl')) == lot_values(engine)
+
+    def test_timer_flushes_quiet_engine(self, tmp_path):
+        s3 = InMemoryS3()
+        engine = make_engine(s3, tmp_path / 'journal.jsonl', flush_seconds=0.2)
+        for transaction in make_transactions(5):
+            engine.process_transaction(transaction)
+        assert engine.write_behind.pending == 5
+
+        deadline = time.monotonic() + 10
+        while engine.write_behind.pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert engine.write_behind.pending == 0
+        assert engine.persistence.load_lot_manifest()['journal_sequence'] == 5
+        assert lot_values(make_engine(s3, tmp_path / 'journal.jsonl')) == lot_values(engine)
+
+    def test_close_flushes_pending(self, tmp_path):
+        s3 = InMemoryS3()
+        engine = make_engine(s3, tmp_path / 'journal.jsonl')
+        for transaction in make_transactions(5):
+            engine.process_transaction(transaction)
+
+        assert engine.close()
+        assert engine.write_behind.pending == 0
+        assert engine.write_behind._timer is None
+        assert not os.path.exists(tmp_path / 'journal.jsonl')
+        assert lot_values(make_engine(s3, tmp_path / 'journal.jsonl')) == lot_values(engine)
+
+    def test_commit_without_pending_writes_nothing(self, tmp_path):
+        s3 = InMemoryS3()
+        engine = make_engine(s3, tmp_path / 'journal.jsonl')
+        assert engine.commit()
+        assert s3.puts == []
+
+
+class TestJournal:
+    """Test crash recovery from the local journal."""
+
+    def test_unflushed_operations_replayed(self, tmp_path):
+        s3 = InMemoryS3()
+        journal = tmp_path / 'journal.jsonl'
+        transactions = make_transactions()
+
+        engine = make_engine(s3, journal)
+        engine.process_transaction_batch(transactions[:60])
+        for transaction in transactions[60:]:
+            engine.process_transaction(transaction)
+        assert engine.write_behind.pending == 60
+        expected = lot_values(engine)
+
+        # The process dies before a flush: a new engine replays the journal
+        recovered = make_engine(s3, journal)
+        assert lot_values(recovered) == expected
+        assert recovered.write_behind.pending == 60
+        assert recovered.duplicate_detector.check_duplicate(transactions[100]).duplicate_type == 'exact'
+
+        assert recovered.commit()
+        assert lot_values(make_engine(s3, journal)) == expected
+
+    def test_flushed_entries_not_replayed(self, tmp_path):
+        s3 = InMemoryS3()
+        journal = tmp_path / 'journal.jsonl'
+        transactions = make_transactions(20)
+
+        engine = make_engine(s3, journal)
+        for transaction in transactions:
+            engine.process_transaction(transaction)
+        lines = open(journal).read()
+        assert engine.commit()
+
+        # The flush wrote the lots but the process died before truncating the journal
+        with open(journal, 'w') as f:
+            f.write(lines)
+        recovered = make_engine(s3, journal)
+        assert recovered.write_behind.pending == 0
+        assert lot_values(recovered) == lot_values(engine)
+
+        # Numbering continues past the flushed entries
+        assert LotJournal(str(journal)).sequence == 20
+        recovered.process_transaction(make_transactions(1, offset=20)[0])
+        assert LotJournal(str(journal)).entries(after=20)[0]['seq'] == 21
+
+
+class TestLayout:
+    """Test the partitioned lot layout."""
+
+    def test_legacy_lots_partitioned(self, tmp_path):
+        s3 = InMemoryS3()
+        legacy = make_engine(s3, tmp_path / 'a.jsonl')
+        legacy.process_transaction_batch(make_transactions(40))
+        lots = [lot for lot_deque in legacy.lots.values() for lot in lot_deque]
+
+        # The pre-partitioning layout: one parquet of all lots, no manifest
+        s3.objects.clear()
+        persistence = PersistenceManager(FUND_ID, s3_client=s3)
+        frame = pd.DataFrame([{k: float(v) if isinstance(v, Decimal) else v for k, v in asdict(lot).items()}
+                              for lot in lots])
+        s3.put_object(Bucket=persistence.bucket, Key=persistence.lots_key, Body=frame.to_parquet(index=False))
+
+        engine = make_engine(s3, tmp_path / 'b.jsonl')
+        assert len(lot_values(engine)) == len(lots)
+        engine.process_transaction(make_transactions(1, offset=40)[0])
+        assert engine.commit()
+
+        manifest = persistence.load_lot_manifest()
+        assert {(e['wallet_id'], e['asset']) for e in manifest['partitions'].values()} == set(engine.lots)
+        assert len(lot_values(make_engine(s3, tmp_path / 'b.jsonl'))) == len(lot_values(engine))
+
+    def test_sold_out_partition_dropped(self, tmp_path):
+        s3 = InMemoryS3()
+        engine = make_engine(s3, tmp_path / 'journal.jsonl')
+        buy = make_transactions(1)[0]
+        sell = replace(buy, tx_hash='0x' + 'f' * 64, side='sell', date=buy.date + timedelta(days=1),
+                       duplicate_check_hash=None)
+        engine.process_transaction(buy)
+        assert engine.commit()
+        assert len(engine.persistence.load_lot_manifest()['partitions']) == 1
+
+        engine.process_transaction(sell)
+        assert engine.commit()
+        assert engine.persistence.load_lot_manifest()['partitions'] == {}
+        assert not [key for key in s3.objects if key.endswith('.parquet') and '/fifo_lots/' in key]
+
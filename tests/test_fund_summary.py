@@ -0,0 +1,158 @@
+"""
+Unit tests for the materialized dashboard aggregates.
+
+Tests:
+- Cube slices match the same figures computed from the ledger
+- Combining per-partition summaries equals summarizing the whole ledger
+- After an append only the touched partitions are summarized again
+- Compaction and unchanged saves reuse every partition summary
+- s3_utils.get_fund_summary sees postings made through append_GL_entries
+"""
+import pytest
+import logging
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services.gl_store import GLStore, partition_labels
+from main_app.services.fund_summary import FundSummary, FundSummaryCube, RECENT_ROWS
+
+KEY = "drip_capital/general_ledger.parquet"
+BUCKET = "test-bucket"
+ACCOUNTS = ['investments_loans', 'digital_assets_eth', 'interest_income', 'gas_expense']
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_ledger(n=800, seed=0, start='2024-01-01', days=150):
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 10**6, n) / 1000
+    debit = rng.random(n) < 0.5
+    return pd.DataFrame({
+        'date': pd.Timestamp(start, tz='UTC') + pd.to_timedelta(rng.integers(0, days * 86400, n), unit='s'),
+        'fund_id': rng.choice(['fund_i_class_B_ETH', 'fund_ii_class_B_ETH'], n),
+        'account_name': rng.choice(ACCOUNTS, n),
+        'debit_crypto': np.where(debit, amounts, 0.0),
+        'credit_crypto': np.where(debit, 0.0, amounts),
+        'row_key': [f'{seed}:{i}' for i in range(n)],
+    })
+
+
+def assert_same_cube(actual, expected):
+    pd.testing.assert_frame_equal(actual.accounts(), expected.accounts())
+    assert actual.entries() == expected.entries()
+    pd.testing.assert_frame_equal(actual.recent_transactions(), expected.recent_transactions())
+
+
+class TestCube:
+    """Test slices against the ledger."""
+
+    def test_slices_match_ledger(self):
+        gl = make_ledger()
+        cube = FundSummaryCube.from_gl(gl)
+
+        by_account = gl.groupby('account_name')[['debit_crypto', 'credit_crypto']].sum()
+        accounts = cube.accounts()
+        np.testing.assert_allclose(accounts['debit'], by_account['debit_crypto'])
+        np.testing.assert_allclose(accounts['credit'], by_account['credit_crypto'])
+        assert cube.entries() == len(gl)
+
+        start, end = pd.Timestamp('2024-02-01'), pd.Timestamp('2024-03-15')
+        window = gl[(gl['date'].dt.date >= start.date()) & (gl['date'].dt.date <= end.date())]
+        loans = window[window['account_name'] == 'investments_loans']
+        debits, credits = cube.totals(['investments_loans'], start=start, end=end.date())
+        assert debits == pytest.approx(loans['debit_crypto'].sum())
+        assert credits == pytest.approx(loans['credit_crypto'].sum())
+        assert cube.entries(start=start) == int((gl['date'] >= start.tz_localize('UTC')).sum())
+
+        monthly = cube.monthly(['interest_income'])
+        income = gl[gl['account_name'] == 'interest_income']
+        expected = income.groupby(income['date'].dt.strftime('%Y-%m'))['credit_crypto'].sum()
+        np.testing.assert_allclose(monthly['credit'], expected)
+
+        recent = cube.recent_transactions()
+        assert len(recent) == RECENT_ROWS
+        assert list(recent['date']) == list(gl['date'].sort_values(ascending=False).head(RECENT_ROWS))
+
+    def test_fund_slice_and_memo(self):
+        gl = make_ledger()
+        cube = FundSummaryCube.from_gl(gl)
+        fund = cube.fund('fund_ii_class_B_ETH')
+        assert fund.entries() == int((gl['fund_id'] == 'fund_ii_class_B_ETH').sum())
+        assert cube.fund('fund_ii_class_B_ETH') is fund
+
+        calls = []
+        assert cube.memo('figure', lambda: calls.append(1) or 42) == 42
+        assert cube.memo('figure', lambda: calls.append(1) or 43) == 42
+        assert calls == [1]
+
+    def test_combine_partitions(self):
+        gl = make_ledger()
+        labels = partition_labels(gl)
+        parts = [FundSummaryCube.from_gl(gl[labels == label]) for label in labels.unique()]
+        combined = FundSummaryCube.combine((part.daily, part.recent) for part in parts)
+        assert_same_cube(combined, FundSummaryCube.from_gl(gl))
+
+
+class TestFundSummary:
+    """Test incremental maintenance from a GLStore."""
+
+    def make_summary(self):
+        store = GLStore(KEY, InMemoryS3(), BUCKET)
+        store.replace(make_ledger())
+        return store, FundSummary(store, check_seconds=0)
+
+    def test_append_resummarizes_touched_partitions(self):
+        store, summary = self.make_summary()
+        first = summary.cube()
+        partitions = len(store.manifest()['partitions'])
+        assert summary.stats['partitions_summarized'] == partitions
+
+        new_lines = make_ledger(5, seed=7, start='2024-03-10', days=3)
+        new_lines['fund_id'] = 'fund_i_class_B_ETH'
+        store.append(new_lines)
+
+        cube = summary.cube()
+        assert cube is not first
+        assert summary.stats['partitions_summarized'] - partitions == 1
+        assert cube.entries() == first.entries() + 5
+        assert_same_cube(cube, FundSummaryCube.from_gl(store.read()))
+
+    def test_unchanged_ledger_reuses_cube(self):
+        store, summary = self.make_summary()
+        first = summary.cube()
+
+        # Same rows written again and compacted: new manifest versions, same content
+        store.replace(store.read())
+        store.compact()
+        assert summary.cube() is first
+        assert summary.stats['partitions_summarized'] == len(store.manifest()['partitions'])
+
+
+class TestS3Utils:
+    """Test the s3_utils entry point."""
+
+    def test_postings_reach_summary(self, monkeypatch):
+        from main_app import s3_utils
+
+        monkeypatch.setattr(s3_utils, 's3', InMemoryS3())
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+        monkeypatch.setattr(s3_utils, '_fund_summaries', {})
+
+        s3_utils.save_GL_file(make_ledger(100))
+        assert s3_utils.get_fund_summary().entries() == 100
+
+        s3_utils.append_GL_entries(make_ledger(3, seed=4))
+        assert s3_utils.get_fund_summary().entries() == 103
+        s3_utils.load_GL_file.cache_clear()
@@ -0,0 +1,238 @@
+"""
+Unit tests for typed fixed-point GL amounts.
+
+Tests:
+- Vectorized cleaning matches safe_to_decimal cell by cell
+- load_GL2_file(typed=True) keeps every column total identical to the Decimal load
+- Trial balance, NAV and income statement totals match the Decimal path
+- The account x day pivot behind the fund trial balance is identical
+- PCAP capital flows land in the same grid cells with the same amounts
+- The NAV/PCAP GL loader returns typed amounts when GL_TYPED_AMOUNTS is on
+"""
+import pytest
+import logging
+import sys
+import os
+from datetime import datetime
+from decimal import Decimal, localcontext
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app import s3_utils
+from main_app.s3_utils import safe_to_decimal
+from main_app.services.gl_amounts import AMOUNT_DTYPE, is_amount_column, sum_pivot, to_amounts
+from main_app.modules.financial_reporting import tb_generator
+
+ACCOUNTS = {
+    10110: 'Digital assets - ETH',
+    30110: 'Capital contributions',
+    30210: 'Capital distributions',
+    40100: 'Interest income',
+    80100: 'Management fees',
+    90100: 'Realized gains',
+}
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def quantized(values):
+    with localcontext() as ctx:
+        ctx.prec = 60
+        return [safe_to_decimal(v).quantize(Decimal('1e-18')) for v in values]
+
+
+def make_gl(n=2000, seed=0):
+    """GL lines whose float amounts come from 9-place or wei-scale decimals, like real postings"""
+    rng = np.random.default_rng(seed)
+    amounts = np.round(rng.uniform(0, 50, n), 9)
+    wei = rng.random(n) < 0.2
+    amounts[wei] = [float(Decimal(int(i)).scaleb(-18)) for i in rng.integers(1, 10**9, wei.sum())]
+    debit = rng.random(n) < 0.5
+    return pd.DataFrame({
+        'date': pd.Timestamp('2024-01-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s'),
+        'fund_id': 'fund_i_class_B_ETH',
+        'GL_Acct_Number': rng.choice(list(ACCOUNTS), n),
+        'debit_crypto': np.where(debit, amounts, 0.0),
+        'credit_crypto': np.where(debit, 0.0, amounts),
+        'eth_usd_price': np.round(rng.uniform(1500, 4000, n), 2),
+        'row_key': [f'row:{i}' for i in range(n)],
+    })
+
+
+def decimal_and_typed(gl):
+    legacy, typed = gl.copy(), gl.copy()
+    for col in ['debit_crypto', 'credit_crypto']:
+        legacy[col] = gl[col].apply(safe_to_decimal)
+        typed[col] = to_amounts(gl[col])
+    return legacy, typed
+
+
+class TestCleaning:
+    """Test the vectorized conversion against safe_to_decimal."""
+
+    def test_floats(self):
+        values = pd.Series([0.1, 1e-5, 123.456, -0.0, np.nan, 1e16, 2.5e-7, 0.1 + 0.2, 12345.6789])
+        assert to_amounts(values).dtype == AMOUNT_DTYPE
+        assert to_amounts(values).astype(object).tolist() == quantized(values)
+
+    def test_text_and_decimals(self):
+        values = pd.Series(['', ' NaN ', 'None', 'null', 'na', '1,234.50', '$12', 'abc', '1e-5',
+                            '  -3.25 ', '1.2.3', '-', '.5', Decimal('2.5'), None, np.nan, 7], dtype=object)
+        assert to_amounts(values).astype(object).tolist() == quantized(values)
+
+    def test_float_noise_is_rounded(self):
+        amounts = to_amounts(pd.Series([1.2345678901234567e-05]))
+        assert amounts.iloc[0] == Decimal('0.000012345678901235')
+
+    def test_typed_column_passes_through(self):
+        amounts = to_amounts(pd.Series([1.5]))
+        assert to_amounts(amounts) is amounts
+        assert is_amount_column(amounts)
+        assert not is_amount_column(pd.Series([1.5]))
+
+
+class TestTypedLoad:
+    """Test load_GL2_file(typed=True) on top of the GL store."""
+
+    def test_column_totals_identical(self, monkeypatch):
+        monkeypatch.setattr(s3_utils, 's3', InMemoryS3())
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+        s3_utils.clear_GL2_cache()
+
+        assert s3_utils.save_GL2_file(make_gl())
+        decimals = s3_utils.load_GL2_file()
+        typed = s3_utils.load_GL2_file(typed=True)
+        s3_utils.clear_GL2_cache()
+
+        for col in ['debit_crypto', 'credit_crypto', 'eth_usd_price']:
+            assert is_amount_column(typed[col])
+            assert isinstance(decimals[col].iloc[0], Decimal)
+            assert typed[col].sum() == sum(decimals[col])
+
+
+class TestReports:
+    """Test trial balance, NAV and income statement totals on both paths."""
+
+    @pytest.fixture(autouse=True)
+    def coa(self, monkeypatch):
+        coa_df = pd.DataFrame({'GL_Acct_Number': list(ACCOUNTS), 'GL_Acct_Name': list(ACCOUNTS.values())})
+        monkeypatch.setattr(tb_generator, 'load_COA_file', lambda: coa_df)
+
+    def test_trial_balance_is_exact(self):
+        gl = make_gl()
+        legacy, typed = decimal_and_typed(gl)
+        as_of = datetime(2024, 9, 30)
+
+        legacy_tb = tb_generator.generate_trial_balance_from_gl(legacy, as_of).set_index('GL_Acct_Number')
+        typed_tb = tb_generator.generate_trial_balance_from_gl(typed, as_of).set_index('GL_Acct_Number')
+
+        assert list(typed_tb.index) == list(legacy_tb.index)
+        assert typed_tb['Balance'].dtype == 'float64'
+        # The typed balance is the exact Decimal total, rounded once to float
+        lines = legacy[legacy['date'] <= pd.Timestamp(as_of, tz='UTC')]
+        for acct, balance in typed_tb['Balance'].items():
+            acct_lines = lines[lines['GL_Acct_Number'] == acct]
+            assert balance == float(sum(acct_lines['debit_crypto']) - sum(acct_lines['credit_crypto']))
+        np.testing.assert_allclose(typed_tb['Balance'], legacy_tb['Balance'], rtol=1e-12)
+
+    def test_nav_and_income_statement_identical(self):
+        legacy, typed = decimal_and_typed(make_gl(seed=1))
+        as_of = datetime(2024, 11, 15)
+
+        pd.testing.assert_frame_equal(tb_generator.calculate_nav_changes(typed, as_of),
+                                      tb_generator.calculate_nav_changes(legacy, as_of))
+        for typed_part, legacy_part in zip(tb_generator.get_income_expense_changes(typed, as_of),
+                                           tb_generator.get_income_expense_changes(legacy, as_of)):
+            pd.testing.assert_frame_equal(typed_part, legacy_part)
+
+    def test_account_day_pivot_identical(self):
+        legacy, typed = decimal_and_typed(make_gl(seed=2))
+        legacy['net_debit_credit_crypto'] = (legacy['debit_crypto'] - legacy['credit_crypto']).round(18)
+        typed['net_debit_credit_crypto'] = typed['debit_crypto'] - typed['credit_crypto']
+        for df in (legacy, typed):
+            df['day'] = df['date'].dt.normalize()
+
+        legacy_pivot = sum_pivot(legacy, ['GL_Acct_Number'], 'day', 'net_debit_credit_crypto')
+        typed_pivot = sum_pivot(typed, ['GL_Acct_Number'], 'day', 'net_debit_credit_crypto')
+
+        assert typed_pivot.shape == legacy_pivot.shape
+        pd.testing.assert_frame_equal(typed_pivot.cumsum(axis=1), legacy_pivot.cumsum(axis=1))
+
+
+class TestLoaders:
+    """Test the GL loader of the NAV and PCAP paths."""
+
+    @pytest.mark.parametrize('typed', [False, True])
+    def test_gl_data_for_fund_follows_flag(self, monkeypatch, typed):
+        from main_app.modules.fund_accounting import helpers
+        from main_app.modules.fund_accounting.balance_engine import BalanceEngine
+
+        monkeypatch.setattr(s3_utils, 's3', InMemoryS3())
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+        monkeypatch.setattr(helpers, 'TYPED_GL_AMOUNTS', typed)
+        monkeypatch.setattr(helpers, 'load_COA_file', lambda: pd.DataFrame(
+            {'GL_Acct_Number': list(ACCOUNTS), 'GL_Acct_Name': list(ACCOUNTS.values())}))
+        gl = make_gl(500, seed=4)
+        # The GL carries account names; numbers come from the COA
+        gl['account_name'] = gl.pop('GL_Acct_Number').map(ACCOUNTS)
+        s3_utils.save_GL_file(gl)
+
+        loaded = helpers.gl_data_for_fund(lambda: 'fund_i_class_B_ETH')
+
+        for col in ['debit_crypto', 'credit_crypto']:
+            assert is_amount_column(loaded[col]) == typed
+            if typed:
+                assert loaded[col].sum() == sum(quantized(gl[col]))
+            else:
+                assert loaded[col].sum() == pytest.approx(gl[col].sum())
+        if typed:
+            # Feeds the NAV balance matrix like the float load
+            nav = BalanceEngine(loaded).nav_at(loaded['date'].max())
+            monkeypatch.setattr(helpers, 'TYPED_GL_AMOUNTS', False)
+            floats = helpers.gl_data_for_fund(lambda: 'fund_i_class_B_ETH')
+            np.testing.assert_allclose(nav, BalanceEngine(floats).nav_at(floats['date'].max()))
+
+
+class TestPCAP:
+    """Test PCAP capital flows from a typed GL."""
+
+    def test_capital_flows_identical(self):
+        pytest.importorskip('pytz')
+        from main_app.modules.fund_accounting.PCAP.pcap import (
+            SimplifiedCapitalTiming, process_capital_with_partner_accounting,
+        )
+
+        rng = np.random.default_rng(3)
+        days = pd.date_range('2024-03-01 23:59:59', periods=10, freq='D', tz='UTC')
+        lps = ['LP_001', 'LP_002', 'LP_003']
+        grid = pd.DataFrame([{'limited_partner_ID': lp, 'date': day} for lp in lps for day in days])
+
+        n = 60
+        day_idx = rng.integers(0, len(days), n)
+        seconds = rng.integers(0, 86400, n)
+        gl = pd.DataFrame({
+            'limited_partner_ID': rng.choice(lps, n),
+            'account_name': rng.choice(['capital_contributions_property', 'capital_distributions_property'], n),
+            'date': days[day_idx],
+            'transaction_datetime': days[day_idx].normalize() + pd.to_timedelta(seconds, unit='s'),
+            'net_debit_credit_crypto': np.round(rng.uniform(-100, 100, n), 9),
+        })
+        typed_gl = gl.assign(net_debit_credit_crypto=to_amounts(gl['net_debit_credit_crypto']))
+
+        timing = SimplifiedCapitalTiming("09:00")
+        legacy_grid = process_capital_with_partner_accounting(gl, grid.copy(), timing)
+        typed_grid = process_capital_with_partner_accounting(typed_gl, grid.copy(), timing)
+
+        pd.testing.assert_frame_equal(typed_grid, legacy_grid)
+        assert typed_grid[['cap_contrib_bod', 'cap_contrib_eod', 'cap_dist_bod', 'cap_dist_eod']].to_numpy().sum() \
+            == sum(safe_to_decimal(v) for v in gl['net_debit_credit_crypto'])
@@ -0,0 +1,181 @@
+"""
+Unit tests for projected, date-bounded parquet reads.
+
+Tests:
+- read_gl returns exactly the rows and columns of a filtered full load
+- Projected / bounded reads of uncached files fetch a fraction of the bytes
+- Row groups outside the date range are skipped using their statistics
+- Files outside the range are skipped using the manifest date bounds
+- PersistenceManager.load_transactions pushes the date range and columns down
+"""
+import pytest
+import logging
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app import s3_utils
+from main_app.services import parquet_io
+from main_app.services.gl_store import GLStore
+from main_app.services.parquet_io import S3RangeFile, read_parquet, to_parquet_bytes
+
+KEY = "drip_capital/general_ledger.parquet"
+BUCKET = "test-bucket"
+FUND = 'fund_i_class_B_ETH'
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def selective(monkeypatch):
+    """Use ranged reads even for the small objects of these tests"""
+    monkeypatch.setattr(parquet_io, 'SELECTIVE_READ_MIN_BYTES', 0)
+
+
+def make_ledger(n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 10**6, n) / 1000
+    return pd.DataFrame({
+        'date': pd.Timestamp('2024-01-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 120 * 86400, n), unit='s'),
+        'fund_id': rng.choice([FUND, 'fund_ii_class_B_ETH'], n),
+        'GL_Acct_Number': rng.choice(['100.30', '400.10', '600.10'], n),
+        'account_name': rng.choice(['digital_assets_eth', 'interest_income', 'management_fees'], n),
+        'debit_crypto': np.where(rng.random(n) < 0.5, amounts, 0.0),
+        'credit_crypto': np.where(rng.random(n) < 0.5, 0.0, amounts),
+        'hash': [f'0x{i:064x}' for i in range(n)],
+        'row_key': [f'0x{i:064x}:{i % 3}' for i in range(n)],
+    })
+
+
+def sort_rows(df):
+    return df.sort_values('row_key').reset_index(drop=True)
+
+
+class TestReadGL:
+    """Test the s3_utils query loader."""
+
+    def test_matches_filtered_full_load(self, monkeypatch, selective):
+        s3 = InMemoryS3()
+        monkeypatch.setattr(s3_utils, 's3', s3)
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+        s3_utils.load_GL_file.cache_clear()
+
+        s3_utils.save_GL_file(make_ledger(40_000))
+        start, end = pd.Timestamp('2024-02-10', tz='UTC'), pd.Timestamp('2024-03-05', tz='UTC')
+        columns = ['date', 'GL_Acct_Number', 'debit_crypto', 'credit_crypto', 'row_key']
+
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+        s3.reset_counters()
+        result = s3_utils.read_gl(fund_id=FUND, start=start, end=end, columns=columns)
+        partial_bytes = s3.bytes_downloaded
+
+        full = s3_utils.load_GL_file()
+        expected = full[(full['fund_id'] == FUND) & (full['date'] >= start) & (full['date'] <= end)][columns]
+
+        assert list(result.columns) == columns
+        assert isinstance(result['debit_crypto'].iloc[0], Decimal)
+        pd.testing.assert_frame_equal(sort_rows(result), sort_rows(expected))
+        assert partial_bytes < (s3.bytes_downloaded - partial_bytes) / 3
+        s3_utils.load_GL_file.cache_clear()
+
+    def test_save_invalidates_cached_query(self, monkeypatch):
+        monkeypatch.setattr(s3_utils, 's3', InMemoryS3())
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+
+        ledger = make_ledger(200)
+        s3_utils.save_GL_file(ledger)
+        assert len(s3_utils.read_gl(columns=['row_key'])) == 200
+
+        s3_utils.append_GL_entries(make_ledger(3, seed=1).assign(row_key=['a', 'b', 'c']))
+        assert len(s3_utils.read_gl(columns=['row_key'])) == 203
+
+
+class TestSelectiveReads:
+    """Test row-group pruning and column projection in the store."""
+
+    def test_row_groups_pruned_by_date(self, monkeypatch, selective):
+        monkeypatch.setattr(parquet_io, 'ROW_GROUP_ROWS', 1000)
+        ledger = make_ledger(40_000).assign(fund_id=FUND)
+        ledger['date'] = pd.Timestamp('2024-02-01', tz='UTC') + (ledger['date'] - ledger['date'].min()) / 5
+        s3 = InMemoryS3()
+        s3.put_object(Bucket=BUCKET, Key='one.parquet', Body=to_parquet_bytes(ledger.sort_values('date')))
+
+        start, end = pd.Timestamp('2024-02-10', tz='UTC'), pd.Timestamp('2024-02-12', tz='UTC')
+        source = S3RangeFile(s3, BUCKET, 'one.parquet')
+        table = read_parquet(source, ['date', 'debit_crypto'], 'date', start, end)
+
+        inside = ((ledger['date'] >= start) & (ledger['date'] <= end)).sum()
+        assert inside <= table.num_rows < inside + 2000
+        assert source.bytes_read < len(s3.objects['one.parquet'][0]) / 5
+
+    def test_cached_files_serve_projections(self):
+        store = GLStore(KEY, InMemoryS3(), BUCKET)
+        store.replace(make_ledger())
+        store.clear_cache()
+        store.read()
+        store.s3.reset_counters()
+
+        result = store.read(fund_id=FUND, columns=['row_key', 'debit_crypto'])
+        assert list(result.columns) == ['row_key', 'debit_crypto']
+        # Only the manifest was fetched
+        assert store.s3.calls == 1
+
+    def test_files_skipped_by_manifest_bounds(self, selective):
+        store = GLStore(KEY, InMemoryS3(), BUCKET)
+        early = make_ledger(50).assign(fund_id=FUND, date=pd.Timestamp('2024-03-02', tz='UTC'))
+        late = make_ledger(50, seed=1).assign(fund_id=FUND, date=pd.Timestamp('2024-03-28', tz='UTC'),
+                                              row_key=lambda d: 'late:' + d['row_key'])
+        store.append(early)
+        store.append(late)
+
+        reader = GLStore(KEY, store.s3, BUCKET)
+        result = reader.read(start=datetime(2024, 3, 20), end=datetime(2024, 3, 31))
+        pd.testing.assert_frame_equal(sort_rows(result), sort_rows(late))
+        assert reader.stats['files_read_partially'] == 1
+
+
+class TestTransactionLoads:
+    """Test pushdown in PersistenceManager.load_transactions."""
+
+    def test_bounded_projected_load(self, monkeypatch, selective):
+        from main_app.services.crypto_tracker import PersistenceManager
+        from main_app.services.crypto_tracker.persistence_manager import TransactionRecord
+
+        monkeypatch.setattr(parquet_io, 'ROW_GROUP_ROWS', 500)
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        transactions = [
+            TransactionRecord(
+                tx_hash=f'0x{i:064x}', block_number=19_000_000 + i, date=base + timedelta(minutes=13 * ((i * 37) % 6000)),
+                fund_id=FUND, wallet_id='0xabc', asset='WETH', side='buy',
+                token_amount=Decimal(i % 9 + 1) / 4, eth_value=Decimal('0.5'), usd_value=Decimal(1500 + i),
+            )
+            for i in range(6000)
+        ]
+        s3 = InMemoryS3()
+        persistence = PersistenceManager(FUND, s3_client=s3)
+        assert persistence.save_transactions(transactions, create_backup=False)
+
+        full = persistence.load_transactions()
+        s3.reset_counters()
+        start, end = datetime(2024, 1, 20), datetime(2024, 1, 25, 23)
+        result = persistence.load_transactions(start=start, end=end, columns=['tx_hash', 'token_amount'])
+
+        window = full[(full['date'] >= pd.Timestamp(start, tz='UTC')) & (full['date'] <= pd.Timestamp(end, tz='UTC'))]
+        assert list(result.columns) == ['tx_hash', 'token_amount']
+        assert sorted(result['tx_hash']) == sorted(window['tx_hash'])
+        assert set(result['token_amount']) <= set(full['token_amount'])
+        assert s3.bytes_downloaded < len(s3.objects[persistence.transactions_key][0]) / 4
+        assert persistence.get_data_summary()['transaction_count'] == 6000
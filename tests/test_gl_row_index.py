@@ -0,0 +1,231 @@
+"""
+Unit tests for the GL row-key index.
+
+Tests:
+- Keys use row_key when set and are the same for Decimal and float amounts
+- Stored keys with raw (e.g. Decimal) amounts match the keys generated now
+- post() skips lines already in the ledger and appends the rest
+- Steady-state posting reads no ledger data, only the two manifests
+- Edited, replaced or externally appended partitions are re-keyed, and only those
+- A second process loads the sidecar instead of rebuilding it
+- A partition's key files are merged once they pile up
+- s3_utils.post_GL_entries and post_GL2_entries post through the index
+"""
+import pytest
+import logging
+import sys
+import os
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services.gl_store import GLStore, partition_labels
+from main_app.services.gl_row_index import GLRowKeyIndex, gl_row_keys
+
+KEY = "drip_capital/general_ledger.parquet"
+BUCKET = "test-bucket"
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_ledger(n=600, seed=0, start='2024-01-01', prefix='0x'):
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 10**6, n) / 1000
+    return pd.DataFrame({
+        'date': pd.Timestamp(start, tz='UTC') + pd.to_timedelta(rng.integers(0, 180 * 86400, n), unit='s'),
+        'fund_id': rng.choice(['fund_i_class_B_ETH', 'fund_ii_class_B_ETH'], n),
+        'account_name': rng.choice(['100.30 - ETH Wallet', '400.10 - Interest Income'], n),
+        'transaction_type': rng.choice(['loan_origination', 'interest_accrual'], n),
+        'debit_crypto': np.where(rng.random(n) < 0.5, amounts, 0.0),
+        'credit_crypto': np.where(rng.random(n) < 0.5, 0.0, amounts),
+        'hash': [f'{prefix}{i:064x}' for i in range(n)],
+    })
+
+
+def make_index(s3=None, **kwargs):
+    return GLRowKeyIndex(GLStore(KEY, s3 or InMemoryS3(), BUCKET), **kwargs)
+
+
+class TestKeys:
+    """Test the row key of a GL line."""
+
+    def test_row_key_and_amount_types(self):
+        lines = pd.DataFrame({
+            'hash': ['0x1', '0x1', '0x2'],
+            'account_name': ['100.30 - ETH Wallet'] * 3,
+            'transaction_type': ['gas_fee'] * 3,
+            'debit_crypto': [Decimal('0.125'), 0.125, None],
+            'credit_crypto': [0, 0.0, Decimal('1.5')],
+            'row_key': [None, '', 'accrual:7:2024-01-01'],
+        })
+
+        keys = gl_row_keys(lines)
+
+        assert keys[0] == keys[1] == '0x1:100.30 - ETH Wallet:gas_fee:0.125:0.0'
+        assert keys[2] == 'accrual:7:2024-01-01'
+
+    def test_legacy_row_keys_match(self):
+        amounts = [Decimal('0.123456789012345678'), Decimal('0E-18'), Decimal('5'), Decimal('1E+2')]
+        lines = pd.DataFrame({
+            'hash': '0x1', 'account_name': '100.30 - ETH Wallet', 'transaction_type': 'gas_fee',
+            'debit_crypto': amounts, 'credit_crypto': [0, None, Decimal('2.50'), 0.0],
+        })
+        # Keys as posted before the index: str() of the raw amounts
+        legacy = pd.DataFrame({'row_key': [f"0x1:100.30 - ETH Wallet:gas_fee:{d}:{c}"
+                                           for d, c in zip(lines['debit_crypto'], lines['credit_crypto'])]})
+
+        assert list(gl_row_keys(legacy)) == list(gl_row_keys(lines))
+        assert gl_row_keys(legacy)[0] == '0x1:100.30 - ETH Wallet:gas_fee:0.12345678901234568:0.0'
+        # Keys not ending in two amounts are left alone
+        assert list(gl_row_keys(pd.DataFrame({'row_key': ['0x1:10030:income_interest_accruals:2024-01-01:DR',
+                                                          '0x1:10030:reversal']}))) == \
+            ['0x1:10030:income_interest_accruals:2024-01-01:DR', '0x1:10030:reversal']
+
+
+class TestPost:
+    """Test idempotent posting."""
+
+    def test_skips_posted_lines(self):
+        index = make_index()
+        ledger = make_ledger()
+        index.store.replace(ledger)
+
+        batch = pd.concat([ledger.iloc[:5], make_ledger(7, seed=3, prefix='0xnew')], ignore_index=True)
+        posted, skipped = index.post(batch)
+
+        assert (posted['hash'].str.startswith('0xnew')).all() and len(posted) == 7
+        assert skipped == 5
+        assert len(index.store.read()) == len(ledger) + 7
+
+        # Posting the same batch again is a no-op
+        posted, skipped = index.post(batch)
+        assert posted.empty and skipped == 12
+        assert len(index.store.read()) == len(ledger) + 7
+
+    def test_steady_state_reads_no_ledger_data(self):
+        index = make_index()
+        index.store.replace(make_ledger())
+        index.post(make_ledger(3, seed=1, prefix='0xa'))
+
+        index.store.s3.reset_counters()
+        downloaded = index.store.stats['files_downloaded']
+        posted, _ = index.post(make_ledger(3, seed=2, start='2024-02-01', prefix='0xb'))
+
+        assert len(posted) == 3
+        assert index.store.stats['files_downloaded'] == downloaded
+        assert index.stats['partitions_rebuilt'] == len(set(partition_labels(make_ledger())))
+        # The two manifests are the only objects read
+        assert index.store.s3.bytes_downloaded < 20_000
+
+
+class TestDrift:
+    """Test rebuilding partitions that drifted from the ledger."""
+
+    def test_replace_rekeys_changed_partition(self):
+        index = make_index()
+        ledger = make_ledger()
+        index.store.replace(ledger)
+        index.post(make_ledger(1, seed=4, prefix='0xc'))
+        rebuilt = index.stats['partitions_rebuilt']
+
+        # Edit one line outside the index: its hash changes, so its old key is gone
+        edited = index.store.read()
+        edited.loc[edited['hash'] == ledger.loc[0, 'hash'], 'hash'] = '0xedited'
+        index.store.replace(edited)
+
+        posted, skipped = index.post(ledger.iloc[[0]])
+        assert len(posted) == 1 and skipped == 0
+        assert index.stats['partitions_rebuilt'] == rebuilt + 1
+
+    def test_external_append_is_detected(self):
+        s3 = InMemoryS3()
+        index = make_index(s3)
+        index.store.replace(make_ledger())
+        index.post(make_ledger(2, seed=5, prefix='0xd'))
+
+        # Another writer appends straight to the store
+        outside = make_ledger(3, seed=6, prefix='0xe')
+        GLStore(KEY, s3, BUCKET).append(outside)
+
+        posted, skipped = index.post(outside)
+        assert posted.empty and skipped == 3
+
+    def test_second_process_loads_sidecar(self):
+        s3 = InMemoryS3()
+        first = make_index(s3)
+        first.store.replace(make_ledger())
+        first.post(make_ledger(4, seed=7, prefix='0xf'))
+
+        second = make_index(s3)
+        posted, skipped = second.post(make_ledger(4, seed=7, prefix='0xf'))
+
+        assert posted.empty and skipped == 4
+        assert second.stats['partitions_rebuilt'] == 0
+        assert len(second) == len(first)
+
+    def test_key_files_are_merged(self):
+        s3 = InMemoryS3()
+        index = make_index(s3, compact_min_files=3)
+        batches = [make_ledger(2, seed=10 + i, prefix=f'0x{i}').assign(
+            fund_id='fund_i_class_B_ETH', date=pd.Timestamp('2024-05-15', tz='UTC')) for i in range(5)]
+        for batch in batches:
+            index.post(batch)
+
+        key_files = [k for k in s3.objects if '_row_keys/fund_id=' in k]
+        assert len(key_files) < 3
+        assert len(index) == 10
+        assert make_index(s3).contains(pd.concat(batches)).all()
+
+
+class TestS3Utils:
+    """Test the s3_utils posting function."""
+
+    def test_post_gl_entries(self, monkeypatch):
+        from main_app import s3_utils
+
+        monkeypatch.setattr(s3_utils, 's3', InMemoryS3())
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+        monkeypatch.setattr(s3_utils, '_gl_row_indexes', {})
+        monkeypatch.setattr(s3_utils, '_fund_summaries', {})
+
+        lines = make_ledger(6).assign(debit_crypto=lambda d: d['debit_crypto'].map(lambda v: Decimal(str(v))))
+        posted, skipped = s3_utils.post_GL_entries(lines)
+        assert len(posted) == 6 and skipped == 0
+
+        posted, skipped = s3_utils.post_GL_entries(lines)
+        assert posted.empty and skipped == 6
+        assert len(s3_utils.get_gl_store(s3_utils.GL_KEY).read()) == 6
+
+    def test_post_gl2_skips_lines_posted_before_index(self, monkeypatch):
+        from main_app import s3_utils
+
+        monkeypatch.setattr(s3_utils, 's3', InMemoryS3())
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+        monkeypatch.setattr(s3_utils, '_gl_row_indexes', {})
+        monkeypatch.setattr(s3_utils, '_fund_summaries', {})
+
+        line = {'hash': '0x' + 'ab' * 32, 'account_name': '100.30 - ETH Wallet', 'transaction_type': 'loan_origination',
+                'debit_crypto': Decimal('0.123456789012345678'), 'credit_crypto': 0}
+        gl2_line = {'tx_hash': line['hash'], 'entry_type': 'DEBIT', 'account_name': line['account_name'],
+                    'debit_crypto': 0.123456789012345678, 'credit_crypto': 0.0,
+                    'timestamp': pd.Timestamp('2024-03-01', tz='UTC'), 'fund_id': 'fund_i_class_B_ETH'}
+        # Posted by the row-by-row path, with the key built from the raw amounts
+        legacy = pd.DataFrame([dict(gl2_line, row_key=f"{line['hash']}:{line['account_name']}:"
+                                                      f"{line['transaction_type']}:{line['debit_crypto']}:0")])
+        s3_utils.get_gl_store(s3_utils.GL2_KEY).replace(legacy.rename(columns={'timestamp': 'date'}))
+
+        repost = pd.DataFrame([dict(gl2_line, row_key=gl_row_keys(pd.DataFrame([line]))[0])])
+        posted, skipped = s3_utils.post_GL2_entries(repost)
+
+        assert posted.empty and skipped == 1
+        assert len(s3_utils.get_gl_store(s3_utils.GL2_KEY).read()) == 1
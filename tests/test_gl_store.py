@@ -0,0 +1,242 @@
+"""
+Unit tests for the partitioned general ledger store.
+
+Tests:
+- Appends write one small segment per (fund, month) and read back in full
+- Saving a loaded ledger unchanged rewrites nothing; an edit rewrites one partition
+- Reads prune partitions by fund and date range
+- Crowded partitions are compacted; retired files are deleted after the grace period
+- Concurrent writers retry on the manifest instead of losing lines
+- A legacy single-object ledger is migrated on first use
+- s3_utils save/append/load go through the store
+"""
+import pytest
+import logging
+import sys
+import os
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from tests.stub_s3 import InMemoryS3
+from main_app.services import gl_store
+from main_app.services.gl_store import GLStore, partition_labels
+
+KEY = "drip_capital/general_ledger.parquet"
+BUCKET = "test-bucket"
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_ledger(n=600, seed=0, start='2024-01-01'):
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 10**6, n) / 1000
+    return pd.DataFrame({
+        'date': pd.Timestamp(start, tz='UTC') + pd.to_timedelta(rng.integers(0, 180 * 86400, n), unit='s'),
+        'fund_id': rng.choice(['fund_i_class_B_ETH', 'fund_ii_class_B_ETH'], n),
+        'GL_Acct_Number': rng.choice(['100.30', '400.10', '600.10'], n),
+        'debit_crypto': np.where(rng.random(n) < 0.5, amounts, 0.0),
+        'credit_crypto': np.where(rng.random(n) < 0.5, 0.0, amounts),
+        'hash': [f'0x{i:064x}' for i in range(n)],
+        'row_key': [f'0x{i:064x}:{i % 3}' for i in range(n)],
+    })
+
+
+def sort_rows(df):
+    return df.sort_values('row_key').reset_index(drop=True)
+
+
+def make_store(s3=None, **kwargs):
+    return GLStore(KEY, s3 or InMemoryS3(), BUCKET, **kwargs)
+
+
+class TestAppend:
+    """Test append-only posting."""
+
+    def test_append_and_read(self):
+        store = make_store()
+        ledger = make_ledger()
+        store.replace(ledger)
+
+        new_lines = make_ledger(4, seed=9, start='2024-03-10').assign(row_key=lambda d: 'new:' + d['hash'])
+        store.s3.reset_counters()
+        assert store.append(new_lines) == 4
+
+        labels = set(partition_labels(new_lines))
+        # One segment per touched partition plus the manifest, nothing rewritten
+        assert len(store.s3.puts) == len(labels) + 1
+        assert store.s3.bytes_uploaded < 20_000
+
+        expected = pd.concat([ledger, new_lines], ignore_index=True)
+        pd.testing.assert_frame_equal(sort_rows(store.read()), sort_rows(expected))
+
+    def test_reread_downloads_only_new_segment(self):
+        s3 = InMemoryS3()
+        writer, reader = make_store(s3), make_store(s3)
+        writer.replace(make_ledger())
+        reader.read()
+
+        writer.append(make_ledger(2, seed=3, start='2024-02-01'))
+        before = reader.stats['files_downloaded']
+        reader.read()
+        assert reader.stats['files_downloaded'] - before <= 2
+
+
+class TestReplace:
+    """Test whole-ledger saves."""
+
+    def test_unchanged_loaded_ledger_rewrites_nothing(self):
+        store = make_store()
+        store.replace(make_ledger())
+
+        # What load_GL2_file hands back: Decimal amounts, columns in another order
+        loaded = store.read()
+        for col in ['debit_crypto', 'credit_crypto']:
+            loaded[col] = loaded[col].map(lambda v: Decimal(str(v)))
+        loaded = loaded[list(reversed(loaded.columns))]
+
+        summary = store.replace(loaded)
+        assert summary['rewritten'] == 0
+        assert summary['dropped'] == 0
+
+    def test_edit_rewrites_one_partition(self):
+        store = make_store()
+        ledger = make_ledger()
+        store.replace(ledger)
+
+        edited = store.read()
+        edited.loc[10, 'debit_crypto'] = 12345.0
+        deleted = edited.drop(index=[10])
+
+        assert store.replace(edited)['rewritten'] == 1
+        pd.testing.assert_frame_equal(sort_rows(store.read()), sort_rows(edited))
+
+        assert store.replace(deleted)['rewritten'] == 1
+        assert len(store.read()) == len(ledger) - 1
+
+
+class TestReadPruning:
+    """Test partition pruning on reads."""
+
+    def test_prune_by_fund_and_date(self):
+        store = make_store()
+        ledger = make_ledger()
+        store.replace(ledger)
+        reader = make_store(store.s3)
+
+        start, end = pd.Timestamp('2024-02-10', tz='UTC'), pd.Timestamp('2024-03-20', tz='UTC')
+        result = reader.read(fund_id='fund_ii_class_B_ETH', start=start, end=end)
+
+        expected = ledger[(ledger['fund_id'] == 'fund_ii_class_B_ETH')
+                          & (ledger['date'] >= start) & (ledger['date'] <= end)]
+        pd.testing.assert_frame_equal(sort_rows(result), sort_rows(expected))
+        # February and March of one fund
+        assert reader.stats['files_downloaded'] == 2
+
+    def test_unknown_partition(self):
+        store = make_store()
+        undated = pd.DataFrame({'date': [None, 'not a date'], 'fund_id': ['f', None], 'row_key': ['a', 'b']})
+        store.append(undated)
+        assert sorted(store.manifest()['partitions']) == ['f/unknown', 'unknown/unknown']
+        assert len(store.read()) == 2
+        assert len(store.read(fund_id='f')) == 1
+
+
+class TestCompaction:
+    """Test merging of append segments."""
+
+    def test_compaction_after_many_appends(self, monkeypatch):
+        monkeypatch.setattr(gl_store, 'RETIRE_GRACE_SECONDS', 0)
+        store = make_store(compact_min_files=4)
+        lines = make_ledger(40, seed=4, start='2024-05-01')
+        lines['date'] = pd.Timestamp('2024-05-15', tz='UTC')
+        lines['fund_id'] = 'fund_i_class_B_ETH'
+
+        for chunk in np.array_split(np.arange(40), 10):
+            store.append(lines.iloc[chunk])
+
+        files = store.manifest()['partitions']['fund_i_class_B_ETH/2024-05']['files']
+        assert len(files) < 4
+        pd.testing.assert_frame_equal(sort_rows(store.read()), sort_rows(lines))
+
+        # The next commit deletes the retired segments
+        store.append(lines.iloc[:1].assign(row_key='extra'))
+        data_keys = [k for k in store.s3.objects if k.endswith('.parquet')]
+        live = {f['key'] for p in store.manifest()['partitions'].values() for f in p['files']}
+        assert set(data_keys) == live
+
+
+class TestConcurrency:
+    """Test manifest conflicts between writers."""
+
+    def test_stale_writer_retries(self):
+        s3 = InMemoryS3()
+        first, second = make_store(s3), make_store(s3)
+        first.append(make_ledger(5, seed=1))
+
+        # Another writer commits between second's manifest read and its conditional put
+        original_put = s3.put_object
+        raced = []
+
+        def racing_put(**kwargs):
+            if kwargs['Key'].endswith('_manifest.json') and not raced:
+                raced.append(True)
+                first.append(make_ledger(3, seed=2).assign(row_key=lambda d: 'race:' + d['hash']))
+            return original_put(**kwargs)
+
+        s3.put_object = racing_put
+        second.append(make_ledger(4, seed=3).assign(row_key=lambda d: 'second:' + d['hash']))
+
+        assert second.stats['commit_conflicts'] == 1
+        assert len(make_store(s3).read()) == 12
+
+
+class TestMigration:
+    """Test migration of the legacy single-object ledger."""
+
+    def test_legacy_object_is_migrated(self):
+        s3 = InMemoryS3()
+        ledger = make_ledger()
+        s3.put_object(Bucket=BUCKET, Key=KEY, Body=ledger.to_parquet(index=False))
+
+        store = make_store(s3)
+        pd.testing.assert_frame_equal(sort_rows(store.read()), sort_rows(ledger))
+        assert store.manifest()['version'] == 1
+
+        # Later processes use the manifest, not the legacy object
+        s3.reset_counters()
+        make_store(s3).read()
+        assert KEY not in s3.puts
+
+
+class TestS3Utils:
+    """Test the s3_utils GL2 functions on top of the store."""
+
+    def test_save_append_load(self, monkeypatch):
+        from main_app import s3_utils
+
+        monkeypatch.setattr(s3_utils, 's3', InMemoryS3())
+        monkeypatch.setattr(s3_utils, '_gl_stores', {})
+        s3_utils.clear_GL2_cache()
+
+        assert list(s3_utils.load_GL2_file().columns) == s3_utils.get_gl2_schema_columns()
+
+        ledger = make_ledger(50)
+        assert s3_utils.save_GL2_file(ledger)
+        assert s3_utils.append_GL2_entries(make_ledger(2, seed=5).assign(row_key=['m1', 'm2']))
+
+        loaded = s3_utils.load_GL2_file()
+        assert len(loaded) == 52
+        assert isinstance(loaded['debit_crypto'].iloc[0], Decimal)
+        assert s3_utils.save_GL2_file(loaded)
+        assert s3_utils.get_gl_store(s3_utils.GL2_KEY).replace(loaded)['rewritten'] == 0
+        s3_utils.clear_GL2_cache()
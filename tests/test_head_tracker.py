@@ -0,0 +1,263 @@
+"""
+Unit tests for the shared block head tracker.
+
+Tests:
+- Only transactions after a wallet's high-water block are published
+- Token transfers come from two topic-filtered eth_getLogs queries for all wallets
+- Native ETH transfers are matched in new blocks; intercompany transfers yield a row per wallet
+- High-water blocks survive a restart
+- A gap longer than one step is walked in full; a failed step keeps the high-water block
+- A reorg rolls back to the last common block and the new fork is re-read
+- Readers that fall behind the event log are told to reload
+"""
+import pytest
+import logging
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_app.services.head_tracker import BlockHeadTracker, TRANSFER_TOPIC
+
+FUND_A = '0x' + 'aa' * 20
+FUND_B = '0x' + 'bb' * 20
+OUTSIDER = '0x' + 'cc' * 20
+TOKEN = '0x' + 'dd' * 20
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def topic(address):
+    return '0x' + address[2:].zfill(64)
+
+
+class FakeEth:
+    """In-memory chain: blocks of native transactions and Transfer logs"""
+
+    def __init__(self):
+        self.blocks = {}
+        self.log_queries = []
+        self.fork = 0
+        for number in range(100, 111):
+            self.add_block(number)
+
+    @property
+    def block_number(self):
+        return max(self.blocks)
+
+    def add_block(self, number, txs=(), logs=()):
+        self.blocks[number] = {
+            'number': number,
+            'hash': f'0x{self.fork:02x}{number:062x}',
+            'timestamp': 1_700_000_000 + 12 * number,
+            'transactions': [dict(tx, blockNumber=number) for tx in txs],
+            'logs': [dict(log, blockNumber=number) for log in logs],
+        }
+
+    def reorg(self, from_block):
+        """Replace every block from from_block on with empty blocks of a new fork"""
+        self.fork += 1
+        for number in [n for n in self.blocks if n >= from_block]:
+            self.add_block(number)
+
+    def get_block(self, number, full_transactions=False):
+        return self.blocks[number]
+
+    def get_transaction_receipt(self, tx_hash):
+        return {'status': 1, 'gasUsed': 21000, 'effectiveGasPrice': 10**9}
+
+    def get_logs(self, params):
+        self.log_queries.append(params)
+        topics = params['topics']
+        result = []
+        for number in range(params['fromBlock'], params['toBlock'] + 1):
+            for log in self.blocks[number]['logs']:
+                if all(want is None or log['topics'][i] in want
+                       for i, want in enumerate(topics) if i > 0) and log['topics'][0] == topics[0]:
+                    result.append(log)
+        return result
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+def native(tx_hash, sender, recipient, value=10**18):
+    return {'hash': tx_hash, 'from': sender, 'to': recipient, 'value': value, 'nonce': 1, 'gasPrice': 10**9}
+
+
+def transfer(tx_hash, sender, recipient, amount=5 * 10**18, log_index=0):
+    return {'transactionHash': tx_hash, 'logIndex': log_index, 'address': TOKEN,
+            'topics': [TRANSFER_TOPIC, topic(sender), topic(recipient)], 'data': hex(amount)}
+
+
+@pytest.fixture
+def w3():
+    return FakeWeb3()
+
+
+def summarize(events):
+    return [(row['hash'], row['wallet'], row['type'], row['token'], row['amount'])
+            for event in events if event.kind == 'transactions' for row in event.rows]
+
+
+class TestPolling:
+    """Test what a poll reads and publishes."""
+
+    def test_new_blocks_only(self, w3, tmp_path):
+        tracker = BlockHeadTracker(w3, state_path=str(tmp_path / 'state.json'))
+        tracker.watch(['0x' + 'AA' * 20, FUND_B])
+        assert tracker.high_water(FUND_A) == 110
+
+        w3.eth.add_block(111, txs=[native('0x01', OUTSIDER, FUND_A), native('0x02', OUTSIDER, OUTSIDER)],
+                         logs=[transfer('0x03', FUND_A, OUTSIDER)])
+        w3.eth.add_block(112, txs=[native('0x04', FUND_A, FUND_B)],
+                         logs=[transfer('0x05', OUTSIDER, FUND_B, log_index=3)])
+
+        events = tracker.poll()
+
+        assert summarize(events) == [
+            ('0x01', FUND_A, 'IN', 'ETH', 1.0),
+            ('0x03', FUND_A, 'OUT', 'UNKNOWN', 5.0),
+            ('0x04', FUND_A, 'OUT', 'ETH', 1.0),
+            ('0x04', FUND_B, 'IN', 'ETH', 1.0),
+            ('0x05', FUND_B, 'IN', 'UNKNOWN', 5.0),
+        ]
+        # One sent and one received query covering all wallets
+        assert len(w3.eth.log_queries) == 2
+        assert all(len([t for t in q['topics'] if isinstance(t, list)][0]) == 2 for q in w3.eth.log_queries)
+        assert tracker.high_water(FUND_B) == 112
+
+        # Nothing new: nothing published
+        assert tracker.poll() == []
+
+    def test_wallet_added_later(self, w3):
+        tracker = BlockHeadTracker(w3)
+        tracker.watch([FUND_A])
+        w3.eth.add_block(111, logs=[transfer('0x01', OUTSIDER, FUND_A), transfer('0x02', OUTSIDER, FUND_B, log_index=1)])
+        tracker.watch([FUND_B], start_block=111)
+
+        assert summarize(tracker.poll()) == [('0x01', FUND_A, 'IN', 'UNKNOWN', 5.0)]
+
+    def test_zero_value_transfers_skipped(self, w3):
+        tracker = BlockHeadTracker(w3)
+        tracker.watch([FUND_A])
+        w3.eth.add_block(111, logs=[transfer('0x01', OUTSIDER, FUND_A, amount=0)])
+
+        assert tracker.poll() == []
+
+    def test_resume_after_restart(self, w3, tmp_path):
+        state = str(tmp_path / 'state.json')
+        tracker = BlockHeadTracker(w3, state_path=state)
+        tracker.watch([FUND_A])
+        w3.eth.add_block(111, logs=[transfer('0x01', OUTSIDER, FUND_A)])
+        tracker.poll()
+
+        w3.eth.add_block(112, logs=[transfer('0x02', OUTSIDER, FUND_A)])
+        restarted = BlockHeadTracker(w3, state_path=state)
+
+        assert restarted.high_water(FUND_A) == 111
+        assert summarize(restarted.poll()) == [('0x02', FUND_A, 'IN', 'UNKNOWN', 5.0)]
+
+
+class TestGap:
+    """Test polls after more blocks than one step."""
+
+    def test_native_transfers_in_long_gap(self, w3):
+        tracker = BlockHeadTracker(w3, max_block_scan=4)
+        tracker.watch([FUND_A])
+        w3.eth.add_block(111, txs=[native('0x01', OUTSIDER, FUND_A)])
+        for number in range(112, 130):
+            w3.eth.add_block(number)
+        w3.eth.add_block(130, txs=[native('0x02', FUND_A, OUTSIDER)], logs=[transfer('0x03', OUTSIDER, FUND_A)])
+
+        events = tracker.poll()
+
+        assert summarize(events) == [
+            ('0x01', FUND_A, 'IN', 'ETH', 1.0),
+            ('0x02', FUND_A, 'OUT', 'ETH', 1.0),
+            ('0x03', FUND_A, 'IN', 'UNKNOWN', 5.0),
+        ]
+        assert [event.block_number for event in events] == [114, 130]
+        assert tracker.high_water(FUND_A) == 130
+        assert tracker.stats['blocks'] == 20
+
+    def test_failed_step_keeps_high_water(self, w3, tmp_path):
+        state = str(tmp_path / 'state.json')
+        tracker = BlockHeadTracker(w3, state_path=state, max_block_scan=4)
+        tracker.watch([FUND_A])
+        for number in range(111, 121):
+            w3.eth.add_block(number)
+        w3.eth.add_block(118, txs=[native('0x01', OUTSIDER, FUND_A)])
+
+        get_block = w3.eth.get_block
+
+        def outage(number, full_transactions=False):
+            if number >= 116:
+                raise ConnectionError("node unavailable")
+            return get_block(number, full_transactions)
+        w3.eth.get_block = outage
+        with pytest.raises(ConnectionError):
+            tracker.poll()
+        # Blocks 111-114 were read; 115 onward were not
+        assert tracker.high_water(FUND_A) == 114
+
+        w3.eth.get_block = get_block
+        restarted = BlockHeadTracker(w3, state_path=state, max_block_scan=4)
+        assert summarize(restarted.poll()) == [('0x01', FUND_A, 'IN', 'ETH', 1.0)]
+        assert restarted.high_water(FUND_A) == 120
+
+
+class TestReorg:
+    """Test rollback when remembered blocks leave the chain."""
+
+    def test_rollback_and_reread(self, w3):
+        rolled_back = []
+        tracker = BlockHeadTracker(w3, reorg_depth=5, on_rollback=rolled_back.append)
+        tracker.watch([FUND_A])
+        w3.eth.add_block(111, logs=[transfer('0x01', OUTSIDER, FUND_A)])
+        w3.eth.add_block(112, logs=[transfer('0x02', OUTSIDER, FUND_A)])
+        tracker.poll()
+
+        # Blocks 112+ are replaced; the new fork carries a different transfer
+        w3.eth.reorg(112)
+        w3.eth.add_block(112, logs=[transfer('0x03', OUTSIDER, FUND_A)])
+        w3.eth.add_block(113)
+
+        events = tracker.poll()
+
+        assert [(e.kind, e.block_number) for e in events] == [('rollback', 111), ('transactions', 113)]
+        assert summarize(events) == [('0x03', FUND_A, 'IN', 'UNKNOWN', 5.0)]
+        assert rolled_back == [111]
+        assert tracker.stats['rollbacks'] == 1
+
+        # The new fork is remembered: no further rollback
+        assert tracker.poll() == []
+
+
+class TestEventLog:
+    """Test reading the event log with a cursor."""
+
+    def test_cursor(self, w3):
+        tracker = BlockHeadTracker(w3, event_log_size=2)
+        tracker.watch([FUND_A])
+        cursor = tracker.sequence
+
+        for number in range(111, 114):
+            w3.eth.add_block(number, logs=[transfer(f'0x{number:x}', OUTSIDER, FUND_A)])
+            tracker.poll()
+
+        events, new_cursor, complete = tracker.events_since(cursor)
+        assert not complete
+        assert [e.block_number for e in events] == [112, 113]
+
+        events, _, complete = tracker.events_since(new_cursor - 1)
+        assert complete and [e.block_number for e in events] == [113]
+        assert tracker.events_since(new_cursor) == ([], new_cursor, True)
@@ -0,0 +1,186 @@
+"""
+Unit tests for the topic0 log dispatcher.
+
+Tests:
+- Logs decode to the same result as process_log()
+- Unknown topics and foreign addresses are skipped
+- ERC20/ERC721 Transfer signature collision picks the fitting ABI
+- BaseDecoder._decode_events_by_names matches process_receipt()
+"""
+import pytest
+from decimal import Decimal
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3
+
+from main_app.services.decoders.abis.common import ERC20_ABI
+from main_app.services.decoders.base import BaseDecoder, Platform
+from main_app.services.decoders.log_dispatcher import LogDispatcher, topic_key
+
+TOKEN = Web3.to_checksum_address("0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2")
+NFT = Web3.to_checksum_address("0xbc4ca0eda7647a8ab7c2061c2e118a18a936f13d")
+ALICE = "0x" + "11" * 20
+BOB = "0x" + "22" * 20
+
+ERC721_TRANSFER_ABI = {
+    "anonymous": False,
+    "inputs": [
+        {"indexed": True, "name": "from", "type": "address"},
+        {"indexed": True, "name": "to", "type": "address"},
+        {"indexed": True, "name": "tokenId", "type": "uint256"},
+    ],
+    "name": "Transfer",
+    "type": "event",
+}
+
+
+def _event(abi, name):
+    return next(e for e in abi if e.get("type") == "event" and e["name"] == name)
+
+
+def make_log(address, topics, data=b"", log_index=0):
+    return {
+        "address": address,
+        "topics": [HexBytes(t) for t in topics],
+        "data": HexBytes(data),
+        "logIndex": log_index,
+        "transactionIndex": 0,
+        "transactionHash": HexBytes(b"\x01" * 32),
+        "blockHash": HexBytes(b"\x02" * 32),
+        "blockNumber": 1,
+    }
+
+
+def erc20_transfer_log(value, log_index=0, address=TOKEN):
+    topic0 = event_abi_to_log_topic(_event(ERC20_ABI, "Transfer"))
+    topics = [topic0, encode(["address"], [ALICE]), encode(["address"], [BOB])]
+    return make_log(address, topics, encode(["uint256"], [value]), log_index)
+
+
+def erc721_transfer_log(token_id, log_index=0):
+    topic0 = event_abi_to_log_topic(ERC721_TRANSFER_ABI)
+    topics = [
+        topic0,
+        encode(["address"], [ALICE]),
+        encode(["address"], [BOB]),
+        encode(["uint256"], [token_id]),
+    ]
+    return make_log(NFT, topics, b"", log_index)
+
+
+@pytest.fixture
+def w3():
+    return Web3()
+
+
+class TestLogDispatcher:
+    """Test LogDispatcher lookups and decoding."""
+
+    def test_topic_key_normalizes_hex_and_bytes(self):
+        raw = b"\xab" * 32
+        assert topic_key(HexBytes(raw)) == raw
+        assert topic_key("0x" + "ab" * 32) == raw
+        assert topic_key("ab" * 32) == raw
+
+    def test_decode_matches_process_log(self, w3):
+        contract = w3.eth.contract(address=TOKEN, abi=ERC20_ABI)
+        dispatcher = LogDispatcher.for_contracts(w3, [contract])
+        log = erc20_transfer_log(12345)
+
+        expected = contract.events.Transfer().process_log(log)
+        decoded = dispatcher.decode_log(log)
+
+        assert decoded == expected
+        assert decoded["event"] == "Transfer"
+        assert decoded["args"]["value"] == 12345
+
+    def test_event_name_filter(self, w3):
+        contract = w3.eth.contract(address=TOKEN, abi=ERC20_ABI)
+        dispatcher = LogDispatcher.for_contracts(w3, [contract], ["Approval"])
+        assert [e.event_name for e in dispatcher.entries] == ["Approval"]
+        assert dispatcher.decode_log(erc20_transfer_log(1)) is None
+
+    def test_foreign_address_needs_any_address(self, w3):
+        contract = w3.eth.contract(address=TOKEN, abi=ERC20_ABI)
+        dispatcher = LogDispatcher.for_contracts(w3, [contract])
+        log = erc20_transfer_log(7, address=NFT)
+
+        assert dispatcher.decode_log(log) is None
+        assert dispatcher.decode_log(log, any_address=True)["args"]["value"] == 7
+
+    def test_unknown_topic_and_empty_topics(self, w3):
+        dispatcher = LogDispatcher(w3)
+        dispatcher.register(ERC20_ABI, TOKEN)
+        assert dispatcher.decode_log(make_log(TOKEN, [b"\x00" * 32])) is None
+        assert dispatcher.decode_log(make_log(TOKEN, [])) is None
+
+    def test_erc20_erc721_collision(self, w3):
+        dispatcher = LogDispatcher(w3)
+        dispatcher.register(ERC20_ABI, event_names=["Transfer"])
+        dispatcher.register([ERC721_TRANSFER_ABI])
+
+        fungible = dispatcher.decode_log(erc20_transfer_log(5), any_address=True)
+        nft = dispatcher.decode_log(erc721_transfer_log(99), any_address=True)
+
+        assert fungible["args"]["value"] == 5
+        assert nft["args"]["tokenId"] == 99
+
+    def test_decode_receipt_in_log_order(self, w3):
+        contract = w3.eth.contract(address=TOKEN, abi=ERC20_ABI)
+        dispatcher = LogDispatcher.for_contracts(w3, [contract])
+        receipt = {"logs": [erc20_transfer_log(v, i) for i, v in enumerate([3, 1, 2])]}
+
+        decoded = dispatcher.decode_receipt(receipt)
+        assert [d["args"]["value"] for d in decoded] == [3, 1, 2]
+
+
+class _TokenDecoder(BaseDecoder):
+    """Minimal concrete decoder for exercising BaseDecoder helpers"""
+
+    PLATFORM = Platform.GENERIC
+
+    def _load_abis(self):
+        pass
+
+    def can_decode(self, tx, receipt):
+        return True
+
+    def decode(self, tx, receipt, block, eth_price: Decimal):
+        return None
+
+
+class TestDecodeEventsByNames:
+    """Test BaseDecoder._decode_events_by_names against process_receipt()."""
+
+    def test_matches_process_receipt(self, w3):
+        decoder = _TokenDecoder(w3, [])
+        contract = w3.eth.contract(address=TOKEN, abi=ERC20_ABI)
+        receipt = {"logs": [
+            erc20_transfer_log(10, 0),
+            erc721_transfer_log(4, 1),
+            erc20_transfer_log(20, 2, address=NFT),
+        ]}
+
+        events = decoder._decode_events_by_names(contract, receipt, ["Transfer", "Missing"])
+
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = contract.events.Transfer().process_receipt(receipt)
+
+        assert [e.log_index for e in events] == [e["logIndex"] for e in expected]
+        assert [e.args["value"] for e in events] == [str(e["args"]["value"]) for e in expected]
+        assert all(e.name == "Transfer" for e in events)
+
+    def test_dispatcher_built_once(self, w3):
+        decoder = _TokenDecoder(w3, [])
+        contract = w3.eth.contract(address=TOKEN, abi=ERC20_ABI)
+        first = decoder._get_log_dispatcher(contract, ["Transfer"])
+        assert decoder._get_log_dispatcher(contract, ["Transfer"]) is first
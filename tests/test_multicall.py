@@ -0,0 +1,239 @@
+"""
+Unit tests for Multicall3 batched state reads.
+
+Tests run against the stub JSON-RPC node, which serves NFTfi loan contracts,
+ERC-20 balances and a Multicall3 aggregate3 over HTTP.
+
+Tests:
+- get_loan_terms_many() matches get_loan_terms() per loan in a few eth_calls
+- A reverting or undecodable read loses only its own result
+- All batches read the same block, even when the head moves mid-read
+- A failing aggregate3 call is split until the bad call is isolated
+- verify_wallet_balances(batched=True) matches the per-position path
+- Positions whose batched read failed are read one at a time
+"""
+import pytest
+import logging
+import sys
+import os
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from web3 import Web3
+
+from tests.stub_rpc_server import StubRpcServer, StubRevert, abi_contract
+from main_app.services.decoders.nftfi_decoder import (
+    NFTfiOnChainQuery,
+    LOAN_TERMS_V3_ABI,
+    LOAN_TERMS_V23_ABI,
+)
+from main_app.services.etherscan_balance_checker import EtherscanBalanceChecker
+from main_app.services.multicall import (
+    MulticallReader,
+    StateCall,
+    ERC20_BALANCE_OF_ABI,
+    erc20_balance_call,
+    eth_balance_call,
+)
+
+V3_CONTRACT = "0x9f10d706d789e4c76a1a6434cd1a9841c875c0a6"
+V23_CONTRACT = "0xd0a40eb7fd94ee97102ba8e9342243a2b2e22207"
+USDC = "0xA0b86a33E6441644663FB5CDDFEF68e36E6c6C46"
+BORROWER = "0x" + "bb" * 20
+LENDER = "0x" + "aa" * 20
+WALLETS = ["0x" + f"{i:02x}" * 20 for i in range(1, 7)]
+KNOWN_LOANS = 500
+
+
+@pytest.fixture
+def server():
+    with StubRpcServer(n_txs=0, latency=0) as s:
+        register_nftfi(s)
+        s.register_contract(USDC, abi_contract([ERC20_BALANCE_OF_ABI], {
+            'balanceOf': lambda block, account: 10**6 * int(account[-2:], 16),
+        }))
+        for i, wallet in enumerate(WALLETS):
+            s.eth_balances[wallet] = (i + 1) * 10**17
+        yield s
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def register_nftfi(server):
+    """NFTfi v3 and v2.3 contracts whose loans' start time is the block read"""
+    def loan(loan_id):
+        if loan_id >= KNOWN_LOANS:
+            raise StubRevert("unknown loan")
+        return 10**18 + loan_id, 10**18 + 10**16 + loan_id, loan_id, USDC, 30 * 86400, 1200, 500
+
+    def v3_terms(block, loan_id):
+        principal, repay, nft_id, erc20, duration, rate, fee = loan(loan_id)
+        return (principal, repay, nft_id, erc20, duration, rate, fee, 0, BORROWER, block, BORROWER,
+                BORROWER, LENDER, LENDER, loan_id % 2 == 0)
+
+    def v23_terms(block, loan_id):
+        principal, repay, nft_id, erc20, duration, rate, fee = loan(loan_id)
+        return principal, repay, nft_id, erc20, duration, rate, fee, BORROWER, block, BORROWER, BORROWER
+
+    def v23_extras(block, loan_id):
+        if loan_id % 3 == 0:
+            raise StubRevert("no extras")
+        return LENDER, 25, 10
+
+    server.register_contract(V3_CONTRACT, abi_contract(LOAN_TERMS_V3_ABI, {'getLoanTerms': v3_terms}))
+    server.register_contract(V23_CONTRACT, abi_contract(LOAN_TERMS_V23_ABI, {
+        'loanIdToLoan': v23_terms, 'loanIdToLoanExtras': v23_extras}))
+
+
+def make_w3(server):
+    return Web3(Web3.HTTPProvider(server.url))
+
+
+class TestLoanTerms:
+    """Test get_loan_terms_many against per-loan queries."""
+
+    def test_matches_single_queries(self, server):
+        query = NFTfiOnChainQuery(make_w3(server))
+        loans = [(i, V3_CONTRACT) for i in range(40)] + [(i, V23_CONTRACT) for i in range(40)]
+        block = server.chain.head
+
+        server.reset_counters()
+        batched = query.get_loan_terms_many(loans, block_identifier=block, batch_size=50)
+        batched_calls = server.calls_by_method['eth_call']
+
+        server.reset_counters()
+        single = {loan: query.get_loan_terms(*loan, block_identifier=block) for loan in loans}
+
+        assert batched == single
+        assert all(terms is not None for terms in batched.values())
+        assert batched[(3, V23_CONTRACT)].revenue_share_partner is None
+        assert batched[(4, V23_CONTRACT)].revenue_share_partner == LENDER
+        # 40 + 80 reads in 50-call batches
+        assert batched_calls == 3
+        assert server.calls_by_method['eth_call'] == 40 + 80
+
+    def test_failed_loans_are_none(self, server):
+        query = NFTfiOnChainQuery(make_w3(server))
+        unknown_contract = "0x" + "99" * 20
+
+        terms = query.get_loan_terms_many(
+            [(1, V3_CONTRACT), (KNOWN_LOANS, V3_CONTRACT), (KNOWN_LOANS, V23_CONTRACT), (2, unknown_contract)])
+
+        assert terms[(1, V3_CONTRACT)].loan_principal_amount == 10**18 + 1
+        assert terms[(KNOWN_LOANS, V3_CONTRACT)] is None
+        assert terms[(KNOWN_LOANS, V23_CONTRACT)] is None
+        assert terms[(2, unknown_contract)] is None
+
+
+class TestReader:
+    """Test the aggregate3 reader."""
+
+    def test_failure_isolation(self, server):
+        w3 = make_w3(server)
+        contract = w3.eth.contract(address=Web3.to_checksum_address(V3_CONTRACT), abi=LOAN_TERMS_V3_ABI)
+        calls = {i: StateCall.from_function(contract.functions.getLoanTerms(i)) for i in range(KNOWN_LOANS - 2,
+                                                                                           KNOWN_LOANS + 2)}
+        # No contract at this address: the call succeeds with no return data
+        calls['eoa'] = erc20_balance_call(WALLETS[0], WALLETS[1])
+        calls['eth'] = eth_balance_call(WALLETS[2])
+
+        reader = MulticallReader(w3, batch_size=100)
+        values = reader.read(calls)
+
+        assert sorted(k for k in values if isinstance(k, int)) == [KNOWN_LOANS - 2, KNOWN_LOANS - 1]
+        assert values['eth'] == 3 * 10**17
+        assert 'eoa' not in values
+        assert reader.stats['multicalls'] == 1
+        assert reader.stats['failed_calls'] == 3
+
+    def test_reads_pinned_to_one_block(self, server):
+        w3 = make_w3(server)
+        contract = w3.eth.contract(address=Web3.to_checksum_address(V3_CONTRACT), abi=LOAN_TERMS_V3_ABI)
+        start_head = server.chain.head
+
+        # Every aggregate3 call moves the head forward
+        handler = server.contracts[V3_CONTRACT.lower()]
+
+        def advancing(data, block):
+            server.chain.head += 1
+            return handler(data, block)
+        server.register_contract(V3_CONTRACT, advancing)
+
+        calls = {i: StateCall.from_function(contract.functions.getLoanTerms(i)) for i in range(30)}
+        values = MulticallReader(w3, batch_size=7, max_concurrency=1).read(calls)
+
+        assert server.chain.head > start_head
+        assert {terms[9] for terms in values.values()} == {start_head}
+        # Addresses checksummed like ContractFunction.call()
+        assert values[5][3] == Web3.to_checksum_address(USDC)
+
+    def test_failed_batch_is_split(self, server):
+        w3 = make_w3(server)
+        usdc = server.contracts[USDC.lower()]
+
+        def strict(data, block):
+            # A call the node cannot even attempt fails the whole aggregate3
+            if data.endswith(bytes.fromhex(WALLETS[4][2:])):
+                raise RuntimeError("out of gas")
+            return usdc(data, block)
+        server.register_contract(USDC, strict)
+
+        calls = {wallet: erc20_balance_call(USDC, wallet) for wallet in WALLETS}
+        reader = MulticallReader(w3, batch_size=10)
+        values = reader.read(calls)
+
+        assert set(values) == set(WALLETS) - {WALLETS[4]}
+        assert values[WALLETS[1]] == 10**6 * 0x02
+        assert reader.stats['split_batches'] >= 2
+        assert reader.stats['failed_calls'] == 1
+
+
+class TestBalances:
+    """Test batched balance verification."""
+
+    def test_batched_matches_per_position(self, server, monkeypatch):
+        w3 = make_w3(server)
+        positions = pd.DataFrame([{
+            'wallet_address': wallet, 'asset': asset, 'token_amount': amount,
+            'eth_value': 1.0, 'cost_basis_eth': 1.0,
+        } for wallet in WALLETS for asset, amount in (('ETH', 0.2), ('USDC', 2.0), ('PEPE', 1.0))])
+
+        checker = EtherscanBalanceChecker(api_key="test", w3=w3)
+        checker.rate_limit_delay = 0
+        monkeypatch.setattr(checker, 'get_eth_balance',
+                            lambda wallet: Decimal(server.eth_balances[wallet]) / Decimal(10**18))
+        monkeypatch.setattr(checker, 'get_token_balance',
+                            lambda wallet, token, decimals: Decimal(int(wallet[-2:], 16)))
+
+        per_position = checker.verify_wallet_balances(positions)
+        server.reset_counters()
+        batched = checker.verify_wallet_balances(positions, batched=True)
+
+        pd.testing.assert_frame_equal(batched.drop(columns='last_checked'),
+                                      per_position.drop(columns='last_checked'))
+        assert set(batched['status']) == {'Match', 'Mismatch'}
+        assert server.calls_by_method['eth_call'] == 1
+
+    def test_failed_read_falls_back_per_position(self, server, monkeypatch):
+        positions = pd.DataFrame([{'wallet_address': w, 'asset': 'DAI', 'token_amount': 1.0,
+                                   'eth_value': 1.0, 'cost_basis_eth': 1.0} for w in WALLETS[:2]])
+        # No contract registered for DAI: balanceOf returns no data
+        contracts = {'DAI': {'address': '0x6B175474E89094C44Da98b954EedeAC495271d0F', 'decimals': 18}}
+
+        checker = EtherscanBalanceChecker(api_key="test", w3=make_w3(server))
+        checker.rate_limit_delay = 0
+        fallback = []
+        monkeypatch.setattr(checker, 'get_token_balance',
+                            lambda wallet, token, decimals: fallback.append(wallet) or Decimal('1'))
+        result = checker.verify_wallet_balances(positions, contracts, batched=True)
+
+        assert fallback == WALLETS[:2]
+        assert list(result['status']) == ['Match', 'Match']
@@ -0,0 +1,251 @@
+"""
+Unit tests for incremental month-over-month PCAP allocation.
+
+Tests:
+- A first incremental run matches a full allocation and snapshots every closed month
+- A rerun restores the closed months and allocates only the open one
+- A new month rolls forward from the previous close
+- A back-dated GL change recomputes from the touched month onward
+- Snapshots of a grid for other LPs are not reused
+- Deferred P&L and GP incentive state survive the snapshot round trip
+- The app's PCAP generation allocates all LPs through the fund's snapshot store
+  and filters a single-LP selection afterwards
+"""
+import pytest
+import logging
+import sys
+import os
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+pytest.importorskip('pytz')
+from tests.stub_s3 import InMemoryS3
+from main_app.modules.fund_accounting import simple_pcap_function
+from main_app.modules.fund_accounting.PCAP import pcap, pcap_snapshots
+from main_app.modules.fund_accounting.PCAP.pcap_snapshots import (
+    PCAPSnapshotStore, gl_period_fingerprints, run_incremental_pcap_allocation, snapshot_store,
+)
+
+FUND_ID = 'fund_i_class_B_ETH'
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs(capsys):
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_inputs(n_lps=6, n_days=120, seed=0, first_join=2):
+    """Grid, fund P&L and GL from Jan 2024; no LP holds capital before first_join"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2024-01-01 23:59:59', periods=n_days, freq='D', tz='UTC')
+    rows = []
+    for k in range(n_lps):
+        joined = first_join if k == 0 else int(rng.integers(first_join, n_days - 10))
+        for t in range(joined, n_days):
+            rows.append({
+                'limited_partner_ID': f'LP_{k:03d}',
+                'date': days[t],
+                'cap_contrib_bod': -Decimal(int(rng.integers(1, 10**6))) / 10**4 if t == joined else Decimal('0'),
+                'cap_contrib_eod': Decimal('0'),
+                'cap_dist_bod': Decimal('0'),
+                'cap_dist_eod': Decimal(int(rng.integers(1, 100))) / 10**3 if rng.random() < 0.02 else Decimal('0'),
+                'mgmt_fee_amt': Decimal(int(rng.integers(0, 50))) / 10**6,
+                'gp_incentive_amt': Decimal(int(rng.integers(0, 5))) / 10**5,
+                'beg_bal': Decimal('0'),
+            })
+    pnl = pd.DataFrame({
+        'date': np.repeat(days, 2),
+        'SCPC': ['Net investment income', 'Realized gain'] * n_days,
+        'schedule_ranking': [1, 2] * n_days,
+        'fund_pnl_amt': np.round(rng.normal(0, 5, 2 * n_days), 9),
+    })
+    gl = pd.DataFrame({
+        'date': days[rng.integers(0, n_days, 400)],
+        'GL_Acct_Number': rng.choice([40100, 80100, 90100], 400),
+        'debit_crypto': np.round(rng.uniform(0, 10, 400), 9),
+        'credit_crypto': np.round(rng.uniform(0, 10, 400), 9),
+    })
+    return pd.DataFrame(rows), pnl, gl
+
+
+def assert_same(result, expected):
+    pd.testing.assert_frame_equal(result[0], expected[0])
+    assert result[1] == expected[1]
+    pd.testing.assert_frame_equal(result[2], expected[2])
+
+
+class TestIncremental:
+    """Test incremental runs against full allocations."""
+
+    def test_first_run_matches_full(self):
+        grid, pnl, gl = make_inputs()
+        store = PCAPSnapshotStore(FUND_ID, s3_client=InMemoryS3())
+
+        result = run_incremental_pcap_allocation(grid.copy(), pnl, gl, store)
+
+        assert_same(result, pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl))
+        # Jan-Mar closed, April open
+        assert [p['period'] for p in store.manifest()['periods']] == ['2024-01', '2024-02', '2024-03']
+        assert store.stats['snapshots_saved'] == 3
+
+    def test_rerun_restores_closed_months(self):
+        grid, pnl, gl = make_inputs()
+        s3 = InMemoryS3()
+        run_incremental_pcap_allocation(grid.copy(), pnl, gl, PCAPSnapshotStore(FUND_ID, s3_client=s3))
+
+        # A fresh process reads the snapshots back from S3
+        store = PCAPSnapshotStore(FUND_ID, s3_client=s3)
+        s3.reset_counters()
+        result = run_incremental_pcap_allocation(grid.copy(), pnl, gl, store)
+
+        assert_same(result, pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl))
+        assert store.stats['periods_restored'] == 3
+        assert store.stats['days_allocated'] == 29
+        assert not s3.puts
+
+    def test_new_month_rolls_forward(self):
+        grid, pnl, gl = make_inputs(n_days=150)
+        april_close = grid['date'] < pd.Timestamp('2024-05-01', tz='UTC')
+        store = PCAPSnapshotStore(FUND_ID, s3_client=InMemoryS3())
+        run_incremental_pcap_allocation(grid[april_close].copy(), pnl, gl, store, closed_through='2024-04')
+
+        result = run_incremental_pcap_allocation(grid.copy(), pnl, gl, store)
+
+        assert_same(result, pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl))
+        assert store.stats['periods_restored'] == 4
+        assert store.stats['periods_allocated'] == 5
+
+
+class TestInvalidation:
+    """Test that GL changes in closed months force recomputation."""
+
+    def test_back_dated_gl_change_recomputes_from_month(self):
+        grid, pnl, gl = make_inputs()
+        store = PCAPSnapshotStore(FUND_ID, s3_client=InMemoryS3())
+        run_incremental_pcap_allocation(grid.copy(), pnl, gl, store)
+        versions = [p['version'] for p in store.manifest()['periods']]
+
+        # Back-dated posting in February; the grid and P&L change with it
+        february = gl.index[gl['date'].dt.month == 2][0]
+        gl.loc[february, 'debit_crypto'] += 1.0
+        feb_pnl = pnl.index[pnl['date'].dt.month == 2][0]
+        pnl.loc[feb_pnl, 'fund_pnl_amt'] += 1.0
+
+        result = run_incremental_pcap_allocation(grid.copy(), pnl, gl, store)
+
+        assert_same(result, pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl))
+        assert store.stats['periods_restored'] == 1
+        assert [p['version'] for p in store.manifest()['periods']] == [versions[0], versions[1] + 1, versions[2] + 1]
+        # Superseded versions are deleted
+        assert not any('/2024-02/v1-' in key for key in store.s3.objects)
+
+    def test_grid_for_other_lps_recomputes(self):
+        grid, pnl, gl = make_inputs()
+        store = PCAPSnapshotStore(FUND_ID, s3_client=InMemoryS3())
+        single = grid[grid['limited_partner_ID'] == 'LP_001']
+        run_incremental_pcap_allocation(single.copy(), pnl, gl, store)
+
+        result = run_incremental_pcap_allocation(grid.copy(), pnl, gl, store)
+
+        assert_same(result, pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl))
+        assert store.stats['periods_restored'] == 0
+        assert_same(run_incremental_pcap_allocation(single.copy(), pnl, gl, store),
+                    pcap.run_partner_capital_pcap_allocation(single.copy(), pnl))
+
+    def test_fingerprint_ignores_row_order_and_amount_type(self):
+        _, _, gl = make_inputs()
+        shuffled = gl.sample(frac=1, random_state=1)
+        shuffled['debit_crypto'] = shuffled['debit_crypto'].map(lambda v: Decimal(str(v)))
+
+        assert gl_period_fingerprints(shuffled) == gl_period_fingerprints(gl)
+
+
+class TestState:
+    """Test the state carried in a snapshot."""
+
+    def test_deferred_and_gp_incentive_round_trip(self):
+        grid, pnl, gl = make_inputs(n_days=70, first_join=31)
+        # An LP without capital through January: January's P&L stays deferred
+        idle = grid[grid['date'] >= pd.Timestamp('2024-02-01', tz='UTC')].drop_duplicates('date').copy()
+        idle['date'] -= pd.Timedelta(days=31)
+        idle['limited_partner_ID'] = 'LP_999'
+        for col in ['cap_contrib_bod', 'cap_dist_eod', 'mgmt_fee_amt', 'gp_incentive_amt']:
+            idle[col] = Decimal('0')
+        grid = pd.concat([idle, grid], ignore_index=True)
+        store = PCAPSnapshotStore(FUND_ID, s3_client=InMemoryS3())
+
+        result = run_incremental_pcap_allocation(grid.copy(), pnl, gl, store)
+        assert_same(result, pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl))
+
+        january, february_state = (p['state'] for p in store.manifest()['periods'])
+        january_pnl = sum(Decimal(str(v)) for v in pnl.loc[pnl['date'].dt.month == 1, 'fund_pnl_amt'])
+        assert sum(Decimal(amount) for _, _, amount in january['deferred']) == january_pnl
+        assert [rank for _, rank, _ in january['deferred']] == [1, 2]
+
+        # Rerun from the snapshots
+        rerun = PCAPSnapshotStore(FUND_ID, s3_client=store.s3)
+        assert_same(run_incremental_pcap_allocation(grid.copy(), pnl, gl, rerun, closed_through='2024-02'), result)
+        assert rerun.stats['periods_allocated'] == 1
+
+        state = february_state
+        february = grid[grid['date'] < pd.Timestamp('2024-03-01', tz='UTC')]
+        for lp, amount in february.groupby('limited_partner_ID')['gp_incentive_amt'].sum().items():
+            assert Decimal(state['gp_incentive_itd'][lp]) == amount
+
+
+class TestAppAllocation:
+    """Test the PCAP generation path of the app."""
+
+    @pytest.fixture
+    def stores(self, monkeypatch):
+        monkeypatch.setattr(pcap_snapshots, 'get_s3_client', lambda: InMemoryS3())
+        monkeypatch.setattr(pcap_snapshots, '_stores', {})
+        return pcap_snapshots._stores
+
+    def test_snapshot_store_per_fund(self, stores):
+        assert snapshot_store(FUND_ID) is snapshot_store(FUND_ID)
+        assert snapshot_store('fund_ii_class_B_ETH') is not snapshot_store(FUND_ID)
+        assert snapshot_store(FUND_ID).fund_id == FUND_ID
+
+    def test_rolls_forward_from_fund_snapshots(self, stores):
+        grid, pnl, gl = make_inputs()
+        expected = pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl)
+
+        assert_same(simple_pcap_function.run_pcap_allocation(grid.copy(), pnl, gl, FUND_ID), expected)
+        assert_same(simple_pcap_function.run_pcap_allocation(grid.copy(), pnl, gl, FUND_ID), expected)
+
+        store = stores[FUND_ID]
+        assert store.stats['periods_restored'] == 3
+        assert store.stats['periods_allocated'] == 4 + 1
+
+    def test_falls_back_to_full_allocation(self, monkeypatch):
+        grid, pnl, gl = make_inputs()
+
+        def unavailable(fund_id):
+            raise ConnectionError("S3 unavailable")
+        monkeypatch.setattr(simple_pcap_function, 'snapshot_store', unavailable)
+
+        assert_same(simple_pcap_function.run_pcap_allocation(grid.copy(), pnl, gl, FUND_ID),
+                    pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl))
+
+    def test_single_lp_then_all(self, stores):
+        grid, pnl, gl = make_inputs()
+        expected = pcap.run_partner_capital_pcap_allocation(grid.copy(), pnl)
+
+        lp_grid, lp_rows, lp_summary = simple_pcap_function.run_pcap_allocation(grid.copy(), pnl, gl, FUND_ID, 'LP_001')
+        all_lps = simple_pcap_function.run_pcap_allocation(grid.copy(), pnl, gl, FUND_ID, 'ALL')
+
+        assert_same(all_lps, expected)
+        assert stores[FUND_ID].stats['periods_restored'] == 3
+        # The LP's rows are its share of the fund-wide allocation
+        pd.testing.assert_frame_equal(
+            lp_grid, expected[0][expected[0]['limited_partner_ID'] == 'LP_001'].reset_index(drop=True))
+        assert lp_rows == [row for row in expected[1] if row['limited_partner_ID'] == 'LP_001']
+        assert set(lp_summary['limited_partner_ID']) == {'LP_001'}
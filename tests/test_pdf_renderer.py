@@ -0,0 +1,152 @@
+"""
+Unit tests for batch PDF rendering of investor statements.
+
+Tests:
+- Serial and process-pool rendering write every job and report progress
+- Jobs are pulled lazily, never more than max_in_flight ahead of completion
+- Failed jobs are reported and left out; the rest are bundled into a zip
+- Jobs lost when a worker dies are retried one at a time; only the crashing one fails
+- The statement template is compiled once per process
+- Statement jobs split the grid by LP once and match the single-LP statement
+"""
+import pytest
+import logging
+import sys
+import os
+import zipfile
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from main_app.services.pdf_renderer import PDFJob, RenderProgress, get_template, render_pdfs
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def write_html(html, base_url, output_path):
+    """Stand-in for the WeasyPrint layout step: the 'PDF' is the HTML itself"""
+    if 'fail' in html:
+        raise RuntimeError('layout failed')
+    with open(output_path, 'w') as f:
+        f.write(html)
+    return output_path
+
+
+def crash_once(html, base_url, output_path):
+    """Kill the worker the first time a 'crash' job is seen (marker file next to the output)"""
+    marker = output_path + '.crashed'
+    if 'crash' in html and ('always' in html or not os.path.exists(marker)):
+        open(marker, 'w').close()
+        os._exit(1)
+    return write_html(html, base_url, output_path)
+
+
+def make_jobs(tmp_path, n, pulled=None):
+    for i in range(n):
+        if pulled is not None:
+            pulled.append(i)
+        yield PDFJob(name=f'LP_{i:03d}', html=f'<p>statement {i}</p>', output_path=str(tmp_path / f'{i:03d}.pdf'))
+
+
+class TestRenderPdfs:
+    """Test render_pdfs on both execution paths."""
+
+    @pytest.mark.parametrize('workers', [0, 2])
+    def test_all_jobs_written_in_order(self, tmp_path, workers):
+        progress = RenderProgress()
+        progress.start(12)
+
+        paths = render_pdfs(make_jobs(tmp_path, 12), total=12, max_workers=workers,
+                            progress=progress, writer=write_html)
+
+        assert paths == [str(tmp_path / f'{i:03d}.pdf') for i in range(12)]
+        assert open(paths[5]).read() == '<p>statement 5</p>'
+        assert progress.snapshot()['done'] == 12
+        assert progress.snapshot()['failed'] == 0
+
+    def test_jobs_pulled_lazily(self, tmp_path):
+        pulled, seen = [], []
+
+        def progress(done, total, name, path):
+            seen.append(len(pulled) - done)
+
+        render_pdfs(make_jobs(tmp_path, 20, pulled), total=20, max_workers=2, max_in_flight=3,
+                    progress=progress, writer=write_html)
+
+        assert len(seen) == 20
+        assert max(seen) <= 3
+
+    def test_failures_reported_and_zip_bundled(self, tmp_path):
+        jobs = list(make_jobs(tmp_path, 4))
+        jobs[2].html = 'fail'
+        events = []
+
+        paths = render_pdfs(jobs, max_workers=0, writer=write_html, zip_path=str(tmp_path / 'all.zip'),
+                            progress=lambda done, total, name, path: events.append((done, total, name, path)))
+
+        assert len(paths) == 3
+        assert events[2] == (3, 4, 'LP_002', None)
+        with zipfile.ZipFile(tmp_path / 'all.zip') as archive:
+            assert sorted(archive.namelist()) == ['000.pdf', '001.pdf', '003.pdf']
+
+    @pytest.mark.parametrize('html, written', [('<p>crash</p>', True), ('<p>crash always</p>', False)])
+    def test_worker_death(self, tmp_path, html, written):
+        jobs = list(make_jobs(tmp_path, 8))
+        jobs[3].html = html
+        progress = RenderProgress()
+        progress.start(8)
+
+        paths = render_pdfs(jobs, max_workers=2, progress=progress, writer=crash_once)
+
+        expected = [str(tmp_path / f'{i:03d}.pdf') for i in range(8) if written or i != 3]
+        assert paths == expected
+        assert progress.snapshot()['done'] == 8
+        assert progress.snapshot()['failed'] == (0 if written else 1)
+
+    def test_template_compiled_once(self, tmp_path):
+        (tmp_path / 'report.html').write_text('{{ fund_name }}')
+        get_template.cache_clear()
+
+        assert get_template(str(tmp_path)) is get_template(str(tmp_path))
+        assert get_template(str(tmp_path)).render(fund_name='Fund I') == 'Fund I'
+
+
+class TestInvestorStatements:
+    """Test the PCAP statement jobs."""
+
+    def test_jobs_match_single_statement(self, tmp_path, monkeypatch):
+        pytest.importorskip('pytz')
+        from main_app.modules.fund_accounting.PCAP import pcap
+
+        monkeypatch.setattr(pcap, 'get_lp_net_irr_from_audit', lambda lp_id: 'N/A')
+        (tmp_path / 'report.html').write_text(
+            '{{ limited_partner_id }}|{{ from_date }}|{{ main_date }}|'
+            '{% for row in statement_of_changes %}{{ row.itd }};{% endfor %}')
+
+        days = pd.date_range('2024-01-31', periods=6, freq='ME')
+        grid = pd.DataFrame([{
+            'limited_partner_ID': lp, 'date': day,
+            'beg_bal': Decimal(k), 'cap_contrib': Decimal(10 * k + 1), 'cap_dist': Decimal('0'),
+            'allocated_pnl': Decimal('0.5'), 'running_nav': Decimal(k + i),
+        } for i, day in enumerate(days) for k, lp in enumerate(['LP_001', 'LP_002', 'LP_003'])
+            if not (lp == 'LP_003' and i < 2)])
+
+        jobs = list(pcap.investor_statement_jobs(grid, 'Fund I', output_dir=str(tmp_path / 'out'),
+                                                 template_dir=str(tmp_path)))
+
+        assert [job.name for job in jobs] == ['LP_001', 'LP_002', 'LP_003']
+        for job in jobs:
+            json_data = pcap.create_investor_statement_json(grid, job.name, 'Fund I')
+            assert job.html == pcap._render_statement_html(get_template(str(tmp_path)), json_data)
+            assert os.path.basename(job.output_path) == \
+                pcap._statement_filename(grid, job.name, 'Fund I')
+        # LP_003 joined later but its statement still covers the whole period
+        assert jobs[2].html.split('|')[1] == 'January 31, 2024'
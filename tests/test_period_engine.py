@@ -0,0 +1,180 @@
+"""
+Unit tests for the single-pass trial balance period engine.
+
+The reference is the previous implementation: every period boundary
+re-filters and re-groups the GL with generate_trial_balance_from_gl().
+
+Tests:
+- PeriodEngine trial balances match generate_trial_balance_from_gl at any cut-off
+- calculate_period_changes, get_income_expense_changes and calculate_nav_changes
+  return the same frames as with per-boundary GL scans
+- Typed amounts, naive dates and GLs without account names are handled alike
+- The reports no longer scan the GL once per boundary
+"""
+import pytest
+import logging
+import sys
+import os
+from datetime import datetime, date
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from main_app.services.gl_amounts import to_amounts
+from main_app.modules.financial_reporting import tb_generator
+from main_app.modules.financial_reporting.tb_generator import PeriodEngine
+
+ACCOUNTS = {
+    10110: 'Digital assets - ETH',
+    13010: 'Loans receivable',
+    20100: 'Accrued expenses',
+    30110: 'Capital contributions',
+    30210: 'Capital distributions',
+    40100: 'Interest income',
+    80100: 'Management fees',
+    80200: 'Gas fees',
+    90100: 'Realized gains',
+}
+
+REPORT_DATES = [datetime(2022, 1, 31), datetime(2023, 5, 17, 15, 30), date(2023, 12, 31), datetime(2024, 8, 1)]
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(autouse=True)
+def coa(monkeypatch):
+    coa_df = pd.DataFrame({'GL_Acct_Number': list(ACCOUNTS)[:-1], 'GL_Acct_Name': list(ACCOUNTS.values())[:-1]})
+    monkeypatch.setattr(tb_generator, 'load_COA_file', lambda: coa_df)
+
+
+def make_gl(n=2000, seed=0, years=3, tz='UTC', typed=False, names=True):
+    """Multi-year GL; some lines unmapped, some on exact month starts, one account closed out"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2021-07-14 09:00', tz=tz)
+    dates = start + pd.to_timedelta(rng.integers(0, years * 365 * 86400, n), unit='s')
+    # Lines posted at midnight, exactly on a period boundary
+    midnight = rng.random(n) < 0.1
+    dates = dates.where(~midnight, dates.normalize().map(lambda d: d.replace(day=1)))
+    amounts = np.round(rng.uniform(0, 50, n), 6)
+    debit = rng.random(n) < 0.5
+    accounts = rng.choice(list(ACCOUNTS), n).astype(object)
+    accounts[rng.random(n) < 0.02] = 'unmapped'
+    gl = pd.DataFrame({
+        'date': dates,
+        'GL_Acct_Number': accounts,
+        'debit_crypto': np.where(debit, amounts, 0.0),
+        'credit_crypto': np.where(debit, 0.0, amounts),
+    })
+    if names:
+        gl['account_name'] = rng.choice(['wallet', 'loans', None], n)
+    # 20100 is accrued and paid back to exactly zero by mid 2022
+    accrued = pd.DataFrame({
+        'date': [pd.Timestamp('2021-09-30', tz=tz), pd.Timestamp('2022-06-15', tz=tz)],
+        'GL_Acct_Number': [20100, 20100],
+        'debit_crypto': [0.0, 1.25],
+        'credit_crypto': [1.25, 0.0],
+    })
+    gl = pd.concat([gl[gl['GL_Acct_Number'] != 20100], accrued], ignore_index=True)
+    if typed:
+        for col in ['debit_crypto', 'credit_crypto']:
+            gl[col] = to_amounts(gl[col])
+    return gl
+
+
+class ScanningTrialBalances:
+    """Per-boundary GL scans behind the PeriodEngine interface (the previous behaviour)"""
+
+    def __init__(self, gl_df):
+        self.gl_df = gl_df
+
+    def trial_balance(self, as_of_date):
+        return tb_generator.generate_trial_balance_from_gl(self.gl_df, as_of_date)
+
+    def trial_balances(self, dates):
+        return {d: self.trial_balance(d) for d in dates}
+
+
+GL_VARIANTS = {
+    'utc': {},
+    'naive': {'tz': None},
+    'typed': {'typed': True, 'seed': 1},
+    'no_names': {'names': False, 'seed': 2},
+}
+
+
+@pytest.fixture(params=list(GL_VARIANTS))
+def gl(request):
+    return make_gl(**GL_VARIANTS[request.param])
+
+
+class TestTrialBalances:
+    """Test PeriodEngine against generate_trial_balance_from_gl."""
+
+    def test_matches_scan_at_any_cutoff(self, gl):
+        cutoffs = [datetime(2021, 1, 1), datetime(2021, 7, 14, 9), date(2022, 3, 1), '2022-06-15',
+                   pd.Timestamp('2023-02-28 23:59:59', tz='UTC'), datetime(2030, 1, 1)]
+        cutoffs += list(gl['date'].sample(10, random_state=0))
+
+        engine = PeriodEngine(gl)
+        balances = engine.trial_balances(cutoffs)
+
+        for cutoff in cutoffs:
+            pd.testing.assert_frame_equal(balances[cutoff],
+                                          tb_generator.generate_trial_balance_from_gl(gl, cutoff))
+        assert balances[datetime(2021, 1, 1)].empty
+        assert 20100 not in set(balances[datetime(2030, 1, 1)]['GL_Acct_Number'])
+
+    def test_reuses_computed_cutoffs(self, monkeypatch):
+        engine = PeriodEngine(make_gl())
+        first = engine.trial_balance(datetime(2023, 1, 1))
+        monkeypatch.setattr(engine, '_compute', lambda cutoffs: pytest.fail("recomputed"))
+
+        assert engine.trial_balance(pd.Timestamp('2023-01-01', tz='UTC')) is first
+
+
+class TestPeriodReports:
+    """Test the period reports on the engine against per-boundary scans."""
+
+    @pytest.mark.parametrize('report_date', REPORT_DATES)
+    def test_period_changes(self, gl, report_date):
+        expected = tb_generator.calculate_period_changes(gl.copy(), report_date,
+                                                         engine=ScanningTrialBalances(gl))
+        actual = tb_generator.calculate_period_changes(gl.copy(), report_date)
+
+        assert list(actual) == ['mtd', 'qtd', 'ytd', 'itd']
+        for period in expected:
+            pd.testing.assert_frame_equal(actual[period], expected[period])
+
+    @pytest.mark.parametrize('report_date', REPORT_DATES)
+    def test_income_expense_changes(self, gl, report_date):
+        expected = tb_generator.get_income_expense_changes(gl, report_date, engine=ScanningTrialBalances(gl))
+        actual = tb_generator.get_income_expense_changes(gl, report_date)
+
+        for actual_part, expected_part in zip(actual, expected):
+            pd.testing.assert_frame_equal(actual_part, expected_part)
+        assert not actual[0].empty and not actual[1].empty
+
+    @pytest.mark.parametrize('report_date', REPORT_DATES)
+    def test_nav_changes(self, gl, report_date):
+        expected = tb_generator.calculate_nav_changes(gl, report_date, engine=ScanningTrialBalances(gl))
+        actual = tb_generator.calculate_nav_changes(gl, report_date)
+
+        pd.testing.assert_frame_equal(actual, expected)
+
+    def test_reports_do_not_rescan_gl(self, monkeypatch):
+        gl = make_gl()
+        monkeypatch.setattr(tb_generator, 'generate_trial_balance_from_gl',
+                            lambda *args: pytest.fail("per-boundary GL scan"))
+        engine = PeriodEngine(gl)
+
+        tb_generator.calculate_period_changes(gl, datetime(2023, 6, 30), engine=engine)
+        tb_generator.get_income_expense_changes(gl, datetime(2023, 6, 30), engine=engine)
+        tb_generator.calculate_nav_changes(gl, datetime(2023, 6, 30), engine=engine)
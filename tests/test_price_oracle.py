@@ -0,0 +1,192 @@
+"""
+Unit tests for the ETH/USD price oracle.
+
+Tests:
+- Step lookup returns the round in force, interpolation blends neighbours
+- Lookups outside synced coverage are refused
+- Round history survives a save/load and merges with another writer
+- A range sync prices every block exactly like latestRoundData, with no further RPC
+- Range sync walks across aggregator phase changes
+- Sparse blocks are priced with one batched latestRoundData each
+- Live reads are remembered; a dead node falls back to the last known round
+"""
+import pytest
+import logging
+import sys
+import os
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eth_abi import decode
+from web3 import Web3
+
+from tests.stub_rpc_server import StubRpcServer, SyntheticChain, FIRST_BLOCK
+from main_app.services.chain_cache import ChainDataCache
+from main_app.services.price_oracle import (
+    EthUsdPriceOracle,
+    PriceUnavailableError,
+    make_round_id,
+    split_round_id,
+)
+from main_app.services.rpc_batch import BatchRpcFetcher
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_oracle(path=None):
+    return EthUsdPriceOracle(path, chain_cache=ChainDataCache(None, enabled=False))
+
+
+def expected_price(chain: SyntheticChain, block_number: int) -> Decimal:
+    """What latestRoundData answers at block_number on the stub chain"""
+    data = bytes.fromhex(chain.eth_usd_round(block_number)[2:])
+    answer = decode(["uint80", "int256", "uint256", "uint256", "uint80"], data)[1]
+    return Decimal(answer) / Decimal(10**8)
+
+
+class TestLookups:
+    """Test binary-search lookups over stored rounds."""
+
+    def setup_method(self):
+        self.oracle = make_oracle()
+        self.oracle.add_rounds({
+            make_round_id(1, 1): (2000_00000000, 1000),
+            make_round_id(1, 2): (2100_00000000, 2000),
+            make_round_id(1, 3): (2400_00000000, 3000),
+        }, covered=(1000, 5000))
+
+    def test_step_lookup(self):
+        assert self.oracle.price_at_timestamp(1000) == Decimal(2000)
+        assert self.oracle.price_at_timestamp(1999) == Decimal(2000)
+        assert self.oracle.price_at_timestamp(2000) == Decimal(2100)
+        assert self.oracle.price_at_timestamp(5000) == Decimal(2400)
+
+    def test_interpolation(self):
+        assert self.oracle.price_at_timestamp(2500, interpolate=True) == Decimal(2250)
+        assert self.oracle.price_at_timestamp(2000, interpolate=True) == Decimal(2100)
+        # Past the last round there is nothing to interpolate towards
+        assert self.oracle.price_at_timestamp(4000, interpolate=True) == Decimal(2400)
+
+    def test_outside_coverage(self):
+        assert self.oracle.price_at_timestamp(999) is None
+        assert self.oracle.price_at_timestamp(5001) is None
+        assert self.oracle.price_at_timestamp(5001, allow_stale=True) == Decimal(2400)
+
+    def test_round_ids(self):
+        round_id = make_round_id(6, 12345)
+        assert round_id == (6 << 64) + 12345
+        assert split_round_id(round_id) == (6, 12345)
+
+
+class TestPersistence:
+    """Test the parquet round history."""
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / 'rounds.parquet')
+        oracle = make_oracle(path)
+        oracle.add_rounds({make_round_id(2, 7): (3000_00000000, 100)}, covered=(100, 200))
+        oracle.save()
+
+        loaded = make_oracle(path)
+        assert len(loaded) == 1
+        assert loaded.coverage == [(100, 200)]
+        assert loaded.price_at_timestamp(150) == Decimal(3000)
+
+    def test_concurrent_writers_merge(self, tmp_path):
+        path = str(tmp_path / 'rounds.parquet')
+        first, second = make_oracle(path), make_oracle(path)
+        first.add_rounds({make_round_id(1, 1): (1_00000000, 10)}, covered=(10, 19))
+        second.add_rounds({make_round_id(1, 2): (2_00000000, 20)}, covered=(20, 30))
+        first.save()
+        second.save()
+
+        merged = make_oracle(path)
+        assert len(merged) == 2
+        assert merged.coverage == [(10, 30)]
+
+
+class TestSync:
+    """Test bulk loading against the stub RPC node."""
+
+    def test_range_sync_matches_latest_round_data(self):
+        with StubRpcServer(n_txs=400, latency=0, blocks_per_round=5) as server:
+            w3 = Web3(Web3.HTTPProvider(server.url))
+            oracle = make_oracle()
+            start, end = FIRST_BLOCK, FIRST_BLOCK + 99
+
+            added = oracle.sync_range(w3, start, end, fetcher=BatchRpcFetcher(w3, batch_size=50))
+
+            assert added == 20
+            assert server.http_requests <= 4
+
+            server.reset_counters()
+            for block in range(start, end + 1):
+                price = oracle.price_at_block(w3, block, SyntheticChain.timestamp(block))
+                assert price == expected_price(server.chain, block)
+            assert server.rpc_calls == 0
+
+    def test_range_sync_across_phases(self):
+        with StubRpcServer(n_txs=400, latency=0, blocks_per_round=5, rounds_per_phase=7) as server:
+            w3 = Web3(Web3.HTTPProvider(server.url))
+            oracle = make_oracle()
+            start, end = FIRST_BLOCK, FIRST_BLOCK + 99
+
+            oracle.sync_range(w3, start, end)
+
+            phases = {split_round_id(r)[0] for r in oracle._rounds}
+            assert len(phases) >= 3
+            for block in range(start, end + 1):
+                price = oracle.price_at_timestamp(SyntheticChain.timestamp(block))
+                assert price == expected_price(server.chain, block)
+
+    def test_sparse_blocks_read_per_block(self, tmp_path):
+        with StubRpcServer(n_txs=400, latency=0, blocks_per_round=1) as server:
+            w3 = Web3(Web3.HTTPProvider(server.url))
+            oracle = EthUsdPriceOracle(None, chain_cache=ChainDataCache(str(tmp_path / 'chain.sqlite3')))
+            blocks = [FIRST_BLOCK - 5000, FIRST_BLOCK - 2000, FIRST_BLOCK + 50]
+
+            oracle.prefetch_blocks(w3, blocks)
+            # 3 block headers + 3 latestRoundData, no round-by-round download
+            assert server.rpc_calls == 6
+
+            server.reset_counters()
+            for block in blocks:
+                assert oracle.price_at_block(w3, block) == expected_price(server.chain, block)
+            assert server.rpc_calls == 0
+
+
+class TestLiveFallback:
+    """Test per-block reads outside the synced history."""
+
+    def test_live_read_is_remembered(self):
+        with StubRpcServer(n_txs=40, latency=0) as server:
+            w3 = Web3(Web3.HTTPProvider(server.url))
+            oracle = make_oracle()
+            block = FIRST_BLOCK + 3
+
+            assert oracle.price_at_block(w3, block) == expected_price(server.chain, block)
+            assert oracle.stats['live_reads'] == 1
+
+            oracle._lru.clear()
+            server.reset_counters()
+            assert oracle.price_at_block(w3, block, SyntheticChain.timestamp(block)) == \
+                expected_price(server.chain, block)
+            assert server.rpc_calls == 0
+
+    def test_dead_node_uses_last_known_round(self):
+        w3 = Web3(Web3.HTTPProvider("http://127.0.0.1:9", request_kwargs={'timeout': 1}))
+        oracle = make_oracle()
+
+        with pytest.raises(PriceUnavailableError):
+            oracle.price_at_block(w3, 123, timestamp=1_000)
+
+        oracle.add_rounds({make_round_id(1, 1): (2500_00000000, 900)})
+        assert oracle.price_at_block(w3, 123, timestamp=1_000) == Decimal(2500)
+        assert oracle.stats['stale_answers'] == 1
@@ -0,0 +1,187 @@
+"""
+Unit tests for the columnar transaction rule engine.
+
+Tests:
+- Rule 7 matches the row-by-row reference on a large random frame
+- The full pipeline matches rules 0-6 followed by the row-by-row rule 7
+- Direction cases: external in/out, intercompany from/to, wrong qty sign
+- get_rule_stats exposes per-rule seconds and rows
+"""
+import pytest
+import logging
+import random
+import sys
+import os
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from main_app.services.transaction_rules import TransactionRuleEngine
+
+FUND_WALLETS = ['0xAAA1', '0xaaa2', '0xaaa3']
+EXTERNAL = ['0xbbb1', '0xbbb2', '0x0000000000000000000000000000000000000000']
+WETH = '0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2'
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_engine():
+    return TransactionRuleEngine(pd.DataFrame({'wallet_address': FUND_WALLETS + [None, '']}))
+
+
+def reference_rule_7(df, known_wallets):
+    """The row-by-row rule 7 the columnar version replaced (logging removed)"""
+    for col in ['tx_hash', 'from_address', 'to_address', 'wallet_address', 'side', 'qty', 'event_type']:
+        if col not in df.columns:
+            df[col] = ''
+    for col in ['from_address', 'to_address', 'wallet_address']:
+        df[col] = df[col].fillna('').astype(str).str.lower()
+
+    for idx, row in df.iterrows():
+        from_addr, to_addr, wallet_addr = row['from_address'], row['to_address'], row['wallet_address']
+        current_side, current_qty = row['side'], row['qty']
+        if row['event_type'] != 'Transfer' or wallet_addr not in known_wallets:
+            continue
+
+        if to_addr == wallet_addr and from_addr not in known_wallets:
+            expected_side, expected_qty = 'buy', abs(current_qty)
+        elif from_addr == wallet_addr and to_addr not in known_wallets:
+            expected_side, expected_qty = 'sell', -abs(current_qty)
+        elif from_addr in known_wallets and to_addr in known_wallets:
+            if wallet_addr == from_addr:
+                expected_side, expected_qty = 'sell', -abs(current_qty)
+            elif wallet_addr == to_addr:
+                expected_side, expected_qty = 'buy', abs(current_qty)
+            else:
+                continue
+        else:
+            continue
+
+        needs_correction = expected_side != current_side or (
+            (expected_side == 'buy' and current_qty < 0) or (expected_side == 'sell' and current_qty > 0)
+        )
+        if needs_correction:
+            df.at[idx, 'side'] = expected_side
+            df.at[idx, 'qty'] = expected_qty
+    return df
+
+
+def make_transactions(n=3000, seed=0):
+    """Transfers, WETH deposits/withdrawals and noise between fund and external wallets"""
+    rng = random.Random(seed)
+    addresses = FUND_WALLETS + EXTERNAL
+    transactions = []
+    for i in range(n):
+        amount = Decimal(rng.randint(1, 10_000)) / 100
+        side = rng.choice(['buy', 'sell', None])
+        kind = rng.random()
+        tx = {
+            'tx_hash': f'0x{i:064x}',
+            'from_address': rng.choice(addresses),
+            'to_address': rng.choice(addresses),
+            'wallet_address': rng.choice(addresses),
+            'token_address': rng.choice(['0xccc1', WETH]),
+            'token_symbol': rng.choice(['WETH', 'BLUR', 'USDC']),
+            'asset': 'WETH',
+            'function_signature': '',
+            'event_type': 'Transfer' if kind < 0.8 else rng.choice(['Deposit', 'Withdraw', 'Approval']),
+            'side': side,
+            'token_amount': amount,
+            'qty': amount if rng.random() < 0.5 else -amount,
+        }
+        if tx['event_type'] in ('Deposit', 'Withdraw'):
+            tx['to_address'] = ''
+        transactions.append(tx)
+    return transactions
+
+
+def records_frame(records):
+    return pd.DataFrame(records).reset_index(drop=True)
+
+
+class TestParity:
+    """Test the columnar rules against the row-by-row reference."""
+
+    def test_rule_7_matches_reference(self):
+        engine = make_engine()
+        known_wallets = engine._known_wallets()
+        df = pd.DataFrame(make_transactions())
+
+        expected = reference_rule_7(df.copy(), known_wallets)
+        actual = engine._apply_rule_7_direction_based_correction(df.copy(), known_wallets)
+
+        pd.testing.assert_frame_equal(actual, expected)
+        assert engine.get_rule_stats()['rule_7_applied'] > 0
+
+    def test_pipeline_matches_reference(self):
+        transactions = make_transactions(seed=1)
+
+        reference = make_engine()
+        df = pd.DataFrame(transactions)
+        for col in ['from_address', 'to_address', 'token_address', 'wallet_address',
+                    'token_symbol', 'asset', 'function_signature', 'event_type']:
+            df[col] = df[col].fillna('').astype(str)
+        df = reference._apply_rule_0_wallet_filtering(df)
+        for rule in (reference._apply_rule_1_weth_wrapping, reference._apply_rule_2_weth_unwrapping,
+                     reference._apply_rule_3_token_normalization, reference._apply_rule_4_phishing_filtering,
+                     reference._apply_rule_5_token_mints, reference._apply_rule_6_token_burns):
+            df = rule(df)
+        expected = reference_rule_7(df, reference._known_wallets()).to_dict('records')
+
+        actual = make_engine().apply_fifo_rules(transactions)
+
+        pd.testing.assert_frame_equal(records_frame(actual), records_frame(expected))
+
+
+class TestDirectionCases:
+    """Test the expected side of each rule 7 case."""
+
+    def run(self, rows):
+        engine = make_engine()
+        base = {'event_type': 'Transfer', 'tx_hash': '0x1', 'token_address': '', 'token_symbol': 'USDC',
+                'asset': 'USDC', 'function_signature': '', 'token_amount': Decimal('5')}
+        return engine, engine.apply_fifo_rules([{**base, **row} for row in rows])
+
+    def test_cases(self):
+        engine, result = self.run([
+            # Case 1: external → our wallet, misclassified as sell
+            {'from_address': '0xbbb1', 'to_address': '0xaaa1', 'wallet_address': '0xAAA1', 'side': 'sell', 'qty': Decimal('-5')},
+            # Case 2: our wallet → external, right side but positive qty
+            {'from_address': '0xaaa2', 'to_address': '0xbbb1', 'wallet_address': '0xaaa2', 'side': 'sell', 'qty': Decimal('5')},
+            # Case 3a/3b: intercompany from and to legs
+            {'from_address': '0xaaa2', 'to_address': '0xaaa3', 'wallet_address': '0xaaa2', 'side': 'buy', 'qty': Decimal('5')},
+            {'from_address': '0xaaa2', 'to_address': '0xaaa3', 'wallet_address': '0xaaa3', 'side': 'buy', 'qty': Decimal('5')},
+            # Not a Transfer: left alone
+            {'from_address': '0xbbb1', 'to_address': '0xaaa1', 'wallet_address': '0xaaa1', 'side': 'sell',
+             'qty': Decimal('-5'), 'event_type': 'Approval'},
+        ])
+
+        assert [(tx['side'], tx['qty']) for tx in result] == [
+            ('buy', Decimal('5')),
+            ('sell', Decimal('-5')),
+            ('sell', Decimal('-5')),
+            ('buy', Decimal('5')),
+            ('sell', Decimal('-5')),
+        ]
+        assert engine.get_rule_stats()['rule_7_applied'] == 3
+
+    def test_rule_stats_timing(self):
+        engine, result = self.run([
+            {'from_address': '0xbbb1', 'to_address': '0xaaa1', 'wallet_address': '0xaaa1', 'side': 'buy', 'qty': Decimal('5')},
+            {'from_address': '0xbbb1', 'to_address': '0xbbb2', 'wallet_address': '0xbbb2', 'side': 'buy', 'qty': Decimal('5')},
+        ])
+
+        stats = engine.get_rule_stats()
+        assert stats['total_processed'] == 2
+        assert stats['rule_0_dropped'] == 1
+        assert stats['rule_0_rows'] == 1 and stats['rule_7_rows'] == 1
+        assert all(stats[f'rule_{n}_seconds'] >= 0 for n in range(8))
+        assert len(result) == 1
@@ -0,0 +1,179 @@
+"""
+Unit tests for the multi-wallet fetcher.
+
+Tests:
+- All wallets and kinds are fetched concurrently and merged into one frame
+- A transfer between two fund wallets is kept once, attributed to the sender
+- Identical transfers within one wallet's results are both kept
+- Cursors turn a refresh into a delta fetch; a full page leaves its last block for later
+- A transfer already merged is not added again when a later fetch sees it from the other wallet
+"""
+import pytest
+import logging
+import threading
+import time
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from main_app.services.wallet_fanout import MultiWalletFetcher
+
+FUND_A = '0x' + 'aa' * 20
+FUND_B = '0x' + 'bb' * 20
+OUTSIDER = '0x' + 'cc' * 20
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def row(tx_hash, block, sender, recipient, amount=1.0, token='ETH'):
+    return {'hash': tx_hash, 'block': block, 'from': sender, 'to': recipient, 'amount': amount,
+            'token': token, 'timestamp': datetime.fromtimestamp(1_700_000_000 + 12 * block, tz=timezone.utc)}
+
+
+class FakeEtherscan:
+    """Serves per-(wallet, kind) rows like EtherscanClient, with latency"""
+
+    def __init__(self, rows, latency=0.05):
+        self.rows = rows
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _serve(self, kind, address, limit=100, start_block=0, sort='desc'):
+        with self._lock:
+            self.calls.append((address, kind, start_block, sort))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+        rows = [r for r in self.rows.get((address, kind), []) if r['block'] >= start_block]
+        rows.sort(key=lambda r: r['block'], reverse=(sort == 'desc'))
+        rows = rows[:limit]
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows)
+        df['type'] = ['IN' if r['to'] == address else 'OUT' for r in rows]
+        return df
+
+    def get_transactions(self, address, **kwargs):
+        return self._serve('normal', address, **kwargs)
+
+    def get_internal_transactions(self, address, **kwargs):
+        return self._serve('internal', address, **kwargs)
+
+    def get_token_transfers(self, address, **kwargs):
+        return self._serve('token', address, **kwargs)
+
+
+class TestMerge:
+    """Test the combined frame."""
+
+    def test_intercompany_kept_once(self):
+        intercompany = row('0x01', 10, FUND_A, FUND_B)
+        client = FakeEtherscan({
+            (FUND_A, 'normal'): [intercompany, row('0x02', 11, OUTSIDER, FUND_A)],
+            (FUND_B, 'normal'): [intercompany],
+            (FUND_B, 'token'): [row('0x03', 12, FUND_B, OUTSIDER, 5.0, 'USDC')],
+            (FUND_A, 'internal'): [row('0x04', 9, OUTSIDER, FUND_A, 0.5)],
+        })
+
+        df = MultiWalletFetcher(client).fetch([FUND_A, FUND_B.upper().replace('0X', '0x')])
+
+        assert list(df['hash']) == ['0x03', '0x02', '0x01', '0x04']
+        by_hash = df.set_index('hash')
+        assert by_hash.loc['0x01', 'wallet'] == FUND_A
+        assert by_hash.loc['0x01', 'type'] == 'OUT'
+        assert bool(by_hash.loc['0x01', 'intercompany'])
+        assert by_hash.loc['0x03', 'wallet'] == FUND_B and by_hash.loc['0x03', 'tx_kind'] == 'token'
+        assert by_hash.loc['0x04', 'tx_kind'] == 'internal'
+
+    def test_same_transfer_twice_in_one_wallet(self):
+        client = FakeEtherscan({
+            (FUND_A, 'token'): [row('0x01', 10, OUTSIDER, FUND_A, 5.0, 'USDC')] * 2,
+        })
+
+        df = MultiWalletFetcher(client).fetch([FUND_A, FUND_B])
+
+        assert len(df) == 2
+
+    def test_concurrent_within_one_pool(self):
+        client = FakeEtherscan({}, latency=0.1)
+
+        started = time.perf_counter()
+        MultiWalletFetcher(client, max_workers=6).fetch([FUND_A, FUND_B])
+        elapsed = time.perf_counter() - started
+
+        assert len(client.calls) == 6
+        assert client.max_in_flight > 1
+        assert elapsed < 6 * 0.1
+
+
+class TestCursors:
+    """Test delta fetching with per-(wallet, kind) cursors."""
+
+    def test_refresh_fetches_only_new_blocks(self):
+        rows = {(FUND_A, 'normal'): [row('0x01', 10, OUTSIDER, FUND_A)]}
+        client = FakeEtherscan(rows, latency=0)
+        fetcher = MultiWalletFetcher(client)
+        cursors = {}
+
+        first = fetcher.fetch([FUND_A, FUND_B], cursors=cursors)
+        assert cursors == {(FUND_A, 'normal'): 10}
+
+        rows[(FUND_A, 'normal')].append(row('0x02', 12, FUND_A, OUTSIDER))
+        client.calls.clear()
+        merged = fetcher.fetch([FUND_A, FUND_B], cursors=cursors, existing=first)
+
+        assert (FUND_A, 'normal', 11, 'asc') in client.calls
+        assert all(sort == 'desc' for wallet, kind, _, sort in client.calls if (wallet, kind) != (FUND_A, 'normal'))
+        assert list(merged['hash']) == ['0x02', '0x01']
+        assert cursors[(FUND_A, 'normal')] == 12
+
+    def test_full_page_leaves_last_block(self):
+        rows = {(FUND_A, 'token'): [row('0x00', 5, OUTSIDER, FUND_A)]}
+        client = FakeEtherscan(rows, latency=0)
+        fetcher = MultiWalletFetcher(client)
+        cursors = {}
+        existing = fetcher.fetch([FUND_A], limit=3, cursors=cursors)
+
+        rows[(FUND_A, 'token')] += [row(f'0x{n:02x}', n, OUTSIDER, FUND_A) for n in (6, 7, 8, 8)]
+        delta = fetcher.fetch([FUND_A], limit=3, cursors=cursors, existing=existing)
+
+        # Blocks 6 and 7 read; block 8 was cut off by the page size and is read next time
+        assert sorted(delta['block']) == [5, 6, 7]
+        assert cursors[(FUND_A, 'token')] == 7
+
+        delta = fetcher.fetch([FUND_A], limit=3, cursors=cursors, existing=delta)
+        assert sorted(delta['block']) == [5, 6, 7, 8, 8]
+
+    def test_later_fetch_from_other_wallet_not_merged_twice(self):
+        intercompany = row('0x01', 10, FUND_A, FUND_B, 2.0)
+        rows = {(FUND_B, 'normal'): [intercompany, intercompany]}
+        client = FakeEtherscan(rows, latency=0)
+        fetcher = MultiWalletFetcher(client)
+        cursors = {}
+
+        # The transfers reach FUND_B's results first and are attributed to the sender
+        first = fetcher.fetch([FUND_A, FUND_B], cursors=cursors)
+        assert list(first['wallet']) == [FUND_A, FUND_A]
+
+        # The next refresh sees them from FUND_A as well
+        rows[(FUND_A, 'normal')] = [intercompany, intercompany, row('0x02', 12, OUTSIDER, FUND_A)]
+        merged = fetcher.fetch([FUND_A, FUND_B], cursors=cursors, existing=first)
+
+        assert list(merged['hash']) == ['0x02', '0x01', '0x01']
+        assert set(merged.loc[merged['hash'] == '0x01', 'wallet']) == {FUND_A}